@@ -0,0 +1,80 @@
+"""Benchmark: retaining complete transactions.
+
+Writes one ITI-41 exchange (SOAP request, registry response and a CCD
+built from the bundled template) per call, either as a temp file per
+payload, the way malformed responses used to be kept, or by queueing it on
+a TransactionArchive (the caller-side cost; compression runs on the writer
+thread). A third case reads one transaction back from an archive of 1000
+by message ID.
+
+Run this benchmark:
+    python benchmarks/bench_archive.py
+"""
+
+import itertools
+import tempfile
+from pathlib import Path
+
+from ihe_test_util.logging_audit.transaction_archive import ArchiveReader, TransactionArchive
+
+from harness import BenchmarkCase, run_module
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
+
+REQUEST_XML = "<soap:Envelope>" + "<rim:Slot name='sourcePatientId'/>" * 120 + "</soap:Envelope>"
+RESPONSE_XML = "<soap:Envelope><rs:RegistryResponse status='Success'/></soap:Envelope>"
+
+READ_ARCHIVE_SIZE = 1000
+
+
+def write_tempfiles(directory: Path, message_id: str, parts: dict[str, str]) -> None:
+    """Save every payload to its own file."""
+    for name, text in parts.items():
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".xml", prefix=f"{message_id}_{name}_", delete=False, dir=directory
+        ) as temp_file:
+            temp_file.write(text)
+
+
+def cases() -> list[BenchmarkCase]:
+    """Transaction retention cases."""
+    ccd = (TEMPLATES_DIR / "ccd-template.xml").read_text(encoding="utf-8")
+    parts = {"request": REQUEST_XML, "response": RESPONSE_XML, "document": ccd}
+    root = Path(tempfile.mkdtemp(prefix="ihe-bench-archive-"))
+    counter = itertools.count()
+
+    tempfile_dir = root / "tempfiles"
+    tempfile_dir.mkdir()
+
+    # The writer is a daemon thread; it runs until the benchmark process exits
+    archive = TransactionArchive(root / "archive")
+
+    read_dir = root / "read"
+    read_archive = TransactionArchive(read_dir, flush_interval=0)
+    for i in range(READ_ARCHIVE_SIZE):
+        read_archive.write("ITI41_SUBMIT", f"urn:uuid:{i}", "SUCCESS", parts)
+    read_archive.close()
+    reader = ArchiveReader(read_dir)
+    read_id = f"urn:uuid:{READ_ARCHIVE_SIZE // 2}"
+
+    return [
+        BenchmarkCase(
+            "archive.write",
+            "temp files",
+            lambda: write_tempfiles(tempfile_dir, f"msg{next(counter)}", parts),
+        ),
+        BenchmarkCase(
+            "archive.write",
+            "archive",
+            lambda: archive.write("ITI41_SUBMIT", f"urn:uuid:{next(counter)}", "SUCCESS", parts),
+        ),
+        BenchmarkCase(
+            "archive.read",
+            f"1 of {READ_ARCHIVE_SIZE}",
+            lambda: reader.get(read_id),
+        ),
+    ]
+
+
+if __name__ == "__main__":
+    run_module(cases)
@@ -0,0 +1,71 @@
+"""Benchmark: CSV parsing and demographics validation.
+
+Times parse_csv (without the comprehensive validation pass) and
+validate_demographics on generated patient CSVs of increasing size.
+
+Run this benchmark:
+    python benchmarks/bench_csv.py
+"""
+
+import csv
+import random
+import tempfile
+from pathlib import Path
+
+from ihe_test_util.csv_parser.parser import parse_csv
+from ihe_test_util.csv_parser.validator import validate_demographics
+
+from harness import BenchmarkCase, run_module
+
+ROW_COUNTS = (100, 1_000, 10_000)
+
+FIELDNAMES = [
+    "first_name", "last_name", "dob", "gender", "patient_id_oid", "patient_id", "mrn",
+    "ssn", "address", "city", "state", "zip", "phone", "email",
+]
+
+_work_dir = tempfile.TemporaryDirectory(prefix="ihe-bench-csv-")
+
+
+def write_patients_csv(path: Path, rows: int, seed: int = 42) -> Path:
+    """Write a patient CSV with ``rows`` valid rows."""
+    rng = random.Random(seed)
+    with path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        for index in range(rows):
+            writer.writerow({
+                "first_name": rng.choice(["John", "Mary", "José", "Anne-Marie", "Wei"]),
+                "last_name": rng.choice(["Smith", "García", "O'Brien", "Nguyen", "Müller"]),
+                "dob": f"{rng.randint(1930, 2020)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                "gender": rng.choice("MFOU"),
+                "patient_id_oid": "2.16.840.1.113883.3.9999.1",
+                "patient_id": f"PAT{index:08d}",
+                "mrn": f"MRN{index:08d}",
+                "ssn": f"{rng.randint(100, 899)}-{rng.randint(10, 99)}-{rng.randint(1000, 9999)}",
+                "address": f"{rng.randint(1, 9999)} Main Street",
+                "city": "Springfield",
+                "state": "IL",
+                "zip": "62701",
+                "phone": f"555-{rng.randint(1000, 9999)}",
+                "email": f"patient{index}@example.com",
+            })
+    return path
+
+
+def cases() -> list[BenchmarkCase]:
+    """CSV parsing and validation cases."""
+    benchmark_cases = []
+    for rows in ROW_COUNTS:
+        path = write_patients_csv(Path(_work_dir.name) / f"patients_{rows}.csv", rows)
+        df, _ = parse_csv(path, validate=False)
+        size = f"{rows} rows"
+        benchmark_cases += [
+            BenchmarkCase("csv.parse_csv", size, lambda path=path: parse_csv(path, validate=False)),
+            BenchmarkCase("csv.validate_demographics", size, lambda df=df: validate_demographics(df)),
+        ]
+    return benchmark_cases
+
+
+if __name__ == "__main__":
+    run_module(cases)
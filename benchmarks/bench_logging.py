@@ -0,0 +1,98 @@
+"""Benchmark: per-patient logging overhead on the calling thread.
+
+Replays the log calls one patient makes through the integrated workflow
+(progress lines, transaction summaries and the PIX Add / ITI-41 payload
+dumps) against a rotating log file, written either synchronously or
+through the queue handler and background writer used by
+``configure_logging``. A third case runs the queued pipeline at INFO, where
+the payload dumps are skipped by their level guard.
+
+The loggers live in a private hierarchy, so the harness's global
+``logging.disable`` does not apply to them and nothing reaches the real
+root logger.
+
+Run this benchmark:
+    python benchmarks/bench_logging.py
+"""
+
+import logging
+import queue
+import tempfile
+from logging.handlers import QueueListener, RotatingFileHandler
+from pathlib import Path
+
+from ihe_test_util.logging_audit.formatters import PIIRedactingFormatter
+from ihe_test_util.logging_audit.logger import (
+    BACKUP_COUNT,
+    DEFAULT_LOG_FORMAT,
+    MAX_LOG_FILE_SIZE,
+    DeferredQueueHandler,
+)
+
+from harness import BenchmarkCase, run_module
+
+REQUEST_XML = "<soap:Envelope>" + "<patient>PAT001</patient>" * 160 + "</soap:Envelope>"
+RESPONSE_XML = "<soap:Envelope>" + "<ack typeCode='AA'/>" * 80 + "</soap:Envelope>"
+
+
+def _file_handler(log_dir: Path, name: str) -> RotatingFileHandler:
+    handler = RotatingFileHandler(
+        filename=str(log_dir / f"{name}.log"),
+        maxBytes=MAX_LOG_FILE_SIZE,
+        backupCount=BACKUP_COUNT,
+        encoding="utf-8",
+    )
+    handler.setFormatter(PIIRedactingFormatter(fmt=DEFAULT_LOG_FORMAT))
+    return handler
+
+
+def _logger(name: str, level: int, handler: logging.Handler) -> logging.Logger:
+    """Return a logger outside the process-wide hierarchy."""
+    manager = logging.Manager(logging.RootLogger(level))
+    logger = manager.getLogger(f"bench.{name}")
+    logger.addHandler(handler)
+    logger.propagate = False
+    return logger
+
+
+def log_patient(logger: logging.Logger) -> None:
+    """Emit the log calls of one patient's integrated workflow."""
+    patient_id = "PAT001"
+    logger.info("Processing patient through integrated workflow: %s", patient_id)
+    logger.debug("Generating CCD for patient %s", patient_id)
+    logger.info("CCD generated for patient %s (%sms)", patient_id, 12)
+    for transaction in ("PIX_ADD", "ITI_41"):
+        logger.info(
+            "TRANSACTION [%s] | status=%s | correlation_id=%s | "
+            "request_size=%d bytes | response_size=%d bytes",
+            transaction, "success", "urn:uuid:1", len(REQUEST_XML), len(RESPONSE_XML),
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("TRANSACTION REQUEST [%s]\n%s", transaction, REQUEST_XML)
+            logger.debug("TRANSACTION RESPONSE [%s]\n%s", transaction, RESPONSE_XML)
+    logger.info("Patient %s processed", patient_id)
+
+
+def cases() -> list[BenchmarkCase]:
+    """Per-patient logging cases."""
+    log_dir = Path(tempfile.mkdtemp(prefix="ihe-bench-logging-"))
+
+    sync_logger = _logger("sync", logging.DEBUG, _file_handler(log_dir, "sync"))
+
+    # Listeners are daemon threads; they run until the benchmark process exits
+    queued_cases = []
+    for name, level in (("queued", logging.DEBUG), ("queued_info", logging.INFO)):
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue()
+        QueueListener(log_queue, _file_handler(log_dir, name)).start()
+        queued_cases.append(_logger(name, level, DeferredQueueHandler(log_queue)))
+    queued_logger, queued_info_logger = queued_cases
+
+    return [
+        BenchmarkCase("logging.per_patient", "sync DEBUG", lambda: log_patient(sync_logger)),
+        BenchmarkCase("logging.per_patient", "queued DEBUG", lambda: log_patient(queued_logger)),
+        BenchmarkCase("logging.per_patient", "queued INFO", lambda: log_patient(queued_info_logger)),
+    ]
+
+
+if __name__ == "__main__":
+    run_module(cases)
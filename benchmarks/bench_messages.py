@@ -0,0 +1,92 @@
+"""Benchmark: PIX Add message and XDSb metadata construction.
+
+Times build_pix_add_message for minimal and fully populated demographics,
+and XDSbMetadataBuilder.build with an increasing number of custom slots.
+
+Run this benchmark:
+    python benchmarks/bench_messages.py
+"""
+
+from datetime import date, datetime, timezone
+
+from lxml import etree
+
+from ihe_test_util.ihe_transactions.pix_add import build_pix_add_message
+from ihe_test_util.ihe_transactions.xdsb_metadata import XDSbMetadataBuilder
+from ihe_test_util.models.ccd import CCDDocument
+from ihe_test_util.models.patient import PatientDemographics
+
+from harness import BenchmarkCase, run_module
+
+PATIENT_OID = "2.16.840.1.113883.3.9999.1"
+
+SLOT_COUNTS = (0, 10, 100)
+
+MINIMAL_PATIENT = PatientDemographics(
+    patient_id="PAT00000001",
+    patient_id_oid=PATIENT_OID,
+    first_name="John",
+    last_name="Doe",
+    dob=date(1980, 1, 15),
+    gender="M",
+)
+
+FULL_PATIENT = PatientDemographics(
+    patient_id="PAT00000002",
+    patient_id_oid=PATIENT_OID,
+    first_name="José",
+    last_name="García-O'Brien",
+    dob=date(1975, 6, 20),
+    gender="F",
+    mrn="MRN00000002",
+    ssn="123-45-6789",
+    address="123 Main Street",
+    city="Springfield",
+    state="IL",
+    zip="62701",
+    phone="555-0100",
+    email="jose.garcia@example.com",
+)
+
+
+def sample_document() -> CCDDocument:
+    """Return a small CCD document."""
+    return CCDDocument(
+        document_id="2.16.840.1.113883.3.9999.2.1",
+        patient_id=MINIMAL_PATIENT.patient_id,
+        template_path="tests/fixtures/test_ccd_template.xml",
+        xml_content='<ClinicalDocument xmlns="urn:hl7-org:v3"><title>CCD</title></ClinicalDocument>',
+        creation_timestamp=datetime(2025, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+def build_metadata(document: CCDDocument, slot_count: int) -> etree._Element:
+    """Build XDSb metadata with ``slot_count`` custom slots."""
+    builder = XDSbMetadataBuilder()
+    builder.set_patient_identifier(MINIMAL_PATIENT.patient_id, PATIENT_OID)
+    builder.set_document(document)
+    for index in range(slot_count):
+        builder.add_slot(f"urn:ihe-test-util:slot{index}", [f"value-{index}", f"other-{index}"])
+    return builder.build()
+
+
+def cases() -> list[BenchmarkCase]:
+    """Message construction cases."""
+    document = sample_document()
+    benchmark_cases = [
+        BenchmarkCase("pix_add.build_pix_add_message", "minimal", lambda: build_pix_add_message(MINIMAL_PATIENT)),
+        BenchmarkCase("pix_add.build_pix_add_message", "full", lambda: build_pix_add_message(FULL_PATIENT)),
+    ]
+    for slot_count in SLOT_COUNTS:
+        benchmark_cases.append(
+            BenchmarkCase(
+                "xdsb.XDSbMetadataBuilder.build",
+                f"{slot_count} slots",
+                lambda slot_count=slot_count: build_metadata(document, slot_count),
+            )
+        )
+    return benchmark_cases
+
+
+if __name__ == "__main__":
+    run_module(cases)
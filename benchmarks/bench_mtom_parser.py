@@ -0,0 +1,110 @@
+"""Benchmark: email-based vs. zero-copy MTOM parsing in the mock ITI-41 endpoint.
+
+Compares iti41_endpoint.extract_mtom_parts (email.message_from_bytes) against
+mtom_parser.fast_extract_mtom_parts on MTOMPackage-built messages with
+documents of increasing size.
+
+Run this benchmark:
+    python benchmarks/bench_mtom_parser.py [--iterations N]
+
+``cases()`` feeds both parsers, plus MTOMPackage.build at the same
+document sizes, into the baseline suite (benchmarks/run_benchmarks.py).
+"""
+
+import argparse
+import logging
+import timeit
+from typing import Callable
+
+from ihe_test_util.ihe_transactions.mtom import MTOMAttachment, MTOMPackage
+from ihe_test_util.mock_server.iti41_endpoint import extract_mtom_parts
+from ihe_test_util.mock_server.mtom_parser import fast_extract_mtom_parts
+
+from harness import BenchmarkCase
+
+SOAP_ENVELOPE = (
+    b'<?xml version="1.0" encoding="UTF-8"?>'
+    b'<soap:Envelope xmlns:soap="http://www.w3.org/2003/05/soap-envelope">'
+    b"<soap:Body><Document>"
+    b'<xop:Include xmlns:xop="http://www.w3.org/2004/08/xop/include" '
+    b'href="cid:doc%40ihe-test-util.local"/>'
+    b"</Document></soap:Body></soap:Envelope>"
+)
+
+DOCUMENT_SIZES = {
+    "10 KB": 10 * 1024,
+    "1 MB": 1024 * 1024,
+    "5 MB": 5 * 1024 * 1024,
+}
+
+
+def build_package(document_size: int) -> MTOMPackage:
+    """Build an MTOM package carrying an XML document of roughly the given size."""
+    entry = b"<entry><observation><value>12345</value></observation></entry>\n"
+    body = entry * max(1, document_size // len(entry))
+    document = b'<?xml version="1.0"?><ClinicalDocument xmlns="urn:hl7-org:v3">' + body + b"</ClinicalDocument>"
+    package = MTOMPackage(SOAP_ENVELOPE)
+    package.add_attachment(
+        MTOMAttachment(document, "doc@ihe-test-util.local", "application/xml")
+    )
+    return package
+
+
+def build_message(document_size: int) -> tuple[bytes, str]:
+    """Build an MTOM message carrying an XML document of roughly the given size."""
+    return build_package(document_size).build()
+
+
+def cases() -> list[BenchmarkCase]:
+    """MTOM parser cases for the baseline suite."""
+    benchmark_cases = []
+    for label, size in DOCUMENT_SIZES.items():
+        package = build_package(size)
+        message, content_type = package.build()
+        benchmark_cases += [
+            BenchmarkCase("mtom.MTOMPackage.build", label, package.build),
+            BenchmarkCase(
+                "mock.extract_mtom_parts",
+                label,
+                lambda message=message, content_type=content_type: extract_mtom_parts(message, content_type),
+            ),
+            BenchmarkCase(
+                "mock.fast_extract_mtom_parts",
+                label,
+                lambda message=message, content_type=content_type: fast_extract_mtom_parts(
+                    message, content_type
+                ),
+            ),
+        ]
+    return benchmark_cases
+
+
+def _time_per_call_us(func: Callable[[], object], iterations: int) -> float:
+    """Return the best-of-5 mean time per call in microseconds."""
+    timings = timeit.repeat(func, number=iterations, repeat=5)
+    return min(timings) / iterations * 1_000_000
+
+
+def main() -> None:
+    """Run the MTOM parser comparison."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--iterations", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    for label, size in DOCUMENT_SIZES.items():
+        message, content_type = build_message(size)
+        reference_us = _time_per_call_us(
+            lambda: extract_mtom_parts(message, content_type), args.iterations
+        )
+        fast_us = _time_per_call_us(
+            lambda: fast_extract_mtom_parts(message, content_type), args.iterations
+        )
+        print(f"document {label} ({len(message)} byte message)")
+        print(f"  {'reference':<12} {reference_us:12.1f} us/call")
+        print(f"  {'zero-copy':<12} {fast_us:12.1f} us/call  ({reference_us / fast_us:7.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark: CCD template personalization.
+
+Times TemplatePersonalizer.personalize on the CCD test template and on
+templates grown with repeated placeholder-bearing entries.
+
+Run this benchmark:
+    python benchmarks/bench_personalizer.py
+"""
+
+from datetime import date
+from pathlib import Path
+
+from ihe_test_util.template_engine.personalizer import TemplatePersonalizer
+
+from harness import BenchmarkCase, run_module
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "tests" / "fixtures"
+
+ENTRY_COUNTS = (10, 100, 1_000)
+
+ENTRY = """    <entry>
+      <observation classCode="OBS" moodCode="EVN">
+        <subject><name><given>{{first_name}}</given><family>{{last_name}}</family></name></subject>
+        <effectiveTime value="{{dob}}"/>
+        <value xsi:type="ST">{{address}}, {{city}}, {{state}} {{zip}}</value>
+      </observation>
+    </entry>
+"""
+
+VALUES = {
+    "document_id": "2.16.840.1.113883.3.9999.2.1",
+    "patient_id": "PAT00000001",
+    "patient_id_oid": "2.16.840.1.113883.3.9999.1",
+    "first_name": "José",
+    "last_name": "O'Brien & Sons",
+    "dob": date(1980, 1, 15),
+    "gender": "M",
+    "address": "123 Main Street",
+    "city": "Springfield",
+    "state": "IL",
+    "zip": "62701",
+    "phone": "555-0100",
+}
+
+
+def build_template(entry_count: int) -> str:
+    """Return the CCD test template with ``entry_count`` extra entries."""
+    template = (FIXTURES_DIR / "test_ccd_template.xml").read_text(encoding="utf-8")
+    return template.replace("</ClinicalDocument>", ENTRY * entry_count + "</ClinicalDocument>")
+
+
+def cases() -> list[BenchmarkCase]:
+    """Template personalization cases."""
+    personalizer = TemplatePersonalizer()
+    benchmark_cases = []
+    for entry_count in (0,) + ENTRY_COUNTS:
+        template = build_template(entry_count)
+        benchmark_cases.append(
+            BenchmarkCase(
+                "template.personalize",
+                f"{entry_count} entries" if entry_count else "ccd",
+                lambda template=template: personalizer.personalize(template, VALUES),
+            )
+        )
+    return benchmark_cases
+
+
+if __name__ == "__main__":
+    run_module(cases)
@@ -0,0 +1,56 @@
+"""Benchmark: PII redaction throughput.
+
+Times PIIRedactor.redact against the sequential reference (one regex pass
+per pattern in REDACTION_PATTERNS) on a plain log line, a log line that
+names a patient, and records embedding a CCD document of growing size.
+Divide the record size by the time per call for characters per second.
+
+Run this benchmark:
+    python benchmarks/bench_redaction.py
+"""
+
+from pathlib import Path
+
+from ihe_test_util.logging_audit.formatters import REDACTION_PATTERNS, PIIRedactor
+
+from harness import BenchmarkCase, run_module
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
+
+HEADER = "2026-01-15 10:30:00,123 - ihe_test_util.ihe_transactions.audit - DEBUG - "
+
+PLAIN_LINE = HEADER + "Processing patient through integrated workflow: PAT00000001"
+PII_LINE = HEADER + 'Patient: John Doe name="John Doe" SSN: 123-45-6789'
+
+CCD_COPIES = (1, 10, 100)
+
+
+def redact_sequentially(text: str) -> str:
+    """Apply each reference pattern in turn."""
+    for pattern, replacement in REDACTION_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def cases() -> list[BenchmarkCase]:
+    """Redaction cases: reference vs single-pass engine."""
+    ccd = (TEMPLATES_DIR / "ccd-template.xml").read_text(encoding="utf-8")
+    records = [("plain line", PLAIN_LINE), ("PII line", PII_LINE)] + [
+        (f"{len(ccd) * copies // 1024} KiB CCD", f"{PII_LINE}\n{ccd * copies}")
+        for copies in CCD_COPIES
+    ]
+    redactor = PIIRedactor(max_chars=None)
+
+    result: list[BenchmarkCase] = []
+    for size, text in records:
+        result.append(
+            BenchmarkCase("redaction.sequential", size, lambda text=text: redact_sequentially(text))
+        )
+        result.append(
+            BenchmarkCase("redaction.redactor", size, lambda text=text: redactor.redact(text))
+        )
+    return result
+
+
+if __name__ == "__main__":
+    run_module(cases)
@@ -0,0 +1,187 @@
+"""Benchmark: reference vs. fast-path response parsers.
+
+Compares parse_registry_response against fast_parse_registry_response (tree and
+streaming modes) on the registry response fixtures in tests/fixtures, and
+parse_acknowledgment against fast_parse_acknowledgment on a representative
+PIX Add acknowledgment.
+
+The reference registry parser writes every response to logs/transactions, so
+the benchmark runs from a temporary working directory.
+
+Run this benchmark:
+    python benchmarks/bench_response_parsers.py [--iterations N]
+
+``cases()`` feeds the fast-path parsers into the baseline suite
+(benchmarks/run_benchmarks.py) at several response sizes.
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import timeit
+from pathlib import Path
+from typing import Callable
+
+from ihe_test_util.ihe_transactions.fast_parsers import (
+    fast_parse_acknowledgment,
+    fast_parse_registry_response,
+)
+from ihe_test_util.ihe_transactions.parsers import (
+    parse_acknowledgment,
+    parse_registry_response,
+)
+
+from harness import BenchmarkCase
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "tests" / "fixtures"
+
+ACKNOWLEDGMENT_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<MCCI_IN000002UV01 xmlns="urn:hl7-org:v3" ITSVersion="XML_1.0">
+  <id root="2.16.840.1.113883.3.72.5.9.2" extension="ACK-20251116-001"/>
+  <creationTime value="20251116144530"/>
+  <acknowledgement>
+    <typeCode code="AA"/>
+    <targetMessage>
+      <id root="2.16.840.1.113883.3.72.5.9.1" extension="MSG-20251116-001"/>
+    </targetMessage>
+  </acknowledgement>
+  <controlActProcess>
+    <subject typeCode="SUBJ">
+      <registrationEvent>
+        <subject1 typeCode="SBJ">
+          <patient>
+            <id root="2.16.840.1.113883.3.72.5.9.1" extension="PAT123456"/>
+          </patient>
+        </subject1>
+      </registrationEvent>
+    </subject>
+  </controlActProcess>
+</MCCI_IN000002UV01>"""
+
+
+REGISTRY_ERROR = (
+    '<rs:RegistryError errorCode="XDSRegistryError" codeContext="Error {index} in submission" '
+    'severity="urn:oasis:names:tc:ebxml-regrep:ErrorSeverityType:Error" location="Document{index}"/>'
+)
+
+REGISTRY_FAILURE_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<soap12:Envelope xmlns:soap12="http://www.w3.org/2003/05/soap-envelope"
+                 xmlns:rs="urn:oasis:names:tc:ebxml-regrep:xsd:rs:3.0">
+  <soap12:Body>
+    <rs:RegistryResponse status="urn:oasis:names:tc:ebxml-regrep:ResponseStatusType:Failure">
+      <rs:RegistryErrorList highestSeverity="urn:oasis:names:tc:ebxml-regrep:ErrorSeverityType:Error">
+{errors}
+      </rs:RegistryErrorList>
+    </rs:RegistryResponse>
+  </soap12:Body>
+</soap12:Envelope>"""
+
+
+def build_registry_failure(error_count: int) -> str:
+    """Build a failure RegistryResponse carrying ``error_count`` RegistryErrors."""
+    errors = "\n".join(REGISTRY_ERROR.format(index=index) for index in range(error_count))
+    return REGISTRY_FAILURE_TEMPLATE.format(errors=errors)
+
+
+def cases() -> list[BenchmarkCase]:
+    """Response parser cases for the baseline suite."""
+    benchmark_cases = [
+        BenchmarkCase(
+            "parsers.fast_parse_acknowledgment",
+            "AA",
+            lambda: fast_parse_acknowledgment(ACKNOWLEDGMENT_XML),
+        ),
+        BenchmarkCase(
+            "parsers.parse_acknowledgment",
+            "AA",
+            lambda: parse_acknowledgment(ACKNOWLEDGMENT_XML),
+        ),
+    ]
+    success_xml = (FIXTURES_DIR / "registry_response_success.xml").read_text(encoding="utf-8")
+    responses = {"success": success_xml}
+    for error_count in (1, 10, 100):
+        responses[f"{error_count} errors"] = build_registry_failure(error_count)
+    for size, xml in responses.items():
+        benchmark_cases += [
+            BenchmarkCase(
+                "parsers.fast_parse_registry_response",
+                size,
+                lambda xml=xml: fast_parse_registry_response(xml),
+            ),
+            BenchmarkCase(
+                "parsers.fast_parse_registry_response_streaming",
+                size,
+                lambda xml=xml: fast_parse_registry_response(xml, streaming=True),
+            ),
+            BenchmarkCase(
+                "parsers.parse_registry_response",
+                size,
+                lambda xml=xml: parse_registry_response(xml),
+            ),
+        ]
+    return benchmark_cases
+
+
+def _time_per_call_us(func: Callable[[], object], iterations: int) -> float:
+    """Return the best-of-5 mean time per call in microseconds."""
+    timings = timeit.repeat(func, number=iterations, repeat=5)
+    return min(timings) / iterations * 1_000_000
+
+
+def _report(name: str, reference_us: float, candidates: dict[str, float]) -> None:
+    """Print one comparison row per candidate."""
+    print(f"{name}")
+    print(f"  {'reference':<12} {reference_us:10.1f} us/call")
+    for label, value in candidates.items():
+        print(f"  {label:<12} {value:10.1f} us/call  ({reference_us / value:5.1f}x)")
+
+
+def main() -> None:
+    """Run the parser comparison."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--iterations", type=int, default=500)
+    args = arg_parser.parse_args()
+
+    # Keep parser log output out of the measurements
+    logging.disable(logging.CRITICAL)
+
+    fixtures = sorted(FIXTURES_DIR.glob("registry_response_*.xml"))
+    original_cwd = Path.cwd()
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        try:
+            for fixture in fixtures:
+                xml = fixture.read_text(encoding="utf-8")
+                _report(
+                    fixture.name,
+                    _time_per_call_us(lambda: parse_registry_response(xml), args.iterations),
+                    {
+                        "fast": _time_per_call_us(
+                            lambda: fast_parse_registry_response(xml), args.iterations
+                        ),
+                        "streaming": _time_per_call_us(
+                            lambda: fast_parse_registry_response(xml, streaming=True),
+                            args.iterations,
+                        ),
+                    },
+                )
+
+            _report(
+                "acknowledgment (AA)",
+                _time_per_call_us(
+                    lambda: parse_acknowledgment(ACKNOWLEDGMENT_XML), args.iterations
+                ),
+                {
+                    "fast": _time_per_call_us(
+                        lambda: fast_parse_acknowledgment(ACKNOWLEDGMENT_XML),
+                        args.iterations,
+                    ),
+                },
+            )
+        finally:
+            os.chdir(original_cwd)
+
+
+if __name__ == "__main__":
+    main()
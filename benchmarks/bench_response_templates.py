@@ -0,0 +1,93 @@
+"""Benchmark: lxml tree building vs. precompiled templates for mock responses.
+
+Compares building and serialising the acknowledgment / RegistryResponse trees
+per request (what the endpoints did before response templates) against
+rendering the precompiled templates, plus SOAP fault rendering.
+
+Run this benchmark:
+    python benchmarks/bench_response_templates.py [--iterations N]
+
+``cases()`` feeds the template renderers into the baseline suite
+(benchmarks/run_benchmarks.py).
+"""
+
+import argparse
+import logging
+import timeit
+from typing import Callable
+
+from ihe_test_util.mock_server.iti41_endpoint import (
+    _build_registry_response_template,
+    generate_registry_response,
+    generate_soap_fault,
+)
+from ihe_test_util.mock_server.pix_add_endpoint import (
+    _build_acknowledgment_template,
+    generate_acknowledgment,
+)
+
+from harness import BenchmarkCase
+
+
+def cases() -> list[BenchmarkCase]:
+    """Mock response rendering cases for the baseline suite."""
+    return [
+        BenchmarkCase(
+            "mock.generate_acknowledgment",
+            "AA",
+            lambda: generate_acknowledgment("MSG-1", "1.2.3.4", "PAT-1", "1.2.840.114350"),
+        ),
+        BenchmarkCase(
+            "mock.generate_registry_response",
+            "success",
+            lambda: generate_registry_response("req-1", "1.2.3.4.5", "1.2.3.4.6"),
+        ),
+        BenchmarkCase(
+            "mock.generate_soap_fault",
+            "sender",
+            lambda: generate_soap_fault("soap:Sender", "Invalid XDSb Metadata", "Missing <rim:Slot>"),
+        ),
+    ]
+
+
+def _time_per_call_us(func: Callable[[], object], iterations: int) -> float:
+    """Return the best-of-5 mean time per call in microseconds."""
+    timings = timeit.repeat(func, number=iterations, repeat=5)
+    return min(timings) / iterations * 1_000_000
+
+
+def main() -> None:
+    """Run the response generation comparison."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--iterations", type=int, default=2000)
+    args = arg_parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    cases = {
+        "PIX acknowledgment": (
+            _build_acknowledgment_template,
+            lambda: generate_acknowledgment("MSG-1", "1.2.3.4", "PAT-1", "1.2.840.114350"),
+        ),
+        "RegistryResponse": (
+            _build_registry_response_template,
+            lambda: generate_registry_response("req-1", "1.2.3.4.5", "1.2.3.4.6"),
+        ),
+    }
+    for label, (tree_build, template_render) in cases.items():
+        tree_us = _time_per_call_us(tree_build, args.iterations)
+        template_us = _time_per_call_us(template_render, args.iterations)
+        print(label)
+        print(f"  {'lxml tree':<12} {tree_us:10.2f} us/call")
+        print(f"  {'template':<12} {template_us:10.2f} us/call  ({tree_us / template_us:6.1f}x)")
+
+    fault_us = _time_per_call_us(
+        lambda: generate_soap_fault("soap:Sender", "Invalid XDSb Metadata", "Missing <rim:Slot>"),
+        args.iterations,
+    )
+    print("SOAP fault")
+    print(f"  {'template':<12} {fault_us:10.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark: SAML signing and WS-Security envelope construction.
+
+Times SAMLSigner.sign_assertion and WSSecurityHeaderBuilder.build_ws_security_header
+on assertions with an increasing number of attributes, and the PIX Add and
+ITI-41 SOAP envelope builders on payloads of increasing size. Uses the test
+certificate in tests/fixtures.
+
+Run this benchmark:
+    python benchmarks/bench_saml.py
+"""
+
+from pathlib import Path
+
+from lxml import etree
+
+from ihe_test_util.ihe_transactions.pix_add import build_pix_add_message
+from ihe_test_util.saml.certificate_manager import load_certificate
+from ihe_test_util.saml.programmatic_generator import SAMLProgrammaticGenerator
+from ihe_test_util.saml.signer import SAMLSigner
+from ihe_test_util.saml.ws_security import WSSecurityHeaderBuilder
+
+from bench_messages import MINIMAL_PATIENT, build_metadata, sample_document
+from harness import BenchmarkCase, run_module
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "tests" / "fixtures"
+
+ATTRIBUTE_COUNTS = (0, 10, 50)
+
+SLOT_COUNTS = (0, 100)
+
+
+def _assertion(generator: SAMLProgrammaticGenerator, attribute_count: int):
+    """Generate an unsigned assertion with ``attribute_count`` attributes."""
+    attributes = {f"urn:ihe-test-util:attribute{index}": f"value-{index}" for index in range(attribute_count)}
+    return generator.generate(
+        subject="load-test@example.com",
+        issuer="https://idp.example.com",
+        audience="https://pix.example.com",
+        attributes=attributes or None,
+    )
+
+
+def cases() -> list[BenchmarkCase]:
+    """SAML signing and WS-Security cases."""
+    cert_bundle = load_certificate(FIXTURES_DIR / "test_cert.pem", FIXTURES_DIR / "test_key.pem")
+    signer = SAMLSigner(cert_bundle)
+    generator = SAMLProgrammaticGenerator(cert_bundle)
+    ws_builder = WSSecurityHeaderBuilder()
+
+    benchmark_cases = []
+    for attribute_count in ATTRIBUTE_COUNTS:
+        size = f"{attribute_count} attributes"
+        assertion = _assertion(generator, attribute_count)
+        signed = signer.sign_assertion(assertion)
+        benchmark_cases += [
+            BenchmarkCase(
+                "saml.SAMLSigner.sign_assertion",
+                size,
+                lambda assertion=assertion: signer.sign_assertion(assertion),
+            ),
+            BenchmarkCase(
+                "ws_security.build_ws_security_header",
+                size,
+                lambda signed=signed: ws_builder.build_ws_security_header(signed),
+            ),
+        ]
+
+    signed = signer.sign_assertion(_assertion(generator, 0))
+    pix_message = etree.fromstring(build_pix_add_message(MINIMAL_PATIENT).encode("utf-8"))
+    benchmark_cases.append(
+        BenchmarkCase(
+            "ws_security.create_pix_add_soap_envelope",
+            "minimal",
+            lambda: ws_builder.create_pix_add_soap_envelope(signed, pix_message),
+        )
+    )
+    document = sample_document()
+    for slot_count in SLOT_COUNTS:
+        metadata = build_metadata(document, slot_count)
+        benchmark_cases.append(
+            BenchmarkCase(
+                "ws_security.create_iti41_soap_envelope",
+                f"{slot_count} slots",
+                lambda metadata=metadata: ws_builder.create_iti41_soap_envelope(signed, metadata),
+            )
+        )
+    return benchmark_cases
+
+
+if __name__ == "__main__":
+    run_module(cases)
@@ -0,0 +1,45 @@
+"""Benchmark: span tracing overhead.
+
+Times one ``span()`` block and one ``trace_context()`` block with tracing
+disabled (the cost every batch pays) and enabled (the cost of --trace).
+
+Run this benchmark:
+    python benchmarks/bench_tracing.py
+"""
+
+from ihe_test_util.profiling.tracing import Tracer, span, trace_context
+
+from harness import BenchmarkCase, run_module
+
+
+def disabled_span() -> None:
+    """Open and close one span while tracing is disabled."""
+    with span("http.post", "http", attempt=1) as http_span:
+        http_span.set(status_code=200)
+
+
+def disabled_context() -> None:
+    """Bind patient context while tracing is disabled."""
+    with trace_context(patient_id="PAT001"):
+        pass
+
+
+def enabled_span(tracer: Tracer) -> None:
+    """Record one span (events are discarded so memory stays flat)."""
+    with tracer.span("http.post", "http", {"attempt": 1}) as http_span:
+        http_span.set(status_code=200)
+    tracer._events.clear()
+
+
+def cases() -> list[BenchmarkCase]:
+    """Tracing overhead cases."""
+    tracer = Tracer()
+    return [
+        BenchmarkCase("tracing.span", "disabled", disabled_span),
+        BenchmarkCase("tracing.trace_context", "disabled", disabled_context),
+        BenchmarkCase("tracing.span", "enabled", lambda: enabled_span(tracer)),
+    ]
+
+
+if __name__ == "__main__":
+    run_module(cases)
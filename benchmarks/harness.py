@@ -0,0 +1,283 @@
+"""Shared timing, baseline and comparison helpers for the benchmark suite.
+
+Every bench_*.py module exposes ``cases()`` returning ``BenchmarkCase``s,
+one per measured function and input size. ``run_cases`` times them,
+``save_results``/``load_results`` store runs as JSON baselines and
+``compare_results`` flags cases that got slower than a threshold.
+
+Timing calibrates the number of calls per measurement so each one lasts
+at least ``min_time`` seconds, then keeps the best of ``repeat``
+measurements; the minimum is the least noisy estimate of the cost of a
+call on an otherwise idle machine.
+"""
+
+import argparse
+import json
+import logging
+import platform
+import re
+import timeit
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+SCHEMA_VERSION = 1
+DEFAULT_THRESHOLD = 0.15
+
+
+@dataclass
+class BenchmarkCase:
+    """One function measured at one input size.
+
+    Attributes:
+        group: Measured operation, e.g. 'csv.parse_csv'
+        size: Input size label, e.g. '1000 rows'
+        func: Zero-argument callable performing one operation
+    """
+
+    group: str
+    size: str
+    func: Callable[[], object]
+
+    @property
+    def name(self) -> str:
+        """Stable identifier used as the baseline key."""
+        return f"{self.group}[{self.size}]"
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing of one case.
+
+    Attributes:
+        group: Measured operation
+        size: Input size label
+        us_per_call: Best-of-repeat mean time per call in microseconds
+        calls: Calls per measurement
+        repeat: Measurements taken
+    """
+
+    group: str
+    size: str
+    us_per_call: float
+    calls: int
+    repeat: int
+
+
+@dataclass
+class Comparison:
+    """Baseline vs. current timing of one case.
+
+    Attributes:
+        name: Case identifier
+        baseline_us: Baseline time per call (None: new case)
+        current_us: Current time per call (None: case no longer measured)
+        ratio: current / baseline
+        status: 'regression', 'improvement', 'unchanged', 'new' or 'missing'
+    """
+
+    name: str
+    baseline_us: Optional[float]
+    current_us: Optional[float]
+    ratio: Optional[float]
+    status: str
+
+
+def time_per_call_us(
+    func: Callable[[], object], repeat: int = 5, min_time: float = 0.2
+) -> tuple[float, int]:
+    """Time a callable.
+
+    Args:
+        func: Zero-argument callable
+        repeat: Measurements to take (the fastest one counts)
+        min_time: Minimum duration of one measurement in seconds
+
+    Returns:
+        (best mean time per call in microseconds, calls per measurement)
+    """
+    timer = timeit.Timer(func)
+    calls = 1
+    while True:
+        elapsed = timer.timeit(calls)
+        if elapsed >= min_time:
+            break
+        calls = max(calls * 2, int(calls * min_time / elapsed * 1.1) if elapsed > 0 else calls * 10)
+    timings = [elapsed] + timer.repeat(repeat=max(repeat - 1, 0), number=calls)
+    return min(timings) / calls * 1_000_000, calls
+
+
+def select_cases(cases: Iterable[BenchmarkCase], pattern: Optional[str]) -> list[BenchmarkCase]:
+    """Return the cases whose name matches a regular expression (all if None)."""
+    if not pattern:
+        return list(cases)
+    regex = re.compile(pattern)
+    return [case for case in cases if regex.search(case.name)]
+
+
+def run_cases(
+    cases: Iterable[BenchmarkCase],
+    repeat: int = 5,
+    min_time: float = 0.2,
+    progress: Optional[Callable[[BenchmarkResult], None]] = None,
+) -> dict[str, BenchmarkResult]:
+    """Time every case.
+
+    Args:
+        cases: Cases to run
+        repeat: Measurements per case
+        min_time: Minimum duration of one measurement in seconds
+        progress: Called with each result as it completes
+
+    Returns:
+        Results keyed by case name, in run order
+    """
+    results: dict[str, BenchmarkResult] = {}
+    for case in cases:
+        us_per_call, calls = time_per_call_us(case.func, repeat=repeat, min_time=min_time)
+        result = BenchmarkResult(case.group, case.size, round(us_per_call, 3), calls, repeat)
+        results[case.name] = result
+        if progress is not None:
+            progress(result)
+    return results
+
+
+def environment() -> dict[str, str]:
+    """Describe the machine and interpreter a run was taken on."""
+    try:
+        from importlib.metadata import version
+
+        package_version = version("ihe-test-util")
+    except Exception:
+        package_version = "unknown"
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or "unknown",
+        "package_version": package_version,
+    }
+
+
+def save_results(path: Path, results: dict[str, BenchmarkResult]) -> None:
+    """Write results as a JSON baseline."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "schema_version": SCHEMA_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": environment(),
+        "results": {name: asdict(result) for name, result in results.items()},
+    }
+    path.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+
+
+def load_results(path: Path) -> dict[str, BenchmarkResult]:
+    """Read results from a JSON baseline.
+
+    Raises:
+        ValueError: If the file is not a benchmark baseline
+    """
+    document = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(document, dict) or "results" not in document:
+        raise ValueError(f"{path} is not a benchmark baseline (no 'results' key)")
+    if document.get("schema_version", SCHEMA_VERSION) != SCHEMA_VERSION:
+        raise ValueError(
+            f"{path} has baseline schema version {document['schema_version']}, "
+            f"expected {SCHEMA_VERSION}"
+        )
+    return {name: BenchmarkResult(**data) for name, data in document["results"].items()}
+
+
+def compare_results(
+    baseline: dict[str, BenchmarkResult],
+    current: dict[str, BenchmarkResult],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[Comparison]:
+    """Compare two runs case by case.
+
+    A case regresses when it takes more than ``1 + threshold`` times its
+    baseline time and improves when the baseline takes more than
+    ``1 + threshold`` times the current time.
+
+    Args:
+        baseline: Reference results
+        current: Results to check
+        threshold: Tolerated relative slowdown, e.g. 0.15 for 15%
+
+    Returns:
+        One comparison per case in either run (baseline order first)
+    """
+    comparisons: list[Comparison] = []
+    for name, base in baseline.items():
+        result = current.get(name)
+        if result is None:
+            comparisons.append(Comparison(name, base.us_per_call, None, None, "missing"))
+            continue
+        ratio = result.us_per_call / base.us_per_call if base.us_per_call > 0 else 1.0
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio * (1 + threshold) < 1:
+            status = "improvement"
+        else:
+            status = "unchanged"
+        comparisons.append(Comparison(name, base.us_per_call, result.us_per_call, ratio, status))
+    for name, result in current.items():
+        if name not in baseline:
+            comparisons.append(Comparison(name, None, result.us_per_call, None, "new"))
+    return comparisons
+
+
+def format_us(value: Optional[float]) -> str:
+    """Format a time per call with a readable unit."""
+    if value is None:
+        return "-"
+    if value >= 1_000_000:
+        return f"{value / 1_000_000:.2f} s"
+    if value >= 1_000:
+        return f"{value / 1_000:.2f} ms"
+    return f"{value:.2f} us"
+
+
+def print_comparisons(comparisons: list[Comparison], threshold: float) -> None:
+    """Print a comparison table followed by a summary line."""
+    width = max((len(c.name) for c in comparisons), default=10)
+    print(f"{'case':<{width}}  {'baseline':>12}  {'current':>12}  {'change':>8}  status")
+    for c in comparisons:
+        change = f"{(c.ratio - 1) * 100:+.1f}%" if c.ratio is not None else "-"
+        print(
+            f"{c.name:<{width}}  {format_us(c.baseline_us):>12}  {format_us(c.current_us):>12}  "
+            f"{change:>8}  {c.status}"
+        )
+    regressions = sum(1 for c in comparisons if c.status == "regression")
+    improvements = sum(1 for c in comparisons if c.status == "improvement")
+    print()
+    print(
+        f"{regressions} regression(s), {improvements} improvement(s) "
+        f"beyond {threshold * 100:.0f}% across {len(comparisons)} case(s)"
+    )
+
+
+
+def print_result(name: str, result: BenchmarkResult) -> None:
+    """Print one result line."""
+    print(f"  {name:<64} {format_us(result.us_per_call):>12}  ({result.calls} calls x {result.repeat})")
+
+
+def run_module(cases_factory: Callable[[], list[BenchmarkCase]]) -> None:
+    """Run one benchmark module's cases from the command line.
+
+    Args:
+        cases_factory: The module's ``cases`` function
+    """
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--filter", default=None, help="Regular expression on case names")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument("--min-time", type=float, default=0.2)
+    args = arg_parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    for case in select_cases(cases_factory(), args.filter):
+        result = run_cases([case], repeat=args.repeat, min_time=args.min_time)[case.name]
+        print_result(case.name, result)
@@ -0,0 +1,170 @@
+"""Run the benchmark suite, save JSON baselines and compare runs.
+
+Collects ``cases()`` from every benchmark module (CSV parsing and
+validation, template personalization, PIX Add and XDSb metadata
+construction, SAML signing and WS-Security envelopes, MTOM packaging and
+parsing, response parsers and mock response rendering), each at several
+input sizes, and times them with the harness.
+
+Run the suite and save a baseline:
+    python benchmarks/run_benchmarks.py run --save benchmarks/baselines/main.json
+
+Check a change against it (exit code 1 on regressions beyond the threshold):
+    python benchmarks/run_benchmarks.py run --compare benchmarks/baselines/main.json
+
+Compare two saved runs:
+    python benchmarks/run_benchmarks.py compare baseline.json current.json --threshold 0.10
+
+List the cases:
+    python benchmarks/run_benchmarks.py list [--filter REGEX]
+
+The suite runs from a temporary working directory because the reference
+registry response parser writes transaction logs to ./logs.
+"""
+
+import argparse
+import importlib
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from harness import (
+    DEFAULT_THRESHOLD,
+    BenchmarkCase,
+    compare_results,
+    load_results,
+    print_comparisons,
+    print_result,
+    run_cases,
+    save_results,
+    select_cases,
+)
+
+BENCHMARK_MODULES = [
+    "bench_csv",
+    "bench_personalizer",
+    "bench_messages",
+    "bench_saml",
+    "bench_mtom_parser",
+    "bench_response_parsers",
+    "bench_response_templates",
+    "bench_tracing",
+    "bench_logging",
+    "bench_redaction",
+    "bench_archive",
+]
+
+
+def collect_cases() -> list[BenchmarkCase]:
+    """Return the cases of every benchmark module."""
+    cases: list[BenchmarkCase] = []
+    for module_name in BENCHMARK_MODULES:
+        cases.extend(importlib.import_module(module_name).cases())
+    return cases
+
+
+def _run(args: argparse.Namespace) -> int:
+    """Run the suite; optionally save and compare the results."""
+    repeat, min_time = (3, 0.05) if args.quick else (args.repeat, args.min_time)
+    baseline = load_results(args.compare) if args.compare else None
+    save_path = args.save.resolve() if args.save else None
+
+    original_cwd = Path.cwd()
+    with tempfile.TemporaryDirectory(prefix="ihe-bench-") as work_dir:
+        os.chdir(work_dir)
+        try:
+            cases = select_cases(collect_cases(), args.filter)
+            if not cases:
+                print(f"No benchmark case matches '{args.filter}'", file=sys.stderr)
+                return 2
+            print(f"Running {len(cases)} benchmark case(s) (best of {repeat}, >= {min_time}s each)")
+            started = time.perf_counter()
+            results = run_cases(
+                cases,
+                repeat=repeat,
+                min_time=min_time,
+                progress=lambda result: print_result(f"{result.group}[{result.size}]", result),
+            )
+            print(f"Finished in {time.perf_counter() - started:.1f}s")
+        finally:
+            os.chdir(original_cwd)
+
+    if save_path:
+        save_results(save_path, results)
+        print(f"Saved results to {save_path}")
+
+    if baseline is None:
+        return 0
+    print()
+    if args.filter:
+        baseline = {name: result for name, result in baseline.items() if name in results}
+    comparisons = compare_results(baseline, results, args.threshold)
+    print_comparisons(comparisons, args.threshold)
+    return 1 if any(c.status == "regression" for c in comparisons) else 0
+
+
+def _compare(args: argparse.Namespace) -> int:
+    """Compare two saved runs."""
+    comparisons = compare_results(load_results(args.baseline), load_results(args.current), args.threshold)
+    print_comparisons(comparisons, args.threshold)
+    return 1 if any(c.status == "regression" for c in comparisons) else 0
+
+
+def _list(args: argparse.Namespace) -> int:
+    """Print the case names."""
+    for case in select_cases(collect_cases(), args.filter):
+        print(case.name)
+    return 0
+
+
+def main() -> int:
+    """Parse the command line and dispatch."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the suite")
+    run_parser.add_argument("--filter", default=None, help="Regular expression on case names")
+    run_parser.add_argument("--repeat", type=int, default=5, help="Measurements per case (default: 5)")
+    run_parser.add_argument(
+        "--min-time", type=float, default=0.2, help="Minimum seconds per measurement (default: 0.2)"
+    )
+    run_parser.add_argument("--quick", action="store_true", help="Shorthand for --repeat 3 --min-time 0.05")
+    run_parser.add_argument("--save", type=Path, default=None, help="Write the results to this JSON file")
+    run_parser.add_argument("--compare", type=Path, default=None, help="Compare against this baseline")
+    run_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Tolerated relative slowdown (default: {DEFAULT_THRESHOLD})",
+    )
+    run_parser.set_defaults(handler=_run)
+
+    compare_parser = commands.add_parser("compare", help="Compare two saved runs")
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("current", type=Path)
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Tolerated relative slowdown (default: {DEFAULT_THRESHOLD})",
+    )
+    compare_parser.set_defaults(handler=_compare)
+
+    list_parser = commands.add_parser("list", help="List the benchmark cases")
+    list_parser.add_argument("--filter", default=None, help="Regular expression on case names")
+    list_parser.set_defaults(handler=_list)
+
+    args = arg_parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    try:
+        return args.handler(args)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,385 @@
+"""Benchmark: end-to-end workflow throughput against a local mock server.
+
+Answers "how many patients per second on this machine" for each workflow
+mode. Starts the mock server in a child process on a free port, writes a
+synthetic patient CSV, and runs IntegratedWorkflow.process_batch in full,
+PIX-only and ITI-41-only mode (the ITI-41-only run gets a prior-results
+lookup marking every patient as registered). For each mode it records:
+
+- throughput (patients per second of process_batch wall time)
+- per-patient latency percentiles (total, PIX Add, ITI-41)
+- client and mock server CPU time
+- client and mock server peak RSS (sampled)
+
+Results are written as JSON so they can be tracked across releases.
+
+With ``--transport wsgi`` the mock server is not started; requests are
+dispatched into the mock app in-process through WSGIAdapter. This removes
+socket and HTTP server overhead (useful for profiling the client), but
+client and server then share one process, so server CPU and RSS are not
+reported separately.
+
+Run this benchmark:
+    python benchmarks/workflow_throughput.py [--patients N] [--modes full pix-only iti41-only]
+        [--transport {http,wsgi}] [--connections N] [--mock-workers N] [--mock-threads N]
+        [--mock-config FILE] [--output results.json]
+
+The run happens in a temporary working directory so transaction logs and
+mock server files do not land in the checkout. Application logging is
+disabled during the measurement, as in the other benchmarks.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import psutil
+import requests
+
+from ihe_test_util.config.schema import (
+    BatchConfig,
+    CertificatesConfig,
+    Config,
+    EndpointsConfig,
+)
+from ihe_test_util.ihe_transactions.workflows import IntegratedWorkflow
+from ihe_test_util.load.histogram import LatencyHistogram
+from ihe_test_util.mock_server.config import MockServerConfig, load_config
+from ihe_test_util.transport.wsgi_adapter import DEFAULT_BASE_URL, WSGIAdapter
+
+from bench_csv import write_patients_csv
+from harness import environment
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+FIXTURES_DIR = REPO_ROOT / "tests" / "fixtures"
+
+SCHEMA_VERSION = 1
+
+MODES = {
+    "full": {},
+    "pix-only": {"pix_only_mode": True},
+    "iti41-only": {"iti41_only_mode": True},
+}
+
+
+class ResourceSampler:
+    """Samples CPU time and peak RSS of a process and its children."""
+
+    def __init__(self, pid: int, interval: float = 0.05) -> None:
+        self._process = psutil.Process(pid)
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_cpu = 0.0
+        self.peak_rss = 0
+
+    def _processes(self) -> list[psutil.Process]:
+        try:
+            return [self._process] + self._process.children(recursive=True)
+        except psutil.Error:
+            return [self._process]
+
+    def cpu_seconds(self) -> float:
+        """Return the user + system CPU time of the process tree."""
+        total = 0.0
+        for process in self._processes():
+            try:
+                times = process.cpu_times()
+                total += times.user + times.system
+            except psutil.Error:
+                pass
+        return total
+
+    def _rss(self) -> int:
+        total = 0
+        for process in self._processes():
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.peak_rss = max(self.peak_rss, self._rss())
+
+    def start(self) -> None:
+        """Reset the counters and start sampling."""
+        self._start_cpu = self.cpu_seconds()
+        self.peak_rss = self._rss()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> dict[str, float]:
+        """Stop sampling and return CPU seconds and peak RSS in MB since ``start``."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.peak_rss = max(self.peak_rss, self._rss())
+        return {
+            "cpu_seconds": round(self.cpu_seconds() - self._start_cpu, 3),
+            "peak_rss_mb": round(self.peak_rss / (1024 * 1024), 1),
+        }
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _serve(config: MockServerConfig, port: int, workers: int, threads: int) -> None:
+    """Child process entry point: run the mock server."""
+    from ihe_test_util.mock_server.app import run_server
+
+    run_server(host="127.0.0.1", port=port, config=config, workers=workers, threads=threads)
+
+
+def start_mock_server(
+    config: MockServerConfig, workers: int, threads: int, timeout: float = 30.0
+) -> tuple[multiprocessing.Process, str]:
+    """Start the mock server in a child process and wait until it is healthy.
+
+    Returns:
+        (server process, base URL)
+
+    Raises:
+        RuntimeError: If the server does not become healthy in time
+    """
+    port = _free_port()
+    config = config.model_copy(update={"host": "127.0.0.1", "http_port": port})
+    process = multiprocessing.Process(target=_serve, args=(config, port, workers, threads), daemon=True)
+    process.start()
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not process.is_alive():
+            raise RuntimeError(f"Mock server exited with code {process.exitcode}")
+        try:
+            if requests.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return process, base_url
+        except requests.RequestException:
+            pass
+        time.sleep(0.1)
+    stop_mock_server(process)
+    raise RuntimeError(f"Mock server did not become healthy within {timeout:.0f}s")
+
+
+def stop_mock_server(process: multiprocessing.Process) -> None:
+    """Stop the mock server process."""
+    process.terminate()
+    process.join(10)
+    if process.is_alive():
+        process.kill()
+        process.join()
+
+
+def _latency_summary(values_ms: list[float]) -> dict:
+    histogram = LatencyHistogram()
+    for value in values_ms:
+        histogram.record(value * 1000.0)
+    summary = histogram.summary()
+    return {
+        "count": summary.count,
+        "mean_ms": summary.mean_ms,
+        "p50_ms": summary.p50_ms,
+        "p90_ms": summary.p90_ms,
+        "p99_ms": summary.p99_ms,
+        "max_ms": summary.max_ms,
+    }
+
+
+def run_mode(
+    mode: str,
+    csv_path: Path,
+    patient_ids: list[str],
+    config: Config,
+    ccd_template: Path,
+    connections: int,
+    server: Optional[ResourceSampler],
+    adapter: Optional[WSGIAdapter] = None,
+) -> dict:
+    """Run process_batch in one workflow mode and collect its measurements."""
+    batch_config = BatchConfig(concurrent_connections=connections, **MODES[mode])
+    if batch_config.iti41_only_mode:
+        batch_config.pix_results_lookup = {
+            patient_id: {"pix_add_status": "success", "pix_enterprise_id": patient_id}
+            for patient_id in patient_ids
+        }
+    workflow = IntegratedWorkflow(config, ccd_template, batch_config)
+    if adapter is not None:
+        workflow.mount_transport(f"{DEFAULT_BASE_URL}/", adapter)
+    client = ResourceSampler(os.getpid())
+
+    client.start()
+    if server is not None:
+        server.start()
+    started = time.perf_counter()
+    result = workflow.process_batch(csv_path)
+    wall_seconds = time.perf_counter() - started
+    server_usage = server.stop() if server is not None else None
+    client_usage = client.stop()
+
+    patients = result.patient_results
+    if mode == "pix-only":
+        succeeded = sum(1 for p in patients if p.pix_add_status == "success")
+    elif mode == "iti41-only":
+        succeeded = sum(1 for p in patients if p.iti41_status == "success")
+    else:
+        succeeded = sum(1 for p in patients if p.is_fully_successful)
+    latency = {"total": _latency_summary([p.total_time_ms for p in patients])}
+    if mode != "iti41-only":
+        latency["pix_add"] = _latency_summary([p.pix_add_time_ms for p in patients])
+    if mode != "pix-only":
+        latency["iti41"] = _latency_summary(
+            [p.iti41_time_ms for p in patients if p.iti41_status in ("success", "failed")]
+        )
+    return {
+        "mode": mode,
+        "patients": len(patients),
+        "succeeded": succeeded,
+        "failed": len(patients) - succeeded,
+        "wall_seconds": round(wall_seconds, 3),
+        "patients_per_second": round(len(patients) / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+        "latency": latency,
+        "client": {
+            **client_usage,
+            "cpu_ms_per_patient": round(client_usage["cpu_seconds"] * 1000 / max(len(patients), 1), 3),
+        },
+        "server": server_usage,
+    }
+
+
+def _print_result(result: dict) -> None:
+    total = result["latency"]["total"]
+    server = result["server"]
+    print(
+        f"{result['mode']:<11} {result['patients']:>7} patients  {result['failed']:>5} failed  "
+        f"{result['patients_per_second']:>8.1f}/s  "
+        f"p50 {total['p50_ms']:7.1f}ms  p99 {total['p99_ms']:7.1f}ms  "
+        f"client cpu {result['client']['cpu_ms_per_patient']:6.2f}ms/patient "
+        f"rss {result['client']['peak_rss_mb']:6.1f}MB"
+        + (f"  server cpu {server['cpu_seconds']:6.2f}s rss {server['peak_rss_mb']:6.1f}MB" if server else "")
+    )
+
+
+def _client_config(base_url: str, mock_config: MockServerConfig) -> Config:
+    return Config(
+        endpoints=EndpointsConfig(
+            pix_add_url=f"{base_url}{mock_config.pix_add_endpoint}",
+            iti41_url=f"{base_url}{mock_config.iti41_endpoint}",
+        ),
+        certificates=CertificatesConfig(
+            cert_path=FIXTURES_DIR / "test_cert.pem",
+            key_path=FIXTURES_DIR / "test_key.pem",
+        ),
+    )
+
+
+def main() -> int:
+    """Run the throughput benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--patients", type=int, default=1000, help="Synthetic CSV rows (default: 1000)")
+    arg_parser.add_argument(
+        "--modes", nargs="+", choices=list(MODES), default=list(MODES), help="Workflow modes to run"
+    )
+    arg_parser.add_argument(
+        "--transport",
+        choices=["http", "wsgi"],
+        default="http",
+        help="http: mock server over sockets; wsgi: in-process dispatch into the mock app (default: http)",
+    )
+    arg_parser.add_argument(
+        "--connections", type=int, default=10, help="BatchConfig.concurrent_connections (default: 10)"
+    )
+    arg_parser.add_argument("--mock-workers", type=int, default=1, help="Mock server worker processes")
+    arg_parser.add_argument("--mock-threads", type=int, default=16, help="Mock server threads per worker")
+    arg_parser.add_argument(
+        "--mock-config", type=Path, default=None, help="Mock server configuration (default: built-in defaults)"
+    )
+    arg_parser.add_argument(
+        "--ccd-template", type=Path, default=FIXTURES_DIR / "test_ccd_template.xml", help="CCD template"
+    )
+    arg_parser.add_argument("--seed", type=int, default=42, help="Random seed for the synthetic CSV")
+    arg_parser.add_argument("--output", type=Path, default=None, help="Write the JSON results to this file")
+    args = arg_parser.parse_args()
+
+    mock_config = (
+        load_config(args.mock_config.resolve()) if args.mock_config else MockServerConfig(log_level="WARNING")
+    )
+    ccd_template = args.ccd_template.resolve()
+    output = args.output.resolve() if args.output else None
+
+    logging.disable(logging.CRITICAL)
+    original_cwd = Path.cwd()
+    with tempfile.TemporaryDirectory(prefix="ihe-throughput-") as work_dir:
+        os.chdir(work_dir)
+        try:
+            csv_path = write_patients_csv(Path(work_dir) / "patients.csv", args.patients, seed=args.seed)
+            patient_ids = [f"PAT{index:08d}" for index in range(args.patients)]
+            results = []
+            if args.transport == "wsgi":
+                from ihe_test_util.mock_server.app import app, initialize_app
+
+                initialize_app(mock_config)
+                config = _client_config(DEFAULT_BASE_URL, mock_config)
+                adapter = WSGIAdapter(app)
+                for mode in args.modes:
+                    result = run_mode(
+                        mode, csv_path, patient_ids, config, ccd_template, args.connections, None, adapter
+                    )
+                    _print_result(result)
+                    results.append(result)
+            else:
+                process, base_url = start_mock_server(mock_config, args.mock_workers, args.mock_threads)
+                try:
+                    config = _client_config(base_url, mock_config)
+                    server = ResourceSampler(process.pid)
+                    for mode in args.modes:
+                        result = run_mode(
+                            mode, csv_path, patient_ids, config, ccd_template, args.connections, server
+                        )
+                        _print_result(result)
+                        results.append(result)
+                finally:
+                    stop_mock_server(process)
+        finally:
+            os.chdir(original_cwd)
+
+    document = {
+        "schema_version": SCHEMA_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": environment(),
+        "settings": {
+            "patients": args.patients,
+            "transport": args.transport,
+            "connections": args.connections,
+            "mock_workers": args.mock_workers,
+            "mock_threads": args.mock_threads,
+            "mock_config": str(args.mock_config) if args.mock_config else None,
+            "ccd_template": str(ccd_template),
+        },
+        "results": results,
+    }
+    if output:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+        print(f"Saved results to {output}")
+    else:
+        print(json.dumps(document, indent=2))
+    return 1 if any(result["failed"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""Transaction archive CLI commands.
+
+This module provides Click commands for reading the compressed transaction
+archive written with ``ihe-test-util --archive-dir``.
+
+Commands:
+    archive list <dir> - List archived transactions matching filters
+    archive export <dir> <message-id> - Export one transaction's payloads
+"""
+
+import logging
+import re
+import sys
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from ihe_test_util.logging_audit.transaction_archive import ArchiveReader
+
+
+logger = logging.getLogger(__name__)
+
+
+def _open_reader(directory: Path) -> ArchiveReader:
+    """Open the archive or exit with code 2."""
+    try:
+        return ArchiveReader(directory)
+    except FileNotFoundError as e:
+        click.echo(click.style("✗ Archive Error: ", fg="red", bold=True) + str(e), err=True)
+        sys.exit(2)
+
+
+@click.group(name="archive")
+def archive_group() -> None:
+    """Transaction archive commands.
+
+    Use these commands to find and export complete SOAP requests and
+    responses from a transaction archive.
+    """
+
+
+@archive_group.command(name="list")
+@click.argument("directory", type=click.Path(file_okay=False, path_type=Path))
+@click.option("--patient", "patient_id", default=None, help="Patient ID")
+@click.option("--type", "transaction_type", default=None, help="Transaction type (PIX_ADD, ITI41_SUBMIT)")
+@click.option("--status", default=None, help="Status (SUCCESS, ERROR, success, failure)")
+@click.option("--limit", type=click.IntRange(min=1), default=None, help="Stop after N transactions")
+def list_command(
+    directory: Path,
+    patient_id: Optional[str],
+    transaction_type: Optional[str],
+    status: Optional[str],
+    limit: Optional[int],
+) -> None:
+    """List archived transactions, oldest first.
+
+    Prints one line per transaction: timestamp, type, status, patient ID,
+    message ID and the archived parts with their sizes.
+
+    Exit Codes:
+        0: Listing completed (including no matches)
+        2: Archive not found
+
+    Example:
+        ihe-test-util archive list logs/archive --patient PAT001
+    """
+    reader = _open_reader(directory)
+
+    listed = 0
+    for entry in reader.entries(
+        patient_id=patient_id, transaction_type=transaction_type, status=status
+    ):
+        parts = ", ".join(f"{name} {size:,}B" for name, size in entry["parts"])
+        click.echo(
+            f"{entry['timestamp']}  {entry['transaction_type']:<13} {entry['status']:<8} "
+            f"{entry.get('patient_id') or '-':<12} {entry['message_id']}  [{parts}]"
+        )
+        listed += 1
+        if limit is not None and listed >= limit:
+            break
+    logger.debug(f"Listed {listed} archived transaction(s) from {directory}")
+
+
+@archive_group.command(name="export")
+@click.argument("directory", type=click.Path(file_okay=False, path_type=Path))
+@click.argument("message_id")
+@click.option(
+    "--part",
+    default="request",
+    show_default=True,
+    help="Payload to print (request, response, document)",
+)
+@click.option(
+    "--output-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Write every payload to <message-id>.<part>.xml in this directory instead",
+)
+def export_command(
+    directory: Path,
+    message_id: str,
+    part: str,
+    output_dir: Optional[Path],
+) -> None:
+    """Export one archived transaction.
+
+    Only the compressed chunk holding the transaction is read, so export
+    is fast regardless of the archive size.
+
+    Exit Codes:
+        0: Transaction exported
+        1: Transaction or part not found
+        2: Archive not found
+
+    Example:
+        ihe-test-util archive export logs/archive urn:uuid:1234 --part response
+    """
+    reader = _open_reader(directory)
+    transaction = reader.get(message_id)
+    if transaction is None:
+        click.echo(
+            click.style("✗ Archive Error: ", fg="red", bold=True)
+            + f"Message ID not found in archive: {message_id}",
+            err=True,
+        )
+        sys.exit(1)
+
+    if output_dir is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        stem = re.sub(r"[^\w.-]", "_", message_id)
+        for name, text in transaction.parts.items():
+            target = output_dir / f"{stem}.{name}.xml"
+            target.write_text(text, encoding="utf-8")
+            click.echo(f"✓ Wrote {name} to {target}")
+        return
+
+    if part not in transaction.parts:
+        click.echo(
+            click.style("✗ Archive Error: ", fg="red", bold=True)
+            + f"Transaction has no '{part}' part (available: {', '.join(transaction.parts)})",
+            err=True,
+        )
+        sys.exit(1)
+    click.echo(transaction.parts[part])
@@ -0,0 +1,119 @@
+"""Audit trail CLI commands.
+
+This module provides Click commands for querying the structured JSONL audit
+trail written with ``ihe-test-util --audit-file``.
+
+Commands:
+    audit query <file> - Print audit records matching filters
+"""
+
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from ihe_test_util.logging_audit.audit_sink import (
+    audit_files,
+    iter_audit_records,
+    parse_audit_time,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+@click.group(name="audit")
+def audit_group() -> None:
+    """Audit trail commands.
+
+    Use these commands to answer compliance questions from the JSONL audit
+    trail without scraping the text log.
+    """
+
+
+@audit_group.command(name="query")
+@click.argument("file", type=click.Path(path_type=Path))
+@click.option("--event", default=None, help="Record type (workflow_step, transaction, CSV_PROCESSED, ...)")
+@click.option("--batch", "batch_id", default=None, help="Batch ID")
+@click.option("--patient", "patient_id", default=None, help="Patient ID")
+@click.option("--step", default=None, help="Workflow step or transaction type (PIX_ADD, ITI41, ...)")
+@click.option("--status", default=None, help="Status (SUCCESS, FAILED, ...)")
+@click.option("--since", default=None, help="Records at or after this ISO-8601 time (UTC if no offset)")
+@click.option("--until", default=None, help="Records before this ISO-8601 time (UTC if no offset)")
+@click.option("--limit", type=click.IntRange(min=1), default=None, help="Stop after N matching records")
+@click.option("--count", "count_only", is_flag=True, help="Print only the number of matching records")
+@click.option(
+    "--no-rotated",
+    is_flag=True,
+    help="Read only FILE, not its rotated segments (FILE.1, FILE.2.gz, ...)",
+)
+def query_command(
+    file: Path,
+    event: Optional[str],
+    batch_id: Optional[str],
+    patient_id: Optional[str],
+    step: Optional[str],
+    status: Optional[str],
+    since: Optional[str],
+    until: Optional[str],
+    limit: Optional[int],
+    count_only: bool,
+    no_rotated: bool,
+) -> None:
+    """Print audit records matching all given filters as JSON lines.
+
+    Files are streamed line by line, oldest rotated segment first, so large
+    trails are never loaded into memory.
+
+    Exit Codes:
+        0: Query completed (including no matches)
+        1: Invalid time filter
+        2: Audit file not found
+
+    Example:
+        ihe-test-util audit query logs/audit.jsonl --step ITI41 --status FAILED
+    """
+    try:
+        since_time = parse_audit_time(since)
+        until_time = parse_audit_time(until)
+    except ValueError as e:
+        click.echo(
+            click.style("✗ Audit Query Error: ", fg="red", bold=True) + f"Invalid time filter: {e}",
+            err=True,
+        )
+        sys.exit(1)
+
+    paths = ([file] if file.exists() else []) if no_rotated else audit_files(file)
+    if not paths:
+        click.echo(
+            click.style("✗ Audit Query Error: ", fg="red", bold=True)
+            + f"Audit file not found: {file}",
+            err=True,
+        )
+        sys.exit(2)
+
+    records = iter_audit_records(
+        paths,
+        event=event,
+        batch_id=batch_id,
+        patient_id=patient_id,
+        step=step,
+        status=status,
+        since=since_time,
+        until=until_time,
+    )
+
+    matched = 0
+    for record in records:
+        matched += 1
+        if not count_only:
+            click.echo(json.dumps(record, ensure_ascii=False))
+        if limit is not None and matched >= limit:
+            break
+
+    if count_only:
+        click.echo(str(matched))
+    logger.debug(f"Audit query matched {matched} record(s) in {len(paths)} file(s)")
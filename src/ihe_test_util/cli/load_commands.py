@@ -0,0 +1,400 @@
+"""Load generation CLI command.
+
+Drives PIX Add, ITI-41 or the combined workflow at a target arrival rate
+(open loop) or a fixed number of virtual users (closed loop) through ramp,
+steady and spike phases, printing live throughput and latency percentiles
+and writing a final JSON report.
+
+Examples:
+    # 50 PIX Adds/sec for an hour after a two-minute ramp
+    $ ihe-test-util load --transaction pix-add --phase ramp:2m:0-50 --phase steady:1h:50
+
+    # 20 virtual users running the full workflow, recycling CSV patients
+    $ ihe-test-util load --mode closed --phase steady:10m:20 --csv examples/patients_sample.csv
+
+    # Spike test with a JSON report
+    $ ihe-test-util load --phase steady:5m:10 --phase spike:30s:100 --phase steady:5m:10 \\
+        --report output/load-report.json
+
+    # Timeline of a short run, one track per worker thread
+    $ ihe-test-util load --phase steady:30s:20 --trace output/load-trace.json
+
+    # Scrape live client metrics while an hour-long run is going
+    $ ihe-test-util load --phase steady:1h:20 --metrics-port 9464
+"""
+
+import json
+import logging
+import sys
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from ihe_test_util.cli.submit_commands import (
+    _display_http_security_warning,
+    _get_default_ccd_template,
+    _is_http_endpoint,
+    _load_config_with_overrides,
+)
+from ihe_test_util.config.schema import BatchConfig
+from ihe_test_util.csv_parser.parser import parse_csv
+from ihe_test_util.ihe_transactions.metrics import DEFAULT_TEXTFILE_INTERVAL, metrics_exporters
+from ihe_test_util.ihe_transactions.workflows import IntegratedWorkflow
+from ihe_test_util.load.histogram import LatencySummary
+from ihe_test_util.load.profile import LoadProfile
+from ihe_test_util.load.runner import (
+    AssertionCache,
+    LoadMode,
+    LoadProgress,
+    LoadReport,
+    LoadRunner,
+    LoadTransaction,
+    PatientSource,
+    build_workflow_transaction,
+)
+from ihe_test_util.profiling.tracing import tracing
+from ihe_test_util.utils.exceptions import ConfigurationError, ValidationError
+
+
+logger = logging.getLogger(__name__)
+
+
+def _format_latency(summary: LatencySummary) -> str:
+    """Format a latency summary as a single line."""
+    return (
+        f"p50 {summary.p50_ms:8.1f}ms  p90 {summary.p90_ms:8.1f}ms  "
+        f"p99 {summary.p99_ms:8.1f}ms  p99.9 {summary.p999_ms:8.1f}ms  max {summary.max_ms:8.1f}ms"
+    )
+
+
+def _display_progress(progress: LoadProgress) -> None:
+    """Print one live progress line."""
+    click.echo(
+        f"[{progress.elapsed_seconds:7.1f}s] {progress.phase:<28} "
+        f"target {progress.target_level:6.1f}  "
+        f"{progress.throughput:7.1f}/s  done {progress.completed:7d}  "
+        f"failed {progress.failed:5d}  dropped {progress.dropped:5d}  "
+        f"in-flight {progress.in_flight:4d}  "
+        f"p50 {progress.interval.p50_ms:7.1f}ms  p99 {progress.interval.p99_ms:7.1f}ms"
+    )
+
+
+def _display_report(report: LoadReport) -> None:
+    """Print the final load report."""
+    click.echo()
+    click.echo("=" * 80)
+    click.echo(click.style("LOAD TEST REPORT", fg="cyan", bold=True))
+    click.echo("=" * 80)
+    click.echo(f"Transaction:        {report.transaction} ({report.mode} loop)")
+    click.echo(f"Duration:           {report.duration_seconds:.1f}s" + (" (interrupted)" if report.interrupted else ""))
+    click.echo(f"Completed:          {report.completed}")
+    click.echo(f"Succeeded:          {report.succeeded}")
+    click.echo(f"Failed:             {report.failed}")
+    if report.dropped:
+        click.echo(
+            click.style(f"Dropped:            {report.dropped}", fg="yellow")
+            + " (client saturated - raise --max-in-flight)"
+        )
+    click.echo(f"Throughput:         {report.throughput:.2f}/s")
+    click.echo()
+    click.echo("Latency (corrected for coordinated omission):")
+    click.echo(f"  {'end-to-end':<12} {_format_latency(report.corrected_latency)}")
+    click.echo("Service time (send to response):")
+    for label, summary in report.service_latency.items():
+        click.echo(f"  {label:<12} {_format_latency(summary)}")
+    click.echo()
+    click.echo("Phases:")
+    for phase in report.phases:
+        click.echo(
+            f"  {phase.label:<28} done {phase.completed:7d}  failed {phase.failed:5d}  "
+            f"dropped {phase.dropped:5d}  {phase.throughput:7.2f}/s  "
+            f"p99 {phase.latency.p99_ms:8.1f}ms"
+        )
+    if report.errors:
+        click.echo()
+        click.echo(click.style("Errors:", fg="red"))
+        for message, count in report.errors.items():
+            click.echo(f"  {count:7d}  {message}")
+    click.echo("=" * 80)
+
+
+@click.command(name="load")
+@click.option(
+    "--transaction",
+    "-t",
+    type=click.Choice([t.value for t in LoadTransaction]),
+    default=LoadTransaction.WORKFLOW.value,
+    show_default=True,
+    help="Transaction to drive (workflow = PIX Add followed by ITI-41)",
+)
+@click.option(
+    "--mode",
+    type=click.Choice([m.value for m in LoadMode]),
+    default=LoadMode.OPEN.value,
+    show_default=True,
+    help="open: phase level is an arrival rate (per second); closed: number of virtual users",
+)
+@click.option(
+    "--phase",
+    "phases",
+    multiple=True,
+    default=("steady:1m:10",),
+    show_default=True,
+    help="Load phase kind:duration:level, e.g. ramp:2m:0-50, steady:1h:50, spike:30s:200 (repeatable)",
+)
+@click.option(
+    "--csv",
+    "csv_file",
+    type=click.Path(exists=True, path_type=Path),
+    default=None,
+    help="Recycle patients from this CSV (default: synthesise patients)",
+)
+@click.option(
+    "--reuse-ids",
+    is_flag=True,
+    help="Keep the CSV patient IDs when recycling (default: fresh ID per transaction)",
+)
+@click.option(
+    "--patient-id-oid",
+    type=str,
+    default="2.16.840.1.113883.3.9999.1",
+    show_default=True,
+    help="Assigning authority OID of synthesised patients",
+)
+@click.option(
+    "--seed",
+    type=int,
+    default=None,
+    help="Random seed for synthesised patient demographics",
+)
+@click.option(
+    "--max-in-flight",
+    type=click.IntRange(min=1),
+    default=64,
+    show_default=True,
+    help="Sender threads in open-loop mode",
+)
+@click.option(
+    "--think-time",
+    type=click.FloatRange(min=0.0),
+    default=0.0,
+    show_default=True,
+    help="Seconds each virtual user pauses between transactions (closed loop)",
+)
+@click.option(
+    "--progress-interval",
+    type=click.FloatRange(min=0.1),
+    default=5.0,
+    show_default=True,
+    help="Seconds between live progress lines",
+)
+@click.option(
+    "--report",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Write the final report as JSON to this file",
+)
+@click.option(
+    "--trace",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Write a Chrome/Perfetto trace of every transaction step (keep runs short)",
+)
+@click.option(
+    "--metrics-file",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Prometheus textfile to rewrite with live client metrics during the run",
+)
+@click.option(
+    "--metrics-interval",
+    type=click.FloatRange(min=0.1),
+    default=DEFAULT_TEXTFILE_INTERVAL,
+    show_default=True,
+    help="Seconds between --metrics-file writes",
+)
+@click.option(
+    "--metrics-port",
+    type=click.IntRange(0, 65535),
+    default=None,
+    help="Serve live client metrics at http://127.0.0.1:PORT/metrics during the run",
+)
+@click.option(
+    "--config",
+    type=click.Path(exists=True, path_type=Path),
+    default=None,
+    help="Configuration file path (overrides default)",
+)
+@click.option(
+    "--ccd-template",
+    type=click.Path(exists=True, path_type=Path),
+    default=None,
+    help="CCD template file path (ITI-41 and workflow)",
+)
+@click.option(
+    "--http",
+    is_flag=True,
+    help="Use HTTP transport (displays security warning)",
+)
+@click.option(
+    "--yes",
+    "-y",
+    is_flag=True,
+    help="Do not ask for confirmation before using HTTP transport",
+)
+@click.option(
+    "--quiet",
+    "-q",
+    is_flag=True,
+    help="Suppress live progress output",
+)
+@click.pass_context
+def load(
+    ctx: click.Context,
+    transaction: str,
+    mode: str,
+    phases: tuple[str, ...],
+    csv_file: Optional[Path],
+    reuse_ids: bool,
+    patient_id_oid: str,
+    seed: Optional[int],
+    max_in_flight: int,
+    think_time: float,
+    progress_interval: float,
+    report: Optional[Path],
+    trace: Optional[Path],
+    metrics_file: Optional[Path],
+    metrics_interval: float,
+    metrics_port: Optional[int],
+    config: Optional[Path],
+    ccd_template: Optional[Path],
+    http: bool,
+    yes: bool,
+    quiet: bool,
+) -> None:
+    """Generate sustained load against PIX Add and ITI-41 endpoints.
+
+    Runs the phases in order. In open-loop mode each phase level is an
+    arrival rate in transactions per second and requests are sent on
+    schedule whatever the response time; in closed-loop mode it is the
+    number of virtual users, each waiting for its response (and
+    --think-time) before the next transaction.
+
+    Latency percentiles are reported corrected for coordinated omission:
+    open-loop latencies are measured from each request's scheduled start,
+    closed-loop latencies are back-filled for the requests stalled users
+    could not send.
+
+    Press Ctrl+C to stop early; the report covers the completed part.
+
+    \b
+    Exit codes:
+      0  All transactions succeeded
+      2  Some transactions failed or arrivals were dropped
+      1  Invalid arguments or data; 3 configuration or unexpected error
+    """
+    load_transaction = LoadTransaction(transaction)
+    load_mode = LoadMode(mode)
+
+    try:
+        profile = LoadProfile.parse(list(phases))
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--phase") from None
+
+    try:
+        config_obj = _load_config_with_overrides(
+            ctx=ctx,
+            config_path=config,
+            ccd_template=ccd_template,
+            http_flag=http,
+        )
+        if (http or _is_http_endpoint(config_obj)) and not yes:
+            _display_http_security_warning()
+
+        templates = None
+        if csv_file is not None:
+            df, _ = parse_csv(csv_file, validate=True)
+            if df.empty:
+                raise ValidationError(f"CSV file {csv_file} contains no patients.")
+
+        batch_config = BatchConfig(
+            pix_only_mode=load_transaction == LoadTransaction.PIX_ADD,
+            iti41_only_mode=load_transaction == LoadTransaction.ITI41,
+            pix_results_lookup={} if load_transaction == LoadTransaction.ITI41 else None,
+            concurrent_connections=min(max_in_flight, 50),
+        )
+        workflow = IntegratedWorkflow(
+            config_obj, ccd_template or _get_default_ccd_template(), batch_config
+        )
+        if csv_file is not None:
+            templates = [workflow._row_to_patient_demographics(row) for _, row in df.iterrows()]
+        patients = PatientSource(
+            templates=templates,
+            patient_id_oid=patient_id_oid,
+            reuse_ids=reuse_ids,
+            seed=seed,
+        )
+        assertions = AssertionCache(workflow._generate_saml_assertion)
+        assertions.get()  # fail before the run on certificate problems
+
+        runner = LoadRunner(
+            build_workflow_transaction(workflow, load_transaction, assertions),
+            patients,
+            profile,
+            mode=load_mode,
+            transaction_name=load_transaction.value,
+            max_in_flight=max_in_flight,
+            think_time_seconds=think_time,
+            progress_callback=None if quiet else _display_progress,
+            progress_interval_seconds=progress_interval,
+        )
+
+        unit = "transactions/s" if load_mode == LoadMode.OPEN else "virtual users"
+        click.echo(f"Load test: {load_transaction.value}, {load_mode.value} loop, "
+                   f"{profile.duration_seconds:g}s total")
+        for phase in profile.phases:
+            click.echo(f"  {phase.label} ({unit})")
+        click.echo(f"PIX Add Endpoint:   {config_obj.endpoints.pix_add_url}")
+        if load_transaction != LoadTransaction.PIX_ADD:
+            click.echo(f"ITI-41 Endpoint:    {config_obj.endpoints.iti41_url}")
+        click.echo()
+
+        with tracing() if trace else nullcontext() as tracer, \
+                metrics_exporters(metrics_file, metrics_interval, metrics_port) as exporters:
+            for exporter in exporters:
+                click.echo(f"Client metrics: {exporter.location}")
+            result = runner.run()
+        _display_report(result)
+
+        if tracer is not None:
+            tracer.write(trace)
+            click.echo(click.style("✓ Trace saved to: ", fg="green") + str(trace))
+
+        if report:
+            report.parent.mkdir(parents=True, exist_ok=True)
+            report.write_text(json.dumps(result.to_dict(), indent=2), encoding="utf-8")
+            click.echo(click.style("✓ Report saved to: ", fg="green") + str(report))
+
+        logger.info(
+            f"Load run complete: {result.completed} transactions, {result.failed} failed, "
+            f"{result.dropped} dropped, {result.throughput:.2f}/s, "
+            f"p99 {result.corrected_latency.p99_ms:.1f}ms"
+        )
+        sys.exit(0 if result.failed == 0 and result.dropped == 0 else 2)
+
+    except ValidationError as e:
+        logger.error(f"Validation error: {e}")
+        click.echo(click.style("✗ Validation Error: ", fg="red", bold=True) + str(e), err=True)
+        sys.exit(1)
+
+    except ConfigurationError as e:
+        logger.error(f"Configuration error: {e}")
+        click.echo(click.style("✗ Configuration Error: ", fg="red", bold=True) + str(e), err=True)
+        sys.exit(3)
+
+    except Exception as e:
+        logger.error(f"Unexpected error: {e}", exc_info=True)
+        click.echo(click.style("✗ Unexpected Error: ", fg="red", bold=True) + str(e), err=True)
+        sys.exit(3)
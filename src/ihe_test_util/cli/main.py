@@ -9,14 +9,23 @@ from typing import Optional
 import click
 
 from ihe_test_util import __version__
+from ihe_test_util.cli.archive_commands import archive_group
+from ihe_test_util.cli.audit_commands import audit_group
 from ihe_test_util.cli.csv_commands import csv
+from ihe_test_util.cli.load_commands import load
 from ihe_test_util.cli.mock_commands import mock_group
 from ihe_test_util.cli.pix_commands import pix_add
+from ihe_test_util.cli.registry_commands import registry_group
 from ihe_test_util.cli.saml_commands import saml_group
 from ihe_test_util.cli.submit_commands import submit
 from ihe_test_util.cli.template_commands import template_group
 from ihe_test_util.config import load_config
-from ihe_test_util.logging_audit import configure_logging
+from ihe_test_util.logging_audit import configure_logging, flush_logging
+from ihe_test_util.logging_audit.audit_sink import close_audit_sink, open_audit_sink
+from ihe_test_util.logging_audit.transaction_archive import (
+    close_transaction_archive,
+    open_transaction_archive,
+)
 from ihe_test_util.utils.exceptions import ConfigurationError
 
 
@@ -40,6 +49,23 @@ from ihe_test_util.utils.exceptions import ConfigurationError
     is_flag=True,
     help="Redact PII (patient names, SSNs) from logs",
 )
+@click.option(
+    "--audit-file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write a structured JSONL audit trail to this file (overrides config file)",
+)
+@click.option(
+    "--audit-compress",
+    is_flag=True,
+    help="Gzip rotated audit trail segments",
+)
+@click.option(
+    "--archive-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Archive complete SOAP requests/responses to this directory (overrides config file)",
+)
 @click.pass_context
 def cli(
     ctx: click.Context,
@@ -47,6 +73,9 @@ def cli(
     verbose: bool,
     log_file: Optional[Path],
     redact_pii: bool,
+    audit_file: Optional[Path],
+    audit_compress: bool,
+    archive_dir: Optional[Path],
 ) -> None:
     """IHE Test Utility - Testing tool for IHE transactions.
     
@@ -66,6 +95,17 @@ def cli(
         
         # Enable verbose logging for debugging
         ihe-test-util --verbose csv validate patients.csv
+        
+        # Record a queryable audit trail of a batch
+        ihe-test-util --audit-file logs/audit.jsonl submit batch patients.csv
+        
+        # Archive every request/response and export one transaction later
+        ihe-test-util --archive-dir logs/archive submit batch patients.csv
+        ihe-test-util archive export logs/archive <message-id>
+        
+        # Rerun a CSV without resending patients that already succeeded
+        ihe-test-util submit batch patients.csv --registry output/registry.db
+        ihe-test-util registry list output/registry.db --patient PAT001
     
     Use --help with any command for more information.
     """
@@ -93,12 +133,34 @@ def cli(
     configure_logging(
         level=log_level, log_file=log_file_path, redact_pii=redact_pii_setting
     )
+    # Write queued records before the command returns (runs after the
+    # close callbacks registered below, which may log)
+    ctx.call_on_close(flush_logging)
+    
+    # Structured audit trail, flushed and closed when the command finishes
+    audit_file_path = audit_file if audit_file else config_obj.logging.audit_file
+    if audit_file_path:
+        open_audit_sink(
+            audit_file_path,
+            compress=audit_compress or config_obj.logging.audit_compress,
+        )
+        ctx.call_on_close(close_audit_sink)
+    
+    # Transaction archive, drained and closed when the command finishes
+    archive_dir_path = archive_dir if archive_dir else config_obj.logging.archive_dir
+    if archive_dir_path:
+        open_transaction_archive(archive_dir_path)
+        ctx.call_on_close(close_transaction_archive)
 
 
 # Register command groups
+cli.add_command(archive_group)
+cli.add_command(audit_group)
 cli.add_command(csv)
+cli.add_command(load)
 cli.add_command(mock_group)
 cli.add_command(pix_add)
+cli.add_command(registry_group)
 cli.add_command(saml_group)
 cli.add_command(submit)
 cli.add_command(template_group)
@@ -131,6 +193,13 @@ def validate(config_file: Path) -> None:
         click.echo(f"\nEndpoints:")
         click.echo(f"  PIX Add URL: {config_obj.endpoints.pix_add_url}")
         click.echo(f"  ITI-41 URL:  {config_obj.endpoints.iti41_url}")
+        endpoints = config_obj.endpoints
+        if endpoints.pix_add_endpoints or endpoints.iti41_endpoints:
+            click.echo(
+                f"  Balancing:   {endpoints.load_balancing} over "
+                f"{len(endpoints.pix_add_targets())} PIX Add / "
+                f"{len(endpoints.iti41_targets())} ITI-41 endpoints"
+            )
         
         click.echo(f"\nCertificates:")
         click.echo(f"  Cert path:   {config_obj.certificates.cert_path or 'Not configured'}")
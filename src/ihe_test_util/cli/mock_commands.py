@@ -19,6 +19,10 @@ import requests
 
 from ..mock_server.app import run_server
 from ..mock_server.config import load_config
+from ..mock_server.document_store import DocumentStore
+from ..mock_server.prefork import DEFAULT_THREADS_PER_WORKER, worker_log_path
+from ..mock_server.recording import TrafficArchive
+from ..mock_server.submission_log import SubmissionArchive
 
 
 logger = logging.getLogger(__name__)
@@ -38,16 +42,20 @@ def write_pid_file(
     port: int,
     protocol: str,
     host: str = "0.0.0.0",
-    config_file: str | None = None
+    config_file: str | None = None,
+    workers: int = 1,
+    threads: int | None = None
 ) -> None:
     """Write PID file with server metadata.
     
     Args:
-        pid: Process ID of the running server
+        pid: Process ID of the running server (master process in multi-worker mode)
         port: Server port number
         protocol: Protocol (http or https)
         host: Server host address
         config_file: Path to configuration file if used
+        workers: Number of worker processes
+        threads: Handler threads per worker (None for the Flask dev server)
     """
     pid_data = {
         "pid": pid,
@@ -55,7 +63,9 @@ def write_pid_file(
         "protocol": protocol,
         "host": host,
         "start_time": datetime.now(timezone.utc).isoformat(),
-        "config_file": config_file
+        "config_file": config_file,
+        "workers": workers,
+        "threads": threads
     }
     
     # Ensure mocks directory exists
@@ -183,12 +193,32 @@ def mock_group():
     is_flag=True,
     help="Enable debug mode"
 )
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of pre-forked worker processes (Linux/macOS)"
+)
+@click.option(
+    "--threads",
+    type=click.IntRange(min=1),
+    help="Handler threads per worker (enables pooled HTTP/1.1 keep-alive serving)"
+)
+@click.option(
+    "--reuse-port",
+    is_flag=True,
+    help="Give each worker its own SO_REUSEPORT socket instead of a shared one"
+)
 def start_server(
     protocol: str,
     port: int | None,
     config: Path | None,
     background: bool,
-    debug: bool
+    debug: bool,
+    workers: int,
+    threads: int | None,
+    reuse_port: bool
 ):
     """Start the mock IHE server.
     
@@ -205,6 +235,9 @@ def start_server(
         
         # Start with custom config file\n
         ihe-test-util mock start --config path/to/config.json
+        
+        # Start 4 worker processes with 16 threads each for load testing\n
+        ihe-test-util mock start --workers 4 --threads 16 --background
     """
     try:
         # Check if server is already running
@@ -238,6 +271,8 @@ def start_server(
         click.echo(f"Host: {server_config.host}")
         click.echo(f"Port: {port}")
         click.echo(f"Mode: {'Background' if background else 'Foreground'}")
+        if workers > 1 or threads is not None:
+            click.echo(f"Workers: {workers} x {threads or DEFAULT_THREADS_PER_WORKER} threads")
         click.echo(f"Health Check: {protocol}://{server_config.host}:{port}/health")
         click.echo(f"PIX Add: {protocol}://{server_config.host}:{port}{server_config.pix_add_endpoint}")
         click.echo(f"ITI-41: {protocol}://{server_config.host}:{port}{server_config.iti41_endpoint}")
@@ -264,7 +299,10 @@ def start_server(
                 port=port,
                 config_path=config,
                 debug=debug,
-                server_config=server_config
+                server_config=server_config,
+                workers=workers,
+                threads=threads,
+                reuse_port=reuse_port
             )
         else:
             # Start server in foreground
@@ -275,7 +313,10 @@ def start_server(
                 port=port,
                 protocol=protocol,
                 config=server_config,
-                debug=debug
+                debug=debug,
+                workers=workers,
+                threads=threads,
+                reuse_port=reuse_port
             )
 
     except FileNotFoundError as e:
@@ -294,7 +335,10 @@ def start_background_server(
     port: int,
     config_path: Path | None,
     debug: bool,
-    server_config: Any
+    server_config: Any,
+    workers: int = 1,
+    threads: int | None = None,
+    reuse_port: bool = False
 ) -> None:
     """Start mock server as background process.
     
@@ -304,6 +348,9 @@ def start_background_server(
         config_path: Path to configuration file
         debug: Enable debug mode
         server_config: Loaded server configuration
+        workers: Number of worker processes
+        threads: Handler threads per worker
+        reuse_port: Use SO_REUSEPORT sockets per worker
     """
     # Build command to execute
     cmd = [
@@ -320,6 +367,13 @@ def start_background_server(
     if debug:
         cmd.append("--debug")
     
+    if workers > 1:
+        cmd.extend(["--workers", str(workers)])
+    if threads is not None:
+        cmd.extend(["--threads", str(threads)])
+    if reuse_port:
+        cmd.append("--reuse-port")
+    
     # Start process in background
     click.echo("Starting server in background...")
     
@@ -337,7 +391,9 @@ def start_background_server(
             port=port,
             protocol=protocol,
             host=server_config.host,
-            config_file=str(config_path) if config_path else None
+            config_file=str(config_path) if config_path else None,
+            workers=workers,
+            threads=threads
         )
         
         # Wait briefly and check if server started
@@ -380,11 +436,17 @@ def start_background_server(
 @click.option("--port", type=int, required=True)
 @click.option("--config", type=click.Path(exists=True, path_type=Path))
 @click.option("--debug", is_flag=True)
+@click.option("--workers", type=click.IntRange(min=1), default=1)
+@click.option("--threads", type=click.IntRange(min=1))
+@click.option("--reuse-port", is_flag=True)
 def start_foreground(
     protocol: str,
     port: int,
     config: Path | None,
-    debug: bool
+    debug: bool,
+    workers: int,
+    threads: int | None,
+    reuse_port: bool
 ):
     """Internal command to start server in foreground (used by background mode)."""
     try:
@@ -394,7 +456,10 @@ def start_foreground(
             port=port,
             protocol=protocol,
             config=server_config,
-            debug=debug
+            debug=debug,
+            workers=workers,
+            threads=threads,
+            reuse_port=reuse_port
         )
     except Exception as e:
         logger.exception("Server crashed")
@@ -436,6 +501,12 @@ def stop_server(force: bool, timeout: int):
     try:
         process = psutil.Process(pid)
         
+        # In multi-worker mode the master forwards SIGTERM to its workers;
+        # remember them so none outlive a master that had to be killed
+        workers = []
+        if pid_info.get("workers", 1) > 1:
+            workers = process.children(recursive=True)
+        
         click.echo(f"Stopping mock server (PID: {pid})...")
         
         # Send graceful shutdown signal
@@ -462,6 +533,8 @@ def stop_server(force: bool, timeout: int):
                 )
                 raise click.Abort()
         
+        stop_orphaned_workers(workers, timeout)
+        
         # Remove PID file
         remove_pid_file()
         
@@ -473,6 +546,31 @@ def stop_server(force: bool, timeout: int):
         raise click.ClickException(f"Failed to stop server: {e}")
 
 
+def stop_orphaned_workers(workers: list[Any], timeout: int) -> None:
+    """Terminate worker processes that survived their master.
+    
+    Args:
+        workers: psutil.Process objects collected before stopping the master
+        timeout: Seconds to wait for graceful termination before killing
+    """
+    alive = [worker for worker in workers if worker.is_running()]
+    if not alive:
+        return
+    
+    click.echo(f"Stopping {len(alive)} remaining worker process(es)...")
+    for worker in alive:
+        try:
+            worker.terminate()
+        except psutil.NoSuchProcess:
+            pass
+    _, still_alive = psutil.wait_procs(alive, timeout=timeout)
+    for worker in still_alive:
+        try:
+            worker.kill()
+        except psutil.NoSuchProcess:
+            pass
+
+
 @mock_group.command(name="status")
 @click.option(
     "--json",
@@ -541,8 +639,12 @@ def server_status(output_json: bool):
             "url": f"{protocol}://{host}:{port}",
             "uptime_seconds": uptime_seconds,
             "endpoints": endpoints,
-            "request_count": request_count
+            "request_count": request_count,
+            "workers": pid_info.get("workers", 1),
+            "threads": pid_info.get("threads")
         }
+        if "workers" in health_data:
+            status_data["worker_status"] = health_data["workers"]
         click.echo(json.dumps(status_data, indent=2))
     else:
         click.echo("Mock Server Status")
@@ -553,6 +655,15 @@ def server_status(output_json: bool):
         click.echo(f"URL: {protocol}://{host}:{port}")
         click.echo(f"Uptime: {uptime_str}")
         click.echo(f"Requests Handled: {request_count}")
+        worker_status = health_data.get("workers", [])
+        if worker_status:
+            alive = sum(1 for worker in worker_status if worker.get("alive"))
+            click.echo(f"Workers: {alive}/{len(worker_status)} alive")
+            for worker in worker_status:
+                click.echo(
+                    f"  - Worker {worker['worker_id']} (PID {worker['pid']}): "
+                    f"{worker['request_count']} requests"
+                )
         click.echo("")
         click.echo("Available Endpoints:")
         for endpoint in endpoints:
@@ -608,7 +719,18 @@ def format_uptime(seconds: int) -> str:
     type=str,
     help="Filter lines matching regex pattern"
 )
-def view_logs(tail: int, follow: bool, level: str | None, grep: str | None):
+@click.option(
+    "--worker",
+    type=click.IntRange(min=1),
+    help="Show the log of one worker (multi-worker mode)"
+)
+def view_logs(
+    tail: int,
+    follow: bool,
+    level: str | None,
+    grep: str | None,
+    worker: int | None
+):
     """Display mock server logs with filtering options.
     
     Examples:
@@ -630,10 +752,14 @@ def view_logs(tail: int, follow: bool, level: str | None, grep: str | None):
         
         # Combine filters\n
         ihe-test-util mock logs --follow --level INFO --grep "endpoint"
+        
+        # Show the log of worker 2 (started with --workers)\n
+        ihe-test-util mock logs --worker 2
     """
-    if not LOG_FILE_PATH.exists():
+    log_file = LOG_FILE_PATH if worker is None else worker_log_path(LOG_FILE_PATH, worker)
+    if not log_file.exists():
         click.echo(
-            f"Log file not found: {LOG_FILE_PATH}\n"
+            f"Log file not found: {log_file}\n"
             "Start the server to generate logs.",
             err=True
         )
@@ -641,9 +767,9 @@ def view_logs(tail: int, follow: bool, level: str | None, grep: str | None):
     
     try:
         if follow:
-            follow_log_file(LOG_FILE_PATH, level, grep)
+            follow_log_file(log_file, level, grep)
         else:
-            display_tail(LOG_FILE_PATH, tail, level, grep)
+            display_tail(log_file, tail, level, grep)
     except KeyboardInterrupt:
         click.echo("\n\nLog viewing stopped.")
     except Exception as e:
@@ -651,6 +777,246 @@ def view_logs(tail: int, follow: bool, level: str | None, grep: str | None):
         raise click.ClickException(f"Failed to read logs: {e}")
 
 
+@mock_group.command(name="submissions")
+@click.option(
+    "--request-id",
+    type=str,
+    help="Match the mock server request ID"
+)
+@click.option(
+    "--patient-id",
+    type=str,
+    help="Match the submission patient ID"
+)
+@click.option(
+    "--document-id",
+    type=str,
+    help="Match the document unique ID"
+)
+@click.option(
+    "--show",
+    is_flag=True,
+    help="Print the full transaction log of each match"
+)
+@click.option(
+    "--archive-dir",
+    type=click.Path(path_type=Path),
+    help="Archive directory (default: submission_log.archive_dir from config)"
+)
+@click.option(
+    "--config",
+    type=click.Path(exists=True, path_type=Path),
+    help="Mock server configuration file"
+)
+def list_submissions(
+    request_id: str | None,
+    patient_id: str | None,
+    document_id: str | None,
+    show: bool,
+    archive_dir: Path | None,
+    config: Path | None
+):
+    """Look up ITI-41 submissions in the compressed submission archive.
+    
+    Requires submission_log.mode "archive" in the mock server configuration.
+    
+    Examples:
+    
+        # List every archived submission\n
+        ihe-test-util mock submissions
+        
+        # Show the transaction log of one request\n
+        ihe-test-util mock submissions --request-id 3f2a... --show
+        
+        # All submissions of a patient\n
+        ihe-test-util mock submissions --patient-id PAT123
+    """
+    if archive_dir is None:
+        archive_dir = Path(load_config(config).submission_log.archive_dir)
+
+    archive = SubmissionArchive(archive_dir)
+    entries = archive.find(
+        request_id=request_id,
+        patient_id=patient_id,
+        document_unique_id=document_id,
+    )
+    if not entries:
+        click.echo(f"No matching submissions in {archive_dir}")
+        return
+
+    for entry in entries:
+        if show:
+            click.echo(archive.read_record(entry).decode("utf-8", errors="replace"))
+        else:
+            click.echo(
+                f"{entry.timestamp}  {entry.request_id}  patient={entry.patient_id}  "
+                f"document={entry.document_unique_id}  ({entry.segment_path.name})"
+            )
+
+
+@mock_group.command(name="documents")
+@click.option(
+    "--document-id",
+    type=str,
+    help="Match the document unique ID"
+)
+@click.option(
+    "--submission-set-id",
+    type=str,
+    help="Match the submission set unique ID"
+)
+@click.option(
+    "--patient-id",
+    type=str,
+    help="Match the submission patient ID"
+)
+@click.option(
+    "--show",
+    is_flag=True,
+    help="Print the content of each match"
+)
+@click.option(
+    "--stats",
+    is_flag=True,
+    help="Print deduplication statistics instead of listing documents"
+)
+@click.option(
+    "--store-dir",
+    type=click.Path(path_type=Path),
+    help="Document store directory (default: document_store_dir from config)"
+)
+@click.option(
+    "--config",
+    type=click.Path(exists=True, path_type=Path),
+    help="Mock server configuration file"
+)
+def list_documents(
+    document_id: str | None,
+    submission_set_id: str | None,
+    patient_id: str | None,
+    show: bool,
+    stats: bool,
+    store_dir: Path | None,
+    config: Path | None
+):
+    """Look up documents saved by the ITI-41 mock.
+    
+    Requires save_submitted_documents in the mock server configuration.
+    
+    Examples:
+    
+        # Deduplication statistics\n
+        ihe-test-util mock documents --stats
+        
+        # Print one document\n
+        ihe-test-util mock documents --document-id 1.2.3.4.5 --show
+        
+        # All documents of a patient\n
+        ihe-test-util mock documents --patient-id PAT123
+    """
+    if store_dir is None:
+        store_dir = Path(load_config(config).document_store_dir)
+
+    store = DocumentStore(store_dir)
+    if stats:
+        summary = store.stats()
+        click.echo(f"Documents:      {summary.documents}")
+        click.echo(f"Unique blobs:   {summary.unique_blobs}")
+        click.echo(f"Duplicates:     {summary.duplicates}")
+        click.echo(f"Logical bytes:  {summary.logical_bytes}")
+        click.echo(f"Stored bytes:   {summary.stored_bytes}")
+        click.echo(f"Dedup ratio:    {summary.dedup_ratio:.2f}x")
+        return
+
+    entries = store.find(
+        document_unique_id=document_id,
+        submission_set_id=submission_set_id,
+        patient_id=patient_id,
+    )
+    if not entries:
+        click.echo(f"No matching documents in {store_dir}")
+        return
+
+    for entry in entries:
+        if show:
+            content = store.blob_path(entry.sha256).read_bytes()
+            click.echo(content.decode("utf-8", errors="replace"))
+        else:
+            click.echo(
+                f"{entry.stored_at}  {entry.document_unique_id}  "
+                f"submission_set={entry.submission_set_id}  patient={entry.patient_id}  "
+                f"{entry.size} bytes  sha256={entry.sha256[:12]}"
+            )
+
+
+@mock_group.command(name="recordings")
+@click.option(
+    "--transaction",
+    type=click.Choice(["pix_add", "iti41"]),
+    help="Match the transaction"
+)
+@click.option(
+    "--patient-id",
+    type=str,
+    help="Match the patient ID"
+)
+@click.option(
+    "--show",
+    is_flag=True,
+    help="Print the recorded response of each match"
+)
+@click.option(
+    "--archive-dir",
+    type=click.Path(path_type=Path),
+    help="Recording archive directory (default: record_replay.archive_dir from config)"
+)
+@click.option(
+    "--config",
+    type=click.Path(exists=True, path_type=Path),
+    help="Mock server configuration file"
+)
+def list_recordings(
+    transaction: str | None,
+    patient_id: str | None,
+    show: bool,
+    archive_dir: Path | None,
+    config: Path | None
+):
+    """List exchanges recorded in record_replay "record" mode.
+    
+    Examples:
+    
+        # List every recorded exchange\n
+        ihe-test-util mock recordings
+        
+        # Show the recorded ITI-41 responses of a patient\n
+        ihe-test-util mock recordings --transaction iti41 --patient-id PAT123 --show
+    """
+    if archive_dir is None:
+        archive_dir = Path(load_config(config).record_replay.archive_dir)
+
+    archive = TrafficArchive(archive_dir)
+    entries = [
+        entry
+        for entry in archive.entries()
+        if (transaction is None or entry.transaction == transaction)
+        and (patient_id is None or entry.patient_id == patient_id)
+    ]
+    if not entries:
+        click.echo(f"No matching recordings in {archive_dir}")
+        return
+
+    for entry in entries:
+        if show:
+            click.echo(archive.read_response(entry).decode("utf-8", errors="replace"))
+        else:
+            click.echo(
+                f"{entry.recorded_at}  {entry.transaction}  patient={entry.patient_id}  "
+                f"status={entry.status}  {entry.latency_ms:.1f}ms  "
+                f"{entry.request_length}/{entry.response_length} bytes  ({entry.segment})"
+            )
+
+
 def display_tail(
     file_path: Path,
     num_lines: int,
@@ -307,6 +307,7 @@ def _load_config_with_overrides(
     if endpoint:
         logger.info(f"Overriding PIX Add endpoint: {endpoint}")
         config_obj.endpoints.pix_add_url = endpoint
+        config_obj.endpoints.pix_add_endpoints = []
     
     if cert:
         logger.info(f"Overriding certificate path: {cert}")
@@ -325,6 +326,8 @@ def _load_config_with_overrides(
             config_obj.endpoints.pix_add_url = config_obj.endpoints.pix_add_url.replace(
                 "https://", "http://"
             )
+        for target in config_obj.endpoints.pix_add_endpoints:
+            target.url = target.url.replace("https://", "http://")
     
     # Validate required configuration
     if not config_obj.endpoints.pix_add_url:
@@ -0,0 +1,158 @@
+"""Submission registry CLI commands.
+
+This module provides Click commands for inspecting the registry of
+successful submissions written with ``ihe-test-util submit --registry``.
+
+Commands:
+    registry list <file> - List recorded PIX Adds and ITI-41 submissions
+    registry stats <file> - Count recorded submissions per endpoint
+    registry forget <file> - Remove entries so the next run resubmits them
+"""
+
+import logging
+import sys
+from pathlib import Path
+from typing import Optional
+
+import click
+
+from ihe_test_util.ihe_transactions.submission_registry import (
+    PIX_ADD,
+    TRANSACTIONS,
+    SubmissionRegistry,
+)
+
+
+logger = logging.getLogger(__name__)
+
+_TRANSACTION_OPTION = click.option(
+    "--transaction",
+    "transaction_type",
+    type=click.Choice(TRANSACTIONS),
+    default=None,
+    help="Transaction (pix_add, iti41)",
+)
+
+
+def _open_registry(path: Path) -> SubmissionRegistry:
+    """Open an existing registry or exit with code 2."""
+    if not path.is_file():
+        click.echo(
+            click.style("✗ Registry Error: ", fg="red", bold=True)
+            + f"Submission registry not found: {path}",
+            err=True,
+        )
+        sys.exit(2)
+    return SubmissionRegistry(path)
+
+
+@click.group(name="registry")
+def registry_group() -> None:
+    """Submission registry commands.
+
+    Use these commands to see which patients earlier runs registered and
+    submitted, and to make selected patients be sent again.
+    """
+
+
+@registry_group.command(name="list")
+@click.argument("registry_file", type=click.Path(dir_okay=False, path_type=Path))
+@click.option("--patient", "patient_id", default=None, help="Patient ID")
+@_TRANSACTION_OPTION
+@click.option("--limit", type=click.IntRange(min=1), default=None, help="Stop after N entries")
+def list_command(
+    registry_file: Path,
+    patient_id: Optional[str],
+    transaction_type: Optional[str],
+    limit: Optional[int],
+) -> None:
+    """List recorded submissions, oldest first.
+
+    Prints one line per entry: time recorded, transaction, patient ID and
+    OID, the enterprise ID (PIX Add) or document ID (ITI-41), the batch and
+    the endpoint.
+
+    Exit Codes:
+        0: Listing completed (including no matches)
+        2: Registry not found
+
+    Example:
+        ihe-test-util registry list output/registry.db --patient PAT001
+    """
+    registry = _open_registry(registry_file)
+    try:
+        listed = 0
+        for entry in registry.entries(patient_id=patient_id, transaction_type=transaction_type):
+            key = entry.key
+            identifier = entry.enterprise_id if key.transaction_type == PIX_ADD else entry.document_id
+            click.echo(
+                f"{entry.recorded_at}  {key.transaction_type:<7} {key.patient_id:<12} "
+                f"{key.patient_id_oid:<20} {identifier or '-':<40} {entry.batch_id or '-'}  {key.endpoint}"
+            )
+            listed += 1
+            if limit is not None and listed >= limit:
+                break
+        logger.debug(f"Listed {listed} registry entries from {registry_file}")
+    finally:
+        registry.close()
+
+
+@registry_group.command(name="stats")
+@click.argument("registry_file", type=click.Path(dir_okay=False, path_type=Path))
+def stats_command(registry_file: Path) -> None:
+    """Count recorded submissions per transaction and endpoint.
+
+    Exit Codes:
+        0: Counts printed
+        2: Registry not found
+
+    Example:
+        ihe-test-util registry stats output/registry.db
+    """
+    registry = _open_registry(registry_file)
+    try:
+        counts = registry.counts()
+    finally:
+        registry.close()
+
+    if not counts:
+        click.echo("Registry is empty")
+        return
+    for transaction_type, endpoints in counts.items():
+        click.echo(click.style(f"{transaction_type}: {sum(endpoints.values())}", bold=True))
+        for endpoint, count in endpoints.items():
+            click.echo(f"  {count:>8}  {endpoint}")
+
+
+@registry_group.command(name="forget")
+@click.argument("registry_file", type=click.Path(dir_okay=False, path_type=Path))
+@click.option("--patient", "patient_id", default=None, help="Patient ID")
+@_TRANSACTION_OPTION
+@click.option("--all", "forget_all", is_flag=True, help="Remove every entry")
+def forget_command(
+    registry_file: Path,
+    patient_id: Optional[str],
+    transaction_type: Optional[str],
+    forget_all: bool,
+) -> None:
+    """Remove entries so the next run submits those patients again.
+
+    Give --patient and/or --transaction, or --all to empty the registry.
+    Unlike 'submit --force', this affects only the selected entries.
+
+    Exit Codes:
+        0: Entries removed (including none matching)
+        2: Registry not found, or no filter and no --all
+
+    Example:
+        ihe-test-util registry forget output/registry.db --patient PAT001 --transaction iti41
+    """
+    if not (patient_id or transaction_type or forget_all):
+        raise click.UsageError("Give --patient and/or --transaction, or --all to remove every entry.")
+
+    registry = _open_registry(registry_file)
+    try:
+        deleted = registry.forget(patient_id=patient_id, transaction_type=transaction_type)
+    finally:
+        registry.close()
+    click.echo(click.style("✓ Removed ", fg="green") + f"{deleted} registry entries")
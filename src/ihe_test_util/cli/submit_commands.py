@@ -21,6 +21,20 @@ Examples:
 
     # Development mode with HTTP transport
     $ ihe-test-util submit patients.csv --http --dry-run
+
+    # Profile a batch run (cpu, wall or alloc)
+    $ ihe-test-util submit --profile=wall patients.csv
+
+    # Record a timeline of every workflow step (chrome://tracing, Perfetto)
+    $ ihe-test-util submit --trace output/trace.json patients.csv
+
+    # Expose live client metrics to Prometheus during a long batch
+    $ ihe-test-util submit --metrics-port 9464 --metrics-file metrics/ihe.prom patients.csv
+
+    # Split a batch across workers, then merge their results
+    $ ihe-test-util submit batch patients.csv --shard 1/2 -o output/shard-1.json
+    $ ihe-test-util submit batch patients.csv --shard 2/2 -o output/shard-2.json
+    $ ihe-test-util submit merge output/shard-*.json -o output/results.json
 """
 
 import json
@@ -28,10 +42,11 @@ import logging
 import sys
 import time
 from collections import Counter
+from contextlib import nullcontext
 from datetime import datetime, timezone
 from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterable, Optional
 
 import click
 from requests import ConnectionError, Timeout
@@ -40,12 +55,25 @@ from requests.exceptions import SSLError
 from ihe_test_util.config.manager import load_config
 from ihe_test_util.config.schema import BatchConfig, Config
 from ihe_test_util.csv_parser.parser import parse_csv
+from ihe_test_util.ihe_transactions.metrics import DEFAULT_TEXTFILE_INTERVAL, metrics_exporters
+from ihe_test_util.ihe_transactions.sharding import (
+    DEFAULT_LEASE_SECONDS,
+    DEFAULT_RANGE_SIZE,
+    ShardSpec,
+    WorkQueue,
+    default_worker_id,
+)
 from ihe_test_util.ihe_transactions.workflows import (
     IntegratedWorkflow,
     generate_integrated_workflow_summary,
+    load_workflow_results_from_json,
+    merge_workflow_results,
     save_workflow_results_to_json,
 )
 from ihe_test_util.models.batch import BatchWorkflowResult, PatientWorkflowResult
+from ihe_test_util.profiling.profiler import BatchProfiler, ProfileMode
+from ihe_test_util.profiling.report import subsystem_totals, write_profile
+from ihe_test_util.profiling.tracing import Tracer, tracing
 from ihe_test_util.saml.certificate_manager import load_certificate
 from ihe_test_util.utils.exceptions import ConfigurationError, ValidationError
 from ihe_test_util.utils.output_manager import OutputManager, setup_output_directories
@@ -199,7 +227,78 @@ def load_pix_results(pix_results_path: Path) -> dict:
 # Submit CLI Group with Default Command (AC: 1)
 # =============================================================================
 
-@click.group(name="submit", invoke_without_command=True)
+class SubmitGroup(click.Group):
+    """Group whose optional CSV_FILE argument never consumes a subcommand name.
+    
+    Without this, ``submit batch patients.csv`` parses "batch" as CSV_FILE.
+    """
+    
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        if args and args[0] in self.commands:
+            # Group options keep their defaults; the subcommand gets the rest
+            super().parse_args(ctx, [])
+            ctx._protected_args, ctx.args = args[:1], args[1:]
+            return ctx.args
+        return super().parse_args(ctx, args)
+
+
+def _parse_shard(ctx: click.Context, param: click.Parameter, value: Optional[str]) -> Optional[ShardSpec]:
+    """Click callback converting --shard i/N to a ShardSpec."""
+    if value is None:
+        return None
+    try:
+        return ShardSpec.parse(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from e
+
+
+def _file_label(shard_label: str) -> str:
+    """File-name-safe form of a shard label ("1/4" → "1of4")."""
+    return shard_label.replace("/", "of").replace(":", "-")
+
+
+def _sharding_options(command):
+    """Options shared by ``submit`` and ``submit batch`` for sharded runs."""
+    options = [
+        click.option(
+            "--shard",
+            callback=_parse_shard,
+            default=None,
+            metavar="I/N",
+            help="Process only shard I of N (every N-th CSV row, starting at row I)",
+        ),
+        click.option(
+            "--work-queue",
+            type=click.Path(dir_okay=False, path_type=Path),
+            default=None,
+            help="Lease row ranges from this shared SQLite work queue (created if missing)",
+        ),
+        click.option(
+            "--worker-id",
+            default=None,
+            help="Worker ID in the work queue (default: <hostname>-<pid>)",
+        ),
+        click.option(
+            "--range-size",
+            type=click.IntRange(min=1),
+            default=DEFAULT_RANGE_SIZE,
+            show_default=True,
+            help="Rows per work queue lease (used when the queue is created)",
+        ),
+        click.option(
+            "--lease-seconds",
+            type=click.FloatRange(min=1),
+            default=DEFAULT_LEASE_SECONDS,
+            show_default=True,
+            help="Seconds without a heartbeat before a lease can be reclaimed",
+        ),
+    ]
+    for option in reversed(options):
+        command = option(command)
+    return command
+
+
+@click.group(name="submit", cls=SubmitGroup, invoke_without_command=True)
 @click.argument("csv_file", type=click.Path(exists=True, path_type=Path), required=False)
 @click.option(
     "--config",
@@ -286,6 +385,57 @@ def load_pix_results(pix_results_path: Path) -> dict:
     is_flag=True,
     help="Display full error details at end of batch",
 )
+@click.option(
+    "--profile",
+    type=click.Choice([mode.value for mode in ProfileMode]),
+    is_flag=False,
+    flag_value=ProfileMode.CPU.value,
+    default=None,
+    help="Profile the run: cpu (default), wall or alloc. Use --profile=MODE before CSV_FILE",
+)
+@click.option(
+    "--profile-output",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Directory for profile reports (default: <output-dir>/profile or output/profile)",
+)
+@click.option(
+    "--trace",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Write a Chrome/Perfetto trace of every workflow step to this JSON file",
+)
+@click.option(
+    "--metrics-file",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Prometheus textfile to rewrite with live client metrics during the run",
+)
+@click.option(
+    "--metrics-interval",
+    type=click.FloatRange(min=0.1),
+    default=DEFAULT_TEXTFILE_INTERVAL,
+    show_default=True,
+    help="Seconds between --metrics-file writes",
+)
+@click.option(
+    "--metrics-port",
+    type=click.IntRange(0, 65535),
+    default=None,
+    help="Serve live client metrics at http://127.0.0.1:PORT/metrics during the run",
+)
+@click.option(
+    "--registry",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Submission registry (SQLite): skip PIX Adds and ITI-41s that succeeded in earlier runs",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Resubmit patients the registry already records as successful",
+)
+@_sharding_options
 @click.pass_context
 def submit(
     ctx: click.Context,
@@ -305,6 +455,19 @@ def submit(
     quiet: bool,
     verbose: bool,
     show_errors: bool,
+    profile: Optional[str],
+    profile_output: Optional[Path],
+    trace: Optional[Path],
+    metrics_file: Optional[Path],
+    metrics_interval: float,
+    metrics_port: Optional[int],
+    registry: Optional[Path],
+    force: bool,
+    shard: Optional[ShardSpec],
+    work_queue: Optional[Path],
+    worker_id: Optional[str],
+    range_size: int,
+    lease_seconds: float,
 ) -> None:
     """Process patients through complete PIX Add + ITI-41 workflow.
     
@@ -346,6 +509,28 @@ def submit(
     Development mode with HTTP:
       $ ihe-test-util submit patients.csv --http --config config/batch-development.json
     
+    \b
+    Profile where the time goes (cpu, wall or alloc):
+      $ ihe-test-util submit --profile=wall patients.csv
+    
+    \b
+    Record a per-step timeline for chrome://tracing or Perfetto:
+      $ ihe-test-util submit --trace output/trace.json patients.csv
+    
+    \b
+    Expose live client metrics to Prometheus:
+      $ ihe-test-util submit --metrics-port 9464 patients.csv
+    
+    \b
+    Rerun a CSV, skipping patients already submitted (--force resends):
+      $ ihe-test-util submit --registry output/registry.db patients.csv
+    
+    \b
+    Split the CSV across workers (static shards or a shared work queue):
+      $ ihe-test-util submit --shard 1/4 patients.csv
+      $ ihe-test-util submit --work-queue /shared/queue.db patients.csv
+      $ ihe-test-util submit merge output/results-*.json -o results.json
+    
     \b
     EXIT CODES:
         0: All patients processed successfully
@@ -395,6 +580,19 @@ def submit(
             quiet=quiet,
             verbose=verbose,
             show_errors=show_errors,
+            profile=profile,
+            profile_output=profile_output,
+            trace=trace,
+            metrics_file=metrics_file,
+            metrics_interval=metrics_interval,
+            metrics_port=metrics_port,
+            registry=registry,
+            force=force,
+            shard=shard,
+            work_queue=work_queue,
+            worker_id=worker_id,
+            range_size=range_size,
+            lease_seconds=lease_seconds,
         )
     elif ctx.invoked_subcommand is None:
         # No csv_file and no subcommand - show help
@@ -488,6 +686,57 @@ def submit(
     is_flag=True,
     help="Display full error details at end of batch",
 )
+@click.option(
+    "--profile",
+    type=click.Choice([mode.value for mode in ProfileMode]),
+    is_flag=False,
+    flag_value=ProfileMode.CPU.value,
+    default=None,
+    help="Profile the run: cpu (default), wall or alloc. Use --profile=MODE before CSV_FILE",
+)
+@click.option(
+    "--profile-output",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Directory for profile reports (default: <output-dir>/profile or output/profile)",
+)
+@click.option(
+    "--trace",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Write a Chrome/Perfetto trace of every workflow step to this JSON file",
+)
+@click.option(
+    "--metrics-file",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Prometheus textfile to rewrite with live client metrics during the run",
+)
+@click.option(
+    "--metrics-interval",
+    type=click.FloatRange(min=0.1),
+    default=DEFAULT_TEXTFILE_INTERVAL,
+    show_default=True,
+    help="Seconds between --metrics-file writes",
+)
+@click.option(
+    "--metrics-port",
+    type=click.IntRange(0, 65535),
+    default=None,
+    help="Serve live client metrics at http://127.0.0.1:PORT/metrics during the run",
+)
+@click.option(
+    "--registry",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Submission registry (SQLite): skip PIX Adds and ITI-41s that succeeded in earlier runs",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Resubmit patients the registry already records as successful",
+)
+@_sharding_options
 @click.pass_context
 def batch(
     ctx: click.Context,
@@ -507,6 +756,19 @@ def batch(
     quiet: bool,
     verbose: bool,
     show_errors: bool,
+    profile: Optional[str],
+    profile_output: Optional[Path],
+    trace: Optional[Path],
+    metrics_file: Optional[Path],
+    metrics_interval: float,
+    metrics_port: Optional[int],
+    registry: Optional[Path],
+    force: bool,
+    shard: Optional[ShardSpec],
+    work_queue: Optional[Path],
+    worker_id: Optional[str],
+    range_size: int,
+    lease_seconds: float,
 ) -> None:
     """Process patients through complete PIX Add + ITI-41 workflow.
     
@@ -535,6 +797,51 @@ def batch(
     ITI-41 Only Mode (--iti41-only --pix-results <file>):
       Only executes ITI-41 submission using prior PIX Add results.
       Skips patients that failed PIX Add in prior run.
+    
+    \b
+    PROFILING (--profile [cpu|wall|alloc]):
+      cpu   - CPU time only (network waits excluded)
+      wall  - elapsed time, including network waits
+      alloc - memory still allocated at the end of the run (tracemalloc)
+      Writes a report ranking functions by subsystem (csv_parser,
+      template_engine, saml, ihe_transactions, transport), collapsed stacks
+      for flamegraph tools and, for cpu/wall, a pstats file.
+    
+    \b
+    TRACING (--trace FILE):
+      Records a span for each step (CSV row conversion, CCD generation,
+      metadata, SAML, envelope and MTOM build, each HTTP attempt and
+      backoff, response parsing, checkpoint writes) tagged with patient
+      and transaction IDs. Open FILE in chrome://tracing or
+      https://ui.perfetto.dev.
+    
+    \b
+    METRICS (--metrics-file FILE, --metrics-port PORT):
+      Publishes stage outcomes, errors by stage and category, HTTP
+      requests by status, retries, in-flight requests, bytes sent and
+      received, and latency histograms per transaction while the batch
+      runs, as a Prometheus textfile and/or a local scrape endpoint.
+    
+    \b
+    SUBMISSION REGISTRY (--registry FILE, --force):
+      Records every successful PIX Add and ITI-41 in a SQLite file. On
+      later runs a patient whose PIX Add is recorded for the same
+      endpoint and demographics is not re-registered; its enterprise ID
+      is reused. An ITI-41 recorded for the same demographics and CCD
+      template is not resubmitted. --force resends everything and
+      updates the records. Inspect or edit the file with
+      'ihe-test-util registry'.
+    
+    \b
+    SHARDING (--shard I/N, --work-queue FILE):
+      --shard I/N processes every N-th CSV row starting at row I, so N
+      workers started with 1/N .. N/N cover the file once.
+      --work-queue FILE instead leases ranges of --range-size rows from a
+      SQLite queue shared by every worker (on a shared filesystem for
+      several machines). Workers heartbeat their leases; a range whose
+      worker crashed is reclaimed after --lease-seconds and processed
+      again. Each worker saves output/results-<shard>.json unless
+      --output is given; combine them with 'submit merge'.
     """
     start_time = time.time()
     
@@ -556,6 +863,26 @@ def batch(
             "--pix-results can only be used with --iti41-only."
         )
     
+    if shard and work_queue:
+        raise click.UsageError(
+            "Cannot use --shard and --work-queue together. "
+            "Choose static shards or a shared work queue."
+        )
+    
+    if work_queue and resume:
+        raise click.UsageError(
+            "--resume cannot be used with --work-queue. "
+            "Restart the worker; unfinished ranges are reclaimed from the queue."
+        )
+    
+    # Label identifying this worker's part of the batch
+    shard_label: Optional[str] = None
+    if shard:
+        shard_label = str(shard)
+    elif work_queue:
+        worker_id = worker_id or default_worker_id()
+        shard_label = f"queue:{worker_id}"
+    
     try:
         # Load configuration with overrides
         logger.info("Loading configuration for integrated workflow")
@@ -581,6 +908,8 @@ def batch(
             checkpoint_interval=checkpoint_interval,
             fail_fast=fail_fast,
             output_dir=output_dir,
+            registry_path=registry,
+            force_resubmit=force,
         )
         
         # Set up output directories if output_dir specified
@@ -599,9 +928,15 @@ def batch(
                 )
             elif output:
                 checkpoint_file = output.parent / f"checkpoint-{output.stem}.json"
+            elif shard:
+                checkpoint_file = Path("output") / f"checkpoint-{shard.index}of{shard.count}.json"
             else:
                 checkpoint_file = Path("output") / "checkpoint.json"
         
+        # Each shard worker keeps its results for 'submit merge'
+        if shard_label and not output and not output_manager:
+            output = Path("output") / f"results-{_file_label(shard_label)}.json"
+        
         # If resuming, use the specified checkpoint file
         if resume:
             checkpoint_file = resume
@@ -616,9 +951,33 @@ def batch(
         df, validation_result = parse_csv(csv_file, validate=True)
         total_patients = len(df)
         
+        # Select the rows this worker processes
+        row_selector: Optional[Callable[[int], Iterable[int]]] = None
+        progress_total = total_patients
+        if shard:
+            row_selector = shard.rows
+            progress_total = len(shard.rows(total_patients))
+        elif work_queue:
+            queue = WorkQueue(work_queue, lease_seconds=lease_seconds)
+            try:
+                queue.initialize(csv_file.name, total_patients, range_size)
+            except ValueError as e:
+                raise ValidationError(str(e)) from e
+            
+            def row_selector(total: int) -> Iterable[int]:
+                return queue.rows(worker_id)
+        
         if not quiet:
             click.echo(f"CSV File:           {csv_file}")
             click.echo(f"Total Patients:     {total_patients}")
+            if shard:
+                click.echo(f"Shard:              {shard} ({progress_total} patients)")
+            elif work_queue:
+                progress = queue.progress()
+                click.echo(
+                    f"Work Queue:         {work_queue} (worker {worker_id}, "
+                    f"{progress['done']}/{sum(progress.values())} ranges done)"
+                )
             click.echo(f"PIX Add Endpoint:   {config_obj.endpoints.pix_add_url}")
             if not pix_only:
                 click.echo(f"ITI-41 Endpoint:    {config_obj.endpoints.iti41_url}")
@@ -660,51 +1019,76 @@ def batch(
                 click.echo(f"  Fail-Fast Mode:      {click.style('ENABLED', fg='yellow')}")
             if output_dir:
                 click.echo(f"  Output Directory:    {output_dir}")
+        if not quiet and batch_config.registry_path:
+            click.echo(
+                f"Registry:           {batch_config.registry_path}"
+                + (click.style(" (--force: resubmitting all)", fg="yellow") if force else "")
+            )
         click.echo()
         
-        # Initialize workflow with batch config
-        logger.info("Initializing integrated workflow")
-        workflow = IntegratedWorkflow(config_obj, template_path, batch_config)
+        profiler = BatchProfiler(ProfileMode(profile)) if profile else None
+        with profiler if profiler else nullcontext(), \
+                tracing() if trace else nullcontext() as tracer, \
+                metrics_exporters(metrics_file, metrics_interval, metrics_port) as exporters:
+            for exporter in exporters:
+                if not quiet:
+                    click.echo(f"Client metrics:     {exporter.location}")
+            # Initialize workflow with batch config
+            logger.info("Initializing integrated workflow")
+            workflow = IntegratedWorkflow(config_obj, template_path, batch_config)
         
-        # Load PIX results if ITI-41 only mode
-        prior_pix_results: Optional[dict] = None
-        if iti41_only and pix_results:
-            prior_pix_results = load_pix_results(pix_results)
+            # Load PIX results if ITI-41 only mode
+            prior_pix_results: Optional[dict] = None
+            if iti41_only and pix_results:
+                prior_pix_results = load_pix_results(pix_results)
         
-        # Process batch with real-time progress display
-        if not quiet:
-            click.echo(click.style("Processing patients...", fg="cyan"))
-            click.echo()
+            # Process batch with real-time progress display
+            if not quiet:
+                click.echo(click.style("Processing patients...", fg="cyan"))
+                click.echo()
         
-        # Execute workflow based on mode
-        if pix_only:
-            result = _execute_pix_only_workflow(
-                workflow=workflow,
-                csv_file=csv_file,
-                checkpoint_file=checkpoint_file,
-                total_patients=total_patients,
-                quiet=quiet,
-                verbose=verbose,
-            )
-        elif iti41_only:
-            result = _execute_iti41_only_workflow(
-                workflow=workflow,
-                csv_file=csv_file,
-                pix_results_data=prior_pix_results,
-                checkpoint_file=checkpoint_file,
-                total_patients=total_patients,
-                quiet=quiet,
-                verbose=verbose,
-            )
-        else:
-            result = _execute_full_workflow(
-                workflow=workflow,
-                csv_file=csv_file,
-                checkpoint_file=checkpoint_file,
-                total_patients=total_patients,
-                quiet=quiet,
-                verbose=verbose,
-            )
+            # Execute workflow based on mode
+            if pix_only:
+                result = _execute_pix_only_workflow(
+                    workflow=workflow,
+                    csv_file=csv_file,
+                    checkpoint_file=checkpoint_file,
+                    total_patients=progress_total,
+                    quiet=quiet,
+                    verbose=verbose,
+                    row_selector=row_selector,
+                )
+            elif iti41_only:
+                result = _execute_iti41_only_workflow(
+                    workflow=workflow,
+                    csv_file=csv_file,
+                    pix_results_data=prior_pix_results,
+                    checkpoint_file=checkpoint_file,
+                    total_patients=progress_total,
+                    quiet=quiet,
+                    verbose=verbose,
+                    row_selector=row_selector,
+                )
+            else:
+                result = _execute_full_workflow(
+                    workflow=workflow,
+                    csv_file=csv_file,
+                    checkpoint_file=checkpoint_file,
+                    total_patients=progress_total,
+                    quiet=quiet,
+                    verbose=verbose,
+                    row_selector=row_selector,
+                )
+        
+        
+        result.shard = shard_label
+        
+        if profiler:
+            profile_dir = profile_output or (output_dir or Path("output")) / "profile"
+            _save_profile(profiler, profile_dir, result.batch_id, quiet)
+        
+        if tracer is not None:
+            _save_trace(tracer, trace)
         
         # Display per-patient results with color coding
         if not quiet:
@@ -827,10 +1211,102 @@ def batch(
         sys.exit(3)
 
 
+@submit.command(name="merge")
+@click.argument(
+    "result_files",
+    nargs=-1,
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(path_type=Path),
+    required=True,
+    help="Output JSON file for the merged workflow results",
+)
+def merge(result_files: tuple[Path, ...], output: Path) -> None:
+    """Merge results files from sharded batch workers into one.
+    
+    Combines the patient results of every RESULT_FILE, recalculates the
+    statistics over all of them (throughput spans the earliest start to
+    the latest finish) and sums the endpoint counters. A patient found in
+    several files is counted once, from the file that finished last.
+    
+    \b
+    Example:
+      $ ihe-test-util submit merge output/results-1of2.json output/results-2of2.json -o results.json
+    
+    \b
+    EXIT CODES:
+        0: Results merged
+        1: A file is not a workflow results file, or files are from different CSVs
+    """
+    try:
+        results = [load_workflow_results_from_json(path) for path in result_files]
+        merged = merge_workflow_results(results)
+    except ValidationError as e:
+        logger.error(f"Merge failed: {e}")
+        click.echo(
+            click.style("✗ Validation Error: ", fg="red", bold=True) + str(e),
+            err=True
+        )
+        sys.exit(1)
+    
+    click.echo(f"Merged {len(results)} result files ({merged.total_patients} patients)")
+    if merged.duplicates_dropped:
+        # A work queue range reclaimed from a stalled worker is processed twice
+        click.echo(
+            click.style("⚠ Duplicate patient results dropped: ", fg="yellow") +
+            f"{merged.duplicates_dropped} (kept the result from the shard that finished last)"
+        )
+    click.echo()
+    _display_summary_report_with_stages(merged)
+    
+    save_workflow_results_to_json(merged, output)
+    click.echo()
+    click.echo(click.style("✓ Results saved to: ", fg="green") + str(output))
+
+
 # =============================================================================
 # Workflow Execution Functions
 # =============================================================================
 
+def _save_profile(profiler: BatchProfiler, profile_dir: Path, batch_id: str, quiet: bool) -> None:
+    """Write the profile of a batch run and show where the time went.
+    
+    Args:
+        profiler: Stopped profiler
+        profile_dir: Directory for the report files
+        batch_id: Batch identifier used in the file names
+        quiet: Only print the file paths
+    """
+    result = profiler.result
+    paths = write_profile(result, profile_dir, f"profile-{batch_id}-{result.mode.value}")
+    
+    click.echo()
+    if not quiet:
+        totals = subsystem_totals(result)
+        total = sum(totals.values()) or 1
+        click.echo(click.style(f"Profile ({result.mode.value}):", fg="cyan", bold=True))
+        for subsystem, weight in list(totals.items())[:6]:
+            click.echo(f"  {subsystem:<18} {weight / total:6.1%}")
+    for kind, path in paths.items():
+        click.echo(click.style(f"✓ Profile {kind} saved to: ", fg="green") + str(path))
+
+
+def _save_trace(tracer: Tracer, trace_file: Path) -> None:
+    """Write the span trace of a batch run.
+    
+    Args:
+        tracer: Tracer that recorded the run
+        trace_file: Output JSON file
+    """
+    tracer.write(trace_file)
+    click.echo()
+    click.echo(click.style("✓ Trace saved to: ", fg="green") + str(trace_file))
+
+
 def _execute_full_workflow(
     workflow: IntegratedWorkflow,
     csv_file: Path,
@@ -838,6 +1314,7 @@ def _execute_full_workflow(
     total_patients: int,
     quiet: bool,
     verbose: bool,
+    row_selector: Optional[Callable[[int], Iterable[int]]] = None,
 ) -> BatchWorkflowResult:
     """Execute full PIX Add + ITI-41 workflow with progress display.
     
@@ -848,6 +1325,7 @@ def _execute_full_workflow(
         total_patients: Total number of patients in CSV
         quiet: Suppress progress output
         verbose: Show detailed logging
+        row_selector: Optional selector of the CSV rows to process
         
     Returns:
         BatchWorkflowResult with processing results
@@ -868,7 +1346,9 @@ def _execute_full_workflow(
                     click.echo(f"\n  → Patient {patient_idx + 1}/{total_patients}: {patient_id} - {status}")
             
             # Process batch with progress tracking
-            result = workflow.process_batch(csv_file, checkpoint_file=checkpoint_file)
+            result = workflow.process_batch(
+                csv_file, checkpoint_file=checkpoint_file, row_selector=row_selector
+            )
             
             # Update progress bar to completion
             remaining = total_patients - bar.pos
@@ -876,7 +1356,9 @@ def _execute_full_workflow(
                 bar.update(remaining)
     else:
         # Silent processing
-        result = workflow.process_batch(csv_file, checkpoint_file=checkpoint_file)
+        result = workflow.process_batch(
+            csv_file, checkpoint_file=checkpoint_file, row_selector=row_selector
+        )
     
     return result
 
@@ -888,6 +1370,7 @@ def _execute_pix_only_workflow(
     total_patients: int,
     quiet: bool,
     verbose: bool,
+    row_selector: Optional[Callable[[int], Iterable[int]]] = None,
 ) -> BatchWorkflowResult:
     """Execute PIX Add only workflow (skip ITI-41).
     
@@ -898,6 +1381,7 @@ def _execute_pix_only_workflow(
         total_patients: Total number of patients in CSV
         quiet: Suppress progress output
         verbose: Show detailed logging
+        row_selector: Optional selector of the CSV rows to process
         
     Returns:
         BatchWorkflowResult with PIX Add results (ITI-41 marked as skipped)
@@ -915,6 +1399,7 @@ def _execute_pix_only_workflow(
         total_patients=total_patients,
         quiet=quiet,
         verbose=verbose,
+        row_selector=row_selector,
     )
 
 
@@ -926,6 +1411,7 @@ def _execute_iti41_only_workflow(
     total_patients: int,
     quiet: bool,
     verbose: bool,
+    row_selector: Optional[Callable[[int], Iterable[int]]] = None,
 ) -> BatchWorkflowResult:
     """Execute ITI-41 only workflow using prior PIX results.
     
@@ -937,6 +1423,7 @@ def _execute_iti41_only_workflow(
         total_patients: Total number of patients in CSV
         quiet: Suppress progress output
         verbose: Show detailed logging
+        row_selector: Optional selector of the CSV rows to process
         
     Returns:
         BatchWorkflowResult with ITI-41 results
@@ -958,6 +1445,7 @@ def _execute_iti41_only_workflow(
         total_patients=total_patients,
         quiet=quiet,
         verbose=verbose,
+        row_selector=row_selector,
     )
 
 
@@ -1049,6 +1537,10 @@ def _display_summary_report_with_stages(
     click.echo(click.style("=" * 80, fg="cyan"))
     click.echo()
     
+    if result.shard:
+        click.echo(f"Shard:                {result.shard}")
+        click.echo()
+    
     # Stage 1: CSV Parsing
     click.echo(click.style("Stage 1: CSV Parsing", bold=True))
     click.echo("-" * 40)
@@ -1083,6 +1575,8 @@ def _display_summary_report_with_stages(
                 f"  Failed:             " +
                 click.style(f"{result.pix_add_failed_count}", fg="red")
             )
+        if result.pix_add_reused_count > 0:
+            click.echo(f"  Already Registered: {result.pix_add_reused_count} (not resent)")
         click.echo()
     else:
         click.echo(click.style("Stage 3: PIX Add (from prior run)", bold=True))
@@ -1110,6 +1604,8 @@ def _display_summary_report_with_stages(
                 click.style(f"{result.iti41_skipped_count}", fg="yellow") +
                 " (PIX Add failed)"
             )
+        if result.iti41_reused_count > 0:
+            click.echo(f"  Already Submitted:  {result.iti41_reused_count} (not resent)")
         click.echo()
     else:
         click.echo(click.style("Stage 4: ITI-41 (skipped - PIX-only mode)", bold=True))
@@ -1139,6 +1635,22 @@ def _display_summary_report_with_stages(
     if result.throughput_per_minute:
         click.echo(f"  Throughput:         {result.throughput_per_minute:.1f} patients/minute")
     
+    # Per-endpoint breakdown (load balancing only)
+    if result.endpoint_stats:
+        click.echo()
+        click.echo(click.style("Endpoints", bold=True))
+        click.echo("-" * 40)
+        for stats in result.endpoint_stats:
+            health = (
+                click.style("healthy", fg="green") if stats.healthy
+                else click.style("ejected", fg="red")
+            )
+            click.echo(f"  {stats.transaction:<8} {stats.url} ({health})")
+            click.echo(
+                f"           {stats.requests} requests, {stats.failures} failures, "
+                f"{stats.ejections} ejections, avg {stats.avg_time_ms:.0f}ms"
+            )
+    
     click.echo()
     click.echo(click.style("=" * 80, fg="cyan"))
 
@@ -1246,6 +1758,8 @@ def _load_config_with_overrides(
             config_obj.endpoints.iti41_url = config_obj.endpoints.iti41_url.replace(
                 "https://", "http://"
             )
+        for target in config_obj.endpoints.pix_add_endpoints + config_obj.endpoints.iti41_endpoints:
+            target.url = target.url.replace("https://", "http://")
     
     # Validate required configuration
     if not config_obj.endpoints.pix_add_url:
@@ -1438,6 +1952,8 @@ def _build_batch_config(
     checkpoint_interval: Optional[int],
     fail_fast: bool,
     output_dir: Optional[Path],
+    registry_path: Optional[Path] = None,
+    force_resubmit: bool = False,
 ) -> BatchConfig:
     """Build BatchConfig from CLI options.
     
@@ -1445,6 +1961,8 @@ def _build_batch_config(
         checkpoint_interval: Checkpoint interval from CLI
         fail_fast: Fail-fast flag from CLI
         output_dir: Output directory from CLI
+        registry_path: Submission registry file (None disables it)
+        force_resubmit: Resubmit patients the registry records as successful
         
     Returns:
         BatchConfig instance with CLI options applied
@@ -1460,4 +1978,10 @@ def _build_batch_config(
     if output_dir:
         config_kwargs["output_dir"] = output_dir
     
+    if registry_path:
+        config_kwargs["registry_path"] = registry_path
+    
+    if force_resubmit:
+        config_kwargs["force_resubmit"] = True
+    
     return BatchConfig(**config_kwargs)
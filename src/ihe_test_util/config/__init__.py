@@ -14,6 +14,7 @@ from ihe_test_util.config.schema import (
     CertificatesConfig,
     Config,
     EndpointsConfig,
+    EndpointTarget,
     LoggingConfig,
     TransportConfig,
 )
@@ -29,6 +30,7 @@ __all__ = [
     # Configuration models
     "Config",
     "EndpointsConfig",
+    "EndpointTarget",
     "CertificatesConfig",
     "TransportConfig",
     "LoggingConfig",
@@ -201,6 +201,14 @@ def _apply_env_overrides(config_dict: dict[str, Any]) -> dict[str, Any]:
         config_dict.setdefault("logging", {})["redact_pii"] = _parse_bool(redact_pii)
         logger.debug("Override: redact_pii from environment")
     
+    if audit_file := os.getenv(f"{ENV_PREFIX}AUDIT_FILE"):
+        config_dict.setdefault("logging", {})["audit_file"] = audit_file
+        logger.debug("Override: audit_file from environment")
+    
+    if archive_dir := os.getenv(f"{ENV_PREFIX}ARCHIVE_DIR"):
+        config_dict.setdefault("logging", {})["archive_dir"] = archive_dir
+        logger.debug("Override: archive_dir from environment")
+    
     # Story 6.6: Apply batch and template overrides
     config_dict = _apply_batch_env_overrides(config_dict)
     config_dict = _apply_template_env_overrides(config_dict)
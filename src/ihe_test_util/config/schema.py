@@ -13,16 +13,109 @@ from typing import Optional
 from pydantic import BaseModel, Field, field_validator, model_validator
 
 
+def _validate_http_url(v: str) -> str:
+    """Validate URL is valid HTTP/HTTPS.
+
+    Raises:
+        ValueError: If URL does not start with http:// or https://
+    """
+    if not v.startswith(("http://", "https://")):
+        raise ValueError(
+            f"Invalid URL: {v}. Must start with http:// or https://"
+        )
+    return v
+
+
+class EndpointTarget(BaseModel):
+    """One node of a load-balanced transaction endpoint.
+    
+    Attributes:
+        url: Endpoint URL
+        weight: Relative share of requests under the weighted strategy
+    """
+    
+    url: str = Field(..., description="Endpoint URL")
+    weight: int = Field(default=1, ge=1, description="Relative weight (weighted strategy)")
+    
+    @field_validator("url")
+    @classmethod
+    def validate_url(cls, v: str) -> str:
+        """Validate URL is valid HTTP/HTTPS."""
+        return _validate_http_url(v)
+
+
 class EndpointsConfig(BaseModel):
     """Configuration for IHE endpoint URLs.
     
+    A transaction served by several nodes lists them in ``pix_add_endpoints``
+    / ``iti41_endpoints`` (URL strings or ``{"url", "weight"}`` objects).
+    A non-empty list replaces the single URL; the single URL defaults to the
+    first listed endpoint.
+    
     Attributes:
         pix_add_url: PIX Add endpoint URL (ITI-8 transaction)
         iti41_url: ITI-41 Provide and Register Document Set-b endpoint URL
+        pix_add_endpoints: Load-balanced PIX Add endpoints
+        iti41_endpoints: Load-balanced ITI-41 endpoints
+        load_balancing: Endpoint selection strategy (round_robin, weighted,
+            least_outstanding)
+        failure_threshold: Consecutive failures that eject an endpoint
+            (0 disables ejection)
+        ejection_seconds: How long an ejected endpoint is skipped
     """
     
     pix_add_url: str = Field(..., description="PIX Add endpoint URL")
     iti41_url: str = Field(..., description="ITI-41 endpoint URL")
+    pix_add_endpoints: list[EndpointTarget] = Field(
+        default_factory=list,
+        description="Load-balanced PIX Add endpoints"
+    )
+    iti41_endpoints: list[EndpointTarget] = Field(
+        default_factory=list,
+        description="Load-balanced ITI-41 endpoints"
+    )
+    load_balancing: str = Field(
+        default="round_robin",
+        description="Endpoint selection: round_robin, weighted, or least_outstanding"
+    )
+    failure_threshold: int = Field(
+        default=3,
+        ge=0,
+        description="Consecutive failures before an endpoint is ejected (0 disables)"
+    )
+    ejection_seconds: float = Field(
+        default=30.0,
+        gt=0,
+        description="Seconds an ejected endpoint is skipped"
+    )
+    
+    @model_validator(mode="before")
+    @classmethod
+    def default_urls_from_endpoints(cls, data: object) -> object:
+        """Accept plain URL strings in endpoint lists and fill missing single URLs.
+        
+        Args:
+            data: Raw endpoints configuration
+            
+        Returns:
+            Configuration with endpoint lists normalized
+        """
+        if not isinstance(data, dict):
+            return data
+        data = dict(data)
+        for url_key, list_key in (
+            ("pix_add_url", "pix_add_endpoints"),
+            ("iti41_url", "iti41_endpoints"),
+        ):
+            targets = data.get(list_key)
+            if not targets:
+                continue
+            targets = [{"url": t} if isinstance(t, str) else t for t in targets]
+            data[list_key] = targets
+            if not data.get(url_key):
+                first = targets[0]
+                data[url_key] = first.get("url") if isinstance(first, dict) else first.url
+        return data
     
     @field_validator("pix_add_url", "iti41_url")
     @classmethod
@@ -38,11 +131,42 @@ class EndpointsConfig(BaseModel):
         Raises:
             ValueError: If URL does not start with http:// or https://
         """
-        if not v.startswith(("http://", "https://")):
+        return _validate_http_url(v)
+    
+    @field_validator("load_balancing")
+    @classmethod
+    def validate_load_balancing(cls, v: str) -> str:
+        """Validate the load balancing strategy.
+        
+        Args:
+            v: Strategy name
+            
+        Returns:
+            Validated strategy name (lowercase)
+            
+        Raises:
+            ValueError: If the strategy is not known
+        """
+        valid_strategies = ["round_robin", "weighted", "least_outstanding"]
+        v_lower = v.lower()
+        if v_lower not in valid_strategies:
             raise ValueError(
-                f"Invalid URL: {v}. Must start with http:// or https://"
+                f"Invalid load balancing strategy: {v}. "
+                f"Must be one of: {', '.join(valid_strategies)}"
             )
-        return v
+        return v_lower
+    
+    def pix_add_targets(self) -> list[tuple[str, int]]:
+        """PIX Add (url, weight) pairs to balance over."""
+        if self.pix_add_endpoints:
+            return [(target.url, target.weight) for target in self.pix_add_endpoints]
+        return [(self.pix_add_url, 1)]
+    
+    def iti41_targets(self) -> list[tuple[str, int]]:
+        """ITI-41 (url, weight) pairs to balance over."""
+        if self.iti41_endpoints:
+            return [(target.url, target.weight) for target in self.iti41_endpoints]
+        return [(self.iti41_url, 1)]
 
 
 class CertificatesConfig(BaseModel):
@@ -129,6 +253,9 @@ class LoggingConfig(BaseModel):
         level: Log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_file: Path to log file
         redact_pii: Whether to redact PII from logs
+        audit_file: Path to the JSONL audit trail (None disables it)
+        audit_compress: Whether to gzip rotated audit trail segments
+        archive_dir: Transaction archive directory (None disables it)
     """
     
     level: str = Field(
@@ -143,6 +270,18 @@ class LoggingConfig(BaseModel):
         default=False,
         description="Redact PII from logs"
     )
+    audit_file: Optional[Path] = Field(
+        default=None,
+        description="JSONL audit trail path (disabled when not set)"
+    )
+    audit_compress: bool = Field(
+        default=False,
+        description="Gzip rotated audit trail segments"
+    )
+    archive_dir: Optional[Path] = Field(
+        default=None,
+        description="Compressed transaction archive directory (disabled when not set)"
+    )
     
     @field_validator("level")
     @classmethod
@@ -246,6 +385,9 @@ class BatchConfig(BaseModel):
         pix_only_mode: Execute only PIX Add (skip ITI-41) - Story 6.7
         iti41_only_mode: Execute only ITI-41 (skip PIX Add) - Story 6.7
         pix_results_lookup: PIX results from prior run for ITI-41 only mode - Story 6.7
+        registry_path: SQLite submission registry; successful PIX Adds and
+            ITI-41 submissions recorded there are skipped on later runs
+        force_resubmit: Resubmit even when the registry has a success
         
     Example:
         >>> batch_config = BatchConfig(
@@ -312,6 +454,16 @@ class BatchConfig(BaseModel):
         description="PIX results from prior run for ITI-41 only mode"
     )
     
+    # Idempotent reruns
+    registry_path: Optional[Path] = Field(
+        default=None,
+        description="SQLite registry of successful submissions to skip on later runs"
+    )
+    force_resubmit: bool = Field(
+        default=False,
+        description="Resubmit patients the registry records as successful"
+    )
+    
     @model_validator(mode="after")
     def validate_checkpoint_interval(self) -> "BatchConfig":
         """Validate checkpoint interval is not greater than batch size.
@@ -83,9 +83,9 @@ def parse_csv(
     if not file_path.exists():
         raise FileNotFoundError(f"CSV file not found: {file_path}")
 
-    # Load CSV with UTF-8 encoding
+    # Load CSV with UTF-8 encoding; ZIP codes stay text so leading zeros survive
     try:
-        df = pd.read_csv(file_path, encoding="utf-8")
+        df = pd.read_csv(file_path, encoding="utf-8", dtype={"zip": str})
     except Exception as e:
         raise ValidationError(
             f"Failed to read CSV file {file_path}. Ensure file is valid CSV with UTF-8 encoding. Error: {e}"
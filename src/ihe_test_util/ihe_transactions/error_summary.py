@@ -9,6 +9,7 @@ from collections import defaultdict
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 
+from ihe_test_util.ihe_transactions.metrics import get_client_metrics
 from ihe_test_util.utils.exceptions import ErrorCategory, ErrorInfo
 
 logger = logging.getLogger(__name__)
@@ -67,13 +68,18 @@ class ErrorSummaryCollector:
     def add_error(
         self,
         error_info: ErrorInfo,
-        patient_id: Optional[str] = None
+        patient_id: Optional[str] = None,
+        stage: Optional[str] = None
     ) -> None:
         """Add error to collection.
         
+        The error is also counted in the client metrics registry by stage
+        and category.
+        
         Args:
             error_info: Structured error information
             patient_id: Optional patient ID if error during patient processing
+            stage: Workflow stage that failed ("ccd", "pix_add", "iti41")
             
         Example:
             >>> error_info = create_error_info(exception, patient_id="PAT123")
@@ -84,6 +90,7 @@ class ErrorSummaryCollector:
             error_info.patient_id = patient_id
         
         self.errors.append(error_info)
+        get_client_metrics().observe_error(stage or "workflow", error_info.category)
         
         logger.debug(
             f"Error added to collection: {error_info.error_type} "
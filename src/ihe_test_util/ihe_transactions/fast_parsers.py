@@ -0,0 +1,596 @@
+"""Fast-path response parsers for IHE transactions.
+
+Used by the PIX Add and ITI-41 SOAP clients in place of the parsers in
+:mod:`ihe_test_util.ihe_transactions.parsers`. They return the same dataclasses
+but:
+
+- resolve paths with module-level compiled ``etree.XPath`` objects instead of
+  building namespace-qualified ``find``/``findall`` paths per call
+- reuse one hardened ``XMLParser`` per thread (no DTDs, no entity expansion,
+  no network access, no huge-tree mode)
+- reject bodies above a configurable size cap before parsing
+- optionally stream registry responses with ``iterparse`` and stop as soon as
+  status and identifiers are known (common success case)
+- log a single summary line instead of writing the full payload to the
+  transaction audit files (callers already log complete request/response via
+  ``log_transaction``)
+
+Response shapes the fast path does not handle (non-HL7 default namespace,
+missing acknowledgement element, SOAP faults inside registry responses) fall
+through to the reference parsers so results and error messages stay identical.
+"""
+
+import io
+import logging
+import threading
+from typing import List, Optional, Tuple
+
+from lxml import etree
+
+from ihe_test_util.ihe_transactions import parsers
+from ihe_test_util.ihe_transactions.parsers import (
+    DOCUMENT_UNIQUE_ID_SCHEME,
+    ERROR_SEVERITY_ERROR,
+    HL7_NS,
+    REGISTRY_SUCCESS,
+    RIM_NS,
+    RS_NS,
+    SOAP_11_NS,
+    SOAP_NS,
+    SUBMISSION_SET_UNIQUE_ID_SCHEME,
+    WSA_NS,
+    AcknowledgmentDetail,
+    AcknowledgmentResponse,
+    RegistryErrorInfo,
+    RegistryResponse,
+    SOAPFaultInfo,
+)
+
+logger = logging.getLogger(__name__)
+
+# Default cap on response body size (10 MiB). Acknowledgments and registry
+# responses are a few KB; anything this large is almost certainly an error page
+# or a misrouted payload.
+MAX_RESPONSE_BYTES = 10 * 1024 * 1024
+
+_NAMESPACES = {
+    "hl7": HL7_NS,
+    "soap12": SOAP_NS,
+    "soap11": SOAP_11_NS,
+    "rs": RS_NS,
+    "rim": RIM_NS,
+    "wsa": WSA_NS,
+}
+
+
+def _xpath(expression: str) -> etree.XPath:
+    """Compile an XPath expression against the shared namespace map."""
+    return etree.XPath(expression, namespaces=_NAMESPACES)
+
+
+# HL7v3 acknowledgment paths
+_ACK_MESSAGE_ID = _xpath("(.//hl7:id)[1]")
+_ACK_ELEMENT = _xpath("(.//hl7:acknowledgement)[1]")
+_ACK_TYPE_CODE = _xpath("(.//hl7:typeCode)[1]/@code")
+_ACK_HAS_TYPE_CODE = _xpath("boolean(.//hl7:typeCode)")
+_ACK_TARGET_ID = _xpath("(.//hl7:targetMessage)[1]/descendant::hl7:id[1]")
+_ACK_DETAILS = _xpath(".//hl7:acknowledgementDetail")
+_ACK_DETAIL_TEXT = _xpath("(.//hl7:text)[1]")
+_ACK_DETAIL_CODE = _xpath("(.//hl7:code)[1]")
+_ACK_PATIENT_IDS = _xpath(
+    ".//hl7:controlActProcess//hl7:subject//hl7:registrationEvent"
+    "//hl7:subject1//hl7:patient//hl7:id"
+)
+_ACK_HAS_QUERY_ACK = _xpath("boolean(.//hl7:controlActProcess//hl7:queryAck)")
+
+# Status codes the reference parser accepts without a warning
+_ACK_STATUS_CODES = ("AA", "AE", "AR", "CA", "CE", "CR")
+
+# XDSb registry response paths
+_RR_FAULT = _xpath("boolean(.//soap12:Fault)")
+_RR_ELEMENT = _xpath("(.//rs:RegistryResponse)[1]")
+_RR_DOCUMENT_IDS = _xpath(
+    ".//rim:ExtrinsicObject/rim:ExternalIdentifier"
+    "[@identificationScheme=$scheme]/@value"
+)
+_RR_SUBMISSION_SET_ID = _xpath(
+    "(.//rim:RegistryPackage/rim:ExternalIdentifier"
+    "[@identificationScheme=$scheme])[1]/@value"
+)
+_RR_ERRORS = _xpath("(.//rs:RegistryErrorList)[1]//rs:RegistryError")
+_WSA_MESSAGE_ID = _xpath("(.//wsa:MessageID)[1]/text()")
+_WSA_RELATES_TO = _xpath("(.//wsa:RelatesTo)[1]/text()")
+
+# SOAP fault paths
+_FAULT_12 = _xpath("(.//soap12:Fault)[1]")
+_FAULT_11 = _xpath("(.//soap11:Fault)[1]")
+_FAULT_12_CODE = _xpath("(.//soap12:Code/soap12:Value)[1]")
+_FAULT_12_SUBCODES = _xpath(".//soap12:Subcode/soap12:Value/text()")
+_FAULT_12_REASON = _xpath("(.//soap12:Reason/soap12:Text)[1]")
+_FAULT_12_DETAIL = _xpath("(.//soap12:Detail)[1]")
+_FAULT_12_ROLE = _xpath("(.//soap12:Role)[1]")
+_FAULT_11_CODE = _xpath("faultcode[1]")
+_FAULT_11_STRING = _xpath("faultstring[1]")
+_FAULT_11_DETAIL = _xpath("detail[1]")
+_FAULT_11_ACTOR = _xpath("faultactor[1]")
+
+# Streaming tags
+_TAG_MESSAGE_ID = f"{{{WSA_NS}}}MessageID"
+_TAG_RELATES_TO = f"{{{WSA_NS}}}RelatesTo"
+_TAG_FAULT = f"{{{SOAP_NS}}}Fault"
+_TAG_REGISTRY_RESPONSE = f"{{{RS_NS}}}RegistryResponse"
+_TAG_ERROR_LIST = f"{{{RS_NS}}}RegistryErrorList"
+_TAG_EXTERNAL_IDENTIFIER = f"{{{RIM_NS}}}ExternalIdentifier"
+_TAG_EXTRINSIC_OBJECT = f"{{{RIM_NS}}}ExtrinsicObject"
+_TAG_REGISTRY_PACKAGE = f"{{{RIM_NS}}}RegistryPackage"
+
+_HARDENED_PARSER_OPTIONS = {
+    "resolve_entities": False,
+    "no_network": True,
+    "load_dtd": False,
+    "huge_tree": False,
+}
+
+# lxml parser objects must not be used from several threads at once, so each
+# worker thread gets its own reusable instance.
+_thread_local = threading.local()
+
+
+def get_hardened_parser() -> etree.XMLParser:
+    """Return the calling thread's reusable hardened XML parser.
+
+    The parser disables DTD loading, entity resolution, network access and
+    libxml2's huge-tree mode, which protects against entity-expansion and
+    external-entity attacks from untrusted endpoints.
+
+    Returns:
+        Thread-local ``etree.XMLParser`` instance
+    """
+    parser = getattr(_thread_local, "parser", None)
+    if parser is None:
+        parser = etree.XMLParser(**_HARDENED_PARSER_OPTIONS)
+        _thread_local.parser = parser
+    return parser
+
+
+def _to_bytes(xml: str | bytes, max_bytes: Optional[int]) -> bytes:
+    """Encode response XML and enforce the size cap.
+
+    Args:
+        xml: Response XML as str or bytes
+        max_bytes: Maximum accepted size in bytes (None disables the check)
+
+    Returns:
+        Response XML as UTF-8 bytes
+
+    Raises:
+        ValueError: If the body exceeds ``max_bytes``
+    """
+    data = xml if isinstance(xml, bytes) else xml.encode("utf-8")
+    if max_bytes is not None and len(data) > max_bytes:
+        raise ValueError(
+            f"Response body of {len(data)} bytes exceeds the {max_bytes} byte limit. "
+            "Check the endpoint URL or raise max_bytes for this parser."
+        )
+    return data
+
+
+def _parse_tree(data: bytes, error_prefix: str, hint: str) -> etree._Element:
+    """Parse bytes with the hardened parser, mapping syntax errors to ValueError."""
+    try:
+        return etree.fromstring(data, parser=get_hardened_parser())
+    except etree.XMLSyntaxError as e:
+        raise ValueError(f"{error_prefix}: {e}. {hint}") from e
+
+
+def _format_ii(elem: Optional[etree._Element]) -> Optional[str]:
+    """Format an HL7 II element as ``root::extension`` (or ``root``)."""
+    if elem is None:
+        return None
+    root = elem.get("root")
+    if not root:
+        return None
+    extension = elem.get("extension")
+    return f"{root}::{extension}" if extension else root
+
+
+def _first(results: list) -> Optional[etree._Element]:
+    """Return the first XPath result or None."""
+    return results[0] if results else None
+
+
+def fast_parse_acknowledgment(
+    ack_xml: str | bytes,
+    max_bytes: Optional[int] = MAX_RESPONSE_BYTES,
+) -> AcknowledgmentResponse:
+    """Parse HL7v3 MCCI_IN000002UV01 acknowledgment with compiled XPath.
+
+    Produces the same result as :func:`parsers.parse_acknowledgment`. Documents
+    whose default namespace is not HL7v3 are delegated to the reference parser.
+
+    Args:
+        ack_xml: XML string or bytes containing the acknowledgment message
+        max_bytes: Maximum accepted body size (default 10 MiB, None disables)
+
+    Returns:
+        AcknowledgmentResponse with parsed acknowledgment data
+
+    Raises:
+        ValueError: If XML is malformed, oversized or missing required elements
+
+    Example:
+        >>> ack = fast_parse_acknowledgment(response_xml)
+        >>> ack.status
+        'AA'
+    """
+    data = _to_bytes(ack_xml, max_bytes)
+    root = _parse_tree(
+        data,
+        "Invalid acknowledgment XML",
+        "Check if response is valid HL7v3 MCCI_IN000002UV01 message.",
+    )
+
+    ack_elem = _first(_ACK_ELEMENT(root))
+    if ack_elem is None or root.nsmap.get(None, HL7_NS) != HL7_NS:
+        # Namespace fallbacks and error reporting live in the reference parser
+        return parsers.parse_acknowledgment(data)
+
+    status_values = _ACK_TYPE_CODE(ack_elem)
+    if not status_values:
+        if _ACK_HAS_TYPE_CODE(ack_elem):
+            raise ValueError(
+                "typeCode element missing 'code' attribute. "
+                "Expected attribute with value: AA, AE, AR, CA, CE, or CR"
+            )
+        raise ValueError(
+            "No typeCode element found in acknowledgement. "
+            "Expected element: <typeCode code='AA|AE|AR|CA|CE|CR'/>"
+        )
+    status = str(status_values[0])
+    if not status:
+        raise ValueError(
+            "typeCode element missing 'code' attribute. "
+            "Expected attribute with value: AA, AE, AR, CA, CE, or CR"
+        )
+    if status not in _ACK_STATUS_CODES:
+        logger.warning(
+            f"Unknown acknowledgment status code '{status}'. "
+            f"Expected one of: {', '.join(_ACK_STATUS_CODES)}"
+        )
+
+    details: List[AcknowledgmentDetail] = []
+    for detail_elem in _ACK_DETAILS(ack_elem):
+        text_elem = _first(_ACK_DETAIL_TEXT(detail_elem))
+        code_elem = _first(_ACK_DETAIL_CODE(detail_elem))
+        details.append(
+            AcknowledgmentDetail(
+                type_code=detail_elem.get("typeCode", "E"),
+                text=(
+                    text_elem.text
+                    if text_elem is not None and text_elem.text
+                    else "No detail message provided"
+                ),
+                code=code_elem.get("code") if code_elem is not None else None,
+                code_system=(
+                    code_elem.get("codeSystem") if code_elem is not None else None
+                ),
+            )
+        )
+
+    patient_identifiers: dict = {}
+    patient_elems = _ACK_PATIENT_IDS(root)
+    if patient_elems:
+        first_id = patient_elems[0]
+        if first_id.get("extension"):
+            patient_identifiers["patient_id"] = first_id.get("extension")
+            patient_identifiers["patient_id_root"] = first_id.get("root")
+        additional_ids = [
+            {"root": elem.get("root"), "extension": elem.get("extension")}
+            for elem in patient_elems[1:]
+            if elem.get("root") and elem.get("extension")
+        ]
+        if additional_ids:
+            patient_identifiers["additional_ids"] = additional_ids
+
+    # Query continuation is rare in PIX Add; reuse the reference extractor
+    query_continuation = (
+        parsers._extract_query_continuation(root) if _ACK_HAS_QUERY_ACK(root) else None
+    )
+
+    response = AcknowledgmentResponse(
+        status=status,
+        is_success=status in ("AA", "CA"),
+        message_id=_format_ii(_first(_ACK_MESSAGE_ID(root))),
+        target_message_id=_format_ii(_first(_ACK_TARGET_ID(ack_elem))),
+        details=details,
+        patient_identifiers=patient_identifiers,
+        query_continuation=query_continuation,
+    )
+
+    logger.debug(
+        "Fast-parsed acknowledgment: status=%s, details=%d, patient_ids=%d",
+        status,
+        len(details),
+        len(patient_identifiers),
+    )
+    return response
+
+
+def _stream_registry_success(data: bytes) -> Optional[RegistryResponse]:
+    """Stream a registry response and stop once status and IDs are known.
+
+    Only handles the common success case. Returns None as soon as anything
+    else is seen (SOAP fault, non-success status, error list) so the caller
+    can fall back to the tree parser.
+
+    Args:
+        data: Response XML bytes
+
+    Returns:
+        RegistryResponse for a plain success response, otherwise None
+
+    Raises:
+        ValueError: If the XML is malformed
+    """
+    response_id: Optional[str] = None
+    request_id: Optional[str] = None
+    submission_set_id: Optional[str] = None
+    document_ids: List[str] = []
+    saw_registry_response = False
+
+    events = etree.iterparse(
+        io.BytesIO(data), events=("start", "end"), **_HARDENED_PARSER_OPTIONS
+    )
+    try:
+        for event, elem in events:
+            tag = elem.tag
+            if event == "start":
+                if tag == _TAG_FAULT or tag == _TAG_ERROR_LIST:
+                    return None
+                if tag == _TAG_REGISTRY_RESPONSE:
+                    if elem.get("status") != REGISTRY_SUCCESS:
+                        return None
+                    saw_registry_response = True
+                continue
+
+            if tag == _TAG_MESSAGE_ID:
+                if response_id is None and elem.text:
+                    response_id = elem.text
+            elif tag == _TAG_RELATES_TO:
+                if request_id is None and elem.text:
+                    request_id = elem.text
+            elif tag == _TAG_EXTERNAL_IDENTIFIER:
+                parent = elem.getparent()
+                scheme = elem.get("identificationScheme")
+                value = elem.get("value")
+                if parent is not None and value:
+                    if (
+                        parent.tag == _TAG_EXTRINSIC_OBJECT
+                        and scheme == DOCUMENT_UNIQUE_ID_SCHEME
+                    ):
+                        document_ids.append(value)
+                    elif (
+                        parent.tag == _TAG_REGISTRY_PACKAGE
+                        and scheme == SUBMISSION_SET_UNIQUE_ID_SCHEME
+                        and submission_set_id is None
+                    ):
+                        submission_set_id = value
+            elif tag == _TAG_EXTRINSIC_OBJECT or tag == _TAG_REGISTRY_PACKAGE:
+                # Identifiers already collected; release the subtree
+                elem.clear()
+            elif tag == _TAG_REGISTRY_RESPONSE:
+                break
+    except etree.XMLSyntaxError as e:
+        raise ValueError(
+            f"Invalid registry response XML: {e}. "
+            "Check if response is valid SOAP envelope with XDSb RegistryResponse. "
+            "Verify the XDSb repository endpoint is responding correctly."
+        ) from e
+
+    if not saw_registry_response:
+        return None
+
+    return RegistryResponse(
+        status="Success",
+        is_success=True,
+        response_id=response_id,
+        submission_set_id=submission_set_id,
+        document_ids=document_ids,
+        request_id=request_id,
+    )
+
+
+def _extract_registry_errors(
+    registry_response: etree._Element,
+) -> Tuple[List[RegistryErrorInfo], List[RegistryErrorInfo]]:
+    """Split RegistryErrorList entries into errors and warnings."""
+    errors: List[RegistryErrorInfo] = []
+    warnings: List[RegistryErrorInfo] = []
+    for error_elem in _RR_ERRORS(registry_response):
+        info = RegistryErrorInfo(
+            error_code=error_elem.get("errorCode", "Unknown"),
+            code_context=error_elem.get("codeContext", "No context provided"),
+            severity=parsers._map_error_severity_to_string(
+                error_elem.get("severity", ERROR_SEVERITY_ERROR)
+            ),
+            location=error_elem.get("location"),
+        )
+        if info.severity == "Warning":
+            warnings.append(info)
+        else:
+            errors.append(info)
+    return errors, warnings
+
+
+def fast_parse_registry_response(
+    response_xml: str | bytes,
+    streaming: bool = False,
+    max_bytes: Optional[int] = MAX_RESPONSE_BYTES,
+) -> RegistryResponse:
+    """Parse XDSb RegistryResponse from ITI-41 SOAP response with compiled XPath.
+
+    Produces the same result as :func:`parsers.parse_registry_response` without
+    writing the full payload to the registry audit log. SOAP faults are
+    delegated to the reference parser.
+
+    Args:
+        response_xml: Complete SOAP response XML (str or bytes)
+        streaming: Use the ``iterparse`` fast path, which stops after the
+            RegistryResponse element for plain success responses and falls
+            back to tree parsing for anything else
+        max_bytes: Maximum accepted body size (default 10 MiB, None disables)
+
+    Returns:
+        RegistryResponse with parsed status, IDs, and errors
+
+    Raises:
+        ValueError: If XML is malformed, oversized or missing required elements
+
+    Example:
+        >>> response = fast_parse_registry_response(response_xml, streaming=True)
+        >>> response.document_ids
+        ['1.2.3.4.5.6.7.8.9.2000']
+    """
+    data = _to_bytes(response_xml, max_bytes)
+
+    if streaming:
+        streamed = _stream_registry_success(data)
+        if streamed is not None:
+            logger.debug(
+                "Stream-parsed registry response: status=Success, documents=%d",
+                len(streamed.document_ids),
+            )
+            return streamed
+
+    root = _parse_tree(
+        data,
+        "Invalid registry response XML",
+        "Check if response is valid SOAP envelope with XDSb RegistryResponse. "
+        "Verify the XDSb repository endpoint is responding correctly.",
+    )
+
+    if _RR_FAULT(root):
+        return parsers.parse_registry_response(data)
+
+    registry_response = _first(_RR_ELEMENT(root))
+    if registry_response is None:
+        raise ValueError(
+            "No RegistryResponse element found in SOAP response. "
+            "Expected element: <rs:RegistryResponse> with namespace "
+            f"'{RS_NS}'. Verify the XDSb repository returned a valid response."
+        )
+
+    status_uri = registry_response.get("status", "")
+    if not status_uri:
+        raise ValueError(
+            "RegistryResponse element missing 'status' attribute. "
+            "Expected attribute with value like "
+            "'urn:oasis:names:tc:ebxml-regrep:ResponseStatusType:Success'. "
+            "Check XDSb repository response format."
+        )
+
+    status = parsers._map_registry_status_to_string(status_uri)
+    submission_set_ids = _RR_SUBMISSION_SET_ID(
+        root, scheme=SUBMISSION_SET_UNIQUE_ID_SCHEME
+    )
+    response_ids = _WSA_MESSAGE_ID(root)
+    request_ids = _WSA_RELATES_TO(root)
+    errors, warnings = _extract_registry_errors(registry_response)
+
+    response = RegistryResponse(
+        status=status,
+        is_success=status == "Success",
+        response_id=str(response_ids[0]) if response_ids else None,
+        submission_set_id=str(submission_set_ids[0]) if submission_set_ids else None,
+        document_ids=[
+            str(value)
+            for value in _RR_DOCUMENT_IDS(root, scheme=DOCUMENT_UNIQUE_ID_SCHEME)
+            if value
+        ],
+        errors=errors,
+        warnings=warnings,
+        request_id=str(request_ids[0]) if request_ids else None,
+    )
+
+    logger.debug(
+        "Fast-parsed registry response: status=%s, documents=%d, errors=%d, warnings=%d",
+        status,
+        len(response.document_ids),
+        len(errors),
+        len(warnings),
+    )
+    return response
+
+
+def _detail_text(detail_elem: Optional[etree._Element]) -> Optional[str]:
+    """Flatten a SOAP fault detail element the same way as the reference parser."""
+    if detail_elem is None:
+        return None
+    if detail_elem.text and detail_elem.text.strip():
+        return detail_elem.text.strip()
+    parts = [
+        child.text.strip() for child in detail_elem if child.text and child.text.strip()
+    ]
+    return "; ".join(parts) if parts else None
+
+
+def _element_text(elem: Optional[etree._Element], default: Optional[str]) -> Optional[str]:
+    """Return element text, or ``default`` when the element is missing."""
+    return elem.text if elem is not None else default
+
+
+def fast_parse_soap_fault(
+    fault_xml: str | bytes,
+    max_bytes: Optional[int] = MAX_RESPONSE_BYTES,
+) -> SOAPFaultInfo:
+    """Parse SOAP 1.1 or 1.2 fault with compiled XPath.
+
+    Produces the same result as :func:`parsers.parse_soap_fault`.
+
+    Args:
+        fault_xml: XML string or bytes containing SOAP envelope with fault
+        max_bytes: Maximum accepted body size (default 10 MiB, None disables)
+
+    Returns:
+        SOAPFaultInfo with parsed fault details
+
+    Raises:
+        ValueError: If XML is malformed, oversized or not a SOAP fault
+    """
+    data = _to_bytes(fault_xml, max_bytes)
+    root = _parse_tree(data, "Invalid SOAP fault XML", "Response is not valid XML.")
+
+    fault_elem = _first(_FAULT_12(root))
+    if fault_elem is not None:
+        fault_info = SOAPFaultInfo(
+            fault_code=_element_text(_first(_FAULT_12_CODE(fault_elem)), "Unknown"),
+            fault_string=_element_text(
+                _first(_FAULT_12_REASON(fault_elem)), "No fault message provided"
+            ),
+            fault_detail=_detail_text(_first(_FAULT_12_DETAIL(fault_elem))),
+            fault_actor=_element_text(_first(_FAULT_12_ROLE(fault_elem)), None),
+            subcodes=[str(code) for code in _FAULT_12_SUBCODES(fault_elem)],
+        )
+    else:
+        fault_elem = _first(_FAULT_11(root))
+        if fault_elem is None:
+            raise ValueError(
+                "No SOAP Fault element found in response. "
+                "Expected <SOAP-ENV:Fault> element in SOAP envelope."
+            )
+        fault_info = SOAPFaultInfo(
+            fault_code=_element_text(_first(_FAULT_11_CODE(fault_elem)), "Unknown"),
+            fault_string=_element_text(
+                _first(_FAULT_11_STRING(fault_elem)), "No fault message provided"
+            ),
+            fault_detail=_detail_text(_first(_FAULT_11_DETAIL(fault_elem))),
+            fault_actor=_element_text(_first(_FAULT_11_ACTOR(fault_elem)), None),
+            subcodes=[],
+        )
+
+    logger.error(
+        "SOAP Fault received - Code: %s, Message: %s",
+        fault_info.fault_code,
+        fault_info.fault_string,
+    )
+    return fault_info
@@ -11,17 +11,17 @@ import logging
 import ssl
 import time
 import uuid
+from contextlib import nullcontext
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Optional, Sequence
 
 import requests
 from lxml import etree
 
+from ihe_test_util.ihe_transactions.metrics import get_client_metrics
 from ihe_test_util.ihe_transactions.mtom import MTOMPackage, MTOMAttachment
-from ihe_test_util.ihe_transactions.parsers import (
-    parse_registry_response,
-    RegistryResponse,
-)
+from ihe_test_util.ihe_transactions.fast_parsers import fast_parse_registry_response
+from ihe_test_util.ihe_transactions.parsers import RegistryResponse
 from ihe_test_util.logging_audit.audit import log_transaction
 from ihe_test_util.models.responses import (
     TransactionResponse,
@@ -30,7 +30,14 @@ from ihe_test_util.models.responses import (
 )
 from ihe_test_util.models.saml import SAMLAssertion
 from ihe_test_util.models.transactions import ITI41Transaction
+from ihe_test_util.profiling.tracing import span, trace_context
 from ihe_test_util.saml.ws_security import WSSecurityHeaderBuilder
+from ihe_test_util.transport.load_balancer import (
+    DEFAULT_EJECTION_SECONDS,
+    DEFAULT_FAILURE_THRESHOLD,
+    BalancingStrategy,
+    EndpointPool,
+)
 from ihe_test_util.utils.exceptions import (
     ITI41SOAPError,
     ITI41TimeoutError,
@@ -70,8 +77,9 @@ class ITI41SOAPClient:
     headers, WS-Security with SAML assertions, and comprehensive retry logic.
     
     Attributes:
-        endpoint_url: The ITI-41 endpoint URL
+        endpoint_url: The ITI-41 endpoint URL (the first one when load balancing)
         timeout: Request timeout in seconds
+        endpoint_pool: Endpoints each attempt is balanced over
     
     Example:
         >>> client = ITI41SOAPClient("http://localhost:8080/iti41/submit")
@@ -86,6 +94,10 @@ class ITI41SOAPClient:
         timeout: int = 60,
         verify_tls: bool = True,
         ca_bundle_path: Optional[str] = None,
+        endpoints: Optional[Sequence[tuple[str, int]]] = None,
+        load_balancing: str = BalancingStrategy.ROUND_ROBIN.value,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        ejection_seconds: float = DEFAULT_EJECTION_SECONDS,
     ) -> None:
         """Initialize ITI-41 client.
         
@@ -94,16 +106,30 @@ class ITI41SOAPClient:
             timeout: Request timeout in seconds (default 60)
             verify_tls: Whether to verify TLS certificates (default True)
             ca_bundle_path: Optional path to CA certificate bundle
+            endpoints: (url, weight) pairs to load balance over instead of
+                endpoint_url alone
+            load_balancing: Endpoint selection strategy (round_robin,
+                weighted, least_outstanding)
+            failure_threshold: Consecutive failures that eject an endpoint
+            ejection_seconds: How long an ejected endpoint is skipped
         """
         self._endpoint_url = endpoint_url
         self._timeout = timeout
         self._verify_tls = verify_tls
         self._ca_bundle_path = ca_bundle_path
-        self._session = self._create_session()
+        self._endpoint_pool = EndpointPool(
+            "iti41",
+            list(endpoints) if endpoints else [(endpoint_url, 1)],
+            strategy=BalancingStrategy(load_balancing),
+            failure_threshold=failure_threshold,
+            ejection_seconds=ejection_seconds,
+            session_factory=self._create_session,
+        )
+        self._session = self._endpoint_pool.sessions[0]
         self._ws_security_builder = WSSecurityHeaderBuilder()
         
         # Log HTTP warning
-        if endpoint_url.startswith("http://"):
+        if any(url.startswith("http://") for url in self._endpoint_pool.urls):
             logger.warning(
                 "WARNING: Using HTTP transport for ITI-41. "
                 "HTTPS recommended for production environments."
@@ -124,6 +150,16 @@ class ITI41SOAPClient:
         """Get the request timeout in seconds."""
         return self._timeout
 
+    @property
+    def session(self) -> requests.Session:
+        """Get the HTTP session (e.g. to mount a custom transport adapter)."""
+        return self._session
+
+    @property
+    def endpoint_pool(self) -> EndpointPool:
+        """Get the endpoint pool (one session per endpoint)."""
+        return self._endpoint_pool
+
     def _create_session(self) -> requests.Session:
         """Create HTTP session with TLS 1.2+ configuration.
         
@@ -134,7 +170,7 @@ class ITI41SOAPClient:
         
         # Configure TLS 1.2 minimum via SSLContext
         # Note: requests uses urllib3 which respects ssl context settings
-        if self._endpoint_url.startswith("https://"):
+        if self._endpoint_url and self._endpoint_url.startswith("https://"):
             # TLS 1.2+ is enforced by default in modern Python/requests
             # Additional configuration can be done via HTTPAdapter if needed
             logger.debug("HTTPS transport configured with TLS 1.2+ enforcement")
@@ -173,11 +209,12 @@ class ITI41SOAPClient:
         
         try:
             # Build SOAP envelope with WS-Addressing and WS-Security
-            soap_envelope = self._build_soap_envelope(
-                xdsb_metadata=transaction.metadata_xml,
-                message_id=message_id,
-                saml_assertion=saml_assertion,
-            )
+            with span("iti41.build_envelope", "iti41", transaction_id=message_id):
+                soap_envelope = self._build_soap_envelope(
+                    xdsb_metadata=transaction.metadata_xml,
+                    message_id=message_id,
+                    saml_assertion=saml_assertion,
+                )
             
             # Create MTOM attachment for CCD document
             content_id = transaction.mtom_content_id or f"{uuid.uuid4()}@ihe-test-util.local"
@@ -192,27 +229,29 @@ class ITI41SOAPClient:
             )
             
             # Package with MTOM
-            mtom_package = MTOMPackage(soap_envelope)
-            mtom_package.add_attachment(attachment)
+            with span("iti41.build_mtom", "iti41", transaction_id=message_id) as mtom_span:
+                mtom_package = MTOMPackage(soap_envelope)
+                mtom_package.add_attachment(attachment)
             
-            # Validate MTOM package
-            is_valid, errors = mtom_package.validate()
-            if not is_valid:
-                raise ITI41SOAPError(
-                    f"MTOM package validation failed: {'; '.join(errors)}. "
-                    "Verify SOAP envelope structure and attachment references."
-                )
+                # Validate MTOM package
+                is_valid, errors = mtom_package.validate()
+                if not is_valid:
+                    raise ITI41SOAPError(
+                        f"MTOM package validation failed: {'; '.join(errors)}. "
+                        "Verify SOAP envelope structure and attachment references."
+                    )
             
-            # Build MTOM message
-            message_bytes, content_type = mtom_package.build()
+                # Build MTOM message
+                message_bytes, content_type = mtom_package.build()
+                mtom_span.set(bytes=len(message_bytes))
             
             # Submit with retry logic
-            response = self._submit_with_retry(
-                url=self._endpoint_url,
-                data=message_bytes,
-                headers={"Content-Type": content_type},
-                max_retries=MAX_RETRIES,
-            )
+            with trace_context(transaction_id=message_id):
+                response = self._submit_with_retry(
+                    data=message_bytes,
+                    headers={"Content-Type": content_type},
+                    max_retries=MAX_RETRIES,
+                )
             
             # Calculate processing time
             processing_time_ms = int((time.time() - start_time) * 1000)
@@ -223,11 +262,17 @@ class ITI41SOAPClient:
                 response_xml=response.text,
                 duration_ms=processing_time_ms,
                 message_id=message_id,
+                patient_id=transaction.patient_id,
+                document_xml=ccd_content if isinstance(ccd_content, str) else None,
             )
             
-            # Parse response using new parser from parsers module
+            # Parse response (fast path; falls back to the reference parser
+            # for SOAP faults and unusual shapes)
             try:
-                parsed_response = parse_registry_response(response.text)
+                with span("iti41.parse_response", "iti41", transaction_id=message_id):
+                    parsed_response = fast_parse_registry_response(
+                        response.text, streaming=True
+                    )
             except ValueError as e:
                 # Fall back to error response if parsing fails
                 logger.error(f"Failed to parse registry response: {e}")
@@ -422,9 +467,9 @@ class ITI41SOAPClient:
 
     def _submit_with_retry(
         self,
-        url: str,
-        data: bytes,
-        headers: dict,
+        url: Optional[str] = None,
+        data: bytes = b"",
+        headers: Optional[dict] = None,
         max_retries: int = 3,
     ) -> requests.Response:
         """Submit HTTP request with exponential backoff retry.
@@ -432,8 +477,12 @@ class ITI41SOAPClient:
         Retries on transient errors: ConnectionError, Timeout, 503 Service Unavailable.
         Does NOT retry on: 400 Bad Request, 401 Unauthorized, 500 Internal Server Error.
         
+        Without a url, each attempt leases an endpoint from the pool, so a
+        retry can go to another node; transient errors and 5xx responses
+        count against that endpoint's health.
+        
         Args:
-            url: Target URL
+            url: Target URL (default: balance over the configured endpoints)
             data: Request body bytes
             headers: HTTP headers
             max_retries: Maximum retry attempts
@@ -446,19 +495,32 @@ class ITI41SOAPClient:
             ITI41TimeoutError: On timeout
         """
         last_exception = None
+        requested_url = url
         
         for attempt in range(max_retries + 1):
+            url = requested_url or self._endpoint_url
             try:
                 # Configure TLS verification
                 verify = self._ca_bundle_path if self._ca_bundle_path else self._verify_tls
+                lease_context = self._endpoint_pool.lease() if requested_url is None else nullcontext()
                 
-                response = self._session.post(
-                    url,
-                    data=data,
-                    headers=headers,
-                    timeout=self._timeout,
-                    verify=verify,
-                )
+                with span("http.post", "http", transaction="ITI_41", attempt=attempt + 1) as http_span, \
+                        get_client_metrics().track_request("iti41", len(data), attempt + 1) as request, \
+                        lease_context as lease:
+                    session = self._session
+                    if lease is not None:
+                        url, session = lease.url, lease.session
+                    response = session.post(
+                        url,
+                        data=data,
+                        headers=headers,
+                        timeout=self._timeout,
+                        verify=verify,
+                    )
+                    http_span.set(status_code=response.status_code)
+                    request.set_response(response)
+                    if lease is not None and response.status_code >= 500:
+                        lease.fail()
                 
                 # Check for retryable status codes
                 if response.status_code in RETRYABLE_STATUS_CODES:
@@ -468,7 +530,8 @@ class ITI41SOAPClient:
                             f"Received {response.status_code} response, "
                             f"retrying in {delay}s (attempt {attempt + 1}/{max_retries})"
                         )
-                        time.sleep(delay)
+                        with span("http.backoff", "http", attempt=attempt + 1, delay_s=delay):
+                            time.sleep(delay)
                         continue
                 
                 # Check for non-retryable errors
@@ -499,7 +562,8 @@ class ITI41SOAPClient:
                         f"Request timeout, retrying in {delay}s "
                         f"(attempt {attempt + 1}/{max_retries}): {e}"
                     )
-                    time.sleep(delay)
+                    with span("http.backoff", "http", attempt=attempt + 1, delay_s=delay):
+                        time.sleep(delay)
                 else:
                     raise ITI41TimeoutError(
                         f"Request to {url} timed out after {max_retries} retries. "
@@ -515,7 +579,8 @@ class ITI41SOAPClient:
                         f"Connection error, retrying in {delay}s "
                         f"(attempt {attempt + 1}/{max_retries}): {e}"
                     )
-                    time.sleep(delay)
+                    with span("http.backoff", "http", attempt=attempt + 1, delay_s=delay):
+                        time.sleep(delay)
                 else:
                     raise ITI41TransportError(
                         f"Connection to {url} failed after {max_retries} retries. "
@@ -534,6 +599,8 @@ class ITI41SOAPClient:
         response_xml: str,
         duration_ms: int,
         message_id: str,
+        patient_id: Optional[str] = None,
+        document_xml: Optional[str] = None,
     ) -> None:
         """Log complete transaction per RULE 2.
         
@@ -542,12 +609,18 @@ class ITI41SOAPClient:
             response_xml: Complete SOAP response XML
             duration_ms: Transaction duration in milliseconds
             message_id: Message ID for correlation
+            patient_id: Patient the document belongs to
+            document_xml: CCD sent as the MTOM attachment (archived with the
+                transaction when a transaction archive is open)
         """
         log_transaction(
             transaction_type="ITI41_SUBMIT",
             request=request_xml,
             response=response_xml,
             status="success" if "Success" in response_xml else "failure",
+            message_id=message_id,
+            patient_id=patient_id,
+            attachments={"document": document_xml} if document_xml else None,
         )
         
         logger.info(
@@ -0,0 +1,436 @@
+"""Client-side metrics for batch and load runs.
+
+The batch engine records into a process-wide ``ClientMetrics`` registry:
+per-stage outcomes for every patient, errors by stage and
+``ErrorSummaryCollector`` category, and for each HTTP attempt the request
+count by status, retries, in-flight gauge, bytes sent/received and a
+latency histogram per transaction type.
+
+Long runs expose the registry while they are still going, either as a
+Prometheus textfile rewritten every few seconds (for node_exporter's
+textfile collector) or through a local ``/metrics`` scrape endpoint::
+
+    with metrics_exporters(textfile=Path("metrics/ihe.prom"), port=9464):
+        workflow.process_batch(csv_path)
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Iterator, Optional
+
+from ihe_test_util.utils.exceptions import ErrorCategory
+
+logger = logging.getLogger(__name__)
+
+TRANSACTIONS = ("pix_add", "iti41")
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+DEFAULT_TEXTFILE_INTERVAL = 15.0
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Histogram:
+    """Latency histogram with fixed buckets."""
+
+    __slots__ = ("buckets", "sum")
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # last: overflow
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.sum += seconds
+
+
+class RequestTracker:
+    """Times one HTTP attempt; see ``ClientMetrics.track_request``.
+
+    Attributes:
+        status_code: HTTP status, None until a response arrives
+        response_bytes: Response body size
+    """
+
+    __slots__ = ("_metrics", "_transaction", "_start", "status_code", "response_bytes")
+
+    def __init__(self, metrics: "ClientMetrics", transaction: str) -> None:
+        self._metrics = metrics
+        self._transaction = transaction
+        self._start = 0.0
+        self.status_code: Optional[int] = None
+        self.response_bytes = 0
+
+    def set_response(self, response: Any) -> None:
+        """Record the status and body size of the response."""
+        self.status_code = response.status_code
+        content = response.content
+        self.response_bytes = len(content) if isinstance(content, (bytes, bytearray)) else 0
+
+    def __enter__(self) -> "RequestTracker":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        status = str(self.status_code) if self.status_code is not None else "error"
+        self._metrics.request_finished(
+            self._transaction, status, time.perf_counter() - self._start, self.response_bytes
+        )
+
+
+class ClientMetrics:
+    """Thread-safe counters, gauges and histograms for the client side."""
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Zero every metric."""
+        with self._lock:
+            self._patients_total = 0
+            self._patients_processed = 0
+            self._stage_results: dict[tuple[str, str], int] = defaultdict(int)
+            self._errors: dict[tuple[str, str], int] = defaultdict(int)
+            self._requests: dict[tuple[str, str], int] = defaultdict(int)
+            self._retries: dict[str, int] = defaultdict(int)
+            self._in_flight: dict[str, int] = {transaction: 0 for transaction in TRANSACTIONS}
+            self._bytes_sent: dict[str, int] = defaultdict(int)
+            self._bytes_received: dict[str, int] = defaultdict(int)
+            self._latency: dict[str, _Histogram] = defaultdict(_Histogram)
+
+    def set_patients_total(self, count: int) -> None:
+        """Set the number of patients in the current batch."""
+        with self._lock:
+            self._patients_total = count
+
+    def observe_patient(self, ccd_generated: bool, pix_add_status: str, iti41_status: str) -> None:
+        """Count a processed patient and the outcome of each stage.
+
+        Args:
+            ccd_generated: Whether the CCD was generated
+            pix_add_status: "success", "failed", "skipped" or "pending" (not reached)
+            iti41_status: "success", "failed", "skipped" or "pending" (not reached)
+        """
+        with self._lock:
+            self._patients_processed += 1
+            self._stage_results[("ccd", "success" if ccd_generated else "failed")] += 1
+            if pix_add_status != "pending":
+                self._stage_results[("pix_add", pix_add_status)] += 1
+            if iti41_status != "pending":
+                self._stage_results[("iti41", iti41_status)] += 1
+
+    def observe_error(self, stage: str, category: ErrorCategory) -> None:
+        """Count an error by stage and error category."""
+        with self._lock:
+            self._errors[(stage, category.value.lower())] += 1
+
+    def track_request(self, transaction: str, bytes_sent: int, attempt: int = 1) -> RequestTracker:
+        """Count an HTTP attempt as in flight until the returned tracker exits.
+
+        Args:
+            transaction: "pix_add" or "iti41"
+            bytes_sent: Request body size
+            attempt: 1-based attempt number; later attempts count as retries
+
+        Example:
+            >>> with metrics.track_request("pix_add", len(body), attempt) as request:
+            ...     response = session.post(url, data=body)
+            ...     request.set_response(response)
+        """
+        with self._lock:
+            self._in_flight[transaction] = self._in_flight.get(transaction, 0) + 1
+            self._bytes_sent[transaction] += bytes_sent
+            if attempt > 1:
+                self._retries[transaction] += 1
+        return RequestTracker(self, transaction)
+
+    def request_finished(self, transaction: str, status: str, seconds: float, bytes_received: int) -> None:
+        """Record a finished HTTP attempt (called by ``RequestTracker``)."""
+        with self._lock:
+            self._in_flight[transaction] -= 1
+            self._requests[(transaction, status)] += 1
+            self._bytes_received[transaction] += bytes_received
+            self._latency[transaction].observe(seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return a consistent copy of every metric.
+
+        Returns:
+            Dict with patients_total, patients_processed, stage_results,
+            errors, requests (keyed by label tuples), retries, in_flight,
+            bytes_sent, bytes_received and latency (buckets, sum, count)
+        """
+        with self._lock:
+            return {
+                "patients_total": self._patients_total,
+                "patients_processed": self._patients_processed,
+                "stage_results": dict(self._stage_results),
+                "errors": dict(self._errors),
+                "requests": dict(self._requests),
+                "retries": dict(self._retries),
+                "in_flight": dict(self._in_flight),
+                "bytes_sent": dict(self._bytes_sent),
+                "bytes_received": dict(self._bytes_received),
+                "latency": {
+                    transaction: {
+                        "buckets": list(histogram.buckets),
+                        "sum": histogram.sum,
+                        "count": sum(histogram.buckets),
+                    }
+                    for transaction, histogram in self._latency.items()
+                },
+            }
+
+
+def _format_le(bound: float) -> str:
+    """Format a histogram bound the way Prometheus client libraries do."""
+    return repr(float(bound))
+
+
+def render_prometheus(snapshot: dict[str, Any]) -> str:
+    """Render a metrics snapshot in the Prometheus text exposition format.
+
+    Args:
+        snapshot: Output of ``ClientMetrics.snapshot``
+
+    Returns:
+        Exposition text (version 0.0.4)
+    """
+    lines = [
+        "# HELP ihe_client_patients Patients in the current batch.",
+        "# TYPE ihe_client_patients gauge",
+        f"ihe_client_patients {snapshot['patients_total']}",
+        "# HELP ihe_client_patients_processed_total Patients that finished the workflow.",
+        "# TYPE ihe_client_patients_processed_total counter",
+        f"ihe_client_patients_processed_total {snapshot['patients_processed']}",
+        "# HELP ihe_client_stage_results_total Patient outcomes by workflow stage.",
+        "# TYPE ihe_client_stage_results_total counter",
+    ]
+    for (stage, outcome), count in sorted(snapshot["stage_results"].items()):
+        lines.append(f'ihe_client_stage_results_total{{stage="{stage}",outcome="{outcome}"}} {count}')
+
+    lines += [
+        "# HELP ihe_client_errors_total Errors by workflow stage and error category.",
+        "# TYPE ihe_client_errors_total counter",
+    ]
+    for (stage, category), count in sorted(snapshot["errors"].items()):
+        lines.append(f'ihe_client_errors_total{{stage="{stage}",category="{category}"}} {count}')
+
+    lines += [
+        "# HELP ihe_client_requests_total HTTP attempts by transaction and status (error: no response).",
+        "# TYPE ihe_client_requests_total counter",
+    ]
+    for (transaction, status), count in sorted(snapshot["requests"].items()):
+        lines.append(f'ihe_client_requests_total{{transaction="{transaction}",status="{status}"}} {count}')
+
+    per_transaction = (
+        ("ihe_client_retries_total", "counter", "HTTP attempts after the first.", "retries"),
+        ("ihe_client_in_flight_requests", "gauge", "HTTP requests awaiting a response.", "in_flight"),
+        ("ihe_client_request_bytes_total", "counter", "Request body bytes sent.", "bytes_sent"),
+        ("ihe_client_response_bytes_total", "counter", "Response body bytes received.", "bytes_received"),
+    )
+    for name, metric_type, help_text, key in per_transaction:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+        for transaction in TRANSACTIONS:
+            lines.append(f'{name}{{transaction="{transaction}"}} {snapshot[key].get(transaction, 0)}')
+
+    lines += [
+        "# HELP ihe_client_request_seconds HTTP attempt latency by transaction.",
+        "# TYPE ihe_client_request_seconds histogram",
+    ]
+    for transaction, histogram in sorted(snapshot["latency"].items()):
+        labels = f'transaction="{transaction}"'
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, histogram["buckets"]):
+            cumulative += count
+            lines.append(f'ihe_client_request_seconds_bucket{{{labels},le="{_format_le(bound)}"}} {cumulative}')
+        lines.append(f'ihe_client_request_seconds_bucket{{{labels},le="+Inf"}} {histogram["count"]}')
+        lines.append(f"ihe_client_request_seconds_sum{{{labels}}} {histogram['sum']}")
+        lines.append(f"ihe_client_request_seconds_count{{{labels}}} {histogram['count']}")
+
+    return "\n".join(lines) + "\n"
+
+
+_metrics = ClientMetrics()
+
+
+def get_client_metrics() -> ClientMetrics:
+    """Return the registry the batch engine records into."""
+    return _metrics
+
+
+def write_textfile(path: Path, metrics: Optional[ClientMetrics] = None) -> None:
+    """Write the metrics as a Prometheus textfile.
+
+    The file is written next to its destination and renamed into place so
+    a collector never reads a partial file.
+
+    Args:
+        path: Destination, conventionally ending in ``.prom``
+        metrics: Registry to render (default: the process registry)
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temp_path.write_text(render_prometheus((metrics or _metrics).snapshot()), encoding="utf-8")
+    os.replace(temp_path, path)
+
+
+class TextfileWriter:
+    """Rewrites a Prometheus textfile periodically from a background thread."""
+
+    def __init__(
+        self,
+        path: Path,
+        interval: float = DEFAULT_TEXTFILE_INTERVAL,
+        metrics: Optional[ClientMetrics] = None,
+    ) -> None:
+        """Initialize writer.
+
+        Args:
+            path: Textfile destination
+            interval: Seconds between writes
+            metrics: Registry to render (default: the process registry)
+        """
+        self.path = path
+        self.interval = interval
+        self._metrics = metrics or _metrics
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def location(self) -> str:
+        """Where the metrics are published."""
+        return str(self.path)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                write_textfile(self.path, self._metrics)
+            except OSError as e:
+                logger.warning(f"Could not write metrics textfile {self.path}: {e}")
+
+    def start(self) -> None:
+        """Write the file now and then every ``interval`` seconds."""
+        write_textfile(self.path, self._metrics)
+        self._thread = threading.Thread(target=self._run, name="metrics-textfile", daemon=True)
+        self._thread.start()
+        logger.info(f"Writing client metrics to {self.path} every {self.interval:g}s")
+
+    def stop(self) -> None:
+        """Stop the thread and write the final values."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        write_textfile(self.path, self._metrics)
+
+
+class MetricsServer:
+    """Serves ``GET /metrics`` from a background thread."""
+
+    def __init__(self, port: int, host: str = "127.0.0.1", metrics: Optional[ClientMetrics] = None) -> None:
+        """Bind the server (port 0 picks a free port).
+
+        Args:
+            port: TCP port
+            host: Interface to listen on (local only by default)
+            metrics: Registry to serve (default: the process registry)
+        """
+        registry = metrics or _metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 - http.server naming
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render_prometheus(registry.snapshot()).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug(f"metrics scrape: {format % args}")
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Scrape URL."""
+        host, port = self._server.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode("ascii")
+        return f"http://{host}:{port}/metrics"
+
+    @property
+    def location(self) -> str:
+        """Where the metrics are published."""
+        return self.url
+
+    def start(self) -> None:
+        """Start serving."""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        logger.info(f"Serving client metrics at {self.url}")
+
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+
+@contextmanager
+def metrics_exporters(
+    textfile: Optional[Path] = None,
+    interval: float = DEFAULT_TEXTFILE_INTERVAL,
+    port: Optional[int] = None,
+    host: str = "127.0.0.1",
+) -> Iterator[list[Any]]:
+    """Export the process registry for the duration of the block.
+
+    Args:
+        textfile: Prometheus textfile to rewrite every ``interval`` seconds
+        interval: Seconds between textfile writes
+        port: Port for a local ``/metrics`` endpoint
+        host: Interface for the endpoint
+
+    Yields:
+        The started exporters (empty when neither is requested)
+    """
+    exporters: list[Any] = []
+    with ExitStack() as stack:
+        if textfile is not None:
+            writer = TextfileWriter(textfile, interval)
+            writer.start()
+            stack.callback(writer.stop)
+            exporters.append(writer)
+        if port is not None:
+            server = MetricsServer(port, host)
+            server.start()
+            stack.callback(server.stop)
+            exporters.append(server)
+        yield exporters
@@ -129,12 +129,12 @@ def log_acknowledgment_response(response_xml: str, status: str, message_id: str)
     
     # Log summary at INFO level
     audit_logger.info(
-        f"PIX Add Acknowledgment - Status: {status}, MessageID: {message_id}, "
-        f"Size: {len(response_xml)} bytes"
+        "PIX Add Acknowledgment - Status: %s, MessageID: %s, Size: %d bytes",
+        status, message_id, len(response_xml),
     )
     
     # Log complete response XML at DEBUG level (RULE 2)
-    audit_logger.debug(f"Response XML (MessageID: {message_id}):\n{response_xml}")
+    audit_logger.debug("Response XML (MessageID: %s):\n%s", message_id, response_xml)
 
 
 @dataclass
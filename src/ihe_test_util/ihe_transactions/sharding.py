@@ -0,0 +1,349 @@
+"""Sharded batch execution across processes and machines.
+
+Two ways to split one CSV between several ``submit batch`` workers:
+
+Static shards (``--shard i/N``):
+    Worker i (1-based) processes every N-th row starting at row i, so
+    shards stay balanced even when slow patients cluster in the file. No
+    coordination is needed, but a crashed worker's rows are not picked up
+    by the others.
+
+Shared work queue (``--work-queue FILE``):
+    The first worker splits the CSV into ranges of rows stored in a SQLite
+    database. Each worker leases the next free range, heartbeats while it
+    processes it and marks it done. A range whose lease expires because its
+    worker crashed or stalled goes to the next worker that asks, so work is
+    processed at least once; a reclaimed range is processed again from its
+    first row.
+
+Workers on several machines need the database on a shared filesystem with
+working file locks, and roughly synchronized clocks (lease expiry uses
+wall-clock time).
+
+Each worker writes its own results file; ``submit merge`` combines them.
+"""
+
+import logging
+import os
+import re
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RANGE_SIZE = 25
+DEFAULT_LEASE_SECONDS = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS work_ranges (
+    id INTEGER PRIMARY KEY,
+    start_row INTEGER NOT NULL,
+    end_row INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker_id TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    completed_at REAL
+);
+"""
+
+
+def default_worker_id() -> str:
+    """Worker ID unique per process: ``<hostname>-<pid>``."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+@dataclass(frozen=True)
+class ShardSpec:
+    """Static shard ``index`` of ``count`` (1-based).
+
+    Attributes:
+        index: Shard number, 1 to count
+        count: Total number of shards
+    """
+
+    index: int
+    count: int
+
+    def __post_init__(self) -> None:
+        if self.count < 1 or not 1 <= self.index <= self.count:
+            raise ValueError(
+                f"Invalid shard {self.index}/{self.count}. Use i/N with 1 <= i <= N, e.g. 2/4"
+            )
+
+    @classmethod
+    def parse(cls, value: str) -> "ShardSpec":
+        """Parse ``"i/N"``.
+
+        Raises:
+            ValueError: If the value is not i/N with 1 <= i <= N
+        """
+        match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", value)
+        if match is None:
+            raise ValueError(f"Invalid shard '{value}'. Use i/N with 1 <= i <= N, e.g. 2/4")
+        return cls(int(match[1]), int(match[2]))
+
+    def rows(self, total_rows: int) -> range:
+        """Row indices this shard processes."""
+        return range(self.index - 1, total_rows, self.count)
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+
+@dataclass
+class WorkLease:
+    """A range of CSV rows leased by one worker.
+
+    Attributes:
+        range_id: Range row ID in the queue database
+        start: First row index (inclusive)
+        end: Last row index (exclusive)
+        worker_id: Worker holding the lease
+        attempt: 1 for a first lease, higher when the range was reclaimed
+        lost: Set when a heartbeat finds the lease taken over
+    """
+
+    range_id: int
+    start: int
+    end: int
+    worker_id: str
+    attempt: int
+    lost: bool = False
+
+
+class WorkQueue:
+    """Lease-based work queue of CSV row ranges in a SQLite database.
+
+    Every method opens its own connection, so one instance can be shared by
+    the processing thread and its heartbeat thread.
+
+    Example:
+        >>> queue = WorkQueue(Path("output/queue.db"))
+        >>> queue.initialize("patients.csv", total_rows=1000)
+        >>> for row_index in queue.rows("worker-1"):
+        ...     process(df.iloc[row_index])
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Create or open the queue database.
+
+        Args:
+            path: SQLite database file (created if missing)
+            lease_seconds: How long a lease lasts without a heartbeat
+            clock: Wall-clock time source (seconds)
+        """
+        if lease_seconds <= 0:
+            raise ValueError(f"lease_seconds must be > 0, got {lease_seconds}")
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self._clock = clock
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode; writes use explicit BEGIN IMMEDIATE transactions
+        return sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction holding the database lock until it ends."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def initialize(self, source: str, total_rows: int, range_size: int = DEFAULT_RANGE_SIZE) -> bool:
+        """Split the CSV into ranges unless another worker already did.
+
+        Args:
+            source: CSV identifier (file name) the queue is for
+            total_rows: Number of CSV rows
+            range_size: Rows per leased range
+
+        Returns:
+            True if this call created the ranges
+
+        Raises:
+            ValueError: If the queue was created for a different CSV
+        """
+        if range_size < 1:
+            raise ValueError(f"range_size must be >= 1, got {range_size}")
+        with self._transaction() as conn:
+            meta = dict(conn.execute("SELECT key, value FROM queue_meta"))
+            if meta:
+                if meta["source"] != source or int(meta["total_rows"]) != total_rows:
+                    raise ValueError(
+                        f"Work queue {self.path} belongs to {meta['source']} "
+                        f"({meta['total_rows']} rows), not {source} ({total_rows} rows). "
+                        "Use a new queue file for a different CSV."
+                    )
+                return False
+            conn.executemany(
+                "INSERT INTO queue_meta (key, value) VALUES (?, ?)",
+                [("source", source), ("total_rows", str(total_rows)), ("range_size", str(range_size))],
+            )
+            conn.executemany(
+                "INSERT INTO work_ranges (start_row, end_row) VALUES (?, ?)",
+                [(start, min(start + range_size, total_rows)) for start in range(0, total_rows, range_size)],
+            )
+        logger.info(
+            f"Initialized work queue {self.path}: {total_rows} rows in ranges of {range_size}"
+        )
+        return True
+
+    def claim(self, worker_id: str) -> Optional[WorkLease]:
+        """Lease the next pending range, or one whose lease expired.
+
+        Returns:
+            The lease, or None when every range is done or actively leased
+        """
+        now = self._clock()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT id, start_row, end_row, attempts, worker_id FROM work_ranges "
+                "WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            range_id, start, end, attempts, previous_worker = row
+            conn.execute(
+                "UPDATE work_ranges SET status = 'leased', worker_id = ?, lease_expires = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (worker_id, now + self.lease_seconds, range_id),
+            )
+        if attempts:
+            logger.warning(
+                f"Worker {worker_id} reclaimed rows {start}-{end - 1} "
+                f"from expired lease of {previous_worker}"
+            )
+        return WorkLease(range_id, start, end, worker_id, attempts + 1)
+
+    def heartbeat(self, lease: WorkLease) -> bool:
+        """Extend a lease.
+
+        Returns:
+            False if the lease expired and another worker took the range
+        """
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE work_ranges SET lease_expires = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'leased'",
+                (self._clock() + self.lease_seconds, lease.range_id, lease.worker_id),
+            ).rowcount
+        return updated == 1
+
+    def complete(self, lease: WorkLease) -> bool:
+        """Mark a leased range done.
+
+        Returns:
+            False if the lease was lost to another worker
+        """
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE work_ranges SET status = 'done', lease_expires = NULL, completed_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'leased'",
+                (self._clock(), lease.range_id, lease.worker_id),
+            ).rowcount
+        return updated == 1
+
+    def progress(self) -> dict[str, int]:
+        """Range counts by state: pending, leased, expired and done."""
+        now = self._clock()
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT CASE WHEN status = 'leased' AND lease_expires < ? THEN 'expired' "
+                "ELSE status END, COUNT(*) FROM work_ranges GROUP BY 1",
+                (now,),
+            ).fetchall()
+        finally:
+            conn.close()
+        counts = {"pending": 0, "leased": 0, "expired": 0, "done": 0}
+        counts.update(dict(rows))
+        return counts
+
+    def rows(self, worker_id: str) -> Iterator[int]:
+        """Yield row indices from successive leases until the queue is drained.
+
+        A range is marked done when the row after its last one is requested,
+        i.e. once the caller finished processing it. If a heartbeat finds the
+        lease lost, the rest of the range is left to its new owner.
+
+        Args:
+            worker_id: This worker's ID
+        """
+        while (lease := self.claim(worker_id)) is not None:
+            logger.info(
+                f"Worker {worker_id} leased rows {lease.start}-{lease.end - 1} "
+                f"(attempt {lease.attempt})"
+            )
+            heartbeat = _Heartbeat(self, lease)
+            heartbeat.start()
+            try:
+                for index in range(lease.start, lease.end):
+                    if lease.lost:
+                        break
+                    yield index
+            finally:
+                heartbeat.stop()
+            if lease.lost or not self.complete(lease):
+                logger.warning(
+                    f"Worker {worker_id} lost its lease on rows {lease.start}-{lease.end - 1}; "
+                    "another worker is processing them"
+                )
+
+
+class _Heartbeat(threading.Thread):
+    """Extends a lease every third of the lease duration until stopped."""
+
+    def __init__(self, queue: WorkQueue, lease: WorkLease) -> None:
+        super().__init__(name=f"work-queue-heartbeat-{lease.range_id}", daemon=True)
+        self._queue = queue
+        self._lease = lease
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        interval = self._queue.lease_seconds / 3
+        while not self._stopped.wait(interval):
+            try:
+                alive = self._queue.heartbeat(self._lease)
+            except sqlite3.Error as e:
+                # A busy database is retried on the next beat
+                logger.warning(f"Work queue heartbeat failed: {e}")
+                continue
+            if not alive:
+                self._lease.lost = True
+                return
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
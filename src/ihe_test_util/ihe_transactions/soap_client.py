@@ -19,14 +19,21 @@ from requests.adapters import HTTPAdapter
 from urllib3.util.ssl_ import create_urllib3_context
 
 from ihe_test_util.config.schema import Config
+from ihe_test_util.ihe_transactions.metrics import get_client_metrics
+from ihe_test_util.logging_audit.transaction_archive import (
+    archive_transaction,
+    get_transaction_archive,
+)
 from ihe_test_util.models.responses import (
     TransactionResponse,
     TransactionStatus,
     TransactionType,
 )
 from ihe_test_util.models.saml import SAMLAssertion
+from ihe_test_util.profiling.tracing import span, trace_context
 from ihe_test_util.saml.ws_security import WSSecurityHeaderBuilder
-from ihe_test_util.ihe_transactions.parsers import parse_acknowledgment
+from ihe_test_util.transport.load_balancer import BalancingStrategy, EndpointPool
+from ihe_test_util.ihe_transactions.fast_parsers import fast_parse_acknowledgment
 from ihe_test_util.utils.exceptions import ValidationError, create_error_info
 
 logger = logging.getLogger(__name__)
@@ -67,10 +74,12 @@ class PIXAddSOAPClient:
     
     Attributes:
         config: Application configuration
-        endpoint_url: PIX Add endpoint URL
+        endpoint_url: PIX Add endpoint URL (the first one when load balancing)
         timeout: Request timeout in seconds
         max_retries: Maximum retry attempts for failed requests
-        session: Configured requests session with TLS enforcement
+        endpoint_pool: Endpoints each attempt is balanced over
+        session: Configured requests session with TLS enforcement (first
+            endpoint's session; every endpoint has its own)
         
     Example:
         >>> from ihe_test_util.config.manager import ConfigManager
@@ -92,7 +101,8 @@ class PIXAddSOAPClient:
         
         Args:
             config: Application configuration with endpoint URLs
-            endpoint_url: Override endpoint URL (uses config if not provided)
+            endpoint_url: Override endpoint URL (uses config if not provided;
+                disables load balancing over config.endpoints.pix_add_endpoints)
             timeout: Request timeout in seconds (default 30)
             max_retries: Maximum retry attempts (default 3)
             
@@ -117,33 +127,39 @@ class PIXAddSOAPClient:
         self.timeout = timeout
         self.max_retries = max_retries
         
-        # Load endpoint URL from config or use provided
+        # Load endpoint URL(s) from config or use provided
         if endpoint_url:
-            self.endpoint_url = endpoint_url
+            targets = [(endpoint_url, 1)]
         else:
-            self.endpoint_url = config.endpoints.pix_add_url
+            targets = config.endpoints.pix_add_targets()
+        self.endpoint_url = targets[0][0]
         
         # Validate endpoint URL format
-        if not self.endpoint_url.startswith(('http://', 'https://')):
-            raise ValidationError(
-                f"Invalid endpoint URL: {self.endpoint_url}. "
-                "Must start with http:// or https://"
-            )
+        for url, _ in targets:
+            if not url.startswith(('http://', 'https://')):
+                raise ValidationError(
+                    f"Invalid endpoint URL: {url}. "
+                    "Must start with http:// or https://"
+                )
         
         # Log security warning for HTTP endpoints
-        if self.endpoint_url.startswith('http://'):
+        if any(url.startswith('http://') for url, _ in targets):
             logger.warning(
                 "SECURITY WARNING: Using HTTP transport (not HTTPS) for PIX Add endpoint. "
                 "This is only acceptable for local development. "
                 "Production endpoints MUST use HTTPS with valid certificates."
             )
         
-        # Create session with TLS 1.2+ enforcement
-        self.session = requests.Session()
-        self.session.mount('https://', TLS12Adapter())
-        
-        # Configure certificate verification
-        self.session.verify = config.transport.verify_tls
+        # One session (connection pool) per endpoint, with TLS 1.2+ enforcement
+        self.endpoint_pool = EndpointPool(
+            "pix_add",
+            targets,
+            strategy=BalancingStrategy(config.endpoints.load_balancing),
+            failure_threshold=config.endpoints.failure_threshold,
+            ejection_seconds=config.endpoints.ejection_seconds,
+            session_factory=self._create_session,
+        )
+        self.session = self.endpoint_pool.sessions[0]
         
         if not config.transport.verify_tls:
             logger.warning(
@@ -156,6 +172,17 @@ class PIXAddSOAPClient:
             f"timeout={timeout}s, max_retries={max_retries}"
         )
     
+    def _create_session(self) -> requests.Session:
+        """Create an endpoint session with TLS 1.2+ and certificate verification configured.
+        
+        Returns:
+            Configured requests session
+        """
+        session = requests.Session()
+        session.mount('https://', TLS12Adapter())
+        session.verify = self.config.transport.verify_tls
+        return session
+    
     def submit_pix_add(
         self,
         hl7v3_message: str,
@@ -198,12 +225,13 @@ class PIXAddSOAPClient:
         
         logger.info(f"Submitting PIX Add transaction to {self.endpoint_url}")
         
-        # Build SOAP envelope with WS-Security and WS-Addressing headers
-        soap_envelope = self._build_soap_envelope(hl7v3_message, saml_assertion)
-        
         # Extract request ID for correlation
         request_id = self._extract_message_id(hl7v3_message)
         
+        # Build SOAP envelope with WS-Security and WS-Addressing headers
+        with span("pix_add.build_envelope", "pix_add", transaction_id=request_id):
+            soap_envelope = self._build_soap_envelope(hl7v3_message, saml_assertion)
+        
         # Log complete request to audit trail before transmission
         self._log_transaction(
             request_xml=soap_envelope,
@@ -214,7 +242,8 @@ class PIXAddSOAPClient:
         
         # Submit with retry logic
         try:
-            response_xml, status_code = self._submit_with_retry(soap_envelope)
+            with trace_context(transaction_id=request_id):
+                response_xml, status_code = self._submit_with_retry(soap_envelope)
             
             # Calculate processing time
             processing_time_ms = int((time.time() - start_time) * 1000)
@@ -228,11 +257,12 @@ class PIXAddSOAPClient:
             )
             
             # Parse acknowledgment response
-            transaction_response = self._parse_acknowledgment(
-                response_xml=response_xml,
-                request_id=request_id,
-                processing_time_ms=processing_time_ms
-            )
+            with span("pix_add.parse_response", "pix_add", transaction_id=request_id):
+                transaction_response = self._parse_acknowledgment(
+                    response_xml=response_xml,
+                    request_id=request_id,
+                    processing_time_ms=processing_time_ms
+                )
             
             logger.info(
                 f"PIX Add transaction completed: status={transaction_response.status}, "
@@ -305,7 +335,9 @@ class PIXAddSOAPClient:
         """Submit SOAP request with retry logic.
         
         Implements exponential backoff retry logic for transient errors
-        (connection errors, timeouts, 5xx server errors).
+        (connection errors, timeouts, 5xx server errors). Each attempt leases
+        an endpoint from the pool, so a retry can go to another node; the
+        transient errors count against that endpoint's health.
         
         Args:
             soap_envelope: Complete SOAP envelope XML string
@@ -320,25 +352,36 @@ class PIXAddSOAPClient:
             requests.HTTPError: On 4xx client errors (no retry)
         """
         backoff_delays = [1, 2, 4, 8, 16]  # Exponential backoff: 1s, 2s, 4s, 8s, 16s
+        body = soap_envelope.encode('utf-8')
+        metrics = get_client_metrics()
         
         for attempt in range(1, self.max_retries + 1):
+            url = self.endpoint_url
             try:
                 logger.debug(f"PIX Add submission attempt {attempt}/{self.max_retries}")
                 
-                response = self.session.post(
-                    self.endpoint_url,
-                    data=soap_envelope.encode('utf-8'),
-                    headers={
-                        'Content-Type': 'application/soap+xml; charset=utf-8',
-                        'SOAPAction': 'urn:hl7-org:v3:PRPA_IN201301UV02'
-                    },
-                    timeout=self.timeout
-                )
+                with span("http.post", "http", transaction="PIX_ADD", attempt=attempt) as http_span, \
+                        metrics.track_request("pix_add", len(body), attempt) as request, \
+                        self.endpoint_pool.lease() as lease:
+                    url = lease.url
+                    response = lease.session.post(
+                        url,
+                        data=body,
+                        headers={
+                            'Content-Type': 'application/soap+xml; charset=utf-8',
+                            'SOAPAction': 'urn:hl7-org:v3:PRPA_IN201301UV02'
+                        },
+                        timeout=self.timeout
+                    )
+                    http_span.set(status_code=response.status_code)
+                    request.set_response(response)
+                    if response.status_code >= 500:
+                        lease.fail()
                 
                 # Handle HTTP error responses
                 if response.status_code >= 400:
                     logger.warning(
-                        f"HTTP error {response.status_code} from PIX Add endpoint"
+                        f"HTTP error {response.status_code} from PIX Add endpoint {url}"
                     )
                     
                     # 4xx errors are client errors - do not retry
@@ -354,7 +397,8 @@ class PIXAddSOAPClient:
                             f"Retry {attempt}/{self.max_retries} after {delay}s delay "
                             f"(HTTP {response.status_code})"
                         )
-                        time.sleep(delay)
+                        with span("http.backoff", "http", attempt=attempt, delay_s=delay):
+                            time.sleep(delay)
                         continue
                 
                 # Success - return response
@@ -364,7 +408,7 @@ class PIXAddSOAPClient:
             except requests.exceptions.SSLError as e:
                 # SSL errors are permanent - do not retry
                 logger.error(
-                    f"SSL certificate validation failed for {self.endpoint_url}. "
+                    f"SSL certificate validation failed for {url}. "
                     f"Check server certificate or TLS configuration. Error: {e}"
                 )
                 raise
@@ -372,7 +416,7 @@ class PIXAddSOAPClient:
             except requests.ConnectionError as e:
                 if attempt == self.max_retries:
                     logger.error(
-                        f"Could not connect to PIX Add endpoint at {self.endpoint_url} "
+                        f"Could not connect to PIX Add endpoint at {url} "
                         f"after {self.max_retries} attempts. "
                         f"Check network connectivity and endpoint URL. Error: {e}"
                     )
@@ -383,7 +427,8 @@ class PIXAddSOAPClient:
                         f"Connection error on attempt {attempt}/{self.max_retries}. "
                         f"Retrying after {delay}s delay. Error: {e}"
                     )
-                    time.sleep(delay)
+                    with span("http.backoff", "http", attempt=attempt, delay_s=delay):
+                        time.sleep(delay)
                     
             except requests.Timeout as e:
                 if attempt == self.max_retries:
@@ -399,7 +444,8 @@ class PIXAddSOAPClient:
                         f"Timeout on attempt {attempt}/{self.max_retries}. "
                         f"Retrying after {delay}s delay."
                     )
-                    time.sleep(delay)
+                    with span("http.backoff", "http", attempt=attempt, delay_s=delay):
+                        time.sleep(delay)
         
         # Should not reach here, but raise error if we do
         raise RuntimeError("Retry logic error - should not reach this point")
@@ -418,7 +464,8 @@ class PIXAddSOAPClient:
             request_id: Request ID for correlation
             
         Returns:
-            Path to temp file containing raw response
+            Path to temp file containing raw response, or the archive location
+            when a transaction archive is open
         """
         # Log complete raw response for debugging (RULE 2)
         logger.error(f"Malformed SOAP response received: {error}")
@@ -429,6 +476,13 @@ class PIXAddSOAPClient:
         else:
             logger.error(f"Raw response: {response_text}")
         
+        # The response was archived with the transaction; no temp file needed
+        archive = get_transaction_archive()
+        if archive is not None:
+            location = f"{archive.path} (message ID {request_id})"
+            logger.error(f"Full raw response archived in: {location}")
+            return location
+        
         # Save full response to temp file for analysis
         try:
             with tempfile.NamedTemporaryFile(
@@ -469,8 +523,9 @@ class PIXAddSOAPClient:
         logger.debug("Parsing PIX Add acknowledgment response")
         
         try:
-            # Parse acknowledgment using parsers module
-            ack = parse_acknowledgment(response_xml)
+            # Parse acknowledgment (fast path; falls back to the reference
+            # parser for non-HL7v3 namespaces)
+            ack = fast_parse_acknowledgment(response_xml)
             
             # Map HL7 status codes to TransactionStatus
             if ack.status == "AA":
@@ -618,7 +673,22 @@ class PIXAddSOAPClient:
             status: Transaction status (SENDING, SUCCESS, ERROR, RETRY)
             request_id: Request message ID for correlation
             error_message: Error message if status is ERROR
+        
+        When a transaction archive is open, the request and response are
+        archived once the outcome is known (SUCCESS or ERROR) and only the
+        status line is written to the audit log.
         """
+        archived = get_transaction_archive() is not None
+        if archived and status != "SENDING":
+            archive_transaction(
+                "PIX_ADD",
+                request_id,
+                status,
+                request_xml,
+                response_xml,
+                error=error_message,
+            )
+        
         # Create audit log directory if it doesn't exist
         log_dir = Path("logs/transactions")
         log_dir.mkdir(parents=True, exist_ok=True)
@@ -642,17 +712,15 @@ class PIXAddSOAPClient:
         
         # Log transaction details
         audit_logger.info(
-            f"PIX Add Transaction - Status: {status}, "
-            f"RequestID: {request_id}, "
-            f"Endpoint: {self.endpoint_url}"
+            "PIX Add Transaction - Status: %s, RequestID: %s, Endpoint: %s",
+            status, request_id, self.endpoint_url,
         )
         
-        # Log complete request XML (RULE 2 - MANDATORY)
-        audit_logger.debug(f"Request XML:\n{request_xml}")
-        
-        # Log complete response XML (RULE 2 - MANDATORY)
-        if response_xml:
-            audit_logger.debug(f"Response XML:\n{response_xml}")
+        # Log complete request and response XML (RULE 2 - MANDATORY)
+        if not archived:
+            audit_logger.debug("Request XML:\n%s", request_xml)
+            if response_xml:
+                audit_logger.debug("Response XML:\n%s", response_xml)
         
         # Log error message if present
         if error_message:
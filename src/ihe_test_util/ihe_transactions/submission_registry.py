@@ -0,0 +1,259 @@
+"""Persistent registry of successful submissions across batch runs.
+
+Rerunning the same or an overlapping CSV re-sends PIX Add and ITI-41 for
+patients that already succeeded. The registry records every successful
+transaction in a local SQLite database so later runs can skip it:
+
+PIX Add:
+    Keyed by endpoint, patient ID, patient ID OID and a hash of the
+    patient's demographics. Stores the enterprise ID returned by the
+    PIX Manager, which later ITI-41 submissions reuse.
+ITI-41:
+    Keyed by endpoint, patient ID, OID and a hash of the demographics and
+    the CCD template. Stores the document and submission set IDs. A new
+    template or changed demographics therefore produce a new submission,
+    while a patient whose PIX Add succeeded but whose ITI-41 failed is
+    only resubmitted to ITI-41.
+
+The endpoint is part of the key, so switching to another partner system
+sends everything again.
+
+Example:
+    >>> registry = SubmissionRegistry(Path("output/registry.db"))
+    >>> key = RegistryKey(PIX_ADD, pix_add_url, patient.patient_id,
+    ...                   patient.patient_id_oid, demographics_hash(patient))
+    >>> if registry.lookup(key) is None:
+    ...     registry.record(key, enterprise_id=submit_pix_add(patient))
+"""
+
+import dataclasses
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional
+
+from ihe_test_util.models.patient import PatientDemographics
+
+logger = logging.getLogger(__name__)
+
+PIX_ADD = "pix_add"
+ITI41 = "iti41"
+TRANSACTIONS = (PIX_ADD, ITI41)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    transaction_type TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    patient_id TEXT NOT NULL,
+    patient_id_oid TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    enterprise_id TEXT,
+    enterprise_id_oid TEXT,
+    document_id TEXT,
+    submission_set_id TEXT,
+    batch_id TEXT,
+    recorded_at TEXT NOT NULL,
+    PRIMARY KEY (transaction_type, endpoint, patient_id, patient_id_oid, content_hash)
+);
+CREATE INDEX IF NOT EXISTS submissions_patient ON submissions (patient_id, patient_id_oid);
+"""
+
+_COLUMNS = (
+    "transaction_type, endpoint, patient_id, patient_id_oid, content_hash, "
+    "enterprise_id, enterprise_id_oid, document_id, submission_set_id, batch_id, recorded_at"
+)
+
+
+def demographics_hash(patient: PatientDemographics) -> str:
+    """SHA-256 of the patient's demographics (every field, canonical JSON)."""
+    canonical = json.dumps(dataclasses.asdict(patient), sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def document_hash(patient: PatientDemographics, template_content: str) -> str:
+    """SHA-256 of the demographics and the CCD template they personalize.
+
+    Generated CCDs carry a fresh document ID and timestamp on every run, so
+    the template and its inputs identify the content, not the CCD itself.
+    """
+    digest = hashlib.sha256(demographics_hash(patient).encode("ascii"))
+    digest.update(template_content.encode("utf-8"))
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class RegistryKey:
+    """Identity of one transaction for one patient.
+
+    Attributes:
+        transaction_type: PIX_ADD or ITI41
+        endpoint: Endpoint URL the transaction was sent to
+        patient_id: Patient ID from the CSV
+        patient_id_oid: Patient ID assigning authority OID
+        content_hash: demographics_hash (PIX Add) or document_hash (ITI-41)
+    """
+
+    transaction_type: str
+    endpoint: str
+    patient_id: str
+    patient_id_oid: str
+    content_hash: str
+
+
+@dataclass
+class RegistryEntry:
+    """A successful transaction recorded in the registry.
+
+    Attributes:
+        key: Transaction identity
+        enterprise_id: Enterprise patient ID (PIX Add)
+        enterprise_id_oid: Enterprise ID domain OID (PIX Add)
+        document_id: Document unique ID (ITI-41)
+        submission_set_id: Submission set unique ID (ITI-41)
+        batch_id: Batch that made the submission
+        recorded_at: When the success was recorded (UTC, ISO 8601)
+    """
+
+    key: RegistryKey
+    enterprise_id: Optional[str] = None
+    enterprise_id_oid: Optional[str] = None
+    document_id: Optional[str] = None
+    submission_set_id: Optional[str] = None
+    batch_id: Optional[str] = None
+    recorded_at: str = ""
+
+    @classmethod
+    def _from_row(cls, row: tuple) -> "RegistryEntry":
+        return cls(RegistryKey(*row[:5]), *row[5:])
+
+
+def _where(patient_id: Optional[str], transaction_type: Optional[str]) -> tuple[str, list[str]]:
+    """WHERE clause and parameters for the optional entry filters."""
+    conditions, params = [], []
+    if patient_id is not None:
+        conditions.append("patient_id = ?")
+        params.append(patient_id)
+    if transaction_type is not None:
+        conditions.append("transaction_type = ?")
+        params.append(transaction_type)
+    return (f" WHERE {' AND '.join(conditions)}" if conditions else ""), params
+
+
+class SubmissionRegistry:
+    """SQLite registry of successful PIX Add and ITI-41 submissions.
+
+    Thread-safe. Several processes (e.g. shard workers) can share one
+    database file; SQLite serializes their writes.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Open the registry, creating the database if missing.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path, timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self._conn.executescript(_SCHEMA)
+        logger.debug(f"Opened submission registry {self.path}")
+
+    def lookup(self, key: RegistryKey) -> Optional[RegistryEntry]:
+        """Recorded success for a transaction, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM submissions WHERE transaction_type = ? AND endpoint = ? "
+                "AND patient_id = ? AND patient_id_oid = ? AND content_hash = ?",
+                dataclasses.astuple(key),
+            ).fetchone()
+        return RegistryEntry._from_row(row) if row else None
+
+    def record(
+        self,
+        key: RegistryKey,
+        *,
+        enterprise_id: Optional[str] = None,
+        enterprise_id_oid: Optional[str] = None,
+        document_id: Optional[str] = None,
+        submission_set_id: Optional[str] = None,
+        batch_id: Optional[str] = None,
+    ) -> RegistryEntry:
+        """Record a successful transaction, replacing an earlier record of it.
+
+        Returns:
+            The recorded entry
+        """
+        entry = RegistryEntry(
+            key,
+            enterprise_id,
+            enterprise_id_oid,
+            document_id,
+            submission_set_id,
+            batch_id,
+            datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        )
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO submissions ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                dataclasses.astuple(key) + (
+                    enterprise_id, enterprise_id_oid, document_id, submission_set_id,
+                    batch_id, entry.recorded_at,
+                ),
+            )
+        return entry
+
+    def entries(
+        self,
+        patient_id: Optional[str] = None,
+        transaction_type: Optional[str] = None,
+    ) -> Iterator[RegistryEntry]:
+        """Recorded entries, oldest first, optionally filtered."""
+        where, params = _where(patient_id, transaction_type)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM submissions{where} ORDER BY recorded_at, rowid", params
+            ).fetchall()
+        return (RegistryEntry._from_row(row) for row in rows)
+
+    def counts(self) -> dict[str, dict[str, int]]:
+        """Entry counts per transaction type and endpoint."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT transaction_type, endpoint, COUNT(*) FROM submissions "
+                "GROUP BY transaction_type, endpoint ORDER BY transaction_type, endpoint"
+            ).fetchall()
+        counts: dict[str, dict[str, int]] = {}
+        for transaction_type, endpoint, count in rows:
+            counts.setdefault(transaction_type, {})[endpoint] = count
+        return counts
+
+    def forget(
+        self,
+        patient_id: Optional[str] = None,
+        transaction_type: Optional[str] = None,
+    ) -> int:
+        """Delete entries so the next run submits them again.
+
+        With no filters, every entry is deleted.
+
+        Returns:
+            Number of entries deleted
+        """
+        where, params = _where(patient_id, transaction_type)
+        with self._lock:
+            deleted = self._conn.execute(f"DELETE FROM submissions{where}", params).rowcount
+        logger.info(f"Removed {deleted} entries from submission registry {self.path}")
+        return deleted
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
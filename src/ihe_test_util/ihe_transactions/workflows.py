@@ -7,21 +7,26 @@ and acknowledgment parsing.
 
 import json
 import logging
+import sqlite3
 import time
 import uuid
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterable, Optional, Sized
 
 import pandas as pd
 from lxml import etree
 from requests import ConnectionError, Timeout
+from requests.adapters import BaseAdapter
 from requests.exceptions import SSLError
 
 from ihe_test_util.config.schema import Config
 from ihe_test_util.csv_parser.parser import parse_csv
+from ihe_test_util.ihe_transactions.metrics import get_client_metrics
 from ihe_test_util.ihe_transactions.pix_add import build_pix_add_message
 from ihe_test_util.ihe_transactions.soap_client import PIXAddSOAPClient
+from ihe_test_util.logging_audit.audit_sink import record_audit
+from ihe_test_util.logging_audit.transaction_archive import archive_context
 from ihe_test_util.models.batch import (
     BatchCheckpoint,
     BatchProcessingResult,
@@ -31,6 +36,7 @@ from ihe_test_util.models.batch import (
 from ihe_test_util.models.patient import PatientDemographics
 from ihe_test_util.models.responses import TransactionStatus
 from ihe_test_util.models.saml import SAMLAssertion
+from ihe_test_util.profiling.tracing import span, trace_context
 from ihe_test_util.saml.generator import generate_saml_assertion
 from ihe_test_util.saml.signer import SAMLSigner
 from ihe_test_util.utils.exceptions import (
@@ -115,24 +121,25 @@ class PIXAddWorkflow:
         start_time = time.time()
         patient_id = patient.patient_id
         
-        logger.info(f"Processing patient: {patient_id}")
+        logger.info("Processing patient: %s", patient_id)
         
         try:
             # Step 1: Build HL7v3 PIX Add message
-            logger.debug(f"Building HL7v3 message for patient {patient_id}")
-            message_xml = build_pix_add_message(
-                demographics=patient,
-                sending_application=self.config.sender_application,
-                sending_facility=self.config.sender_oid,
-                receiver_application=self.config.receiver_application,
-                receiver_facility=self.config.receiver_oid
-            )
-            logger.info(f"HL7v3 message built for patient {patient_id}")
+            logger.debug("Building HL7v3 message for patient %s", patient_id)
+            with span("pix_add.build_message", "pix_add"):
+                message_xml = build_pix_add_message(
+                    demographics=patient,
+                    sending_application=self.config.sender_application,
+                    sending_facility=self.config.sender_oid,
+                    receiver_application=self.config.receiver_application,
+                    receiver_facility=self.config.receiver_oid
+                )
+            logger.info("HL7v3 message built for patient %s", patient_id)
             
             # Step 2: Submit via SOAP client
-            logger.debug(f"Submitting PIX Add for patient {patient_id}")
+            logger.debug("Submitting PIX Add for patient %s", patient_id)
             response = self.soap_client.submit_pix_add(message_xml, saml_assertion)
-            logger.info(f"PIX Add submitted for patient {patient_id}, status: {response.status}")
+            logger.info("PIX Add submitted for patient %s, status: %s", patient_id, response.status)
             
             # Step 3: Extract patient identifiers and create result
             processing_time_ms = int((time.time() - start_time) * 1000)
@@ -189,7 +196,7 @@ class PIXAddWorkflow:
             
             # Track error in collector
             if error_collector:
-                error_collector.add_error(error_info, patient_id)
+                error_collector.add_error(error_info, patient_id, stage="pix_add")
             
             # Re-raise to halt workflow
             raise
@@ -208,7 +215,7 @@ class PIXAddWorkflow:
             
             # Track error in collector
             if error_collector:
-                error_collector.add_error(error_info, patient_id)
+                error_collector.add_error(error_info, patient_id, stage="pix_add")
             
             result = PatientResult(
                 patient_id=patient_id,
@@ -235,7 +242,7 @@ class PIXAddWorkflow:
             
             # Track error in collector
             if error_collector:
-                error_collector.add_error(error_info, patient_id)
+                error_collector.add_error(error_info, patient_id, stage="pix_add")
             
             result = PatientResult(
                 patient_id=patient_id,
@@ -306,13 +313,14 @@ class PIXAddWorkflow:
             
             error_collector = ErrorSummaryCollector()
             error_collector.set_patient_count(total_patients)
+            get_client_metrics().set_patients_total(total_patients)
             
             # Step 5: Process patients sequentially
             logger.info(f"Processing {total_patients} patients sequentially")
             
             for idx, row in df.iterrows():
                 patient_num = idx + 1
-                logger.info(f"Processing patient {patient_num}/{total_patients}")
+                logger.info("Processing patient %s/%s", patient_num, total_patients)
                 
                 try:
                     # Convert DataFrame row to PatientDemographics
@@ -516,6 +524,13 @@ class PIXAddWorkflow:
         if isinstance(dob, str):
             dob = pd.to_datetime(dob).date()
         
+        def optional_text(column: str) -> Optional[str]:
+            # Empty CSV cells arrive as NaN and numeric-looking ones as numbers
+            value = row.get(column)
+            if value is None or pd.isna(value):
+                return None
+            return str(value)
+        
         return PatientDemographics(
             patient_id=row["patient_id"],
             patient_id_oid=row["patient_id_oid"],
@@ -523,14 +538,14 @@ class PIXAddWorkflow:
             last_name=row["last_name"],
             dob=dob,
             gender=row["gender"],
-            mrn=row.get("mrn"),
-            ssn=row.get("ssn"),
-            address=row.get("address"),
-            city=row.get("city"),
-            state=row.get("state"),
-            zip=row.get("zip"),
-            phone=row.get("phone"),
-            email=row.get("email")
+            mrn=optional_text("mrn"),
+            ssn=optional_text("ssn"),
+            address=optional_text("address"),
+            city=optional_text("city"),
+            state=optional_text("state"),
+            zip=optional_text("zip"),
+            phone=optional_text("phone"),
+            email=optional_text("email")
         )
 
 
@@ -684,12 +699,22 @@ def generate_summary_report(results: BatchProcessingResult) -> str:
 
 from ihe_test_util.config.schema import BatchConfig
 from ihe_test_util.ihe_transactions.iti41_client import ITI41SOAPClient
+from ihe_test_util.ihe_transactions.submission_registry import (
+    ITI41,
+    PIX_ADD,
+    RegistryEntry,
+    RegistryKey,
+    SubmissionRegistry,
+    demographics_hash,
+    document_hash,
+)
 from ihe_test_util.ihe_transactions.xdsb_metadata import XDSbMetadataBuilder
 from ihe_test_util.models.batch import BatchWorkflowResult, PatientWorkflowResult, BatchCheckpoint, BatchStatistics
 from ihe_test_util.models.ccd import CCDDocument
 from ihe_test_util.models.transactions import ITI41Transaction
 from ihe_test_util.template_engine.personalizer import TemplatePersonalizer, MissingValueStrategy
 from ihe_test_util.transport.http_client import ConnectionPool, ConnectionPoolConfig
+from ihe_test_util.transport.load_balancer import EndpointStats
 from ihe_test_util.utils.exceptions import (
     ITI41TransportError,
     ITI41TimeoutError,
@@ -718,6 +743,8 @@ class IntegratedWorkflow:
     - Connection pooling for efficient HTTP connections
     - Fail-fast mode to stop on first error
     - Statistics calculation for throughput/latency tracking
+    - A persistent submission registry: PIX Adds and ITI-41 submissions
+      that succeeded in an earlier run are skipped unless force_resubmit
     
     Attributes:
         config: Application configuration with endpoints and OIDs
@@ -765,6 +792,9 @@ class IntegratedWorkflow:
         self._ccd_template_path = ccd_template_path
         self._batch_config = batch_config or BatchConfig()
         
+        # Batch being processed, recorded on audit trail entries
+        self._batch_id: Optional[str] = None
+        
         # Initialize connection pool for HTTP sessions
         pool_config = ConnectionPoolConfig(
             max_connections=self._batch_config.concurrent_connections,
@@ -778,6 +808,15 @@ class IntegratedWorkflow:
             f"concurrent_connections={self._batch_config.concurrent_connections}"
         )
         
+        # Successful submissions from earlier runs (None: registry disabled)
+        self._registry: Optional[SubmissionRegistry] = None
+        if self._batch_config.registry_path:
+            self._registry = SubmissionRegistry(self._batch_config.registry_path)
+            logger.info(
+                f"Using submission registry {self._batch_config.registry_path}"
+                + (" (force resubmit)" if self._batch_config.force_resubmit else "")
+            )
+        
         # Validate CCD template exists
         if not ccd_template_path.exists():
             raise ValidationError(
@@ -795,9 +834,13 @@ class IntegratedWorkflow:
         # Initialize ITI-41 client (from Story 6.3)
         self._iti41_client = ITI41SOAPClient(
             endpoint_url=config.endpoints.iti41_url,
-            timeout=config.endpoints.timeout,
-            verify_tls=config.endpoints.verify_tls,
+            timeout=config.transport.timeout_read,
+            verify_tls=config.transport.verify_tls,
             ca_bundle_path=config.certificates.ca_bundle_path if hasattr(config.certificates, 'ca_bundle_path') else None,
+            endpoints=config.endpoints.iti41_targets(),
+            load_balancing=config.endpoints.load_balancing,
+            failure_threshold=config.endpoints.failure_threshold,
+            ejection_seconds=config.endpoints.ejection_seconds,
         )
         
         # Initialize template personalizer (from Story 3.x)
@@ -827,10 +870,76 @@ class IntegratedWorkflow:
         """Get batch configuration."""
         return self._batch_config
     
+    @property
+    def registry(self) -> Optional[SubmissionRegistry]:
+        """Get the submission registry (None when disabled)."""
+        return self._registry
+    
+    def mount_transport(self, prefix: str, adapter: BaseAdapter) -> None:
+        """Mount a requests transport adapter on the PIX Add and ITI-41 sessions.
+        
+        Used to route both transactions through a custom transport, e.g.
+        ``WSGIAdapter`` to call the mock server in-process. The adapter is
+        mounted on every load-balanced endpoint's session.
+        
+        Args:
+            prefix: URL prefix the adapter handles (e.g. "http://mock.local/")
+            adapter: Transport adapter to mount
+        """
+        self._pix_add_workflow.soap_client.endpoint_pool.mount(prefix, adapter)
+        self._iti41_client.endpoint_pool.mount(prefix, adapter)
+    
+    def endpoint_stats(self) -> list[EndpointStats]:
+        """Per-endpoint request, failure and latency counters.
+        
+        Returns:
+            Stats for every PIX Add and ITI-41 endpoint, or an empty list when
+            neither transaction is load balanced
+        """
+        pools = [self._pix_add_workflow.soap_client.endpoint_pool, self._iti41_client.endpoint_pool]
+        if all(len(pool) == 1 for pool in pools):
+            return []
+        return [stats for pool in pools for stats in pool.stats()]
+    
+    def _registry_key(self, transaction_type: str, patient: PatientDemographics) -> RegistryKey:
+        """Registry identity of a patient's PIX Add or ITI-41 submission."""
+        if transaction_type == PIX_ADD:
+            endpoint = self._config.endpoints.pix_add_url
+            content_hash = demographics_hash(patient)
+        else:
+            endpoint = self._config.endpoints.iti41_url
+            content_hash = document_hash(patient, self._ccd_template_content)
+        return RegistryKey(
+            transaction_type, endpoint, patient.patient_id, patient.patient_id_oid, content_hash
+        )
+    
+    def _registry_lookup(
+        self, transaction_type: str, patient: PatientDemographics
+    ) -> Optional[RegistryEntry]:
+        """Earlier success to reuse, or None to submit (no registry, force, or not found)."""
+        if self._registry is None or self._batch_config.force_resubmit:
+            return None
+        return self._registry.lookup(self._registry_key(transaction_type, patient))
+    
+    def _registry_record(self, transaction_type: str, patient: PatientDemographics, **identifiers) -> None:
+        """Record a successful submission; a registry error never fails the patient."""
+        if self._registry is None:
+            return
+        try:
+            self._registry.record(
+                self._registry_key(transaction_type, patient), batch_id=self._batch_id, **identifiers
+            )
+        except sqlite3.Error as e:
+            logger.warning(
+                f"Could not record {transaction_type} for patient {patient.patient_id} "
+                f"in submission registry: {e}"
+            )
+    
     def process_batch(
         self,
         csv_path: Path,
-        checkpoint_file: Optional[Path] = None
+        checkpoint_file: Optional[Path] = None,
+        row_selector: Optional[Callable[[int], Iterable[int]]] = None,
     ) -> BatchWorkflowResult:
         """Process all patients from CSV file through complete workflow.
         
@@ -845,6 +954,9 @@ class IntegratedWorkflow:
             csv_path: Path to CSV file with patient demographics
             checkpoint_file: Optional path to checkpoint file. If provided,
                            checkpoints are saved at configured intervals.
+            row_selector: Called with the CSV row count; returns the
+                ascending row indices to process (e.g. a static shard or
+                rows leased from a work queue). Default: every row.
             
         Returns:
             BatchWorkflowResult with per-patient results and statistics
@@ -864,6 +976,7 @@ class IntegratedWorkflow:
         # Generate batch ID
         batch_id = f"batch-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
         start_timestamp = datetime.now(timezone.utc)
+        self._batch_id = batch_id
         
         logger.info(
             f"Starting integrated workflow batch: batch_id={batch_id}, "
@@ -882,7 +995,8 @@ class IntegratedWorkflow:
         try:
             # Step 1: Parse CSV
             logger.info("Parsing CSV file")
-            df, validation_result = parse_csv(csv_path, validate=True)
+            with span("csv.parse", "csv", csv_file=str(csv_path)):
+                df, validation_result = parse_csv(csv_path, validate=True)
             total_patients = len(df)
             
             logger.info(f"CSV parsed successfully: {total_patients} patients")
@@ -892,7 +1006,8 @@ class IntegratedWorkflow:
             
             # Step 3: Generate SAML assertion (reuse for all patients)
             logger.info("Generating SAML assertion for batch")
-            saml_assertion = self._generate_saml_assertion()
+            with span("saml.assertion", "saml"):
+                saml_assertion = self._generate_saml_assertion()
             logger.info("SAML assertion generated and signed")
             
             # Step 4: Initialize batch result
@@ -905,6 +1020,7 @@ class IntegratedWorkflow:
             
             error_collector = ErrorSummaryCollector()
             error_collector.set_patient_count(total_patients)
+            get_client_metrics().set_patients_total(total_patients)
             
             # Step 4.5: Check for existing checkpoint to resume from
             start_index = 0
@@ -919,6 +1035,10 @@ class IntegratedWorkflow:
                     )
             
             # Step 5: Process patients sequentially (AC: 4)
+            row_indices = range(total_patients) if row_selector is None else row_selector(total_patients)
+            if isinstance(row_indices, Sized) and len(row_indices) != total_patients:
+                logger.info(f"Processing {len(row_indices)} of {total_patients} CSV rows in this shard")
+                error_collector.set_patient_count(len(row_indices))
             logger.info(f"Processing {total_patients} patients sequentially (starting at {start_index + 1})")
             
             # Track completed/failed IDs for checkpoint
@@ -930,16 +1050,18 @@ class IntegratedWorkflow:
                 completed_patient_ids = list(existing_checkpoint.completed_patient_ids)
                 failed_patient_ids = list(existing_checkpoint.failed_patient_ids)
             
-            for idx, row in df.iterrows():
+            for idx in row_indices:
                 # Skip already processed patients when resuming
                 if idx < start_index:
                     continue
+                row = df.iloc[idx]
                 patient_num = idx + 1
-                logger.info(f"Processing patient {patient_num}/{total_patients}")
+                logger.info("Processing patient %s/%s", patient_num, total_patients)
                 
                 try:
                     # Convert DataFrame row to PatientDemographics
-                    patient = self._row_to_patient_demographics(row)
+                    with span("csv.row_to_patient", "csv", row=int(idx)):
+                        patient = self._row_to_patient_demographics(row)
                     
                     # Process patient through complete workflow
                     patient_result = self.process_patient(
@@ -968,7 +1090,8 @@ class IntegratedWorkflow:
                             failed_patient_ids=failed_patient_ids,
                             total_patients=total_patients
                         )
-                        _save_checkpoint(checkpoint, checkpoint_file)
+                        with span("checkpoint.write", "checkpoint", index=int(idx)):
+                            _save_checkpoint(checkpoint, checkpoint_file)
                     
                     # Check fail-fast mode
                     if self._batch_config.fail_fast and not patient_result.is_fully_successful:
@@ -1023,6 +1146,7 @@ class IntegratedWorkflow:
                 batch_result.patient_results,
                 total_time_ms
             )
+            batch_result.endpoint_stats = self.endpoint_stats()
             
             logger.info(
                 f"Integrated workflow complete: batch_id={batch_id}, "
@@ -1032,6 +1156,11 @@ class IntegratedWorkflow:
                 f"complete_success={batch_result.fully_successful_count}, "
                 f"duration={batch_result.duration_seconds:.2f}s"
             )
+            if batch_result.pix_add_reused_count or batch_result.iti41_reused_count:
+                logger.info(
+                    f"Submission registry: reused {batch_result.pix_add_reused_count} PIX Add "
+                    f"and {batch_result.iti41_reused_count} ITI-41 results from earlier runs"
+                )
             
             # Log statistics if available
             if batch_result.statistics:
@@ -1085,11 +1214,30 @@ class IntegratedWorkflow:
             If PIX Add fails, ITI-41 is skipped (AC: 6)
             If pix_only_mode is True, ITI-41 is skipped (Story 6.7)
             If iti41_only_mode is True, PIX Add is skipped and prior results are used (Story 6.7)
+            When tracing is enabled, every span opened for this patient carries
+            its patient_id; when a transaction archive is open, so does every
+            archived transaction.
         """
+        with (
+            trace_context(patient_id=patient.patient_id),
+            archive_context(patient.patient_id),
+            span("patient", "workflow"),
+        ):
+            result = self._process_patient_steps(patient, saml_assertion, error_collector)
+        get_client_metrics().observe_patient(result.ccd_generated, result.pix_add_status, result.iti41_status)
+        return result
+
+    def _process_patient_steps(
+        self,
+        patient: PatientDemographics,
+        saml_assertion: SAMLAssertion,
+        error_collector: Optional[ErrorSummaryCollector]
+    ) -> PatientWorkflowResult:
+        """Run the workflow steps for one patient (see ``process_patient``)."""
         start_time = time.time()
         patient_id = patient.patient_id
         
-        logger.info(f"Processing patient through integrated workflow: {patient_id}")
+        logger.info("Processing patient through integrated workflow: %s", patient_id)
         
         # Initialize result with CSV parsed
         result = PatientWorkflowResult(
@@ -1108,9 +1256,10 @@ class IntegratedWorkflow:
         try:
             # Step 1: Generate CCD from template
             ccd_start = time.time()
-            logger.debug(f"Generating CCD for patient {patient_id}")
+            logger.debug("Generating CCD for patient %s", patient_id)
             
-            ccd_document = self._generate_ccd(patient)
+            with span("ccd.generate", "ccd"):
+                ccd_document = self._generate_ccd(patient)
             result.ccd_generated = True
             
             ccd_time_ms = int((time.time() - ccd_start) * 1000)
@@ -1122,7 +1271,7 @@ class IntegratedWorkflow:
                 duration_ms=ccd_time_ms
             )
             
-            logger.info(f"CCD generated for patient {patient_id} ({ccd_time_ms}ms)")
+            logger.info("CCD generated for patient %s (%sms)", patient_id, ccd_time_ms)
             
         except Exception as ccd_error:
             # CCD generation failed - skip remaining steps
@@ -1146,7 +1295,7 @@ class IntegratedWorkflow:
             
             if error_collector:
                 error_info = create_error_info(ccd_error, patient_id=patient_id)
-                error_collector.add_error(error_info, patient_id)
+                error_collector.add_error(error_info, patient_id, stage="ccd")
             
             return result
         
@@ -1211,83 +1360,111 @@ class IntegratedWorkflow:
                 )
                 
                 return result
+        elif (prior_pix := self._registry_lookup(PIX_ADD, patient)) is not None:
+            # Registered by an earlier run: reuse its enterprise ID
+            result.pix_add_status = "success"
+            result.pix_add_reused = True
+            result.pix_add_message = (
+                f"Already registered (batch {prior_pix.batch_id}, {prior_pix.recorded_at})"
+            )
+            result.pix_enterprise_id = prior_pix.enterprise_id
+            result.pix_enterprise_id_oid = prior_pix.enterprise_id_oid
+            
+            self._log_workflow_step(
+                patient_id=patient_id,
+                step="PIX_ADD",
+                status="SKIPPED",
+                duration_ms=0,
+                details=f"Registry: {result.pix_enterprise_id}"
+            )
+            
+            logger.info(
+                f"PIX Add skipped for patient {patient_id}: already registered "
+                f"(Enterprise ID: {result.pix_enterprise_id})"
+            )
         else:
             # Step 2: Execute PIX Add transaction (normal mode)
             pix_add_start = time.time()
-            logger.debug(f"Executing PIX Add for patient {patient_id}")
+            logger.debug("Executing PIX Add for patient %s", patient_id)
         
-        try:
-            pix_result = self._pix_add_workflow.process_patient(
-                patient=patient,
-                saml_assertion=saml_assertion,
-                error_collector=error_collector
-            )
+            try:
+                pix_result = self._pix_add_workflow.process_patient(
+                    patient=patient,
+                    saml_assertion=saml_assertion,
+                    error_collector=error_collector
+                )
             
-            pix_add_time_ms = int((time.time() - pix_add_start) * 1000)
-            result.pix_add_time_ms = pix_add_time_ms
+                pix_add_time_ms = int((time.time() - pix_add_start) * 1000)
+                result.pix_add_time_ms = pix_add_time_ms
             
-            if pix_result.is_success:
-                result.pix_add_status = "success"
-                result.pix_add_message = "Patient registered successfully"
+                if pix_result.is_success:
+                    result.pix_add_status = "success"
+                    result.pix_add_message = "Patient registered successfully"
                 
-                # Extract patient identifiers from PIX Add response (AC: 3)
-                identifiers = self._extract_patient_identifiers(pix_result)
-                result.pix_enterprise_id = identifiers.get("patient_id")
-                result.pix_enterprise_id_oid = identifiers.get("patient_id_oid")
+                    # Extract patient identifiers from PIX Add response (AC: 3)
+                    identifiers = self._extract_patient_identifiers(pix_result)
+                    result.pix_enterprise_id = identifiers.get("patient_id")
+                    result.pix_enterprise_id_oid = identifiers.get("patient_id_oid")
+                    self._registry_record(
+                        PIX_ADD,
+                        patient,
+                        enterprise_id=result.pix_enterprise_id,
+                        enterprise_id_oid=result.pix_enterprise_id_oid,
+                    )
                 
-                self._log_workflow_step(
-                    patient_id=patient_id,
-                    step="PIX_ADD",
-                    status="SUCCESS",
-                    duration_ms=pix_add_time_ms,
-                    details=f"Enterprise ID: {result.pix_enterprise_id}"
-                )
+                    self._log_workflow_step(
+                        patient_id=patient_id,
+                        step="PIX_ADD",
+                        status="SUCCESS",
+                        duration_ms=pix_add_time_ms,
+                        details=f"Enterprise ID: {result.pix_enterprise_id}"
+                    )
                 
-                logger.info(
-                    f"PIX Add successful for patient {patient_id} "
-                    f"(Enterprise ID: {result.pix_enterprise_id}, {pix_add_time_ms}ms)"
-                )
-            else:
-                # PIX Add failed - skip ITI-41 (AC: 6)
+                    logger.info(
+                        f"PIX Add successful for patient {patient_id} "
+                        f"(Enterprise ID: {result.pix_enterprise_id}, {pix_add_time_ms}ms)"
+                    )
+                else:
+                    # PIX Add failed - skip ITI-41 (AC: 6)
+                    result.pix_add_status = "failed"
+                    result.pix_add_message = pix_result.pix_add_message
+                    result.iti41_status = "skipped"
+                    result.iti41_message = "Skipped due to PIX Add failure"
+                    result.total_time_ms = int((time.time() - start_time) * 1000)
+                    result.error_message = pix_result.error_details
+                
+                    self._log_workflow_step(
+                        patient_id=patient_id,
+                        step="PIX_ADD",
+                        status="FAILED",
+                        duration_ms=pix_add_time_ms,
+                        details=pix_result.pix_add_message
+                    )
+                
+                    logger.warning(
+                        f"PIX Add failed for patient {patient_id}: {pix_result.pix_add_message}. "
+                        "Skipping ITI-41 submission."
+                    )
+                
+                    return result
+                
+            except (ConnectionError, Timeout, SSLError) as critical_error:
+                # Critical PIX Add errors - re-raise to halt batch
+                pix_add_time_ms = int((time.time() - pix_add_start) * 1000)
+                result.pix_add_time_ms = pix_add_time_ms
                 result.pix_add_status = "failed"
-                result.pix_add_message = pix_result.pix_add_message
-                result.iti41_status = "skipped"
-                result.iti41_message = "Skipped due to PIX Add failure"
+                result.pix_add_message = f"Critical error: {critical_error}"
                 result.total_time_ms = int((time.time() - start_time) * 1000)
-                result.error_message = pix_result.error_details
-                
+            
                 self._log_workflow_step(
                     patient_id=patient_id,
                     step="PIX_ADD",
-                    status="FAILED",
+                    status="CRITICAL_ERROR",
                     duration_ms=pix_add_time_ms,
-                    details=pix_result.pix_add_message
+                    details=str(critical_error)
                 )
-                
-                logger.warning(
-                    f"PIX Add failed for patient {patient_id}: {pix_result.pix_add_message}. "
-                    "Skipping ITI-41 submission."
-                )
-                
-                return result
-                
-        except (ConnectionError, Timeout, SSLError) as critical_error:
-            # Critical PIX Add errors - re-raise to halt batch
-            pix_add_time_ms = int((time.time() - pix_add_start) * 1000)
-            result.pix_add_time_ms = pix_add_time_ms
-            result.pix_add_status = "failed"
-            result.pix_add_message = f"Critical error: {critical_error}"
-            result.total_time_ms = int((time.time() - start_time) * 1000)
-            
-            self._log_workflow_step(
-                patient_id=patient_id,
-                step="PIX_ADD",
-                status="CRITICAL_ERROR",
-                duration_ms=pix_add_time_ms,
-                details=str(critical_error)
-            )
             
-            raise
+                raise
         
         # Story 6.7: Check for PIX-only mode - skip ITI-41
         if self._batch_config.pix_only_mode:
@@ -1303,22 +1480,49 @@ class IntegratedWorkflow:
                 details="PIX-only mode enabled"
             )
             
-            logger.info(f"ITI-41 skipped for patient {patient_id} (PIX-only mode)")
+            logger.info("ITI-41 skipped for patient %s (PIX-only mode)", patient_id)
+            
+            return result
+        
+        # Submitted by an earlier run: nothing to resend
+        prior_iti41 = self._registry_lookup(ITI41, patient)
+        if prior_iti41 is not None:
+            result.iti41_status = "success"
+            result.iti41_reused = True
+            result.iti41_message = (
+                f"Already submitted (batch {prior_iti41.batch_id}, {prior_iti41.recorded_at})"
+            )
+            result.document_id = prior_iti41.document_id
+            result.total_time_ms = int((time.time() - start_time) * 1000)
+            
+            self._log_workflow_step(
+                patient_id=patient_id,
+                step="ITI41",
+                status="SKIPPED",
+                duration_ms=0,
+                details=f"Registry: {result.document_id}"
+            )
+            
+            logger.info(
+                f"ITI-41 skipped for patient {patient_id}: already submitted "
+                f"(Document ID: {result.document_id})"
+            )
             
             return result
         
         # Step 3: Build and execute ITI-41 transaction
         iti41_start = time.time()
-        logger.debug(f"Executing ITI-41 for patient {patient_id}")
+        logger.debug("Executing ITI-41 for patient %s", patient_id)
         
         try:
             # Build ITI-41 transaction using patient IDs from PIX Add (AC: 3)
-            transaction = self._build_iti41_transaction(
-                patient=patient,
-                ccd_document=ccd_document,
-                pix_add_patient_id=result.pix_enterprise_id,
-                pix_add_patient_id_oid=result.pix_enterprise_id_oid or patient.patient_id_oid
-            )
+            with span("iti41.build_metadata", "iti41"):
+                transaction = self._build_iti41_transaction(
+                    patient=patient,
+                    ccd_document=ccd_document,
+                    pix_add_patient_id=result.pix_enterprise_id,
+                    pix_add_patient_id_oid=result.pix_enterprise_id_oid or patient.patient_id_oid
+                )
             
             # Submit ITI-41
             iti41_response = self._iti41_client.submit(transaction, saml_assertion)
@@ -1334,13 +1538,20 @@ class IntegratedWorkflow:
                 document_ids = iti41_response.extracted_identifiers.get("document_ids", [])
                 if document_ids:
                     result.document_id = document_ids[0]
+                self._registry_record(
+                    ITI41,
+                    patient,
+                    document_id=result.document_id or transaction.document_entry_id,
+                    submission_set_id=transaction.submission_set_id,
+                )
                 
                 self._log_workflow_step(
                     patient_id=patient_id,
                     step="ITI41",
                     status="SUCCESS",
                     duration_ms=iti41_time_ms,
-                    details=f"Document ID: {result.document_id}"
+                    details=f"Document ID: {result.document_id}",
+                    correlation_id=iti41_response.request_id,
                 )
                 
                 logger.info(
@@ -1357,7 +1568,8 @@ class IntegratedWorkflow:
                     step="ITI41",
                     status="FAILED",
                     duration_ms=iti41_time_ms,
-                    details=result.iti41_message
+                    details=result.iti41_message,
+                    correlation_id=iti41_response.request_id,
                 )
                 
                 logger.warning(
@@ -1369,7 +1581,7 @@ class IntegratedWorkflow:
                         Exception(result.iti41_message),
                         patient_id=patient_id
                     )
-                    error_collector.add_error(error_info, patient_id)
+                    error_collector.add_error(error_info, patient_id, stage="iti41")
                     
         except (ITI41TransportError, ITI41TimeoutError, ITI41SOAPError) as iti41_error:
             # ITI-41 errors - continue batch, don't halt
@@ -1391,7 +1603,7 @@ class IntegratedWorkflow:
             
             if error_collector:
                 error_info = create_error_info(iti41_error, patient_id=patient_id)
-                error_collector.add_error(error_info, patient_id)
+                error_collector.add_error(error_info, patient_id, stage="iti41")
                 
         except Exception as unexpected_error:
             # Unexpected ITI-41 errors - continue batch
@@ -1416,7 +1628,7 @@ class IntegratedWorkflow:
             
             if error_collector:
                 error_info = create_error_info(unexpected_error, patient_id=patient_id)
-                error_collector.add_error(error_info, patient_id)
+                error_collector.add_error(error_info, patient_id, stage="iti41")
         
         # Calculate total time
         result.total_time_ms = int((time.time() - start_time) * 1000)
@@ -1598,20 +1810,35 @@ class IntegratedWorkflow:
         step: str,
         status: str,
         duration_ms: int,
-        details: str = ""
+        details: str = "",
+        correlation_id: Optional[str] = None,
     ) -> None:
         """Log workflow step for audit trail.
         
+        The step is logged as text and, when an audit sink is open, written
+        as a "workflow_step" record of the current batch.
+        
         Args:
             patient_id: Patient identifier
             step: Workflow step name (e.g., "PIX_ADD", "ITI41", "CCD_GENERATED")
             status: Step status (e.g., "SUCCESS", "FAILED", "SKIPPED")
             duration_ms: Step duration in milliseconds
             details: Optional details about the step
+            correlation_id: Transaction message ID, when the step has one
         """
         logger.info(
-            f"WORKFLOW_AUDIT: patient_id={patient_id}, step={step}, "
-            f"status={status}, duration_ms={duration_ms}, details={details}"
+            "WORKFLOW_AUDIT: patient_id=%s, step=%s, status=%s, duration_ms=%s, details=%s",
+            patient_id, step, status, duration_ms, details,
+        )
+        record_audit(
+            "workflow_step",
+            status,
+            batch_id=self._batch_id,
+            patient_id=patient_id,
+            step=step,
+            duration_ms=duration_ms,
+            correlation_id=correlation_id,
+            details=details or None,
         )
 
 
@@ -1645,6 +1872,106 @@ def save_workflow_results_to_json(
     logger.info(f"Saved workflow results to {output_path}")
 
 
+def load_workflow_results_from_json(input_path: Path) -> BatchWorkflowResult:
+    """Load integrated workflow results saved by ``save_workflow_results_to_json``.
+    
+    Args:
+        input_path: Path to results JSON file
+        
+    Returns:
+        BatchWorkflowResult with patient results, endpoint stats and shard
+        
+    Raises:
+        ValidationError: If the file is not a workflow results file
+    """
+    try:
+        data = json.loads(input_path.read_text(encoding="utf-8"))
+        return BatchWorkflowResult.from_dict(data)
+    except (OSError, json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+        raise ValidationError(
+            f"Invalid workflow results file {input_path}: {e}. "
+            "Expected JSON written by 'submit --output'."
+        ) from e
+
+
+def merge_workflow_results(results: list[BatchWorkflowResult]) -> BatchWorkflowResult:
+    """Combine shard results into one batch result.
+    
+    Patient results are concatenated in the given order. A patient in more
+    than one result (a work queue range reclaimed from a stalled worker is
+    processed twice) is kept once, from the shard that finished last, and
+    counted in ``duplicates_dropped``. The merged batch spans the earliest
+    start to the latest end, so throughput reflects all workers together;
+    statistics are recalculated and endpoint counters are summed per
+    transaction and URL.
+    
+    Args:
+        results: Shard results (at least one)
+        
+    Returns:
+        Merged BatchWorkflowResult with a new batch ID
+        
+    Raises:
+        ValidationError: If no results are given or they come from different CSV files
+    """
+    if not results:
+        raise ValidationError("No workflow results to merge.")
+    csv_names = {Path(result.csv_file).name for result in results}
+    if len(csv_names) > 1:
+        raise ValidationError(
+            f"Cannot merge results from different CSV files: {', '.join(sorted(csv_names))}"
+        )
+    
+    # Rank shards by end time; unfinished ones lose, ties go to the later file
+    ranks = {
+        id(result): rank
+        for rank, result in enumerate(sorted(
+            results,
+            key=lambda result: (result.end_timestamp is not None, result.end_timestamp or result.start_timestamp),
+        ))
+    }
+    latest: dict[str, tuple[int, PatientWorkflowResult]] = {}
+    for result in results:
+        for patient in result.patient_results:
+            kept = latest.get(patient.patient_id)
+            if kept is None or ranks[id(result)] >= kept[0]:
+                latest[patient.patient_id] = (ranks[id(result)], patient)
+    patient_results = [patient for _, patient in latest.values()]
+    duplicates_dropped = sum(len(result.patient_results) for result in results) - len(patient_results)
+    
+    end_timestamps = [result.end_timestamp for result in results if result.end_timestamp]
+    merged = BatchWorkflowResult(
+        batch_id=f"merged-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}",
+        csv_file=results[0].csv_file,
+        ccd_template=results[0].ccd_template,
+        start_timestamp=min(result.start_timestamp for result in results),
+        end_timestamp=max(end_timestamps) if len(end_timestamps) == len(results) else None,
+        patient_results=patient_results,
+        duplicates_dropped=duplicates_dropped,
+    )
+    
+    endpoints: dict[tuple[str, str], EndpointStats] = {}
+    for result in results:
+        for stats in result.endpoint_stats:
+            key = (stats.transaction, stats.url)
+            if key not in endpoints:
+                endpoints[key] = EndpointStats(stats.transaction, stats.url, stats.weight)
+            total = endpoints[key]
+            total.requests += stats.requests
+            total.failures += stats.failures
+            total.ejections += stats.ejections
+            total.total_time_ms += stats.total_time_ms
+            total.healthy = total.healthy and stats.healthy
+    merged.endpoint_stats = list(endpoints.values())
+    merged.calculate_statistics()
+    
+    logger.info(
+        f"Merged {len(results)} workflow results into {merged.batch_id}: "
+        f"{merged.total_patients} patients, {duplicates_dropped} duplicate(s) dropped"
+    )
+    return merged
+
+
 def _save_checkpoint(checkpoint: BatchCheckpoint, path: Path) -> None:
     """Save batch processing checkpoint to file.
     
@@ -1776,6 +2103,8 @@ def generate_integrated_workflow_summary(results: BatchWorkflowResult) -> str:
     pix_add_failed_pct = (pix_add_failed / results.total_patients * 100) if results.total_patients > 0 else 0
     lines.append(f"Successful:            {results.pix_add_success_count:3d} ({pix_add_pct:5.1f}%)")
     lines.append(f"Failed:                {pix_add_failed:3d} ({pix_add_failed_pct:5.1f}%)")
+    if results.pix_add_reused_count:
+        lines.append(f"Reused:                {results.pix_add_reused_count:3d}           ← Already registered (submission registry)")
     lines.append("")
     
     # ITI-41 results
@@ -1790,6 +2119,8 @@ def generate_integrated_workflow_summary(results: BatchWorkflowResult) -> str:
     lines.append(f"Successful:            {results.iti41_success_count:3d} ({iti41_pct:5.1f}%)")
     lines.append(f"Failed:                {iti41_failed:3d} ({iti41_failed_pct:5.1f}%)")
     lines.append(f"Skipped:               {iti41_skipped:3d} ({iti41_skipped_pct:5.1f}%)  ← Due to PIX Add failures")
+    if results.iti41_reused_count:
+        lines.append(f"Reused:                {results.iti41_reused_count:3d}           ← Already submitted (submission registry)")
     lines.append("")
     
     # Error breakdown - compute from patient results
@@ -1819,6 +2150,20 @@ def generate_integrated_workflow_summary(results: BatchWorkflowResult) -> str:
         lines.append(f"Throughput:                  {results.throughput_per_minute:.1f} patients/minute")
     lines.append("")
     
+    # Per-endpoint statistics (load balancing only)
+    if results.endpoint_stats:
+        lines.append("Endpoint Statistics")
+        lines.append("-" * 80)
+        for stats in results.endpoint_stats:
+            health = "healthy" if stats.healthy else "ejected"
+            lines.append(f"{stats.transaction:<8} {stats.url}")
+            lines.append(
+                f"  Requests: {stats.requests:4d}  Failures: {stats.failures:3d} "
+                f"({stats.failure_rate * 100:5.1f}%)  Ejections: {stats.ejections}  "
+                f"Avg: {stats.avg_time_ms:.0f}ms  ({health})"
+            )
+        lines.append("")
+    
     lines.append("=" * 80)
     
     return "\n".join(lines)
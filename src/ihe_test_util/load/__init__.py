@@ -0,0 +1 @@
+"""Sustained load generation against PIX Add and ITI-41 endpoints."""
@@ -0,0 +1,191 @@
+"""Log-linear latency histogram with coordinated-omission correction.
+
+Latencies are recorded in microseconds into buckets whose width grows with
+the value (64 buckets per power of two), so every recorded value is kept
+within 1.6% of its bucket's upper bound regardless of magnitude. Memory
+is fixed at roughly 2,000 counters for latencies up to hours, so a histogram
+can record every transaction of a long load run.
+
+Coordinated omission: a load generator that waits for a slow response
+before sending the next request never measures the requests it failed to
+send during the stall, so the percentiles look better than what a client
+arriving on schedule would have seen. ``record_corrected`` and
+``corrected_copy`` back-fill those missing samples the way HdrHistogram does:
+a latency of ``v`` with an expected request interval ``i`` adds samples at
+``v - i``, ``v - 2i``, ... down to ``i``.
+"""
+
+from dataclasses import dataclass
+
+
+# Buckets per power of two (as a power of two); relative error <= 2 ** -(SUB_BUCKET_BITS - 1)
+SUB_BUCKET_BITS = 7
+_SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+_SUB_BUCKET_HALF = _SUB_BUCKET_COUNT // 2
+
+
+def bucket_index(value: int) -> int:
+    """Return the bucket of a non-negative integer value."""
+    if value < _SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return (shift + 1) * _SUB_BUCKET_HALF + ((value >> shift) - _SUB_BUCKET_HALF)
+
+
+def bucket_upper_bound(index: int) -> int:
+    """Return the largest value that falls into a bucket."""
+    if index < _SUB_BUCKET_COUNT:
+        return index
+    shift = index // _SUB_BUCKET_HALF - 1
+    lower = ((index % _SUB_BUCKET_HALF) + _SUB_BUCKET_HALF) << shift
+    return lower + (1 << shift) - 1
+
+
+@dataclass
+class LatencySummary:
+    """Percentile summary of a histogram, in milliseconds.
+
+    Attributes:
+        count: Recorded samples
+        min_ms: Smallest sample
+        mean_ms: Mean of the samples
+        p50_ms: Median
+        p90_ms: 90th percentile
+        p99_ms: 99th percentile
+        p999_ms: 99.9th percentile
+        max_ms: Largest sample
+    """
+
+    count: int = 0
+    min_ms: float = 0.0
+    mean_ms: float = 0.0
+    p50_ms: float = 0.0
+    p90_ms: float = 0.0
+    p99_ms: float = 0.0
+    p999_ms: float = 0.0
+    max_ms: float = 0.0
+
+
+class LatencyHistogram:
+    """Fixed-precision histogram of latencies in microseconds.
+
+    Not thread-safe; callers recording from several threads hold a lock.
+    """
+
+    def __init__(self) -> None:
+        self._counts: list[int] = []
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def record(self, value_us: float, count: int = 1) -> None:
+        """Record a latency.
+
+        Args:
+            value_us: Latency in microseconds (negative values count as 0)
+            count: Number of samples with this value
+        """
+        value = max(int(value_us), 0)
+        index = bucket_index(value)
+        counts = self._counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += count
+        if self.count == 0 or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += count
+        self.total += value * count
+
+    def record_corrected(self, value_us: float, expected_interval_us: float) -> None:
+        """Record a latency and the samples coordinated omission hid behind it.
+
+        Args:
+            value_us: Latency in microseconds
+            expected_interval_us: Expected time between requests (0 = no correction)
+        """
+        self.record(value_us)
+        if expected_interval_us <= 0:
+            return
+        missing = value_us - expected_interval_us
+        while missing >= expected_interval_us:
+            self.record(missing)
+            missing -= expected_interval_us
+
+    def corrected_copy(self, expected_interval_us: float) -> "LatencyHistogram":
+        """Return a copy corrected for coordinated omission.
+
+        Equivalent to having recorded every sample with ``record_corrected``;
+        samples are taken at their bucket's upper bound.
+
+        Args:
+            expected_interval_us: Expected time between requests (0 = plain copy)
+
+        Returns:
+            Corrected histogram
+        """
+        corrected = LatencyHistogram()
+        for index, bucket_count in enumerate(self._counts):
+            if not bucket_count:
+                continue
+            value = min(bucket_upper_bound(index), self.max)
+            corrected.record(value, bucket_count)
+            if expected_interval_us <= 0:
+                continue
+            missing = value - expected_interval_us
+            while missing >= expected_interval_us:
+                corrected.record(missing, bucket_count)
+                missing -= expected_interval_us
+        return corrected
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add the samples of another histogram."""
+        if not other.count:
+            return
+        if len(other._counts) > len(self._counts):
+            self._counts.extend([0] * (len(other._counts) - len(self._counts)))
+        for index, bucket_count in enumerate(other._counts):
+            self._counts[index] += bucket_count
+        if self.count == 0 or other.min < self.min:
+            self.min = other.min
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def percentile(self, percentile: float) -> int:
+        """Return the value at a percentile (0-100), in microseconds.
+
+        Returns the upper bound of the bucket holding the percentile, capped
+        at the largest recorded value.
+        """
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * percentile // 100))  # ceil without float drift
+        seen = 0
+        for index, bucket_count in enumerate(self._counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(bucket_upper_bound(index), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        """Mean latency in microseconds."""
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self) -> LatencySummary:
+        """Return the percentile summary in milliseconds."""
+        if not self.count:
+            return LatencySummary()
+        return LatencySummary(
+            count=self.count,
+            min_ms=self.min / 1000.0,
+            mean_ms=round(self.mean / 1000.0, 3),
+            p50_ms=self.percentile(50) / 1000.0,
+            p90_ms=self.percentile(90) / 1000.0,
+            p99_ms=self.percentile(99) / 1000.0,
+            p999_ms=self.percentile(99.9) / 1000.0,
+            max_ms=self.max / 1000.0,
+        )
@@ -0,0 +1,198 @@
+"""Load profiles: sequences of ramp, steady and spike phases.
+
+A phase has a kind, a duration and a start and end level. The level is the
+arrival rate in transactions per second for open-loop runs and the number of
+concurrent virtual users for closed-loop runs; it changes linearly from the
+start to the end level over the phase (ramps), or stays constant.
+
+Phases are written as ``kind:duration:level`` on the command line, with the
+level either a single value or ``start-end``::
+
+    ramp:2m:0-50      # ramp from 0 to 50 over two minutes
+    steady:1h:50      # hold 50 for an hour
+    spike:30s:200     # burst to 200 for 30 seconds
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from enum import Enum
+from typing import Iterator
+
+
+class PhaseKind(str, Enum):
+    """Kind of a load phase."""
+
+    RAMP = "ramp"
+    STEADY = "steady"
+    SPIKE = "spike"
+
+
+_DURATION_UNITS = {"": 1.0, "ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+_DURATION_PATTERN = re.compile(r"^(\d+(?:\.\d+)?)(ms|s|m|h)?$")
+
+
+def parse_duration(text: str) -> float:
+    """Parse a duration such as '90', '90s', '5m' or '1.5h' into seconds.
+
+    Raises:
+        ValueError: If the duration is malformed or not positive
+    """
+    match = _DURATION_PATTERN.match(text.strip())
+    if not match:
+        raise ValueError(f"Invalid duration '{text}'. Use a number with an optional unit: 30s, 5m, 1h.")
+    seconds = float(match.group(1)) * _DURATION_UNITS[match.group(2) or ""]
+    if seconds <= 0:
+        raise ValueError(f"Invalid duration '{text}': must be greater than zero.")
+    return seconds
+
+
+@dataclass
+class LoadPhase:
+    """One phase of a load profile.
+
+    Attributes:
+        kind: ramp, steady or spike
+        duration_seconds: Phase duration
+        start_level: Rate (open loop) or concurrency (closed loop) at the start
+        end_level: Rate or concurrency at the end
+    """
+
+    kind: PhaseKind
+    duration_seconds: float
+    start_level: float
+    end_level: float
+
+    @classmethod
+    def parse(cls, spec: str) -> "LoadPhase":
+        """Parse a ``kind:duration:level`` phase specification.
+
+        Args:
+            spec: Phase specification, e.g. 'ramp:2m:0-50' or 'steady:1h:50'
+
+        Returns:
+            Parsed phase
+
+        Raises:
+            ValueError: If the specification is malformed
+        """
+        parts = spec.split(":")
+        if len(parts) != 3:
+            raise ValueError(
+                f"Invalid phase '{spec}'. Use kind:duration:level, e.g. ramp:2m:0-50 or steady:1h:50."
+            )
+        kind_text, duration_text, level_text = parts
+        try:
+            kind = PhaseKind(kind_text.strip().lower())
+        except ValueError:
+            raise ValueError(
+                f"Invalid phase kind '{kind_text}' in '{spec}'. Use ramp, steady or spike."
+            ) from None
+        duration = parse_duration(duration_text)
+
+        try:
+            if "-" in level_text:
+                start_text, end_text = level_text.split("-", 1)
+                start, end = float(start_text), float(end_text)
+            else:
+                start = end = float(level_text)
+        except ValueError:
+            raise ValueError(f"Invalid level '{level_text}' in '{spec}'. Use a number or start-end.") from None
+        if start < 0 or end < 0:
+            raise ValueError(f"Invalid level '{level_text}' in '{spec}': levels cannot be negative.")
+        if kind != PhaseKind.RAMP and start != end:
+            raise ValueError(f"Phase '{spec}': only ramp phases can change level.")
+        return cls(kind=kind, duration_seconds=duration, start_level=start, end_level=end)
+
+    @property
+    def label(self) -> str:
+        """Short description, e.g. 'ramp 0-50 for 120s'."""
+        level = (
+            f"{self.start_level:g}-{self.end_level:g}"
+            if self.start_level != self.end_level
+            else f"{self.start_level:g}"
+        )
+        return f"{self.kind.value} {level} for {self.duration_seconds:g}s"
+
+    def level_at(self, elapsed: float) -> float:
+        """Return the level at ``elapsed`` seconds into the phase."""
+        fraction = min(max(elapsed / self.duration_seconds, 0.0), 1.0)
+        return self.start_level + (self.end_level - self.start_level) * fraction
+
+    def arrival_offsets(self) -> Iterator[float]:
+        """Yield the offsets (seconds into the phase) of open-loop arrivals.
+
+        The n-th arrival is placed where the integrated rate reaches n, so a
+        ramp's arrivals follow its rate exactly.
+        """
+        r0, r1, duration = self.start_level, self.end_level, self.duration_seconds
+        slope = (r1 - r0) / duration
+        n = 1
+        while True:
+            if slope == 0:
+                if r0 == 0:
+                    return
+                offset = n / r0
+            else:
+                # Solve r0 * t + slope / 2 * t^2 = n for the first t >= 0
+                discriminant = r0 * r0 + 2.0 * slope * n
+                if discriminant < 0:
+                    return
+                offset = (math.sqrt(discriminant) - r0) / slope
+            if offset > duration:
+                return
+            yield offset
+            n += 1
+
+
+@dataclass
+class LoadProfile:
+    """Sequence of load phases.
+
+    Attributes:
+        phases: Phases in execution order
+    """
+
+    phases: list[LoadPhase]
+
+    @classmethod
+    def parse(cls, specs: list[str] | tuple[str, ...]) -> "LoadProfile":
+        """Parse phase specifications into a profile.
+
+        Raises:
+            ValueError: If no phase is given or a specification is malformed
+        """
+        if not specs:
+            raise ValueError("A load profile needs at least one phase.")
+        return cls([LoadPhase.parse(spec) for spec in specs])
+
+    @property
+    def duration_seconds(self) -> float:
+        """Total duration of all phases."""
+        return sum(phase.duration_seconds for phase in self.phases)
+
+    @property
+    def peak_level(self) -> float:
+        """Highest level of any phase."""
+        return max(max(phase.start_level, phase.end_level) for phase in self.phases)
+
+    def phase_at(self, elapsed: float) -> tuple[int, float] | None:
+        """Return the phase index and level at ``elapsed`` seconds into the run.
+
+        Returns:
+            (phase index, level), or None once the profile has ended
+        """
+        phase_start = 0.0
+        for index, phase in enumerate(self.phases):
+            if elapsed < phase_start + phase.duration_seconds:
+                return index, phase.level_at(elapsed - phase_start)
+            phase_start += phase.duration_seconds
+        return None
+
+    def arrivals(self) -> Iterator[tuple[float, int]]:
+        """Yield (offset from the run start, phase index) for every open-loop arrival."""
+        phase_start = 0.0
+        for index, phase in enumerate(self.phases):
+            for offset in phase.arrival_offsets():
+                yield phase_start + offset, index
+            phase_start += phase.duration_seconds
@@ -0,0 +1,601 @@
+"""Open- and closed-loop load runner for IHE transactions.
+
+``LoadRunner`` drives a transaction callable with patients from a
+``PatientSource`` according to a ``LoadProfile``:
+
+- **Open loop** (``LoadMode.OPEN``): requests are started on a precomputed
+  arrival schedule whatever the endpoint's response time, like independent
+  clients would. Response times are measured from each request's *scheduled*
+  start, so time spent waiting for a free sender thread counts against the
+  endpoint — the coordinated-omission-corrected latency. If more than
+  ``max_in_flight`` requests are already waiting, new arrivals are dropped
+  and counted instead of queueing without bound.
+- **Closed loop** (``LoadMode.CLOSED``): the profile level is the number of
+  virtual users; each sends a request, waits for the response and the think
+  time, and repeats. The corrected latencies back-fill the requests that
+  stalled users would have sent, with the expected interval being the think
+  time plus the median service time.
+
+Every completion is recorded in per-transaction ``LatencyHistogram``s; a
+progress callback receives a ``LoadProgress`` snapshot every interval.
+"""
+
+import logging
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, replace
+from datetime import date, datetime, timezone
+from enum import Enum
+from typing import Callable, Optional
+
+from ihe_test_util.ihe_transactions.workflows import IntegratedWorkflow
+from ihe_test_util.load.histogram import LatencyHistogram, LatencySummary
+from ihe_test_util.load.profile import LoadProfile
+from ihe_test_util.models.batch import PatientWorkflowResult
+from ihe_test_util.models.patient import PatientDemographics
+from ihe_test_util.models.saml import SAMLAssertion
+
+
+logger = logging.getLogger(__name__)
+
+# Label of the end-to-end latency of one load transaction
+TOTAL_LABEL = "total"
+
+# Longest error message kept in the report (messages are grouped by text)
+MAX_ERROR_MESSAGE_LENGTH = 200
+
+_FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda",
+                "David", "Elizabeth", "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica"]
+_LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+               "Rodriguez", "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson"]
+_CITIES = [("Springfield", "IL", "62701"), ("Chicago", "IL", "60601"), ("Boston", "MA", "02108"),
+           ("Denver", "CO", "80202"), ("Austin", "TX", "73301"), ("Portland", "OR", "97201")]
+
+
+class LoadMode(str, Enum):
+    """How the runner paces transactions."""
+
+    OPEN = "open"
+    CLOSED = "closed"
+
+
+class LoadTransaction(str, Enum):
+    """Transaction driven by the runner."""
+
+    PIX_ADD = "pix-add"
+    ITI41 = "iti41"
+    WORKFLOW = "workflow"
+
+
+@dataclass
+class TransactionOutcome:
+    """Result of one load transaction.
+
+    Attributes:
+        success: Whether the transaction succeeded
+        timings_ms: Per-step latencies to record in addition to the total
+            (e.g. 'pix_add' and 'iti41' for the combined workflow)
+        error: Error description of a failed transaction
+    """
+
+    success: bool
+    timings_ms: dict[str, float] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+class PatientSource:
+    """Thread-safe supply of patients: synthesised, or recycled from a template list.
+
+    Recycled patients keep the demographics of their template. Unless
+    ``reuse_ids`` is set, every patient gets a fresh ID
+    (``<prefix><sequence>``) so repeated passes over a small CSV register new
+    patients instead of duplicates.
+    """
+
+    def __init__(
+        self,
+        templates: Optional[list[PatientDemographics]] = None,
+        patient_id_oid: str = "2.16.840.1.113883.3.9999.1",
+        id_prefix: Optional[str] = None,
+        reuse_ids: bool = False,
+        seed: Optional[int] = None,
+    ) -> None:
+        """Initialize the source.
+
+        Args:
+            templates: Patients to recycle (None: synthesise patients)
+            patient_id_oid: Assigning authority OID of synthesised patients
+            id_prefix: Patient ID prefix (default: 'LOAD-<random>-')
+            reuse_ids: Keep the template patient IDs when recycling
+            seed: Random seed for synthesised demographics
+        """
+        if templates is not None and not templates:
+            raise ValueError("PatientSource needs at least one template patient.")
+        self._templates = templates
+        self._patient_id_oid = patient_id_oid
+        self._id_prefix = id_prefix if id_prefix is not None else f"LOAD-{uuid.uuid4().hex[:6].upper()}-"
+        self._reuse_ids = reuse_ids
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    def next(self) -> PatientDemographics:
+        """Return the next patient."""
+        with self._lock:
+            sequence = self._sequence
+            self._sequence += 1
+            if self._templates is None:
+                return self._synthesise(sequence)
+
+        template = self._templates[sequence % len(self._templates)]
+        if self._reuse_ids:
+            return template
+        return replace(template, patient_id=f"{self._id_prefix}{sequence + 1:08d}")
+
+    def _synthesise(self, sequence: int) -> PatientDemographics:
+        """Build random demographics (caller holds the lock)."""
+        rng = self._random
+        city, state, zip_code = rng.choice(_CITIES)
+        return PatientDemographics(
+            patient_id=f"{self._id_prefix}{sequence + 1:08d}",
+            patient_id_oid=self._patient_id_oid,
+            first_name=rng.choice(_FIRST_NAMES),
+            last_name=rng.choice(_LAST_NAMES),
+            dob=date.fromordinal(date(1930, 1, 1).toordinal() + rng.randrange(30000)),
+            gender=rng.choice("MF"),
+            mrn=f"MRN{sequence + 1:08d}",
+            address=f"{rng.randrange(1, 9999)} Main Street",
+            city=city,
+            state=state,
+            zip=zip_code,
+        )
+
+
+class AssertionCache:
+    """Reuses a signed SAML assertion and re-signs it before it expires."""
+
+    def __init__(self, generate: Callable[[], SAMLAssertion], refresh_seconds: float = 1800.0) -> None:
+        """Initialize the cache.
+
+        Args:
+            generate: Returns a freshly signed assertion
+            refresh_seconds: Age after which the assertion is regenerated
+        """
+        self._generate = generate
+        self._refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._assertion: Optional[SAMLAssertion] = None
+        self._created = 0.0
+
+    def get(self) -> SAMLAssertion:
+        """Return a valid assertion."""
+        with self._lock:
+            now = time.monotonic()
+            if self._assertion is None or now - self._created >= self._refresh_seconds:
+                self._assertion = self._generate()
+                self._created = now
+            return self._assertion
+
+
+def build_workflow_transaction(
+    workflow: IntegratedWorkflow,
+    transaction: LoadTransaction,
+    assertions: AssertionCache,
+) -> Callable[[PatientDemographics], TransactionOutcome]:
+    """Adapt ``IntegratedWorkflow.process_patient`` into a load transaction.
+
+    The workflow's batch configuration selects the transaction: PIX-only
+    mode for PIX Add, ITI-41-only mode (every patient treated as registered
+    under its own ID) for ITI-41, and the full workflow otherwise.
+
+    Args:
+        workflow: Integrated workflow with the clients and CCD template
+        transaction: Transaction to run
+        assertions: Source of the SAML assertion
+
+    Returns:
+        Callable running one transaction for a patient
+    """
+    lookup = workflow.batch_config.pix_results_lookup
+
+    def run(patient: PatientDemographics) -> TransactionOutcome:
+        if transaction == LoadTransaction.ITI41:
+            lookup[patient.patient_id] = {
+                "pix_add_status": "success",
+                "pix_enterprise_id": patient.patient_id,
+                "pix_enterprise_id_oid": patient.patient_id_oid,
+            }
+        try:
+            result = workflow.process_patient(patient, assertions.get())
+        finally:
+            if transaction == LoadTransaction.ITI41:
+                lookup.pop(patient.patient_id, None)
+        return _outcome_from_result(result, transaction)
+
+    return run
+
+
+def _outcome_from_result(result: PatientWorkflowResult, transaction: LoadTransaction) -> TransactionOutcome:
+    """Translate a workflow result into a load outcome."""
+    if transaction == LoadTransaction.PIX_ADD:
+        success = result.pix_add_status == "success"
+        error = None if success else result.error_message or result.pix_add_message
+        return TransactionOutcome(success=success, error=error)
+    if transaction == LoadTransaction.ITI41:
+        success = result.iti41_status == "success"
+        error = None if success else result.error_message or result.iti41_message
+        return TransactionOutcome(success=success, error=error)
+
+    timings: dict[str, float] = {}
+    if result.pix_add_status in ("success", "failed"):
+        timings["pix_add"] = float(result.pix_add_time_ms)
+    if result.iti41_status in ("success", "failed"):
+        timings["iti41"] = float(result.iti41_time_ms)
+    success = result.is_fully_successful
+    error = None
+    if not success:
+        if result.pix_add_status != "success":
+            error = f"PIX Add: {result.error_message or result.pix_add_message}"
+        else:
+            error = f"ITI-41: {result.error_message or result.iti41_message}"
+    return TransactionOutcome(success=success, timings_ms=timings, error=error)
+
+
+@dataclass
+class LoadProgress:
+    """Live snapshot passed to the progress callback.
+
+    Attributes:
+        elapsed_seconds: Time since the run started
+        phase: Current phase label
+        target_level: Current target rate (open loop) or concurrency (closed loop)
+        completed: Transactions completed so far
+        failed: Failed transactions so far
+        dropped: Arrivals dropped because the client was saturated (open loop)
+        in_flight: Transactions started or waiting for a sender thread
+        throughput: Completions per second over the last interval
+        interval: Latency summary of the last interval (corrected latency)
+    """
+
+    elapsed_seconds: float
+    phase: str
+    target_level: float
+    completed: int
+    failed: int
+    dropped: int
+    in_flight: int
+    throughput: float
+    interval: LatencySummary
+
+
+@dataclass
+class PhaseReport:
+    """Outcome of one profile phase.
+
+    Attributes:
+        label: Phase description
+        completed: Transactions completed (started in this phase)
+        failed: Failed transactions
+        dropped: Dropped arrivals (open loop)
+        throughput: Completions per second of phase duration
+        latency: Corrected latency summary
+    """
+
+    label: str
+    completed: int
+    failed: int
+    dropped: int
+    throughput: float
+    latency: LatencySummary
+
+
+@dataclass
+class LoadReport:
+    """Final report of a load run.
+
+    Attributes:
+        mode: open or closed
+        transaction: Transaction that was driven
+        started_at: Run start (ISO 8601, UTC)
+        duration_seconds: Wall-clock duration
+        interrupted: True if the run was stopped before the profile ended
+        completed: Transactions completed
+        succeeded: Successful transactions
+        failed: Failed transactions
+        dropped: Dropped arrivals (open loop)
+        throughput: Completions per second
+        corrected_latency: Coordinated-omission-corrected end-to-end latency
+        service_latency: Per-label latency from actual send to completion
+        phases: Per-phase breakdown
+        errors: Most frequent error messages with counts
+    """
+
+    mode: str
+    transaction: str
+    started_at: str
+    duration_seconds: float
+    interrupted: bool
+    completed: int
+    succeeded: int
+    failed: int
+    dropped: int
+    throughput: float
+    corrected_latency: LatencySummary
+    service_latency: dict[str, LatencySummary]
+    phases: list[PhaseReport]
+    errors: dict[str, int]
+
+    def to_dict(self) -> dict:
+        """Return the report as JSON-serialisable data."""
+        return asdict(self)
+
+
+class _PhaseStats:
+    """Counters of one phase (updated under the runner lock)."""
+
+    def __init__(self) -> None:
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.latency = LatencyHistogram()
+
+
+class LoadRunner:
+    """Drives a transaction according to a load profile."""
+
+    def __init__(
+        self,
+        transaction: Callable[[PatientDemographics], TransactionOutcome],
+        patients: PatientSource,
+        profile: LoadProfile,
+        mode: LoadMode = LoadMode.OPEN,
+        transaction_name: str = LoadTransaction.WORKFLOW.value,
+        max_in_flight: int = 64,
+        think_time_seconds: float = 0.0,
+        progress_callback: Optional[Callable[[LoadProgress], None]] = None,
+        progress_interval_seconds: float = 5.0,
+    ) -> None:
+        """Initialize the runner.
+
+        Args:
+            transaction: Runs one transaction for a patient
+            patients: Patient supply
+            profile: Load phases
+            mode: Open loop (arrival rate) or closed loop (virtual users)
+            transaction_name: Name of the transaction for the report
+            max_in_flight: Sender threads (open loop); arrivals beyond twice
+                this many outstanding transactions are dropped
+            think_time_seconds: Pause between a user's transactions (closed loop)
+            progress_callback: Receives a snapshot every progress interval
+            progress_interval_seconds: Seconds between progress snapshots
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1.")
+        self._transaction = transaction
+        self._patients = patients
+        self._profile = profile
+        self._mode = mode
+        self._transaction_name = transaction_name
+        self._max_in_flight = max_in_flight
+        self._think_time = think_time_seconds
+        self._progress_callback = progress_callback
+        self._progress_interval = progress_interval_seconds
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._stop_requested = False
+        self._start = 0.0
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._dropped = 0
+        self._errors: Counter = Counter()
+        self._service: dict[str, LatencyHistogram] = {}
+        self._corrected = LatencyHistogram()
+        self._window = LatencyHistogram()
+        self._window_completed = 0
+        self._phases = [_PhaseStats() for _ in profile.phases]
+
+    def stop(self) -> None:
+        """Ask a running load run to stop (safe from any thread)."""
+        self._stop_requested = True
+        self._stop.set()
+
+    def run(self) -> LoadReport:
+        """Run the whole profile (or until ``stop``/Ctrl+C) and return the report."""
+        started_at = datetime.now(timezone.utc).isoformat()
+        self._start = time.perf_counter()
+        reporter = None
+        if self._progress_callback is not None:
+            reporter = threading.Thread(target=self._report_progress, name="load-progress", daemon=True)
+            reporter.start()
+
+        interrupted = False
+        try:
+            if self._mode == LoadMode.OPEN:
+                self._run_open_loop()
+            else:
+                self._run_closed_loop()
+        except KeyboardInterrupt:
+            logger.warning("Load run interrupted")
+            interrupted = True
+        interrupted = interrupted or self._stop_requested
+        self._stop.set()
+        if reporter is not None:
+            reporter.join()
+
+        return self._build_report(started_at, time.perf_counter() - self._start, interrupted)
+
+    def _run_open_loop(self) -> None:
+        """Start transactions on the arrival schedule."""
+        backlog_limit = 2 * self._max_in_flight
+        executor = ThreadPoolExecutor(max_workers=self._max_in_flight, thread_name_prefix="load")
+        try:
+            for offset, phase_index in self._profile.arrivals():
+                delay = self._start + offset - time.perf_counter()
+                if delay > 0 and self._stop.wait(delay):
+                    break
+                if self._stop.is_set():
+                    break
+                with self._lock:
+                    if self._in_flight >= backlog_limit:
+                        self._dropped += 1
+                        self._phases[phase_index].dropped += 1
+                        continue
+                    self._in_flight += 1
+                executor.submit(self._execute, self._start + offset, phase_index)
+        except BaseException:
+            self._stop.set()
+            raise
+        finally:
+            executor.shutdown(wait=True, cancel_futures=self._stop.is_set())
+
+    def _run_closed_loop(self) -> None:
+        """Run one thread per virtual user at the profile's peak concurrency."""
+        users = [
+            threading.Thread(target=self._user_loop, args=(user,), name=f"load-user-{user}", daemon=True)
+            for user in range(max(int(round(self._profile.peak_level)), 1))
+        ]
+        for user in users:
+            user.start()
+        try:
+            while any(user.is_alive() for user in users):
+                for user in users:
+                    user.join(0.2)
+        finally:
+            self._stop.set()
+            for user in users:
+                user.join()
+
+    def _user_loop(self, user: int) -> None:
+        """Closed-loop virtual user: active while the profile's level exceeds its number."""
+        while not self._stop.is_set():
+            current = self._profile.phase_at(time.perf_counter() - self._start)
+            if current is None:
+                return
+            phase_index, level = current
+            if user >= int(round(level)):
+                self._stop.wait(0.05)
+                continue
+            with self._lock:
+                self._in_flight += 1
+            self._execute(time.perf_counter(), phase_index)
+            if self._think_time:
+                self._stop.wait(self._think_time)
+
+    def _execute(self, intended_start: float, phase_index: int) -> None:
+        """Run one transaction and record its latencies."""
+        try:
+            patient = self._patients.next()
+            started = time.perf_counter()
+            try:
+                outcome = self._transaction(patient)
+            except Exception as e:
+                outcome = TransactionOutcome(success=False, error=f"{type(e).__name__}: {e}")
+            finished = time.perf_counter()
+        except Exception as e:
+            logger.error(f"Load transaction setup failed: {e}", exc_info=True)
+            started = finished = time.perf_counter()
+            outcome = TransactionOutcome(success=False, error=f"{type(e).__name__}: {e}")
+
+        service_us = (finished - started) * 1_000_000
+        response_us = (finished - intended_start) * 1_000_000
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+            self._window_completed += 1
+            phase = self._phases[phase_index]
+            phase.completed += 1
+            if not outcome.success:
+                self._failed += 1
+                phase.failed += 1
+                message = (outcome.error or "unknown error")[:MAX_ERROR_MESSAGE_LENGTH]
+                self._errors[message] += 1
+            self._record(TOTAL_LABEL, service_us)
+            for label, value_ms in outcome.timings_ms.items():
+                self._record(label, value_ms * 1000.0)
+            self._corrected.record(response_us)
+            self._window.record(response_us)
+            phase.latency.record(response_us)
+
+    def _record(self, label: str, value_us: float) -> None:
+        histogram = self._service.get(label)
+        if histogram is None:
+            histogram = self._service[label] = LatencyHistogram()
+        histogram.record(value_us)
+
+    def _report_progress(self) -> None:
+        """Emit a progress snapshot every interval until the run stops."""
+        last = time.perf_counter()
+        while not self._stop.wait(self._progress_interval):
+            now = time.perf_counter()
+            elapsed = now - self._start
+            current = self._profile.phase_at(elapsed)
+            if current is None:
+                phase_label, level = "draining", 0.0
+            else:
+                phase_label, level = self._profile.phases[current[0]].label, current[1]
+            with self._lock:
+                window, self._window = self._window, LatencyHistogram()
+                window_completed, self._window_completed = self._window_completed, 0
+                snapshot = LoadProgress(
+                    elapsed_seconds=elapsed,
+                    phase=phase_label,
+                    target_level=level,
+                    completed=self._completed,
+                    failed=self._failed,
+                    dropped=self._dropped,
+                    in_flight=self._in_flight,
+                    throughput=window_completed / (now - last) if now > last else 0.0,
+                    interval=window.summary(),
+                )
+            last = now
+            try:
+                self._progress_callback(snapshot)
+            except Exception as e:
+                logger.warning(f"Load progress callback failed: {e}")
+
+    def _build_report(self, started_at: str, duration: float, interrupted: bool) -> LoadReport:
+        """Summarise the recorded histograms."""
+        with self._lock:
+            corrected = self._corrected
+            phase_histograms = [phase.latency for phase in self._phases]
+            if self._mode == LoadMode.CLOSED:
+                # Back-fill the requests stalled users did not send
+                total = self._service.get(TOTAL_LABEL)
+                median_us = total.percentile(50) if total else 0
+                expected_interval_us = self._think_time * 1_000_000 + median_us
+                corrected = corrected.corrected_copy(expected_interval_us)
+                phase_histograms = [h.corrected_copy(expected_interval_us) for h in phase_histograms]
+
+            phases = [
+                PhaseReport(
+                    label=phase.label,
+                    completed=stats.completed,
+                    failed=stats.failed,
+                    dropped=stats.dropped,
+                    throughput=round(stats.completed / phase.duration_seconds, 3),
+                    latency=histogram.summary(),
+                )
+                for phase, stats, histogram in zip(self._profile.phases, self._phases, phase_histograms)
+            ]
+            return LoadReport(
+                mode=self._mode.value,
+                transaction=self._transaction_name,
+                started_at=started_at,
+                duration_seconds=round(duration, 3),
+                interrupted=interrupted,
+                completed=self._completed,
+                succeeded=self._completed - self._failed,
+                failed=self._failed,
+                dropped=self._dropped,
+                throughput=round(self._completed / duration, 3) if duration > 0 else 0.0,
+                corrected_latency=corrected.summary(),
+                service_latency={label: h.summary() for label, h in sorted(self._service.items())},
+                phases=phases,
+                errors=dict(self._errors.most_common(20)),
+            )
@@ -4,13 +4,42 @@ This module provides logging configuration and audit trail functionality.
 """
 
 from .audit import log_audit_event, log_transaction
-from .formatters import PIIRedactingFormatter
-from .logger import configure_logging, get_logger
+from .audit_sink import (
+    AuditRecord,
+    AuditSink,
+    close_audit_sink,
+    iter_audit_records,
+    open_audit_sink,
+    record_audit,
+)
+from .formatters import OversizePolicy, PIIRedactingFormatter, PIIRedactor
+from .logger import configure_logging, flush_logging, get_logger
+from .transaction_archive import (
+    ArchiveReader,
+    TransactionArchive,
+    archive_transaction,
+    close_transaction_archive,
+    open_transaction_archive,
+)
 
 __all__ = [
+    "ArchiveReader",
+    "archive_transaction",
+    "AuditRecord",
+    "AuditSink",
+    "close_audit_sink",
+    "close_transaction_archive",
     "configure_logging",
+    "flush_logging",
     "get_logger",
+    "iter_audit_records",
     "log_audit_event",
     "log_transaction",
+    "open_audit_sink",
+    "open_transaction_archive",
+    "OversizePolicy",
     "PIIRedactingFormatter",
+    "PIIRedactor",
+    "record_audit",
+    "TransactionArchive",
 ]
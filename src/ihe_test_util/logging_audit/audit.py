@@ -7,9 +7,11 @@ transactions, and compliance requirements.
 import logging
 import time
 import uuid
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
+from .audit_sink import record_audit
 from .logger import get_logger
+from .transaction_archive import archive_transaction
 
 logger = get_logger(__name__)
 
@@ -19,7 +21,8 @@ def log_audit_event(event_type: str, details: Dict[str, Any]) -> None:
     
     Creates a structured audit log entry with standard fields for tracking
     operations and compliance. Audit events are logged at INFO level for
-    successful operations and ERROR level for failures.
+    successful operations and ERROR level for failures. When an audit sink
+    is open, the event is also written to the JSONL audit trail.
     
     Args:
         event_type: Type of operation (e.g., "CSV_PROCESSED", "VALIDATION_FAILED",
@@ -90,6 +93,19 @@ def log_audit_event(event_type: str, details: Dict[str, Any]) -> None:
         logger.error(audit_message)
     else:
         logger.info(audit_message)
+    
+    duration = details.get("duration")
+    record_audit(
+        event_type,
+        status,
+        duration_ms=int(duration * 1000) if isinstance(duration, (int, float)) else None,
+        correlation_id=details["correlation_id"],
+        details={
+            key: value
+            for key, value in details.items()
+            if key not in ("status", "duration", "correlation_id", "timestamp")
+        },
+    )
 
 
 def log_transaction(
@@ -97,44 +113,70 @@ def log_transaction(
     request: str,
     response: str,
     status: str = "success",
+    message_id: Optional[str] = None,
+    patient_id: Optional[str] = None,
+    attachments: Optional[Dict[str, str]] = None,
 ) -> None:
     """Log a complete IHE transaction with request and response.
     
     This function is designed for logging complete SOAP transactions to meet
     compliance and debugging requirements. The transaction details are logged
-    at DEBUG level to avoid cluttering INFO logs.
+    at DEBUG level to avoid cluttering INFO logs. Payloads are passed as
+    %-style arguments, so they are only rendered by the log writer, and are
+    skipped entirely when DEBUG is disabled. When an audit sink is open, a
+    "transaction" record with the payload sizes is written to it.
+    
+    When a transaction archive is open, the payloads (and ``attachments``)
+    are archived under ``message_id`` instead of being written to the log.
     
     Args:
         transaction_type: Type of transaction (e.g., "PIX_ADD", "ITI41_SUBMIT")
         request: Full request XML/SOAP envelope
         response: Full response XML/SOAP envelope
         status: Transaction status ("success" or "failure")
+        message_id: Request message ID (used as correlation ID when given)
+        patient_id: Patient the transaction belongs to
+        attachments: Further payloads to archive, e.g. {"document": ccd_xml}
         
     Example:
         >>> request_xml = '<soap:Envelope>...</soap:Envelope>'
         >>> response_xml = '<soap:Envelope>...</soap:Envelope>'
         >>> log_transaction("PIX_ADD", request_xml, response_xml, "success")
     """
-    correlation_id = str(uuid.uuid4())
+    correlation_id = message_id or str(uuid.uuid4())
     
     # Log transaction header at INFO level
     logger.info(
-        f"TRANSACTION [{transaction_type}] | "
-        f"status={status} | "
-        f"correlation_id={correlation_id} | "
-        f"request_size={len(request)} bytes | "
-        f"response_size={len(response)} bytes"
+        "TRANSACTION [%s] | status=%s | correlation_id=%s | "
+        "request_size=%d bytes | response_size=%d bytes",
+        transaction_type, status, correlation_id, len(request), len(response),
+    )
+    record_audit(
+        "transaction",
+        status,
+        step=transaction_type,
+        correlation_id=correlation_id,
+        details={"request_bytes": len(request), "response_bytes": len(response)},
+    )
+    
+    archived = archive_transaction(
+        transaction_type,
+        correlation_id,
+        status,
+        request,
+        response,
+        patient_id=patient_id,
+        **(attachments or {}),
     )
     
     # Log full request and response at DEBUG level
+    if archived or not logger.isEnabledFor(logging.DEBUG):
+        return
     logger.debug(
-        f"TRANSACTION REQUEST [{transaction_type}] | "
-        f"correlation_id={correlation_id}\n"
-        f"{request}"
+        "TRANSACTION REQUEST [%s] | correlation_id=%s\n%s",
+        transaction_type, correlation_id, request,
     )
-    
     logger.debug(
-        f"TRANSACTION RESPONSE [{transaction_type}] | "
-        f"correlation_id={correlation_id}\n"
-        f"{response}"
+        "TRANSACTION RESPONSE [%s] | correlation_id=%s\n%s",
+        transaction_type, correlation_id, response,
     )
@@ -0,0 +1,479 @@
+"""Structured JSONL audit trail.
+
+Workflow steps, audit events and transactions are written as one JSON
+object per line, with fixed keys, to a dedicated audit file. Compliance
+questions such as "every failed ITI-41 step for batch X" are then simple
+filtered scans (see ``iter_audit_records`` and ``ihe-test-util audit
+query``) instead of regex scraping over the text log.
+
+Records are buffered in memory and written when the buffer reaches
+``flush_bytes``, every ``flush_interval`` seconds from a background thread,
+and on ``close()``. The file rotates at ``max_bytes``, keeping
+``backup_count`` segments, which are gzipped when ``compress`` is set.
+Writers only rename the full file (to ``<file>.rotated-<ns>``); gzipping it
+and shifting the older segments happens on a separate compression thread.
+
+Only one process writes and rotates a given audit file: the sink holding
+the lock on ``<file>.lock``. Other processes configured with the same file
+(e.g. sharded batch workers) write ``<stem>-<pid><suffix>`` next to it,
+and ``audit_files`` returns all of them.
+
+Record format (keys always present, unset values are null)::
+
+    {"v": 1, "timestamp": "2026-01-15T10:30:00.123+00:00",
+     "event": "workflow_step", "batch_id": "batch-...", "patient_id": "PAT001",
+     "step": "ITI41", "status": "SUCCESS", "duration_ms": 412,
+     "correlation_id": "urn:uuid:...", "details": "Document ID: 1.2.3"}
+"""
+
+import gzip
+import json
+import logging
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+AUDIT_SCHEMA_VERSION = 1
+
+DEFAULT_FLUSH_INTERVAL = 1.0  # seconds
+DEFAULT_FLUSH_BYTES = 64 * 1024
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+
+# Keys matched by substring before a line is parsed (see iter_audit_records)
+_PREFILTER_KEYS = ("event", "batch_id", "patient_id", "step", "status")
+
+_sink: Optional["AuditSink"] = None
+
+
+def _utc_timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+@dataclass
+class AuditRecord:
+    """One audit trail entry.
+
+    Attributes:
+        event: Record type ("workflow_step", "transaction", or an audit event
+            type such as "CSV_PROCESSED")
+        status: Outcome, e.g. "SUCCESS", "FAILED", "success"
+        batch_id: Batch the record belongs to
+        patient_id: Patient identifier ("BATCH" for batch-level steps)
+        step: Workflow step or transaction type, e.g. "PIX_ADD"
+        duration_ms: Step duration in milliseconds
+        correlation_id: Message or correlation ID linking related records
+        details: Free text or a JSON-serializable mapping
+        timestamp: UTC ISO-8601 time the record was created
+    """
+
+    event: str
+    status: str
+    batch_id: Optional[str] = None
+    patient_id: Optional[str] = None
+    step: Optional[str] = None
+    duration_ms: Optional[int] = None
+    correlation_id: Optional[str] = None
+    details: Any = None
+    timestamp: str = field(default_factory=_utc_timestamp)
+
+    def to_json(self) -> str:
+        """Serialize as one compact JSON line (without the newline)."""
+        return json.dumps(
+            {
+                "v": AUDIT_SCHEMA_VERSION,
+                "timestamp": self.timestamp,
+                "event": self.event,
+                "batch_id": self.batch_id,
+                "patient_id": self.patient_id,
+                "step": self.step,
+                "status": self.status,
+                "duration_ms": self.duration_ms,
+                "correlation_id": self.correlation_id,
+                "details": self.details,
+            },
+            separators=(",", ":"),
+            ensure_ascii=False,
+            default=str,
+        )
+
+
+def _try_lock(lock_file: Any) -> bool:
+    """Take a non-blocking exclusive lock, held until ``lock_file`` is closed."""
+    try:
+        if os.name == "nt":
+            import msvcrt
+
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def _process_path(path: Path) -> Path:
+    """Audit file of this process when another process owns ``path``."""
+    return path.with_name(f"{path.stem}-{os.getpid()}{path.suffix}")
+
+
+def _segment_path(path: Path, index: int, compress: bool) -> Path:
+    """Path of rotated segment ``index`` (1 is the newest)."""
+    return path.with_name(f"{path.name}.{index}{'.gz' if compress else ''}")
+
+
+class AuditSink:
+    """Buffered, rotating JSONL writer.
+
+    Thread-safe; ``write`` only appends to an in-memory buffer unless the
+    buffer has reached ``flush_bytes``. ``path`` is the file actually
+    written, which is the per-process file when another sink owns the
+    requested one.
+
+    Example:
+        >>> sink = AuditSink(Path("logs/audit.jsonl"), compress=True)
+        >>> sink.write(AuditRecord(event="workflow_step", status="SUCCESS"))
+        >>> sink.close()
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        flush_bytes: int = DEFAULT_FLUSH_BYTES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backup_count: int = DEFAULT_BACKUP_COUNT,
+        compress: bool = False,
+    ) -> None:
+        """Open (append to) the audit file and start the flush thread.
+
+        Args:
+            path: Audit file (parent directories are created)
+            flush_interval: Seconds between background flushes (0 disables them)
+            flush_bytes: Buffered size that triggers an immediate flush
+            max_bytes: Size at which the file rotates (0 disables rotation)
+            backup_count: Rotated segments to keep
+            compress: Gzip rotated segments
+        """
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Rotation renames the file under every other writer, so only the
+        # owner of the lock appends to it
+        self._lock_file: Optional[Any] = open(self.path.with_name(f"{self.path.name}.lock"), "ab")
+        if not _try_lock(self._lock_file):
+            self._lock_file.close()
+            self._lock_file = None
+            requested, self.path = self.path, _process_path(self.path)
+            logger.info(f"Audit file {requested} is in use by another process; writing {self.path}")
+        self._file = open(self.path, "ab")
+        self._file_size = self._file.tell()
+        self._buffer: list[str] = []
+        self._buffered = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # Full files waiting to be gzipped into segment 1, oldest first
+        self._rotated: "queue.Queue[Optional[Path]]" = queue.Queue()
+        self._compress_thread: Optional[threading.Thread] = None
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if flush_interval > 0:
+            self._thread = threading.Thread(
+                target=self._flush_periodically, name="audit-sink-flush", daemon=True
+            )
+            self._thread.start()
+
+    def write(self, record: AuditRecord) -> None:
+        """Buffer a record, flushing if the buffer is full."""
+        line = record.to_json() + "\n"
+        with self._lock:
+            if self._closed:
+                return
+            self._buffer.append(line)
+            self._buffered += len(line)
+            if self._buffered >= self.flush_bytes:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        """Write buffered records to the file."""
+        with self._lock:
+            if not self._closed:
+                self._flush_locked()
+
+    def close(self) -> None:
+        """Stop the flush thread, write remaining records and close the file.
+
+        Waits for rotated segments still being compressed.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._file.close()
+            self._closed = True
+            compress_thread = self._compress_thread
+        if compress_thread is not None:
+            self._rotated.put(None)
+            compress_thread.join()
+        if self._lock_file is not None:
+            self._lock_file.close()
+
+    def _flush_periodically(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def _flush_locked(self) -> None:
+        if not self._buffer:
+            return
+        data = "".join(self._buffer).encode("utf-8")
+        self._buffer.clear()
+        self._buffered = 0
+        if self.max_bytes and self._file_size and self._file_size + len(data) > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._file_size += len(data)
+
+    def _rotate(self) -> None:
+        """Start a new file; the full one becomes segment 1.
+
+        Called with the lock held, so with ``compress`` the full file is only
+        renamed here and gzipped on the compression thread.
+        """
+        self._file.close()
+        if self.backup_count <= 0:
+            self.path.unlink()
+        elif self.compress:
+            # Unique even next to files left behind by a crashed process
+            rotated = self.path.with_name(f"{self.path.name}.rotated-{time.time_ns()}")
+            os.replace(self.path, rotated)
+            if self._compress_thread is None:
+                self._compress_thread = threading.Thread(
+                    target=self._compress_rotated, name="audit-sink-compress", daemon=True
+                )
+                self._compress_thread.start()
+            self._rotated.put(rotated)
+        else:
+            self._shift_segments()
+            os.replace(self.path, _segment_path(self.path, 1, compress=False))
+        logger.debug("Rotated audit file %s", self.path)
+        self._file = open(self.path, "ab")
+        self._file_size = 0
+
+    def _shift_segments(self) -> None:
+        """Renumber segments 1..backup_count-1 up by one (the oldest is replaced)."""
+        for index in range(self.backup_count - 1, 0, -1):
+            source = _segment_path(self.path, index, self.compress)
+            if source.exists():
+                os.replace(source, _segment_path(self.path, index + 1, self.compress))
+
+    def _compress_rotated(self) -> None:
+        """Gzip rotated files into segment 1, in rotation order, until close()."""
+        while (rotated := self._rotated.get()) is not None:
+            newest = _segment_path(self.path, 1, compress=True)
+            partial = newest.with_name(f"{newest.name}.tmp")
+            try:
+                with open(rotated, "rb") as source_file, gzip.open(partial, "wb") as target:
+                    shutil.copyfileobj(source_file, target)
+                self._shift_segments()
+                os.replace(partial, newest)
+                rotated.unlink()
+            except OSError as e:
+                logger.error(f"Failed to compress rotated audit file {rotated}: {e}")
+
+
+def open_audit_sink(path: Path, **options: Any) -> AuditSink:
+    """Open an audit sink and make it the destination of ``record_audit``.
+
+    Args:
+        path: Audit file
+        **options: AuditSink options (flush_interval, max_bytes, compress, ...)
+
+    Returns:
+        The active sink
+    """
+    global _sink
+    close_audit_sink()
+    _sink = AuditSink(path, **options)
+    logger.info(f"Writing audit trail to {path}")
+    return _sink
+
+
+def close_audit_sink() -> None:
+    """Flush and close the active audit sink, if any."""
+    global _sink
+    sink, _sink = _sink, None
+    if sink is not None:
+        sink.close()
+
+
+def get_audit_sink() -> Optional[AuditSink]:
+    """Return the active audit sink, or None when the audit trail is off."""
+    return _sink
+
+
+@contextmanager
+def audit_sink(path: Path, **options: Any) -> Iterator[AuditSink]:
+    """Record audit entries to ``path`` for the duration of the block."""
+    sink = open_audit_sink(path, **options)
+    try:
+        yield sink
+    finally:
+        close_audit_sink()
+
+
+def record_audit(event: str, status: str, **fields: Any) -> None:
+    """Write an audit record to the active sink; a no-op when none is open.
+
+    Args:
+        event: Record type
+        status: Outcome
+        **fields: Other AuditRecord fields (batch_id, patient_id, step, ...)
+
+    Example:
+        >>> record_audit("workflow_step", "SUCCESS", patient_id="PAT001",
+        ...              step="PIX_ADD", duration_ms=120)
+    """
+    sink = _sink
+    if sink is not None:
+        sink.write(AuditRecord(event=event, status=status, **fields))
+
+
+def audit_files(path: Path) -> list[Path]:
+    """Return every file of the audit trail at ``path``, oldest first.
+
+    For the audit file, then each per-process file next to it (see
+    AuditSink): its numbered segments, rotated files still waiting to be
+    gzipped, and the file itself.
+    """
+    path = Path(path)
+    files = _trail_files(path)
+    per_process = re.compile(rf"{re.escape(path.stem)}-\d+{re.escape(path.suffix)}")
+    for candidate in sorted(path.parent.glob(f"{path.stem}-*{path.suffix}")):
+        if per_process.fullmatch(candidate.name):
+            files.extend(_trail_files(candidate))
+    return files
+
+
+def _trail_files(path: Path) -> list[Path]:
+    """Segments, pending rotated files and the live file of one audit file."""
+    segments = []
+    pending = []
+    for candidate in path.parent.glob(f"{path.name}.*"):
+        suffix = candidate.name[len(path.name) + 1:]
+        index = suffix.removesuffix(".gz")
+        if index.isdigit():
+            segments.append((int(index), candidate))
+        elif suffix.startswith("rotated-") and suffix[len("rotated-"):].isdigit():
+            pending.append((int(suffix[len("rotated-"):]), candidate))
+    files = [candidate for _, candidate in sorted(segments, reverse=True)]
+    files.extend(candidate for _, candidate in sorted(pending))
+    if path.exists():
+        files.append(path)
+    return files
+
+
+def _open_text(path: Path):
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def parse_audit_time(value: Optional[str | datetime]) -> Optional[datetime]:
+    """Parse an ISO-8601 time filter; naive times are taken as UTC.
+
+    Raises:
+        ValueError: If ``value`` is not an ISO-8601 time
+    """
+    if value is None or isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(value)
+    if parsed is not None and parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def iter_audit_records(
+    paths: Iterable[Path],
+    event: Optional[str] = None,
+    batch_id: Optional[str] = None,
+    patient_id: Optional[str] = None,
+    step: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[str | datetime] = None,
+    until: Optional[str | datetime] = None,
+) -> Iterator[dict[str, Any]]:
+    """Stream matching records from audit files, one line at a time.
+
+    Equality filters are first checked as substrings of the raw line, so
+    non-matching lines are skipped without being parsed.
+
+    Args:
+        paths: Audit files (plain or .gz), read in order
+        event: Only records of this type
+        batch_id: Only records of this batch
+        patient_id: Only records of this patient
+        step: Only records of this step
+        status: Only records with this status
+        since: Only records at or after this time (naive times are UTC)
+        until: Only records before this time (naive times are UTC)
+
+    Yields:
+        Matching records as dictionaries
+
+    Raises:
+        ValueError: If since/until is not an ISO-8601 time
+    """
+    equals = {
+        key: value
+        for key, value in zip(_PREFILTER_KEYS, (event, batch_id, patient_id, step, status), strict=True)
+        if value is not None
+    }
+    needles = [
+        f'"{key}":{json.dumps(value, ensure_ascii=False)}' for key, value in equals.items()
+    ]
+    since_time = parse_audit_time(since)
+    until_time = parse_audit_time(until)
+
+    for path in paths:
+        with _open_text(path) as lines:
+            for line_number, line in enumerate(lines, 1):
+                if not all(needle in line for needle in needles):
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping malformed audit line {path}:{line_number}")
+                    continue
+                if any(record.get(key) != value for key, value in equals.items()):
+                    continue
+                if since_time or until_time:
+                    timestamp = datetime.fromisoformat(record["timestamp"])
+                    if since_time and timestamp < since_time:
+                        continue
+                    if until_time and timestamp >= until_time:
+                        continue
+                yield record
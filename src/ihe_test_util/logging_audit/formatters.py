@@ -1,23 +1,180 @@
 """Custom log formatters for the IHE Test Utility.
 
 This module provides specialized formatters for logging, including PII redaction.
+
+Redaction runs once per formatted record, and records often embed whole
+SOAP envelopes or CCD documents. ``PIIRedactor`` therefore avoids one full
+regex scan per pattern: it rejects records that cannot contain PII with
+cheap substring checks, and otherwise finds every pattern in a single scan
+anchored on the punctuation each pattern requires ("-" for SSNs, "=" for
+``name=``, ":" for "Patient:"/"Name:"). Its output is identical to applying
+``REDACTION_PATTERNS`` one after another.
 """
 
 import logging
 import re
-from typing import List, Tuple
+from enum import Enum
+from typing import List, Optional, Tuple
+
+# Reference patterns: (regex, replacement), applied in order
+REDACTION_PATTERNS: List[Tuple[re.Pattern[str], str]] = [
+    # SSN pattern: 123-45-6789
+    (re.compile(r'\b\d{3}-\d{2}-\d{4}\b'), '[SSN-REDACTED]'),
+
+    # Patient name patterns in common formats
+    # Matches: name="John Doe", name='Jane Smith', name=Bob Jones
+    (re.compile(r'name=["\']?([^"\']+)["\']?'), 'name=[NAME-REDACTED]'),
+
+    # Additional name patterns in log messages
+    # Matches: "Patient: John Doe", "Name: Jane Smith"
+    (re.compile(r'(?:Patient|Name):\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)+)'),
+     r'\1: [NAME-REDACTED]'),
+]
+
+# Single-pass scanner equivalent to REDACTION_PATTERNS. Every match starts at
+# the pattern's anchor character; the text before it is checked by a
+# lookbehind, and _ANCHOR_OFFSETS gives the distance back to the real start.
+_PERSON_NAME = r'[A-Z][a-z]+(?:\s+[A-Z][a-z]+)+'
+_SCANNER = re.compile(
+    r'[-=:](?:'
+    r'(?P<ssn>(?<=\d{3}-)(?<!\w\d{3}-)\d{2}-\d{4}\b)'
+    r'|(?P<name>(?<=name=)["\']?[^"\']+["\']?)'
+    rf'|(?P<patient>(?<=Patient:)\s+(?P<patient_name>{_PERSON_NAME}))'
+    rf'|(?P<label>(?<=Name:)\s+(?P<label_name>{_PERSON_NAME}))'
+    r')'
+)
+_ANCHOR_OFFSETS = {"ssn": 3, "name": 4, "patient": 7, "label": 4}
+
+# Necessary condition for an SSN; unlike a full scan it has a literal prefix
+_SSN_HINT = re.compile(r'-\d{2}-\d{4}')
+
+# Records longer than this are truncated before redaction (TRUNCATE policy)
+MAX_REDACT_CHARS = 1024 * 1024
+
+# Extra characters scanned past the cut, so PII straddling it is still matched
+_TRUNCATE_MARGIN = 1024
+
+
+class OversizePolicy(str, Enum):
+    """How the redactor handles records longer than its size limit."""
+
+    TRUNCATE = "truncate"  # Redact and keep the first max_chars characters
+    SCAN = "scan"  # Redact the whole record regardless of size
+
+
+class PIIRedactor:
+    """Single-pass redaction engine used by PIIRedactingFormatter.
+
+    Attributes:
+        max_chars: Size limit in characters (None for no limit)
+        oversize_policy: What to do with records over the limit
+
+    Example:
+        >>> PIIRedactor().redact("SSN: 123-45-6789")
+        'SSN: [SSN-REDACTED]'
+    """
+
+    def __init__(
+        self,
+        max_chars: Optional[int] = MAX_REDACT_CHARS,
+        oversize_policy: OversizePolicy = OversizePolicy.TRUNCATE,
+    ) -> None:
+        """Initialize the redactor.
+
+        Args:
+            max_chars: Size limit in characters (None for no limit)
+            oversize_policy: What to do with records over the limit
+        """
+        self.max_chars = max_chars
+        self.oversize_policy = oversize_policy
+
+    def redact(self, text: str) -> str:
+        """Return ``text`` with SSNs and patient names redacted.
+
+        Args:
+            text: Formatted log record
+
+        Returns:
+            Redacted text, truncated with a marker if it exceeded the size
+            limit under the TRUNCATE policy
+        """
+        limit = len(text)
+        if (
+            self.max_chars is not None
+            and limit > self.max_chars
+            and self.oversize_policy == OversizePolicy.TRUNCATE
+        ):
+            limit = self.max_chars
+
+        if limit == len(text):
+            return self._scan(text, limit, limit)
+
+        scan_end = min(len(text), limit + _TRUNCATE_MARGIN)
+        return self._scan(text, limit, scan_end) + f"... [TRUNCATED: {len(text)} chars total]"
+
+    @staticmethod
+    def _may_contain_pii(text: str, end: int) -> bool:
+        """Fast reject: check the literal text every pattern requires."""
+        window = text if end == len(text) else text[:end]
+        return (
+            "name=" in window
+            or "Patient:" in window
+            or "Name:" in window
+            or _SSN_HINT.search(window) is not None
+        )
+
+    def _scan(self, text: str, limit: int, scan_end: int) -> str:
+        """Redact matches starting before ``limit``; drop the text after it."""
+        if not self._may_contain_pii(text, scan_end):
+            return text[:limit]
+
+        parts: List[str] = []
+        last_end = 0
+        for match in _SCANNER.finditer(text, 0, scan_end):
+            kind = match.lastgroup
+            start = match.start() - _ANCHOR_OFFSETS[kind]
+            if start >= limit:
+                break
+            if kind == "ssn":
+                replacement = "[SSN-REDACTED]"
+            elif kind == "name":
+                replacement = "name=[NAME-REDACTED]"
+            else:
+                replacement = f"{match[kind + '_name']}: [NAME-REDACTED]"
+
+            if start < last_end:
+                # The lookbehind saw text already consumed by a person-name
+                # match. Applied in sequence, name= is redacted first and the
+                # name ending in "name" is still matched, so both replacements
+                # share that text; a second person name is never matched.
+                if kind != "name":
+                    continue
+                replacement = replacement[last_end - start:]
+                start = last_end
+
+            parts.append(text[last_end:start])
+            parts.append(replacement)
+            last_end = match.end()
+
+        if last_end < limit:
+            parts.append(text[last_end:limit])
+        return "".join(parts)
 
 
 class PIIRedactingFormatter(logging.Formatter):
     """Custom formatter that redacts Personally Identifiable Information (PII) from log messages.
-    
+
     This formatter applies regex-based pattern matching to identify and redact
     sensitive information such as patient names and Social Security Numbers (SSNs).
-    
+
     Attributes:
         redact_pii: Whether to enable PII redaction
-        patterns: List of (regex_pattern, replacement_text) tuples for redaction
-        
+        patterns: List of (regex_pattern, replacement_text) tuples for redaction.
+            While they equal ``REDACTION_PATTERNS`` the single-pass ``redactor``
+            is used; after they are changed they are applied in sequence.
+        redactor: Single-pass engine producing the same output as the default
+            patterns; its size limit applies to customized patterns too
+
     Example:
         >>> formatter = PIIRedactingFormatter(
         ...     fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -26,53 +183,65 @@ class PIIRedactingFormatter(logging.Formatter):
         >>> handler = logging.StreamHandler()
         >>> handler.setFormatter(formatter)
     """
-    
+
     def __init__(
         self,
         fmt: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
         datefmt: str | None = None,
         redact_pii: bool = False,
+        max_redact_chars: Optional[int] = MAX_REDACT_CHARS,
+        oversize_policy: OversizePolicy = OversizePolicy.TRUNCATE,
     ) -> None:
         """Initialize the PIIRedactingFormatter.
-        
+
         Args:
             fmt: Log message format string
             datefmt: Date format string (optional)
             redact_pii: Whether to enable PII redaction
+            max_redact_chars: Size limit for redacted records (None for no limit)
+            oversize_policy: What to do with redacted records over the limit
         """
         super().__init__(fmt=fmt, datefmt=datefmt)
         self.redact_pii = redact_pii
-        
-        # Define redaction patterns: (regex, replacement_text)
-        self.patterns: List[Tuple[re.Pattern[str], str]] = [
-            # SSN pattern: 123-45-6789
-            (re.compile(r'\b\d{3}-\d{2}-\d{4}\b'), '[SSN-REDACTED]'),
-            
-            # Patient name patterns in common formats
-            # Matches: name="John Doe", name='Jane Smith', name=Bob Jones
-            (re.compile(r'name=["\']?([^"\']+)["\']?'), 'name=[NAME-REDACTED]'),
-            
-            # Additional name patterns in log messages
-            # Matches: "Patient: John Doe", "Name: Jane Smith"
-            (re.compile(r'(?:Patient|Name):\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)+)'), 
-             r'\1: [NAME-REDACTED]'),
-        ]
-    
+        self.patterns: List[Tuple[re.Pattern[str], str]] = list(REDACTION_PATTERNS)
+        self.redactor = PIIRedactor(max_redact_chars, oversize_policy)
+
     def format(self, record: logging.LogRecord) -> str:
         """Format the log record with optional PII redaction.
-        
+
         Args:
             record: Log record to format
-            
+
         Returns:
             Formatted log message with PII redacted if enabled
         """
         # Get the original formatted message
         original = super().format(record)
-        
+
         # Apply redaction if enabled
         if self.redact_pii:
-            for pattern, replacement in self.patterns:
-                original = pattern.sub(replacement, original)
-        
+            if self.patterns != REDACTION_PATTERNS:
+                return self._redact_with_patterns(original)
+            return self.redactor.redact(original)
+
         return original
+
+    def _redact_with_patterns(self, text: str) -> str:
+        """Apply customized ``patterns`` one after another.
+
+        Honors the redactor's size limit: under TRUNCATE only the first
+        ``max_chars`` characters (plus a margin for PII straddling the cut)
+        are redacted and kept.
+        """
+        max_chars = self.redactor.max_chars
+        truncate = (
+            max_chars is not None
+            and len(text) > max_chars
+            and self.redactor.oversize_policy == OversizePolicy.TRUNCATE
+        )
+        redacted = text[:max_chars + _TRUNCATE_MARGIN] if truncate else text
+        for pattern, replacement in self.patterns:
+            redacted = pattern.sub(replacement, redacted)
+        if truncate:
+            return redacted[:max_chars] + f"... [TRUNCATED: {len(text)} chars total]"
+        return redacted
@@ -5,11 +5,20 @@ This module provides centralized logging configuration with support for:
 - Log rotation to prevent unbounded file growth
 - PII redaction via custom formatters
 - Environment variable configuration
+- Background writing: callers only enqueue file records; a listener thread
+  formats them (including %-style arguments) and does the file I/O.
+  Forked children (pre-fork mock server workers) get their own listener.
+
+Hot paths should log with %-style arguments, e.g.
+``logger.debug("Response XML:\n%s", response_xml)``, so payloads are only
+formatted by the background writer, and only if a handler accepts them.
 """
 
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 from typing import Optional
 
@@ -30,6 +39,11 @@ BACKUP_COUNT = 5
 # Track if logging has been configured
 _logging_configured = False
 
+# Background writer state (see configure_logging)
+_log_queue: Optional["queue.Queue[logging.LogRecord]"] = None
+_listener: Optional[QueueListener] = None
+_handlers: list[logging.Handler] = []
+
 # Operation-specific logger names
 OPERATION_LOGGERS = {
     "csv": "ihe_test_util.csv",
@@ -42,22 +56,84 @@ OPERATION_LOGGERS = {
 logger = logging.getLogger(__name__)
 
 
+class DeferredQueueHandler(QueueHandler):
+    """Queue handler that leaves all formatting to the listener thread.
+    
+    ``QueueHandler.prepare`` formats the message on the calling thread so
+    records can be pickled across processes. Our queue is in-process, so
+    records are enqueued untouched and message formatting, PII redaction
+    and I/O all happen on the listener thread. Arguments are therefore
+    rendered when the record is written, not when it is logged; log
+    immutable values (strings, numbers), not objects that change later.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Return the record unchanged."""
+        return record
+
+
+def stop_logging() -> None:
+    """Stop the background writer after it has written every queued record.
+    
+    Registered with atexit; safe to call when no writer is running.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    for handler in _handlers:
+        handler.close()
+    _handlers.clear()
+
+
+def flush_logging() -> None:
+    """Block until every queued record has been written and flushed.
+    
+    Example:
+        >>> logger.info("Batch complete")
+        >>> flush_logging()  # the log file now contains the message
+    """
+    if _log_queue is not None and _listener is not None:
+        _log_queue.join()
+    for handler in _handlers:
+        handler.flush()
+
+
+def get_log_handlers() -> list[logging.Handler]:
+    """Return the console and file handlers configured by configure_logging.
+    
+    With background writing these are attached to the listener, not to the
+    root logger.
+    """
+    return list(_handlers)
+
+
 def configure_logging(
     level: str = "INFO",
     log_file: Optional[Path] = None,
     redact_pii: bool = False,
+    background: bool = True,
 ) -> None:
     """Configure logging for the IHE Test Utility.
     
     Sets up both console and file handlers with appropriate log levels and formatting.
     This function is idempotent - it can be called multiple times safely.
     
+    By default the file handler runs on a background QueueListener thread
+    behind a queue handler, so logging threads never wait on formatting,
+    redaction or file I/O for DEBUG-level file records. The console handler
+    stays on the root logger, so console lines keep their order relative to
+    CLI output. Call ``flush_logging()`` before reading the log file in the
+    same process.
+    
     Args:
         level: Log level for console output (DEBUG, INFO, WARNING, ERROR, CRITICAL).
                File handler always uses DEBUG level.
         log_file: Path to log file. If None, uses DEFAULT_LOG_FILE or
                  IHE_TEST_LOG_FILE environment variable if set.
         redact_pii: Whether to redact PII (patient names, SSNs) from logs
+        background: Write records from a background thread (False attaches
+                    the handlers to the root logger directly)
         
     Raises:
         ValueError: If invalid log level is provided
@@ -102,6 +178,7 @@ def configure_logging(
     
     # If already configured, remove existing handlers to avoid duplicates
     if _logging_configured:
+        stop_logging()
         root_logger.handlers.clear()
     
     # Set root logger to DEBUG to allow all messages through
@@ -121,7 +198,7 @@ def configure_logging(
     console_handler = logging.StreamHandler()
     console_handler.setLevel(numeric_level)
     console_handler.setFormatter(console_formatter)
-    root_logger.addHandler(console_handler)
+    handlers: list[logging.Handler] = [console_handler]
     
     # File handler - DEBUG and above with rotation
     try:
@@ -133,17 +210,62 @@ def configure_logging(
         )
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(file_formatter)
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
+        file_error = None
     except (OSError, PermissionError) as e:
+        file_error = e
+    
+    _handlers[:] = handlers
+    if background:
+        root_logger.addHandler(console_handler)
+        _start_listener(root_logger, handlers[1:])
+    else:
+        for handler in handlers:
+            root_logger.addHandler(handler)
+    
+    if file_error is not None:
         # Log to console if file handler fails, but don't fail completely
         root_logger.warning(
-            f"Failed to create file handler for {log_file}: {e}. "
+            f"Failed to create file handler for {log_file}: {file_error}. "
             f"Logging to console only."
         )
     
     _logging_configured = True
 
 
+def _start_listener(root_logger: logging.Logger, handlers: list[logging.Handler]) -> None:
+    """Route root logger records through a queue to a background listener."""
+    global _log_queue, _listener
+    _log_queue = queue.Queue()
+    _listener = QueueListener(_log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    root_logger.addHandler(DeferredQueueHandler(_log_queue))
+
+
+def _restart_listener_after_fork() -> None:
+    """Give a forked child its own queue and listener thread.
+    
+    fork() copies the queue handler but not the listener thread, so nothing
+    in the child would ever write (or free) its queued records. Records the
+    parent queued before the fork are left to the parent.
+    """
+    global _listener
+    if _listener is None:
+        return
+    handlers = list(_listener.handlers)
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        if isinstance(handler, DeferredQueueHandler):
+            root_logger.removeHandler(handler)
+    _listener = None
+    _start_listener(root_logger, handlers)
+
+
+atexit.register(stop_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listener_after_fork)
+
+
 def get_logger(module_name: str) -> logging.Logger:
     """Get a logger for the specified module.
     
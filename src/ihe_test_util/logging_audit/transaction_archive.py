@@ -0,0 +1,723 @@
+"""Compressed archive of complete SOAP transactions.
+
+Every request and response must be retained (RULE 2). Writing them into
+DEBUG logs or one temp file per transaction is slow and uses a lot of
+disk, because consecutive transactions are almost identical: the same
+SOAP headers, XDS-b metadata and CCD template, with different patient
+data. The archive stores them instead in append-only segment files of
+compressed chunks, with JSONL indexes of every transaction and a SQLite
+key index from message ID and patient ID to index lines.
+
+Layout of an archive directory::
+
+    dictionary.bin                  Preset compression dictionary (first transaction)
+    segment-<writer>-000001.dat     Chunks: b"IHTA" + 4-byte big-endian length + zlib data
+    index-<writer>.jsonl            One line per transaction, written after its chunk
+    index.db                        Message ID / patient ID -> index file and byte offset
+
+``<writer>`` is the open time, PID and a per-process sequence number of a
+``TransactionArchive``. Every writer appends only to files of its own, so
+several processes (e.g. sharded batch workers sharing ``logging.archive_dir``)
+can archive into one directory. They share the dictionary: the first writer
+to need one publishes it atomically and the others read it back. Archives
+from before per-writer files (``segment-000001.dat``, ``index.jsonl``) are
+still readable.
+
+Chunks hold many transactions and are compressed against a preset
+dictionary seeded from the first archived transaction, so template
+fragments repeated across transactions cost a few bytes each. Retrieving
+one transaction looks up its index line in ``index.db`` and reads and
+inflates only its chunk.
+
+The JSONL indexes are the record of truth; ``index.db`` is derived from
+them. Readers index any lines past the last indexed byte of each index
+file before a lookup, which covers archives written before the key index
+existed and a crash between the two writes.
+
+Writes are asynchronous: ``TransactionArchive.write`` enqueues the payloads
+and a background thread compresses and appends them. A chunk is sealed when
+it reaches ``chunk_bytes``, when the writer has been idle for
+``flush_interval`` seconds, and on ``flush()``/``close()``.
+"""
+
+import heapq
+import itertools
+import json
+import logging
+import os
+import queue
+import re
+import sqlite3
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_SCHEMA_VERSION = 1
+
+DEFAULT_CHUNK_BYTES = 256 * 1024
+DEFAULT_SEGMENT_BYTES = 256 * 1024 * 1024
+DEFAULT_FLUSH_INTERVAL = 1.0  # seconds
+DEFAULT_QUEUE_SIZE = 1024
+COMPRESSION_LEVEL = 6
+
+# zlib's window is 32 KiB; a longer dictionary would be partly unused
+_DICTIONARY_BYTES = 32 * 1024
+
+_CHUNK_MAGIC = b"IHTA"
+_CHUNK_HEADER = struct.Struct(">4sI")
+
+DICTIONARY_FILE = "dictionary.bin"
+KEY_INDEX_FILE = "index.db"
+# Single index of archives written before per-writer files
+LEGACY_INDEX_FILE = "index.jsonl"
+_INDEX_PATTERN = re.compile(r"index(?:-[\w.-]+)?\.jsonl")
+
+# Distinguishes writers opened by one process within the same second
+_writer_sequence = itertools.count(1)
+
+# Queue markers for the writer thread
+_FLUSH = object()
+_STOP = object()
+
+# Patient the current thread/task is working on (see archive_context)
+_patient_id: ContextVar[Optional[str]] = ContextVar("ihe_archive_patient_id", default=None)
+
+_archive: Optional["TransactionArchive"] = None
+
+_KEY_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    index_file TEXT NOT NULL,
+    line_offset INTEGER NOT NULL,
+    message_id TEXT NOT NULL,
+    patient_id TEXT,
+    PRIMARY KEY (index_file, line_offset)
+);
+CREATE INDEX IF NOT EXISTS entries_message_id ON entries (message_id);
+CREATE INDEX IF NOT EXISTS entries_patient_id ON entries (patient_id);
+CREATE TABLE IF NOT EXISTS progress (
+    index_file TEXT PRIMARY KEY,
+    indexed_bytes INTEGER NOT NULL
+);
+"""
+
+
+def _index_files(path: Path) -> list[str]:
+    """Names of the JSONL index files in ``path``, legacy index first."""
+    names = [name for name in os.listdir(path) if _INDEX_PATTERN.fullmatch(name)]
+    return sorted(names, key=lambda name: (name != LEGACY_INDEX_FILE, name))
+
+
+def _entry_time(entry: dict[str, Any]) -> str:
+    return entry.get("timestamp") or ""
+
+
+class _KeyIndex:
+    """SQLite index from message ID and patient ID to JSONL index lines.
+
+    Thread-safe. Several writers and readers, also in different processes,
+    may share one index; rows are keyed by index file and line offset, so
+    indexing a line twice is harmless.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Open (create) the key index of the archive directory ``path``."""
+        self._path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path / KEY_INDEX_FILE, timeout=30.0, check_same_thread=False
+        )
+        self._conn.executescript(_KEY_INDEX_SCHEMA)
+
+    def add(
+        self, index_file: str, rows: list[tuple[int, str, Optional[str]]], indexed_bytes: int
+    ) -> None:
+        """Index (line offset, message ID, patient ID) rows of one index file.
+
+        Args:
+            index_file: Name of the JSONL index file
+            rows: One row per index line
+            indexed_bytes: Offset just past the last of those lines
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?)",
+                [(index_file, *row) for row in rows],
+            )
+            self._conn.execute(
+                "INSERT INTO progress VALUES (?, ?) ON CONFLICT(index_file) DO UPDATE "
+                "SET indexed_bytes = MAX(indexed_bytes, excluded.indexed_bytes)",
+                (index_file, indexed_bytes),
+            )
+
+    def catch_up(self) -> None:
+        """Index complete lines past the last indexed byte of every index file."""
+        with self._lock:
+            progress = dict(self._conn.execute("SELECT index_file, indexed_bytes FROM progress"))
+        for name in _index_files(self._path):
+            start = progress.get(name, 0)
+            if (self._path / name).stat().st_size > start:
+                self._catch_up_file(name, start)
+
+    def _catch_up_file(self, name: str, start: int) -> None:
+        offset = start
+        rows = []
+        with open(self._path / name, "rb") as index:
+            index.seek(start)
+            for line in index:
+                if not line.endswith(b"\n"):
+                    break  # being written, or torn by a crash
+                try:
+                    entry = json.loads(line)
+                    rows.append((offset, entry["message_id"], entry.get("patient_id")))
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    pass
+                offset += len(line)
+        if offset > start:
+            self.add(name, rows, offset)
+            logger.debug(f"Indexed {len(rows)} line(s) of archive index {name} from byte {start}")
+
+    def offsets(
+        self, message_id: Optional[str], patient_id: Optional[str]
+    ) -> list[tuple[str, int]]:
+        """(index file, line offset) of the lines with the given keys, in file order."""
+        conditions, params = [], []
+        for column, value in (("message_id", message_id), ("patient_id", patient_id)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT index_file, line_offset FROM entries WHERE {' AND '.join(conditions)} "
+                "ORDER BY index_file, line_offset",
+                params,
+            ).fetchall()
+        return [(index_file, offset) for index_file, offset in rows]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+@dataclass
+class ArchivedTransaction:
+    """One transaction read back from the archive.
+
+    Attributes:
+        message_id: Request message ID
+        transaction_type: Transaction type, e.g. "PIX_ADD", "ITI41_SUBMIT"
+        status: Outcome, e.g. "SUCCESS", "ERROR"
+        patient_id: Patient the transaction belongs to, if known
+        timestamp: UTC ISO-8601 time the transaction was archived
+        error: Error message, if any
+        parts: Payloads by name ("request", "response", "document", ...)
+    """
+
+    message_id: str
+    transaction_type: str
+    status: str
+    patient_id: Optional[str] = None
+    timestamp: Optional[str] = None
+    error: Optional[str] = None
+    parts: dict[str, str] = field(default_factory=dict)
+
+
+class TransactionArchive:
+    """Append-only writer for an archive directory.
+
+    Thread-safe; ``write`` only enqueues payloads (blocking if the writer
+    falls ``queue_size`` transactions behind). Each instance writes its own
+    segment and index files, so any number of processes may archive into
+    the same directory.
+
+    Example:
+        >>> archive = TransactionArchive(Path("logs/archive"))
+        >>> archive.write("PIX_ADD", "urn:uuid:1", "SUCCESS",
+        ...               {"request": request_xml, "response": response_xml})
+        >>> archive.close()
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ) -> None:
+        """Open the archive, start this writer's files and its writer thread.
+
+        Args:
+            path: Archive directory (created if missing)
+            chunk_bytes: Uncompressed size at which a chunk is sealed
+            segment_bytes: Size at which a new segment file is started
+            flush_interval: Idle seconds after which the open chunk is sealed
+                (0 seals only on size, flush() and close())
+            queue_size: Transactions buffered ahead of the writer thread
+        """
+        self.path = Path(path)
+        self.chunk_bytes = chunk_bytes
+        self.segment_bytes = segment_bytes
+        self.flush_interval = flush_interval
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        dictionary_path = self.path / DICTIONARY_FILE
+        self._dictionary: Optional[bytes] = (
+            dictionary_path.read_bytes() if dictionary_path.exists() else None
+        )
+
+        # Offsets recorded in the index are only right if nobody else appends
+        # to these files; "x" fails rather than share them
+        self._writer = (
+            f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+            f"-{next(_writer_sequence):04d}"
+        )
+        self._segment_number = 1
+        self._segment = open(self.path / self._segment_name(), "xb")
+        self._segment_size = 0
+        self._index_name = f"index-{self._writer}.jsonl"
+        self._index = open(self.path / self._index_name, "xb")
+        self._index_size = 0
+        self._keys = _KeyIndex(self.path)
+
+        # Open chunk: concatenated payloads and the index entries pointing into it
+        self._chunk: list[bytes] = []
+        self._chunk_size = 0
+        self._pending: list[dict[str, Any]] = []
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, name="transaction-archive-writer", daemon=True
+        )
+        self._thread.start()
+
+    def write(
+        self,
+        transaction_type: str,
+        message_id: str,
+        status: str,
+        parts: dict[str, Optional[str]],
+        patient_id: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """Queue a transaction for archiving.
+
+        Args:
+            transaction_type: Transaction type, e.g. "PIX_ADD"
+            message_id: Request message ID (the lookup key)
+            status: Outcome, e.g. "SUCCESS", "ERROR"
+            parts: Payloads by name; None values are skipped
+            patient_id: Patient the transaction belongs to
+            error: Error message, if any
+        """
+        if self._closed:
+            return
+        entry = {
+            "v": ARCHIVE_SCHEMA_VERSION,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "message_id": message_id,
+            "patient_id": patient_id,
+            "transaction_type": transaction_type,
+            "status": status,
+            "error": error,
+        }
+        self._queue.put((entry, {name: text for name, text in parts.items() if text is not None}))
+
+    def flush(self) -> None:
+        """Block until every queued transaction is written and indexed."""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        done.wait()
+
+    def close(self) -> None:
+        """Write queued transactions, stop the writer and close the files."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._segment.close()
+        self._index.close()
+        self._keys.close()
+
+    def _segment_name(self) -> str:
+        return f"segment-{self._writer}-{self._segment_number:06d}.dat"
+
+    def _run(self) -> None:
+        timeout = self.flush_interval if self.flush_interval > 0 else None
+        while True:
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._seal_chunk()
+                continue
+            if item is _STOP:
+                self._seal_chunk()
+                return
+            first, second = item
+            try:
+                if first is _FLUSH:
+                    self._seal_chunk()
+                else:
+                    self._append(first, second)
+            except Exception as e:
+                logger.error(f"Failed to archive transaction: {e}")
+            finally:
+                if first is _FLUSH:
+                    second.set()
+
+    def _append(self, entry: dict[str, Any], parts: dict[str, str]) -> None:
+        """Add one transaction to the open chunk."""
+        entry["offset"] = self._chunk_size
+        lengths = []
+        for name, text in parts.items():
+            data = text.encode("utf-8")
+            self._chunk.append(data)
+            self._chunk_size += len(data)
+            lengths.append([name, len(data)])
+        entry["parts"] = lengths
+        self._pending.append(entry)
+
+        if self._dictionary is None:
+            # Later transactions share most of their bytes with the first;
+            # keep its tail, which zlib matches most cheaply
+            self._dictionary = self._publish_dictionary(b"".join(self._chunk)[-_DICTIONARY_BYTES:])
+
+        if self._chunk_size >= self.chunk_bytes:
+            self._seal_chunk()
+
+    def _publish_dictionary(self, candidate: bytes) -> bytes:
+        """Make ``candidate`` the archive's dictionary unless another writer did first.
+
+        The candidate is written to a private file and hard-linked into
+        place, which fails if the dictionary exists, so no reader or writer
+        ever sees a partial dictionary.
+
+        Returns:
+            The dictionary every writer of the archive compresses against
+        """
+        path = self.path / DICTIONARY_FILE
+        temporary = self.path / f"{DICTIONARY_FILE}.{self._writer}.tmp"
+        temporary.write_bytes(candidate)
+        try:
+            os.link(temporary, path)
+            return candidate
+        except FileExistsError:
+            logger.debug(f"Using the archive dictionary published by another writer in {self.path}")
+            return path.read_bytes()
+        finally:
+            temporary.unlink()
+
+    def _seal_chunk(self) -> None:
+        """Compress and append the open chunk, then index its transactions."""
+        if not self._pending:
+            return
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zdict=self._dictionary)
+        data = compressor.compress(b"".join(self._chunk)) + compressor.flush()
+
+        if self._segment_size and self._segment_size + len(data) > self.segment_bytes:
+            self._segment.close()
+            self._segment_number += 1
+            self._segment = open(self.path / self._segment_name(), "xb")
+            self._segment_size = 0
+
+        chunk_offset = self._segment_size
+        self._segment.write(_CHUNK_HEADER.pack(_CHUNK_MAGIC, len(data)))
+        self._segment.write(data)
+        self._segment.flush()
+        self._segment_size += _CHUNK_HEADER.size + len(data)
+
+        # Index only once the chunk is on disk, so entries never dangle
+        segment = self._segment_name()
+        keys = []
+        lines = []
+        for entry in self._pending:
+            entry["segment"] = segment
+            entry["chunk_offset"] = chunk_offset
+            line = (json.dumps(entry, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8")
+            keys.append((self._index_size, entry["message_id"], entry["patient_id"]))
+            lines.append(line)
+            self._index_size += len(line)
+        self._index.write(b"".join(lines))
+        self._index.flush()
+        try:
+            self._keys.add(self._index_name, keys, self._index_size)
+        except sqlite3.Error as e:
+            # Readers index the missing lines when they open the archive
+            logger.warning(f"Failed to update archive key index: {e}")
+        logger.debug(
+            "Archived chunk of %d transaction(s): %d -> %d bytes",
+            len(self._pending), self._chunk_size, len(data),
+        )
+
+        self._chunk.clear()
+        self._chunk_size = 0
+        self._pending.clear()
+
+
+class ArchiveReader:
+    """Random-access reader for an archive directory.
+
+    Example:
+        >>> reader = ArchiveReader(Path("logs/archive"))
+        >>> transaction = reader.get("urn:uuid:1")
+        >>> print(transaction.parts["response"])
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Open an archive for reading.
+
+        Args:
+            path: Archive directory
+
+        Raises:
+            FileNotFoundError: If ``path`` has no archive index
+        """
+        self.path = Path(path)
+        if not self.path.is_dir() or not _index_files(self.path):
+            raise FileNotFoundError(f"No transaction archive index in {self.path}")
+        self._dictionary: Optional[bytes] = None
+        try:
+            self._keys: Optional[_KeyIndex] = _KeyIndex(self.path)
+        except sqlite3.Error as e:
+            # e.g. a read-only copy of an archive without index.db
+            logger.warning(f"Archive key index unavailable, lookups scan the JSONL indexes: {e}")
+            self._keys = None
+
+    def entries(
+        self,
+        message_id: Optional[str] = None,
+        patient_id: Optional[str] = None,
+        transaction_type: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Stream index entries matching all given filters, oldest first.
+
+        With a message ID or patient ID, only the matching lines are read
+        (looked up in the key index); otherwise every index is scanned.
+        Entries of different writers are merged by timestamp.
+        """
+        equals = {
+            key: value
+            for key, value in (
+                ("message_id", message_id),
+                ("patient_id", patient_id),
+                ("transaction_type", transaction_type),
+                ("status", status),
+            )
+            if value is not None
+        }
+        if self._keys is not None and (message_id is not None or patient_id is not None):
+            return self._lookup(self._keys, equals)
+        return self._scan(equals)
+
+    def _lookup(self, keys: _KeyIndex, equals: dict[str, str]) -> Iterator[dict[str, Any]]:
+        """Read the index lines the key index points at."""
+        # Pick up lines appended since the last lookup (e.g. by a running batch)
+        keys.catch_up()
+        offsets = keys.offsets(equals.get("message_id"), equals.get("patient_id"))
+        per_file = []
+        for name, rows in itertools.groupby(offsets, key=lambda row: row[0]):
+            with open(self.path / name, "rb") as index:
+                entries = []
+                for _, offset in rows:
+                    index.seek(offset)
+                    entry = json.loads(index.readline())
+                    if all(entry.get(key) == value for key, value in equals.items()):
+                        entries.append(entry)
+            per_file.append(entries)
+        yield from heapq.merge(*per_file, key=_entry_time)
+
+    def _scan(self, equals: dict[str, str]) -> Iterator[dict[str, Any]]:
+        """Read every index line, parsing only those containing the filter values."""
+        scans = [self._scan_file(name, equals) for name in _index_files(self.path)]
+        return heapq.merge(*scans, key=_entry_time)
+
+    def _scan_file(self, name: str, equals: dict[str, str]) -> Iterator[dict[str, Any]]:
+        needles = [
+            f'"{key}":{json.dumps(value, ensure_ascii=False)}' for key, value in equals.items()
+        ]
+        with open(self.path / name, "r", encoding="utf-8") as index:
+            for line in index:
+                if not all(needle in line for needle in needles):
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if all(entry.get(key) == value for key, value in equals.items()):
+                    yield entry
+
+    def get(self, message_id: str) -> Optional[ArchivedTransaction]:
+        """Return the latest transaction archived under ``message_id``, or None."""
+        matches = list(self.entries(message_id=message_id))
+        return self.read(matches[-1]) if matches else None
+
+    def read(self, entry: dict[str, Any]) -> ArchivedTransaction:
+        """Read one transaction by inflating only the chunk that holds it.
+
+        Raises:
+            ValueError: If the chunk is corrupt
+        """
+        with open(self.path / entry["segment"], "rb") as segment:
+            segment.seek(entry["chunk_offset"])
+            magic, length = _CHUNK_HEADER.unpack(segment.read(_CHUNK_HEADER.size))
+            if magic != _CHUNK_MAGIC:
+                raise ValueError(
+                    f"Corrupt archive chunk at {entry['segment']}:{entry['chunk_offset']}"
+                )
+            data = segment.read(length)
+
+        end = entry["offset"] + sum(size for _, size in entry["parts"])
+        if self._dictionary is None:
+            # Published by the first writer; may appear after the reader opened
+            dictionary_path = self.path / DICTIONARY_FILE
+            if dictionary_path.exists():
+                self._dictionary = dictionary_path.read_bytes()
+        decompressor = (
+            zlib.decompressobj(zdict=self._dictionary)
+            if self._dictionary is not None
+            else zlib.decompressobj()
+        )
+        # Stop inflating once the transaction's bytes are out
+        chunk = decompressor.decompress(data, end)
+
+        parts = {}
+        position = entry["offset"]
+        for name, size in entry["parts"]:
+            parts[name] = chunk[position:position + size].decode("utf-8")
+            position += size
+        return ArchivedTransaction(
+            message_id=entry["message_id"],
+            transaction_type=entry["transaction_type"],
+            status=entry["status"],
+            patient_id=entry.get("patient_id"),
+            timestamp=entry.get("timestamp"),
+            error=entry.get("error"),
+            parts=parts,
+        )
+
+
+def open_transaction_archive(path: Path, **options: Any) -> TransactionArchive:
+    """Open an archive and make it the destination of ``archive_transaction``.
+
+    Args:
+        path: Archive directory
+        **options: TransactionArchive options (chunk_bytes, flush_interval, ...)
+
+    Returns:
+        The active archive
+    """
+    global _archive
+    close_transaction_archive()
+    _archive = TransactionArchive(path, **options)
+    logger.info(f"Archiving transactions to {path}")
+    return _archive
+
+
+def close_transaction_archive() -> None:
+    """Write queued transactions and close the active archive, if any."""
+    global _archive
+    archive, _archive = _archive, None
+    if archive is not None:
+        archive.close()
+
+
+def get_transaction_archive() -> Optional[TransactionArchive]:
+    """Return the active archive, or None when archiving is off."""
+    return _archive
+
+
+@contextmanager
+def transaction_archive(path: Path, **options: Any) -> Iterator[TransactionArchive]:
+    """Archive transactions to ``path`` for the duration of the block."""
+    archive = open_transaction_archive(path, **options)
+    try:
+        yield archive
+    finally:
+        close_transaction_archive()
+
+
+class archive_context:
+    """Attribute transactions archived inside the block to ``patient_id``.
+
+    A class rather than a generator so the path with archiving off stays a
+    couple of attribute lookups.
+
+    Example:
+        >>> with archive_context(patient_id="PAT001"):
+        ...     pix_client.submit_pix_add(message, assertion)
+    """
+
+    __slots__ = ("_patient_id", "_token")
+
+    def __init__(self, patient_id: Optional[str]) -> None:
+        self._patient_id = patient_id
+        self._token: Optional[Token[Optional[str]]] = None
+
+    def __enter__(self) -> None:
+        if _archive is not None:
+            self._token = _patient_id.set(self._patient_id)
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        if self._token is not None:
+            _patient_id.reset(self._token)
+            self._token = None
+
+
+def archive_transaction(
+    transaction_type: str,
+    message_id: str,
+    status: str,
+    request: Optional[str],
+    response: Optional[str] = None,
+    patient_id: Optional[str] = None,
+    error: Optional[str] = None,
+    **attachments: Optional[str],
+) -> bool:
+    """Archive a transaction to the active archive.
+
+    Args:
+        transaction_type: Transaction type, e.g. "PIX_ADD"
+        message_id: Request message ID
+        status: Outcome
+        request: Complete request envelope
+        response: Complete response envelope (None if there was none)
+        patient_id: Patient ID (defaults to the enclosing archive_context)
+        error: Error message, if any
+        **attachments: Further payloads, e.g. document=ccd_xml
+
+    Returns:
+        True if the transaction was queued, False when no archive is open
+    """
+    archive = _archive
+    if archive is None:
+        return False
+    archive.write(
+        transaction_type,
+        message_id,
+        status,
+        {"request": request, "response": response, **attachments},
+        patient_id=patient_id if patient_id is not None else _patient_id.get(),
+        error=error,
+    )
+    return True
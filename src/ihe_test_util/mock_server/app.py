@@ -3,13 +3,18 @@
 import logging
 import signal
 import sys
+import time
 from datetime import datetime, timezone
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
+from typing import Any
 
-from flask import Flask, Response, jsonify, request
+from flask import Flask, Response, g, jsonify, request
 
 from .config import MockServerConfig, load_config
+from .metrics import LATENCY_BUCKETS, get_metrics_registry, render_prometheus
+from .patient_registry import get_patient_registry
+from .response_templates import render_soap_fault
 
 
 # Server state tracking
@@ -17,6 +22,10 @@ _server_start_time: datetime | None = None
 _request_count: int = 0
 _config: MockServerConfig | None = None
 
+# Multi-worker state (set in each forked worker by prefork.run_prefork_server)
+_worker_id: int | None = None
+_worker_stats: Any = None
+
 # Create Flask app
 app = Flask(__name__)
 
@@ -84,26 +93,7 @@ def generate_soap_fault(
     Returns:
         Tuple of (Response object, HTTP status code)
     """
-    detail_xml = ""
-    if detail:
-        detail_xml = f"""
-      <soap:Detail>
-        <error>{detail}</error>
-      </soap:Detail>"""
-
-    fault_xml = f"""<?xml version="1.0" encoding="UTF-8"?>
-<soap:Envelope xmlns:soap="http://www.w3.org/2003/05/soap-envelope">
-  <soap:Body>
-    <soap:Fault>
-      <soap:Code>
-        <soap:Value>{faultcode}</soap:Value>
-      </soap:Code>
-      <soap:Reason>
-        <soap:Text xml:lang="en">{faultstring}</soap:Text>
-      </soap:Reason>{detail_xml}
-    </soap:Fault>
-  </soap:Body>
-</soap:Envelope>"""
+    fault_xml = render_soap_fault(faultcode, faultstring, detail)
 
     logger.warning(f"SOAP Fault generated: {faultcode} - {faultstring}")
 
@@ -111,11 +101,41 @@ def generate_soap_fault(
     return response, http_status
 
 
+def set_worker_context(worker_id: int, stats: Any) -> None:
+    """Mark this process as a pre-forked worker sharing request counters.
+    
+    Args:
+        worker_id: 1-based worker ID
+        stats: Shared ``prefork.WorkerStats`` instance
+    """
+    global _worker_id, _worker_stats, _request_count
+    _worker_id = worker_id
+    _worker_stats = stats
+    _request_count = 0
+
+
+def _metrics_endpoint_label() -> str:
+    """Return the metrics label of the current request's endpoint."""
+    if request.blueprint in ("pix_add", "iti41"):
+        return request.blueprint
+    if request.path == "/health":
+        return "health"
+    if request.path == "/metrics":
+        return "metrics"
+    return "other"
+
+
 @app.before_request
 def log_request():
     """Log all incoming requests."""
     global _request_count
     _request_count += 1
+    if _worker_stats is not None:
+        _worker_stats.increment(_worker_id)
+
+    g.metrics_endpoint = _metrics_endpoint_label()
+    g._metrics_request_start = time.perf_counter()
+    get_metrics_registry().request_started(g.metrics_endpoint, request.content_length or 0)
 
     logger.info(
         f"Request #{_request_count}: {request.method} {request.path} "
@@ -144,9 +164,24 @@ def add_soap_headers(response: Response) -> Response:
     # Only add XML content-type if not already set and response is XML
     if not response.content_type and request.path != "/health":
         response.headers["Content-Type"] = "text/xml; charset=utf-8"
+
+    start = g.get("_metrics_request_start")
+    if start is not None:
+        registry = get_metrics_registry()
+        registry.observe_phase(g.metrics_endpoint, "total", time.perf_counter() - start)
+        registry.observe_response(
+            g.metrics_endpoint, response.status_code, response.calculate_content_length() or 0
+        )
     return response
 
 
+@app.teardown_request
+def finish_request_metrics(error: BaseException | None) -> None:
+    """Remove the request from the in-flight gauge (runs even on errors)."""
+    if g.get("_metrics_request_start") is not None:
+        get_metrics_registry().request_finished(g.metrics_endpoint)
+
+
 @app.route("/health", methods=["GET"])
 def health_check():
     """Health check endpoint.
@@ -183,9 +218,45 @@ def health_check():
         "timestamp": datetime.now(timezone.utc).isoformat()
     }
 
+    # Aggregate across pre-forked workers
+    if _worker_stats is not None:
+        health_response["request_count"] = _worker_stats.total_requests()
+        health_response["worker_id"] = _worker_id
+        health_response["workers"] = _worker_stats.snapshot()
+
+    if _config and _config.patient_registry.enabled:
+        health_response["registered_patients"] = len(get_patient_registry(_config.patient_registry))
+
     return jsonify(health_response), 200
 
 
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Metrics endpoint.
+    
+    Returns Prometheus text format by default, or JSON with ``?format=json``
+    (or ``Accept: application/json``). Counts are summed over all workers.
+    """
+    registry = get_metrics_registry()
+    snapshot = registry.snapshot()
+
+    wants_json = request.args.get("format") == "json" or (
+        request.accept_mimetypes.best_match(["text/plain", "application/json"])
+        == "application/json"
+    )
+    if wants_json:
+        return jsonify({
+            "workers": registry.workers,
+            "latency_buckets": list(LATENCY_BUCKETS),
+            "endpoints": snapshot,
+        }), 200
+
+    return Response(
+        render_prometheus(snapshot),
+        mimetype="text/plain; version=0.0.4; charset=utf-8",
+    ), 200
+
+
 @app.errorhandler(400)
 def bad_request(error):
     """Handle 400 Bad Request errors with SOAP fault."""
@@ -274,19 +345,30 @@ def run_server(
     port: int = 8080,
     protocol: str = "http",
     config: MockServerConfig | None = None,
-    debug: bool = False
+    debug: bool = False,
+    workers: int = 1,
+    threads: int | None = None,
+    reuse_port: bool = False
 ) -> None:
     """Run the Flask mock server.
     
+    With the defaults this runs Flask's development server. Passing
+    ``workers`` > 1 or ``threads`` switches to the pre-fork server in
+    ``prefork.py`` (multi-process, bounded thread pools, HTTP/1.1 keep-alive).
+    
     Args:
         host: Host address (default: 0.0.0.0)
         port: Port number (default: 8080)
         protocol: Protocol to use ('http' or 'https')
         config: Mock server configuration (loads from file if not provided)
         debug: Enable debug mode (default: False)
+        workers: Number of worker processes (default: 1)
+        threads: Handler threads per worker (enables pooled serving)
+        reuse_port: Give each worker its own SO_REUSEPORT listening socket
         
     Raises:
         FileNotFoundError: If HTTPS enabled but certificates not found
+        ValueError: If worker settings are invalid for this platform
     """
     # Load config if not provided
     if config is None:
@@ -323,6 +405,20 @@ def run_server(
     logger.info(f"Starting IHE Mock Server on {protocol}://{host}:{port}")
     logger.info(f"Health check available at: {protocol}://{host}:{port}/health")
 
+    if workers > 1 or threads is not None:
+        from .prefork import run_prefork_server
+
+        run_prefork_server(
+            host=host,
+            port=port,
+            config=config,
+            workers=workers,
+            threads=threads,
+            ssl_context=ssl_context,
+            reuse_port=reuse_port
+        )
+        return
+
     # Run server
     app.run(
         host=host,
@@ -0,0 +1,226 @@
+"""Capacity-model overload simulation for mock endpoints.
+
+An endpoint with a ``CapacityProfile`` is modelled as a first-come,
+first-served queue with ``max_concurrent`` servers and ``queue_length``
+waiting places, evaluated in virtual time: no thread waits for a server.
+Admission computes when the request would start (the earliest time a server
+is free) and finishes (start + sampled service time); the response is
+delayed by that amount through ``apply_response_delay``, so it is deferred
+under the pooled server. Requests that would find the queue full are
+rejected with 429/503 and ``Retry-After``.
+
+The model state (server free times and the start times of waiting requests)
+lives in ``multiprocessing`` shared memory. Models created before the
+pre-fork workers start (``prepare_capacity_models``) are shared by all
+workers, so the configured capacity is the capacity of the whole server.
+"""
+
+import logging
+import math
+import multiprocessing
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from .config import CapacityProfile, MockServerConfig
+from .latency import apply_response_delay, sample_delay_ms
+from .metrics import record_simulated_delay
+
+
+logger = logging.getLogger("ihe_test_util.mock_server")
+
+# Smallest Retry-After (seconds) sent with an estimated value
+MIN_RETRY_AFTER_SECONDS = 1
+
+
+@dataclass
+class CapacityDecision:
+    """Outcome of admitting one request.
+
+    Attributes:
+        admitted: False if the request is rejected as overload
+        wait_seconds: Queue wait before service starts (admitted requests)
+        delay_seconds: Queue wait plus service time (admitted requests)
+        queue_depth: Requests waiting when this one arrived
+        retry_after_seconds: Estimated time until capacity frees up (rejected requests)
+    """
+
+    admitted: bool
+    wait_seconds: float = 0.0
+    delay_seconds: float = 0.0
+    queue_depth: int = 0
+    retry_after_seconds: float = 0.0
+
+
+class CapacityModel:
+    """Virtual-time c-server queue with a bounded number of waiting places."""
+
+    def __init__(self, max_concurrent: int, queue_length: int) -> None:
+        """Allocate the model state in shared memory.
+
+        Args:
+            max_concurrent: Number of servers
+            queue_length: Number of waiting places
+        """
+        self.max_concurrent = max_concurrent
+        self.queue_length = queue_length
+        # Time (monotonic) at which each server becomes free
+        self._free_at = multiprocessing.RawArray("d", max_concurrent)
+        # Ring of start times of waiting requests; starts are non-decreasing,
+        # so the ring is sorted from head to tail
+        self._waiting = multiprocessing.RawArray("d", max(queue_length, 1))
+        self._ring = multiprocessing.RawArray("q", 2)  # head, count
+        self._lock = multiprocessing.Lock()
+
+    def admit(
+        self,
+        service_seconds: float,
+        max_wait_seconds: float = 0.0,
+        overload_slowdown: float = 0.0,
+        now: float | None = None,
+    ) -> CapacityDecision:
+        """Admit or reject one request arriving now.
+
+        Args:
+            service_seconds: Sampled service time of the request
+            max_wait_seconds: Reject requests that would wait longer (0 = no limit)
+            overload_slowdown: Service time inflation at a full queue
+            now: Arrival time (default: ``time.monotonic()``)
+
+        Returns:
+            Admission decision
+        """
+        with self._lock:
+            if now is None:
+                now = time.monotonic()
+            waiting = self._waiting
+            ring = self._ring
+            size = len(waiting)
+
+            # Requests whose start time has passed are in service, not waiting
+            head, count = ring[0], ring[1]
+            while count and waiting[head] <= now:
+                head = (head + 1) % size
+                count -= 1
+            ring[0], ring[1] = head, count
+
+            free_at = self._free_at
+            server = min(range(self.max_concurrent), key=free_at.__getitem__)
+            start = max(now, free_at[server])
+            wait = start - now
+
+            if wait > 0:
+                if count >= self.queue_length:
+                    # A waiting place frees up when the oldest waiting request starts
+                    retry_after = (waiting[head] - now) if count else wait
+                    return CapacityDecision(
+                        admitted=False, queue_depth=count, retry_after_seconds=retry_after
+                    )
+                if max_wait_seconds and wait > max_wait_seconds:
+                    return CapacityDecision(
+                        admitted=False,
+                        queue_depth=count,
+                        retry_after_seconds=wait - max_wait_seconds,
+                    )
+
+            if overload_slowdown and self.queue_length:
+                service_seconds *= 1.0 + overload_slowdown * count / self.queue_length
+            free_at[server] = start + service_seconds
+            if wait > 0:
+                waiting[(head + count) % size] = start
+                ring[1] = count + 1
+
+            return CapacityDecision(
+                admitted=True,
+                wait_seconds=wait,
+                delay_seconds=wait + service_seconds,
+                queue_depth=count,
+            )
+
+
+_models: dict[str, CapacityModel] = {}
+
+
+def get_capacity_model(endpoint: str, profile: CapacityProfile) -> CapacityModel:
+    """Return the capacity model of an endpoint.
+
+    The model is reused while its server and queue sizes match the profile;
+    a profile with other sizes (e.g. after a config reload) gets a new
+    model, which is local to the process that creates it.
+
+    Args:
+        endpoint: Endpoint label (e.g. 'pix_add', 'iti41')
+        profile: Capacity profile of the endpoint
+
+    Returns:
+        Capacity model
+    """
+    model = _models.get(endpoint)
+    if (
+        model is None
+        or model.max_concurrent != profile.max_concurrent
+        or model.queue_length != profile.queue_length
+    ):
+        model = CapacityModel(profile.max_concurrent, profile.queue_length)
+        _models[endpoint] = model
+    return model
+
+
+def prepare_capacity_models(config: MockServerConfig) -> None:
+    """Create the capacity models of all endpoints (call before forking workers).
+
+    Args:
+        config: Mock server configuration
+    """
+    for endpoint, behavior in (
+        ("pix_add", config.pix_add_behavior),
+        ("iti41", config.iti41_behavior),
+    ):
+        if behavior.capacity is not None:
+            get_capacity_model(endpoint, behavior.capacity)
+
+
+def admit_request(behavior: Any, endpoint: str, endpoint_logger: logging.Logger) -> int | None:
+    """Apply the endpoint's capacity model to the current request.
+
+    Admitted requests get their queue wait and service time applied as a
+    response delay.
+
+    Args:
+        behavior: Endpoint behavior configuration (or None)
+        endpoint: Endpoint label (e.g. 'pix_add', 'iti41')
+        endpoint_logger: Logger of the calling endpoint
+
+    Returns:
+        None if the request is admitted (or no capacity is configured),
+        otherwise the Retry-After value in seconds for the overload response
+    """
+    profile = behavior.capacity if behavior is not None else None
+    if profile is None:
+        return None
+
+    service_ms = sample_delay_ms(profile.service_time)
+    decision = get_capacity_model(endpoint, profile).admit(
+        service_ms / 1000.0,
+        max_wait_seconds=profile.max_queue_wait_ms / 1000.0,
+        overload_slowdown=profile.overload_slowdown,
+    )
+
+    if not decision.admitted:
+        retry_after = profile.retry_after_seconds
+        if retry_after is None:
+            retry_after = max(MIN_RETRY_AFTER_SECONDS, math.ceil(decision.retry_after_seconds))
+        endpoint_logger.info(
+            f"Overload: {profile.max_concurrent} in service, {decision.queue_depth} waiting; "
+            f"rejecting with {profile.overload_status_code} (Retry-After: {retry_after}s)"
+        )
+        return retry_after
+
+    delay_ms = decision.delay_seconds * 1000.0
+    apply_response_delay(delay_ms)
+    record_simulated_delay(delay_ms)
+    endpoint_logger.debug(
+        f"Capacity model: queued {decision.wait_seconds * 1000.0:.1f}ms behind "
+        f"{decision.queue_depth} requests, service {delay_ms - decision.wait_seconds * 1000.0:.1f}ms"
+    )
+    return None
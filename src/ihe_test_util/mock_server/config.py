@@ -6,7 +6,7 @@ from enum import Enum
 from pathlib import Path
 from typing import Optional
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 class ValidationMode(str, Enum):
@@ -16,6 +16,302 @@ class ValidationMode(str, Enum):
     LENIENT = "lenient"
 
 
+class LatencyDistribution(str, Enum):
+    """Shape of the simulated response latency."""
+
+    CONSTANT = "constant"
+    UNIFORM = "uniform"
+    NORMAL = "normal"
+    LOGNORMAL = "lognormal"
+    BIMODAL = "bimodal"
+    SIZE_PROPORTIONAL = "size_proportional"
+
+
+class LatencyProfile(BaseModel):
+    """Per-request latency distribution for a mock endpoint.
+    
+    Only the fields used by the selected distribution are read:
+    
+    - constant: ``delay_ms``
+    - uniform: ``min_ms`` .. ``max_ms``
+    - normal: ``mean_ms`` +/- ``stddev_ms``
+    - lognormal: ``median_ms`` with shape ``sigma``
+    - bimodal: ``mean_ms``/``stddev_ms`` normally, ``spike_ms``/``spike_stddev_ms``
+      with probability ``spike_probability`` (0.01 puts spikes at p99)
+    - size_proportional: ``delay_ms`` + ``ms_per_kb`` per KB of request body
+    
+    Every sample is clamped to 0 .. ``cap_ms``.
+    
+    Attributes:
+        distribution: Latency distribution
+        delay_ms: Constant delay, or base delay for size_proportional
+        min_ms: Uniform lower bound
+        max_ms: Uniform upper bound
+        mean_ms: Normal/bimodal mean
+        stddev_ms: Normal/bimodal standard deviation
+        median_ms: Lognormal median
+        sigma: Lognormal shape parameter
+        spike_probability: Bimodal probability of a latency spike
+        spike_ms: Bimodal spike mean
+        spike_stddev_ms: Bimodal spike standard deviation
+        ms_per_kb: Size-proportional delay per KB of request body
+        cap_ms: Upper bound applied to every sample
+    """
+
+    distribution: LatencyDistribution = Field(
+        default=LatencyDistribution.CONSTANT,
+        description="Latency distribution",
+    )
+    delay_ms: float = Field(default=0.0, ge=0.0, description="Constant or base delay")
+    min_ms: float = Field(default=0.0, ge=0.0, description="Uniform lower bound")
+    max_ms: float = Field(default=0.0, ge=0.0, description="Uniform upper bound")
+    mean_ms: float = Field(default=0.0, ge=0.0, description="Normal/bimodal mean")
+    stddev_ms: float = Field(default=0.0, ge=0.0, description="Normal/bimodal standard deviation")
+    median_ms: float = Field(default=0.0, ge=0.0, description="Lognormal median")
+    sigma: float = Field(default=0.5, ge=0.0, description="Lognormal shape parameter")
+    spike_probability: float = Field(
+        default=0.01,
+        ge=0.0,
+        le=1.0,
+        description="Bimodal probability of a latency spike",
+    )
+    spike_ms: float = Field(default=0.0, ge=0.0, description="Bimodal spike mean")
+    spike_stddev_ms: float = Field(default=0.0, ge=0.0, description="Bimodal spike standard deviation")
+    ms_per_kb: float = Field(default=0.0, ge=0.0, description="Delay per KB of request body")
+    cap_ms: float = Field(
+        default=60000.0,
+        gt=0.0,
+        le=600000.0,
+        description="Upper bound applied to every sample",
+    )
+
+    @model_validator(mode="after")
+    def validate_uniform_bounds(self) -> "LatencyProfile":
+        """Validate uniform bounds are ordered."""
+        if self.distribution == LatencyDistribution.UNIFORM and self.max_ms < self.min_ms:
+            raise ValueError(
+                f"Invalid uniform latency: max_ms ({self.max_ms}) is less than "
+                f"min_ms ({self.min_ms})."
+            )
+        return self
+
+
+class CapacityProfile(BaseModel):
+    """Capacity model of an overloaded endpoint.
+    
+    The endpoint behaves like a server with ``max_concurrent`` transactions
+    in service and ``queue_length`` waiting places, first come first served.
+    Each admitted request is delayed by its queue wait plus a service time
+    drawn from ``service_time``. A request that finds every server busy and
+    the queue full (or would wait longer than ``max_queue_wait_ms``) is
+    rejected with ``overload_status_code`` and a ``Retry-After`` header.
+    
+    Attributes:
+        max_concurrent: Transactions in service at the same time
+        queue_length: Requests that may wait for a free server (0 = none)
+        service_time: Service time distribution
+        max_queue_wait_ms: Longest queue wait before a request is rejected (0 = no limit)
+        overload_slowdown: Extra service time with a full queue (0.5 = 50% slower),
+            scaled by queue occupancy; models contention-driven throughput collapse
+        overload_status_code: HTTP status of rejected requests (429 or 503)
+        retry_after_seconds: Retry-After value (None = estimate from the queue)
+    """
+
+    max_concurrent: int = Field(default=4, ge=1, le=4096, description="Transactions in service")
+    queue_length: int = Field(default=0, ge=0, le=100000, description="Waiting places")
+    service_time: LatencyProfile = Field(
+        default_factory=lambda: LatencyProfile(delay_ms=50.0),
+        description="Service time distribution",
+    )
+    max_queue_wait_ms: int = Field(
+        default=0, ge=0, description="Longest queue wait before rejection (0 = no limit)"
+    )
+    overload_slowdown: float = Field(
+        default=0.0, ge=0.0, le=100.0, description="Service time inflation at a full queue"
+    )
+    overload_status_code: int = Field(
+        default=503, description="HTTP status of rejected requests (429 or 503)"
+    )
+    retry_after_seconds: Optional[int] = Field(
+        default=None, ge=0, description="Retry-After value (None = estimate)"
+    )
+
+    @field_validator("overload_status_code")
+    @classmethod
+    def validate_overload_status_code(cls, v: int) -> int:
+        """Validate the overload status is 429 or 503."""
+        if v not in (429, 503):
+            raise ValueError(
+                f"Invalid overload_status_code {v}. Must be 429 (Too Many Requests) "
+                f"or 503 (Service Unavailable)."
+            )
+        return v
+
+
+class SubmissionLogMode(str, Enum):
+    """Storage mode for ITI-41 transaction logs."""
+
+    FILES = "files"
+    ARCHIVE = "archive"
+
+
+class OverflowPolicy(str, Enum):
+    """What to do when the submission log queue is full."""
+
+    BLOCK = "block"
+    DROP = "drop"
+
+
+class SubmissionLogConfig(BaseModel):
+    """ITI-41 submission logging configuration.
+    
+    In ``files`` mode (default) every submission is written synchronously to
+    its own file in ``mocks/logs/iti41-submissions``. In ``archive`` mode the
+    request thread only enqueues the submission; a background writer appends
+    batches to rotating gzip segments in ``archive_dir`` with a JSON-lines
+    index per segment, and writes saved documents off the request path.
+    
+    Attributes:
+        mode: Storage mode
+        archive_dir: Directory for archive segments and indexes
+        queue_size: Maximum submissions waiting for the writer
+        batch_size: Maximum submissions per compressed batch
+        flush_interval_ms: Maximum time a submission waits before its batch is written
+        segment_max_bytes: Compressed size after which a new segment is started
+        compression_level: gzip compression level (1 = fastest, 9 = smallest)
+        overflow_policy: Block the request or drop the log entry when the queue is full
+        block_timeout_ms: Longest a request blocks before the entry is dropped (0 = no limit)
+    """
+
+    mode: SubmissionLogMode = Field(
+        default=SubmissionLogMode.FILES,
+        description="Storage mode for ITI-41 transaction logs",
+    )
+    archive_dir: str = Field(
+        default="mocks/logs/iti41-archive",
+        description="Directory for archive segments and indexes",
+    )
+    queue_size: int = Field(default=1000, ge=1, description="Maximum queued submissions")
+    batch_size: int = Field(default=64, ge=1, description="Maximum submissions per batch")
+    flush_interval_ms: int = Field(
+        default=200, ge=1, le=60000, description="Maximum wait before a batch is written"
+    )
+    segment_max_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        ge=1024,
+        description="Compressed segment size that triggers rotation",
+    )
+    compression_level: int = Field(default=6, ge=1, le=9, description="gzip compression level")
+    overflow_policy: OverflowPolicy = Field(
+        default=OverflowPolicy.BLOCK,
+        description="Policy when the queue is full",
+    )
+    block_timeout_ms: int = Field(
+        default=1000, ge=0, description="Maximum time a request blocks on a full queue"
+    )
+
+
+class DuplicatePatientPolicy(str, Enum):
+    """How PIX Add treats a patient that is already registered."""
+
+    ACCEPT = "accept"
+    REJECT = "reject"
+
+
+class PatientRegistryConfig(BaseModel):
+    """In-memory patient registry configuration.
+    
+    When enabled, PIX Add registers every patient under its (ID, assigning
+    authority OID) key and ITI-41 in strict validation mode rejects
+    submissions for patients that were never registered.
+    
+    Attributes:
+        enabled: Keep a patient registry
+        duplicate_policy: Accept re-registrations (AA) or reject them (AE)
+        snapshot_path: File the registry is restored from at startup and
+            saved to at shutdown (None: no persistence)
+        snapshot_interval_seconds: Additionally save a snapshot this often (0 = only at shutdown)
+        shared_capacity: Maximum patients tracked across pre-fork workers
+    """
+
+    enabled: bool = Field(default=False, description="Keep a patient registry")
+    duplicate_policy: DuplicatePatientPolicy = Field(
+        default=DuplicatePatientPolicy.ACCEPT,
+        description="PIX Add handling of already registered patients",
+    )
+    snapshot_path: Optional[str] = Field(
+        default=None,
+        description="Snapshot file for restore at startup and save at shutdown",
+    )
+    snapshot_interval_seconds: int = Field(
+        default=0, ge=0, description="Periodic snapshot interval (0 = only at shutdown)"
+    )
+    shared_capacity: int = Field(
+        default=1_000_000,
+        ge=1024,
+        description="Maximum patients in the index shared by pre-fork workers",
+    )
+
+
+class TrafficMode(str, Enum):
+    """Record/replay mode of the mock endpoints."""
+
+    OFF = "off"
+    RECORD = "record"
+    REPLAY = "replay"
+
+
+class ReplayMissPolicy(str, Enum):
+    """What replay mode does with a request that has no recording."""
+
+    MOCK = "mock"
+    FAULT = "fault"
+
+
+class RecordReplayConfig(BaseModel):
+    """Record/replay of PIX Add and ITI-41 traffic.
+    
+    In ``record`` mode the endpoints act as a proxy: each request is
+    forwarded to the upstream URL of its transaction, and the upstream
+    response is returned to the client and recorded together with the
+    request and the upstream latency. In ``replay`` mode requests are
+    matched by transaction and patient ID against the recordings and answered
+    with the recorded response after the recorded latency (times
+    ``latency_scale``).
+    
+    Attributes:
+        mode: off, record or replay
+        archive_dir: Directory of the recording archive
+        upstream_pix_add_url: Upstream PIX Add endpoint (record mode)
+        upstream_iti41_url: Upstream ITI-41 endpoint (record mode)
+        upstream_timeout_seconds: Timeout of upstream requests
+        verify_tls: Verify upstream TLS certificates
+        latency_scale: Multiplier for recorded latencies in replay (0 = no delay)
+        on_miss: Answer unmatched requests with the regular mock behavior or a fault
+    """
+
+    mode: TrafficMode = Field(default=TrafficMode.OFF, description="off, record or replay")
+    archive_dir: str = Field(
+        default="mocks/recordings", description="Directory of the recording archive"
+    )
+    upstream_pix_add_url: Optional[str] = Field(
+        default=None, description="Upstream PIX Add endpoint (record mode)"
+    )
+    upstream_iti41_url: Optional[str] = Field(
+        default=None, description="Upstream ITI-41 endpoint (record mode)"
+    )
+    upstream_timeout_seconds: float = Field(
+        default=60.0, gt=0.0, description="Timeout of upstream requests"
+    )
+    verify_tls: bool = Field(default=True, description="Verify upstream TLS certificates")
+    latency_scale: float = Field(
+        default=1.0, ge=0.0, le=100.0, description="Multiplier for recorded latencies"
+    )
+    on_miss: ReplayMissPolicy = Field(
+        default=ReplayMissPolicy.MOCK, description="Handling of unmatched requests in replay"
+    )
+
+
 class PIXAddBehavior(BaseModel):
     """PIX Add endpoint behavior configuration.
     
@@ -25,6 +321,8 @@ class PIXAddBehavior(BaseModel):
         custom_patient_id: Custom patient ID for acknowledgment
         custom_fault_message: Custom SOAP fault message on failure
         validation_mode: Validation strictness (strict or lenient)
+        latency: Latency distribution (overrides response_delay_ms when set)
+        capacity: Capacity model for overload simulation (None = unlimited)
     """
 
     response_delay_ms: int = Field(
@@ -51,6 +349,14 @@ class PIXAddBehavior(BaseModel):
         default=ValidationMode.LENIENT,
         description="Validation strictness",
     )
+    latency: Optional[LatencyProfile] = Field(
+        default=None,
+        description="Latency distribution (overrides response_delay_ms when set)",
+    )
+    capacity: Optional[CapacityProfile] = Field(
+        default=None,
+        description="Capacity model for overload simulation (None = unlimited)",
+    )
 
 
 class ITI41Behavior(BaseModel):
@@ -63,6 +369,8 @@ class ITI41Behavior(BaseModel):
         custom_document_id: Custom document unique ID
         custom_fault_message: Custom SOAP fault message on failure
         validation_mode: Validation strictness (strict or lenient)
+        latency: Latency distribution (overrides response_delay_ms when set)
+        capacity: Capacity model for overload simulation (None = unlimited)
     """
 
     response_delay_ms: int = Field(
@@ -93,6 +401,14 @@ class ITI41Behavior(BaseModel):
         default=ValidationMode.LENIENT,
         description="Validation strictness",
     )
+    latency: Optional[LatencyProfile] = Field(
+        default=None,
+        description="Latency distribution (overrides response_delay_ms when set)",
+    )
+    capacity: Optional[CapacityProfile] = Field(
+        default=None,
+        description="Capacity model for overload simulation (None = unlimited)",
+    )
 
 
 class MockServerConfig(BaseModel):
@@ -120,6 +436,22 @@ class MockServerConfig(BaseModel):
         description="DEPRECATED: Global response delay. Use per-endpoint behavior configuration instead.",
     )
     save_submitted_documents: bool = Field(default=False, description="Save submitted CCD documents to disk")
+    document_store_dir: str = Field(
+        default="mocks/data/documents",
+        description="Content-addressed store for saved documents",
+    )
+    submission_log: SubmissionLogConfig = Field(
+        default_factory=SubmissionLogConfig,
+        description="ITI-41 submission logging configuration",
+    )
+    record_replay: RecordReplayConfig = Field(
+        default_factory=RecordReplayConfig,
+        description="Record/replay of endpoint traffic",
+    )
+    patient_registry: PatientRegistryConfig = Field(
+        default_factory=PatientRegistryConfig,
+        description="In-memory patient registry configuration",
+    )
 
     # Per-endpoint behavior configuration
     pix_add_behavior: PIXAddBehavior = Field(
@@ -0,0 +1,286 @@
+"""Content-addressed store for documents submitted to the ITI-41 mock.
+
+Documents are stored once per distinct content, named by their SHA-256 and
+spread over two levels of fan-out directories so no directory grows beyond a
+few entries per thousand documents::
+
+    mocks/data/documents/
+        objects/3f/a2/3fa2...e9      # blob (document bytes)
+        index.jsonl                  # one JSON line per stored document
+
+Each index line maps a document unique ID, submission set and patient to the
+blob hash. Lines are appended with single ``O_APPEND`` writes, so several
+processes (e.g. pre-fork workers) can share one store; readers pick up new
+lines incrementally. Identical documents (e.g. generated from one template)
+only cost an index line.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+logger = logging.getLogger("ihe_test_util.mock_server.iti41")
+
+OBJECTS_DIR = "objects"
+INDEX_FILE = "index.jsonl"
+
+
+@dataclass
+class DocumentEntry:
+    """Index entry of one stored document.
+
+    Attributes:
+        document_unique_id: Document unique ID
+        submission_set_id: Submission set unique ID
+        patient_id: Patient ID from the submission metadata
+        sha256: Hex SHA-256 of the document (the blob name)
+        size: Document size in bytes
+        stored_at: Storage time (ISO 8601, UTC)
+    """
+
+    document_unique_id: str
+    submission_set_id: str
+    patient_id: str
+    sha256: str
+    size: int
+    stored_at: str
+
+
+@dataclass
+class DocumentStoreStats:
+    """Deduplication statistics of a document store.
+
+    Attributes:
+        documents: Stored documents (index entries)
+        unique_blobs: Distinct document contents
+        logical_bytes: Total size of all stored documents
+        stored_bytes: Size of the distinct contents (bytes on disk)
+    """
+
+    documents: int = 0
+    unique_blobs: int = 0
+    logical_bytes: int = 0
+    stored_bytes: int = 0
+
+    @property
+    def duplicates(self) -> int:
+        """Documents whose content was already stored."""
+        return self.documents - self.unique_blobs
+
+    @property
+    def dedup_ratio(self) -> float:
+        """Logical bytes per stored byte (1.0 without duplicates)."""
+        return self.logical_bytes / self.stored_bytes if self.stored_bytes else 1.0
+
+
+class DocumentStore:
+    """SHA-256 content-addressed document store with an in-memory index.
+
+    Thread-safe. The index file is read lazily on the first query and then
+    incrementally, so entries appended by other processes become visible.
+    """
+
+    def __init__(self, root: Path | str) -> None:
+        """Initialize the store (nothing is created until the first ``put``).
+
+        Args:
+            root: Store directory
+        """
+        self.root = Path(root)
+        self.index_path = self.root / INDEX_FILE
+        self._lock = threading.Lock()
+        self._index_fd: int | None = None
+        self._index_offset = 0
+        self._index_tail = b""
+        self._by_document: dict[str, DocumentEntry] = {}
+        self._by_submission_set: dict[str, list[DocumentEntry]] = {}
+        self._by_patient: dict[str, list[DocumentEntry]] = {}
+        self._blob_sizes: dict[str, int] = {}
+        self._stats = DocumentStoreStats()
+
+    def blob_path(self, sha256: str) -> Path:
+        """Return the path of the blob with the given hash."""
+        return self.root / OBJECTS_DIR / sha256[:2] / sha256[2:4] / sha256
+
+    def put(
+        self,
+        document: bytes | memoryview,
+        document_unique_id: str,
+        submission_set_id: str,
+        patient_id: str,
+    ) -> DocumentEntry:
+        """Store a document and index it.
+
+        The blob is only written when no document with the same content is
+        stored yet; it is written to a temporary file and renamed into place.
+
+        Args:
+            document: Document bytes
+            document_unique_id: Document unique ID
+            submission_set_id: Submission set unique ID
+            patient_id: Patient ID
+
+        Returns:
+            Index entry of the stored document
+        """
+        sha256 = hashlib.sha256(document).hexdigest()
+        blob_path = self.blob_path(sha256)
+        if not blob_path.exists():
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = blob_path.with_name(f".{sha256}.{os.getpid()}.{threading.get_ident()}.tmp")
+            temp_path.write_bytes(document)
+            os.replace(temp_path, blob_path)
+
+        entry = DocumentEntry(
+            document_unique_id=document_unique_id,
+            submission_set_id=submission_set_id,
+            patient_id=patient_id,
+            sha256=sha256,
+            size=len(document),
+            stored_at=datetime.now(timezone.utc).isoformat(),
+        )
+        line = (json.dumps(asdict(entry), separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            if self._index_fd is None:
+                self.root.mkdir(parents=True, exist_ok=True)
+                self._index_fd = os.open(
+                    self.index_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644
+                )
+            os.write(self._index_fd, line)
+        return entry
+
+    def get(self, document_unique_id: str) -> bytes | None:
+        """Return the content of a document by its unique ID.
+
+        Args:
+            document_unique_id: Document unique ID
+
+        Returns:
+            Document bytes, or None if no such document is stored
+        """
+        entry = self.entry(document_unique_id)
+        if entry is None:
+            return None
+        return self.blob_path(entry.sha256).read_bytes()
+
+    def entry(self, document_unique_id: str) -> DocumentEntry | None:
+        """Return the latest index entry of a document unique ID."""
+        with self._lock:
+            self._refresh()
+            return self._by_document.get(document_unique_id)
+
+    def find(
+        self,
+        document_unique_id: str | None = None,
+        submission_set_id: str | None = None,
+        patient_id: str | None = None,
+    ) -> list[DocumentEntry]:
+        """Return index entries matching all given criteria.
+
+        Args:
+            document_unique_id: Match the document unique ID
+            submission_set_id: Match the submission set unique ID
+            patient_id: Match the patient ID
+
+        Returns:
+            Matching entries in storage order (all entries without criteria)
+        """
+        with self._lock:
+            self._refresh()
+            if document_unique_id is not None:
+                entry = self._by_document.get(document_unique_id)
+                candidates = [entry] if entry is not None else []
+            elif submission_set_id is not None:
+                candidates = list(self._by_submission_set.get(submission_set_id, []))
+            elif patient_id is not None:
+                candidates = list(self._by_patient.get(patient_id, []))
+            else:
+                candidates = [
+                    entry for entries in self._by_submission_set.values() for entry in entries
+                ]
+                candidates.sort(key=lambda entry: entry.stored_at)
+        return [
+            entry for entry in candidates
+            if (submission_set_id is None or entry.submission_set_id == submission_set_id)
+            and (patient_id is None or entry.patient_id == patient_id)
+        ]
+
+    def stats(self) -> DocumentStoreStats:
+        """Return deduplication statistics of the whole store."""
+        with self._lock:
+            self._refresh()
+            return DocumentStoreStats(**asdict(self._stats))
+
+    def close(self) -> None:
+        """Close the index file."""
+        with self._lock:
+            if self._index_fd is not None:
+                os.close(self._index_fd)
+                self._index_fd = None
+
+    def _refresh(self) -> None:
+        """Index entries appended since the last read (caller holds the lock)."""
+        try:
+            with open(self.index_path, "rb") as f:
+                f.seek(self._index_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        if not data:
+            return
+        self._index_offset += len(data)
+
+        lines = (self._index_tail + data).split(b"\n")
+        # A line without its newline is still being written; keep it for the next read
+        self._index_tail = lines.pop()
+        for line in lines:
+            if not line:
+                continue
+            try:
+                entry = DocumentEntry(**json.loads(line))
+            except (ValueError, TypeError) as e:
+                logger.warning(f"Skipping corrupt document index line in {self.index_path}: {e}")
+                continue
+            self._add_to_index(entry)
+
+    def _add_to_index(self, entry: DocumentEntry) -> None:
+        self._by_document[entry.document_unique_id] = entry
+        self._by_submission_set.setdefault(entry.submission_set_id, []).append(entry)
+        self._by_patient.setdefault(entry.patient_id, []).append(entry)
+        self._stats.documents += 1
+        self._stats.logical_bytes += entry.size
+        if entry.sha256 not in self._blob_sizes:
+            self._blob_sizes[entry.sha256] = entry.size
+            self._stats.unique_blobs += 1
+            self._stats.stored_bytes += entry.size
+
+
+_stores: dict[Path, DocumentStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_document_store(root: Path | str) -> DocumentStore:
+    """Return the shared store for a directory.
+
+    Args:
+        root: Store directory
+
+    Returns:
+        Document store (one instance per directory in this process)
+    """
+    key = Path(root).absolute()
+    store = _stores.get(key)
+    if store is not None:
+        return store
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = DocumentStore(key)
+            _stores[key] = store
+        return store
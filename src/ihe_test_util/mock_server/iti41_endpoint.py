@@ -6,7 +6,6 @@ that accepts MTOM-encoded SOAP messages with CCD document attachments.
 
 import logging
 import random
-import time
 import uuid
 from datetime import datetime, timezone
 from email import message_from_bytes
@@ -16,7 +15,20 @@ from typing import Any
 from flask import Blueprint, Response, request, g
 from lxml import etree
 
-from .config import MockServerConfig, ValidationMode
+from .capacity import admit_request
+from .config import MockServerConfig, SubmissionLogMode, ValidationMode
+from .document_store import get_document_store
+from .latency import simulate_latency
+from .metrics import end_phase, record_fault, start_phases
+from .mtom_parser import fast_extract_mtom_parts
+from .patient_registry import get_patient_registry, parse_patient_identifier
+from .recording import record_or_replay
+from .response_templates import ResponseTemplate, render_soap_fault
+from .submission_log import (
+    SubmissionRecord,
+    get_submission_log_writer,
+    transaction_log_parts,
+)
 
 
 # Create Blueprint
@@ -134,11 +146,12 @@ def extract_mtom_parts(request_data: bytes, content_type: str) -> dict[str, Any]
     }
 
 
-def extract_xdsb_metadata(soap_xml: str) -> dict[str, Any]:
+def extract_xdsb_metadata(soap_xml: str | bytes | memoryview) -> dict[str, Any]:
     """Extract XDSb metadata from ProvideAndRegisterDocumentSetRequest.
     
     Args:
-        soap_xml: SOAP envelope XML string
+        soap_xml: SOAP envelope XML string, or raw bytes as returned by
+            ``fast_extract_mtom_parts``
         
     Returns:
         Dictionary containing extracted metadata:
@@ -158,7 +171,9 @@ def extract_xdsb_metadata(soap_xml: str) -> dict[str, Any]:
     logger.debug("Extracting XDSb metadata from SOAP envelope")
 
     try:
-        tree = etree.fromstring(soap_xml.encode("utf-8"))
+        if isinstance(soap_xml, str):
+            soap_xml = soap_xml.encode("utf-8")
+        tree = etree.fromstring(soap_xml)
     except etree.XMLSyntaxError as e:
         raise ValueError(
             f"Failed to parse SOAP XML: {e}. Ensure the SOAP envelope is valid XML."
@@ -273,6 +288,43 @@ def extract_xdsb_metadata(soap_xml: str) -> dict[str, Any]:
     return metadata
 
 
+def _build_registry_response_template() -> ResponseTemplate:
+    """Build the success RegistryResponse template (once, at import)."""
+    # Build SOAP envelope
+    soap_envelope = etree.Element(
+        f"{{{SOAP_NS}}}Envelope",
+        nsmap={"soap": SOAP_NS}
+    )
+
+    soap_body = etree.SubElement(soap_envelope, f"{{{SOAP_NS}}}Body")
+
+    # Build RegistryResponse
+    registry_response = etree.SubElement(
+        soap_body,
+        f"{{{RS_NS}}}RegistryResponse",
+        nsmap={"rs": RS_NS, "rim": RIM_NS},
+        status="urn:oasis:names:tc:ebxml-regrep:ResponseStatusType:Success",
+        requestId="{{request_id}}"
+    )
+
+    # Add SubmissionSetUniqueId, DocumentUniqueId, ResponseId and Timestamp slots
+    for slot_name, placeholder in (
+        ("SubmissionSetUniqueId", "{{submission_set_id}}"),
+        ("DocumentUniqueId", "{{document_unique_id}}"),
+        ("ResponseId", "{{response_id}}"),
+        ("Timestamp", "{{timestamp}}"),
+    ):
+        slot = etree.SubElement(registry_response, f"{{{RIM_NS}}}Slot", name=slot_name)
+        value_list = etree.SubElement(slot, f"{{{RIM_NS}}}ValueList")
+        value = etree.SubElement(value_list, f"{{{RIM_NS}}}Value")
+        value.text = placeholder
+
+    return ResponseTemplate.from_element(soap_envelope)
+
+
+REGISTRY_RESPONSE_TEMPLATE = _build_registry_response_template()
+
+
 def generate_registry_response(
     request_id: str,
     submission_set_id: str,
@@ -280,6 +332,9 @@ def generate_registry_response(
 ) -> str:
     """Generate XDSb RegistryResponse with success status.
     
+    Fills the precompiled ``REGISTRY_RESPONSE_TEMPLATE``; no XML tree is
+    built per request.
+    
     Args:
         request_id: Original request correlation ID
         submission_set_id: Submission set unique ID
@@ -290,64 +345,12 @@ def generate_registry_response(
     """
     logger.debug(f"Generating RegistryResponse for request {request_id}")
 
-    # Generate unique response ID
-    response_id = str(uuid.uuid4())
-    timestamp = datetime.now(timezone.utc).isoformat()
-
-    # Build SOAP envelope
-    soap_envelope = etree.Element(
-        f"{{{SOAP_NS}}}Envelope",
-        nsmap={"soap": SOAP_NS}
-    )
-
-    soap_body = etree.SubElement(soap_envelope, f"{{{SOAP_NS}}}Body")
-
-    # Build RegistryResponse
-    registry_response = etree.SubElement(
-        soap_body,
-        f"{{{RS_NS}}}RegistryResponse",
-        nsmap={"rs": RS_NS, "rim": RIM_NS},
-        status="urn:oasis:names:tc:ebxml-regrep:ResponseStatusType:Success",
-        requestId=request_id
-    )
-
-    # Add SubmissionSetUniqueId slot
-    submission_slot = etree.SubElement(
-        registry_response,
-        f"{{{RIM_NS}}}Slot",
-        name="SubmissionSetUniqueId"
-    )
-    submission_value_list = etree.SubElement(submission_slot, f"{{{RIM_NS}}}ValueList")
-    submission_value = etree.SubElement(submission_value_list, f"{{{RIM_NS}}}Value")
-    submission_value.text = submission_set_id
-
-    # Add DocumentUniqueId slot
-    document_slot = etree.SubElement(
-        registry_response,
-        f"{{{RIM_NS}}}Slot",
-        name="DocumentUniqueId"
-    )
-    document_value_list = etree.SubElement(document_slot, f"{{{RIM_NS}}}ValueList")
-    document_value = etree.SubElement(document_value_list, f"{{{RIM_NS}}}Value")
-    document_value.text = document_unique_id
-
-    # Add ResponseId and Timestamp slots
-    response_id_slot = etree.SubElement(registry_response, f"{{{RIM_NS}}}Slot", name="ResponseId")
-    response_id_value_list = etree.SubElement(response_id_slot, f"{{{RIM_NS}}}ValueList")
-    response_id_value = etree.SubElement(response_id_value_list, f"{{{RIM_NS}}}Value")
-    response_id_value.text = response_id
-
-    timestamp_slot = etree.SubElement(registry_response, f"{{{RIM_NS}}}Slot", name="Timestamp")
-    timestamp_value_list = etree.SubElement(timestamp_slot, f"{{{RIM_NS}}}ValueList")
-    timestamp_value = etree.SubElement(timestamp_value_list, f"{{{RIM_NS}}}Value")
-    timestamp_value.text = timestamp
-
-    # Convert to string
-    response_xml = etree.tostring(
-        soap_envelope,
-        pretty_print=True,
-        xml_declaration=True,
-        encoding="UTF-8"
+    response_xml = REGISTRY_RESPONSE_TEMPLATE.render(
+        request_id=request_id,
+        submission_set_id=submission_set_id,
+        document_unique_id=document_unique_id,
+        response_id=str(uuid.uuid4()),
+        timestamp=datetime.now(timezone.utc).isoformat(),
     ).decode("utf-8")
 
     logger.info("Generated RegistryResponse with status Success")
@@ -370,32 +373,23 @@ def generate_soap_fault(
     Returns:
         SOAP fault XML string
     """
-    detail_xml = ""
-    if detail:
-        detail_xml = f"""
-      <soap:Detail>
-        <error>{detail}</error>
-      </soap:Detail>"""
-
-    fault_xml = f"""<?xml version="1.0" encoding="UTF-8"?>
-<soap:Envelope xmlns:soap="http://www.w3.org/2003/05/soap-envelope">
-  <soap:Body>
-    <soap:Fault>
-      <soap:Code>
-        <soap:Value>{faultcode}</soap:Value>
-      </soap:Code>
-      <soap:Reason>
-        <soap:Text xml:lang="en">{faultstring}</soap:Text>
-      </soap:Reason>{detail_xml}
-    </soap:Fault>
-  </soap:Body>
-</soap:Envelope>"""
+    fault_xml = render_soap_fault(faultcode, faultstring, detail).decode("utf-8")
 
     logger.warning(f"Generated SOAP Fault: {faultcode} - {faultstring}")
 
     return fault_xml
 
 
+def _request_patient_id(body: bytes, content_type: str) -> str:
+    """Return the bare patient ID of an ITI-41 request ('' if it cannot be parsed)."""
+    try:
+        soap_envelope = fast_extract_mtom_parts(body, content_type)["soap_envelope"]
+        patient_id = extract_xdsb_metadata(soap_envelope).get("patient_id", "")
+    except ValueError:
+        return ""
+    return parse_patient_identifier(patient_id)[0] if patient_id else ""
+
+
 @iti41_bp.route("/iti41/submit", methods=["POST"])
 def handle_iti41_submit() -> tuple[Response, int]:
     """Handle ITI-41 Provide and Register Document Set-b request.
@@ -422,10 +416,32 @@ def handle_iti41_submit() -> tuple[Response, int]:
     request_id = str(uuid.uuid4())
 
     try:
-        # Apply response delay from behavior config
-        if behavior and behavior.response_delay_ms > 0:
-            logger.debug(f"Simulating network delay: {behavior.response_delay_ms}ms")
-            time.sleep(behavior.response_delay_ms / 1000.0)
+        # Proxy to the upstream repository, or answer from recordings
+        recorded = record_or_replay(
+            "iti41",
+            config.record_replay if config else None,
+            _request_patient_id,
+            logger,
+            "application/soap+xml; charset=utf-8",
+        )
+        if recorded is not None:
+            return recorded
+
+        # Reject as overloaded, or queue behind other transactions, per the capacity model
+        retry_after = admit_request(behavior, "iti41", logger)
+        if retry_after is not None:
+            record_fault("overload")
+            fault_xml = generate_soap_fault(
+                "soap:Receiver",
+                "Service temporarily overloaded",
+                f"ITI-41 capacity exceeded. Retry after {retry_after} seconds.",
+            )
+            response = Response(fault_xml, mimetype="application/soap+xml; charset=utf-8")
+            response.headers["Retry-After"] = str(retry_after)
+            return response, behavior.capacity.overload_status_code
+        
+        # Apply response latency from behavior config (deferred when the server supports it)
+        simulate_latency(behavior, logger)
         
         # Simulate failure rate
         if behavior and behavior.failure_rate > 0:
@@ -435,15 +451,17 @@ def handle_iti41_submit() -> tuple[Response, int]:
                     or "Simulated ITI-41 submission failure for testing"
                 )
                 logger.info(f"Simulating failure (rate: {behavior.failure_rate})")
+                record_fault("simulated_failure")
                 fault_xml = generate_soap_fault("soap:Receiver", fault_message)
                 return Response(fault_xml, mimetype="application/soap+xml; charset=utf-8"), 500
         
         # Get request data
+        start_phases()
         content_type = request.content_type or ""
-        request_data = request.data
+        request_data = request.get_data()
 
-        logger.debug(f"Content-Type: {content_type}")
-        logger.debug(f"Request size: {len(request_data)} bytes")
+        logger.debug("Content-Type: %s", content_type)
+        logger.debug("Request size: %d bytes", len(request_data))
 
         # Validate multipart/related content type
         if "multipart/related" not in content_type.lower():
@@ -452,6 +470,7 @@ def handle_iti41_submit() -> tuple[Response, int]:
                 f"Expected multipart/related for MTOM attachments."
             )
             logger.warning(error_msg)
+            record_fault("invalid_content_type")
             fault_xml = generate_soap_fault(
                 "soap:Sender",
                 "Invalid Content-Type",
@@ -459,14 +478,15 @@ def handle_iti41_submit() -> tuple[Response, int]:
             )
             return Response(fault_xml, mimetype="application/soap+xml; charset=utf-8"), 400
 
-        # Extract MTOM parts
+        # Extract MTOM parts (zero-copy: envelope and document are views of the body)
         try:
-            mtom_parts = extract_mtom_parts(request_data, content_type)
+            mtom_parts = fast_extract_mtom_parts(request_data, content_type)
             soap_envelope = mtom_parts["soap_envelope"]
             document_attachment = mtom_parts["document_attachment"]
             document_content_id = mtom_parts["document_content_id"]
         except ValueError as e:
             logger.warning(f"MTOM parsing error: {e}")
+            record_fault("mtom_parse")
             fault_xml = generate_soap_fault(
                 "soap:Sender",
                 "MTOM Parsing Error",
@@ -479,12 +499,14 @@ def handle_iti41_submit() -> tuple[Response, int]:
             metadata = extract_xdsb_metadata(soap_envelope)
         except ValueError as e:
             logger.warning(f"XDSb metadata extraction error: {e}")
+            record_fault("invalid_metadata")
             fault_xml = generate_soap_fault(
                 "soap:Sender",
                 "Invalid XDSb Metadata",
                 str(e)
             )
             return Response(fault_xml, mimetype="application/soap+xml; charset=utf-8"), 400
+        end_phase("parse")
         
         # Validation mode enforcement
         if behavior and behavior.validation_mode == ValidationMode.STRICT:
@@ -493,6 +515,7 @@ def handle_iti41_submit() -> tuple[Response, int]:
             missing_fields = [f for f in required_fields if f not in metadata]
             if missing_fields:
                 logger.warning(f"Strict validation failed: missing {missing_fields}")
+                record_fault("strict_validation")
                 fault_xml = generate_soap_fault(
                     "soap:Sender",
                     f"Strict validation failed: Missing required XDSb metadata fields: {', '.join(missing_fields)}. "
@@ -500,9 +523,20 @@ def handle_iti41_submit() -> tuple[Response, int]:
                 )
                 return Response(fault_xml, mimetype="application/soap+xml; charset=utf-8"), 400
 
-        # Setup logging directory
-        log_dir = Path("mocks/logs/iti41-submissions")
-        log_dir.mkdir(parents=True, exist_ok=True)
+            # Strict mode with a patient registry: the patient must have been registered
+            if config.patient_registry.enabled:
+                registry = get_patient_registry(config.patient_registry)
+                patient_key = parse_patient_identifier(metadata["patient_id"])
+                if not registry.contains(*patient_key):
+                    logger.warning(f"Strict validation failed: unknown patient {metadata['patient_id']}")
+                    record_fault("unknown_patient")
+                    fault_xml = generate_soap_fault(
+                        "soap:Sender",
+                        f"XDSUnknownPatientId: Patient {patient_key[0]} ({patient_key[1]}) "
+                        f"is not registered. Register the patient with PIX Add first.",
+                    )
+                    return Response(fault_xml, mimetype="application/soap+xml; charset=utf-8"), 400
+        end_phase("validate")
 
         # Use custom IDs if provided in behavior config
         doc_id = metadata.get("document_unique_id", "unknown")
@@ -518,47 +552,62 @@ def handle_iti41_submit() -> tuple[Response, int]:
         
         patient_id = metadata.get("patient_id", "unknown")
 
-        logger.info(f"ITI-41 Submission - SubmissionSetID: {submission_set_id}")
-        logger.info(f"ITI-41 Submission - DocumentUniqueID: {doc_id}")
-        logger.info(f"ITI-41 Submission - PatientID: {patient_id}")
+        logger.info("ITI-41 Submission - SubmissionSetID: %s", submission_set_id)
+        logger.info("ITI-41 Submission - DocumentUniqueID: %s", doc_id)
+        logger.info("ITI-41 Submission - PatientID: %s", patient_id)
 
         # Log extracted metadata
         for key, value in metadata.items():
             if key not in ["submission_set_id", "document_unique_id", "patient_id"]:
-                logger.info(f"Metadata - {key}: {value}")
-
-        # Log full SOAP envelope at DEBUG level
-        logger.debug(f"SOAP Envelope:\n{soap_envelope}")
-
-        # Log full CCD document at DEBUG level
-        logger.debug(f"CCD Document ({len(document_attachment)} bytes):\n{document_attachment[:500]}...")
-
-        # Save transaction log
-        log_file = log_dir / f"{timestamp}-{doc_id}.log"
-        with open(log_file, "w", encoding="utf-8") as f:
-            f.write("=== ITI-41 Transaction Log ===\n")
-            f.write(f"Timestamp: {timestamp}\n")
-            f.write(f"Request ID: {request_id}\n")
-            f.write(f"Submission Set ID: {submission_set_id}\n")
-            f.write(f"Document Unique ID: {doc_id}\n")
-            f.write(f"Patient ID: {patient_id}\n")
-            f.write("\n=== Metadata ===\n")
-            for key, value in metadata.items():
-                f.write(f"{key}: {value}\n")
-            f.write("\n=== SOAP Envelope ===\n")
-            f.write(soap_envelope)
-            f.write("\n\n=== CCD Document ===\n")
-            f.write(document_attachment)
-
-        logger.info(f"Saved transaction log to {log_file}")
-
-        # Optionally save CCD document to disk
+                logger.info("Metadata - %s: %s", key, value)
+
+        # Log SOAP envelope and start of CCD document at DEBUG level (decoded only when enabled)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"SOAP Envelope:\n{bytes(soap_envelope).decode('utf-8', errors='replace')}"
+            )
+            logger.debug(
+                f"CCD Document ({len(document_attachment)} bytes):\n"
+                f"{bytes(document_attachment[:500]).decode('utf-8', errors='replace')}..."
+            )
+
+        record = SubmissionRecord(
+            request_id=request_id,
+            timestamp=timestamp,
+            submission_set_id=submission_set_id,
+            document_unique_id=doc_id,
+            patient_id=patient_id,
+            metadata=metadata,
+            soap_envelope=soap_envelope,
+            document=document_attachment,
+        )
         if config and config.save_submitted_documents:
-            doc_dir = Path("mocks/data/documents")
-            doc_dir.mkdir(parents=True, exist_ok=True)
-            doc_path = doc_dir / f"{doc_id}.xml"
-            doc_path.write_text(document_attachment, encoding="utf-8")
-            logger.info(f"Saved document to {doc_path}")
+            record.document_store = get_document_store(Path(config.document_store_dir))
+
+        if config and config.submission_log.mode == SubmissionLogMode.ARCHIVE:
+            # Archive mode: the background writer batches, compresses and
+            # indexes the transaction log and saves the document
+            writer = get_submission_log_writer(config.submission_log)
+            if writer.submit(record):
+                logger.debug(f"Queued transaction log for request {request_id}")
+        else:
+            # Save transaction log (parts are written as raw bytes, without decoding)
+            log_dir = Path("mocks/logs/iti41-submissions")
+            log_dir.mkdir(parents=True, exist_ok=True)
+            log_file = log_dir / f"{timestamp}-{doc_id}.log"
+            with open(log_file, "wb") as f:
+                for part in transaction_log_parts(record):
+                    f.write(part)
+
+            logger.info(f"Saved transaction log to {log_file}")
+
+            # Optionally save CCD document to the content-addressed store
+            if record.document_store is not None:
+                entry = record.document_store.put(
+                    document_attachment, doc_id, submission_set_id, patient_id
+                )
+                logger.info(f"Saved document {doc_id} as blob {entry.sha256}")
+        end_phase("log")
 
         # Generate RegistryResponse
         response_xml = generate_registry_response(
@@ -568,17 +617,20 @@ def handle_iti41_submit() -> tuple[Response, int]:
         )
 
         # Log response at DEBUG level
-        logger.debug(f"RegistryResponse:\n{response_xml}")
+        logger.debug("RegistryResponse:\n%s", response_xml)
 
         logger.info("ITI-41 request processed successfully - Status: Success")
 
-        return Response(
+        response = Response(
             response_xml,
             mimetype="application/soap+xml; charset=utf-8"
-        ), 200
+        )
+        end_phase("respond")
+        return response, 200
 
     except Exception as e:
         logger.error(f"Unexpected error processing ITI-41 request: {e}", exc_info=True)
+        record_fault("internal")
         fault_xml = generate_soap_fault(
             "soap:Receiver",
             "Internal Server Error",
@@ -0,0 +1,144 @@
+"""Latency simulation for mock endpoints.
+
+Endpoints draw a delay per request from the endpoint's ``LatencyProfile`` and
+call ``apply_response_delay``. When the request is served by the pooled server
+in ``prefork.py`` the delay is not slept on the handler thread: the buffered
+response is handed to a scheduler that sends it once the delay has elapsed, so
+thousands of slow transactions can be in flight without holding threads. Under
+Flask's development server or test client the delay falls back to
+``time.sleep``.
+"""
+
+import logging
+import math
+import random
+import time
+from typing import Any
+
+from flask import request
+
+from .config import LatencyDistribution, LatencyProfile
+from .metrics import record_simulated_delay
+
+
+logger = logging.getLogger("ihe_test_util.mock_server")
+
+# WSGI environ key set by servers that can defer responses
+DEFER_SUPPORTED_ENVIRON_KEY = "ihe_test_util.mock.defer_supported"
+
+# WSGI environ key holding the accumulated delay (seconds) for the response
+RESPONSE_DELAY_ENVIRON_KEY = "ihe_test_util.mock.response_delay_seconds"
+
+_rng = random.Random()
+
+
+def resolve_latency_profile(behavior: Any) -> LatencyProfile | None:
+    """Return the latency profile configured on an endpoint behavior.
+
+    ``behavior.latency`` takes precedence; otherwise a non-zero
+    ``response_delay_ms`` is treated as a constant profile.
+
+    Args:
+        behavior: PIXAddBehavior or ITI41Behavior (or None)
+
+    Returns:
+        Latency profile, or None if no delay is configured
+    """
+    if behavior is None:
+        return None
+    if behavior.latency is not None:
+        return behavior.latency
+    if behavior.response_delay_ms > 0:
+        return LatencyProfile(delay_ms=behavior.response_delay_ms)
+    return None
+
+
+def sample_delay_ms(
+    profile: LatencyProfile,
+    request_bytes: int = 0,
+    rng: random.Random | None = None,
+) -> float:
+    """Draw one response delay from a latency profile.
+
+    Args:
+        profile: Latency profile
+        request_bytes: Request body size (used by size_proportional)
+        rng: Random generator (default: module-level generator)
+
+    Returns:
+        Delay in milliseconds, clamped to 0 .. ``profile.cap_ms``
+    """
+    rng = rng or _rng
+    distribution = profile.distribution
+
+    if distribution == LatencyDistribution.CONSTANT:
+        delay = profile.delay_ms
+    elif distribution == LatencyDistribution.UNIFORM:
+        delay = rng.uniform(profile.min_ms, profile.max_ms)
+    elif distribution == LatencyDistribution.NORMAL:
+        delay = rng.gauss(profile.mean_ms, profile.stddev_ms)
+    elif distribution == LatencyDistribution.LOGNORMAL:
+        if profile.median_ms <= 0:
+            delay = 0.0
+        else:
+            delay = rng.lognormvariate(math.log(profile.median_ms), profile.sigma)
+    elif distribution == LatencyDistribution.BIMODAL:
+        if rng.random() < profile.spike_probability:
+            delay = rng.gauss(profile.spike_ms, profile.spike_stddev_ms)
+        else:
+            delay = rng.gauss(profile.mean_ms, profile.stddev_ms)
+    elif distribution == LatencyDistribution.SIZE_PROPORTIONAL:
+        delay = profile.delay_ms + profile.ms_per_kb * request_bytes / 1024
+    else:
+        raise ValueError(f"Unsupported latency distribution: {distribution}")
+
+    return min(max(delay, 0.0), profile.cap_ms)
+
+
+def apply_response_delay(delay_ms: float) -> bool:
+    """Delay the response to the current Flask request.
+
+    Must be called inside a request context.
+
+    Args:
+        delay_ms: Delay in milliseconds
+
+    Returns:
+        True if the delay was deferred to the server, False if it was slept
+    """
+    if delay_ms <= 0:
+        return False
+
+    environ = request.environ
+    if environ.get(DEFER_SUPPORTED_ENVIRON_KEY):
+        environ[RESPONSE_DELAY_ENVIRON_KEY] = (
+            environ.get(RESPONSE_DELAY_ENVIRON_KEY, 0.0) + delay_ms / 1000.0
+        )
+        return True
+
+    time.sleep(delay_ms / 1000.0)
+    return False
+
+
+def simulate_latency(behavior: Any, endpoint_logger: logging.Logger) -> float:
+    """Sample and apply the configured latency for the current request.
+
+    Args:
+        behavior: Endpoint behavior configuration (or None)
+        endpoint_logger: Logger of the calling endpoint
+
+    Returns:
+        Applied delay in milliseconds (0 if none)
+    """
+    profile = resolve_latency_profile(behavior)
+    if profile is None:
+        return 0.0
+
+    delay_ms = sample_delay_ms(profile, request.content_length or 0)
+    deferred = apply_response_delay(delay_ms)
+    record_simulated_delay(delay_ms)
+    endpoint_logger.debug(
+        f"Simulating network delay: {delay_ms:.1f}ms "
+        f"({profile.distribution.value}, {'deferred' if deferred else 'blocking'})"
+    )
+    return delay_ms
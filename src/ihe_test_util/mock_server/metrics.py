@@ -0,0 +1,326 @@
+"""Server-side metrics for the mock endpoints.
+
+Counters live in one flat ``multiprocessing.RawArray`` with a fixed layout:
+a block per worker, and inside it a block per endpoint holding request counts
+by status, fault counts by type, handler-phase histograms, an in-flight gauge,
+bytes in/out and simulated-delay totals. In pre-fork mode the master allocates
+the array before forking (like ``prefork.WorkerStats``) and every worker only
+writes its own block, so no cross-process lock is needed; a thread lock makes
+each update atomic within a worker. Reading sums the worker blocks, so any
+worker can serve the aggregated ``/metrics`` view.
+
+Endpoints time their handler phases with ``start_phases`` / ``end_phase``::
+
+    start_phases()
+    data = parse(...)
+    end_phase("parse")
+    ...
+"""
+
+import bisect
+import multiprocessing
+import threading
+import time
+from typing import Any
+
+from flask import g
+
+
+ENDPOINTS = ("pix_add", "iti41", "health", "metrics", "other")
+
+STATUS_CODES = (200, 400, 404, 405, 413, 429, 500, 503)
+
+FAULT_TYPES = (
+    "simulated_failure",
+    "invalid_content_type",
+    "soap_parse",
+    "mtom_parse",
+    "invalid_metadata",
+    "strict_validation",
+    "duplicate_patient",
+    "unknown_patient",
+    "overload",
+    "upstream",
+    "replay_miss",
+    "internal",
+    "other",
+)
+
+PHASES = ("parse", "validate", "log", "respond", "total")
+
+# Upper bounds (seconds) of the handler-time histogram buckets
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+_ENDPOINT_INDEX = {name: index for index, name in enumerate(ENDPOINTS)}
+_STATUS_INDEX = {code: index for index, code in enumerate(STATUS_CODES)}
+_FAULT_INDEX = {name: index for index, name in enumerate(FAULT_TYPES)}
+_PHASE_INDEX = {name: index for index, name in enumerate(PHASES)}
+
+# Per-endpoint block layout
+_STATUS_SLOTS = len(STATUS_CODES) + 1  # last slot: any other status
+_HISTOGRAM_SLOTS = len(LATENCY_BUCKETS) + 2  # buckets, overflow, sum
+_REQUESTS_OFFSET = 0
+_FAULTS_OFFSET = _REQUESTS_OFFSET + _STATUS_SLOTS
+_HISTOGRAMS_OFFSET = _FAULTS_OFFSET + len(FAULT_TYPES)
+_IN_FLIGHT_OFFSET = _HISTOGRAMS_OFFSET + len(PHASES) * _HISTOGRAM_SLOTS
+_BYTES_IN_OFFSET = _IN_FLIGHT_OFFSET + 1
+_BYTES_OUT_OFFSET = _BYTES_IN_OFFSET + 1
+_DELAY_SUM_OFFSET = _BYTES_OUT_OFFSET + 1
+_DELAY_COUNT_OFFSET = _DELAY_SUM_OFFSET + 1
+_ENDPOINT_SLOTS = _DELAY_COUNT_OFFSET + 1
+_WORKER_SLOTS = _ENDPOINT_SLOTS * len(ENDPOINTS)
+
+
+class MetricsRegistry:
+    """Fixed-layout metric counters shared across forked workers.
+
+    Attributes:
+        workers: Number of worker blocks
+    """
+
+    def __init__(self, workers: int = 1) -> None:
+        """Allocate zeroed counters.
+
+        Args:
+            workers: Number of worker blocks (worker IDs 1..workers)
+        """
+        self.workers = workers
+        self._values = multiprocessing.RawArray("d", workers * _WORKER_SLOTS)
+        self._lock = threading.Lock()
+        self._base = 0
+
+    def select_worker(self, worker_id: int) -> None:
+        """Direct this process's updates to a worker block.
+
+        Resets the block's in-flight gauges, which a crashed predecessor may
+        have left non-zero.
+
+        Args:
+            worker_id: 1-based worker ID
+        """
+        self._base = (worker_id - 1) * _WORKER_SLOTS
+        with self._lock:
+            for endpoint in range(len(ENDPOINTS)):
+                self._values[self._base + endpoint * _ENDPOINT_SLOTS + _IN_FLIGHT_OFFSET] = 0
+
+    def _slot(self, endpoint: str, offset: int) -> int:
+        """Return the array index of an endpoint slot in this worker's block."""
+        return (
+            self._base
+            + _ENDPOINT_INDEX.get(endpoint, _ENDPOINT_INDEX["other"]) * _ENDPOINT_SLOTS
+            + offset
+        )
+
+    def request_started(self, endpoint: str, bytes_in: int) -> None:
+        """Count an accepted request as in flight."""
+        base = self._slot(endpoint, 0)
+        with self._lock:
+            self._values[base + _IN_FLIGHT_OFFSET] += 1
+            self._values[base + _BYTES_IN_OFFSET] += bytes_in
+
+    def request_finished(self, endpoint: str) -> None:
+        """Remove a request from the in-flight gauge."""
+        with self._lock:
+            self._values[self._slot(endpoint, _IN_FLIGHT_OFFSET)] -= 1
+
+    def observe_response(self, endpoint: str, status: int, bytes_out: int) -> None:
+        """Count a response by status code and its body size."""
+        base = self._slot(endpoint, 0)
+        status_slot = _STATUS_INDEX.get(status, len(STATUS_CODES))
+        with self._lock:
+            self._values[base + _REQUESTS_OFFSET + status_slot] += 1
+            self._values[base + _BYTES_OUT_OFFSET] += bytes_out
+
+    def observe_fault(self, endpoint: str, fault_type: str) -> None:
+        """Count a SOAP fault by type."""
+        fault_slot = _FAULT_INDEX.get(fault_type, _FAULT_INDEX["other"])
+        with self._lock:
+            self._values[self._slot(endpoint, _FAULTS_OFFSET + fault_slot)] += 1
+
+    def observe_phase(self, endpoint: str, phase: str, seconds: float) -> None:
+        """Add a handler-phase duration to its histogram."""
+        base = self._slot(endpoint, _HISTOGRAMS_OFFSET + _PHASE_INDEX[phase] * _HISTOGRAM_SLOTS)
+        bucket = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            self._values[base + bucket] += 1
+            self._values[base + _HISTOGRAM_SLOTS - 1] += seconds
+
+    def observe_simulated_delay(self, endpoint: str, seconds: float) -> None:
+        """Add a simulated response delay to the totals."""
+        base = self._slot(endpoint, 0)
+        with self._lock:
+            self._values[base + _DELAY_SUM_OFFSET] += seconds
+            self._values[base + _DELAY_COUNT_OFFSET] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return all metrics summed over workers.
+
+        Returns:
+            Dict keyed by endpoint with requests (by status), faults (by
+            type), phases (bucket counts, sum, count), in_flight, bytes_in,
+            bytes_out, simulated_delay_seconds and simulated_delays
+        """
+        values = self._values[:]
+        totals = [0.0] * _WORKER_SLOTS
+        for worker in range(self.workers):
+            start = worker * _WORKER_SLOTS
+            for index in range(_WORKER_SLOTS):
+                totals[index] += values[start + index]
+
+        endpoints = {}
+        for endpoint_index, endpoint in enumerate(ENDPOINTS):
+            base = endpoint_index * _ENDPOINT_SLOTS
+            requests = {
+                str(code): int(totals[base + _REQUESTS_OFFSET + index])
+                for index, code in enumerate(STATUS_CODES)
+            }
+            requests["other"] = int(totals[base + _REQUESTS_OFFSET + len(STATUS_CODES)])
+            phases = {}
+            for phase_index, phase in enumerate(PHASES):
+                start = base + _HISTOGRAMS_OFFSET + phase_index * _HISTOGRAM_SLOTS
+                buckets = [int(count) for count in totals[start:start + len(LATENCY_BUCKETS) + 1]]
+                phases[phase] = {
+                    "buckets": buckets,
+                    "sum": totals[start + _HISTOGRAM_SLOTS - 1],
+                    "count": sum(buckets),
+                }
+            endpoints[endpoint] = {
+                "requests": requests,
+                "faults": {
+                    fault: int(totals[base + _FAULTS_OFFSET + index])
+                    for index, fault in enumerate(FAULT_TYPES)
+                },
+                "phases": phases,
+                "in_flight": int(totals[base + _IN_FLIGHT_OFFSET]),
+                "bytes_in": int(totals[base + _BYTES_IN_OFFSET]),
+                "bytes_out": int(totals[base + _BYTES_OUT_OFFSET]),
+                "simulated_delay_seconds": totals[base + _DELAY_SUM_OFFSET],
+                "simulated_delays": int(totals[base + _DELAY_COUNT_OFFSET]),
+            }
+        return endpoints
+
+
+def _format_le(bound: float) -> str:
+    """Format a histogram bound the way Prometheus client libraries do."""
+    return repr(float(bound))
+
+
+def render_prometheus(snapshot: dict[str, Any]) -> str:
+    """Render a registry snapshot in the Prometheus text exposition format.
+
+    Args:
+        snapshot: Output of ``MetricsRegistry.snapshot``
+
+    Returns:
+        Exposition text (version 0.0.4)
+    """
+    lines = [
+        "# HELP mock_requests_total Requests handled, by endpoint and HTTP status.",
+        "# TYPE mock_requests_total counter",
+    ]
+    for endpoint, data in snapshot.items():
+        for status, count in data["requests"].items():
+            if count:
+                lines.append(f'mock_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+
+    lines += [
+        "# HELP mock_faults_total SOAP faults returned, by endpoint and fault type.",
+        "# TYPE mock_faults_total counter",
+    ]
+    for endpoint, data in snapshot.items():
+        for fault_type, count in data["faults"].items():
+            if count:
+                lines.append(f'mock_faults_total{{endpoint="{endpoint}",fault_type="{fault_type}"}} {count}')
+
+    lines += [
+        "# HELP mock_handler_seconds Handler time by endpoint and phase.",
+        "# TYPE mock_handler_seconds histogram",
+    ]
+    for endpoint, data in snapshot.items():
+        for phase, histogram in data["phases"].items():
+            if not histogram["count"]:
+                continue
+            labels = f'endpoint="{endpoint}",phase="{phase}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, histogram["buckets"]):
+                cumulative += count
+                lines.append(f'mock_handler_seconds_bucket{{{labels},le="{_format_le(bound)}"}} {cumulative}')
+            lines.append(f'mock_handler_seconds_bucket{{{labels},le="+Inf"}} {histogram["count"]}')
+            lines.append(f"mock_handler_seconds_sum{{{labels}}} {histogram['sum']}")
+            lines.append(f"mock_handler_seconds_count{{{labels}}} {histogram['count']}")
+
+    gauges = (
+        ("mock_in_flight_requests", "gauge", "Requests currently being handled.", "in_flight"),
+        ("mock_request_bytes_total", "counter", "Request body bytes received.", "bytes_in"),
+        ("mock_response_bytes_total", "counter", "Response body bytes sent.", "bytes_out"),
+        ("mock_simulated_delay_seconds_total", "counter", "Simulated latency added to responses.", "simulated_delay_seconds"),
+        ("mock_simulated_delays_total", "counter", "Responses that received simulated latency.", "simulated_delays"),
+    )
+    for name, metric_type, help_text, key in gauges:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+        for endpoint, data in snapshot.items():
+            lines.append(f'{name}{{endpoint="{endpoint}"}} {data[key]}')
+
+    return "\n".join(lines) + "\n"
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Return the registry this process records into."""
+    return _registry
+
+
+def install_metrics_registry(registry: MetricsRegistry, worker_id: int = 1) -> None:
+    """Record into a shared registry (called in each pre-forked worker).
+
+    Args:
+        registry: Registry allocated by the master before forking
+        worker_id: 1-based worker ID
+    """
+    global _registry
+    registry.select_worker(worker_id)
+    _registry = registry
+
+
+def start_phases() -> None:
+    """Start timing handler phases for the current request."""
+    g._metrics_phase_start = time.perf_counter()
+
+
+def end_phase(phase: str) -> None:
+    """Record the time since the previous phase boundary under ``phase``.
+
+    No-op when ``start_phases`` was not called for this request.
+
+    Args:
+        phase: One of parse, validate, log, respond
+    """
+    start = g.get("_metrics_phase_start")
+    if start is None:
+        return
+    now = time.perf_counter()
+    _registry.observe_phase(g.get("metrics_endpoint", "other"), phase, now - start)
+    g._metrics_phase_start = now
+
+
+def record_fault(fault_type: str) -> None:
+    """Count a SOAP fault for the current request's endpoint.
+
+    Args:
+        fault_type: One of ``FAULT_TYPES`` (unknown types count as "other")
+    """
+    _registry.observe_fault(g.get("metrics_endpoint", "other"), fault_type)
+
+
+def record_simulated_delay(delay_ms: float) -> None:
+    """Add a simulated delay for the current request's endpoint.
+
+    Args:
+        delay_ms: Delay in milliseconds
+    """
+    _registry.observe_simulated_delay(g.get("metrics_endpoint", "other"), delay_ms / 1000.0)
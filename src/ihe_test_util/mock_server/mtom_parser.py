@@ -0,0 +1,458 @@
+"""Zero-copy multipart/related (MTOM/XOP) parser for the mock ITI-41 endpoint.
+
+``iti41_endpoint.extract_mtom_parts`` hands the whole request to the ``email``
+package, which copies the body several times and decodes every payload to
+``str``. The parser in this module scans for MIME boundaries with ``bytes.find``
+and returns each part body as a ``memoryview`` slice of the original request, so
+multi-MB documents are never copied unless a part declares a
+Content-Transfer-Encoding (base64/quoted-printable) that must be decoded.
+
+Parts are addressable by Content-ID, and ``xop:Include`` references in the root
+part are resolved to the parts they point at.
+
+Example:
+    >>> multipart = parse_multipart_related(body, content_type)
+    >>> root = multipart.root
+    >>> documents = resolve_xop_includes(multipart)
+"""
+
+import base64
+import binascii
+import logging
+import quopri
+import re
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import unquote
+
+
+logger = logging.getLogger("ihe_test_util.mock_server.iti41")
+
+# Content types accepted as the SOAP root part
+ROOT_CONTENT_TYPES = ("application/xop+xml", "application/soap+xml")
+
+# Content types accepted as the document part when no xop:Include is present
+DOCUMENT_CONTENT_TYPES = ("text/xml", "application/xml")
+
+# Matches xop:Include (any prefix) and captures its href attribute
+_XOP_INCLUDE_HREF = re.compile(
+    rb"<(?:[\w.-]+:)?Include\b[^>]*?\bhref\s*=\s*[\"']([^\"']+)[\"']"
+)
+
+# Matches one parameter of a MIME header value: ; name="value" or ; name=value
+_HEADER_PARAM = re.compile(
+    r';\s*([^\s=;]+)\s*=\s*(?:"((?:[^"\\]|\\.)*)"|([^;]*))'
+)
+
+
+@dataclass
+class MIMEPart:
+    """One body part of a multipart/related message.
+
+    Attributes:
+        content_type: Lower-cased media type (e.g. ``application/xop+xml``)
+        content_id: Content-ID without angle brackets (empty if absent)
+        headers: Part headers keyed by lower-cased header name
+        params: Content-Type parameters keyed by lower-cased name
+        transfer_encoding: Lower-cased Content-Transfer-Encoding
+        body: Zero-copy view of the raw (still encoded) part body
+    """
+
+    content_type: str
+    content_id: str
+    headers: dict[str, str]
+    params: dict[str, str]
+    transfer_encoding: str
+    body: memoryview
+
+    @property
+    def charset(self) -> str:
+        """Charset from the Content-Type parameters (default UTF-8)."""
+        return self.params.get("charset", "utf-8")
+
+    def payload(self) -> bytes | memoryview:
+        """Return the decoded body.
+
+        Returns the zero-copy ``body`` view unless the part uses base64 or
+        quoted-printable transfer encoding, in which case a decoded copy is
+        returned.
+
+        Raises:
+            ValueError: If the encoded body cannot be decoded
+        """
+        try:
+            if self.transfer_encoding == "base64":
+                return base64.b64decode(self.body)
+            if self.transfer_encoding == "quoted-printable":
+                return quopri.decodestring(bytes(self.body))
+        except (binascii.Error, ValueError) as e:
+            raise ValueError(
+                f"Failed to decode {self.transfer_encoding} body of MIME part "
+                f"'{self.content_id or self.content_type}': {e}"
+            ) from e
+        return self.body
+
+    def text(self) -> str:
+        """Return the decoded body as text using the part charset.
+
+        Raises:
+            ValueError: If the body cannot be decoded
+        """
+        try:
+            return bytes(self.payload()).decode(self.charset)
+        except (UnicodeDecodeError, LookupError) as e:
+            raise ValueError(
+                f"Failed to decode MIME part '{self.content_id or self.content_type}' "
+                f"as {self.charset}: {e}"
+            ) from e
+
+
+@dataclass
+class MultipartRelated:
+    """Parsed multipart/related message.
+
+    Attributes:
+        parts: Body parts in message order
+        start: Content-ID of the root part from the ``start`` parameter (if any)
+    """
+
+    parts: list[MIMEPart]
+    start: str | None = None
+    _by_content_id: dict[str, MIMEPart] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self) -> None:
+        for part in self.parts:
+            if part.content_id and part.content_id not in self._by_content_id:
+                self._by_content_id[part.content_id] = part
+
+    @property
+    def root(self) -> MIMEPart | None:
+        """Root (SOAP envelope) part.
+
+        The part named by the ``start`` parameter, otherwise the first part whose
+        content type is a SOAP/XOP type. Returns None if there is no such part.
+        """
+        if self.start:
+            return self.get(self.start)
+        for part in self.parts:
+            if _is_root_content_type(part.content_type):
+                return part
+        return None
+
+    def get(self, reference: str) -> MIMEPart | None:
+        """Look up a part by Content-ID.
+
+        Args:
+            reference: Content-ID with or without angle brackets, or a ``cid:``
+                URL (percent-encoded per RFC 2392)
+
+        Returns:
+            Matching part or None
+        """
+        return self._by_content_id.get(normalize_content_id(reference))
+
+
+def normalize_content_id(reference: str) -> str:
+    """Normalize a Content-ID header value or ``cid:`` URL for lookup.
+
+    Args:
+        reference: e.g. ``<doc1@example.org>`` or ``cid:doc1%40example.org``
+
+    Returns:
+        Bare Content-ID, e.g. ``doc1@example.org``
+    """
+    reference = reference.strip()
+    if reference[:4].lower() == "cid:":
+        reference = unquote(reference[4:])
+    return reference.strip("<>")
+
+
+def parse_content_type(header: str) -> tuple[str, dict[str, str]]:
+    """Split a Content-Type header into media type and parameters.
+
+    Args:
+        header: Header value, e.g. ``multipart/related; boundary="b1"``
+
+    Returns:
+        Tuple of (lower-cased media type, parameters keyed by lower-cased name)
+    """
+    media_type, _, rest = header.partition(";")
+    params: dict[str, str] = {}
+    for match in _HEADER_PARAM.finditer(";" + rest):
+        name, quoted, bare = match.groups()
+        if quoted is not None:
+            value = re.sub(r"\\(.)", r"\1", quoted)
+        else:
+            value = (bare or "").strip()
+        params[name.lower()] = value
+    return media_type.strip().lower(), params
+
+
+def parse_multipart_related(
+    data: bytes | bytearray | memoryview,
+    content_type: str,
+) -> MultipartRelated:
+    """Split a multipart/related body into parts without copying part bodies.
+
+    Accepts both CRLF and bare LF line endings and ignores any preamble and
+    epilogue around the delimiters.
+
+    Args:
+        data: Raw request body
+        content_type: Content-Type header of the request (must carry a boundary)
+
+    Returns:
+        Parsed message; each part body is a ``memoryview`` into ``data``
+
+    Raises:
+        ValueError: If the content type is not multipart, has no boundary, or
+            no delimited parts are found
+    """
+    media_type, params = parse_content_type(content_type)
+    if not media_type.startswith("multipart/"):
+        raise ValueError(
+            "Expected multipart/related MTOM message but received non-multipart content. "
+            "Ensure Content-Type is multipart/related with proper boundary."
+        )
+    boundary = params.get("boundary")
+    if not boundary:
+        raise ValueError(
+            f"Content-Type '{content_type}' has no boundary parameter. "
+            f"Ensure Content-Type is multipart/related with proper boundary."
+        )
+
+    view = memoryview(data).cast("B")
+    # Boundary search needs bytes.find; a view over a whole bytes object is
+    # searched through its underlying object, anything else is copied once
+    if isinstance(data, (bytes, bytearray)):
+        haystack = data
+    elif isinstance(view.obj, (bytes, bytearray)) and len(view.obj) == len(view):
+        haystack = view.obj
+    else:
+        haystack = bytes(view)
+
+    delimiter = b"--" + boundary.encode("latin-1")
+    offsets = _find_delimiters(haystack, delimiter, len(view))
+    if len(offsets) < 2:
+        raise ValueError(
+            f"No MIME parts delimited by boundary '{boundary}' were found. "
+            f"Expected multipart/related MTOM message but received non-multipart content."
+        )
+
+    parts: list[MIMEPart] = []
+    for (start, _), (end, _) in zip(offsets, offsets[1:]):
+        body_start = _skip_line(haystack, start + len(delimiter))
+        body_end = end
+        # The CRLF before a delimiter belongs to the delimiter
+        if body_end > body_start and haystack[body_end - 1:body_end] == b"\n":
+            body_end -= 1
+            if body_end > body_start and haystack[body_end - 1:body_end] == b"\r":
+                body_end -= 1
+        parts.append(_parse_part(haystack, view, body_start, body_end))
+
+    start_param = params.get("start")
+    multipart = MultipartRelated(
+        parts=parts,
+        start=normalize_content_id(start_param) if start_param else None,
+    )
+    logger.debug(
+        "Parsed multipart/related: %d parts, %d bytes", len(parts), len(view)
+    )
+    return multipart
+
+
+def _find_delimiters(
+    haystack: bytes | bytearray, delimiter: bytes, length: int
+) -> list[tuple[int, bool]]:
+    """Return (offset, is_close) for each delimiter line up to the close delimiter."""
+    offsets: list[tuple[int, bool]] = []
+    position = 0
+    while position < length:
+        index = haystack.find(delimiter, position)
+        if index < 0:
+            break
+        position = index + len(delimiter)
+        # Delimiters must start a line
+        if index > 0 and haystack[index - 1:index] != b"\n":
+            continue
+        is_close = haystack[position:position + 2] == b"--"
+        offsets.append((index, is_close))
+        if is_close:
+            break
+    return offsets
+
+
+def _skip_line(haystack: bytes | bytearray, position: int) -> int:
+    """Return the offset just past the end of the line containing ``position``."""
+    newline = haystack.find(b"\n", position)
+    return len(haystack) if newline < 0 else newline + 1
+
+
+def _parse_part(
+    haystack: bytes | bytearray, view: memoryview, start: int, end: int
+) -> MIMEPart:
+    """Parse one part's headers and slice its body."""
+    # Headers end at the first empty line; scan line by line so that the
+    # (possibly multi-MB) body is never searched
+    position = start
+    body_start = end
+    while position < end:
+        newline = haystack.find(b"\n", position, end)
+        if newline < 0:
+            break
+        line = haystack[position:newline]
+        position = newline + 1
+        if line in (b"", b"\r"):
+            body_start = position
+            break
+    header_block = haystack[start:body_start]
+
+    headers = _parse_headers(bytes(header_block).decode("latin-1"))
+    content_type, params = parse_content_type(headers.get("content-type", "text/plain"))
+    return MIMEPart(
+        content_type=content_type,
+        content_id=normalize_content_id(headers.get("content-id", "")),
+        headers=headers,
+        params=params,
+        transfer_encoding=headers.get("content-transfer-encoding", "binary").strip().lower(),
+        body=view[body_start:end],
+    )
+
+
+def _parse_headers(block: str) -> dict[str, str]:
+    """Parse RFC 822 style headers, unfolding continuation lines."""
+    headers: dict[str, str] = {}
+    name: str | None = None
+    for line in block.splitlines():
+        if not line.strip():
+            continue
+        if line[0] in " \t" and name is not None:
+            headers[name] += " " + line.strip()
+            continue
+        key, sep, value = line.partition(":")
+        if not sep:
+            continue
+        name = key.strip().lower()
+        headers[name] = value.strip()
+    return headers
+
+
+def _is_root_content_type(content_type: str) -> bool:
+    """Check whether a part content type can carry the SOAP envelope."""
+    return content_type in ROOT_CONTENT_TYPES or "soap" in content_type
+
+
+def find_xop_includes(root: MIMEPart) -> list[str]:
+    """Return the ``href`` of every ``xop:Include`` in the root part.
+
+    Scans the raw bytes with a regular expression instead of building a tree;
+    the endpoint parses the envelope for metadata separately.
+
+    Args:
+        root: Root (SOAP envelope) part
+
+    Returns:
+        href values in document order (e.g. ``cid:doc1@example.org``)
+    """
+    return [
+        match.group(1).decode("ascii", errors="replace")
+        for match in _XOP_INCLUDE_HREF.finditer(root.payload())
+    ]
+
+
+def resolve_xop_includes(multipart: MultipartRelated) -> dict[str, MIMEPart]:
+    """Resolve every ``xop:Include`` in the root part to its MIME part.
+
+    Args:
+        multipart: Parsed message
+
+    Returns:
+        Mapping of href to the referenced part, in document order
+
+    Raises:
+        ValueError: If there is no root part or an href references a
+            Content-ID that no part carries
+    """
+    root = multipart.root
+    if root is None:
+        raise ValueError(
+            "Missing SOAP envelope in MTOM message. "
+            "Ensure multipart message includes application/xop+xml part."
+        )
+
+    resolved: dict[str, MIMEPart] = {}
+    for href in find_xop_includes(root):
+        part = multipart.get(href)
+        if part is None:
+            available = [p.content_id for p in multipart.parts]
+            raise ValueError(
+                f"xop:Include references '{href}' but no MIME part has that "
+                f"Content-ID. Available Content-IDs: {available}"
+            )
+        resolved[href] = part
+    return resolved
+
+
+def fast_extract_mtom_parts(
+    request_data: bytes | memoryview, content_type: str
+) -> dict[str, Any]:
+    """Extract SOAP envelope and document attachment without copying the document.
+
+    Drop-in alternative to ``iti41_endpoint.extract_mtom_parts`` for the
+    endpoint hot path. The document is the part referenced by the first
+    ``xop:Include`` in the envelope, falling back to the first XML part other
+    than the root when the envelope has no include.
+
+    Args:
+        request_data: Raw MTOM multipart message bytes
+        content_type: Content-Type header value
+
+    Returns:
+        Dictionary containing:
+            - soap_envelope: SOAP envelope bytes (view, or decoded copy)
+            - document_attachment: Document bytes (view, or decoded copy)
+            - document_content_id: Content-ID of the document attachment
+            - document_content_type: Content type of the document attachment
+
+    Raises:
+        ValueError: If MTOM structure is invalid or parts are missing
+    """
+    multipart = parse_multipart_related(request_data, content_type)
+    parts_found = [part.content_type for part in multipart.parts]
+
+    root = multipart.root
+    if root is None or not _is_root_content_type(root.content_type):
+        raise ValueError(
+            f"Missing SOAP envelope in MTOM message. Found parts: {parts_found}. "
+            f"Ensure multipart message includes application/xop+xml part."
+        )
+
+    includes = resolve_xop_includes(multipart)
+    document = next(iter(includes.values()), None)
+    if document is None:
+        document = next(
+            (
+                part for part in multipart.parts
+                if part is not root and part.content_type in DOCUMENT_CONTENT_TYPES
+            ),
+            None,
+        )
+    if document is None:
+        raise ValueError(
+            f"Missing CCD document attachment in MTOM message. Found parts: {parts_found}. "
+            f"Ensure multipart message includes text/xml or application/xml part with document content."
+        )
+
+    soap_envelope = root.payload()
+    document_attachment = document.payload()
+    logger.debug(
+        "Extracted MTOM parts: envelope %d bytes, document %d bytes (Content-ID=%s)",
+        len(soap_envelope), len(document_attachment), document.content_id,
+    )
+
+    return {
+        "soap_envelope": soap_envelope,
+        "document_attachment": document_attachment,
+        "document_content_id": document.content_id,
+        "document_content_type": document.content_type,
+    }
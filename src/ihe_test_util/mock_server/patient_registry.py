@@ -0,0 +1,548 @@
+"""In-memory patient registry for cross-transaction checks.
+
+When ``patient_registry.enabled`` is set, PIX Add registers every patient
+under its (patient ID, assigning authority OID) key and ITI-41 in strict
+validation mode rejects submissions for unknown patients. Lookups are single
+dict (or hash table) probes, so they stay O(1) at millions of patients.
+
+Pre-fork workers each keep their own records (demographics, registration
+counts), but membership is decided by a ``SharedPatientIndex``: an
+open-addressing table of 128-bit key digests in shared memory, allocated by
+the master before forking (like ``WorkerStats``). A patient added through one
+worker is therefore known to every other worker.
+
+Snapshots are JSON lines (gzip-compressed when the path ends in ``.gz``) with
+a header line followed by one record per patient::
+
+    {"format": "ihe-mock-patient-registry", "version": 1, "count": 2, ...}
+    {"patient_id": "PAT-1", "patient_id_oid": "1.2.3", "registrations": 1, ...}
+"""
+
+import atexit
+import gzip
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any
+
+from .config import PatientRegistryConfig
+
+
+logger = logging.getLogger("ihe_test_util.mock_server.patient_registry")
+
+SNAPSHOT_FORMAT = "ihe-mock-patient-registry"
+SNAPSHOT_VERSION = 1
+
+# Shared index load factor ceiling (table size is a power of two above capacity / load)
+_MAX_LOAD = 0.7
+
+
+def parse_patient_identifier(value: str) -> tuple[str, str]:
+    """Split an HL7 CX patient identifier into (ID, assigning authority OID).
+
+    Args:
+        value: Identifier such as ``PAT-1^^^&1.2.3.4&ISO`` (a bare ID yields
+            an empty OID)
+
+    Returns:
+        Tuple of (patient ID, assigning authority OID)
+    """
+    components = value.split("^")
+    if len(components) < 4:
+        return value, ""
+    authority = components[3].split("&")
+    oid = authority[1] if len(authority) > 1 else authority[0]
+    return components[0], oid
+
+
+@dataclass(slots=True)
+class PatientRecord:
+    """One registered patient.
+
+    Attributes:
+        patient_id: Patient identifier
+        patient_id_oid: Assigning authority OID
+        demographics: Demographics from the PIX Add message (name, birth date, ...)
+        registered_at: First registration time (ISO 8601, UTC)
+        registrations: PIX Add requests seen for this patient
+    """
+
+    patient_id: str
+    patient_id_oid: str
+    demographics: dict[str, str] = field(default_factory=dict)
+    registered_at: str = ""
+    registrations: int = 1
+
+
+@dataclass
+class PatientRegistryStats:
+    """Counters of a patient registry (per process).
+
+    Attributes:
+        registered: New patients registered
+        duplicates: Registrations of already known patients
+        lookups: Membership checks
+        misses: Membership checks for unknown patients
+        snapshots_saved: Snapshots written
+    """
+
+    registered: int = 0
+    duplicates: int = 0
+    lookups: int = 0
+    misses: int = 0
+    snapshots_saved: int = 0
+
+
+class SharedPatientIndex:
+    """Fixed-capacity set of patient keys shared by forked processes.
+
+    Keys are stored as 128-bit BLAKE2b digests in a ``RawArray`` with linear
+    probing; a ``multiprocessing.Lock`` serialises access. Must be created
+    before ``os.fork`` so that every worker maps the same memory.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Allocate the shared table.
+
+        Args:
+            capacity: Maximum number of patients
+        """
+        size = 1
+        while size * _MAX_LOAD < capacity:
+            size <<= 1
+        self.capacity = capacity
+        self._mask = size - 1
+        # Two words per slot: (high, low) digest halves; high == 0 marks an empty slot
+        self._slots = multiprocessing.RawArray("Q", size * 2)
+        self._count = multiprocessing.RawValue("q", 0)
+        self._lock = multiprocessing.Lock()
+
+    def __len__(self) -> int:
+        return self._count.value
+
+    @staticmethod
+    def _digest(patient_id: str, patient_id_oid: str) -> tuple[int, int]:
+        digest = hashlib.blake2b(
+            f"{patient_id}\x1f{patient_id_oid}".encode("utf-8"), digest_size=16
+        ).digest()
+        return int.from_bytes(digest[:8], "little") or 1, int.from_bytes(digest[8:], "little")
+
+    def add(self, patient_id: str, patient_id_oid: str) -> bool:
+        """Add a patient key.
+
+        Args:
+            patient_id: Patient identifier
+            patient_id_oid: Assigning authority OID
+
+        Returns:
+            True if the key was new, False if it was already present
+
+        Raises:
+            ValueError: If the index is full
+        """
+        high, low = self._digest(patient_id, patient_id_oid)
+        slots = self._slots
+        index = low & self._mask
+        with self._lock:
+            while True:
+                current = slots[index * 2]
+                if current == 0:
+                    if self._count.value >= self.capacity:
+                        raise ValueError(
+                            f"Shared patient index is full ({self.capacity} patients). "
+                            "Increase patient_registry.shared_capacity."
+                        )
+                    slots[index * 2 + 1] = low
+                    slots[index * 2] = high
+                    self._count.value += 1
+                    return True
+                if current == high and slots[index * 2 + 1] == low:
+                    return False
+                index = (index + 1) & self._mask
+
+    def contains(self, patient_id: str, patient_id_oid: str) -> bool:
+        """Check whether a patient key is present.
+
+        Args:
+            patient_id: Patient identifier
+            patient_id_oid: Assigning authority OID
+
+        Returns:
+            True if the patient was added by any process
+        """
+        high, low = self._digest(patient_id, patient_id_oid)
+        slots = self._slots
+        index = low & self._mask
+        with self._lock:
+            while True:
+                current = slots[index * 2]
+                if current == 0:
+                    return False
+                if current == high and slots[index * 2 + 1] == low:
+                    return True
+                index = (index + 1) & self._mask
+
+
+class PatientRegistry:
+    """Patients keyed by (patient ID, assigning authority OID).
+
+    Thread-safe. With a ``SharedPatientIndex`` membership (``contains``,
+    ``len`` and whether ``register`` sees a new patient) spans all pre-fork
+    workers, while ``get`` only returns records registered or restored in
+    this process.
+    """
+
+    def __init__(self, shared_index: SharedPatientIndex | None = None) -> None:
+        """Initialize an empty registry.
+
+        Args:
+            shared_index: Cross-process membership index (pre-fork mode)
+        """
+        self.stats = PatientRegistryStats()
+        self._records: dict[tuple[str, str], PatientRecord] = {}
+        self._shared = shared_index
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        if self._shared is not None:
+            return len(self._shared)
+        return len(self._records)
+
+    def register(
+        self,
+        patient_id: str,
+        patient_id_oid: str,
+        demographics: dict[str, str] | None = None,
+    ) -> bool:
+        """Register a patient (or count a repeat registration).
+
+        Args:
+            patient_id: Patient identifier
+            patient_id_oid: Assigning authority OID
+            demographics: Demographics to store or update
+
+        Returns:
+            True for a new patient, False for a duplicate
+
+        Raises:
+            ValueError: If the shared index is full
+        """
+        key = (patient_id, patient_id_oid)
+        with self._lock:
+            record = self._records.get(key)
+            if self._shared is not None:
+                is_new = self._shared.add(patient_id, patient_id_oid)
+            else:
+                is_new = record is None
+
+            if record is None:
+                self._records[key] = PatientRecord(
+                    patient_id=patient_id,
+                    patient_id_oid=patient_id_oid,
+                    demographics=dict(demographics or {}),
+                    registered_at=datetime.now(timezone.utc).isoformat(),
+                )
+            else:
+                record.registrations += 1
+                if demographics:
+                    record.demographics.update(demographics)
+
+            if is_new:
+                self.stats.registered += 1
+            else:
+                self.stats.duplicates += 1
+        return is_new
+
+    def contains(self, patient_id: str, patient_id_oid: str) -> bool:
+        """Check whether a patient is registered.
+
+        Args:
+            patient_id: Patient identifier
+            patient_id_oid: Assigning authority OID
+
+        Returns:
+            True if the patient is registered
+        """
+        if self._shared is not None:
+            found = self._shared.contains(patient_id, patient_id_oid)
+        else:
+            found = (patient_id, patient_id_oid) in self._records
+        self.stats.lookups += 1
+        if not found:
+            self.stats.misses += 1
+        return found
+
+    def get(self, patient_id: str, patient_id_oid: str) -> PatientRecord | None:
+        """Return the record of a patient known to this process.
+
+        Args:
+            patient_id: Patient identifier
+            patient_id_oid: Assigning authority OID
+
+        Returns:
+            Patient record, or None if not registered in this process
+        """
+        return self._records.get((patient_id, patient_id_oid))
+
+    def records(self) -> list[PatientRecord]:
+        """Return the records of this process (a copy of the record list)."""
+        with self._lock:
+            return list(self._records.values())
+
+    def save_snapshot(self, path: Path | str) -> int:
+        """Write this process's records to a snapshot file.
+
+        The file is written next to the target and renamed into place, so
+        an interrupted save never leaves a truncated snapshot.
+
+        Args:
+            path: Snapshot file (gzip-compressed if it ends in ``.gz``)
+
+        Returns:
+            Number of records written
+        """
+        path = Path(path)
+        records = self.records()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        header = {
+            "format": SNAPSHOT_FORMAT,
+            "version": SNAPSHOT_VERSION,
+            "count": len(records),
+            "saved_at": datetime.now(timezone.utc).isoformat(),
+        }
+        with _open_snapshot(temp_path, "wt", compressed=path.suffix == ".gz") as f:
+            f.write(json.dumps(header) + "\n")
+            for record in records:
+                f.write(json.dumps(asdict(record), separators=(",", ":")) + "\n")
+        os.replace(temp_path, path)
+
+        self.stats.snapshots_saved += 1
+        logger.info(f"Saved patient registry snapshot ({len(records)} patients) to {path}")
+        return len(records)
+
+    def load_snapshot(self, path: Path | str) -> int:
+        """Merge the records of a snapshot file into the registry.
+
+        Patients already present keep their record; the higher registration
+        count wins.
+
+        Args:
+            path: Snapshot file written by ``save_snapshot``
+
+        Returns:
+            Number of records read
+
+        Raises:
+            FileNotFoundError: If the snapshot does not exist
+            ValueError: If the file is not a patient registry snapshot
+        """
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(f"Patient registry snapshot not found: {path}")
+
+        loaded = 0
+        with _open_snapshot(path, "rt", compressed=path.suffix == ".gz") as f:
+            header = _parse_snapshot_line(f.readline(), path, 1)
+            if header.get("format") != SNAPSHOT_FORMAT or header.get("version") != SNAPSHOT_VERSION:
+                raise ValueError(
+                    f"{path} is not a patient registry snapshot "
+                    f"(expected format '{SNAPSHOT_FORMAT}' version {SNAPSHOT_VERSION})."
+                )
+            with self._lock:
+                for line_number, line in enumerate(f, start=2):
+                    data = _parse_snapshot_line(line, path, line_number)
+                    try:
+                        record = PatientRecord(**data)
+                    except TypeError as e:
+                        raise ValueError(f"Invalid patient record at {path}:{line_number}: {e}") from None
+                    key = (record.patient_id, record.patient_id_oid)
+                    existing = self._records.get(key)
+                    if existing is None:
+                        self._records[key] = record
+                    else:
+                        existing.registrations = max(existing.registrations, record.registrations)
+                    if self._shared is not None:
+                        self._shared.add(*key)
+                    loaded += 1
+
+        logger.info(f"Restored {loaded} patients from {path}")
+        return loaded
+
+
+def _open_snapshot(path: Path, mode: str, compressed: bool) -> IO[str]:
+    if compressed:
+        return gzip.open(path, mode, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _parse_snapshot_line(line: str, path: Path, line_number: int) -> dict[str, Any]:
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Corrupt patient registry snapshot at {path}:{line_number}: {e}") from None
+
+
+def worker_snapshot_path(snapshot_path: Path | str, worker_id: int) -> Path:
+    """Return the per-worker variant of a snapshot path.
+
+    Args:
+        snapshot_path: Configured snapshot path (e.g. mocks/data/patients.jsonl.gz)
+        worker_id: 1-based worker ID
+
+    Returns:
+        Path like mocks/data/patients.worker-2.jsonl.gz
+    """
+    path = Path(snapshot_path)
+    stem, _, suffixes = path.name.partition(".")
+    return path.with_name(f"{stem}.worker-{worker_id}.{suffixes}" if suffixes else f"{stem}.worker-{worker_id}")
+
+
+def restore_snapshots(registry: PatientRegistry, snapshot_path: Path | str) -> int:
+    """Restore a registry from a snapshot and any per-worker snapshots.
+
+    Args:
+        registry: Registry to fill
+        snapshot_path: Configured snapshot path
+
+    Returns:
+        Number of records read (0 when no snapshot exists yet)
+    """
+    path = Path(snapshot_path)
+    stem, _, suffixes = path.name.partition(".")
+    pattern = f"{stem}.worker-*.{suffixes}" if suffixes else f"{stem}.worker-*"
+    candidates = [path, *sorted(path.parent.glob(pattern))]
+    return sum(registry.load_snapshot(candidate) for candidate in candidates if candidate.exists())
+
+
+class _SnapshotTimer:
+    """Daemon thread saving a registry snapshot at a fixed interval."""
+
+    def __init__(self, registry: PatientRegistry, path: Path, interval: float) -> None:
+        self._registry = registry
+        self._path = path
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="patient-registry-snapshot", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                self._registry.save_snapshot(self._path)
+            except OSError as e:
+                logger.error(f"Failed to save patient registry snapshot to {self._path}: {e}")
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+_registry: PatientRegistry | None = None
+_snapshot_path: Path | None = None
+_timer: _SnapshotTimer | None = None
+_registry_lock = threading.Lock()
+_atexit_registered = False
+
+
+def _activate(
+    registry: PatientRegistry, settings: PatientRegistryConfig, snapshot_path: Path | None
+) -> None:
+    global _registry, _snapshot_path, _timer
+    _registry = registry
+    _snapshot_path = snapshot_path
+    if snapshot_path is not None and settings.snapshot_interval_seconds > 0:
+        _timer = _SnapshotTimer(registry, snapshot_path, settings.snapshot_interval_seconds)
+
+
+def get_patient_registry(settings: PatientRegistryConfig) -> PatientRegistry:
+    """Return this process's patient registry, creating it on first use.
+
+    A new registry is restored from ``settings.snapshot_path`` when the file
+    exists and saves a snapshot there at exit. Persistence settings are read
+    once; later configuration changes keep the existing registry.
+
+    Args:
+        settings: Patient registry configuration
+
+    Returns:
+        Process-wide patient registry
+    """
+    global _atexit_registered
+
+    registry = _registry
+    if registry is not None:
+        return registry
+
+    with _registry_lock:
+        if _registry is not None:
+            return _registry
+        registry = PatientRegistry()
+        snapshot_path = Path(settings.snapshot_path) if settings.snapshot_path else None
+        if snapshot_path is not None:
+            restore_snapshots(registry, snapshot_path)
+        _activate(registry, settings, snapshot_path)
+        if not _atexit_registered:
+            atexit.register(close_patient_registry)
+            _atexit_registered = True
+        return registry
+
+
+def create_shared_patient_registry(settings: PatientRegistryConfig) -> PatientRegistry:
+    """Create a registry for pre-fork workers (call in the master, before forking).
+
+    Args:
+        settings: Patient registry configuration
+
+    Returns:
+        Registry with a shared index, restored from any existing snapshots
+    """
+    registry = PatientRegistry(SharedPatientIndex(settings.shared_capacity))
+    if settings.snapshot_path:
+        restore_snapshots(registry, settings.snapshot_path)
+    return registry
+
+
+def install_patient_registry(
+    registry: PatientRegistry, settings: PatientRegistryConfig, worker_id: int
+) -> None:
+    """Make a registry created before fork the registry of this worker.
+
+    The worker saves its snapshots to its own ``worker_snapshot_path``.
+
+    Args:
+        registry: Registry from ``create_shared_patient_registry``
+        settings: Patient registry configuration
+        worker_id: 1-based worker ID
+    """
+    with _registry_lock:
+        snapshot_path = (
+            worker_snapshot_path(settings.snapshot_path, worker_id)
+            if settings.snapshot_path
+            else None
+        )
+        _activate(registry, settings, snapshot_path)
+
+
+def close_patient_registry() -> None:
+    """Stop periodic snapshots, save a final snapshot and drop the registry."""
+    global _registry, _snapshot_path, _timer
+    with _registry_lock:
+        if _timer is not None:
+            _timer.stop()
+            _timer = None
+        if _registry is not None and _snapshot_path is not None:
+            try:
+                _registry.save_snapshot(_snapshot_path)
+            except OSError as e:
+                logger.error(f"Failed to save patient registry snapshot to {_snapshot_path}: {e}")
+        _registry = None
+        _snapshot_path = None
@@ -2,7 +2,6 @@
 
 import logging
 import random
-import time
 import uuid
 from datetime import datetime, timezone
 from logging.handlers import RotatingFileHandler
@@ -11,7 +10,13 @@ from pathlib import Path
 from flask import Blueprint, Response, request, g
 from lxml import etree
 
-from .config import MockServerConfig, ValidationMode
+from .capacity import admit_request
+from .config import DuplicatePatientPolicy, MockServerConfig, ValidationMode
+from .latency import simulate_latency
+from .metrics import end_phase, record_fault, start_phases
+from .patient_registry import get_patient_registry
+from .recording import record_or_replay
+from .response_templates import ResponseTemplate, render_soap_fault
 
 # HL7v3 and SOAP namespaces
 HL7_NS = "urn:hl7-org:v3"
@@ -212,28 +217,16 @@ def extract_patient_from_prpa(soap_xml: str) -> dict:
     return result
 
 
-def generate_acknowledgment(
-    request_message_id: str,
-    request_message_id_oid: str,
-    patient_id: str,
-    patient_id_oid: str,
-    status: str = "AA"
-) -> str:
-    """Generate MCCI_IN000002UV01 acknowledgment.
+# Fields of extract_patient_from_prpa that are message data rather than demographics
+_NON_DEMOGRAPHIC_FIELDS = ("request_message_id", "request_message_id_oid", "patient_id", "patient_id_oid")
+
+
+def _build_acknowledgment_template(with_detail: bool = False) -> ResponseTemplate:
+    """Build the MCCI_IN000002UV01 acknowledgment template (once, at import).
     
     Args:
-        request_message_id: Original request message ID (for correlation)
-        request_message_id_oid: Original request message ID OID
-        patient_id: Patient identifier to echo back
-        patient_id_oid: Patient identifier OID to echo back
-        status: Acknowledgment status code (AA=accept, AE=error, AR=reject)
-        
-    Returns:
-        Complete SOAP envelope containing MCCI_IN000002UV01 acknowledgment
+        with_detail: Include an error acknowledgementDetail (``{{detail}}`` slot)
     """
-    # Generate unique response message ID
-    response_message_id = str(uuid.uuid4())
-    
     # Create SOAP envelope
     soap_envelope = etree.Element(
         f"{{{SOAP_NS}}}Envelope",
@@ -252,25 +245,30 @@ def generate_acknowledgment(
     
     # Add response message ID
     id_elem = etree.SubElement(mcci_elem, f"{{{HL7_NS}}}id")
-    id_elem.set("root", request_message_id_oid)
-    id_elem.set("extension", response_message_id)
+    id_elem.set("root", "{{request_message_id_oid}}")
+    id_elem.set("extension", "{{response_message_id}}")
     
     # Add creation time
-    creation_time = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
     creation_time_elem = etree.SubElement(mcci_elem, f"{{{HL7_NS}}}creationTime")
-    creation_time_elem.set("value", creation_time)
+    creation_time_elem.set("value", "{{creation_time}}")
     
     # Add acknowledgment
     ack_elem = etree.SubElement(mcci_elem, f"{{{HL7_NS}}}acknowledgement")
     
     type_code_elem = etree.SubElement(ack_elem, f"{{{HL7_NS}}}typeCode")
-    type_code_elem.set("code", status)
+    type_code_elem.set("code", "{{status}}")
     
     # Add target message (correlation ID)
     target_msg_elem = etree.SubElement(ack_elem, f"{{{HL7_NS}}}targetMessage")
     target_id_elem = etree.SubElement(target_msg_elem, f"{{{HL7_NS}}}id")
-    target_id_elem.set("root", request_message_id_oid)
-    target_id_elem.set("extension", request_message_id)
+    target_id_elem.set("root", "{{request_message_id_oid}}")
+    target_id_elem.set("extension", "{{request_message_id}}")
+    
+    if with_detail:
+        detail_elem = etree.SubElement(ack_elem, f"{{{HL7_NS}}}acknowledgementDetail")
+        detail_elem.set("typeCode", "E")
+        detail_text_elem = etree.SubElement(detail_elem, f"{{{HL7_NS}}}text")
+        detail_text_elem.text = "{{detail}}"
     
     # Echo back patient identifiers
     control_act_elem = etree.SubElement(mcci_elem, f"{{{HL7_NS}}}controlActProcess")
@@ -280,18 +278,61 @@ def generate_acknowledgment(
     patient_elem = etree.SubElement(subject1_elem, f"{{{HL7_NS}}}patient")
     
     patient_id_elem = etree.SubElement(patient_elem, f"{{{HL7_NS}}}id")
-    patient_id_elem.set("root", patient_id_oid)
-    patient_id_elem.set("extension", patient_id)
-    
-    # Convert to XML string
-    xml_string = etree.tostring(
-        soap_envelope,
-        pretty_print=True,
-        xml_declaration=True,
-        encoding="UTF-8"
-    ).decode("utf-8")
+    patient_id_elem.set("root", "{{patient_id_oid}}")
+    patient_id_elem.set("extension", "{{patient_id}}")
     
-    return xml_string
+    return ResponseTemplate.from_element(soap_envelope)
+
+
+ACKNOWLEDGMENT_TEMPLATE = _build_acknowledgment_template()
+ACKNOWLEDGMENT_DETAIL_TEMPLATE = _build_acknowledgment_template(with_detail=True)
+
+
+def generate_acknowledgment(
+    request_message_id: str,
+    request_message_id_oid: str,
+    patient_id: str,
+    patient_id_oid: str,
+    status: str = "AA",
+    detail: str | None = None
+) -> str:
+    """Generate MCCI_IN000002UV01 acknowledgment.
+    
+    Fills the precompiled ``ACKNOWLEDGMENT_TEMPLATE`` (or
+    ``ACKNOWLEDGMENT_DETAIL_TEMPLATE`` when ``detail`` is given); no XML tree
+    is built per request.
+    
+    Args:
+        request_message_id: Original request message ID (for correlation)
+        request_message_id_oid: Original request message ID OID
+        patient_id: Patient identifier to echo back
+        patient_id_oid: Patient identifier OID to echo back
+        status: Acknowledgment status code (AA=accept, AE=error, AR=reject)
+        detail: Optional error text, returned as an acknowledgementDetail
+        
+    Returns:
+        Complete SOAP envelope containing MCCI_IN000002UV01 acknowledgment
+    """
+    if detail:
+        return ACKNOWLEDGMENT_DETAIL_TEMPLATE.render(
+            request_message_id_oid=request_message_id_oid,
+            response_message_id=str(uuid.uuid4()),
+            creation_time=datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S"),
+            status=status,
+            request_message_id=request_message_id,
+            detail=detail,
+            patient_id_oid=patient_id_oid,
+            patient_id=patient_id,
+        ).decode("utf-8")
+    return ACKNOWLEDGMENT_TEMPLATE.render(
+        request_message_id_oid=request_message_id_oid,
+        response_message_id=str(uuid.uuid4()),
+        creation_time=datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S"),
+        status=status,
+        request_message_id=request_message_id,
+        patient_id_oid=patient_id_oid,
+        patient_id=patient_id,
+    ).decode("utf-8")
 
 
 def generate_soap_fault(
@@ -309,34 +350,15 @@ def generate_soap_fault(
     Returns:
         SOAP fault XML string
     """
-    import html
-    
-    # Escape XML special characters
-    faultstring_escaped = html.escape(faultstring)
-    
-    detail_xml = ""
-    if detail:
-        detail_escaped = html.escape(detail)
-        detail_xml = f"""
-      <soap:Detail>
-        <error>{detail_escaped}</error>
-      </soap:Detail>"""
-    
-    fault_xml = f"""<?xml version="1.0" encoding="UTF-8"?>
-<soap:Envelope xmlns:soap="http://www.w3.org/2003/05/soap-envelope">
-  <soap:Body>
-    <soap:Fault>
-      <soap:Code>
-        <soap:Value>{faultcode}</soap:Value>
-      </soap:Code>
-      <soap:Reason>
-        <soap:Text xml:lang="en">{faultstring_escaped}</soap:Text>
-      </soap:Reason>{detail_xml}
-    </soap:Fault>
-  </soap:Body>
-</soap:Envelope>"""
-    
-    return fault_xml
+    return render_soap_fault(faultcode, faultstring, detail).decode("utf-8")
+
+
+def _request_patient_id(body: bytes, content_type: str) -> str:
+    """Return the patient ID of a PIX Add request ('' if it cannot be parsed)."""
+    try:
+        return extract_patient_from_prpa(body.decode("utf-8"))["patient_id"]
+    except (ValueError, KeyError, UnicodeDecodeError):
+        return ""
 
 
 @pix_add_bp.route("/pix/add", methods=["POST"])
@@ -370,13 +392,35 @@ def handle_pix_add() -> tuple[Response, int]:
         # Get request data
         request_data = request.data.decode("utf-8")
         
-        pix_logger.debug(f"Request size: {len(request_data)} bytes")
-        pix_logger.debug(f"Full SOAP request:\n{request_data}")
+        pix_logger.debug("Request size: %d bytes", len(request_data))
+        pix_logger.debug("Full SOAP request:\n%s", request_data)
         
-        # Apply response delay from behavior config
-        if behavior and behavior.response_delay_ms > 0:
-            pix_logger.debug(f"Simulating network delay: {behavior.response_delay_ms}ms")
-            time.sleep(behavior.response_delay_ms / 1000.0)
+        # Proxy to the upstream PIX Manager, or answer from recordings
+        recorded = record_or_replay(
+            "pix_add",
+            config.record_replay if config else None,
+            _request_patient_id,
+            pix_logger,
+            "text/xml; charset=utf-8",
+        )
+        if recorded is not None:
+            return recorded
+        
+        # Reject as overloaded, or queue behind other transactions, per the capacity model
+        retry_after = admit_request(behavior, "pix_add", pix_logger)
+        if retry_after is not None:
+            record_fault("overload")
+            fault_xml = generate_soap_fault(
+                "soap:Receiver",
+                "Service temporarily overloaded",
+                detail=f"PIX Add capacity exceeded. Retry after {retry_after} seconds.",
+            )
+            response = Response(fault_xml, mimetype="text/xml; charset=utf-8")
+            response.headers["Retry-After"] = str(retry_after)
+            return response, behavior.capacity.overload_status_code
+        
+        # Apply response latency from behavior config (deferred when the server supports it)
+        simulate_latency(behavior, pix_logger)
         
         # Simulate failure rate
         if behavior and behavior.failure_rate > 0:
@@ -386,14 +430,17 @@ def handle_pix_add() -> tuple[Response, int]:
                     or "Simulated PIX Add failure for testing"
                 )
                 pix_logger.info(f"Simulating failure (rate: {behavior.failure_rate})")
+                record_fault("simulated_failure")
                 fault_xml = generate_soap_fault("soap:Receiver", fault_message)
                 return Response(fault_xml, mimetype="text/xml; charset=utf-8"), 500
         
         # Extract patient data from PRPA message
+        start_phases()
         try:
             patient_data = extract_patient_from_prpa(request_data)
         except ValueError as e:
             pix_logger.warning(f"SOAP fault: {e}")
+            record_fault("soap_parse")
             fault_xml = generate_soap_fault(
                 "soap:Sender",
                 str(e),
@@ -402,18 +449,21 @@ def handle_pix_add() -> tuple[Response, int]:
             return Response(fault_xml, mimetype="text/xml; charset=utf-8"), 400
         except etree.XMLSyntaxError as e:
             pix_logger.warning(f"XML parsing error: {e}")
+            record_fault("soap_parse")
             fault_xml = generate_soap_fault(
                 "soap:Sender",
                 "Malformed XML",
                 detail=f"Failed to parse XML: {e}"
             )
             return Response(fault_xml, mimetype="text/xml; charset=utf-8"), 400
+        end_phase("parse")
         
         # Validation mode enforcement
         if behavior and behavior.validation_mode == ValidationMode.STRICT:
             # Strict mode: require patient demographics
             if "first_name" not in patient_data or "last_name" not in patient_data:
                 pix_logger.warning("Strict validation failed: missing patient name")
+                record_fault("strict_validation")
                 fault_xml = generate_soap_fault(
                     "soap:Sender",
                     "Strict validation failed: Missing required patient demographics (name). "
@@ -421,6 +471,37 @@ def handle_pix_add() -> tuple[Response, int]:
                 )
                 return Response(fault_xml, mimetype="text/xml; charset=utf-8"), 400
         
+        # Register the patient (duplicate registrations are answered with AE when rejected)
+        registry_settings = config.patient_registry if config else None
+        if registry_settings and registry_settings.enabled:
+            registry = get_patient_registry(registry_settings)
+            demographics = {
+                key: value for key, value in patient_data.items()
+                if key not in _NON_DEMOGRAPHIC_FIELDS
+            }
+            is_new = registry.register(
+                patient_data["patient_id"], patient_data["patient_id_oid"], demographics
+            )
+            if not is_new and registry_settings.duplicate_policy == DuplicatePatientPolicy.REJECT:
+                pix_logger.warning(
+                    f"Duplicate registration rejected - PatientID: {patient_data['patient_id']}, "
+                    f"OID: {patient_data['patient_id_oid']}"
+                )
+                record_fault("duplicate_patient")
+                ack_xml = generate_acknowledgment(
+                    patient_data["request_message_id"],
+                    patient_data["request_message_id_oid"],
+                    patient_data["patient_id"],
+                    patient_data["patient_id_oid"],
+                    status="AE",
+                    detail=(
+                        f"Patient {patient_data['patient_id']} "
+                        f"({patient_data['patient_id_oid']}) is already registered"
+                    ),
+                )
+                return Response(ack_xml, mimetype="text/xml; charset=utf-8"), 200
+        end_phase("validate")
+        
         # Log extracted patient data
         pix_logger.info(
             f"PIX Add request - MessageID: {patient_data['request_message_id']}, "
@@ -438,6 +519,7 @@ def handle_pix_add() -> tuple[Response, int]:
         if behavior and behavior.custom_patient_id:
             response_patient_id = behavior.custom_patient_id
             pix_logger.debug(f"Using custom patient ID: {response_patient_id}")
+        end_phase("log")
         
         # Generate acknowledgment
         ack_xml = generate_acknowledgment(
@@ -454,16 +536,18 @@ def handle_pix_add() -> tuple[Response, int]:
         )
         
         pix_logger.info(
-            f"PIX Add response - Status: AA, "
-            f"CorrelationID: {patient_data['request_message_id']}, "
-            f"ProcessingTime: {processing_time_ms}ms"
+            "PIX Add response - Status: AA, CorrelationID: %s, ProcessingTime: %sms",
+            patient_data['request_message_id'], processing_time_ms,
         )
-        pix_logger.debug(f"Full SOAP response:\n{ack_xml}")
+        pix_logger.debug("Full SOAP response:\n%s", ack_xml)
         
-        return Response(ack_xml, mimetype="text/xml; charset=utf-8"), 200
+        response = Response(ack_xml, mimetype="text/xml; charset=utf-8")
+        end_phase("respond")
+        return response, 200
         
     except Exception as e:
         pix_logger.error(f"Unexpected error processing PIX Add request: {e}", exc_info=True)
+        record_fault("internal")
         fault_xml = generate_soap_fault(
             "soap:Receiver",
             "Internal Server Error",
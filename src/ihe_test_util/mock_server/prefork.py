@@ -0,0 +1,871 @@
+"""Pre-fork multi-process serving mode for the mock IHE server.
+
+The Flask development server handles every request in one process, which makes
+the mock the bottleneck in load tests. This module serves the same Flask ``app``
+from N forked worker processes, each running a bounded pool of M handler
+threads with HTTP/1.1 keep-alive.
+
+Two socket strategies are supported:
+
+- shared listening socket (default): the master binds and listens once and every
+  worker accepts from the inherited descriptor
+- ``SO_REUSEPORT``: every worker binds its own listening socket and the kernel
+  load-balances new connections across them (Linux/BSD only)
+
+The master process only supervises: it respawns workers that die unexpectedly
+and forwards SIGTERM/SIGINT to all workers on shutdown. A worker that keeps
+dying right after it starts (bad certificate, failed bind or snapshot restore)
+is respawned with exponential backoff, and after repeated quick failures the
+master stops every worker and exits with an error. Request counters are kept
+in shared memory so ``/health`` on any worker reports totals for all workers.
+Each worker writes its own rotating log files (``<name>.worker-<N>.log``).
+"""
+
+import heapq
+import io
+import itertools
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Callable
+
+from werkzeug.exceptions import InternalServerError
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+from ..logging_audit.logger import stop_logging
+from .capacity import prepare_capacity_models
+from .config import MockServerConfig
+from .latency import DEFER_SUPPORTED_ENVIRON_KEY, RESPONSE_DELAY_ENVIRON_KEY
+from .metrics import MetricsRegistry, install_metrics_registry
+from .patient_registry import (
+    PatientRegistry,
+    close_patient_registry,
+    create_shared_patient_registry,
+    install_patient_registry,
+)
+from .recording import close_traffic_recorder
+from .submission_log import close_submission_log_writer
+
+
+logger = logging.getLogger("ihe_test_util.mock_server")
+
+# Default handler threads per worker when --threads is not given
+DEFAULT_THREADS_PER_WORKER = 8
+
+# Idle keep-alive connections are closed after this many seconds so they do not
+# pin a pool thread indefinitely
+KEEPALIVE_TIMEOUT_SECONDS = 5
+
+# Listen backlog for the shared socket
+LISTEN_BACKLOG = 1024
+
+# Seconds a worker waits for in-flight requests after SIGTERM
+WORKER_DRAIN_TIMEOUT_SECONDS = 10
+
+# Prefix of the loggers whose file handlers are reopened per worker
+MOCK_LOGGER_PREFIX = "ihe_test_util.mock_server"
+
+# A worker that exits within this many seconds of starting failed "quickly"
+QUICK_FAILURE_SECONDS = 10.0
+
+# Respawn delay after the first quick failure; doubles with each further one
+RESPAWN_BACKOFF_INITIAL_SECONDS = 0.5
+RESPAWN_BACKOFF_MAX_SECONDS = 30.0
+
+# Consecutive quick failures of one worker after which the master gives up
+MAX_QUICK_FAILURES = 5
+
+
+class RespawnPolicy:
+    """Decides when a dead worker is respawned.
+
+    A worker that ran for at least ``quick_failure_seconds`` is respawned at
+    once and its failure count resets. One that exits sooner is respawned
+    after an exponential backoff, and after ``max_quick_failures`` consecutive
+    quick failures it is treated as crash looping.
+    """
+
+    def __init__(
+        self,
+        quick_failure_seconds: float = QUICK_FAILURE_SECONDS,
+        initial_backoff: float = RESPAWN_BACKOFF_INITIAL_SECONDS,
+        max_backoff: float = RESPAWN_BACKOFF_MAX_SECONDS,
+        max_quick_failures: int = MAX_QUICK_FAILURES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.quick_failure_seconds = quick_failure_seconds
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.max_quick_failures = max_quick_failures
+        self._clock = clock
+        self._started: dict[int, float] = {}
+        self._quick_failures: dict[int, int] = {}
+
+    def started(self, worker_id: int) -> None:
+        """Record that a worker was (re)started."""
+        self._started[worker_id] = self._clock()
+
+    def exited(self, worker_id: int) -> float | None:
+        """Record an unexpected worker exit.
+
+        Returns:
+            Seconds to wait before respawning, or None if the worker is
+            crash looping and must not be respawned
+        """
+        now = self._clock()
+        uptime = now - self._started.pop(worker_id, now)
+        if uptime >= self.quick_failure_seconds:
+            self._quick_failures[worker_id] = 0
+            return 0.0
+        failures = self._quick_failures.get(worker_id, 0) + 1
+        self._quick_failures[worker_id] = failures
+        if failures >= self.max_quick_failures:
+            return None
+        return min(self.initial_backoff * 2 ** (failures - 1), self.max_backoff)
+
+
+class WorkerStats:
+    """Per-worker request counters shared across forked processes.
+
+    Counters live in anonymous shared memory created by the master before
+    forking. Each worker only writes its own slot, so no cross-process lock is
+    needed; a thread lock guards increments within a worker.
+
+    Attributes:
+        workers: Number of worker slots
+    """
+
+    def __init__(self, workers: int) -> None:
+        """Allocate shared counters.
+
+        Args:
+            workers: Number of worker slots (worker IDs 1..workers)
+        """
+        self.workers = workers
+        self._pids = multiprocessing.RawArray("q", workers)
+        self._requests = multiprocessing.RawArray("q", workers)
+        self._started = multiprocessing.RawArray("d", workers)
+        self._lock = threading.Lock()
+
+    def register(self, worker_id: int, pid: int) -> None:
+        """Record the PID and start time of a (re)spawned worker.
+
+        Args:
+            worker_id: 1-based worker ID
+            pid: Worker process ID
+        """
+        index = worker_id - 1
+        self._pids[index] = pid
+        self._started[index] = time.time()
+
+    def increment(self, worker_id: int) -> None:
+        """Count one request handled by a worker.
+
+        Args:
+            worker_id: 1-based worker ID
+        """
+        with self._lock:
+            self._requests[worker_id - 1] += 1
+
+    def total_requests(self) -> int:
+        """Return the number of requests handled by all workers."""
+        return sum(self._requests)
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        """Return per-worker status for the health endpoint.
+
+        Returns:
+            List of dicts with worker_id, pid, alive, request_count and
+            uptime_seconds
+        """
+        now = time.time()
+        workers = []
+        for index in range(self.workers):
+            pid = self._pids[index]
+            workers.append({
+                "worker_id": index + 1,
+                "pid": pid,
+                "alive": _pid_alive(pid),
+                "request_count": self._requests[index],
+                "uptime_seconds": int(now - self._started[index]) if pid else 0,
+            })
+        return workers
+
+
+def _pid_alive(pid: int) -> bool:
+    """Check whether a process exists without signalling it."""
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class KeepAliveRequestHandler(WSGIRequestHandler):
+    """Werkzeug request handler speaking HTTP/1.1 keep-alive with an idle timeout.
+
+    Werkzeug's own ``run_wsgi`` always answers ``Connection: close`` and drains
+    the socket after each response. Mock responses are small, so this handler
+    reads the request body up front, buffers the whole response, and sends it
+    with a Content-Length so the connection can serve the next request.
+    Chunked request bodies fall back to werkzeug's close-after-response path.
+
+    If the app asks for a simulated delay (see ``latency.apply_response_delay``)
+    the finished response is stored in ``deferred_response`` instead of being
+    sent, and the server hands it to its ``DelayedResponseScheduler``.
+    """
+
+    protocol_version = "HTTP/1.1"
+    timeout = KEEPALIVE_TIMEOUT_SECONDS
+    deferred_response: tuple[float, bytes, bool] | None = None
+
+    def setup(self) -> None:
+        """Disable Nagle's algorithm on the accepted connection."""
+        super().setup()
+        try:
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except (OSError, AttributeError):
+            pass
+
+    def run_wsgi(self) -> None:
+        """Run the WSGI app for one request and send a buffered response."""
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            super().run_wsgi()
+            self.close_connection = True
+            return
+
+        try:
+            content_length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            self.send_error(400, "Invalid Content-Length")
+            return
+
+        if self.headers.get("Expect", "").lower().strip(" \t") == "100-continue":
+            self.wfile.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+
+        body = self.rfile.read(content_length) if content_length > 0 else b""
+        if len(body) < content_length:
+            # Client went away mid-body
+            self.close_connection = True
+            return
+
+        self.environ = environ = self.make_environ()
+        environ["wsgi.input"] = io.BytesIO(body)
+        environ[DEFER_SUPPORTED_ENVIRON_KEY] = True
+
+        status, headers, chunks = self._call_application(environ)
+        self._send_buffered_response(status, headers, b"".join(chunks))
+
+    def _call_application(
+        self, environ: dict[str, Any]
+    ) -> tuple[str, list[tuple[str, str]], list[bytes]]:
+        """Call the app and collect status, headers and body chunks."""
+        response: dict[str, Any] = {}
+        chunks: list[bytes] = []
+
+        def start_response(status, headers, exc_info=None):  # type: ignore[no-untyped-def]
+            if exc_info and response:
+                raise exc_info[1].with_traceback(exc_info[2])
+            response["status"] = status
+            response["headers"] = headers
+            return chunks.append
+
+        try:
+            app_iter = self.server.app(environ, start_response)
+            try:
+                chunks.extend(app_iter)
+            finally:
+                if hasattr(app_iter, "close"):
+                    app_iter.close()
+        except Exception:
+            if self.server.passthrough_errors:
+                raise
+            logger.exception(f"Error on request {self.command} {self.path}")
+            response.clear()
+            chunks.clear()
+            chunks.extend(InternalServerError()(environ, start_response))
+
+        return response["status"], response["headers"], chunks
+
+    def _send_buffered_response(
+        self, status: str, headers: list[tuple[str, str]], body: bytes
+    ) -> None:
+        """Write status line, headers and body, keeping the connection if allowed."""
+        code_str, _, message = status.partition(" ")
+        code = int(code_str)
+
+        # parse_request() already set close_connection from the request
+        # version and Connection header
+        if getattr(self.server, "stopping", False):
+            self.close_connection = True
+
+        self.send_response(code, message)
+        for key, value in headers:
+            if key.lower() not in ("content-length", "connection", "transfer-encoding"):
+                self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Connection", "close" if self.close_connection else "keep-alive")
+        # Send headers and body in one write; separate small writes stall on
+        # Nagle's algorithm + delayed ACK with keep-alive clients
+        self._headers_buffer.append(b"\r\n")
+        if self.command != "HEAD" and body:
+            self._headers_buffer.append(body)
+
+        delay = self.environ.get(RESPONSE_DELAY_ENVIRON_KEY, 0.0)
+        if delay > 0:
+            # Park the connection: the scheduler sends the response later and
+            # this pool thread is released by ending the request loop
+            self.deferred_response = (delay, b"".join(self._headers_buffer), not self.close_connection)
+            self._headers_buffer = []
+            self.close_connection = True
+            return
+
+        self.flush_headers()
+
+
+class DelayedResponseScheduler:
+    """Sends parked responses when their simulated delay has elapsed.
+
+    A single thread waits on a heap of deadlines, so a delayed request costs a
+    heap entry and an open socket rather than a blocked handler thread.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an idle scheduler (the thread starts on first use)."""
+        self._heap: list[tuple[float, int, Callable[[], None]]] = []
+        self._condition = threading.Condition()
+        self._sequence = itertools.count()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        """Number of responses waiting for their deadline."""
+        with self._condition:
+            return len(self._heap)
+
+    def schedule(self, delay_seconds: float, callback: Callable[[], None]) -> None:
+        """Run ``callback`` on the scheduler thread after ``delay_seconds``.
+
+        Args:
+            delay_seconds: Delay from now
+            callback: Sends the response; must not raise
+
+        Raises:
+            RuntimeError: If the scheduler has been closed
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Delayed response scheduler is closed")
+            deadline = time.monotonic() + delay_seconds
+            heapq.heappush(self._heap, (deadline, next(self._sequence), callback))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="mock-delay-scheduler", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+
+    def close(self, timeout: float = WORKER_DRAIN_TIMEOUT_SECONDS) -> None:
+        """Send every pending response now and stop the thread.
+
+        Args:
+            timeout: Maximum seconds to wait for the thread to finish
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self) -> None:
+        """Scheduler loop."""
+        while True:
+            with self._condition:
+                while True:
+                    if self._closed and not self._heap:
+                        return
+                    if self._heap:
+                        wait = self._heap[0][0] - time.monotonic()
+                        if wait <= 0 or self._closed:
+                            _, _, callback = heapq.heappop(self._heap)
+                            break
+                        self._condition.wait(wait)
+                    else:
+                        self._condition.wait()
+            callback()
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """WSGI server that dispatches connections to a bounded thread pool.
+
+    Unlike werkzeug's ``ThreadedWSGIServer`` (one new thread per connection),
+    concurrency is capped at ``threads``; further connections wait in the pool
+    queue.
+    """
+
+    multithread = True
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        app: Any,
+        threads: int,
+        ssl_context: Any = None,
+        fd: int | None = None,
+    ) -> None:
+        """Initialize server.
+
+        Args:
+            host: Bind host (informational when ``fd`` is given)
+            port: Bind port (informational when ``fd`` is given)
+            app: WSGI application
+            threads: Maximum concurrent handler threads
+            ssl_context: Optional (cert, key) tuple or ``ssl.SSLContext``
+            fd: Already-listening socket descriptor to serve from
+        """
+        super().__init__(
+            host,
+            port,
+            app,
+            handler=KeepAliveRequestHandler,
+            ssl_context=ssl_context,
+            fd=fd,
+        )
+        self.threads = threads
+        self.stopping = False
+        self.delay_scheduler = DelayedResponseScheduler()
+        self._executor = ThreadPoolExecutor(
+            max_workers=threads, thread_name_prefix="mock-handler"
+        )
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        """Hand the accepted connection to the thread pool."""
+        self._executor.submit(self._process_request_in_pool, request, client_address)
+
+    def finish_request(self, request: Any, client_address: Any) -> KeepAliveRequestHandler:
+        """Serve the connection and return the handler (to inspect deferrals)."""
+        return self.RequestHandlerClass(request, client_address, self)
+
+    def _process_request_in_pool(self, request: Any, client_address: Any) -> None:
+        """Serve one connection (all keep-alive requests on it) in a pool thread."""
+        deferred = None
+        try:
+            handler = self.finish_request(request, client_address)
+            deferred = getattr(handler, "deferred_response", None)
+        except Exception:
+            self.handle_error(request, client_address)
+
+        if deferred is None:
+            self.shutdown_request(request)
+            return
+
+        delay, data, keep_alive = deferred
+        try:
+            self.delay_scheduler.schedule(
+                delay,
+                lambda: self._send_deferred(request, client_address, data, keep_alive),
+            )
+        except RuntimeError:
+            # Draining: do not hold the client any longer
+            self._send_deferred(request, client_address, data, keep_alive=False)
+
+    def _send_deferred(
+        self, request: Any, client_address: Any, data: bytes, keep_alive: bool
+    ) -> None:
+        """Send a parked response, then resume or close the connection."""
+        try:
+            request.sendall(data)
+        except OSError:
+            self.shutdown_request(request)
+            return
+
+        if keep_alive and not self.stopping:
+            try:
+                self._executor.submit(self._process_request_in_pool, request, client_address)
+                return
+            except RuntimeError:
+                pass
+        self.shutdown_request(request)
+
+    def drain(self, timeout: float = WORKER_DRAIN_TIMEOUT_SECONDS) -> None:
+        """Stop accepting work and wait for in-flight requests.
+
+        Args:
+            timeout: Maximum seconds to wait before abandoning handler threads
+        """
+        # Keep-alive connections close after their current response and
+        # parked responses are sent immediately
+        self.stopping = True
+        self.delay_scheduler.close(timeout)
+        waiter = threading.Thread(target=self._executor.shutdown, daemon=True)
+        waiter.start()
+        waiter.join(timeout)
+
+
+def create_listening_socket(
+    host: str,
+    port: int,
+    reuse_port: bool = False,
+    listen: bool = True,
+) -> socket.socket:
+    """Create a TCP socket bound to host:port.
+
+    Args:
+        host: Bind host
+        port: Bind port (0 picks a free port)
+        reuse_port: Set ``SO_REUSEPORT`` so several sockets can share the port
+        listen: Start listening (False only reserves the port)
+
+    Returns:
+        Bound (and optionally listening) inheritable socket
+
+    Raises:
+        ValueError: If ``reuse_port`` is requested but unsupported
+        OSError: If the address cannot be bound
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            if not hasattr(socket, "SO_REUSEPORT"):
+                raise ValueError(
+                    "SO_REUSEPORT is not supported on this platform. "
+                    "Omit --reuse-port to use a shared listening socket."
+                )
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((host, port))
+        if listen:
+            sock.listen(LISTEN_BACKLOG)
+        sock.set_inheritable(True)
+    except BaseException:
+        sock.close()
+        raise
+    return sock
+
+
+def worker_log_path(log_path: str | Path, worker_id: int) -> Path:
+    """Return the per-worker variant of a log file path.
+
+    Args:
+        log_path: Base log file path (e.g. mocks/logs/mock-server.log)
+        worker_id: 1-based worker ID
+
+    Returns:
+        Path like mocks/logs/mock-server.worker-2.log
+    """
+    path = Path(log_path)
+    return path.with_name(f"{path.stem}.worker-{worker_id}{path.suffix}")
+
+
+def _reopen_worker_log_files(worker_id: int) -> None:
+    """Point every mock-server file handler at a per-worker log file.
+
+    Rotating one file from several processes corrupts it, so each worker gets
+    its own copy of every file handler with identical level and formatter.
+    """
+    logger_names = [MOCK_LOGGER_PREFIX] + [
+        name
+        for name in logging.root.manager.loggerDict
+        if name.startswith(f"{MOCK_LOGGER_PREFIX}.")
+    ]
+    for name in logger_names:
+        target = logging.getLogger(name)
+        for handler in list(target.handlers):
+            if not isinstance(handler, logging.FileHandler):
+                continue
+            if isinstance(handler, RotatingFileHandler):
+                replacement: logging.FileHandler = RotatingFileHandler(
+                    worker_log_path(handler.baseFilename, worker_id),
+                    maxBytes=handler.maxBytes,
+                    backupCount=handler.backupCount,
+                )
+            else:
+                replacement = logging.FileHandler(
+                    worker_log_path(handler.baseFilename, worker_id)
+                )
+            replacement.setLevel(handler.level)
+            replacement.setFormatter(handler.formatter)
+            target.removeHandler(handler)
+            handler.close()
+            target.addHandler(replacement)
+
+
+def _serve_worker(
+    worker_id: int,
+    host: str,
+    port: int,
+    threads: int,
+    ssl_context: Any,
+    listen_fd: int | None,
+    reuse_port: bool,
+    stats: WorkerStats,
+    metrics_registry: MetricsRegistry,
+    config: MockServerConfig,
+    patient_registry: PatientRegistry | None,
+) -> None:
+    """Run one worker until SIGTERM/SIGINT (called in the forked child)."""
+    from . import app as app_module
+
+    _reopen_worker_log_files(worker_id)
+    stats.register(worker_id, os.getpid())
+    app_module.set_worker_context(worker_id, stats)
+    install_metrics_registry(metrics_registry, worker_id)
+    if patient_registry is not None:
+        install_patient_registry(patient_registry, config.patient_registry, worker_id)
+
+    own_socket = None
+    if listen_fd is None:
+        own_socket = create_listening_socket(host, port, reuse_port=reuse_port)
+        listen_fd = own_socket.fileno()
+
+    server = PooledWSGIServer(
+        host, port, app_module.app, threads, ssl_context=ssl_context, fd=listen_fd
+    )
+
+    def handle_stop(signum: int, frame: Any) -> None:
+        # shutdown() blocks until serve_forever returns, so it must not run on
+        # the thread that is serving
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, handle_stop)
+    signal.signal(signal.SIGINT, handle_stop)
+
+    logger.info(
+        f"Worker {worker_id} (PID {os.getpid()}) serving with {threads} threads"
+    )
+    try:
+        server.serve_forever()
+    finally:
+        server.drain()
+        server.server_close()
+        # Workers leave through os._exit, which skips atexit handlers
+        close_submission_log_writer()
+        close_patient_registry()
+        close_traffic_recorder()
+        if own_socket is not None:
+            own_socket.close()
+        logger.info(f"Worker {worker_id} (PID {os.getpid()}) stopped")
+
+
+def _fork_worker(worker_id: int, **worker_kwargs: Any) -> int:
+    """Fork a worker process and return its PID in the master."""
+    pid = os.fork()
+    if pid == 0:
+        # Drop the master's supervisor handlers before anything else runs
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        exit_code = 0
+        try:
+            _serve_worker(worker_id, **worker_kwargs)
+        except BaseException:
+            logger.exception(f"Worker {worker_id} crashed")
+            exit_code = 1
+        finally:
+            # Never return into the master's stack (atexit handlers, callers);
+            # os._exit skips atexit, so drain the background log writer here
+            stop_logging()
+            logging.shutdown()
+            os._exit(exit_code)
+    return pid
+
+
+def serve_single_process(
+    host: str,
+    port: int,
+    threads: int,
+    ssl_context: Any = None,
+) -> None:
+    """Serve the app from this process with a bounded thread pool.
+
+    Used for ``--workers 1`` and on platforms without ``os.fork``.
+
+    Args:
+        host: Bind host
+        port: Bind port
+        threads: Maximum concurrent handler threads
+        ssl_context: Optional (cert, key) tuple
+    """
+    from .app import app
+
+    server = PooledWSGIServer(host, port, app, threads, ssl_context=ssl_context)
+    logger.info(f"Serving on {host}:{server.port} with {threads} threads")
+    try:
+        server.serve_forever()
+    finally:
+        server.drain()
+        server.server_close()
+
+
+def run_prefork_server(
+    host: str,
+    port: int,
+    config: MockServerConfig,
+    workers: int,
+    threads: int | None = None,
+    ssl_context: Any = None,
+    reuse_port: bool = False,
+) -> None:
+    """Run the mock app from pre-forked worker processes.
+
+    The Flask app must already be initialized (``initialize_app``) so that
+    workers inherit registered endpoints and logging configuration.
+
+    Args:
+        host: Bind host
+        port: Bind port
+        config: Mock server configuration
+        workers: Number of worker processes (>= 1)
+        threads: Handler threads per worker (default 8)
+        ssl_context: Optional (cert, key) tuple for HTTPS
+        reuse_port: Give each worker its own SO_REUSEPORT socket instead of
+            sharing the master's listening socket
+
+    Raises:
+        ValueError: If workers/threads are invalid or multi-process mode is
+            unsupported on this platform
+        RuntimeError: If a worker keeps failing right after it starts
+    """
+    threads = threads or DEFAULT_THREADS_PER_WORKER
+    if workers < 1 or threads < 1:
+        raise ValueError(
+            f"Invalid worker settings (workers={workers}, threads={threads}). "
+            "Both must be at least 1."
+        )
+
+    if workers == 1:
+        serve_single_process(host, port, threads, ssl_context=ssl_context)
+        return
+
+    if not hasattr(os, "fork"):
+        raise ValueError(
+            "Multi-worker mode requires os.fork (Linux/macOS). "
+            "Use --workers 1 with --threads on this platform."
+        )
+
+    # Reserve the port in the master. With SO_REUSEPORT the master socket is
+    # bound but not listening, so the kernel never routes connections to it.
+    master_socket = create_listening_socket(
+        host, port, reuse_port=reuse_port, listen=not reuse_port
+    )
+    bound_port = master_socket.getsockname()[1]
+    config.http_port = bound_port
+
+    stats = WorkerStats(workers)
+    # Shared by all workers, so capacity limits apply to the server as a whole
+    prepare_capacity_models(config)
+    worker_kwargs = {
+        "host": host,
+        "port": bound_port,
+        "threads": threads,
+        "ssl_context": ssl_context,
+        "listen_fd": None if reuse_port else master_socket.fileno(),
+        "reuse_port": reuse_port,
+        "stats": stats,
+        "metrics_registry": MetricsRegistry(workers),
+        "config": config,
+        # Allocated (and restored) before forking so every worker shares the index
+        "patient_registry": (
+            create_shared_patient_registry(config.patient_registry)
+            if config.patient_registry.enabled
+            else None
+        ),
+    }
+
+    children: dict[int, int] = {}
+    # worker_id -> monotonic time its respawn is due
+    pending_respawns: dict[int, float] = {}
+    policy = RespawnPolicy()
+    stopping = False
+    crash_loop_error: str | None = None
+
+    def stop_workers() -> None:
+        nonlocal stopping
+        stopping = True
+        pending_respawns.clear()
+        for child_pid in list(children):
+            try:
+                os.kill(child_pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def handle_stop(signum: int, frame: Any) -> None:
+        if not stopping:
+            logger.info(f"Received shutdown signal ({signum}), stopping workers...")
+        stop_workers()
+
+    def spawn(worker_id: int) -> None:
+        children[_fork_worker(worker_id, **worker_kwargs)] = worker_id
+        policy.started(worker_id)
+
+    signal.signal(signal.SIGTERM, handle_stop)
+    signal.signal(signal.SIGINT, handle_stop)
+
+    logger.info(
+        f"Starting {workers} workers x {threads} threads on {host}:{bound_port} "
+        f"({'SO_REUSEPORT' if reuse_port else 'shared socket'})"
+    )
+    for worker_id in range(1, workers + 1):
+        spawn(worker_id)
+
+    try:
+        while children or pending_respawns:
+            now = time.monotonic()
+            for worker_id, due in list(pending_respawns.items()):
+                if due <= now:
+                    del pending_respawns[worker_id]
+                    spawn(worker_id)
+            if pending_respawns:
+                # Poll so a due respawn is not held up by a blocking wait
+                pid, status = os.waitpid(-1, os.WNOHANG) if children else (0, 0)
+                if pid == 0:
+                    next_due = min(pending_respawns.values())
+                    time.sleep(min(0.1, max(0.0, next_due - time.monotonic())))
+                    continue
+            else:
+                try:
+                    pid, status = os.wait()
+                except ChildProcessError:
+                    break
+            worker_id = children.pop(pid, None)
+            if worker_id is None:
+                continue
+            if stopping:
+                logger.info(f"Worker {worker_id} (PID {pid}) exited")
+                continue
+            delay = policy.exited(worker_id)
+            if delay is None:
+                crash_loop_error = (
+                    f"Worker {worker_id} exited {policy.max_quick_failures} times in a row "
+                    f"within {policy.quick_failure_seconds:g}s of starting (last status "
+                    f"{status}). Check the worker log for the startup error."
+                )
+                logger.error(f"{crash_loop_error} Stopping mock server.")
+                stop_workers()
+                continue
+            logger.warning(
+                f"Worker {worker_id} (PID {pid}) exited unexpectedly "
+                f"(status {status}), respawning"
+                + (f" in {delay:g}s" if delay else "")
+            )
+            pending_respawns[worker_id] = time.monotonic() + delay
+    finally:
+        master_socket.close()
+        logger.info("Mock server shutdown complete")
+
+    if crash_loop_error is not None:
+        raise RuntimeError(crash_loop_error)
@@ -0,0 +1,456 @@
+"""Record/replay of PIX Add and ITI-41 traffic.
+
+In ``record`` mode (see ``RecordReplayConfig``) the mock endpoints forward each
+request to the configured upstream endpoint and return the upstream response
+unchanged. Every exchange is appended to the recording archive::
+
+    mocks/recordings/
+        traffic-20250101T120000-4242-0001.rec.gz      # concatenated gzip members
+        traffic-20250101T120000-4242-0001.idx.jsonl   # one JSON line per exchange
+
+Each exchange is one gzip member holding the request body followed by the
+response body. Its index line records the transaction, patient ID, upstream
+status, content types and latency plus the member location, so replay loads
+only the indexes up front and decompresses a response when it is served.
+Every process (e.g. each pre-fork worker) writes its own segments.
+
+In ``replay`` mode requests are matched by transaction and patient ID;
+several recordings for one key are served round-robin. The recorded latency,
+scaled by ``latency_scale``, is applied as a response delay.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+import requests
+from flask import Response, request
+
+from .config import RecordReplayConfig, ReplayMissPolicy, TrafficMode
+from .latency import apply_response_delay
+from .metrics import record_fault, record_simulated_delay
+from .response_templates import render_soap_fault
+
+
+logger = logging.getLogger("ihe_test_util.mock_server")
+
+SEGMENT_SUFFIX = ".rec.gz"
+INDEX_SUFFIX = ".idx.jsonl"
+
+# Transactions that can be recorded, with their upstream URL setting
+TRANSACTIONS = {
+    "pix_add": "upstream_pix_add_url",
+    "iti41": "upstream_iti41_url",
+}
+
+# Request headers forwarded upstream
+FORWARDED_HEADERS = ("Content-Type", "SOAPAction", "Accept")
+
+# Segments rotate at this size
+SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+
+# gzip container for zlib (de)compressors
+_GZIP_WBITS = 31
+
+
+@dataclass
+class RecordedExchange:
+    """Index entry of one recorded request/response pair.
+
+    Attributes:
+        transaction: Transaction label ('pix_add' or 'iti41')
+        patient_id: Patient ID of the request ('' if none was found)
+        status: Upstream HTTP status code
+        request_content_type: Content-Type of the request
+        response_content_type: Content-Type of the response
+        latency_ms: Upstream response time in milliseconds
+        recorded_at: Recording time (ISO 8601, UTC)
+        segment: Segment file name
+        member_offset: Compressed offset of the exchange member in the segment
+        member_length: Compressed length of the exchange member
+        request_length: Request body length (the response follows it in the member)
+        response_length: Response body length
+    """
+
+    transaction: str
+    patient_id: str
+    status: int
+    request_content_type: str
+    response_content_type: str
+    latency_ms: float
+    recorded_at: str
+    segment: str
+    member_offset: int
+    member_length: int
+    request_length: int
+    response_length: int
+
+
+class TrafficRecorder:
+    """Appends recorded exchanges to compressed archive segments (thread-safe)."""
+
+    def __init__(self, archive_dir: Path | str, compression_level: int = 6) -> None:
+        """Initialize the recorder (nothing is created until the first exchange).
+
+        Args:
+            archive_dir: Recording archive directory
+            compression_level: zlib compression level
+        """
+        self.archive_dir = Path(archive_dir)
+        self.compression_level = compression_level
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._segment = None
+        self._index = None
+        self._segment_name = ""
+        self._segment_sequence = 0
+
+    def record(
+        self,
+        transaction: str,
+        patient_id: str,
+        request_body: bytes,
+        request_content_type: str,
+        response_body: bytes,
+        response_content_type: str,
+        status: int,
+        latency_ms: float,
+    ) -> RecordedExchange:
+        """Append one exchange to the archive.
+
+        Args:
+            transaction: Transaction label
+            patient_id: Patient ID of the request
+            request_body: Request body
+            request_content_type: Content-Type of the request
+            response_body: Response body
+            response_content_type: Content-Type of the response
+            status: HTTP status code of the response
+            latency_ms: Response time in milliseconds
+
+        Returns:
+            Index entry of the exchange
+        """
+        compressor = zlib.compressobj(self.compression_level, zlib.DEFLATED, _GZIP_WBITS)
+        member = compressor.compress(request_body) + compressor.compress(response_body)
+        member += compressor.flush()
+
+        with self._lock:
+            if self._segment is None:
+                self._open_segment()
+            entry = RecordedExchange(
+                transaction=transaction,
+                patient_id=patient_id,
+                status=status,
+                request_content_type=request_content_type,
+                response_content_type=response_content_type,
+                latency_ms=round(latency_ms, 3),
+                recorded_at=datetime.now(timezone.utc).isoformat(),
+                segment=self._segment_name,
+                member_offset=self._segment.tell(),
+                member_length=len(member),
+                request_length=len(request_body),
+                response_length=len(response_body),
+            )
+            self._segment.write(member)
+            self._segment.flush()
+            # The index line follows its data, so readers never see an entry
+            # whose member is incomplete
+            self._index.write(json.dumps(asdict(entry), separators=(",", ":")) + "\n")
+            self._index.flush()
+            self.recorded += 1
+
+            if self._segment.tell() >= SEGMENT_MAX_BYTES:
+                self._close_segment()
+        return entry
+
+    def close(self) -> None:
+        """Close the current segment and index (if open)."""
+        with self._lock:
+            self._close_segment()
+
+    def _open_segment(self) -> None:
+        """Start a new segment and its index (caller holds the lock)."""
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self._segment_sequence += 1
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        stem = f"traffic-{stamp}-{os.getpid()}-{self._segment_sequence:04d}"
+        self._segment_name = f"{stem}{SEGMENT_SUFFIX}"
+        self._segment = open(self.archive_dir / self._segment_name, "ab")
+        self._index = open(self.archive_dir / f"{stem}{INDEX_SUFFIX}", "a", encoding="utf-8")
+        logger.info(f"Opened traffic recording segment {self.archive_dir / self._segment_name}")
+
+    def _close_segment(self) -> None:
+        """Close the current segment and index (caller holds the lock)."""
+        if self._segment is not None:
+            self._segment.close()
+            self._index.close()
+            self._segment = None
+            self._index = None
+
+
+class TrafficArchive:
+    """Read-side access to a recording archive, keyed by transaction and patient ID."""
+
+    def __init__(self, archive_dir: Path | str) -> None:
+        """Load every index of the archive.
+
+        Args:
+            archive_dir: Recording archive directory
+        """
+        self.archive_dir = Path(archive_dir)
+        self._lock = threading.Lock()
+        self._by_key: dict[tuple[str, str], list[RecordedExchange]] = {}
+        self._next: dict[tuple[str, str], int] = {}
+        self._entries: list[RecordedExchange] = []
+        if self.archive_dir.is_dir():
+            for index_path in sorted(self.archive_dir.glob(f"*{INDEX_SUFFIX}")):
+                self._load_index(index_path)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def entries(self) -> list[RecordedExchange]:
+        """Return all recorded exchanges, oldest segment first."""
+        return list(self._entries)
+
+    def match(self, transaction: str, patient_id: str) -> RecordedExchange | None:
+        """Return the next recording for a transaction and patient ID.
+
+        Recordings of one key are returned round-robin in recording order.
+
+        Args:
+            transaction: Transaction label
+            patient_id: Patient ID of the request
+
+        Returns:
+            Recorded exchange, or None if none matches
+        """
+        key = (transaction, patient_id)
+        candidates = self._by_key.get(key)
+        if not candidates:
+            return None
+        with self._lock:
+            position = self._next.get(key, 0)
+            self._next[key] = (position + 1) % len(candidates)
+        return candidates[position]
+
+    def read_request(self, entry: RecordedExchange) -> bytes:
+        """Return the recorded request body of an exchange."""
+        return self._read_member(entry)[:entry.request_length]
+
+    def read_response(self, entry: RecordedExchange) -> bytes:
+        """Return the recorded response body of an exchange."""
+        member = self._read_member(entry)
+        return member[entry.request_length:entry.request_length + entry.response_length]
+
+    def _read_member(self, entry: RecordedExchange) -> bytes:
+        """Decompress the member holding an exchange."""
+        with open(self.archive_dir / entry.segment, "rb") as f:
+            f.seek(entry.member_offset)
+            data = f.read(entry.member_length)
+        return zlib.decompress(data, _GZIP_WBITS)
+
+    def _load_index(self, index_path: Path) -> None:
+        with open(index_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = RecordedExchange(**json.loads(line))
+                except (ValueError, TypeError) as e:
+                    logger.warning(f"Skipping corrupt recording index line in {index_path}: {e}")
+                    continue
+                self._entries.append(entry)
+                self._by_key.setdefault((entry.transaction, entry.patient_id), []).append(entry)
+
+
+_recorder: TrafficRecorder | None = None
+_recorder_pid: int | None = None
+_archives: dict[Path, TrafficArchive] = {}
+_lock = threading.Lock()
+_atexit_registered = False
+
+
+def get_traffic_recorder(archive_dir: Path | str) -> TrafficRecorder:
+    """Return this process's recorder for an archive directory.
+
+    A recorder inherited across ``fork`` is replaced, so every worker writes
+    its own segments.
+
+    Args:
+        archive_dir: Recording archive directory
+
+    Returns:
+        Recorder for this process
+    """
+    global _recorder, _recorder_pid, _atexit_registered
+
+    archive_dir = Path(archive_dir).absolute()
+    recorder = _recorder
+    if recorder is not None and _recorder_pid == os.getpid() and recorder.archive_dir == archive_dir:
+        return recorder
+
+    with _lock:
+        if _recorder is not None and _recorder_pid == os.getpid():
+            if _recorder.archive_dir == archive_dir:
+                return _recorder
+            _recorder.close()
+        _recorder = TrafficRecorder(archive_dir)
+        _recorder_pid = os.getpid()
+        if not _atexit_registered:
+            atexit.register(close_traffic_recorder)
+            _atexit_registered = True
+        return _recorder
+
+
+def close_traffic_recorder() -> None:
+    """Close this process's recorder (no-op if none is open)."""
+    global _recorder
+    with _lock:
+        if _recorder is not None and _recorder_pid == os.getpid():
+            _recorder.close()
+        _recorder = None
+
+
+def get_traffic_archive(archive_dir: Path | str) -> TrafficArchive:
+    """Return the replay archive for a directory (loaded once per process).
+
+    Args:
+        archive_dir: Recording archive directory
+
+    Returns:
+        Loaded archive
+    """
+    key = Path(archive_dir).absolute()
+    archive = _archives.get(key)
+    if archive is not None:
+        return archive
+    with _lock:
+        archive = _archives.get(key)
+        if archive is None:
+            archive = TrafficArchive(key)
+            _archives[key] = archive
+            logger.info(f"Loaded {len(archive)} recorded exchanges from {key}")
+        return archive
+
+
+def _fault_response(
+    status: int, faultcode: str, faultstring: str, detail: str, mimetype: str
+) -> tuple[Response, int]:
+    fault_xml = render_soap_fault(faultcode, faultstring, detail)
+    return Response(fault_xml, mimetype=mimetype), status
+
+
+def record_or_replay(
+    transaction: str,
+    settings: RecordReplayConfig | None,
+    extract_patient_id: Callable[[bytes, str], str],
+    endpoint_logger: logging.Logger,
+    fault_mimetype: str,
+) -> tuple[Response, int] | None:
+    """Answer the current request from upstream (record) or the archive (replay).
+
+    Args:
+        transaction: Transaction label ('pix_add' or 'iti41')
+        settings: Record/replay configuration (or None)
+        extract_patient_id: Returns the patient ID of a request body and
+            Content-Type ('' if none is found)
+        endpoint_logger: Logger of the calling endpoint
+        fault_mimetype: Content type of SOAP faults of the endpoint
+
+    Returns:
+        Response and status code, or None if the endpoint should handle the
+        request itself (mode off, or a replay miss with the ``mock`` policy)
+    """
+    if settings is None or settings.mode == TrafficMode.OFF:
+        return None
+
+    body = request.get_data()
+    content_type = request.content_type or ""
+    patient_id = extract_patient_id(body, content_type)
+
+    if settings.mode == TrafficMode.REPLAY:
+        archive = get_traffic_archive(settings.archive_dir)
+        entry = archive.match(transaction, patient_id)
+        if entry is None:
+            endpoint_logger.info(f"Replay miss: no {transaction} recording for patient '{patient_id}'")
+            if settings.on_miss == ReplayMissPolicy.MOCK:
+                return None
+            record_fault("replay_miss")
+            return _fault_response(
+                404,
+                "soap:Receiver",
+                "No recorded response",
+                f"No {transaction} recording for patient '{patient_id}'",
+                fault_mimetype,
+            )
+
+        delay_ms = entry.latency_ms * settings.latency_scale
+        apply_response_delay(delay_ms)
+        record_simulated_delay(delay_ms)
+        endpoint_logger.debug(
+            f"Replaying {transaction} recording for patient '{patient_id}' "
+            f"(status {entry.status}, {delay_ms:.1f}ms)"
+        )
+        return (
+            Response(archive.read_response(entry), content_type=entry.response_content_type),
+            entry.status,
+        )
+
+    url = getattr(settings, TRANSACTIONS[transaction])
+    if not url:
+        record_fault("upstream")
+        return _fault_response(
+            502,
+            "soap:Receiver",
+            "No upstream endpoint",
+            f"record_replay.{TRANSACTIONS[transaction]} is not configured",
+            fault_mimetype,
+        )
+
+    headers = {name: request.headers[name] for name in FORWARDED_HEADERS if name in request.headers}
+    start = time.perf_counter()
+    try:
+        upstream = requests.post(
+            url,
+            data=body,
+            headers=headers,
+            timeout=settings.upstream_timeout_seconds,
+            verify=settings.verify_tls,
+        )
+    except requests.RequestException as e:
+        endpoint_logger.error(f"Upstream {transaction} request to {url} failed: {e}")
+        record_fault("upstream")
+        return _fault_response(
+            502, "soap:Receiver", "Upstream request failed", str(e), fault_mimetype
+        )
+    latency_ms = (time.perf_counter() - start) * 1000.0
+
+    response_content_type = upstream.headers.get("Content-Type", fault_mimetype)
+    try:
+        get_traffic_recorder(settings.archive_dir).record(
+            transaction,
+            patient_id,
+            body,
+            content_type,
+            upstream.content,
+            response_content_type,
+            upstream.status_code,
+            latency_ms,
+        )
+    except OSError as e:
+        endpoint_logger.error(f"Failed to record {transaction} exchange: {e}")
+    endpoint_logger.debug(
+        f"Recorded {transaction} exchange for patient '{patient_id}' "
+        f"(status {upstream.status_code}, {latency_ms:.1f}ms)"
+    )
+    return Response(upstream.content, content_type=response_content_type), upstream.status_code
@@ -0,0 +1,147 @@
+"""Precompiled response templates for the mock endpoints.
+
+Mock responses have a fixed shape; only IDs, timestamps and messages vary.
+A ``ResponseTemplate`` is serialised once (from a string or an lxml tree with
+``{{name}}`` placeholders) and split into encoded literal fragments. Rendering
+escapes each value and joins fragments and values into the response bytes,
+so no tree is built or serialised per request.
+"""
+
+import re
+
+from lxml import etree
+
+
+_PLACEHOLDER = re.compile(r"\{\{(\w+)\}\}")
+_XML_SPECIAL = re.compile(r'[&<>"]')
+
+
+def escape_xml(value: str) -> str:
+    """Escape a value for XML text or a double-quoted attribute.
+
+    Args:
+        value: Raw value
+
+    Returns:
+        Escaped value (the input itself when nothing needs escaping)
+    """
+    if _XML_SPECIAL.search(value) is None:
+        return value
+    return (
+        value.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace('"', "&quot;")
+    )
+
+
+class ResponseTemplate:
+    """Pre-serialised response with named ``{{slot}}`` placeholders.
+
+    Attributes:
+        slot_names: Names of the placeholders in the template
+    """
+
+    __slots__ = ("_literals", "_slots", "slot_names")
+
+    def __init__(self, source: str) -> None:
+        """Compile a template.
+
+        Args:
+            source: Serialised response containing ``{{name}}`` placeholders
+        """
+        pieces = _PLACEHOLDER.split(source)
+        self._literals = [piece.encode("utf-8") for piece in pieces[0::2]]
+        self._slots = pieces[1::2]
+        self.slot_names = frozenset(self._slots)
+
+    @classmethod
+    def from_element(cls, element: etree._Element) -> "ResponseTemplate":
+        """Compile a template from an lxml tree with placeholder values.
+
+        Args:
+            element: Root element; attribute values and text may contain
+                ``{{name}}`` placeholders
+
+        Returns:
+            Compiled template (serialised with declaration and pretty print)
+        """
+        source = etree.tostring(
+            element, pretty_print=True, xml_declaration=True, encoding="UTF-8"
+        ).decode("utf-8")
+        return cls(source)
+
+    def render(self, **values: str) -> bytes:
+        """Fill every placeholder with its escaped value.
+
+        Args:
+            **values: Value for each slot name
+
+        Returns:
+            UTF-8 encoded response
+
+        Raises:
+            ValueError: If a slot has no value
+        """
+        literals = self._literals
+        out = [literals[0]]
+        try:
+            for index, name in enumerate(self._slots, start=1):
+                out.append(escape_xml(values[name]).encode("utf-8"))
+                out.append(literals[index])
+        except KeyError as e:
+            raise ValueError(
+                f"Missing value for response template slot {e}. "
+                f"Template slots: {', '.join(sorted(self.slot_names))}"
+            ) from None
+        return b"".join(out)
+
+
+SOAP_FAULT_TEMPLATE = ResponseTemplate("""<?xml version="1.0" encoding="UTF-8"?>
+<soap:Envelope xmlns:soap="http://www.w3.org/2003/05/soap-envelope">
+  <soap:Body>
+    <soap:Fault>
+      <soap:Code>
+        <soap:Value>{{faultcode}}</soap:Value>
+      </soap:Code>
+      <soap:Reason>
+        <soap:Text xml:lang="en">{{faultstring}}</soap:Text>
+      </soap:Reason>
+    </soap:Fault>
+  </soap:Body>
+</soap:Envelope>""")
+
+SOAP_FAULT_DETAIL_TEMPLATE = ResponseTemplate("""<?xml version="1.0" encoding="UTF-8"?>
+<soap:Envelope xmlns:soap="http://www.w3.org/2003/05/soap-envelope">
+  <soap:Body>
+    <soap:Fault>
+      <soap:Code>
+        <soap:Value>{{faultcode}}</soap:Value>
+      </soap:Code>
+      <soap:Reason>
+        <soap:Text xml:lang="en">{{faultstring}}</soap:Text>
+      </soap:Reason>
+      <soap:Detail>
+        <error>{{detail}}</error>
+      </soap:Detail>
+    </soap:Fault>
+  </soap:Body>
+</soap:Envelope>""")
+
+
+def render_soap_fault(faultcode: str, faultstring: str, detail: str | None = None) -> bytes:
+    """Render a SOAP 1.2 fault envelope.
+
+    Args:
+        faultcode: SOAP fault code (e.g., 'soap:Sender', 'soap:Receiver')
+        faultstring: Human-readable fault description
+        detail: Optional detailed error information
+
+    Returns:
+        UTF-8 encoded SOAP fault
+    """
+    if detail:
+        return SOAP_FAULT_DETAIL_TEMPLATE.render(
+            faultcode=faultcode, faultstring=faultstring, detail=detail
+        )
+    return SOAP_FAULT_TEMPLATE.render(faultcode=faultcode, faultstring=faultstring)
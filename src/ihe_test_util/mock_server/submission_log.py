@@ -0,0 +1,538 @@
+"""Asynchronous, batched ITI-41 submission logging.
+
+In ``archive`` mode (see ``SubmissionLogConfig``) the ITI-41 endpoint hands a
+``SubmissionRecord`` to a ``SubmissionLogWriter`` and returns immediately. A
+background thread drains a bounded queue in batches and appends each batch as
+one gzip member to the current archive segment::
+
+    mocks/logs/iti41-archive/
+        iti41-20250101T120000-4242-0001.log.gz      # concatenated gzip members
+        iti41-20250101T120000-4242-0001.idx.jsonl   # one JSON line per submission
+
+Segments are plain multi-member gzip files (``zcat`` shows every transaction
+in the same text format as the per-file logs). Each index line records the
+compressed offset and length of the batch member plus the record and document
+offsets inside it, so ``SubmissionArchive`` can fetch one submission by
+request, patient or document ID without decompressing the whole segment.
+Segments rotate once they reach ``segment_max_bytes``; every process (e.g.
+each pre-fork worker) writes its own segments, so no cross-process locking is
+needed.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, TextIO
+
+from .config import OverflowPolicy, SubmissionLogConfig
+from .document_store import DocumentStore
+
+
+logger = logging.getLogger("ihe_test_util.mock_server.iti41")
+
+SEGMENT_SUFFIX = ".log.gz"
+INDEX_SUFFIX = ".idx.jsonl"
+
+# gzip container for zlib (de)compressors
+_GZIP_WBITS = 31
+
+_STOP = object()
+
+
+@dataclass
+class SubmissionRecord:
+    """One ITI-41 transaction to be logged.
+
+    Attributes:
+        request_id: Mock server request ID
+        timestamp: Request timestamp (YYYYmmdd_HHMMSS, UTC)
+        submission_set_id: Submission set unique ID
+        document_unique_id: Document unique ID
+        patient_id: Patient ID from the submission metadata
+        metadata: Extracted XDSb metadata
+        soap_envelope: Raw SOAP envelope bytes
+        document: Raw document bytes
+        document_store: Store to save the document in (None: do not save)
+    """
+
+    request_id: str
+    timestamp: str
+    submission_set_id: str
+    document_unique_id: str
+    patient_id: str
+    metadata: dict[str, Any]
+    soap_envelope: bytes | memoryview
+    document: bytes | memoryview
+    document_store: DocumentStore | None = None
+
+
+@dataclass
+class SubmissionLogStats:
+    """Counters of a submission log writer.
+
+    Attributes:
+        enqueued: Submissions accepted into the queue
+        dropped: Submissions dropped because the queue was full
+        written: Submissions written to the archive
+        failed: Submissions lost to write errors
+        batches: Compressed batches written
+        segments: Segments opened
+        documents_saved: Documents written to disk
+    """
+
+    enqueued: int = 0
+    dropped: int = 0
+    written: int = 0
+    failed: int = 0
+    batches: int = 0
+    segments: int = 0
+    documents_saved: int = 0
+
+
+@dataclass
+class ArchiveIndexEntry:
+    """Location of one submission inside an archive segment.
+
+    Attributes:
+        request_id: Mock server request ID
+        timestamp: Request timestamp
+        patient_id: Patient ID
+        submission_set_id: Submission set unique ID
+        document_unique_id: Document unique ID
+        segment_path: Segment file
+        member_offset: Compressed offset of the batch member in the segment
+        member_length: Compressed length of the batch member
+        offset: Record offset inside the decompressed member
+        length: Record length
+        document_offset: Document offset inside the decompressed member
+        document_length: Document length
+    """
+
+    request_id: str
+    timestamp: str
+    patient_id: str
+    submission_set_id: str
+    document_unique_id: str
+    segment_path: Path
+    member_offset: int
+    member_length: int
+    offset: int
+    length: int
+    document_offset: int
+    document_length: int
+
+
+def transaction_log_parts(record: SubmissionRecord) -> list[bytes | memoryview]:
+    """Return the chunks of the text transaction log for a submission.
+
+    The last chunk is always the raw document, so its offset is the summed
+    length of the preceding chunks.
+
+    Args:
+        record: Submission to format
+
+    Returns:
+        Header, SOAP envelope, separator and document chunks
+    """
+    header_lines = [
+        "=== ITI-41 Transaction Log ===",
+        f"Timestamp: {record.timestamp}",
+        f"Request ID: {record.request_id}",
+        f"Submission Set ID: {record.submission_set_id}",
+        f"Document Unique ID: {record.document_unique_id}",
+        f"Patient ID: {record.patient_id}",
+        "",
+        "=== Metadata ===",
+    ]
+    header_lines.extend(f"{key}: {value}" for key, value in record.metadata.items())
+    header_lines.extend(["", "=== SOAP Envelope ===", ""])
+    return [
+        "\n".join(header_lines).encode("utf-8"),
+        record.soap_envelope,
+        b"\n\n=== CCD Document ===\n",
+        record.document,
+    ]
+
+
+class SubmissionLogWriter:
+    """Background writer appending submissions to compressed archive segments.
+
+    The writer thread starts on the first ``submit`` call, which makes a
+    writer created before ``os.fork`` safe to replace in the child (see
+    ``get_submission_log_writer``).
+    """
+
+    def __init__(self, settings: SubmissionLogConfig, archive_dir: Path | None = None) -> None:
+        """Initialize the writer.
+
+        Args:
+            settings: Submission log configuration
+            archive_dir: Override for ``settings.archive_dir``
+        """
+        self.settings = settings
+        self.archive_dir = Path(archive_dir or settings.archive_dir)
+        self.stats = SubmissionLogStats()
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=settings.queue_size)
+        self._start_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self._segment: BinaryIO | None = None
+        self._index: TextIO | None = None
+        self._segment_path: Path | None = None
+        self._segment_sequence = 0
+
+    def submit(self, record: SubmissionRecord) -> bool:
+        """Queue a submission for logging.
+
+        With the ``block`` policy the caller waits for queue space for up to
+        ``block_timeout_ms`` (0 waits indefinitely); with ``drop`` a full
+        queue drops the entry immediately.
+
+        Args:
+            record: Submission to log
+
+        Returns:
+            True if queued, False if dropped
+        """
+        if self._closed:
+            self._count_drop(record)
+            return False
+        self._ensure_started()
+
+        try:
+            if self.settings.overflow_policy == OverflowPolicy.DROP:
+                self._queue.put_nowait(record)
+            elif self.settings.block_timeout_ms == 0:
+                self._queue.put(record)
+            else:
+                self._queue.put(record, timeout=self.settings.block_timeout_ms / 1000.0)
+        except queue.Full:
+            self._count_drop(record)
+            return False
+
+        self.stats.enqueued += 1
+        return True
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until every queued submission has been written.
+
+        Args:
+            timeout: Maximum seconds to wait (None: no limit)
+
+        Returns:
+            True if the queue drained, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Write everything still queued and close the current segment.
+
+        Args:
+            timeout: Maximum seconds to wait for the writer thread
+        """
+        with self._start_lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def _count_drop(self, record: SubmissionRecord) -> None:
+        """Record a dropped submission (logged sparsely to avoid log floods)."""
+        self.stats.dropped += 1
+        if self.stats.dropped == 1 or self.stats.dropped % 1000 == 0:
+            logger.warning(
+                f"Submission log queue full ({self.settings.queue_size}): dropped "
+                f"transaction log for request {record.request_id} "
+                f"({self.stats.dropped} dropped so far)"
+            )
+
+    def _ensure_started(self) -> None:
+        """Start the writer thread on first use."""
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(
+                    target=self._run, name="iti41-submission-log", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        """Writer loop: collect a batch, write it, repeat until stopped."""
+        flush_interval = self.settings.flush_interval_ms / 1000.0
+        stopping = False
+        try:
+            while not stopping:
+                item = self._queue.get()
+                if item is _STOP:
+                    self._queue.task_done()
+                    break
+
+                batch = [item]
+                deadline = time.monotonic() + flush_interval
+                while len(batch) < self.settings.batch_size:
+                    remaining = deadline - time.monotonic()
+                    try:
+                        item = (
+                            self._queue.get(timeout=remaining)
+                            if remaining > 0
+                            else self._queue.get_nowait()
+                        )
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        self._queue.task_done()
+                        stopping = True
+                        break
+                    batch.append(item)
+
+                try:
+                    self._write_batch(batch)
+                except Exception as e:
+                    self.stats.failed += len(batch)
+                    logger.error(f"Failed to write submission log batch: {e}", exc_info=True)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+        finally:
+            self._close_segment()
+
+    def _write_batch(self, batch: list[SubmissionRecord]) -> None:
+        """Compress a batch into one gzip member and index its records."""
+        self._save_documents(batch)
+
+        if self._segment is None:
+            self._open_segment()
+        segment, index, segment_path = self._segment, self._index, self._segment_path
+        assert segment is not None and index is not None and segment_path is not None
+
+        compressor = zlib.compressobj(
+            self.settings.compression_level, zlib.DEFLATED, _GZIP_WBITS
+        )
+        chunks: list[bytes] = []
+        placements: list[tuple[int, int, int, int]] = []
+        offset = 0
+        for record in batch:
+            parts = transaction_log_parts(record)
+            record_start = offset
+            document_offset = offset + sum(len(part) for part in parts[:-1])
+            for part in parts:
+                chunks.append(compressor.compress(part))
+                offset += len(part)
+            chunks.append(compressor.compress(b"\n\n"))
+            offset += 2
+            placements.append(
+                (record_start, offset - record_start, document_offset, len(record.document))
+            )
+        chunks.append(compressor.flush())
+        member = b"".join(chunks)
+
+        member_offset = segment.tell()
+        segment.write(member)
+        segment.flush()
+
+        # Index lines are written after their data, so readers never see an
+        # entry whose member is incomplete
+        segment_name = segment_path.name
+        lines = []
+        for record, (start, length, doc_offset, doc_length) in zip(batch, placements, strict=True):
+            lines.append(json.dumps({
+                "request_id": record.request_id,
+                "timestamp": record.timestamp,
+                "patient_id": record.patient_id,
+                "submission_set_id": record.submission_set_id,
+                "document_unique_id": record.document_unique_id,
+                "segment": segment_name,
+                "member_offset": member_offset,
+                "member_length": len(member),
+                "offset": start,
+                "length": length,
+                "document_offset": doc_offset,
+                "document_length": doc_length,
+            }))
+        index.write("\n".join(lines) + "\n")
+        index.flush()
+
+        self.stats.written += len(batch)
+        self.stats.batches += 1
+        logger.debug(f"Wrote {len(batch)} submissions ({len(member)} bytes) to {segment_name}")
+
+        if segment.tell() >= self.settings.segment_max_bytes:
+            self._close_segment()
+
+    def _save_documents(self, batch: list[SubmissionRecord]) -> None:
+        """Store documents of submissions that requested saving."""
+        for record in batch:
+            if record.document_store is None:
+                continue
+            try:
+                record.document_store.put(
+                    record.document,
+                    record.document_unique_id,
+                    record.submission_set_id,
+                    record.patient_id,
+                )
+                self.stats.documents_saved += 1
+            except OSError as e:
+                logger.error(
+                    f"Failed to store document {record.document_unique_id} "
+                    f"in {record.document_store.root}: {e}"
+                )
+
+    def _open_segment(self) -> None:
+        """Start a new segment and its index."""
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self._segment_sequence += 1
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        stem = f"iti41-{stamp}-{os.getpid()}-{self._segment_sequence:04d}"
+        self._segment_path = self.archive_dir / f"{stem}{SEGMENT_SUFFIX}"
+        self._segment = open(self._segment_path, "ab")
+        self._index = open(self.archive_dir / f"{stem}{INDEX_SUFFIX}", "a", encoding="utf-8")
+        self.stats.segments += 1
+        logger.info(f"Opened submission archive segment {self._segment_path}")
+
+    def _close_segment(self) -> None:
+        """Close the current segment and index (if open)."""
+        if self._segment is not None:
+            self._segment.close()
+            if self._index is not None:
+                self._index.close()
+            self._segment = None
+            self._index = None
+
+
+class SubmissionArchive:
+    """Read-side access to archive segments by request, patient or document ID."""
+
+    def __init__(self, archive_dir: Path | str) -> None:
+        """Initialize the reader.
+
+        Args:
+            archive_dir: Directory containing segments and indexes
+        """
+        self.archive_dir = Path(archive_dir)
+
+    def entries(self) -> Iterator[ArchiveIndexEntry]:
+        """Iterate over all index entries, oldest segment first."""
+        if not self.archive_dir.is_dir():
+            return
+        for index_path in sorted(self.archive_dir.glob(f"*{INDEX_SUFFIX}")):
+            with open(index_path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    data = json.loads(line)
+                    segment = data.pop("segment")
+                    yield ArchiveIndexEntry(segment_path=self.archive_dir / segment, **data)
+
+    def find(
+        self,
+        request_id: str | None = None,
+        patient_id: str | None = None,
+        document_unique_id: str | None = None,
+    ) -> list[ArchiveIndexEntry]:
+        """Return index entries matching every given ID.
+
+        Args:
+            request_id: Mock server request ID
+            patient_id: Patient ID
+            document_unique_id: Document unique ID
+
+        Returns:
+            Matching entries in archive order
+        """
+        return [
+            entry
+            for entry in self.entries()
+            if (request_id is None or entry.request_id == request_id)
+            and (patient_id is None or entry.patient_id == patient_id)
+            and (document_unique_id is None or entry.document_unique_id == document_unique_id)
+        ]
+
+    def read_record(self, entry: ArchiveIndexEntry) -> bytes:
+        """Return the full transaction log text of a submission."""
+        member = self._read_member(entry)
+        return member[entry.offset:entry.offset + entry.length]
+
+    def read_document(self, entry: ArchiveIndexEntry) -> bytes:
+        """Return the submitted document of a submission."""
+        member = self._read_member(entry)
+        return member[entry.document_offset:entry.document_offset + entry.document_length]
+
+    def _read_member(self, entry: ArchiveIndexEntry) -> bytes:
+        """Decompress the batch member holding an entry."""
+        with open(entry.segment_path, "rb") as f:
+            f.seek(entry.member_offset)
+            data = f.read(entry.member_length)
+        return zlib.decompress(data, _GZIP_WBITS)
+
+
+_writer: SubmissionLogWriter | None = None
+_writer_pid: int | None = None
+_writer_lock = threading.Lock()
+_atexit_registered = False
+
+
+def get_submission_log_writer(settings: SubmissionLogConfig) -> SubmissionLogWriter:
+    """Return this process's writer, replacing it if the settings changed.
+
+    A writer inherited across ``fork`` is discarded without closing (its
+    thread belongs to the parent) and a fresh one is created.
+
+    Args:
+        settings: Current submission log configuration
+
+    Returns:
+        Writer for this process
+    """
+    global _writer, _writer_pid, _atexit_registered
+
+    writer = _writer
+    if writer is not None and _writer_pid == os.getpid() and writer.settings == settings:
+        return writer
+
+    with _writer_lock:
+        if _writer is not None and _writer_pid == os.getpid():
+            if _writer.settings == settings:
+                return _writer
+            # Hot-reloaded settings: finish the old writer's queue first
+            _writer.close()
+        _writer = SubmissionLogWriter(settings)
+        _writer_pid = os.getpid()
+        if not _atexit_registered:
+            atexit.register(close_submission_log_writer)
+            _atexit_registered = True
+        return _writer
+
+
+def close_submission_log_writer(timeout: float = 10.0) -> None:
+    """Flush and close this process's writer (no-op if none is running).
+
+    Args:
+        timeout: Maximum seconds to wait for queued submissions
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is not None and _writer_pid == os.getpid():
+            _writer.close(timeout)
+        _writer = None
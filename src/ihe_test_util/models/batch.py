@@ -14,6 +14,7 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 from ihe_test_util.models.responses import TransactionStatus
+from ihe_test_util.transport.load_balancer import EndpointStats
 
 
 @dataclass
@@ -40,6 +41,8 @@ class PatientWorkflowResult:
         iti41_time_ms: Time taken for ITI-41 transaction (milliseconds)
         total_time_ms: Total time for patient processing (milliseconds)
         error_message: Primary error message for troubleshooting
+        pix_add_reused: PIX Add skipped; identifiers taken from the submission registry
+        iti41_reused: ITI-41 skipped; already submitted according to the registry
         
     Example:
         >>> result = PatientWorkflowResult(
@@ -71,6 +74,8 @@ class PatientWorkflowResult:
     iti41_time_ms: int = 0
     total_time_ms: int = 0
     error_message: Optional[str] = None
+    pix_add_reused: bool = False
+    iti41_reused: bool = False
     
     @property
     def is_fully_successful(self) -> bool:
@@ -114,26 +119,66 @@ class PatientWorkflowResult:
         Returns:
             Dictionary representation of patient workflow result
         """
+        pix_add: Dict[str, Any] = {
+            "status": self.pix_add_status,
+            "message": self.pix_add_message,
+            "enterprise_id": self.pix_enterprise_id,
+            "enterprise_id_oid": self.pix_enterprise_id_oid,
+            "time_ms": self.pix_add_time_ms,
+        }
+        if self.pix_add_reused:
+            pix_add["reused"] = True
+        iti41: Dict[str, Any] = {
+            "status": self.iti41_status,
+            "message": self.iti41_message,
+            "document_id": self.document_id,
+            "time_ms": self.iti41_time_ms,
+        }
+        if self.iti41_reused:
+            iti41["reused"] = True
         return {
             "patient_id": self.patient_id,
             "csv_parsed": self.csv_parsed,
             "ccd_generated": self.ccd_generated,
-            "pix_add": {
-                "status": self.pix_add_status,
-                "message": self.pix_add_message,
-                "enterprise_id": self.pix_enterprise_id,
-                "enterprise_id_oid": self.pix_enterprise_id_oid,
-                "time_ms": self.pix_add_time_ms,
-            },
-            "iti41": {
-                "status": self.iti41_status,
-                "message": self.iti41_message,
-                "document_id": self.document_id,
-                "time_ms": self.iti41_time_ms,
-            },
+            "pix_add": pix_add,
+            "iti41": iti41,
             "total_time_ms": self.total_time_ms,
             "error_message": self.error_message,
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PatientWorkflowResult":
+        """Restore a patient result from its ``to_dict`` form.
+        
+        Args:
+            data: Dictionary produced by ``to_dict``
+            
+        Returns:
+            PatientWorkflowResult instance
+            
+        Raises:
+            KeyError: If patient_id is missing
+        """
+        pix_add = data.get("pix_add", {})
+        iti41 = data.get("iti41", {})
+        return cls(
+            patient_id=data["patient_id"],
+            csv_parsed=data.get("csv_parsed", False),
+            ccd_generated=data.get("ccd_generated", False),
+            pix_add_status=pix_add.get("status", "pending"),
+            pix_add_message=pix_add.get("message", ""),
+            pix_enterprise_id=pix_add.get("enterprise_id"),
+            pix_enterprise_id_oid=pix_add.get("enterprise_id_oid"),
+            iti41_status=iti41.get("status", "pending"),
+            iti41_message=iti41.get("message", ""),
+            document_id=iti41.get("document_id"),
+            pix_add_time_ms=pix_add.get("time_ms", 0),
+            iti41_time_ms=iti41.get("time_ms", 0),
+            total_time_ms=data.get("total_time_ms", 0),
+            error_message=data.get("error_message"),
+            pix_add_reused=pix_add.get("reused", False),
+            iti41_reused=iti41.get("reused", False),
+        )
 
 
 @dataclass
@@ -399,6 +444,11 @@ class BatchWorkflowResult:
         end_timestamp: When batch processing completed (UTC)
         patient_results: List of individual patient workflow results
         statistics: Batch processing statistics (Story 6.6)
+        endpoint_stats: Per-endpoint counters (only when load balancing)
+        shard: Shard this result covers ("2/4", "queue:<worker-id>"), None
+            for a whole-CSV or merged result
+        duplicates_dropped: Patient results dropped while merging because a
+            later shard also processed the patient
         
     Example:
         >>> result = BatchWorkflowResult(
@@ -417,6 +467,9 @@ class BatchWorkflowResult:
     end_timestamp: Optional[datetime] = None
     patient_results: List["PatientWorkflowResult"] = field(default_factory=list)
     statistics: Optional[BatchStatistics] = None
+    endpoint_stats: List[EndpointStats] = field(default_factory=list)
+    shard: Optional[str] = None
+    duplicates_dropped: int = 0
     
     @property
     def total_patients(self) -> int:
@@ -443,6 +496,16 @@ class BatchWorkflowResult:
         """Number of successful ITI-41 submissions."""
         return sum(1 for r in self.patient_results if r.iti41_status == "success")
     
+    @property
+    def pix_add_reused_count(self) -> int:
+        """Number of PIX Adds skipped because the registry had them."""
+        return sum(1 for r in self.patient_results if r.pix_add_reused)
+    
+    @property
+    def iti41_reused_count(self) -> int:
+        """Number of ITI-41 submissions skipped because the registry had them."""
+        return sum(1 for r in self.patient_results if r.iti41_reused)
+    
     @property
     def iti41_failed_count(self) -> int:
         """Number of failed ITI-41 submissions."""
@@ -602,6 +665,48 @@ class BatchWorkflowResult:
         if self.statistics:
             result["statistics"] = self.statistics.to_dict()
         
+        if self.endpoint_stats:
+            result["endpoints"] = [stats.to_dict() for stats in self.endpoint_stats]
+        
+        if self.shard:
+            result["shard"] = self.shard
+        
+        if self.duplicates_dropped:
+            result["duplicates_dropped"] = self.duplicates_dropped
+        
+        return result
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BatchWorkflowResult":
+        """Restore a batch result from its ``to_dict`` form.
+        
+        Statistics are recalculated from the patient results rather than
+        read back.
+        
+        Args:
+            data: Dictionary produced by ``to_dict``
+            
+        Returns:
+            BatchWorkflowResult instance
+            
+        Raises:
+            KeyError: If batch_id, csv_file or start_timestamp is missing
+            ValueError: If a timestamp is malformed
+        """
+        end_timestamp = data.get("end_timestamp")
+        result = cls(
+            batch_id=data["batch_id"],
+            csv_file=data["csv_file"],
+            ccd_template=data.get("ccd_template", ""),
+            start_timestamp=datetime.fromisoformat(data["start_timestamp"]),
+            end_timestamp=datetime.fromisoformat(end_timestamp) if end_timestamp else None,
+            patient_results=[PatientWorkflowResult.from_dict(p) for p in data.get("patients", [])],
+            endpoint_stats=[EndpointStats.from_dict(e) for e in data.get("endpoints", [])],
+            shard=data.get("shard"),
+            duplicates_dropped=data.get("duplicates_dropped", 0),
+        )
+        if "statistics" in data:
+            result.calculate_statistics()
         return result
     
     def calculate_statistics(self) -> BatchStatistics:
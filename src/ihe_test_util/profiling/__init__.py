@@ -0,0 +1 @@
+"""Profiling of batch runs (CPU, wall-clock and allocation profiles)."""
@@ -0,0 +1,234 @@
+"""Profilers for batch runs.
+
+``BatchProfiler`` wraps a block of work (normally a ``submit batch`` run)
+and collects one of three profiles:
+
+- ``cpu``: cProfile timed with the profiled thread's CPU clock, plus a
+  stack sampler that weights each sample by the CPU time the thread used
+  since the previous sample. Time spent waiting on the network is excluded.
+- ``wall``: cProfile timed with the wall clock, plus a stack sampler
+  weighted by elapsed time. Network waits show up under ``transport``.
+- ``alloc``: a tracemalloc snapshot of the memory still allocated at the
+  end of the run, with the tracemalloc peak.
+
+The sampler reads the profiled thread's stack from a background thread
+(``sys._current_frames``), so it works alongside cProfile, which owns the
+thread's profile hook. Its weighted stacks feed the subsystem breakdown
+and the collapsed-stack (flamegraph) output.
+"""
+
+import cProfile
+import logging
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from enum import Enum
+from types import FrameType
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default stack sampling interval (200 Hz)
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+# Frames kept per tracemalloc traceback
+TRACEMALLOC_FRAMES = 25
+
+# A stack frame as (filename, function name, first line of the function)
+Frame = tuple[str, str, int]
+
+
+class ProfileMode(str, Enum):
+    """Kind of profile to collect."""
+
+    CPU = "cpu"
+    WALL = "wall"
+    ALLOC = "alloc"
+
+
+@dataclass
+class ProfileResult:
+    """Data collected by a profiling run.
+
+    Attributes:
+        mode: Profile kind
+        elapsed_seconds: Wall time of the profiled block
+        stacks: Weighted stacks, outermost frame first. Weights are
+            microseconds for ``cpu``/``wall`` and bytes for ``alloc``.
+        stats: cProfile statistics (``cpu``/``wall`` only)
+        samples: Number of stack samples taken (``cpu``/``wall`` only)
+        peak_bytes: Peak traced memory (``alloc`` only)
+        current_bytes: Traced memory still allocated at the end (``alloc`` only)
+    """
+
+    mode: ProfileMode
+    elapsed_seconds: float
+    stacks: Counter = field(default_factory=Counter)
+    stats: Optional[pstats.Stats] = None
+    samples: int = 0
+    peak_bytes: int = 0
+    current_bytes: int = 0
+
+    @property
+    def unit(self) -> str:
+        """Unit of the stack weights ("us" or "bytes")."""
+        return "bytes" if self.mode == ProfileMode.ALLOC else "us"
+
+
+def _thread_cpu_clock(thread_id: int) -> Optional[Callable[[], float]]:
+    """Return a function reading a thread's CPU time, if the platform supports it."""
+    try:
+        clock_id = time.pthread_getcpuclockid(thread_id)
+    except (AttributeError, OSError):
+        return None
+    return lambda: time.clock_gettime(clock_id)
+
+
+class StackSampler:
+    """Samples the stack of one thread from a background thread.
+
+    Each sample is weighted by the time that passed since the previous
+    sample: CPU time of the sampled thread when ``cpu_time`` is set (and
+    the platform exposes per-thread CPU clocks), wall time otherwise.
+    """
+
+    def __init__(
+        self,
+        thread_id: int,
+        interval: float = DEFAULT_SAMPLE_INTERVAL,
+        cpu_time: bool = False,
+    ) -> None:
+        """Initialize the sampler.
+
+        Args:
+            thread_id: ``threading.get_ident()`` of the thread to sample
+            interval: Seconds between samples
+            cpu_time: Weight samples by the thread's CPU time
+        """
+        self._thread_id = thread_id
+        self._interval = interval
+        self._clock = (_thread_cpu_clock(thread_id) if cpu_time else None) or time.perf_counter
+        if cpu_time and self._clock is time.perf_counter:
+            logger.warning("Per-thread CPU clock not available; weighting samples by wall time")
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stacks: Counter = Counter()
+        self.samples = 0
+
+    def _stack(self, frame: Optional[FrameType]) -> tuple[Frame, ...]:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_filename, code.co_name, code.co_firstlineno))
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def _run(self) -> None:
+        last = self._clock()
+        while not self._stop.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)
+            now = self._clock()
+            weight = int((now - last) * 1_000_000)
+            last = now
+            if frame is None or weight <= 0:
+                continue
+            self.stacks[self._stack(frame)] += weight
+            self.samples += 1
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+class BatchProfiler:
+    """Context manager that profiles the current thread.
+
+    Example:
+        >>> with BatchProfiler(ProfileMode.CPU) as profiler:
+        ...     workflow.process_batch(csv_path)
+        >>> print(format_report(profiler.result))
+    """
+
+    def __init__(self, mode: ProfileMode, interval: float = DEFAULT_SAMPLE_INTERVAL) -> None:
+        """Initialize the profiler.
+
+        Args:
+            mode: Profile kind
+            interval: Stack sampling interval in seconds (``cpu``/``wall``)
+        """
+        self.mode = ProfileMode(mode)
+        self._interval = interval
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[StackSampler] = None
+        self._started = 0.0
+        self.result: Optional[ProfileResult] = None
+
+    def start(self) -> None:
+        """Start profiling the calling thread."""
+        logger.info(f"Starting {self.mode.value} profile")
+        self._started = time.perf_counter()
+        if self.mode == ProfileMode.ALLOC:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            return
+        cpu = self.mode == ProfileMode.CPU
+        self._sampler = StackSampler(threading.get_ident(), self._interval, cpu_time=cpu)
+        self._profile = cProfile.Profile(time.thread_time) if cpu else cProfile.Profile()
+        self._sampler.start()
+        self._profile.enable()
+
+    def stop(self) -> ProfileResult:
+        """Stop profiling and return the collected data."""
+        if self.mode == ProfileMode.ALLOC:
+            snapshot = tracemalloc.take_snapshot()
+            current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            elapsed = time.perf_counter() - self._started
+            snapshot = snapshot.filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+            ])
+            stacks: Counter = Counter()
+            for statistic in snapshot.statistics("traceback"):
+                stack = tuple((frame.filename, "", frame.lineno) for frame in statistic.traceback)
+                stacks[stack] += statistic.size
+            self.result = ProfileResult(
+                mode=self.mode,
+                elapsed_seconds=elapsed,
+                stacks=stacks,
+                peak_bytes=peak_bytes,
+                current_bytes=current_bytes,
+            )
+        else:
+            self._profile.disable()
+            elapsed = time.perf_counter() - self._started
+            self._sampler.stop()
+            self.result = ProfileResult(
+                mode=self.mode,
+                elapsed_seconds=elapsed,
+                stacks=self._sampler.stacks,
+                stats=pstats.Stats(self._profile),
+                samples=self._sampler.samples,
+            )
+        logger.info(f"Finished {self.mode.value} profile after {self.result.elapsed_seconds:.2f}s")
+        return self.result
+
+    def __enter__(self) -> "BatchProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
@@ -0,0 +1,220 @@
+"""Profile reports: subsystem breakdown, top functions and collapsed stacks.
+
+Each weighted stack is attributed to the innermost frame that belongs to a
+subsystem, so time spent in lxml, signxml or pandas counts toward the
+ihe_test_util module that called it. Frames in requests, urllib3 and the
+socket/ssl/http stdlib modules count as ``transport``, which makes network
+time visible even though the SOAP clients call requests directly.
+"""
+
+import logging
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .profiler import Frame, ProfileMode, ProfileResult
+
+logger = logging.getLogger(__name__)
+
+# Subsystems in report order
+SUBSYSTEMS = (
+    "csv_parser",
+    "template_engine",
+    "saml",
+    "ihe_transactions",
+    "transport",
+    "mock_server",
+)
+
+# Bucket for stacks without a subsystem frame (CLI, models, interpreter)
+OTHER = "other"
+
+_TRANSPORT_PACKAGES = {"requests", "urllib3"}
+_TRANSPORT_STDLIB = {"socket.py", "ssl.py", "selectors.py", "http/client.py"}
+_PATH_ROOTS = {"site-packages", "dist-packages"}
+
+
+def _parts(filename: str) -> tuple[str, ...]:
+    return Path(filename.replace("\\", "/")).parts
+
+
+def short_path(filename: str) -> str:
+    """Shorten a source path to its package-relative form.
+
+    Args:
+        filename: Absolute source file path
+
+    Returns:
+        e.g. "ihe_test_util/saml/signer.py", "lxml/etree.py" or "ssl.py"
+    """
+    parts = _parts(filename)
+    if "ihe_test_util" in parts:
+        index = len(parts) - 1 - parts[::-1].index("ihe_test_util")
+        return "/".join(parts[index:])
+    for index in range(len(parts) - 1, -1, -1):
+        if parts[index] in _PATH_ROOTS or parts[index].startswith("python3"):
+            return "/".join(parts[index + 1:])
+    return parts[-1] if parts else filename
+
+
+def subsystem_for(filename: str) -> Optional[str]:
+    """Return the subsystem a source file belongs to, or None."""
+    parts = _parts(filename)
+    if "ihe_test_util" in parts:
+        index = len(parts) - 1 - parts[::-1].index("ihe_test_util")
+        if index + 2 < len(parts) and parts[index + 1] in SUBSYSTEMS:
+            return parts[index + 1]
+        return None
+    path = short_path(filename)
+    if path.split("/")[0] in _TRANSPORT_PACKAGES or path in _TRANSPORT_STDLIB:
+        return "transport"
+    return None
+
+
+def stack_subsystem(stack: Iterable[Frame]) -> str:
+    """Return the subsystem of the innermost subsystem frame in a stack."""
+    for filename, _, _ in reversed(tuple(stack)):
+        subsystem = subsystem_for(filename)
+        if subsystem:
+            return subsystem
+    return OTHER
+
+
+def frame_label(frame: Frame) -> str:
+    """Return the display label of a frame.
+
+    Sampled frames show the function and its definition line; allocation
+    frames (no function name) show the allocating line.
+    """
+    filename, function, line = frame
+    if not function:
+        return f"{short_path(filename)}:{line}"
+    return f"{function} ({short_path(filename)}:{line})"
+
+
+def _format_amount(value: float, mode: ProfileMode) -> str:
+    if mode == ProfileMode.ALLOC:
+        for unit in ("B", "KiB", "MiB"):
+            if abs(value) < 1024:
+                return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+            value /= 1024
+        return f"{value:.1f} GiB"
+    return f"{value / 1_000_000:.3f}s"
+
+
+def subsystem_totals(result: ProfileResult) -> dict[str, int]:
+    """Total stack weight per subsystem, largest first."""
+    totals: Counter = Counter()
+    for stack, weight in result.stacks.items():
+        totals[stack_subsystem(stack)] += weight
+    return dict(totals.most_common())
+
+
+def top_functions_by_subsystem(result: ProfileResult, top: int = 10) -> dict[str, list[tuple[str, int]]]:
+    """Rank leaf frames (self time or allocation sites) within each subsystem.
+
+    Args:
+        result: Profiling result
+        top: Entries kept per subsystem
+
+    Returns:
+        Subsystem -> [(frame label, weight), ...] ordered by weight
+    """
+    by_subsystem: dict[str, Counter] = defaultdict(Counter)
+    for stack, weight in result.stacks.items():
+        if stack:
+            by_subsystem[stack_subsystem(stack)][frame_label(stack[-1])] += weight
+    return {subsystem: counter.most_common(top) for subsystem, counter in by_subsystem.items()}
+
+
+def format_report(result: ProfileResult, top: int = 10) -> str:
+    """Render a text report of a profiling run.
+
+    Args:
+        result: Profiling result
+        top: Functions listed per subsystem and in the cProfile table
+
+    Returns:
+        Report text
+    """
+    lines = [f"Profile mode:  {result.mode.value}", f"Elapsed:       {result.elapsed_seconds:.3f}s"]
+    if result.mode == ProfileMode.ALLOC:
+        lines.append(f"Peak traced:   {_format_amount(result.peak_bytes, result.mode)}")
+        lines.append(f"Still live:    {_format_amount(result.current_bytes, result.mode)} at end of run")
+        heading = "Live allocations by subsystem"
+    else:
+        weight_kind = "CPU time" if result.mode == ProfileMode.CPU else "wall time"
+        lines.append(f"Samples:       {result.samples} (weighted by {weight_kind})")
+        heading = f"Sampled {weight_kind} by subsystem"
+
+    totals = subsystem_totals(result)
+    grand_total = sum(totals.values()) or 1
+    lines += ["", heading, "-" * len(heading)]
+    for subsystem, weight in totals.items():
+        lines.append(
+            f"  {subsystem:<18} {weight / grand_total:7.1%}  {_format_amount(weight, result.mode):>12}"
+        )
+
+    heading = "Top allocation sites by subsystem" if result.mode == ProfileMode.ALLOC else (
+        "Top functions by subsystem (self time)"
+    )
+    lines += ["", heading, "-" * len(heading)]
+    ranked = top_functions_by_subsystem(result, top)
+    for subsystem in totals:
+        lines.append(f"[{subsystem}]")
+        for label, weight in ranked.get(subsystem, []):
+            lines.append(
+                f"  {_format_amount(weight, result.mode):>12}  {weight / grand_total:6.1%}  {label}"
+            )
+
+    if result.stats is not None:
+        heading = "Top functions by own time (cProfile)"
+        lines += ["", heading, "-" * len(heading)]
+        lines.append(f"  {'ncalls':>10} {'tottime':>9} {'cumtime':>9}  {'subsystem':<16} function")
+        entries = sorted(result.stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+        for (filename, line, function), (_, calls, tottime, cumtime, _) in entries[:top]:
+            location = function if filename == "~" else f"{function} ({short_path(filename)}:{line})"
+            subsystem = subsystem_for(filename) or "-"
+            lines.append(f"  {calls:>10} {tottime:9.3f} {cumtime:9.3f}  {subsystem:<16} {location}")
+
+    return "\n".join(lines) + "\n"
+
+
+def collapsed_stacks(result: ProfileResult) -> list[str]:
+    """Return stacks in collapsed format ("outer;...;inner weight").
+
+    The output is accepted by flamegraph.pl, speedscope and inferno.
+    """
+    lines = []
+    for stack, weight in result.stacks.most_common():
+        if weight > 0 and stack:
+            labels = ";".join(frame_label(frame).replace(";", ":") for frame in stack)
+            lines.append(f"{labels} {weight}")
+    return lines
+
+
+def write_profile(result: ProfileResult, output_dir: Path, name: str, top: int = 10) -> dict[str, Path]:
+    """Write the report, collapsed stacks and (for cpu/wall) the pstats file.
+
+    Args:
+        result: Profiling result
+        output_dir: Directory to write into (created if needed)
+        name: File name stem
+        top: Functions listed per subsystem in the report
+
+    Returns:
+        Mapping of "report", "collapsed" and optionally "pstats" to paths
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = {
+        "report": output_dir / f"{name}.txt",
+        "collapsed": output_dir / f"{name}.collapsed",
+    }
+    paths["report"].write_text(format_report(result, top), encoding="utf-8")
+    collapsed = collapsed_stacks(result)
+    paths["collapsed"].write_text("\n".join(collapsed) + ("\n" if collapsed else ""), encoding="utf-8")
+    if result.stats is not None:
+        paths["pstats"] = output_dir / f"{name}.prof"
+        result.stats.dump_stats(str(paths["pstats"]))
+    logger.info(f"Wrote {result.mode.value} profile to {output_dir}")
+    return paths
@@ -0,0 +1,322 @@
+"""Span tracing with Chrome trace-event export.
+
+Workflow steps (CSV row conversion, CCD generation, metadata build, SAML
+assertion, envelope and MTOM build, HTTP attempts, response parsing,
+checkpoint writes) are wrapped in ``span()`` calls. While tracing is
+disabled ``span()`` returns a shared no-op context manager, so the cost is
+one global lookup per call. Once ``enable_tracing()`` is called, every span
+is recorded as a Chrome trace "complete" event with the thread it ran on
+and its arguments.
+
+``trace_context()`` binds arguments such as ``patient_id`` and
+``transaction_id`` to every span opened inside it (per thread/task, via
+contextvars), so spans deep in the SOAP clients carry the IDs of the
+patient and transaction they belong to.
+
+A tracer keeps at most ``max_events`` events (default 250,000, roughly
+15,000 patients) so tracing a multi-hour batch cannot exhaust memory;
+later events are counted but dropped, and the count is written to the
+trace's ``otherData``.
+
+The exported JSON loads in chrome://tracing and https://ui.perfetto.dev;
+concurrent load workers show up as separate thread tracks, and retries as
+repeated ``http.post`` spans separated by ``http.backoff``.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from pathlib import Path
+from types import MappingProxyType, TracebackType
+from typing import Any, Iterator, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# Events kept per tracer before further events are dropped
+DEFAULT_MAX_EVENTS = 250_000
+
+# Arguments attached to every span opened in the current context (read-only
+# default so no context can mutate another's)
+_context: ContextVar[Mapping[str, Any]] = ContextVar(
+    "ihe_trace_context", default=MappingProxyType({})
+)
+
+_tracer: Optional["Tracer"] = None
+
+
+class _NullSpan:
+    """Span returned while tracing is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        pass
+
+    def set(self, **args: Any) -> None:
+        """Ignore arguments."""
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """A timed operation, recorded when the ``with`` block exits.
+
+    Attributes:
+        name: Span name, e.g. "http.post"
+        category: Trace category, e.g. "http"
+        args: Arguments shown with the span (IDs, status codes, sizes)
+    """
+
+    __slots__ = ("_tracer", "name", "category", "args", "_start_ns")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, args: dict[str, Any]) -> None:
+        self._tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self._start_ns = 0
+
+    def set(self, **args: Any) -> None:
+        """Attach arguments learned while the span is open (e.g. a status code)."""
+        self.args.update(args)
+
+    def __enter__(self) -> "Span":
+        self._start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self._tracer.record_span(self, self._start_ns, end_ns)
+
+
+class Tracer:
+    """Collects spans and exports them as Chrome trace events."""
+
+    def __init__(self, max_events: int = DEFAULT_MAX_EVENTS) -> None:
+        """Initialize an empty trace starting now.
+
+        Args:
+            max_events: Events to keep; later events are counted in
+                ``dropped_events`` instead of recorded
+        """
+        self._origin_ns = time.perf_counter_ns()
+        self._pid = os.getpid()
+        self.max_events = max_events
+        self.dropped_events = 0
+        self._events: list[dict[str, Any]] = []
+        self._thread_names: dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def _append(self, event: dict[str, Any]) -> None:
+        with self._lock:
+            if len(self._events) < self.max_events:
+                self._events.append(event)
+                return
+            self.dropped_events += 1
+            first_drop = self.dropped_events == 1
+        if first_drop:
+            logger.warning(
+                f"Trace reached {self.max_events} events; later events are dropped"
+            )
+
+    def _thread_id(self) -> int:
+        thread_id = threading.get_ident()
+        if thread_id not in self._thread_names:
+            with self._lock:
+                self._thread_names.setdefault(thread_id, threading.current_thread().name)
+        return thread_id
+
+    def _timestamp_us(self, ns: int) -> float:
+        return (ns - self._origin_ns) / 1000.0
+
+    def span(self, name: str, category: str, args: dict[str, Any]) -> Span:
+        """Create a span carrying the current trace context and ``args``."""
+        context = _context.get()
+        return Span(self, name, category, {**context, **args} if context else args)
+
+    def record_span(self, span: Span, start_ns: int, end_ns: int) -> None:
+        """Record a finished span."""
+        event = {
+            "name": span.name,
+            "cat": span.category,
+            "ph": "X",
+            "ts": self._timestamp_us(start_ns),
+            "dur": (end_ns - start_ns) / 1000.0,
+            "pid": self._pid,
+            "tid": self._thread_id(),
+            "args": span.args,
+        }
+        self._append(event)
+
+    def instant(self, name: str, category: str, args: dict[str, Any]) -> None:
+        """Record a point-in-time event carrying the current trace context."""
+        context = _context.get()
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "i",
+            "s": "t",
+            "ts": self._timestamp_us(time.perf_counter_ns()),
+            "pid": self._pid,
+            "tid": self._thread_id(),
+            "args": {**context, **args},
+        }
+        self._append(event)
+
+    @property
+    def events(self) -> list[dict[str, Any]]:
+        """Recorded events in completion order."""
+        with self._lock:
+            return list(self._events)
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """Return the trace in Chrome trace-event JSON object format."""
+        with self._lock:
+            events = sorted(self._events, key=lambda event: event["ts"])
+            thread_names = dict(self._thread_names)
+        metadata = [
+            {"name": "process_name", "ph": "M", "pid": self._pid, "args": {"name": "ihe-test-util"}}
+        ] + [
+            {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": thread_id, "args": {"name": name}}
+            for thread_id, name in thread_names.items()
+        ]
+        trace: dict[str, Any] = {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+        if self.dropped_events:
+            trace["otherData"] = {
+                "max_events": self.max_events,
+                "dropped_events": self.dropped_events,
+            }
+        return trace
+
+    def write(self, path: Path) -> Path:
+        """Write the trace as JSON.
+
+        Args:
+            path: Output file (parent directories are created)
+
+        Returns:
+            The written path
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_chrome_trace(), default=str), encoding="utf-8")
+        logger.info(
+            f"Wrote trace with {len(self._events)} events to {path}"
+            + (f" ({self.dropped_events} dropped)" if self.dropped_events else "")
+        )
+        return path
+
+
+def enable_tracing(max_events: int = DEFAULT_MAX_EVENTS) -> Tracer:
+    """Start recording spans into a new tracer and return it."""
+    global _tracer
+    _tracer = Tracer(max_events)
+    logger.debug("Span tracing enabled")
+    return _tracer
+
+
+def disable_tracing() -> Optional[Tracer]:
+    """Stop recording spans and return the tracer that was active."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        logger.debug("Span tracing disabled")
+    return tracer
+
+
+@contextmanager
+def tracing(max_events: int = DEFAULT_MAX_EVENTS) -> Iterator[Tracer]:
+    """Record spans for the duration of the block.
+
+    Example:
+        >>> with tracing() as tracer:
+        ...     workflow.process_batch(csv_path)
+        >>> tracer.write(Path("output/trace.json"))
+    """
+    tracer = enable_tracing(max_events)
+    try:
+        yield tracer
+    finally:
+        disable_tracing()
+
+
+def get_tracer() -> Optional[Tracer]:
+    """Return the active tracer, or None while tracing is disabled."""
+    return _tracer
+
+
+def span(name: str, category: str = "workflow", **args: Any) -> "Span | _NullSpan":
+    """Time a block as a span if tracing is enabled.
+
+    Args:
+        name: Span name, e.g. "ccd.generate"
+        category: Trace category
+        **args: Arguments shown with the span
+
+    Example:
+        >>> with span("http.post", "http", attempt=1) as http_span:
+        ...     response = session.post(url, data=body)
+        ...     http_span.set(status_code=response.status_code)
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return tracer.span(name, category, args)
+
+
+def instant(name: str, category: str = "workflow", **args: Any) -> None:
+    """Record a point-in-time event if tracing is enabled."""
+    tracer = _tracer
+    if tracer is not None:
+        tracer.instant(name, category, args)
+
+
+class trace_context:
+    """Attach ``args`` to every span opened inside the block.
+
+    A class rather than a generator so the disabled path stays a couple of
+    attribute lookups.
+
+    Example:
+        >>> with trace_context(patient_id="PAT001"):
+        ...     workflow.process_patient(patient, assertion)
+    """
+
+    __slots__ = ("_args", "_token")
+
+    def __init__(self, **args: Any) -> None:
+        self._args = args
+        self._token: Optional[Token[Mapping[str, Any]]] = None
+
+    def __enter__(self) -> None:
+        if _tracer is not None:
+            self._token = _context.set({**_context.get(), **self._args})
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        if self._token is not None:
+            _context.reset(self._token)
+            self._token = None
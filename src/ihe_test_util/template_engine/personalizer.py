@@ -90,13 +90,13 @@ class TemplatePersonalizer:
                 strategy is ERROR.
             MaxNestingDepthError: If nesting depth exceeded.
         """
-        logger.info(
-            f"Personalizing template ({len(template)} chars, {len(values)} values)"
+        logger.debug(
+            "Personalizing template (%d chars, %d values)", len(template), len(values)
         )
 
         # Extract placeholders from template
         placeholders = self._extract_placeholders(template)
-        logger.debug(f"Found {len(placeholders)} unique placeholders: {placeholders}")
+        logger.debug("Found %d unique placeholders", len(placeholders))
 
         # Check for missing values
         missing = placeholders - values.keys()
@@ -106,7 +106,7 @@ class TemplatePersonalizer:
         # Perform replacement with nesting support
         result = self._replace_placeholders(template, values, depth=0)
 
-        logger.info("Template personalization complete")
+        logger.debug("Template personalization complete")
         return result
 
     def _extract_placeholders(self, template: str) -> set[str]:
@@ -143,7 +143,7 @@ class TemplatePersonalizer:
             for field in missing:
                 if field in self.default_value_map:
                     values[field] = self.default_value_map[field]
-                    logger.debug(f"Using default value for {field}")
+                    logger.debug("Using default value for %s", field)
                 else:
                     values[field] = ""
                     logger.warning(
@@ -152,7 +152,7 @@ class TemplatePersonalizer:
         elif self.missing_value_strategy == MissingValueStrategy.USE_EMPTY:
             for field in missing:
                 values[field] = ""
-                logger.debug(f"Using empty string for missing field: {field}")
+                logger.debug("Using empty string for missing field: %s", field)
 
     def _replace_placeholders(
         self, text: str, values: dict[str, Any], depth: int
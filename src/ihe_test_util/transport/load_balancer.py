@@ -0,0 +1,324 @@
+"""Client-side load balancing over several endpoints of one transaction.
+
+A registry fronted by several nodes, or several sandbox instances tested at
+once, is configured as a list of endpoint URLs per transaction. The SOAP
+clients lease an endpoint from an ``EndpointPool`` for every HTTP attempt,
+so a retry can land on a different node.
+
+Selection strategies:
+    round_robin: Healthy endpoints in turn
+    weighted: Smooth weighted round robin, proportional to each weight
+    least_outstanding: Endpoint with the fewest requests in flight
+        (ties broken round robin)
+
+Health tracking: a connection error, timeout or 5xx response counts as a
+failure; any other response resets the count. After
+``failure_threshold`` consecutive failures an endpoint is ejected for
+``ejection_seconds``, then put back on probation (one more failure ejects
+it again). If every endpoint is ejected, the one due back first is used
+rather than failing the request outright.
+
+Each endpoint has its own ``requests.Session`` and therefore its own
+connection pool, so a slow node cannot exhaust connections to the others.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from enum import Enum
+from typing import Any, Callable, Iterator, Sequence
+
+import requests
+from requests.adapters import BaseAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_EJECTION_SECONDS = 30.0
+
+
+class BalancingStrategy(str, Enum):
+    """How the next endpoint is selected."""
+
+    ROUND_ROBIN = "round_robin"
+    WEIGHTED = "weighted"
+    LEAST_OUTSTANDING = "least_outstanding"
+
+
+@dataclass
+class EndpointStats:
+    """Snapshot of one endpoint's counters.
+
+    Attributes:
+        transaction: Transaction the endpoint serves ("pix_add", "iti41")
+        url: Endpoint URL
+        weight: Configured weight
+        requests: HTTP attempts sent
+        failures: Attempts counted as failures
+        ejections: Times the endpoint was ejected
+        total_time_ms: Summed attempt time (milliseconds)
+        healthy: False while the endpoint is ejected
+    """
+
+    transaction: str
+    url: str
+    weight: int
+    requests: int = 0
+    failures: int = 0
+    ejections: int = 0
+    total_time_ms: float = 0.0
+    healthy: bool = True
+
+    @property
+    def avg_time_ms(self) -> float:
+        """Mean attempt time in milliseconds."""
+        return self.total_time_ms / self.requests if self.requests else 0.0
+
+    @property
+    def failure_rate(self) -> float:
+        """Failures as a fraction of attempts."""
+        return self.failures / self.requests if self.requests else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        result = asdict(self)
+        result["total_time_ms"] = round(self.total_time_ms, 2)
+        result["avg_time_ms"] = round(self.avg_time_ms, 2)
+        return result
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "EndpointStats":
+        """Restore from ``to_dict`` output (derived fields are ignored)."""
+        return cls(**{name: data[name] for name in cls.__dataclass_fields__ if name in data})
+
+
+class Endpoint:
+    """One endpoint URL with its session, load and health state.
+
+    Mutable state is guarded by the owning pool's lock.
+    """
+
+    def __init__(self, url: str, weight: int, session: requests.Session) -> None:
+        self.url = url
+        self.weight = weight
+        self.session = session
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.current_weight = 0  # smooth weighted round robin state
+        self.requests = 0
+        self.failures = 0
+        self.ejections = 0
+        self.total_time_ms = 0.0
+
+    def is_available(self, now: float) -> bool:
+        """Whether the endpoint is not currently ejected."""
+        return self.ejected_until <= now
+
+
+class EndpointLease:
+    """An endpoint handed out for one HTTP attempt.
+
+    Attributes:
+        url: Endpoint URL to post to
+        session: The endpoint's session
+    """
+
+    __slots__ = ("endpoint", "url", "session", "failed")
+
+    def __init__(self, endpoint: Endpoint) -> None:
+        self.endpoint = endpoint
+        self.url = endpoint.url
+        self.session = endpoint.session
+        self.failed = False
+
+    def fail(self) -> None:
+        """Count this attempt as an endpoint failure (e.g. a 5xx response)."""
+        self.failed = True
+
+
+class EndpointPool:
+    """Selects endpoints for a transaction and tracks their health.
+
+    Thread-safe.
+
+    Example:
+        >>> pool = EndpointPool("pix_add", [("https://a/pix", 1), ("https://b/pix", 3)],
+        ...                     strategy=BalancingStrategy.WEIGHTED)
+        >>> with pool.lease() as lease:
+        ...     response = lease.session.post(lease.url, data=body)
+        ...     if response.status_code >= 500:
+        ...         lease.fail()
+    """
+
+    def __init__(
+        self,
+        transaction: str,
+        endpoints: Sequence[tuple[str, int]],
+        strategy: BalancingStrategy = BalancingStrategy.ROUND_ROBIN,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        ejection_seconds: float = DEFAULT_EJECTION_SECONDS,
+        session_factory: Callable[[], requests.Session] = requests.Session,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Create one session per endpoint.
+
+        Args:
+            transaction: Transaction name used in logs and statistics
+            endpoints: (url, weight) pairs; weights must be >= 1
+            strategy: Selection strategy
+            failure_threshold: Consecutive failures that eject an endpoint
+                (0 disables ejection)
+            ejection_seconds: How long an ejected endpoint is skipped
+            session_factory: Creates each endpoint's session
+            clock: Monotonic time source (seconds)
+
+        Raises:
+            ValueError: If no endpoints are given or a weight is < 1
+        """
+        if not endpoints:
+            raise ValueError(f"No endpoints configured for {transaction}")
+        for url, weight in endpoints:
+            if weight < 1:
+                raise ValueError(f"Endpoint weight must be >= 1, got {weight} for {url}")
+
+        self.transaction = transaction
+        self.strategy = BalancingStrategy(strategy)
+        self.failure_threshold = failure_threshold
+        self.ejection_seconds = ejection_seconds
+        self._clock = clock
+        self._endpoints = [Endpoint(url, weight, session_factory()) for url, weight in endpoints]
+        self._next = 0
+        self._lock = threading.Lock()
+
+        if len(self._endpoints) > 1:
+            logger.info(
+                f"{transaction} load balancing over {len(self._endpoints)} endpoints "
+                f"({self.strategy.value})"
+            )
+
+    @property
+    def urls(self) -> list[str]:
+        """Endpoint URLs in configuration order."""
+        return [endpoint.url for endpoint in self._endpoints]
+
+    @property
+    def sessions(self) -> list[requests.Session]:
+        """Endpoint sessions in configuration order."""
+        return [endpoint.session for endpoint in self._endpoints]
+
+    def __len__(self) -> int:
+        return len(self._endpoints)
+
+    def mount(self, prefix: str, adapter: BaseAdapter) -> None:
+        """Mount a transport adapter on every endpoint session."""
+        for endpoint in self._endpoints:
+            endpoint.session.mount(prefix, adapter)
+
+    def acquire(self) -> EndpointLease:
+        """Select an endpoint and count the attempt as outstanding."""
+        with self._lock:
+            endpoint = self._select(self._clock())
+            endpoint.outstanding += 1
+            return EndpointLease(endpoint)
+
+    def release(self, lease: EndpointLease, elapsed_ms: float) -> None:
+        """Record the outcome of a leased attempt."""
+        endpoint = lease.endpoint
+        with self._lock:
+            endpoint.outstanding -= 1
+            endpoint.requests += 1
+            endpoint.total_time_ms += elapsed_ms
+            if not lease.failed:
+                endpoint.consecutive_failures = 0
+                # A success (e.g. while every endpoint was ejected) readmits it
+                endpoint.ejected_until = 0.0
+                return
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            if (
+                self.failure_threshold
+                and endpoint.consecutive_failures >= self.failure_threshold
+                and endpoint.is_available(self._clock())
+                and len(self._endpoints) > 1
+            ):
+                endpoint.ejected_until = self._clock() + self.ejection_seconds
+                endpoint.ejections += 1
+                # One more failure after the ejection ends ejects it again
+                endpoint.consecutive_failures = self.failure_threshold - 1
+                logger.warning(
+                    f"Ejected {self.transaction} endpoint {endpoint.url} for "
+                    f"{self.ejection_seconds:g}s after {self.failure_threshold} consecutive failures"
+                )
+
+    @contextmanager
+    def lease(self) -> Iterator[EndpointLease]:
+        """Lease an endpoint for one attempt.
+
+        Connection errors and timeouts raised inside the block count as
+        failures; call ``lease.fail()`` for failed responses.
+        """
+        lease = self.acquire()
+        start = time.perf_counter()
+        try:
+            yield lease
+        except (requests.ConnectionError, requests.Timeout):
+            lease.failed = True
+            raise
+        finally:
+            self.release(lease, (time.perf_counter() - start) * 1000)
+
+    def stats(self) -> list[EndpointStats]:
+        """Snapshot of every endpoint's counters."""
+        now = self._clock()
+        with self._lock:
+            return [
+                EndpointStats(
+                    transaction=self.transaction,
+                    url=endpoint.url,
+                    weight=endpoint.weight,
+                    requests=endpoint.requests,
+                    failures=endpoint.failures,
+                    ejections=endpoint.ejections,
+                    total_time_ms=endpoint.total_time_ms,
+                    healthy=endpoint.is_available(now),
+                )
+                for endpoint in self._endpoints
+            ]
+
+    def close(self) -> None:
+        """Close every endpoint session."""
+        for endpoint in self._endpoints:
+            endpoint.session.close()
+
+    def _select(self, now: float) -> Endpoint:
+        """Pick the next endpoint (caller holds the lock)."""
+        endpoints = self._endpoints
+        if len(endpoints) == 1:
+            return endpoints[0]
+
+        candidates = [endpoint for endpoint in endpoints if endpoint.is_available(now)]
+        if not candidates:
+            # Every endpoint is ejected: try the one due back first
+            return min(endpoints, key=lambda endpoint: endpoint.ejected_until)
+
+        if self.strategy == BalancingStrategy.WEIGHTED:
+            # Smooth weighted round robin (as in nginx): spreads picks evenly
+            total = 0
+            best = candidates[0]
+            for endpoint in candidates:
+                endpoint.current_weight += endpoint.weight
+                total += endpoint.weight
+                if endpoint.current_weight > best.current_weight:
+                    best = endpoint
+            best.current_weight -= total
+            return best
+
+        start = self._next
+        self._next += 1
+        ordered = candidates[start % len(candidates):] + candidates[:start % len(candidates)]
+        if self.strategy == BalancingStrategy.LEAST_OUTSTANDING:
+            return min(ordered, key=lambda endpoint: endpoint.outstanding)
+        return ordered[0]
@@ -0,0 +1,200 @@
+"""In-process transport adapter that dispatches requests into a WSGI app.
+
+This module provides a ``requests`` transport adapter that hands prepared
+requests straight to a WSGI application (normally the Flask mock server
+``app``) instead of opening a socket. Mounted on the sessions used by
+PIXAddSOAPClient and ITI41SOAPClient, it lets integration tests,
+benchmarks and profiling runs exercise the full client and mock server
+code paths without the Werkzeug server, TCP or TLS in between.
+
+Request and response bodies are passed through as bytes, so MTOM
+multipart payloads, status codes and headers are preserved exactly.
+"""
+
+import io
+import logging
+from typing import Any, Callable, Optional
+from urllib.parse import unquote, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.models import PreparedRequest, Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from werkzeug.test import EnvironBuilder, run_wsgi_app
+
+logger = logging.getLogger(__name__)
+
+WSGIApplication = Callable[..., Any]
+
+# Base URL used when callers do not pick one
+DEFAULT_BASE_URL = "http://mock.local"
+
+
+class WSGIAdapter(BaseAdapter):
+    """Transport adapter that serves requests from a WSGI application.
+
+    Each request is converted to a WSGI environ, run through the
+    application in the calling thread and turned back into a
+    ``requests.Response``. Timeouts, TLS verification and client
+    certificates do not apply because no connection is made.
+
+    Attributes:
+        app: WSGI application that handles the requests.
+
+    Example:
+        >>> from ihe_test_util.mock_server.app import app
+        >>> session = requests.Session()
+        >>> session.mount("http://mock.local/", WSGIAdapter(app))
+        >>> session.get("http://mock.local/health").status_code
+        200
+    """
+
+    def __init__(self, app: WSGIApplication) -> None:
+        """Initialize the adapter.
+
+        Args:
+            app: WSGI application to dispatch requests into.
+        """
+        super().__init__()
+        self.app = app
+
+    def send(
+        self,
+        request: PreparedRequest,
+        stream: bool = False,
+        timeout: Any = None,
+        verify: Any = True,
+        cert: Any = None,
+        proxies: Optional[dict[str, str]] = None,
+    ) -> Response:
+        """Dispatch a prepared request into the WSGI application.
+
+        Args:
+            request: Prepared request from the session.
+            stream: Ignored; the response body is always buffered.
+            timeout: Ignored; no connection is made.
+            verify: Ignored; no TLS handshake takes place.
+            cert: Ignored; no TLS handshake takes place.
+            proxies: Ignored.
+
+        Returns:
+            Response carrying the application's status, headers and body.
+        """
+        # Session.prepare_request always sets both
+        assert request.url is not None and request.method is not None
+        url = urlsplit(request.url)
+
+        builder = EnvironBuilder(
+            path=unquote(url.path) or "/",
+            base_url=f"{url.scheme}://{url.netloc}",
+            query_string=url.query,
+            method=request.method,
+            headers=[
+                (name, value.decode("latin-1") if isinstance(value, bytes) else value)
+                for name, value in request.headers.items()
+            ],
+            data=_request_body(request),
+        )
+        try:
+            environ = builder.get_environ()
+        finally:
+            builder.close()
+
+        app_iter, status, headers = run_wsgi_app(self.app, environ, buffered=True)
+        content = b"".join(app_iter)
+
+        return self.build_response(request, status, headers.items(), content)
+
+    def build_response(
+        self,
+        request: PreparedRequest,
+        status: str,
+        headers: Any,
+        content: bytes,
+    ) -> Response:
+        """Build a ``requests.Response`` from WSGI response parts.
+
+        Repeated header names are joined with ", ", matching how
+        ``requests`` reports them for socket connections.
+
+        Args:
+            request: The request that produced the response.
+            status: WSGI status line, e.g. "200 OK".
+            headers: Iterable of (name, value) header pairs.
+            content: Response body.
+
+        Returns:
+            Fully read response.
+        """
+        status_code, _, reason = status.partition(" ")
+
+        response_headers: CaseInsensitiveDict[str] = CaseInsensitiveDict()
+        for name, value in headers:
+            if name in response_headers:
+                response_headers[name] = f"{response_headers[name]}, {value}"
+            else:
+                response_headers[name] = value
+
+        response = Response()
+        response.status_code = int(status_code)
+        response.reason = reason
+        response.headers = response_headers
+        response.encoding = get_encoding_from_headers(response_headers)
+        response.raw = io.BytesIO(content)
+        response._content = content
+        response.url = request.url or ""
+        response.request = request
+        # requests annotates this as HTTPAdapter, but it holds whichever
+        # adapter sent the request
+        response.connection = self  # type: ignore[assignment]
+        return response
+
+    def close(self) -> None:
+        """Release resources (nothing to release for in-process dispatch)."""
+
+
+def _request_body(request: PreparedRequest) -> Optional[bytes]:
+    """Return the request body as bytes, or None when it is empty."""
+    body = request.body
+    if body is None:
+        return None
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    if isinstance(body, bytes):
+        return body or None
+    # File-like or iterable (streamed upload) body
+    source: Any = body
+    chunks = [source.read()] if hasattr(source, "read") else list(source)
+    data = b"".join(
+        chunk.encode("utf-8") if isinstance(chunk, str) else chunk for chunk in chunks
+    )
+    return data or None
+
+
+def mount_wsgi_app(
+    session: requests.Session,
+    app: WSGIApplication,
+    base_url: str = DEFAULT_BASE_URL,
+) -> WSGIAdapter:
+    """Route every request for ``base_url`` on ``session`` into ``app``.
+
+    The adapter is mounted on the URL prefix, so it takes precedence over
+    the session's ``http://``/``https://`` adapters for that host only.
+
+    Args:
+        session: Session to mount the adapter on.
+        app: WSGI application to dispatch requests into.
+        base_url: Scheme and host prefix to intercept.
+
+    Returns:
+        The mounted adapter.
+
+    Example:
+        >>> client = PIXAddSOAPClient(config)  # pix_add_url="http://mock.local/pix/add"
+        >>> mount_wsgi_app(client.session, app)
+    """
+    adapter = WSGIAdapter(app)
+    session.mount(base_url.rstrip("/") + "/", adapter)
+    logger.debug(f"Mounted in-process WSGI transport for {base_url}")
+    return adapter
@@ -11,7 +11,7 @@ import json
 
 import pytest
 
-from ihe_test_util.config.schema import Config
+from ihe_test_util.config.schema import Config, EndpointsConfig
 from ihe_test_util.ihe_transactions.workflows import (
     IntegratedWorkflow,
     generate_integrated_workflow_summary,
@@ -40,9 +40,10 @@ def integration_config():
     config = Mock(spec=Config)
     
     # Endpoints
-    config.endpoints = Mock()
-    config.endpoints.pix_add_url = "http://localhost:8080/pix/add"
-    config.endpoints.iti41_url = "http://localhost:8080/xdsrepository"
+    config.endpoints = EndpointsConfig(
+        pix_add_url="http://localhost:8080/pix/add",
+        iti41_url="http://localhost:8080/xdsrepository",
+    )
     
     # SAML configuration  
     config.saml = Mock()
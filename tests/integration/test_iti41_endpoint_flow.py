@@ -12,6 +12,7 @@ from lxml import etree
 
 from src.ihe_test_util.mock_server.app import app, initialize_app
 from src.ihe_test_util.mock_server.config import MockServerConfig
+from src.ihe_test_util.mock_server.document_store import DocumentStore
 
 
 @pytest.fixture
@@ -396,12 +397,12 @@ class TestITI41EndpointFlow:
         # Assert
         assert response.status_code == 200
         
-        # Check document was saved
-        doc_files = list(mock_doc_dir.glob("*.xml"))
-        assert len(doc_files) > 0
+        # Check document was saved in the content-addressed store
+        entries = DocumentStore(mock_doc_dir).find()
+        assert len(entries) > 0
         
         # Verify document content
-        doc_content = doc_files[0].read_text()
+        doc_content = DocumentStore(mock_doc_dir).get(entries[0].document_unique_id).decode("utf-8")
         assert "ClinicalDocument" in doc_content
         assert "TEST_CCD_001" in doc_content
 
@@ -7,7 +7,7 @@ import pandas as pd
 import pytest
 
 from ihe_test_util.csv_parser.parser import parse_csv
-from ihe_test_util.logging_audit import configure_logging, log_audit_event
+from ihe_test_util.logging_audit import configure_logging, flush_logging, log_audit_event
 
 
 class TestLoggingWorkflow:
@@ -44,6 +44,7 @@ Jane,Smith,1990-05-20,F,1.2.3.4.5"""
 
         # Assert
         assert log_file.exists()
+        flush_logging()
         content = log_file.read_text()
 
         # Check CSV processing logs
@@ -66,6 +67,7 @@ Jane,Smith,1990-05-20,F,1.2.3.4.5"""
         log_audit_event("TEST_EVENT", {"status": "success"})
 
         # Assert - event in file (console tested in unit tests)
+        flush_logging()
         assert "AUDIT [TEST_EVENT]" in log_file.read_text()
 
     def test_debug_only_in_file_not_console(self, tmp_path, caplog):
@@ -83,6 +85,7 @@ John,Doe,1980-01-15,M,1.2.3.4.5"""
         df, validation_result = parse_csv(csv_file, validate=True)
 
         # Assert
+        flush_logging()
         file_content = log_file.read_text()
         
         # DEBUG messages should be in file
@@ -108,6 +111,7 @@ Jane,Smith,1990-05-20,F,1.2.3.4.5,987-65-4321"""
         df, validation_result = parse_csv(csv_file, validate=True)
 
         # Assert
+        flush_logging()
         content = log_file.read_text()
         
         # SSNs should be redacted
@@ -145,6 +149,7 @@ Jane,Smith,1990-05-20,F,1.2.3.4.5"""
         )
 
         # Assert - verify audit trail structure
+        flush_logging()
         content = log_file.read_text()
         
         assert "AUDIT [CSV_LOADED]" in content
@@ -171,6 +176,7 @@ Jane,Smith,1990-05-20,F,1.2.3.4.5,555-555-5555"""
         df, validation_result = parse_csv(csv_file, validate=True)
 
         # Assert
+        flush_logging()
         content = log_file.read_text()
         
         # Should have validation warnings logged
@@ -192,6 +198,7 @@ Jane,Smith,1990-05-20,F,1.2.3.4.5,555-555-5555"""
         log_audit_event("OPERATION_3", {"status": "success"})
 
         # Assert
+        flush_logging()
         content = log_file.read_text()
         
         # Extract correlation IDs
@@ -264,4 +271,5 @@ class TestEnvironmentConfiguration:
 
         # Assert
         assert env_log_file.exists()
+        flush_logging()
         assert "AUDIT [ENV_TEST]" in env_log_file.read_text()
@@ -558,6 +558,20 @@ class TestExampleConfigurations:
         assert config.iti41_behavior.custom_submission_set_id is not None
         assert config.iti41_behavior.custom_document_id is not None
 
+    def test_load_overload_example_config(self) -> None:
+        """Test loading config-overload.json example."""
+        # Arrange
+        config_file = Path("mocks/config-examples/config-overload.json")
+        if not config_file.exists():
+            pytest.skip("Example config file not found")
+
+        # Act
+        config = load_config(config_file)
+
+        # Assert
+        assert config.pix_add_behavior.capacity.overload_status_code == 429
+        assert config.iti41_behavior.capacity.queue_length == 16
+
 
 class TestEndToEndBehaviors:
     """End-to-end integration tests for endpoint behaviors."""
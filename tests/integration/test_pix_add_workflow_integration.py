@@ -11,7 +11,7 @@ import tempfile
 
 import pytest
 
-from ihe_test_util.config.schema import Config
+from ihe_test_util.config.schema import Config, EndpointsConfig
 from ihe_test_util.ihe_transactions.workflows import (
     PIXAddWorkflow,
     save_registered_identifiers,
@@ -41,8 +41,10 @@ def integration_config(tmp_path):
     config = Mock(spec=Config)
     
     # Endpoints
-    config.endpoints = Mock()
-    config.endpoints.pix_add_url = "http://localhost:8080/pix/add"
+    config.endpoints = EndpointsConfig(
+        pix_add_url="http://localhost:8080/pix/add",
+        iti41_url="http://localhost:8080/iti41/submit",
+    )
     
     # SAML configuration  
     config.saml = Mock()
@@ -0,0 +1,258 @@
+"""Integration tests for the integrated workflow over the in-process WSGI transport.
+
+Runs CSV → CCD → PIX Add → ITI-41 against the Flask mock app without
+starting a server: both SOAP clients dispatch into the app through
+WSGIAdapter.
+"""
+
+import logging
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import pytest
+
+from ihe_test_util.config.schema import (
+    BatchConfig,
+    CertificatesConfig,
+    Config,
+    EndpointsConfig,
+    EndpointTarget,
+    TransportConfig,
+)
+from ihe_test_util.ihe_transactions.metrics import get_client_metrics
+from ihe_test_util.ihe_transactions.submission_registry import ITI41, SubmissionRegistry
+from ihe_test_util.ihe_transactions.workflows import IntegratedWorkflow
+from ihe_test_util.logging_audit.audit_sink import audit_sink, iter_audit_records
+from ihe_test_util.logging_audit.transaction_archive import ArchiveReader, transaction_archive
+from ihe_test_util.mock_server.app import app, initialize_app
+from ihe_test_util.profiling.tracing import tracing
+from ihe_test_util.transport.wsgi_adapter import DEFAULT_BASE_URL, WSGIAdapter
+
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "fixtures"
+
+
+@pytest.fixture
+def wsgi_workflow(mock_server_config, tmp_path, monkeypatch):
+    """Integrated workflow whose clients dispatch into the mock app in-process."""
+    monkeypatch.chdir(tmp_path)
+    # initialize_app reconfigures the mock server logger; restore it afterwards
+    mock_logger = logging.getLogger("ihe_test_util.mock_server")
+    saved_level, saved_handlers = mock_logger.level, list(mock_logger.handlers)
+    initialize_app(mock_server_config)
+    config = Config(
+        endpoints=EndpointsConfig(
+            pix_add_url=f"{DEFAULT_BASE_URL}{mock_server_config.pix_add_endpoint}",
+            iti41_url=f"{DEFAULT_BASE_URL}{mock_server_config.iti41_endpoint}",
+        ),
+        certificates=CertificatesConfig(
+            cert_path=FIXTURES_DIR / "test_cert.pem",
+            key_path=FIXTURES_DIR / "test_key.pem",
+        ),
+        transport=TransportConfig(verify_tls=False),
+    )
+    workflow = IntegratedWorkflow(config, FIXTURES_DIR / "test_ccd_template.xml", BatchConfig())
+    workflow.mount_transport(f"{DEFAULT_BASE_URL}/", WSGIAdapter(app))
+    yield workflow
+    for handler in mock_logger.handlers:
+        if handler not in saved_handlers:
+            handler.close()
+    mock_logger.handlers[:] = saved_handlers
+    mock_logger.setLevel(saved_level)
+
+
+@pytest.fixture
+def patients_csv(tmp_path):
+    """CSV with three patients."""
+    csv_path = tmp_path / "patients.csv"
+    csv_path.write_text(
+        "patient_id,patient_id_oid,first_name,last_name,dob,gender,zip\n"
+        "PAT001,2.16.840.1.113883.3.72.5.9.1,John,Doe,1980-01-01,M,02108\n"
+        "PAT002,2.16.840.1.113883.3.72.5.9.1,Jane,Smith,1985-05-15,F,\n"
+        "PAT003,2.16.840.1.113883.3.72.5.9.1,Bob,Johnson,1990-10-20,M,62701\n",
+        encoding="utf-8",
+    )
+    return csv_path
+
+
+class TestWSGITransportWorkflow:
+    """Test the full workflow over the in-process transport."""
+
+    def test_batch_succeeds_without_sockets(self, wsgi_workflow, patients_csv):
+        """Test PIX Add and MTOM ITI-41 submissions succeed through the mock app."""
+        # Act
+        result = wsgi_workflow.process_batch(patients_csv)
+
+        # Assert
+        assert len(result.patient_results) == 3
+        for patient in result.patient_results:
+            assert patient.pix_add_status == "success", patient.error_message
+            assert patient.iti41_status == "success", patient.error_message
+
+    def test_batch_trace_covers_workflow_steps(self, wsgi_workflow, patients_csv):
+        """Test a traced batch records every step tagged with patient and transaction IDs."""
+        # Act
+        with tracing() as tracer:
+            wsgi_workflow.process_batch(patients_csv)
+
+        # Assert
+        spans = [event for event in tracer.events if event["ph"] == "X"]
+        names = {event["name"] for event in spans}
+        assert {
+            "csv.parse",
+            "csv.row_to_patient",
+            "saml.assertion",
+            "patient",
+            "ccd.generate",
+            "pix_add.build_message",
+            "pix_add.build_envelope",
+            "pix_add.parse_response",
+            "iti41.build_metadata",
+            "iti41.build_envelope",
+            "iti41.build_mtom",
+            "iti41.parse_response",
+            "http.post",
+        } <= names
+        posts = [event for event in spans if event["name"] == "http.post"]
+        assert len(posts) == 6
+        assert {event["args"]["transaction"] for event in posts} == {"PIX_ADD", "ITI_41"}
+        assert all(event["args"]["status_code"] == 200 for event in posts)
+        assert {event["args"]["patient_id"] for event in posts} == {"PAT001", "PAT002", "PAT003"}
+        assert all(event["args"]["transaction_id"] for event in posts)
+
+    def test_batch_records_client_metrics(self, wsgi_workflow, patients_csv):
+        """Test the client metrics registry counts stages and HTTP attempts."""
+        # Arrange
+        metrics = get_client_metrics()
+        metrics.reset()
+
+        # Act
+        wsgi_workflow.process_batch(patients_csv)
+
+        # Assert
+        snapshot = metrics.snapshot()
+        metrics.reset()
+        assert snapshot["patients_total"] == 3
+        assert snapshot["stage_results"][("iti41", "success")] == 3
+        assert snapshot["requests"] == {("pix_add", "200"): 3, ("iti41", "200"): 3}
+        assert snapshot["in_flight"] == {"pix_add": 0, "iti41": 0}
+        assert snapshot["bytes_sent"]["iti41"] > snapshot["bytes_sent"]["pix_add"] > 0
+        assert snapshot["latency"]["iti41"]["count"] == 3
+
+    def test_batch_writes_structured_audit_trail(self, wsgi_workflow, patients_csv, tmp_path):
+        """Test workflow steps land in the JSONL audit trail with batch and correlation IDs."""
+        # Arrange
+        audit_path = tmp_path / "audit.jsonl"
+
+        # Act
+        with audit_sink(audit_path):
+            result = wsgi_workflow.process_batch(patients_csv)
+
+        # Assert
+        records = list(iter_audit_records([audit_path], event="workflow_step"))
+        assert {record["batch_id"] for record in records} == {result.batch_id}
+        assert [record["step"] for record in records[:2]] == ["BATCH_START", "WORKFLOW_START"]
+        assert records[-1]["step"] == "BATCH_COMPLETE"
+        iti41 = list(iter_audit_records([audit_path], step="ITI41", status="SUCCESS"))
+        assert [record["patient_id"] for record in iti41] == ["PAT001", "PAT002", "PAT003"]
+        assert all(record["correlation_id"] and record["duration_ms"] >= 0 for record in iti41)
+
+    def test_batch_archives_complete_transactions(self, wsgi_workflow, patients_csv, tmp_path):
+        """Test every PIX Add and ITI-41 exchange is archived and retrievable by message ID."""
+        # Arrange
+        archive_dir = tmp_path / "archive"
+
+        # Act
+        with transaction_archive(archive_dir):
+            result = wsgi_workflow.process_batch(patients_csv)
+
+        # Assert
+        reader = ArchiveReader(archive_dir)
+        entries = list(reader.entries())
+        assert {(entry["transaction_type"], entry["patient_id"]) for entry in entries} == {
+            (transaction_type, patient_id)
+            for transaction_type in ("PIX_ADD", "ITI41_SUBMIT")
+            for patient_id in ("PAT001", "PAT002", "PAT003")
+        }
+        patient = result.patient_results[1]
+        [iti41] = reader.entries(patient_id=patient.patient_id, transaction_type="ITI41_SUBMIT")
+        transaction = reader.get(iti41["message_id"])
+        assert set(transaction.parts) == {"request", "response", "document"}
+        assert "ProvideAndRegisterDocumentSetRequest" in transaction.parts["request"]
+        assert "RegistryResponse" in transaction.parts["response"]
+        assert patient.patient_id in transaction.parts["document"]
+
+    def test_batch_balances_over_pix_endpoints(self, wsgi_workflow, patients_csv):
+        """Test PIX Add alternates between two nodes and the result carries endpoint stats."""
+        # Arrange
+        config = wsgi_workflow.config
+        pix_path = urlsplit(config.endpoints.pix_add_url).path
+        second_node = "http://mock-2.local"
+        endpoints = config.endpoints.model_copy(update={"pix_add_endpoints": [
+            EndpointTarget(url=config.endpoints.pix_add_url),
+            EndpointTarget(url=f"{second_node}{pix_path}"),
+        ]})
+        workflow = IntegratedWorkflow(
+            config.model_copy(update={"endpoints": endpoints}),
+            FIXTURES_DIR / "test_ccd_template.xml",
+            BatchConfig(),
+        )
+        adapter = WSGIAdapter(app)
+        workflow.mount_transport(f"{DEFAULT_BASE_URL}/", adapter)
+        workflow.mount_transport(f"{second_node}/", adapter)
+
+        # Act
+        result = workflow.process_batch(patients_csv)
+
+        # Assert
+        assert result.fully_successful_count == 3
+        stats = {(s.transaction, s.url): s for s in result.endpoint_stats}
+        assert stats[("pix_add", config.endpoints.pix_add_url)].requests == 2
+        assert stats[("pix_add", f"{second_node}{pix_path}")].requests == 1
+        assert stats[("iti41", config.endpoints.iti41_url)].requests == 3
+        assert all(s.failures == 0 and s.healthy for s in result.endpoint_stats)
+        assert len(result.to_dict()["endpoints"]) == 3
+
+    def test_single_endpoints_omit_endpoint_stats(self, wsgi_workflow, patients_csv):
+        # Act
+        result = wsgi_workflow.process_batch(patients_csv)
+
+        # Assert
+        assert result.endpoint_stats == []
+        assert "endpoints" not in result.to_dict()
+
+    def test_registry_skips_successful_submissions_on_rerun(self, wsgi_workflow, patients_csv, tmp_path):
+        """Test a rerun resends only what the registry lacks, unless forced."""
+        # Arrange
+        registry_path = tmp_path / "registry.db"
+        metrics = get_client_metrics()
+
+        def run(**batch_options):
+            workflow = IntegratedWorkflow(
+                wsgi_workflow.config,
+                FIXTURES_DIR / "test_ccd_template.xml",
+                BatchConfig(registry_path=registry_path, **batch_options),
+            )
+            workflow.mount_transport(f"{DEFAULT_BASE_URL}/", WSGIAdapter(app))
+            metrics.reset()
+            result = workflow.process_batch(patients_csv)
+            requests = metrics.snapshot()["requests"]
+            metrics.reset()
+            return result, requests
+
+        # Act
+        first, first_requests = run()
+        SubmissionRegistry(registry_path).forget(patient_id="PAT002", transaction_type=ITI41)
+        rerun, rerun_requests = run()
+        forced, forced_requests = run(force_resubmit=True)
+
+        # Assert
+        assert first_requests == {("pix_add", "200"): 3, ("iti41", "200"): 3}
+        assert rerun_requests == {("iti41", "200"): 1}
+        assert rerun.fully_successful_count == 3
+        assert (rerun.pix_add_reused_count, rerun.iti41_reused_count) == (3, 2)
+        assert [p.pix_enterprise_id for p in rerun.patient_results] == [
+            p.pix_enterprise_id for p in first.patient_results
+        ]
+        assert forced_requests == first_requests
+        assert (forced.pix_add_reused_count, forced.iti41_reused_count) == (0, 0)
@@ -0,0 +1,105 @@
+"""Unit tests for the transaction archive CLI commands."""
+
+from click.testing import CliRunner
+
+from ihe_test_util.cli.main import cli
+from ihe_test_util.logging_audit.transaction_archive import TransactionArchive, get_transaction_archive
+
+
+def _write_archive(path):
+    archive = TransactionArchive(path, flush_interval=0)
+    archive.write("PIX_ADD", "urn:uuid:1", "SUCCESS",
+                  {"request": "<pix/>", "response": "<ack/>"}, patient_id="PAT001")
+    archive.write("ITI41_SUBMIT", "urn:uuid:2", "failure",
+                  {"request": "<pnr/>", "response": "<rr/>", "document": "<ClinicalDocument/>"},
+                  patient_id="PAT001")
+    archive.write("PIX_ADD", "urn:uuid:3", "SUCCESS",
+                  {"request": "<pix3/>", "response": "<ack3/>"}, patient_id="PAT002")
+    archive.close()
+
+
+class TestArchiveList:
+    """Test the archive list command."""
+
+    def test_list_filters_by_patient(self, tmp_path):
+        # Arrange
+        _write_archive(tmp_path)
+
+        # Act
+        result = CliRunner().invoke(cli, ["archive", "list", str(tmp_path), "--patient", "PAT001"])
+
+        # Assert
+        assert result.exit_code == 0
+        lines = result.stdout.splitlines()
+        assert len(lines) == 2
+        assert "urn:uuid:1" in lines[0] and "PIX_ADD" in lines[0]
+        assert "document 19B" in lines[1]
+
+    def test_list_missing_archive_exits_2(self, tmp_path):
+        result = CliRunner().invoke(cli, ["archive", "list", str(tmp_path / "missing")])
+
+        assert result.exit_code == 2
+        assert "No transaction archive index" in result.output
+
+
+class TestArchiveExport:
+    """Test the archive export command."""
+
+    def test_export_prints_part(self, tmp_path):
+        # Arrange
+        _write_archive(tmp_path)
+
+        # Act
+        result = CliRunner().invoke(
+            cli, ["archive", "export", str(tmp_path), "urn:uuid:2", "--part", "response"]
+        )
+
+        # Assert
+        assert result.exit_code == 0
+        assert result.stdout == "<rr/>\n"
+
+    def test_export_all_parts_to_directory(self, tmp_path):
+        # Arrange
+        _write_archive(tmp_path / "archive")
+        output_dir = tmp_path / "export"
+
+        # Act
+        result = CliRunner().invoke(
+            cli,
+            ["archive", "export", str(tmp_path / "archive"), "urn:uuid:2", "--output-dir", str(output_dir)],
+        )
+
+        # Assert
+        assert result.exit_code == 0
+        assert sorted(path.name for path in output_dir.iterdir()) == [
+            "urn_uuid_2.document.xml", "urn_uuid_2.request.xml", "urn_uuid_2.response.xml",
+        ]
+        assert (output_dir / "urn_uuid_2.document.xml").read_text() == "<ClinicalDocument/>"
+
+    def test_export_unknown_message_or_part_exits_1(self, tmp_path):
+        # Arrange
+        _write_archive(tmp_path)
+
+        # Act
+        unknown = CliRunner().invoke(cli, ["archive", "export", str(tmp_path), "urn:uuid:9"])
+        no_part = CliRunner().invoke(
+            cli, ["archive", "export", str(tmp_path), "urn:uuid:1", "--part", "document"]
+        )
+
+        # Assert
+        assert unknown.exit_code == 1
+        assert "Message ID not found" in unknown.output
+        assert no_part.exit_code == 1
+        assert "available: request, response" in no_part.output
+
+    def test_archive_dir_option_opens_and_closes_archive(self, tmp_path):
+        """Test --archive-dir archives for the duration of the command."""
+        # Act
+        result = CliRunner().invoke(
+            cli, ["--archive-dir", str(tmp_path / "archive"), "archive", "list", str(tmp_path / "archive")]
+        )
+
+        # Assert
+        assert result.exit_code == 0
+        assert get_transaction_archive() is None
+        assert list((tmp_path / "archive").glob("index-*.jsonl"))
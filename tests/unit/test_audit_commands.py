@@ -0,0 +1,88 @@
+"""Unit tests for the audit CLI commands."""
+
+import json
+
+from click.testing import CliRunner
+
+from ihe_test_util.cli.main import cli
+from ihe_test_util.logging_audit.audit_sink import AuditRecord, AuditSink, get_audit_sink
+
+
+def _write_trail(path, records):
+    sink = AuditSink(path, flush_interval=0)
+    for record in records:
+        sink.write(record)
+    sink.close()
+
+
+class TestAuditQuery:
+    """Test the audit query command."""
+
+    def test_query_prints_matching_records(self, tmp_path):
+        # Arrange
+        path = tmp_path / "audit.jsonl"
+        _write_trail(path, [
+            AuditRecord("workflow_step", "SUCCESS", patient_id="PAT001", step="ITI41"),
+            AuditRecord("workflow_step", "FAILED", patient_id="PAT002", step="ITI41"),
+            AuditRecord("workflow_step", "FAILED", patient_id="PAT003", step="PIX_ADD"),
+        ])
+
+        # Act
+        result = CliRunner().invoke(
+            cli, ["audit", "query", str(path), "--step", "ITI41", "--status", "FAILED"]
+        )
+
+        # Assert
+        assert result.exit_code == 0
+        [line] = result.stdout.splitlines()
+        assert json.loads(line)["patient_id"] == "PAT002"
+
+    def test_query_count_and_limit(self, tmp_path):
+        # Arrange
+        path = tmp_path / "audit.jsonl"
+        _write_trail(path, [AuditRecord("workflow_step", "SUCCESS") for _ in range(5)])
+
+        # Act
+        count = CliRunner().invoke(cli, ["audit", "query", str(path), "--count"])
+        limited = CliRunner().invoke(cli, ["audit", "query", str(path), "--limit", "2"])
+
+        # Assert
+        assert count.stdout.strip() == "5"
+        assert len(limited.stdout.splitlines()) == 2
+
+    def test_query_missing_file(self, tmp_path):
+        result = CliRunner().invoke(cli, ["audit", "query", str(tmp_path / "missing.jsonl")])
+
+        assert result.exit_code == 2
+        assert "Audit file not found" in result.output
+
+    def test_query_invalid_time(self, tmp_path):
+        path = tmp_path / "audit.jsonl"
+        _write_trail(path, [AuditRecord("workflow_step", "SUCCESS")])
+
+        result = CliRunner().invoke(cli, ["audit", "query", str(path), "--since", "yesterday"])
+
+        assert result.exit_code == 1
+        assert "Invalid time filter" in result.output
+
+
+class TestAuditFileOption:
+    """Test the global --audit-file option."""
+
+    def test_audit_file_opened_and_closed_around_command(self, tmp_path):
+        # Arrange
+        path = tmp_path / "trail" / "audit.jsonl"
+        csv_file = tmp_path / "patients.csv"
+        csv_file.write_text(
+            "first_name,last_name,dob,gender,patient_id_oid\nJohn,Doe,1980-01-15,M,1.2.3.4.5\n"
+        )
+
+        # Act
+        result = CliRunner().invoke(
+            cli, ["--audit-file", str(path), "csv", "validate", str(csv_file)]
+        )
+
+        # Assert
+        assert result.exit_code == 0, result.output
+        assert get_audit_sink() is None
+        assert path.exists()
@@ -0,0 +1,290 @@
+"""Unit tests for the structured JSONL audit trail."""
+
+import gzip
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from ihe_test_util.logging_audit import audit_sink as audit_sink_module
+from ihe_test_util.logging_audit import log_audit_event, log_transaction
+from ihe_test_util.logging_audit.audit_sink import (
+    AuditRecord,
+    AuditSink,
+    audit_files,
+    audit_sink,
+    get_audit_sink,
+    iter_audit_records,
+    record_audit,
+)
+
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+class TestAuditRecord:
+    """Test record serialization."""
+
+    def test_to_json_has_fixed_keys(self):
+        # Arrange
+        record = AuditRecord(
+            event="workflow_step",
+            status="SUCCESS",
+            patient_id="PAT001",
+            step="PIX_ADD",
+            duration_ms=120,
+        )
+
+        # Act
+        line = record.to_json()
+
+        # Assert
+        assert "\n" not in line and ", " not in line
+        assert json.loads(line) == {
+            "v": 1,
+            "timestamp": record.timestamp,
+            "event": "workflow_step",
+            "batch_id": None,
+            "patient_id": "PAT001",
+            "step": "PIX_ADD",
+            "status": "SUCCESS",
+            "duration_ms": 120,
+            "correlation_id": None,
+            "details": None,
+        }
+
+
+class TestAuditSink:
+    """Test buffering, flushing and rotation."""
+
+    def test_records_buffered_until_flush(self, tmp_path):
+        # Arrange
+        path = tmp_path / "audit.jsonl"
+        sink = AuditSink(path, flush_interval=0)
+
+        # Act
+        sink.write(AuditRecord(event="workflow_step", status="SUCCESS"))
+        size_before_flush = path.stat().st_size
+        sink.flush()
+
+        # Assert
+        assert size_before_flush == 0
+        assert len(_lines(path)) == 1
+        sink.close()
+
+    def test_size_threshold_triggers_flush(self, tmp_path):
+        # Arrange
+        path = tmp_path / "audit.jsonl"
+        sink = AuditSink(path, flush_interval=0, flush_bytes=500)
+
+        # Act
+        for i in range(10):
+            sink.write(AuditRecord(event="workflow_step", status="SUCCESS", patient_id=f"PAT{i:03d}"))
+
+        # Assert
+        assert 0 < len(_lines(path)) < 10
+        sink.close()
+        assert len(_lines(path)) == 10
+
+    def test_background_thread_flushes_on_interval(self, tmp_path):
+        # Arrange
+        path = tmp_path / "audit.jsonl"
+        sink = AuditSink(path, flush_interval=0.05)
+
+        # Act
+        sink.write(AuditRecord(event="workflow_step", status="SUCCESS"))
+        deadline = time.monotonic() + 5
+        while path.stat().st_size == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        # Assert
+        assert len(_lines(path)) == 1
+        sink.close()
+
+    def test_rotation_keeps_compressed_segments(self, tmp_path):
+        """Test rotated segments are gzipped and the oldest are dropped."""
+        # Arrange
+        path = tmp_path / "audit.jsonl"
+        sink = AuditSink(path, flush_interval=0, flush_bytes=1, max_bytes=400, backup_count=2, compress=True)
+
+        # Act
+        for i in range(20):
+            sink.write(AuditRecord(event="workflow_step", status="SUCCESS", patient_id=f"PAT{i:03d}"))
+        sink.close()
+
+        # Assert
+        files = audit_files(path)
+        assert [file.name for file in files] == ["audit.jsonl.2.gz", "audit.jsonl.1.gz", "audit.jsonl"]
+        with gzip.open(files[0], "rt", encoding="utf-8") as segment:
+            assert json.loads(segment.readline())["event"] == "workflow_step"
+        patients = [record["patient_id"] for record in iter_audit_records(files)]
+        assert patients == sorted(patients)
+        assert patients[-1] == "PAT019"
+
+    def test_compression_does_not_block_writers(self, tmp_path, monkeypatch):
+        """Test writes continue while a rotated segment is still being gzipped."""
+        # Arrange
+        release = threading.Event()
+        copy = audit_sink_module.shutil.copyfileobj
+
+        def slow_copy(source, target):
+            assert release.wait(timeout=5)
+            copy(source, target)
+
+        monkeypatch.setattr(audit_sink_module.shutil, "copyfileobj", slow_copy)
+        path = tmp_path / "audit.jsonl"
+        sink = AuditSink(path, flush_interval=0, flush_bytes=1, max_bytes=400, backup_count=10, compress=True)
+
+        # Act
+        for i in range(10):
+            sink.write(AuditRecord(event="workflow_step", status="SUCCESS", patient_id=f"PAT{i:03d}"))
+        written_before_compression = not (tmp_path / "audit.jsonl.1.gz").exists()
+        release.set()
+        sink.close()
+
+        # Assert
+        assert written_before_compression
+        files = audit_files(path)
+        assert len(files) > 2
+        assert all(file.suffix == ".gz" for file in files[:-1])
+        assert not list(tmp_path.glob("*.rotated-*"))
+        patients = [record["patient_id"] for record in iter_audit_records(files)]
+        assert patients == [f"PAT{i:03d}" for i in range(10)]
+
+    def test_files_waiting_for_compression_are_queryable(self, tmp_path, monkeypatch):
+        """Test records in rotated files not yet gzipped are still returned."""
+        # Arrange
+        release = threading.Event()
+        copy = audit_sink_module.shutil.copyfileobj
+
+        def slow_copy(source, target):
+            assert release.wait(timeout=5)
+            copy(source, target)
+
+        monkeypatch.setattr(audit_sink_module.shutil, "copyfileobj", slow_copy)
+        path = tmp_path / "audit.jsonl"
+        sink = AuditSink(path, flush_interval=0, flush_bytes=1, max_bytes=400, backup_count=10, compress=True)
+        for i in range(10):
+            sink.write(AuditRecord(event="workflow_step", status="SUCCESS", patient_id=f"PAT{i:03d}"))
+
+        # Act
+        files = audit_files(path)
+        patients = [record["patient_id"] for record in iter_audit_records(files)]
+        release.set()
+        sink.close()
+
+        # Assert
+        assert any(".rotated-" in file.name for file in files)
+        assert patients == [f"PAT{i:03d}" for i in range(10)]
+
+    def test_second_writer_gets_its_own_file(self, tmp_path):
+        """Test sinks sharing one audit file (sharded workers) never write the same file."""
+        # Arrange
+        path = tmp_path / "audit.jsonl"
+        owner = AuditSink(path, flush_interval=0, flush_bytes=1, max_bytes=400)
+        other = AuditSink(path, flush_interval=0, flush_bytes=1, max_bytes=400)
+
+        # Act
+        for i in range(10):
+            owner.write(AuditRecord(event="workflow_step", status="SUCCESS", patient_id=f"A{i:03d}"))
+            other.write(AuditRecord(event="workflow_step", status="SUCCESS", patient_id=f"B{i:03d}"))
+        owner.close()
+        other.close()
+
+        # Assert
+        assert owner.path == path
+        assert other.path.name == f"audit-{os.getpid()}.jsonl"
+        patients = [record["patient_id"] for record in iter_audit_records(audit_files(path))]
+        assert sorted(patients) == sorted([f"A{i:03d}" for i in range(10)] + [f"B{i:03d}" for i in range(10)])
+        assert [p for p in patients if p.startswith("A")] == [f"A{i:03d}" for i in range(10)]
+
+    def test_write_after_close_is_ignored(self, tmp_path):
+        path = tmp_path / "audit.jsonl"
+        sink = AuditSink(path, flush_interval=0)
+        sink.close()
+
+        sink.write(AuditRecord(event="workflow_step", status="SUCCESS"))
+
+        assert path.read_text(encoding="utf-8") == ""
+
+
+class TestRecordAudit:
+    """Test the process-wide sink and audit producers."""
+
+    def test_record_audit_without_sink_is_noop(self):
+        assert get_audit_sink() is None
+        record_audit("workflow_step", "SUCCESS", patient_id="PAT001")
+
+    def test_audit_events_and_transactions_written(self, tmp_path):
+        """Test log_audit_event and log_transaction feed the open sink."""
+        # Arrange
+        path = tmp_path / "audit.jsonl"
+
+        # Act
+        with audit_sink(path, flush_interval=0):
+            log_audit_event(
+                "CSV_PROCESSED",
+                {"status": "success", "duration": 2.5, "record_count": 10, "correlation_id": "c-1"},
+            )
+            log_transaction("PIX_ADD", "<request/>", "<response/>", "success")
+
+        # Assert
+        event, transaction = _lines(path)
+        assert get_audit_sink() is None
+        assert event["event"] == "CSV_PROCESSED"
+        assert event["duration_ms"] == 2500
+        assert event["correlation_id"] == "c-1"
+        assert event["details"] == {"record_count": 10}
+        assert transaction["event"] == "transaction"
+        assert transaction["step"] == "PIX_ADD"
+        assert transaction["details"] == {"request_bytes": 10, "response_bytes": 11}
+
+
+class TestIterAuditRecords:
+    """Test filtered scans."""
+
+    @pytest.fixture
+    def trail(self, tmp_path):
+        path = tmp_path / "audit.jsonl"
+        records = [
+            AuditRecord("workflow_step", "SUCCESS", batch_id="b1", patient_id="PAT001", step="PIX_ADD",
+                        timestamp="2026-01-15T10:00:00.000+00:00"),
+            AuditRecord("workflow_step", "FAILED", batch_id="b1", patient_id="PAT002", step="ITI41",
+                        details={"patient_id": "PAT001"}, timestamp="2026-01-15T11:00:00.000+00:00"),
+            AuditRecord("workflow_step", "SUCCESS", batch_id="b2", patient_id="PAT001", step="ITI41",
+                        timestamp="2026-01-15T12:00:00.000+00:00"),
+        ]
+        path.write_text(
+            "".join(record.to_json() + "\n" for record in records[:2])
+            + "not json\n"
+            + records[2].to_json() + "\n",
+            encoding="utf-8",
+        )
+        return path
+
+    def test_equality_filters(self, trail):
+        """Test field filters, including lines that only match inside details."""
+        records = list(iter_audit_records([trail], patient_id="PAT001"))
+
+        assert [(record["batch_id"], record["step"]) for record in records] == [
+            ("b1", "PIX_ADD"), ("b2", "ITI41"),
+        ]
+
+    def test_combined_filters(self, trail):
+        [record] = iter_audit_records([trail], step="ITI41", status="FAILED")
+
+        assert record["patient_id"] == "PAT002"
+
+    def test_time_window(self, trail):
+        records = list(
+            iter_audit_records([trail], since="2026-01-15T10:30:00", until="2026-01-15T12:00:00+00:00")
+        )
+
+        assert [record["patient_id"] for record in records] == ["PAT002"]
+
+    def test_invalid_time_raises(self, trail):
+        with pytest.raises(ValueError):
+            list(iter_audit_records([trail], since="yesterday"))
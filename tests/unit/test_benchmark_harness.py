@@ -0,0 +1,185 @@
+"""Unit tests for benchmark baselines and regression detection."""
+
+import json
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+
+
+BENCHMARKS_DIR = Path(__file__).resolve().parents[2] / "benchmarks"
+sys.path.insert(0, str(BENCHMARKS_DIR))
+
+import run_benchmarks  # noqa: E402
+from harness import (  # noqa: E402
+    SCHEMA_VERSION,
+    BenchmarkCase,
+    BenchmarkResult,
+    compare_results,
+    load_results,
+    save_results,
+)
+
+
+def _results(**timings: float) -> dict[str, BenchmarkResult]:
+    return {
+        f"{group}[10 rows]": BenchmarkResult(group, "10 rows", us_per_call, calls=100, repeat=5)
+        for group, us_per_call in timings.items()
+    }
+
+
+def _statuses(comparisons) -> dict[str, str]:
+    return {comparison.name: comparison.status for comparison in comparisons}
+
+
+class TestCompareResults:
+    """Test classification of baseline vs. current timings."""
+
+    def test_regression_improvement_missing_and_new(self):
+        # Arrange
+        baseline = _results(slower=100.0, faster=100.0, same=100.0, removed=100.0)
+        current = _results(slower=150.0, faster=50.0, same=105.0, added=10.0)
+
+        # Act
+        comparisons = compare_results(baseline, current, threshold=0.15)
+
+        # Assert
+        assert _statuses(comparisons) == {
+            "slower[10 rows]": "regression",
+            "faster[10 rows]": "improvement",
+            "same[10 rows]": "unchanged",
+            "removed[10 rows]": "missing",
+            "added[10 rows]": "new",
+        }
+        by_name = {comparison.name: comparison for comparison in comparisons}
+        assert by_name["slower[10 rows]"].ratio == pytest.approx(1.5)
+        removed = by_name["removed[10 rows]"]
+        assert (removed.baseline_us, removed.current_us, removed.ratio) == (100.0, None, None)
+        assert (by_name["added[10 rows]"].baseline_us, by_name["added[10 rows]"].current_us) == (None, 10.0)
+        assert [comparison.name for comparison in comparisons][-1] == "added[10 rows]"
+
+    @pytest.mark.parametrize(
+        ("current_us", "status"),
+        [
+            (110.0, "unchanged"),
+            (110.01, "regression"),
+            (100.0 / 1.1, "unchanged"),
+            (90.0, "improvement"),
+        ],
+    )
+    def test_threshold_edge(self, current_us, status):
+        # Act
+        comparisons = compare_results(_results(case=100.0), _results(case=current_us), threshold=0.10)
+
+        # Assert
+        assert comparisons[0].status == status
+
+    def test_zero_baseline_is_unchanged(self):
+        comparisons = compare_results(_results(case=0.0), _results(case=5.0))
+
+        assert comparisons[0].status == "unchanged"
+
+
+class TestBaselineFiles:
+    """Test saving and loading JSON baselines."""
+
+    def test_round_trip(self, tmp_path):
+        # Arrange
+        results = _results(csv=12.5, saml=800.0)
+        path = tmp_path / "baselines" / "main.json"
+
+        # Act
+        save_results(path, results)
+        loaded = load_results(path)
+
+        # Assert
+        assert loaded == results
+        assert json.loads(path.read_text())["schema_version"] == SCHEMA_VERSION
+
+    def test_rejects_other_schema_version(self, tmp_path):
+        # Arrange
+        path = tmp_path / "old.json"
+        save_results(path, _results(csv=12.5))
+        document = json.loads(path.read_text())
+        document["schema_version"] = SCHEMA_VERSION + 1
+        path.write_text(json.dumps(document))
+
+        # Act & Assert
+        with pytest.raises(ValueError, match="schema version"):
+            load_results(path)
+
+    def test_rejects_non_baseline_json(self, tmp_path):
+        path = tmp_path / "other.json"
+        path.write_text('{"patients": []}')
+
+        with pytest.raises(ValueError, match="not a benchmark baseline"):
+            load_results(path)
+
+
+class TestRunBenchmarksExitCode:
+    """Test the exit codes of run_benchmarks.py."""
+
+    def _main(self, monkeypatch, *args: str) -> int:
+        monkeypatch.setattr(sys, "argv", ["run_benchmarks.py", *args])
+        try:
+            return run_benchmarks.main()
+        finally:
+            # main() silences logging for the whole process
+            logging.disable(logging.NOTSET)
+
+    def test_compare_exits_1_on_regression(self, tmp_path, monkeypatch, capsys):
+        # Arrange
+        save_results(tmp_path / "baseline.json", _results(csv=100.0, saml=100.0))
+        save_results(tmp_path / "current.json", _results(csv=130.0, saml=100.0))
+
+        # Act
+        exit_code = self._main(monkeypatch, "compare", str(tmp_path / "baseline.json"), str(tmp_path / "current.json"))
+
+        # Assert
+        assert exit_code == 1
+        assert "1 regression(s)" in capsys.readouterr().out
+
+    def test_compare_exits_0_within_threshold(self, tmp_path, monkeypatch):
+        # Arrange
+        save_results(tmp_path / "baseline.json", _results(csv=100.0))
+        save_results(tmp_path / "current.json", _results(csv=130.0))
+
+        # Act
+        exit_code = self._main(
+            monkeypatch,
+            "compare",
+            str(tmp_path / "baseline.json"),
+            str(tmp_path / "current.json"),
+            "--threshold",
+            "0.5",
+        )
+
+        # Assert
+        assert exit_code == 0
+
+    def test_run_compare_exits_1_on_regression(self, tmp_path, monkeypatch):
+        # Arrange: the baseline claims the case used to be much faster
+        monkeypatch.setattr(
+            run_benchmarks,
+            "collect_cases",
+            lambda: [BenchmarkCase("noop", "1 call", lambda: sum(range(100)))],
+        )
+        save_results(tmp_path / "baseline.json", {"noop[1 call]": BenchmarkResult("noop", "1 call", 1e-6, 1, 1)})
+
+        # Act
+        exit_code = self._main(monkeypatch, "run", "--quick", "--compare", str(tmp_path / "baseline.json"))
+
+        # Assert
+        assert exit_code == 1
+
+    def test_unreadable_baseline_exits_2(self, tmp_path, monkeypatch):
+        # Arrange
+        path = tmp_path / "baseline.json"
+        path.write_text('{"schema_version": 99, "results": {}}')
+
+        # Act
+        exit_code = self._main(monkeypatch, "compare", str(path), str(path))
+
+        # Assert
+        assert exit_code == 2
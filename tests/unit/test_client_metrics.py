@@ -0,0 +1,187 @@
+"""Unit tests for client-side metrics and their Prometheus exporters."""
+
+import urllib.error
+import urllib.request
+from unittest.mock import Mock
+
+import pytest
+
+from ihe_test_util.ihe_transactions.error_summary import ErrorSummaryCollector
+from ihe_test_util.ihe_transactions.metrics import (
+    ClientMetrics,
+    MetricsServer,
+    TextfileWriter,
+    get_client_metrics,
+    metrics_exporters,
+    render_prometheus,
+    write_textfile,
+)
+from ihe_test_util.utils.exceptions import ErrorCategory, ErrorInfo
+
+
+@pytest.fixture
+def metrics():
+    """Fresh registry."""
+    return ClientMetrics()
+
+
+@pytest.fixture
+def process_metrics():
+    """Process registry, zeroed before and after the test."""
+    registry = get_client_metrics()
+    registry.reset()
+    yield registry
+    registry.reset()
+
+
+def _response(status_code: int, content: bytes) -> Mock:
+    return Mock(status_code=status_code, content=content)
+
+
+class TestClientMetrics:
+    """Test recording into the registry."""
+
+    def test_observe_patient_counts_stage_outcomes(self, metrics):
+        # Act
+        metrics.set_patients_total(3)
+        metrics.observe_patient(True, "success", "success")
+        metrics.observe_patient(True, "failed", "skipped")
+        metrics.observe_patient(False, "pending", "pending")
+
+        # Assert
+        snapshot = metrics.snapshot()
+        assert snapshot["patients_total"] == 3
+        assert snapshot["patients_processed"] == 3
+        assert snapshot["stage_results"] == {
+            ("ccd", "success"): 2,
+            ("ccd", "failed"): 1,
+            ("pix_add", "success"): 1,
+            ("pix_add", "failed"): 1,
+            ("iti41", "success"): 1,
+            ("iti41", "skipped"): 1,
+        }
+
+    def test_track_request_records_attempt(self, metrics):
+        # Act
+        with metrics.track_request("pix_add", 1000) as request:
+            assert metrics.snapshot()["in_flight"]["pix_add"] == 1
+            request.set_response(_response(503, b"busy"))
+        with metrics.track_request("pix_add", 1000, attempt=2) as request:
+            request.set_response(_response(200, b"<ack/>"))
+
+        # Assert
+        snapshot = metrics.snapshot()
+        assert snapshot["in_flight"]["pix_add"] == 0
+        assert snapshot["requests"] == {("pix_add", "503"): 1, ("pix_add", "200"): 1}
+        assert snapshot["retries"] == {"pix_add": 1}
+        assert snapshot["bytes_sent"]["pix_add"] == 2000
+        assert snapshot["bytes_received"]["pix_add"] == 10
+        assert snapshot["latency"]["pix_add"]["count"] == 2
+
+    def test_track_request_without_response_counts_error(self, metrics):
+        with pytest.raises(ConnectionError):
+            with metrics.track_request("iti41", 50):
+                raise ConnectionError("refused")
+
+        snapshot = metrics.snapshot()
+        assert snapshot["requests"] == {("iti41", "error"): 1}
+        assert snapshot["in_flight"]["iti41"] == 0
+
+    def test_error_collector_drives_error_metrics(self, process_metrics):
+        """Test ErrorSummaryCollector categories feed the error counters."""
+        # Arrange
+        collector = ErrorSummaryCollector()
+        error_info = ErrorInfo(
+            category=ErrorCategory.TRANSIENT,
+            error_type="Timeout",
+            message="timed out",
+            remediation="retry",
+            is_retryable=True,
+        )
+
+        # Act
+        collector.add_error(error_info, "PAT001", stage="iti41")
+        collector.add_error(error_info, "PAT002")
+
+        # Assert
+        assert process_metrics.snapshot()["errors"] == {
+            ("iti41", "transient"): 1,
+            ("workflow", "transient"): 1,
+        }
+
+
+class TestPrometheusExport:
+    """Test exposition format and exporters."""
+
+    def test_render_prometheus(self, metrics):
+        # Arrange
+        metrics.observe_patient(True, "success", "failed")
+        metrics.observe_error("iti41", ErrorCategory.PERMANENT)
+        with metrics.track_request("iti41", 10) as request:
+            request.set_response(_response(200, b""))
+
+        # Act
+        text = render_prometheus(metrics.snapshot())
+
+        # Assert
+        assert 'ihe_client_stage_results_total{stage="iti41",outcome="failed"} 1' in text
+        assert 'ihe_client_errors_total{stage="iti41",category="permanent"} 1' in text
+        assert 'ihe_client_requests_total{transaction="iti41",status="200"} 1' in text
+        assert 'ihe_client_in_flight_requests{transaction="pix_add"} 0' in text
+        assert 'ihe_client_request_seconds_bucket{transaction="iti41",le="+Inf"} 1' in text
+        assert "# TYPE ihe_client_request_seconds histogram" in text
+        assert text.endswith("\n")
+
+    def test_write_textfile_replaces_file(self, metrics, tmp_path):
+        path = tmp_path / "metrics" / "ihe.prom"
+
+        write_textfile(path, metrics)
+        metrics.set_patients_total(7)
+        write_textfile(path, metrics)
+
+        assert "ihe_client_patients 7" in path.read_text(encoding="utf-8")
+        assert [entry.name for entry in path.parent.iterdir()] == ["ihe.prom"]
+
+    def test_textfile_writer_writes_final_values_on_stop(self, metrics, tmp_path):
+        path = tmp_path / "ihe.prom"
+        writer = TextfileWriter(path, interval=60, metrics=metrics)
+
+        writer.start()
+        metrics.observe_patient(True, "success", "success")
+        writer.stop()
+
+        assert "ihe_client_patients_processed_total 1" in path.read_text(encoding="utf-8")
+
+    def test_metrics_server_serves_scrapes(self, metrics):
+        # Arrange
+        metrics.set_patients_total(5)
+        server = MetricsServer(0, metrics=metrics)
+        server.start()
+
+        try:
+            # Act
+            with urllib.request.urlopen(server.url, timeout=5) as response:
+                body = response.read().decode("utf-8")
+                content_type = response.headers["Content-Type"]
+            with pytest.raises(urllib.error.HTTPError) as not_found:
+                urllib.request.urlopen(server.url.replace("/metrics", "/other"), timeout=5)
+        finally:
+            server.stop()
+
+        # Assert
+        assert "ihe_client_patients 5" in body
+        assert content_type.startswith("text/plain; version=0.0.4")
+        assert not_found.value.code == 404
+
+    def test_metrics_exporters_start_and_stop(self, process_metrics, tmp_path):
+        path = tmp_path / "ihe.prom"
+
+        with metrics_exporters(textfile=path, interval=60, port=0) as exporters:
+            assert [type(exporter) for exporter in exporters] == [TextfileWriter, MetricsServer]
+            process_metrics.set_patients_total(2)
+
+        assert "ihe_client_patients 2" in path.read_text(encoding="utf-8")
+
+    def test_metrics_exporters_noop_without_targets(self):
+        with metrics_exporters() as exporters:
+            assert exporters == []
@@ -51,6 +51,40 @@ class TestConfigurationSchema:
         assert "Invalid URL" in str(exc_info.value)
         assert "Must start with http:// or https://" in str(exc_info.value)
 
+    def test_endpoints_config_load_balanced_lists(self) -> None:
+        """Test endpoint lists accept URL strings and default the single URLs."""
+        # Arrange & Act
+        config = EndpointsConfig(
+            pix_add_endpoints=[
+                "http://pix-a:8080/pix/add",
+                {"url": "http://pix-b:8080/pix/add", "weight": 3},
+            ],
+            iti41_url="http://localhost:8080/iti41/submit",
+            load_balancing="WEIGHTED",
+        )
+
+        # Assert
+        assert config.pix_add_url == "http://pix-a:8080/pix/add"
+        assert config.pix_add_targets() == [
+            ("http://pix-a:8080/pix/add", 1),
+            ("http://pix-b:8080/pix/add", 3),
+        ]
+        assert config.iti41_targets() == [("http://localhost:8080/iti41/submit", 1)]
+        assert config.load_balancing == "weighted"
+
+    def test_endpoints_config_invalid_load_balancing(self) -> None:
+        """Test EndpointsConfig rejects unknown strategies, bad URLs and weights."""
+        # Arrange
+        base = {"pix_add_url": "http://a/pix", "iti41_url": "http://a/iti41"}
+
+        # Act & Assert
+        with pytest.raises(ValidationError, match="Invalid load balancing strategy"):
+            EndpointsConfig(**base, load_balancing="random")
+        with pytest.raises(ValidationError, match="Invalid URL"):
+            EndpointsConfig(**base, iti41_endpoints=["ftp://b/iti41"])
+        with pytest.raises(ValidationError):
+            EndpointsConfig(**base, iti41_endpoints=[{"url": "http://b/iti41", "weight": 0}])
+
     def test_certificates_config_valid_format(self) -> None:
         """Test CertificatesConfig with valid certificate format."""
         # Arrange & Act
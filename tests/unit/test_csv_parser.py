@@ -56,6 +56,24 @@ class TestParseCSVValidData:
         assert df.iloc[0]["email"] == "john@example.com"
         assert df.iloc[0]["phone"] == "555-1234"
 
+    def test_parse_csv_keeps_zip_as_text(self, tmp_path):
+        """Test ZIP codes are read as text so leading zeros are preserved."""
+        # Arrange
+        csv_file = tmp_path / "patients.csv"
+        csv_content = (
+            "first_name,last_name,dob,gender,patient_id_oid,zip\n"
+            "John,Doe,1980-01-15,M,1.2.3.4.5,02108\n"
+            "Jane,Smith,1975-06-20,F,1.2.3.4.6,62701\n"
+        )
+        csv_file.write_text(csv_content, encoding="utf-8")
+
+        # Act
+        df, _ = parse_csv(csv_file, validate=False)
+
+        # Assert
+        assert df.iloc[0]["zip"] == "02108"
+        assert df.iloc[1]["zip"] == "62701"
+
     def test_parse_csv_with_empty_optional_columns(self, tmp_path):
         """Test parsing CSV with empty optional columns."""
         # Arrange
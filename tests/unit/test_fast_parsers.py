@@ -0,0 +1,312 @@
+"""Unit tests for fast-path response parsers.
+
+Every fast parser must produce the same result as its reference parser in
+ihe_test_util.ihe_transactions.parsers.
+"""
+
+import threading
+from pathlib import Path
+
+import pytest
+
+from ihe_test_util.ihe_transactions import fast_parsers
+from ihe_test_util.ihe_transactions.fast_parsers import (
+    fast_parse_acknowledgment,
+    fast_parse_registry_response,
+    fast_parse_soap_fault,
+    get_hardened_parser,
+)
+from ihe_test_util.ihe_transactions.parsers import (
+    parse_acknowledgment,
+    parse_registry_response,
+    parse_soap_fault,
+)
+
+
+FIXTURES_DIR = Path(__file__).parent.parent / "fixtures"
+REGISTRY_FIXTURES = [
+    "registry_response_success.xml",
+    "registry_response_failure.xml",
+    "registry_response_partial.xml",
+]
+
+ACK_WITH_DETAILS_AND_IDS = """<?xml version="1.0" encoding="UTF-8"?>
+<MCCI_IN000002UV01 xmlns="urn:hl7-org:v3" ITSVersion="XML_1.0">
+  <id root="2.16.840.1.113883.3.72.5.9.1" extension="ACK-12345"/>
+  <creationTime value="20251116140530"/>
+  <acknowledgement>
+    <typeCode code="AE"/>
+    <targetMessage>
+      <id root="2.16.840.1.113883.3.72.5.9.1" extension="MSG-456"/>
+    </targetMessage>
+    <acknowledgementDetail typeCode="E">
+      <code code="204" codeSystem="2.16.840.1.113883.12.357"/>
+      <text>Unknown patient identifier domain</text>
+    </acknowledgementDetail>
+    <acknowledgementDetail typeCode="W"/>
+  </acknowledgement>
+  <controlActProcess>
+    <subject typeCode="SUBJ">
+      <registrationEvent>
+        <subject1 typeCode="SBJ">
+          <patient>
+            <id root="2.16.840.1.113883.3.72.5.9.1" extension="PAT123456"/>
+            <id root="1.2.840.114350.1.13.99998.8734" extension="EID987654"/>
+          </patient>
+        </subject1>
+      </registrationEvent>
+    </subject>
+    <queryAck>
+      <queryResponseCode code="OK"/>
+      <resultTotalQuantity value="1"/>
+    </queryAck>
+  </controlActProcess>
+</MCCI_IN000002UV01>"""
+
+EMPTY_SUCCESS_RESPONSE = """<?xml version="1.0" encoding="UTF-8"?>
+<soap12:Envelope xmlns:soap12="http://www.w3.org/2003/05/soap-envelope"
+                 xmlns:wsa="http://www.w3.org/2005/08/addressing"
+                 xmlns:rs="urn:oasis:names:tc:ebxml-regrep:xsd:rs:3.0">
+  <soap12:Header>
+    <wsa:MessageID>urn:uuid:resp-1</wsa:MessageID>
+    <wsa:RelatesTo>urn:uuid:req-1</wsa:RelatesTo>
+  </soap12:Header>
+  <soap12:Body>
+    <rs:RegistryResponse status="urn:oasis:names:tc:ebxml-regrep:ResponseStatusType:Success"/>
+  </soap12:Body>
+</soap12:Envelope>"""
+
+SOAP_12_FAULT = """<?xml version="1.0" encoding="UTF-8"?>
+<soap:Envelope xmlns:soap="http://www.w3.org/2003/05/soap-envelope">
+  <soap:Body>
+    <soap:Fault>
+      <soap:Code>
+        <soap:Value>soap:Sender</soap:Value>
+        <soap:Subcode><soap:Value>wsse:InvalidSecurity</soap:Value></soap:Subcode>
+      </soap:Code>
+      <soap:Reason><soap:Text xml:lang="en">Invalid SAML assertion</soap:Text></soap:Reason>
+      <soap:Role>http://example.com/pix</soap:Role>
+      <soap:Detail><error>SAML signature verification failed</error></soap:Detail>
+    </soap:Fault>
+  </soap:Body>
+</soap:Envelope>"""
+
+SOAP_11_FAULT = """<?xml version="1.0" encoding="UTF-8"?>
+<SOAP-ENV:Envelope xmlns:SOAP-ENV="http://schemas.xmlsoap.org/soap/envelope/">
+  <SOAP-ENV:Body>
+    <SOAP-ENV:Fault>
+      <faultcode>SOAP-ENV:Server</faultcode>
+      <faultstring>Internal error</faultstring>
+      <faultactor>http://example.com/registry</faultactor>
+      <detail>Database unavailable</detail>
+    </SOAP-ENV:Fault>
+  </SOAP-ENV:Body>
+</SOAP-ENV:Envelope>"""
+
+
+@pytest.fixture(params=REGISTRY_FIXTURES)
+def registry_xml(request) -> str:
+    """Load each registry response fixture."""
+    return (FIXTURES_DIR / request.param).read_text(encoding="utf-8")
+
+
+class TestFastParseRegistryResponse:
+    """Tests for fast_parse_registry_response."""
+
+    @pytest.mark.parametrize("streaming", [False, True])
+    def test_matches_reference_parser(self, registry_xml: str, streaming: bool) -> None:
+        """Test fast parser output equals reference output for all fixtures."""
+        expected = parse_registry_response(registry_xml)
+
+        actual = fast_parse_registry_response(registry_xml, streaming=streaming)
+
+        assert actual.to_dict() == expected.to_dict()
+
+    def test_streaming_empty_success_element(self) -> None:
+        """Test streaming handles a self-closing success RegistryResponse."""
+        response = fast_parse_registry_response(
+            EMPTY_SUCCESS_RESPONSE, streaming=True
+        )
+
+        assert response.is_success is True
+        assert response.response_id == "urn:uuid:resp-1"
+        assert response.request_id == "urn:uuid:req-1"
+        assert response.document_ids == []
+
+    def test_streaming_stops_after_registry_response(self) -> None:
+        """Test streaming ignores malformed trailing content after the response."""
+        truncated = EMPTY_SUCCESS_RESPONSE.replace(
+            "</soap12:Body>\n</soap12:Envelope>", "</soap12:Body><broken"
+        )
+
+        response = fast_parse_registry_response(truncated, streaming=True)
+
+        assert response.status == "Success"
+
+    def test_soap_fault_delegates_to_reference(self) -> None:
+        """Test SOAP fault responses produce the reference failure response."""
+        expected = parse_registry_response(SOAP_12_FAULT)
+
+        actual = fast_parse_registry_response(SOAP_12_FAULT, streaming=True)
+
+        assert actual.to_dict() == expected.to_dict()
+        assert actual.errors[0].error_code == "SOAP:soap:Sender"
+
+    def test_bytes_input(self, registry_xml: str) -> None:
+        """Test bytes input is accepted."""
+        response = fast_parse_registry_response(registry_xml.encode("utf-8"))
+
+        assert response.status in ("Success", "Failure", "PartialSuccess")
+
+    def test_malformed_xml_raises_value_error(self) -> None:
+        """Test malformed XML raises ValueError in both modes."""
+        for streaming in (False, True):
+            with pytest.raises(ValueError, match="Invalid registry response XML"):
+                fast_parse_registry_response("<soap12:Envelope", streaming=streaming)
+
+    def test_missing_registry_response_raises(self) -> None:
+        """Test missing RegistryResponse element raises ValueError."""
+        with pytest.raises(ValueError, match="No RegistryResponse element"):
+            fast_parse_registry_response("<Envelope/>", streaming=True)
+
+    def test_size_cap_rejects_oversized_body(self, registry_xml: str) -> None:
+        """Test bodies above max_bytes are rejected before parsing."""
+        with pytest.raises(ValueError, match="exceeds the 100 byte limit"):
+            fast_parse_registry_response(registry_xml, max_bytes=100)
+
+    def test_size_cap_can_be_disabled(self, registry_xml: str) -> None:
+        """Test max_bytes=None disables the size check."""
+        response = fast_parse_registry_response(registry_xml, max_bytes=None)
+
+        assert response.status
+
+    def test_does_not_write_registry_audit_log(self, mocker) -> None:
+        """Test the fast path skips the full-payload audit log."""
+        mock_log = mocker.patch(
+            "ihe_test_util.ihe_transactions.parsers.log_registry_response"
+        )
+        xml = (FIXTURES_DIR / "registry_response_success.xml").read_text(
+            encoding="utf-8"
+        )
+
+        fast_parse_registry_response(xml)
+
+        mock_log.assert_not_called()
+
+
+class TestFastParseAcknowledgment:
+    """Tests for fast_parse_acknowledgment."""
+
+    def test_matches_reference_parser(self) -> None:
+        """Test fast parser output equals reference output."""
+        expected = parse_acknowledgment(ACK_WITH_DETAILS_AND_IDS)
+
+        actual = fast_parse_acknowledgment(ACK_WITH_DETAILS_AND_IDS)
+
+        assert actual.to_dict() == expected.to_dict()
+        assert actual.patient_identifiers["patient_id"] == "PAT123456"
+        assert actual.details[1].text == "No detail message provided"
+
+    @pytest.mark.parametrize("status", ["AA", "AE", "AR", "CA", "CE", "CR"])
+    def test_status_codes(self, status: str) -> None:
+        """Test success flag for every status code."""
+        xml = ACK_WITH_DETAILS_AND_IDS.replace('code="AE"', f'code="{status}"')
+
+        response = fast_parse_acknowledgment(xml)
+
+        assert response.status == status
+        assert response.is_success is (status in ("AA", "CA"))
+
+    def test_unknown_status_code_warns(self, caplog: pytest.LogCaptureFixture) -> None:
+        """Test an unknown status code is logged like the reference parser does."""
+        xml = ACK_WITH_DETAILS_AND_IDS.replace('code="AE"', 'code="XX"')
+        expected = parse_acknowledgment(xml)
+
+        with caplog.at_level("WARNING", logger=fast_parsers.logger.name):
+            response = fast_parse_acknowledgment(xml)
+
+        assert response.to_dict() == expected.to_dict()
+        assert [record.getMessage() for record in caplog.records if record.name == fast_parsers.logger.name] == [
+            "Unknown acknowledgment status code 'XX'. Expected one of: AA, AE, AR, CA, CE, CR"
+        ]
+
+    def test_missing_type_code_raises(self) -> None:
+        """Test missing typeCode raises the reference error message."""
+        xml = ACK_WITH_DETAILS_AND_IDS.replace('<typeCode code="AE"/>', "")
+
+        with pytest.raises(ValueError, match="No typeCode element found"):
+            fast_parse_acknowledgment(xml)
+
+    def test_missing_acknowledgement_raises(self) -> None:
+        """Test missing acknowledgement element is reported by the reference parser."""
+        xml = '<MCCI_IN000002UV01 xmlns="urn:hl7-org:v3"><id root="1.2"/></MCCI_IN000002UV01>'
+
+        with pytest.raises(ValueError, match="No acknowledgement element found"):
+            fast_parse_acknowledgment(xml)
+
+    def test_foreign_namespace_falls_back(self) -> None:
+        """Test non-HL7 default namespace is delegated to the reference parser."""
+        xml = (
+            '<MCCI_IN000002UV01 xmlns="http://wrong-namespace.org">'
+            '<acknowledgement><typeCode code="AA"/></acknowledgement>'
+            "</MCCI_IN000002UV01>"
+        )
+
+        assert fast_parse_acknowledgment(xml).to_dict() == parse_acknowledgment(
+            xml
+        ).to_dict()
+
+    def test_malformed_xml_raises(self) -> None:
+        """Test malformed XML raises ValueError."""
+        with pytest.raises(ValueError, match="Invalid acknowledgment XML"):
+            fast_parse_acknowledgment("<MCCI_IN000002UV01")
+
+
+class TestFastParseSOAPFault:
+    """Tests for fast_parse_soap_fault."""
+
+    @pytest.mark.parametrize("fault_xml", [SOAP_12_FAULT, SOAP_11_FAULT])
+    def test_matches_reference_parser(self, fault_xml: str) -> None:
+        """Test SOAP 1.1 and 1.2 faults match the reference parser."""
+        assert fast_parse_soap_fault(fault_xml) == parse_soap_fault(fault_xml)
+
+    def test_not_a_fault_raises(self) -> None:
+        """Test non-fault envelope raises ValueError."""
+        with pytest.raises(ValueError, match="No SOAP Fault element found"):
+            fast_parse_soap_fault(EMPTY_SUCCESS_RESPONSE)
+
+
+class TestHardenedParser:
+    """Tests for the reusable hardened parser."""
+
+    def test_parser_reused_within_thread(self) -> None:
+        """Test the same parser instance is returned on one thread."""
+        assert get_hardened_parser() is get_hardened_parser()
+
+    def test_parser_is_per_thread(self) -> None:
+        """Test each thread gets its own parser instance."""
+        other = []
+        thread = threading.Thread(target=lambda: other.append(get_hardened_parser()))
+        thread.start()
+        thread.join()
+
+        assert other[0] is not get_hardened_parser()
+
+    def test_external_entities_not_resolved(self, tmp_path: Path) -> None:
+        """Test external entities are not expanded into parsed content."""
+        secret = tmp_path / "secret.txt"
+        secret.write_text("TOP-SECRET", encoding="utf-8")
+        xml = (
+            f'<!DOCTYPE r [<!ENTITY xxe SYSTEM "file://{secret.as_posix()}">]>'
+            '<soap12:Envelope xmlns:soap12="http://www.w3.org/2003/05/soap-envelope"'
+            ' xmlns:wsa="http://www.w3.org/2005/08/addressing"'
+            ' xmlns:rs="urn:oasis:names:tc:ebxml-regrep:xsd:rs:3.0">'
+            "<soap12:Header><wsa:MessageID>&xxe;</wsa:MessageID></soap12:Header>"
+            '<soap12:Body><rs:RegistryResponse status="urn:oasis:names:tc:'
+            'ebxml-regrep:ResponseStatusType:Success"/></soap12:Body>'
+            "</soap12:Envelope>"
+        )
+
+        response = fast_parsers.fast_parse_registry_response(xml)
+
+        assert "TOP-SECRET" not in (response.response_id or "")
@@ -14,7 +14,7 @@ import pytest
 from requests import ConnectionError, Timeout
 from requests.exceptions import SSLError
 
-from ihe_test_util.config.schema import Config
+from ihe_test_util.config.schema import Config, EndpointsConfig
 from ihe_test_util.ihe_transactions.workflows import (
     IntegratedWorkflow,
     generate_integrated_workflow_summary,
@@ -38,9 +38,10 @@ def mock_config():
     config = Mock(spec=Config)
     
     # Endpoints
-    config.endpoints = Mock()
-    config.endpoints.pix_add_url = "https://pix.example.com/pix/add"
-    config.endpoints.iti41_url = "https://xds.example.com/xdsrepository"
+    config.endpoints = EndpointsConfig(
+        pix_add_url="https://pix.example.com/pix/add",
+        iti41_url="https://xds.example.com/xdsrepository",
+    )
     
     # SAML configuration
     config.saml = Mock()
@@ -403,6 +404,49 @@ class TestIntegratedWorkflowProcessPatient:
         # Verify ITI-41 client was never called
         mock_iti41_client.return_value.submit_document.assert_not_called()
 
+    @patch('ihe_test_util.ihe_transactions.workflows.PIXAddWorkflow')
+    @patch('ihe_test_util.ihe_transactions.workflows.ITI41SOAPClient')
+    @patch('ihe_test_util.ihe_transactions.workflows.TemplatePersonalizer')
+    @patch('ihe_test_util.ihe_transactions.workflows.XDSbMetadataBuilder')
+    @patch('pathlib.Path.exists')
+    def test_process_patient_iti41_only_uses_prior_pix_result(
+        self,
+        mock_exists,
+        mock_metadata_builder,
+        mock_personalizer,
+        mock_iti41_client,
+        mock_pix_workflow,
+        mock_config,
+        sample_patient,
+        sample_saml_assertion,
+    ):
+        """Test that ITI-41 only mode skips PIX Add when a prior success exists."""
+        from ihe_test_util.config.schema import BatchConfig
+
+        mock_exists.return_value = True
+        mock_personalizer.return_value.personalize.return_value = "<ClinicalDocument>...</ClinicalDocument>"
+        mock_metadata_builder.return_value.build.return_value = etree.Element("SubmitObjectsRequest")
+        mock_iti41_response = Mock()
+        mock_iti41_response.is_success = True
+        mock_iti41_response.extracted_identifiers = {"document_ids": ["1.2.3.4.5"]}
+        mock_iti41_response.error_messages = []
+        mock_iti41_response.status_code = "Success"
+        mock_iti41_client.return_value.submit.return_value = mock_iti41_response
+
+        batch_config = BatchConfig(
+            iti41_only_mode=True,
+            pix_results_lookup={
+                "PAT001": {"pix_add_status": "success", "pix_enterprise_id": "EID123456"}
+            },
+        )
+        workflow = IntegratedWorkflow(mock_config, Path("templates/ccd-template.xml"), batch_config)
+        result = workflow.process_patient(sample_patient, sample_saml_assertion)
+
+        assert result.pix_add_status == "skipped"
+        assert result.pix_enterprise_id == "EID123456"
+        assert result.iti41_status == "success"
+        mock_pix_workflow.return_value.process_patient.assert_not_called()
+
 
 class TestIntegratedWorkflowProcessBatch:
     """Test IntegratedWorkflow.process_batch method."""
@@ -25,6 +25,7 @@ from ihe_test_util.ihe_transactions.iti41_client import (
     MAX_RETRIES,
     RETRY_DELAYS,
 )
+from ihe_test_util.ihe_transactions.parsers import parse_registry_response
 from ihe_test_util.models.ccd import CCDDocument
 from ihe_test_util.models.saml import SAMLAssertion, SAMLGenerationMethod
 from ihe_test_util.models.responses import TransactionStatus, TransactionType
@@ -872,6 +873,74 @@ class TestResponseParsing:
         assert status == TransactionStatus.ERROR
 
 
+class TestClientParsingPath:
+    """Tests that submit() parses responses with the fast-path parser."""
+
+    @patch("ihe_test_util.ihe_transactions.parsers.log_registry_response")
+    @patch("ihe_test_util.ihe_transactions.parsers.parse_registry_response")
+    @patch.object(ITI41SOAPClient, "_submit_with_retry")
+    def test_success_response_uses_fast_parser(
+        self,
+        mock_submit: MagicMock,
+        mock_reference_parser: MagicMock,
+        mock_log_registry_response: MagicMock,
+        client: ITI41SOAPClient,
+        mock_iti41_transaction: ITI41Transaction,
+        mock_saml_assertion: SAMLAssertion,
+    ) -> None:
+        """Test a success response skips the reference parser and payload audit log."""
+        # Arrange
+        mock_response = Mock()
+        mock_response.text = f"""<?xml version="1.0"?>
+<soap12:Envelope xmlns:soap12="{SOAP12_NS}">
+    <soap12:Body>
+        <rs:RegistryResponse xmlns:rs="{RS_NS}" status="{REGISTRY_SUCCESS}"/>
+    </soap12:Body>
+</soap12:Envelope>"""
+        mock_submit.return_value = mock_response
+
+        # Act
+        response = client.submit(mock_iti41_transaction, mock_saml_assertion)
+
+        # Assert
+        assert response.status == TransactionStatus.SUCCESS
+        mock_reference_parser.assert_not_called()
+        mock_log_registry_response.assert_not_called()
+
+    @patch.object(ITI41SOAPClient, "_submit_with_retry")
+    def test_soap_fault_falls_back_to_reference_parser(
+        self,
+        mock_submit: MagicMock,
+        client: ITI41SOAPClient,
+        mock_iti41_transaction: ITI41Transaction,
+        mock_saml_assertion: SAMLAssertion,
+    ) -> None:
+        """Test a SOAP fault is still parsed by the reference parser."""
+        # Arrange
+        mock_response = Mock()
+        mock_response.text = f"""<?xml version="1.0"?>
+<soap12:Envelope xmlns:soap12="{SOAP12_NS}">
+    <soap12:Body>
+        <soap12:Fault>
+            <soap12:Code><soap12:Value>soap12:Sender</soap12:Value></soap12:Code>
+            <soap12:Reason><soap12:Text>Invalid request format</soap12:Text></soap12:Reason>
+        </soap12:Fault>
+    </soap12:Body>
+</soap12:Envelope>"""
+        mock_submit.return_value = mock_response
+
+        # Act
+        with patch(
+            "ihe_test_util.ihe_transactions.parsers.parse_registry_response",
+            wraps=parse_registry_response,
+        ) as mock_reference_parser:
+            response = client.submit(mock_iti41_transaction, mock_saml_assertion)
+
+        # Assert
+        assert response.status == TransactionStatus.ERROR
+        mock_reference_parser.assert_called_once()
+
+
 # === Test: Properties ===
 
 
@@ -0,0 +1,170 @@
+"""Unit tests for client-side endpoint load balancing."""
+
+from collections import Counter
+
+import pytest
+import requests
+
+from ihe_test_util.transport.load_balancer import BalancingStrategy, EndpointPool
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _pool(strategy=BalancingStrategy.ROUND_ROBIN, weights=(1, 1, 1), clock=None, **kwargs):
+    endpoints = [(f"http://node-{i}/pix", weight) for i, weight in enumerate(weights)]
+    return EndpointPool("pix_add", endpoints, strategy=strategy, clock=clock or FakeClock(), **kwargs)
+
+
+def _pick(pool) -> str:
+    with pool.lease() as lease:
+        return lease.url
+
+
+def _fail(pool, times: int) -> None:
+    for _ in range(times):
+        with pool.lease() as lease:
+            lease.fail()
+
+
+class TestSelection:
+    """Test endpoint selection strategies."""
+
+    def test_round_robin_rotates(self):
+        pool = _pool()
+
+        assert [_pick(pool)[-5:] for _ in range(4)] == ["0/pix", "1/pix", "2/pix", "0/pix"]
+
+    def test_weighted_is_proportional_and_interleaved(self):
+        # Arrange
+        pool = _pool(BalancingStrategy.WEIGHTED, weights=(1, 3))
+
+        # Act
+        picks = [_pick(pool) for _ in range(8)]
+
+        # Assert
+        assert Counter(picks) == {"http://node-0/pix": 2, "http://node-1/pix": 6}
+        # Smooth weighting never sends the light node two in a row
+        assert all(not (a == b == "http://node-0/pix") for a, b in zip(picks, picks[1:]))
+
+    def test_least_outstanding_avoids_busy_endpoint(self):
+        # Arrange
+        pool = _pool(BalancingStrategy.LEAST_OUTSTANDING, weights=(1, 1))
+        busy = pool.acquire()
+
+        # Act
+        picks = {_pick(pool) for _ in range(3)}
+
+        # Assert
+        assert picks == {"http://node-1/pix"} != {busy.url}
+        pool.release(busy, 1.0)
+
+    def test_sessions_are_per_endpoint(self):
+        pool = _pool()
+
+        assert len({id(session) for session in pool.sessions}) == 3
+
+    def test_invalid_configuration(self):
+        with pytest.raises(ValueError, match="No endpoints"):
+            EndpointPool("iti41", [])
+        with pytest.raises(ValueError, match="weight"):
+            EndpointPool("iti41", [("http://a/iti41", 0)])
+
+
+class TestHealth:
+    """Test failure tracking and ejection."""
+
+    def test_consecutive_failures_eject_until_timeout(self):
+        # Arrange
+        clock = FakeClock()
+        pool = _pool(weights=(1, 1), clock=clock, failure_threshold=2, ejection_seconds=10)
+
+        # Act: node-0 fails twice in a row (node-1 requests in between succeed)
+        for _ in range(2):
+            with pool.lease() as lease:
+                assert lease.url == "http://node-0/pix"
+                lease.fail()
+            assert _pick(pool) == "http://node-1/pix"
+
+        # Assert
+        assert {_pick(pool) for _ in range(4)} == {"http://node-1/pix"}
+        assert [(s.ejections, s.healthy) for s in pool.stats()] == [(1, False), (0, True)]
+        clock.now += 10
+        assert {_pick(pool) for _ in range(2)} == {"http://node-0/pix", "http://node-1/pix"}
+
+    def test_failure_after_ejection_ejects_again(self):
+        """Test a returning endpoint is on probation: one failure ejects it again."""
+        # Arrange
+        clock = FakeClock()
+        pool = _pool(weights=(1, 1), clock=clock, failure_threshold=2, ejection_seconds=5)
+
+        def request():
+            with pool.lease() as lease:
+                if lease.url == "http://node-0/pix":
+                    lease.fail()
+
+        for _ in range(4):
+            request()
+        assert pool.stats()[0].ejections == 1
+
+        # Act
+        clock.now += 5
+        for _ in range(2):
+            request()
+
+        # Assert
+        assert pool.stats()[0].ejections == 2
+        assert not pool.stats()[0].healthy
+
+    def test_success_resets_failure_count(self):
+        pool = _pool(weights=(1, 1), failure_threshold=2)
+
+        _fail(pool, 2)   # one failure on each node
+        _pick(pool)      # node-0 succeeds
+        _fail(pool, 2)   # node-1 reaches 2 consecutive failures, node-0 only 1
+
+        assert [s.ejections for s in pool.stats()] == [0, 1]
+
+    def test_all_ejected_uses_first_due_back(self):
+        # Arrange
+        clock = FakeClock()
+        pool = _pool(weights=(1, 1), clock=clock, failure_threshold=1, ejection_seconds=10)
+        _fail(pool, 1)
+        clock.now += 1
+        _fail(pool, 1)
+
+        # Act & Assert
+        assert _pick(pool) == "http://node-0/pix"
+        assert [s.healthy for s in pool.stats()] == [True, False]
+
+    def test_single_endpoint_is_never_ejected(self):
+        pool = _pool(weights=(1,), failure_threshold=1)
+
+        _fail(pool, 5)
+
+        assert pool.stats()[0].healthy
+        assert pool.stats()[0].failures == 5
+
+    def test_connection_error_counts_as_failure(self):
+        # Arrange
+        pool = _pool(weights=(1,))
+
+        # Act
+        with pytest.raises(requests.ConnectionError):
+            with pool.lease():
+                raise requests.ConnectionError("refused")
+        with pytest.raises(ValueError):
+            with pool.lease():
+                raise ValueError("not a transport error")
+
+        # Assert
+        stats = pool.stats()[0]
+        assert (stats.requests, stats.failures) == (2, 1)
+        assert stats.to_dict()["avg_time_ms"] >= 0
@@ -0,0 +1,120 @@
+"""Unit tests for the load-generation latency histogram."""
+
+import pytest
+
+from ihe_test_util.load.histogram import (
+    LatencyHistogram,
+    bucket_index,
+    bucket_upper_bound,
+)
+
+
+class TestBuckets:
+    """Test bucket index and bound arithmetic."""
+
+    def test_small_values_are_exact(self):
+        for value in range(128):
+            assert bucket_upper_bound(bucket_index(value)) == value
+
+    @pytest.mark.parametrize("value", [128, 1_000, 12_345, 999_999, 3_600_000_000])
+    def test_large_values_within_relative_error(self, value):
+        upper = bucket_upper_bound(bucket_index(value))
+
+        assert value <= upper
+        assert (upper - value) / value <= 1 / 64
+
+    def test_indexes_are_monotonic(self):
+        indexes = [bucket_index(value) for value in range(0, 200_000, 7)]
+
+        assert indexes == sorted(indexes)
+
+
+class TestLatencyHistogram:
+    """Test recording, percentiles and coordinated-omission correction."""
+
+    def test_percentiles_of_uniform_values(self):
+        # Arrange
+        histogram = LatencyHistogram()
+        for value_ms in range(1, 1001):
+            histogram.record(value_ms * 1000)
+
+        # Act
+        summary = histogram.summary()
+
+        # Assert
+        assert summary.count == 1000
+        assert summary.min_ms == 1.0
+        assert summary.max_ms == 1000.0
+        assert summary.p50_ms == pytest.approx(500, rel=0.02)
+        assert summary.p99_ms == pytest.approx(990, rel=0.02)
+        assert summary.mean_ms == pytest.approx(500.5)
+
+    def test_percentile_capped_at_max(self):
+        histogram = LatencyHistogram()
+        histogram.record(1_000_001)
+
+        assert histogram.percentile(100) == 1_000_001
+
+    def test_empty_histogram_summary(self):
+        summary = LatencyHistogram().summary()
+
+        assert summary.count == 0
+        assert summary.p99_ms == 0.0
+
+    def test_negative_values_count_as_zero(self):
+        histogram = LatencyHistogram()
+        histogram.record(-5)
+
+        assert histogram.min == 0
+        assert histogram.count == 1
+
+    def test_record_corrected_back_fills_missing_samples(self):
+        # Arrange: a 1s stall while requests were due every 100ms
+        histogram = LatencyHistogram()
+
+        # Act
+        histogram.record_corrected(1_000_000, 100_000)
+
+        # Assert: 1000ms plus 900ms, 800ms ... 100ms
+        assert histogram.count == 10
+        assert histogram.min == 100_000
+        assert histogram.max == 1_000_000
+
+    def test_corrected_copy_matches_record_corrected(self):
+        # Arrange
+        plain = LatencyHistogram()
+        direct = LatencyHistogram()
+        for value in (5_000, 20_000, 100_000, 450_000):
+            plain.record(value)
+            direct.record_corrected(value, 10_000)
+
+        # Act
+        corrected = plain.corrected_copy(10_000)
+
+        # Assert
+        assert corrected.count == direct.count
+        assert corrected.percentile(50) == pytest.approx(direct.percentile(50), rel=0.02)
+        assert plain.count == 4
+
+    def test_corrected_copy_without_interval_is_plain_copy(self):
+        histogram = LatencyHistogram()
+        histogram.record(50_000)
+
+        assert histogram.corrected_copy(0).count == 1
+
+    def test_merge(self):
+        # Arrange
+        first = LatencyHistogram()
+        second = LatencyHistogram()
+        first.record(2_000)
+        second.record(1_000)
+        second.record(9_000_000)
+
+        # Act
+        first.merge(second)
+
+        # Assert
+        assert first.count == 3
+        assert first.min == 1_000
+        assert first.max == 9_000_000
+        assert first.total == 9_003_000
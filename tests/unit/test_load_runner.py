@@ -0,0 +1,421 @@
+"""Unit tests for load profiles, the load runner and the load command."""
+
+import json
+import threading
+import time
+from datetime import date
+from unittest.mock import Mock, patch
+
+import pytest
+from click.testing import CliRunner
+
+from ihe_test_util.cli.load_commands import load
+from ihe_test_util.load.profile import LoadPhase, LoadProfile, PhaseKind, parse_duration
+from ihe_test_util.load.runner import (
+    AssertionCache,
+    LoadMode,
+    LoadRunner,
+    LoadTransaction,
+    PatientSource,
+    TransactionOutcome,
+    _outcome_from_result,
+    build_workflow_transaction,
+)
+from ihe_test_util.models.batch import PatientWorkflowResult
+from ihe_test_util.models.patient import PatientDemographics
+
+
+@pytest.fixture
+def template_patient():
+    """Patient to recycle."""
+    return PatientDemographics(
+        patient_id="PAT001",
+        patient_id_oid="1.2.3.4",
+        first_name="John",
+        last_name="Doe",
+        dob=date(1980, 1, 1),
+        gender="M",
+    )
+
+
+class TestLoadProfile:
+    """Test phase parsing and arrival schedules."""
+
+    @pytest.mark.parametrize(
+        "text,seconds",
+        [("90", 90.0), ("90s", 90.0), ("500ms", 0.5), ("5m", 300.0), ("1.5h", 5400.0)],
+    )
+    def test_parse_duration(self, text, seconds):
+        assert parse_duration(text) == seconds
+
+    @pytest.mark.parametrize("text", ["", "abc", "5d", "0s", "-1s"])
+    def test_parse_duration_invalid(self, text):
+        with pytest.raises(ValueError):
+            parse_duration(text)
+
+    def test_parse_ramp_phase(self):
+        phase = LoadPhase.parse("ramp:2m:0-50")
+
+        assert phase.kind == PhaseKind.RAMP
+        assert phase.duration_seconds == 120.0
+        assert (phase.start_level, phase.end_level) == (0.0, 50.0)
+        assert phase.label == "ramp 0-50 for 120s"
+
+    @pytest.mark.parametrize(
+        "spec",
+        ["steady:1m", "hold:1m:5", "steady:1m:abc", "steady:1m:5-10", "ramp:1m:-5"],
+    )
+    def test_parse_phase_invalid(self, spec):
+        with pytest.raises(ValueError):
+            LoadPhase.parse(spec)
+
+    def test_steady_arrivals_are_evenly_spaced(self):
+        offsets = list(LoadPhase.parse("steady:2s:5").arrival_offsets())
+
+        assert len(offsets) == 10
+        assert offsets[0] == pytest.approx(0.2)
+        assert offsets[-1] == pytest.approx(2.0)
+
+    def test_ramp_arrivals_follow_integrated_rate(self):
+        # Arrange: 0 -> 20/s over 10s integrates to 100 arrivals
+        phase = LoadPhase.parse("ramp:10s:0-20")
+
+        # Act
+        offsets = list(phase.arrival_offsets())
+
+        # Assert: a quarter of the arrivals in the first half
+        assert len(offsets) == 100
+        assert sum(1 for offset in offsets if offset <= 5.0) == 25
+        assert offsets == sorted(offsets)
+
+    def test_zero_rate_phase_has_no_arrivals(self):
+        assert list(LoadPhase.parse("steady:10s:0").arrival_offsets()) == []
+
+    def test_profile_arrivals_and_phase_lookup(self):
+        profile = LoadProfile.parse(["steady:1s:2", "spike:1s:4"])
+
+        arrivals = list(profile.arrivals())
+
+        assert [index for _, index in arrivals] == [0, 0, 1, 1, 1, 1]
+        assert arrivals[2][0] == pytest.approx(1.25)
+        assert profile.duration_seconds == 2.0
+        assert profile.peak_level == 4.0
+        assert profile.phase_at(1.5) == (1, 4.0)
+        assert profile.phase_at(2.0) is None
+
+    def test_profile_requires_a_phase(self):
+        with pytest.raises(ValueError):
+            LoadProfile.parse([])
+
+
+class TestPatientSource:
+    """Test patient synthesis and recycling."""
+
+    def test_synthesised_patients_get_sequential_ids(self):
+        source = PatientSource(patient_id_oid="9.9.9", id_prefix="T-", seed=1)
+
+        first, second = source.next(), source.next()
+
+        assert (first.patient_id, second.patient_id) == ("T-00000001", "T-00000002")
+        assert first.patient_id_oid == "9.9.9"
+        assert first.gender in ("M", "F")
+
+    def test_seed_makes_demographics_repeatable(self):
+        first = PatientSource(id_prefix="T-", seed=7).next()
+        second = PatientSource(id_prefix="T-", seed=7).next()
+
+        assert first == second
+
+    def test_recycled_patients_get_fresh_ids(self, template_patient):
+        source = PatientSource(templates=[template_patient], id_prefix="R-")
+
+        patients = [source.next() for _ in range(3)]
+
+        assert [p.patient_id for p in patients] == ["R-00000001", "R-00000002", "R-00000003"]
+        assert all(p.last_name == "Doe" for p in patients)
+
+    def test_reuse_ids_keeps_template(self, template_patient):
+        source = PatientSource(templates=[template_patient], reuse_ids=True)
+
+        assert source.next() is template_patient
+
+    def test_empty_templates_rejected(self):
+        with pytest.raises(ValueError):
+            PatientSource(templates=[])
+
+
+class TestAssertionCache:
+    """Test SAML assertion reuse."""
+
+    def test_reuses_until_refresh(self):
+        generate = Mock(side_effect=["first", "second"])
+        cache = AssertionCache(generate, refresh_seconds=3600)
+
+        assert cache.get() == "first"
+        assert cache.get() == "first"
+        assert generate.call_count == 1
+
+    def test_regenerates_after_refresh(self):
+        generate = Mock(side_effect=["first", "second"])
+        cache = AssertionCache(generate, refresh_seconds=0)
+
+        cache.get()
+
+        assert cache.get() == "second"
+
+
+class TestWorkflowTransaction:
+    """Test the IntegratedWorkflow adapter."""
+
+    def test_workflow_outcome_records_step_timings(self):
+        result = PatientWorkflowResult(
+            patient_id="P1",
+            pix_add_status="success",
+            iti41_status="success",
+            pix_add_time_ms=40,
+            iti41_time_ms=60,
+        )
+
+        outcome = _outcome_from_result(result, LoadTransaction.WORKFLOW)
+
+        assert outcome.success is True
+        assert outcome.timings_ms == {"pix_add": 40.0, "iti41": 60.0}
+
+    def test_failed_pix_add_reports_error_message(self):
+        result = PatientWorkflowResult(
+            patient_id="P1",
+            pix_add_status="failed",
+            pix_add_message="PIX Add failed",
+            error_message="Connection refused",
+        )
+
+        outcome = _outcome_from_result(result, LoadTransaction.PIX_ADD)
+
+        assert outcome.success is False
+        assert outcome.error == "Connection refused"
+
+    def test_iti41_registers_patient_for_the_call_only(self, template_patient):
+        # Arrange
+        workflow = Mock()
+        workflow.batch_config.pix_results_lookup = {}
+        seen = {}
+
+        def process_patient(patient, assertion):
+            seen.update(workflow.batch_config.pix_results_lookup)
+            return PatientWorkflowResult(patient_id=patient.patient_id, iti41_status="success")
+
+        workflow.process_patient.side_effect = process_patient
+        run = build_workflow_transaction(
+            workflow, LoadTransaction.ITI41, AssertionCache(lambda: "assertion")
+        )
+
+        # Act
+        outcome = run(template_patient)
+
+        # Assert
+        assert outcome.success is True
+        assert seen["PAT001"]["pix_add_status"] == "success"
+        assert workflow.batch_config.pix_results_lookup == {}
+
+
+class TestLoadRunner:
+    """Test open- and closed-loop runs with a fake transaction."""
+
+    def test_open_loop_sends_every_arrival(self):
+        # Arrange
+        calls = []
+        lock = threading.Lock()
+
+        def transaction(patient):
+            with lock:
+                calls.append(patient.patient_id)
+            return TransactionOutcome(success=True)
+
+        runner = LoadRunner(
+            transaction,
+            PatientSource(id_prefix="T-"),
+            LoadProfile.parse(["steady:500ms:40"]),
+            mode=LoadMode.OPEN,
+            max_in_flight=4,
+        )
+
+        # Act
+        report = runner.run()
+
+        # Assert
+        assert report.completed == 20
+        assert report.failed == 0
+        assert report.dropped == 0
+        assert len(set(calls)) == 20
+        assert report.phases[0].completed == 20
+        assert report.corrected_latency.count == 20
+        assert report.interrupted is False
+
+    def test_open_loop_drops_arrivals_when_saturated(self):
+        # Arrange: one sender and a slow endpoint
+        release = threading.Event()
+
+        def transaction(patient):
+            release.wait(2)
+            return TransactionOutcome(success=True)
+
+        runner = LoadRunner(
+            transaction,
+            PatientSource(id_prefix="T-"),
+            LoadProfile.parse(["steady:300ms:50"]),
+            mode=LoadMode.OPEN,
+            max_in_flight=1,
+        )
+        threading.Timer(0.5, release.set).start()
+
+        # Act
+        report = runner.run()
+
+        # Assert: at most two outstanding, the rest dropped
+        assert report.completed == 2
+        assert report.dropped == 13
+        assert report.phases[0].dropped == 13
+
+    def test_failures_are_counted_by_message(self):
+        def transaction(patient):
+            if patient.patient_id.endswith("1"):
+                raise RuntimeError("boom")
+            return TransactionOutcome(success=False, error="AE: duplicate")
+
+        runner = LoadRunner(
+            transaction,
+            PatientSource(id_prefix="T-"),
+            LoadProfile.parse(["steady:1s:10"]),
+            mode=LoadMode.OPEN,
+        )
+
+        report = runner.run()
+
+        assert report.failed == 10
+        assert report.errors == {"AE: duplicate": 9, "RuntimeError: boom": 1}
+
+    def test_closed_loop_runs_virtual_users(self):
+        # Arrange
+        active = set()
+        peak = []
+        lock = threading.Lock()
+
+        def transaction(patient):
+            with lock:
+                active.add(threading.current_thread().name)
+                peak.append(len(active))
+            time.sleep(0.01)
+            with lock:
+                active.discard(threading.current_thread().name)
+            return TransactionOutcome(success=True, timings_ms={"pix_add": 10.0})
+
+        runner = LoadRunner(
+            transaction,
+            PatientSource(id_prefix="T-"),
+            LoadProfile.parse(["steady:400ms:3"]),
+            mode=LoadMode.CLOSED,
+        )
+
+        # Act
+        report = runner.run()
+
+        # Assert
+        assert report.mode == "closed"
+        assert report.completed > 10
+        assert max(peak) <= 3
+        assert set(report.service_latency) == {"pix_add", "total"}
+        assert report.corrected_latency.count >= report.completed
+
+    def test_stop_ends_run_early(self):
+        runner = LoadRunner(
+            lambda patient: TransactionOutcome(success=True),
+            PatientSource(id_prefix="T-"),
+            LoadProfile.parse(["steady:1h:5"]),
+            mode=LoadMode.OPEN,
+        )
+        threading.Timer(0.3, runner.stop).start()
+
+        report = runner.run()
+
+        assert report.interrupted is True
+        assert report.duration_seconds < 5
+
+    def test_progress_callback_receives_snapshots(self):
+        snapshots = []
+        runner = LoadRunner(
+            lambda patient: TransactionOutcome(success=True),
+            PatientSource(id_prefix="T-"),
+            LoadProfile.parse(["steady:500ms:20"]),
+            progress_callback=snapshots.append,
+            progress_interval_seconds=0.1,
+        )
+
+        runner.run()
+
+        assert snapshots
+        assert snapshots[0].phase == "steady 20 for 0.5s"
+
+    def test_report_is_json_serialisable(self):
+        runner = LoadRunner(
+            lambda patient: TransactionOutcome(success=True),
+            PatientSource(id_prefix="T-"),
+            LoadProfile.parse(["steady:200ms:10"]),
+        )
+
+        data = json.loads(json.dumps(runner.run().to_dict()))
+
+        assert data["completed"] == 2
+        assert data["phases"][0]["latency"]["count"] == 2
+
+
+class TestLoadCommand:
+    """Test the load CLI command."""
+
+    def test_invalid_phase_is_usage_error(self):
+        result = CliRunner().invoke(load, ["--phase", "steady:1m"])
+
+        assert result.exit_code == 2
+        assert "Invalid phase" in result.output
+
+    @patch("ihe_test_util.cli.load_commands.IntegratedWorkflow")
+    @patch("ihe_test_util.cli.load_commands._load_config_with_overrides")
+    def test_pix_add_run_writes_report(self, mock_load_config, mock_workflow_class, tmp_path):
+        # Arrange
+        mock_load_config.return_value.endpoints.pix_add_url = "https://pix.example.com/pix/add"
+        mock_load_config.return_value.endpoints.iti41_url = "https://xds.example.com/iti41"
+        workflow = mock_workflow_class.return_value
+        workflow.batch_config.pix_results_lookup = None
+        workflow.process_patient.side_effect = lambda patient, assertion: PatientWorkflowResult(
+            patient_id=patient.patient_id, pix_add_status="success"
+        )
+        report_path = tmp_path / "report.json"
+
+        # Act
+        result = CliRunner().invoke(
+            load,
+            ["-t", "pix-add", "--phase", "steady:300ms:10", "--report", str(report_path), "-q"],
+        )
+
+        # Assert
+        assert result.exit_code == 0, result.output
+        assert "LOAD TEST REPORT" in result.output
+        batch_config = mock_workflow_class.call_args[0][2]
+        assert batch_config.pix_only_mode is True
+        report = json.loads(report_path.read_text())
+        assert report["transaction"] == "pix-add"
+        assert report["completed"] == 3
+
+    @patch("ihe_test_util.cli.load_commands.IntegratedWorkflow")
+    @patch("ihe_test_util.cli.load_commands._load_config_with_overrides")
+    def test_failures_exit_with_code_2(self, mock_load_config, mock_workflow_class):
+        mock_load_config.return_value.endpoints.pix_add_url = "https://pix.example.com/pix/add"
+        mock_load_config.return_value.endpoints.iti41_url = "https://xds.example.com/iti41"
+        workflow = mock_workflow_class.return_value
+        workflow.process_patient.side_effect = lambda patient, assertion: PatientWorkflowResult(
+            patient_id=patient.patient_id, pix_add_status="failed", pix_add_message="AE"
+        )
+
+        result = CliRunner().invoke(load, ["-t", "pix-add", "--phase", "steady:200ms:10", "-q"])
+
+        assert result.exit_code == 2
+        assert "AE" in result.output
@@ -2,7 +2,9 @@
 
 import logging
 import os
+import random
 import re
+import threading
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -11,10 +13,21 @@ import pytest
 from ihe_test_util.logging_audit import (
     PIIRedactingFormatter,
     configure_logging,
+    flush_logging,
     get_logger,
     log_audit_event,
     log_transaction,
 )
+from ihe_test_util.logging_audit.formatters import (
+    REDACTION_PATTERNS,
+    OversizePolicy,
+    PIIRedactor,
+)
+from ihe_test_util.logging_audit.logger import (
+    DeferredQueueHandler,
+    get_log_handlers,
+    stop_logging,
+)
 
 
 class TestConfigureLogging:
@@ -32,6 +45,7 @@ class TestConfigureLogging:
 
         # Assert
         assert log_file.exists()
+        flush_logging()
         content = log_file.read_text()
         assert "Test message" in content
 
@@ -48,11 +62,11 @@ class TestConfigureLogging:
         logger.warning("Warning message")
 
         # Assert - file should have both, verify via file content
+        flush_logging()
         file_content = log_file.read_text()
         assert "Info message" not in file_content or "WARNING" in file_content
         # Just verify the log level was set correctly by checking handler
-        root_logger = logging.getLogger()
-        console_handler = [h for h in root_logger.handlers if isinstance(h, logging.StreamHandler) and not hasattr(h, 'baseFilename')][0]
+        console_handler = [h for h in get_log_handlers() if isinstance(h, logging.StreamHandler) and not hasattr(h, 'baseFilename')][0]
         assert console_handler.level == logging.WARNING
 
     def test_configure_logging_file_level_debug(self, tmp_path):
@@ -67,6 +81,7 @@ class TestConfigureLogging:
         logger.info("Info message")
 
         # Assert - both messages in file
+        flush_logging()
         content = log_file.read_text()
         assert "Debug message" in content
         assert "Info message" in content
@@ -107,6 +122,7 @@ class TestConfigureLogging:
 
         # Assert
         assert env_log_file.exists()
+        flush_logging()
         assert "Test message" in env_log_file.read_text()
 
     def test_configure_logging_cli_overrides_environment(self, tmp_path, monkeypatch):
@@ -124,6 +140,7 @@ class TestConfigureLogging:
         # Assert
         assert cli_log_file.exists()
         assert not env_log_file.exists()
+        flush_logging()
         assert "Test message" in cli_log_file.read_text()
 
     def test_configure_logging_idempotent(self, tmp_path):
@@ -138,6 +155,7 @@ class TestConfigureLogging:
         logger.debug("Test message")
 
         # Assert - no errors, DEBUG level active
+        flush_logging()
         content = log_file.read_text()
         assert "Test message" in content
 
@@ -152,6 +170,7 @@ class TestConfigureLogging:
         logger.info("Test message")
 
         # Assert - format: timestamp - module - level - message
+        flush_logging()
         content = log_file.read_text()
         pattern = r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3} - .+ - INFO - Test message"
         assert re.search(pattern, content)
@@ -165,9 +184,8 @@ class TestConfigureLogging:
         configure_logging(level="INFO", log_file=log_file, redact_pii=False)
 
         # Assert - check handler configuration
-        root_logger = logging.getLogger()
         file_handler = None
-        for handler in root_logger.handlers:
+        for handler in get_log_handlers():
             if hasattr(handler, "maxBytes"):
                 file_handler = handler
                 break
@@ -287,6 +305,139 @@ class TestPIIRedactingFormatter:
         assert "[NAME-REDACTED]" in result
         assert "[SSN-REDACTED]" in result
 
+    def test_custom_patterns_are_applied(self):
+        """Test patterns added to the formatter are honored alongside the defaults."""
+        # Arrange
+        formatter = PIIRedactingFormatter(redact_pii=True)
+        formatter.patterns.append((re.compile(r"MRN\d{6}"), "[MRN-REDACTED]"))
+        record = logging.LogRecord(
+            name="test",
+            level=logging.INFO,
+            pathname="",
+            lineno=0,
+            msg="MRN123456 SSN 123-45-6789 name=John Doe",
+            args=(),
+            exc_info=None,
+        )
+
+        # Act
+        result = formatter.format(record)
+
+        # Assert
+        assert result.endswith("[MRN-REDACTED] SSN [SSN-REDACTED] name=[NAME-REDACTED]")
+
+    def test_custom_patterns_respect_size_limit(self):
+        # Arrange
+        formatter = PIIRedactingFormatter(fmt="%(message)s", redact_pii=True, max_redact_chars=100)
+        formatter.patterns = [(re.compile(r"secret-\w+"), "[REDACTED]")]
+        record = logging.LogRecord(
+            name="test",
+            level=logging.INFO,
+            pathname="",
+            lineno=0,
+            msg="x" * 95 + " secret-token " + "y" * 500,
+            args=(),
+            exc_info=None,
+        )
+
+        # Act
+        result = formatter.format(record)
+
+        # Assert
+        assert "secret" not in result
+        assert result.startswith("x" * 95 + " [RED")
+        assert result.endswith("[TRUNCATED: 609 chars total]")
+
+
+def _redact_sequentially(text):
+    """Reference: apply each redaction pattern in turn, as before the redactor."""
+    for pattern, replacement in REDACTION_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+class TestPIIRedactor:
+    """Test the single-pass redaction engine."""
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "Patient SSN: 123-45-6789",
+            'Processing patient name="John Doe"',
+            'Patient name="John Doe" SSN: 123-45-6789',
+            "Patient: John Doe admitted, Name: Jane Smith discharged",
+            "ids 1234-56-7890 A123-45-6789 123-45-67890 123-45-6789-00 (987-65-4321)",
+            "name=Bob Jones 123-45-6789\nnext line 'quoted' tail",
+            "filename='report.xml' name=\"\" name='Ann Lee'",
+            'Patient: John Doename="x" Name: John Patient: Bob Smith',
+            "Patient:\n  Mary Ann Jones",
+            "2026-10-18 22:50:45,022 - workflows - INFO - Processed PAT-00123",
+            "Arabic digits \u0661\u0662\u0663-\u0664\u0665-\u0666\u0667\u0668\u0669",
+        ],
+    )
+    def test_matches_sequential_patterns(self, text):
+        assert PIIRedactor().redact(text) == _redact_sequentially(text)
+
+    def test_matches_sequential_patterns_on_random_text(self):
+        """Differential check over random mixes of PII fragments."""
+        # Arrange
+        fragments = [
+            "123", "-", "45", "6789", "9", "name", "=", '"', "'", "Patient", "Name",
+            ":", " ", "\n", "John", "Doe", "Doename", "x", "a1", "Name: ", "name=",
+        ]
+        rng = random.Random(45)
+        redactor = PIIRedactor()
+
+        # Act / Assert
+        for _ in range(5000):
+            text = "".join(rng.choice(fragments) for _ in range(rng.randint(1, 30)))
+            assert redactor.redact(text) == _redact_sequentially(text), text
+
+    def test_fast_reject_skips_scan(self):
+        """Test records without any pattern's literal text are not scanned."""
+        # Arrange
+        line = "2026-10-18 22:50:45,022 - workflows - INFO - Processing patient: PAT001"
+
+        # Act
+        with patch("ihe_test_util.logging_audit.formatters._SCANNER") as scanner:
+            result = PIIRedactor().redact(line)
+
+        # Assert
+        assert result == line
+        scanner.finditer.assert_not_called()
+
+    def test_truncate_policy_redacts_pii_straddling_limit(self):
+        """Test oversize records are cut without leaking a partial SSN."""
+        # Arrange
+        text = "x" * 94 + " 123-45-6789 " + "y" * 100
+
+        # Act
+        result = PIIRedactor(max_chars=100).redact(text)
+
+        # Assert
+        assert result == "x" * 94 + " [SSN-REDACTED]... [TRUNCATED: 207 chars total]"
+
+    def test_scan_policy_redacts_whole_record(self):
+        # Arrange
+        text = "x" * 200 + " 123-45-6789"
+
+        # Act
+        result = PIIRedactor(max_chars=100, oversize_policy=OversizePolicy.SCAN).redact(text)
+
+        # Assert
+        assert result == "x" * 200 + " [SSN-REDACTED]"
+
+    def test_formatter_applies_size_limit(self):
+        # Arrange
+        formatter = PIIRedactingFormatter(fmt="%(message)s", redact_pii=True, max_redact_chars=10)
+        record = logging.LogRecord("test", logging.DEBUG, "", 0, "<Envelope>" * 5, (), None)
+
+        # Act
+        result = formatter.format(record)
+
+        # Assert
+        assert result == "<Envelope>... [TRUNCATED: 50 chars total]"
+
 
 class TestLogAuditEvent:
     """Test audit trail logging."""
@@ -309,6 +460,7 @@ class TestLogAuditEvent:
         )
 
         # Assert
+        flush_logging()
         content = log_file.read_text()
         assert "AUDIT [CSV_PROCESSED]" in content
         assert "status=success" in content
@@ -335,6 +487,7 @@ class TestLogAuditEvent:
         )
 
         # Assert
+        flush_logging()
         content = log_file.read_text()
         assert "AUDIT [VALIDATION_FAILED]" in content
         assert "status=failure" in content
@@ -351,6 +504,7 @@ class TestLogAuditEvent:
         log_audit_event("CSV_PROCESSED", {"status": "success"})
 
         # Assert
+        flush_logging()
         content = log_file.read_text()
         assert "correlation_id=" in content
 
@@ -367,6 +521,7 @@ class TestLogAuditEvent:
         )
 
         # Assert
+        flush_logging()
         content = log_file.read_text()
         assert f"correlation_id={custom_id}" in content
 
@@ -386,6 +541,7 @@ class TestLogTransaction:
         log_transaction("PIX_ADD", request_xml, response_xml, "success")
 
         # Assert
+        flush_logging()
         content = log_file.read_text()
         assert "TRANSACTION [PIX_ADD]" in content
         assert "status=success" in content
@@ -405,6 +561,7 @@ class TestLogTransaction:
         log_transaction("PIX_ADD", request_xml, response_xml, "success")
 
         # Assert
+        flush_logging()
         content = log_file.read_text()
         assert "TRANSACTION REQUEST [PIX_ADD]" in content
         assert "TRANSACTION RESPONSE [PIX_ADD]" in content
@@ -423,6 +580,7 @@ class TestLogTransaction:
         log_transaction("PIX_ADD", request_xml, response_xml, "success")
 
         # Assert
+        flush_logging()
         content = log_file.read_text()
         # Extract all correlation IDs
         correlation_ids = re.findall(r"correlation_id=([a-f0-9\-]+)", content)
@@ -442,6 +600,131 @@ class TestLogTransaction:
         log_transaction("PIX_ADD", request_xml, response_xml, "success")
 
         # Assert
+        flush_logging()
         content = log_file.read_text()
         assert f"request_size={len(request_xml)} bytes" in content
         assert f"response_size={len(response_xml)} bytes" in content
+
+
+class _Payload(str):
+    """String payload that records which threads stringified it."""
+
+    def __new__(cls, value):
+        payload = super().__new__(cls, value)
+        payload.rendered_on = []
+        return payload
+
+    def __str__(self):
+        self.rendered_on.append(threading.current_thread().name)
+        return super().__str__()
+
+
+class TestBackgroundLogging:
+    """Test the queue-based background writer."""
+
+    def test_file_handler_runs_on_listener(self, tmp_path):
+        """Test the file handler runs on the listener and the console handler stays synchronous."""
+        # Act
+        configure_logging(level="INFO", log_file=tmp_path / "test.log", redact_pii=False)
+
+        # Assert
+        console_handler, queue_handler = logging.getLogger().handlers
+        assert type(console_handler) is logging.StreamHandler
+        assert isinstance(queue_handler, DeferredQueueHandler)
+        assert {type(handler).__name__ for handler in get_log_handlers()} == {
+            "StreamHandler", "RotatingFileHandler",
+        }
+
+    def test_payload_formatted_on_writer_thread(self, tmp_path):
+        """Test %-style arguments are rendered by the background writer."""
+        # Arrange
+        log_file = tmp_path / "test.log"
+        configure_logging(level="INFO", log_file=log_file, redact_pii=False)
+        payload = _Payload("<soap:Envelope>Body</soap:Envelope>")
+
+        # Act
+        get_logger(__name__).debug("Full SOAP response:\n%s", payload)
+        flush_logging()
+
+        # Assert
+        assert "<soap:Envelope>Body</soap:Envelope>" in log_file.read_text()
+        assert payload.rendered_on
+        assert threading.current_thread().name not in payload.rendered_on
+
+    def test_foreground_mode_attaches_handlers(self, tmp_path):
+        """Test background=False writes synchronously from the caller."""
+        # Arrange
+        log_file = tmp_path / "test.log"
+
+        # Act
+        configure_logging(level="INFO", log_file=log_file, redact_pii=False, background=False)
+        get_logger(__name__).info("Synchronous message")
+
+        # Assert
+        assert logging.getLogger().handlers == get_log_handlers()
+        assert "Synchronous message" in log_file.read_text()
+
+    def test_stop_logging_writes_queued_records(self, tmp_path):
+        """Test stopping the writer drains the queue first."""
+        # Arrange
+        log_file = tmp_path / "test.log"
+        configure_logging(level="INFO", log_file=log_file, redact_pii=False)
+        logger = get_logger(__name__)
+
+        # Act
+        for i in range(200):
+            logger.info("Queued message %d", i)
+        stop_logging()
+
+        # Assert
+        assert "Queued message 199" in log_file.read_text()
+        assert get_log_handlers() == []
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+    def test_forked_child_writes_its_records(self, tmp_path):
+        """Test a forked child (pre-fork worker) drains its own queue."""
+        # Arrange
+        log_file = tmp_path / "test.log"
+        configure_logging(level="INFO", log_file=log_file, redact_pii=False)
+        logger = get_logger(__name__)
+
+        # Act: exit the way pre-fork workers do
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 1
+            try:
+                for i in range(2000):
+                    logger.debug("Child record %d", i)
+                stop_logging()
+                exit_code = 0
+            finally:
+                os._exit(exit_code)
+        _, status = os.waitpid(pid, 0)
+
+        # Assert
+        assert os.waitstatus_to_exitcode(status) == 0
+        contents = log_file.read_text()
+        assert "Child record 0" in contents
+        assert "Child record 1999" in contents
+        root_handlers = logging.getLogger().handlers
+        assert sum(isinstance(handler, DeferredQueueHandler) for handler in root_handlers) == 1
+
+    def test_log_transaction_skips_payloads_when_debug_disabled(self, tmp_path):
+        """Test request/response payloads are never stringified below their level."""
+        # Arrange
+        configure_logging(level="INFO", log_file=tmp_path / "test.log", redact_pii=False)
+        audit_logger = logging.getLogger("ihe_test_util.logging_audit.audit")
+        request_xml = _Payload("<soap:Envelope>Request</soap:Envelope>")
+        response_xml = _Payload("<soap:Envelope>Response</soap:Envelope>")
+
+        # Act
+        audit_logger.setLevel(logging.INFO)
+        try:
+            log_transaction("PIX_ADD", request_xml, response_xml, "success")
+            flush_logging()
+        finally:
+            audit_logger.setLevel(logging.NOTSET)
+
+        # Assert
+        assert request_xml.rendered_on == []
+        assert response_xml.rendered_on == []
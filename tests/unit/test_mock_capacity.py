@@ -0,0 +1,190 @@
+"""Unit tests for capacity-model overload simulation."""
+
+import os
+
+import pytest
+from flask import Flask, request
+from pydantic import ValidationError
+
+from ihe_test_util.mock_server import capacity as capacity_module
+from ihe_test_util.mock_server.capacity import CapacityModel, admit_request, prepare_capacity_models
+from ihe_test_util.mock_server.config import CapacityProfile, MockServerConfig, PIXAddBehavior
+from ihe_test_util.mock_server.latency import DEFER_SUPPORTED_ENVIRON_KEY, RESPONSE_DELAY_ENVIRON_KEY
+from ihe_test_util.mock_server.pix_add_endpoint import register_pix_add_endpoint
+
+
+PIX_ADD_REQUEST = """<?xml version="1.0" encoding="UTF-8"?>
+<SOAP-ENV:Envelope xmlns:SOAP-ENV="http://schemas.xmlsoap.org/soap/envelope/">
+  <SOAP-ENV:Body>
+    <PRPA_IN201301UV02 xmlns="urn:hl7-org:v3">
+      <id root="1.2.3" extension="MSG-1"/>
+      <controlActProcess><subject><registrationEvent><subject1><patient>
+        <id root="1.2.3.4" extension="PAT-1"/>
+      </patient></subject1></registrationEvent></subject></controlActProcess>
+    </PRPA_IN201301UV02>
+  </SOAP-ENV:Body>
+</SOAP-ENV:Envelope>"""
+
+
+@pytest.fixture(autouse=True)
+def fresh_models(monkeypatch):
+    """Give every test its own capacity models."""
+    monkeypatch.setattr(capacity_module, "_models", {})
+
+
+class TestCapacityProfile:
+    """Tests for CapacityProfile validation."""
+
+    def test_overload_status_must_be_429_or_503(self):
+        with pytest.raises(ValidationError, match="overload_status_code"):
+            CapacityProfile(overload_status_code=500)
+
+    def test_behavior_accepts_capacity(self):
+        behavior = PIXAddBehavior(capacity={"max_concurrent": 2, "service_time": {"delay_ms": 20}})
+
+        assert behavior.capacity.max_concurrent == 2
+        assert behavior.capacity.service_time.delay_ms == 20
+
+
+class TestCapacityModel:
+    """Tests for the virtual-time queue."""
+
+    def test_queue_then_reject(self):
+        # Arrange - two servers, one waiting place, 1s service
+        model = CapacityModel(max_concurrent=2, queue_length=1)
+
+        # Act
+        first = model.admit(1.0, now=0.0)
+        second = model.admit(1.0, now=0.0)
+        queued = model.admit(1.0, now=0.0)
+        rejected = model.admit(1.0, now=0.5)
+
+        # Assert
+        assert (first.delay_seconds, second.delay_seconds) == (1.0, 1.0)
+        assert queued.wait_seconds == 1.0
+        assert queued.delay_seconds == 2.0
+        assert not rejected.admitted
+        assert rejected.queue_depth == 1
+        assert rejected.retry_after_seconds == pytest.approx(0.5)  # the waiting request starts at 1.0
+
+    def test_waiting_place_frees_when_service_starts(self):
+        model = CapacityModel(max_concurrent=1, queue_length=1)
+        model.admit(1.0, now=0.0)
+        model.admit(1.0, now=0.0)  # waits until 1.0
+
+        decision = model.admit(1.0, now=1.0)
+
+        assert decision.admitted
+        assert decision.wait_seconds == 1.0  # behind the request that started at 1.0
+
+    def test_without_queue_busy_servers_reject(self):
+        model = CapacityModel(max_concurrent=1, queue_length=0)
+        model.admit(2.0, now=0.0)
+
+        decision = model.admit(1.0, now=1.5)
+
+        assert not decision.admitted
+        assert decision.retry_after_seconds == pytest.approx(0.5)
+
+    def test_max_queue_wait(self):
+        model = CapacityModel(max_concurrent=1, queue_length=10)
+        model.admit(5.0, now=0.0)
+
+        decision = model.admit(1.0, max_wait_seconds=2.0, now=0.0)
+
+        assert not decision.admitted
+        assert decision.retry_after_seconds == pytest.approx(3.0)
+
+    def test_overload_slowdown_scales_with_queue(self):
+        # Arrange
+        model = CapacityModel(max_concurrent=1, queue_length=2)
+        model.admit(1.0, overload_slowdown=1.0, now=0.0)
+        model.admit(1.0, overload_slowdown=1.0, now=0.0)  # 0 waiting ahead -> 1.0s
+
+        # Act
+        decision = model.admit(1.0, overload_slowdown=1.0, now=0.0)  # 1 of 2 places taken
+
+        # Assert
+        assert decision.wait_seconds == pytest.approx(2.0)
+        assert decision.delay_seconds - decision.wait_seconds == pytest.approx(1.5)
+
+    def test_throughput_is_capped(self):
+        # Arrange - 4 servers x 100ms service = 40 transactions/s
+        model = CapacityModel(max_concurrent=4, queue_length=8)
+
+        # Act - offer 200 requests/s for 2s
+        admitted = sum(model.admit(0.1, now=i * 0.005).admitted for i in range(400))
+
+        # Assert
+        assert 80 <= admitted <= 95  # ~2s x 40/s plus the initial queue
+
+    def test_model_is_shared_across_fork(self):
+        if not hasattr(os, "fork"):
+            pytest.skip("os.fork not available")
+        model = CapacityModel(max_concurrent=1, queue_length=0)
+
+        pid = os.fork()
+        if pid == 0:
+            model.admit(60.0)
+            os._exit(0)
+        os.waitpid(pid, 0)
+
+        assert not model.admit(1.0).admitted
+
+
+class TestOverloadResponses:
+    """Tests for the endpoint integration."""
+
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        config = MockServerConfig(
+            log_path=str(tmp_path / "mock.log"),
+            pix_add_behavior={
+                "capacity": {
+                    "max_concurrent": 1,
+                    "queue_length": 1,
+                    "service_time": {"delay_ms": 10000},
+                    "overload_status_code": 429,
+                }
+            },
+        )
+        flask_app = Flask(__name__)
+        register_pix_add_endpoint(flask_app, config)
+        prepare_capacity_models(config)
+
+        @flask_app.after_request
+        def expose_delay(response):
+            response.headers["X-Test-Delay"] = str(request.environ.get(RESPONSE_DELAY_ENVIRON_KEY, 0.0))
+            return response
+
+        return flask_app.test_client()
+
+    def test_queued_then_rejected_with_retry_after(self, client):
+        # Arrange - deferred delays, so the test client does not sleep
+        environ = {DEFER_SUPPORTED_ENVIRON_KEY: True}
+
+        # Act
+        responses = []
+        for _ in range(3):
+            response = client.post(
+                "/pix/add", data=PIX_ADD_REQUEST, content_type="text/xml", environ_base=environ
+            )
+            responses.append(response)
+
+        # Assert
+        assert [r.status_code for r in responses] == [200, 200, 429]
+        assert float(responses[1].headers["X-Test-Delay"]) == pytest.approx(20.0, abs=0.5)
+        assert int(responses[2].headers["Retry-After"]) in (9, 10)
+        assert b"Service temporarily overloaded" in responses[2].data
+
+    def test_configured_retry_after(self, tmp_path):
+        behavior = PIXAddBehavior(
+            capacity={"max_concurrent": 1, "service_time": {"delay_ms": 10000}, "retry_after_seconds": 30}
+        )
+        app = Flask(__name__)
+        with app.test_request_context(environ_base={DEFER_SUPPORTED_ENVIRON_KEY: True}):
+            first = admit_request(behavior, "pix_add", capacity_module.logger)
+            second = admit_request(behavior, "pix_add", capacity_module.logger)
+
+        assert (first, second) == (None, 30)
@@ -328,6 +328,44 @@ def test_mock_start_foreground_mode(
     mock_run_server.assert_called_once()
 
 
+@patch("ihe_test_util.cli.mock_commands.is_server_running")
+@patch("ihe_test_util.cli.mock_commands.load_config")
+@patch("ihe_test_util.cli.mock_commands.run_server")
+def test_mock_start_passes_worker_options(
+    mock_run_server, mock_load_config, mock_is_running, cli_runner
+):
+    """Test mock start forwards --workers/--threads/--reuse-port."""
+    # Arrange
+    mock_is_running.return_value = (False, None)
+    mock_config = Mock()
+    mock_config.host = "0.0.0.0"
+    mock_config.http_port = 8080
+    mock_config.pix_add_endpoint = "/pix/add"
+    mock_config.iti41_endpoint = "/iti41/submit"
+    mock_load_config.return_value = mock_config
+    
+    # Act
+    result = cli_runner.invoke(
+        mock_group, ["start", "--workers", "4", "--threads", "16", "--reuse-port"]
+    )
+    
+    # Assert
+    assert result.exit_code == 0
+    assert "Workers: 4 x 16 threads" in result.output
+    kwargs = mock_run_server.call_args.kwargs
+    assert kwargs["workers"] == 4
+    assert kwargs["threads"] == 16
+    assert kwargs["reuse_port"] is True
+
+
+def test_mock_start_rejects_zero_workers(cli_runner):
+    """Test mock start validates --workers."""
+    result = cli_runner.invoke(mock_group, ["start", "--workers", "0"])
+    
+    assert result.exit_code != 0
+    assert "--workers" in result.output
+
+
 @patch("ihe_test_util.cli.mock_commands.is_server_running")
 def test_mock_start_fails_when_already_running(mock_is_running, cli_runner):
     """Test mock start fails when server is already running."""
@@ -411,6 +449,39 @@ def test_mock_stop_graceful_shutdown(
     mock_remove.assert_called_once()
 
 
+@patch("ihe_test_util.cli.mock_commands.is_server_running")
+@patch("ihe_test_util.cli.mock_commands.psutil.Process")
+@patch("ihe_test_util.cli.mock_commands.remove_pid_file")
+def test_mock_stop_terminates_surviving_workers(
+    mock_remove, mock_process_class, mock_is_running, cli_runner
+):
+    """Test mock stop cleans up workers left behind by a multi-worker master."""
+    # Arrange
+    mock_is_running.return_value = (True, {"pid": 12345, "workers": 2})
+    survivor = Mock()
+    survivor.is_running.return_value = True
+    exited = Mock()
+    exited.is_running.return_value = False
+    mock_process = Mock()
+    mock_process.wait.return_value = None
+    mock_process.children.return_value = [survivor, exited]
+    mock_process_class.return_value = mock_process
+    
+    # Act
+    with patch(
+        "ihe_test_util.cli.mock_commands.psutil.wait_procs",
+        return_value=([survivor], [])
+    ):
+        result = cli_runner.invoke(mock_group, ["stop"])
+    
+    # Assert
+    assert result.exit_code == 0
+    assert "1 remaining worker" in result.output
+    survivor.terminate.assert_called_once()
+    exited.terminate.assert_not_called()
+    mock_remove.assert_called_once()
+
+
 @patch("ihe_test_util.cli.mock_commands.is_server_running")
 def test_mock_stop_no_server_running(mock_is_running, cli_runner):
     """Test mock stop when no server is running."""
@@ -584,6 +655,21 @@ def test_mock_logs_file_not_found(cli_runner, tmp_path, monkeypatch):
     assert "not found" in result.output
 
 
+def test_mock_logs_worker_file(cli_runner, temp_log_file):
+    """Test mock logs --worker reads the per-worker log file."""
+    # Arrange
+    worker_log = temp_log_file.with_name("mock-server.worker-2.log")
+    worker_log.write_text("2025-11-07 18:00:00 INFO Worker 2 serving\n")
+    
+    # Act
+    result = cli_runner.invoke(mock_group, ["logs", "--worker", "2"])
+    
+    # Assert
+    assert result.exit_code == 0
+    assert "Worker 2 serving" in result.output
+    assert "Server started" not in result.output
+
+
 def test_mock_logs_tail_default(cli_runner, temp_log_file):
     """Test mock logs with default tail."""
     # Arrange
@@ -0,0 +1,134 @@
+"""Unit tests for the content-addressed mock document store."""
+
+import hashlib
+import os
+
+import pytest
+from click.testing import CliRunner
+
+from ihe_test_util.cli.mock_commands import mock_group
+from ihe_test_util.mock_server.document_store import DocumentStore, get_document_store
+
+
+DOCUMENT = b'<ClinicalDocument xmlns="urn:hl7-org:v3"><id extension="CCD-1"/></ClinicalDocument>'
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DocumentStore(tmp_path / "documents")
+
+
+class TestDocumentStore:
+    """Tests for blob storage, indexes and statistics."""
+
+    def test_blob_is_named_by_content_hash(self, store):
+        # Act
+        entry = store.put(DOCUMENT, "doc-1", "ss-1", "PAT-1")
+
+        # Assert
+        sha256 = hashlib.sha256(DOCUMENT).hexdigest()
+        assert entry.sha256 == sha256
+        assert store.blob_path(sha256) == store.root / "objects" / sha256[:2] / sha256[2:4] / sha256
+        assert store.blob_path(sha256).read_bytes() == DOCUMENT
+        assert store.get("doc-1") == DOCUMENT
+
+    def test_identical_documents_are_stored_once(self, store):
+        # Arrange
+        other = DOCUMENT.replace(b"CCD-1", b"CCD-2")
+
+        # Act
+        for index in range(3):
+            store.put(memoryview(DOCUMENT), f"doc-{index}", "ss-1", "PAT-1")
+        store.put(other, "doc-other", "ss-2", "PAT-2")
+
+        # Assert
+        stats = store.stats()
+        assert stats.documents == 4
+        assert stats.unique_blobs == 2
+        assert stats.duplicates == 2
+        assert stats.stored_bytes == len(DOCUMENT) + len(other)
+        assert stats.dedup_ratio == 2.0
+        assert len(list((store.root / "objects").rglob("*"))) == 2 + 2 * 2  # blobs + fan-out dirs
+
+    def test_find_by_submission_set_and_patient(self, store):
+        store.put(b"a", "doc-a", "ss-1", "PAT-1")
+        store.put(b"b", "doc-b", "ss-1", "PAT-2")
+        store.put(b"c", "doc-c", "ss-2", "PAT-1")
+
+        assert [e.document_unique_id for e in store.find(submission_set_id="ss-1")] == ["doc-a", "doc-b"]
+        assert [e.document_unique_id for e in store.find(patient_id="PAT-1")] == ["doc-a", "doc-c"]
+        assert [e.document_unique_id for e in store.find(submission_set_id="ss-1", patient_id="PAT-2")] == ["doc-b"]
+        assert len(store.find()) == 3
+        assert store.get("missing") is None
+
+    def test_entries_from_other_writers_become_visible(self, store):
+        # Arrange - a second instance stands in for another worker process
+        reader = DocumentStore(store.root)
+        store.put(b"first", "doc-1", "ss-1", "PAT-1")
+        assert reader.get("doc-1") == b"first"
+
+        # Act
+        store.put(b"second", "doc-2", "ss-1", "PAT-1")
+
+        # Assert
+        assert reader.get("doc-2") == b"second"
+        assert reader.stats().documents == 2
+
+    def test_corrupt_and_partial_lines_are_skipped(self, store):
+        # Arrange
+        store.put(b"ok", "doc-ok", "ss-1", "PAT-1")
+        with open(store.index_path, "ab") as f:
+            f.write(b"not json\n{\"document_unique_id\": \"half")
+
+        # Act
+        entries = store.find()
+
+        # Assert
+        assert [e.document_unique_id for e in entries] == ["doc-ok"]
+
+    def test_shared_instance_per_directory(self, tmp_path):
+        assert get_document_store(tmp_path / "a") is get_document_store(tmp_path / "a")
+        assert get_document_store(tmp_path / "a") is not get_document_store(tmp_path / "b")
+
+    def test_store_is_shared_across_fork(self, store):
+        if not hasattr(os, "fork"):
+            pytest.skip("os.fork not available")
+
+        pid = os.fork()
+        if pid == 0:
+            store.put(b"from child", "doc-child", "ss-1", "PAT-1")
+            os._exit(0)
+        os.waitpid(pid, 0)
+        store.put(b"from parent", "doc-parent", "ss-1", "PAT-1")
+
+        assert store.get("doc-child") == b"from child"
+        assert store.stats().documents == 2
+
+
+class TestDocumentsCommand:
+    """Tests for `mock documents`."""
+
+    def test_stats_and_show(self, store):
+        # Arrange
+        store.put(DOCUMENT, "doc-1", "ss-1", "PAT-1")
+        store.put(DOCUMENT, "doc-2", "ss-2", "PAT-1")
+        runner = CliRunner()
+
+        # Act
+        stats = runner.invoke(mock_group, ["documents", "--store-dir", str(store.root), "--stats"])
+        shown = runner.invoke(mock_group, ["documents", "--store-dir", str(store.root), "--document-id", "doc-2", "--show"])
+        listing = runner.invoke(mock_group, ["documents", "--store-dir", str(store.root), "--submission-set-id", "ss-1"])
+
+        # Assert
+        assert stats.exit_code == 0
+        assert "Duplicates:     1" in stats.output
+        assert "Dedup ratio:    2.00x" in stats.output
+        assert "CCD-1" in shown.output
+        assert "doc-1" in listing.output
+        assert "doc-2" not in listing.output
+
+    def test_no_matches(self, tmp_path):
+        result = CliRunner().invoke(mock_group, ["documents", "--store-dir", str(tmp_path)])
+
+        assert result.exit_code == 0
+        assert "No matching documents" in result.output
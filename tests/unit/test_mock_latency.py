@@ -0,0 +1,230 @@
+"""Unit tests for mock endpoint latency simulation."""
+
+import http.client
+import random
+import statistics
+import threading
+import time
+
+import pytest
+from flask import Flask, request
+from pydantic import ValidationError
+
+from ihe_test_util.mock_server.config import (
+    ITI41Behavior,
+    LatencyDistribution,
+    LatencyProfile,
+    PIXAddBehavior,
+)
+from ihe_test_util.mock_server.latency import (
+    DEFER_SUPPORTED_ENVIRON_KEY,
+    RESPONSE_DELAY_ENVIRON_KEY,
+    apply_response_delay,
+    resolve_latency_profile,
+    sample_delay_ms,
+)
+from ihe_test_util.mock_server.prefork import DelayedResponseScheduler, PooledWSGIServer
+
+
+def _samples(profile: LatencyProfile, count: int = 2000, request_bytes: int = 0) -> list[float]:
+    rng = random.Random(42)
+    return [sample_delay_ms(profile, request_bytes, rng) for _ in range(count)]
+
+
+class TestLatencyProfile:
+    """Tests for LatencyProfile validation."""
+
+    def test_uniform_requires_ordered_bounds(self):
+        with pytest.raises(ValidationError, match="max_ms"):
+            LatencyProfile(distribution="uniform", min_ms=200, max_ms=100)
+
+    def test_behaviors_accept_latency(self):
+        behavior = ITI41Behavior(latency={"distribution": "lognormal", "median_ms": 120})
+
+        assert behavior.latency.distribution == LatencyDistribution.LOGNORMAL
+
+
+class TestResolveLatencyProfile:
+    """Tests for choosing the profile of an endpoint."""
+
+    def test_none_when_no_delay(self):
+        assert resolve_latency_profile(PIXAddBehavior()) is None
+        assert resolve_latency_profile(None) is None
+
+    def test_response_delay_ms_becomes_constant_profile(self):
+        profile = resolve_latency_profile(PIXAddBehavior(response_delay_ms=250))
+
+        assert profile.distribution == LatencyDistribution.CONSTANT
+        assert profile.delay_ms == 250
+
+    def test_latency_takes_precedence(self):
+        behavior = PIXAddBehavior(
+            response_delay_ms=250, latency={"distribution": "uniform", "min_ms": 1, "max_ms": 2}
+        )
+
+        assert resolve_latency_profile(behavior).distribution == LatencyDistribution.UNIFORM
+
+
+class TestSampleDelay:
+    """Tests for drawing delays from each distribution."""
+
+    def test_constant(self):
+        assert set(_samples(LatencyProfile(delay_ms=75), count=10)) == {75}
+
+    def test_uniform_within_bounds(self):
+        samples = _samples(LatencyProfile(distribution="uniform", min_ms=10, max_ms=20))
+
+        assert min(samples) >= 10
+        assert max(samples) <= 20
+
+    def test_normal_mean(self):
+        samples = _samples(LatencyProfile(distribution="normal", mean_ms=100, stddev_ms=10))
+
+        assert statistics.mean(samples) == pytest.approx(100, abs=2)
+
+    def test_lognormal_median(self):
+        samples = _samples(LatencyProfile(distribution="lognormal", median_ms=80, sigma=0.6))
+
+        assert statistics.median(samples) == pytest.approx(80, rel=0.1)
+        assert max(samples) > 200  # long right tail
+
+    def test_bimodal_spikes_at_requested_rate(self):
+        # Arrange
+        profile = LatencyProfile(
+            distribution="bimodal", mean_ms=50, stddev_ms=5,
+            spike_probability=0.01, spike_ms=2000, spike_stddev_ms=100,
+        )
+
+        # Act
+        samples = _samples(profile, count=20000)
+        spikes = [s for s in samples if s > 1000]
+
+        # Assert
+        assert len(spikes) / len(samples) == pytest.approx(0.01, abs=0.003)
+        assert statistics.quantiles(samples, n=1000)[-1] > 1000  # p99.9 lands in a spike
+
+    def test_size_proportional(self):
+        profile = LatencyProfile(distribution="size_proportional", delay_ms=20, ms_per_kb=0.5)
+
+        assert sample_delay_ms(profile, request_bytes=1024 * 1024) == pytest.approx(532)
+
+    def test_clamped_to_cap_and_zero(self):
+        assert sample_delay_ms(LatencyProfile(delay_ms=5000, cap_ms=1000)) == 1000
+        negative = _samples(LatencyProfile(distribution="normal", mean_ms=0, stddev_ms=50))
+        assert min(negative) == 0
+
+
+class TestApplyResponseDelay:
+    """Tests for blocking vs. deferred delays."""
+
+    def test_sleeps_without_deferring_server(self):
+        app = Flask(__name__)
+        with app.test_request_context("/"):
+            start = time.perf_counter()
+            deferred = apply_response_delay(50)
+            elapsed = time.perf_counter() - start
+
+        assert deferred is False
+        assert elapsed >= 0.045
+
+    def test_defers_when_supported(self):
+        app = Flask(__name__)
+        with app.test_request_context("/", environ_base={DEFER_SUPPORTED_ENVIRON_KEY: True}):
+            start = time.perf_counter()
+            deferred = apply_response_delay(500)
+            apply_response_delay(250)
+            elapsed = time.perf_counter() - start
+
+            assert request.environ[RESPONSE_DELAY_ENVIRON_KEY] == pytest.approx(0.75)
+
+        assert deferred is True
+        assert elapsed < 0.1
+
+
+class TestDelayedResponseScheduler:
+    """Tests for the scheduler that releases parked responses."""
+
+    def test_runs_callbacks_in_deadline_order(self):
+        # Arrange
+        scheduler = DelayedResponseScheduler()
+        fired = []
+        done = threading.Event()
+
+        # Act
+        scheduler.schedule(0.06, lambda: (fired.append("late"), done.set()))
+        scheduler.schedule(0.02, lambda: fired.append("early"))
+        done.wait(2)
+        scheduler.close()
+
+        # Assert
+        assert fired == ["early", "late"]
+
+    def test_close_flushes_pending(self):
+        scheduler = DelayedResponseScheduler()
+        fired = []
+        scheduler.schedule(60, lambda: fired.append(1))
+
+        scheduler.close(timeout=2)
+
+        assert fired == [1]
+        with pytest.raises(RuntimeError, match="closed"):
+            scheduler.schedule(0, lambda: None)
+
+
+class TestDeferredResponses:
+    """Tests for delayed responses on the pooled server."""
+
+    @pytest.fixture
+    def delayed_server(self):
+        def delayed_app(environ, start_response):
+            environ[RESPONSE_DELAY_ENVIRON_KEY] = 0.3 if environ.get(DEFER_SUPPORTED_ENVIRON_KEY) else 0
+            start_response("200 OK", [("Content-Type", "text/plain")])
+            return [b"ok"]
+
+        server = PooledWSGIServer("127.0.0.1", 0, delayed_app, threads=2)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        server.drain(timeout=2)
+        server.server_close()
+        thread.join(timeout=2)
+
+    def test_delayed_requests_do_not_hold_threads(self, delayed_server):
+        # Arrange
+        results = []
+
+        def fetch():
+            connection = http.client.HTTPConnection("127.0.0.1", delayed_server.port, timeout=5)
+            connection.request("GET", "/")
+            results.append(connection.getresponse().read())
+            connection.close()
+
+        clients = [threading.Thread(target=fetch) for _ in range(20)]
+
+        # Act - 20 requests x 300ms on 2 threads would take 3s if slept
+        start = time.perf_counter()
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join(5)
+        elapsed = time.perf_counter() - start
+
+        # Assert
+        assert results == [b"ok"] * 20
+        assert elapsed < 1.5
+
+    def test_connection_kept_alive_after_deferred_response(self, delayed_server):
+        connection = http.client.HTTPConnection("127.0.0.1", delayed_server.port, timeout=5)
+        try:
+            for _ in range(2):
+                connection.request("GET", "/")
+                response = connection.getresponse()
+                assert response.read() == b"ok"
+                assert response.getheader("Connection") == "keep-alive"
+            sock = connection.sock
+            connection.request("GET", "/")
+            connection.getresponse().read()
+            assert connection.sock is sock
+        finally:
+            connection.close()
@@ -0,0 +1,208 @@
+"""Unit tests for mock server metrics."""
+
+import os
+
+import pytest
+from flask import Flask
+
+from ihe_test_util.mock_server import app as app_module
+from ihe_test_util.mock_server import metrics as metrics_module
+from ihe_test_util.mock_server.config import MockServerConfig
+from ihe_test_util.mock_server.metrics import (
+    LATENCY_BUCKETS,
+    MetricsRegistry,
+    install_metrics_registry,
+    render_prometheus,
+)
+from ihe_test_util.mock_server.pix_add_endpoint import register_pix_add_endpoint
+
+
+PIX_ADD_REQUEST = """<?xml version="1.0" encoding="UTF-8"?>
+<SOAP-ENV:Envelope xmlns:SOAP-ENV="http://schemas.xmlsoap.org/soap/envelope/">
+  <SOAP-ENV:Body>
+    <PRPA_IN201301UV02 xmlns="urn:hl7-org:v3">
+      <id root="1.2.3" extension="MSG-123"/>
+      <controlActProcess><subject><registrationEvent><subject1><patient>
+        <id root="1.2.3.4" extension="PAT-002"/>
+      </patient></subject1></registrationEvent></subject></controlActProcess>
+    </PRPA_IN201301UV02>
+  </SOAP-ENV:Body>
+</SOAP-ENV:Envelope>"""
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Record into a fresh registry for the duration of a test."""
+    fresh = MetricsRegistry()
+    monkeypatch.setattr(metrics_module, "_registry", fresh)
+    return fresh
+
+
+@pytest.fixture
+def client(registry, tmp_path, monkeypatch):
+    """Flask app with the mock server's request hooks, /metrics and PIX Add."""
+    monkeypatch.chdir(tmp_path)
+    flask_app = Flask(__name__)
+    flask_app.before_request(app_module.log_request)
+    flask_app.after_request(app_module.add_soap_headers)
+    flask_app.teardown_request(app_module.finish_request_metrics)
+    flask_app.add_url_rule("/metrics", view_func=app_module.metrics)
+    flask_app.add_url_rule("/health", view_func=app_module.health_check)
+    register_pix_add_endpoint(flask_app, MockServerConfig(log_path=str(tmp_path / "mock.log")))
+    return flask_app.test_client()
+
+
+class TestMetricsRegistry:
+    """Tests for counter layout and aggregation."""
+
+    def test_response_counts_by_status(self, registry):
+        registry.observe_response("iti41", 200, 100)
+        registry.observe_response("iti41", 200, 50)
+        registry.observe_response("iti41", 418, 10)
+
+        data = registry.snapshot()["iti41"]
+
+        assert data["requests"]["200"] == 2
+        assert data["requests"]["other"] == 1
+        assert data["bytes_out"] == 160
+
+    def test_unknown_labels_fall_back_to_other(self, registry):
+        registry.observe_fault("nonexistent", "novel_fault")
+
+        assert registry.snapshot()["other"]["faults"]["other"] == 1
+
+    def test_histogram_buckets(self, registry):
+        # Arrange
+        registry.observe_phase("pix_add", "parse", 0.0002)
+        registry.observe_phase("pix_add", "parse", 0.003)
+        registry.observe_phase("pix_add", "parse", 60.0)
+
+        # Act
+        histogram = registry.snapshot()["pix_add"]["phases"]["parse"]
+
+        # Assert
+        assert histogram["count"] == 3
+        assert histogram["sum"] == pytest.approx(60.0032)
+        assert histogram["buckets"][LATENCY_BUCKETS.index(0.00025)] == 1
+        assert histogram["buckets"][LATENCY_BUCKETS.index(0.005)] == 1
+        assert histogram["buckets"][-1] == 1  # overflow
+
+    def test_in_flight_gauge(self, registry):
+        registry.request_started("iti41", 1000)
+        registry.request_started("iti41", 500)
+        registry.request_finished("iti41")
+
+        data = registry.snapshot()["iti41"]
+
+        assert data["in_flight"] == 1
+        assert data["bytes_in"] == 1500
+
+    def test_workers_are_summed_across_fork(self):
+        # Arrange
+        if not hasattr(os, "fork"):
+            pytest.skip("os.fork not available")
+        shared = MetricsRegistry(workers=2)
+        shared.select_worker(1)
+        shared.observe_response("pix_add", 200, 10)
+
+        # Act
+        pid = os.fork()
+        if pid == 0:
+            shared.select_worker(2)
+            shared.observe_response("pix_add", 200, 10)
+            shared.observe_simulated_delay("pix_add", 0.25)
+            os._exit(0)
+        os.waitpid(pid, 0)
+
+        # Assert
+        data = shared.snapshot()["pix_add"]
+        assert data["requests"]["200"] == 2
+        assert data["simulated_delay_seconds"] == pytest.approx(0.25)
+
+    def test_install_resets_in_flight_of_worker(self, monkeypatch):
+        shared = MetricsRegistry(workers=2)
+        shared.select_worker(2)
+        shared.request_started("iti41", 0)
+        monkeypatch.setattr(metrics_module, "_registry", metrics_module._registry)
+
+        install_metrics_registry(shared, 2)
+
+        assert shared.snapshot()["iti41"]["in_flight"] == 0
+
+
+class TestRenderPrometheus:
+    """Tests for the text exposition format."""
+
+    def test_histogram_is_cumulative(self, registry):
+        # Arrange
+        registry.observe_phase("iti41", "total", 0.0002)
+        registry.observe_phase("iti41", "total", 0.02)
+
+        # Act
+        text = render_prometheus(registry.snapshot())
+
+        # Assert
+        assert '# TYPE mock_handler_seconds histogram' in text
+        assert 'mock_handler_seconds_bucket{endpoint="iti41",phase="total",le="0.00025"} 1' in text
+        assert 'mock_handler_seconds_bucket{endpoint="iti41",phase="total",le="0.025"} 2' in text
+        assert 'mock_handler_seconds_bucket{endpoint="iti41",phase="total",le="+Inf"} 2' in text
+        assert 'mock_handler_seconds_count{endpoint="iti41",phase="total"} 2' in text
+        assert 'phase="parse"' not in text  # empty histograms are omitted
+
+    def test_counters_and_gauges(self, registry):
+        registry.observe_response("pix_add", 500, 0)
+        registry.observe_fault("pix_add", "simulated_failure")
+
+        text = render_prometheus(registry.snapshot())
+
+        assert 'mock_requests_total{endpoint="pix_add",status="500"} 1' in text
+        assert 'mock_faults_total{endpoint="pix_add",fault_type="simulated_failure"} 1' in text
+        assert 'mock_in_flight_requests{endpoint="pix_add"} 0' in text
+
+
+class TestMetricsEndpoint:
+    """Tests for request instrumentation and /metrics."""
+
+    def test_requests_are_counted(self, client):
+        # Act
+        client.get("/health")
+        client.get("/missing")
+        text = client.get("/metrics").get_data(as_text=True)
+
+        # Assert
+        assert 'mock_requests_total{endpoint="health",status="200"} 1' in text
+        assert 'mock_requests_total{endpoint="other",status="404"} 1' in text
+        assert 'mock_in_flight_requests{endpoint="metrics"} 1' in text  # this request
+
+    def test_json_variant(self, client):
+        client.get("/health")
+
+        data = client.get("/metrics?format=json").get_json()
+
+        assert data["workers"] == 1
+        assert data["endpoints"]["health"]["requests"]["200"] == 1
+        assert data["endpoints"]["health"]["phases"]["total"]["count"] == 1
+        assert client.get("/metrics", headers={"Accept": "application/json"}).is_json
+
+    def test_pix_add_fault_and_phases(self, client, registry):
+        # Act
+        client.post("/pix/add", data="<not-xml", content_type="text/xml")
+        data = registry.snapshot()["pix_add"]
+
+        # Assert
+        assert data["requests"]["400"] == 1
+        assert data["faults"]["soap_parse"] == 1
+        assert data["bytes_in"] == len("<not-xml")
+        assert data["bytes_out"] > 0
+        assert data["in_flight"] == 0
+        assert data["phases"]["total"]["count"] == 1
+        assert data["phases"]["parse"]["count"] == 0  # parsing failed before the boundary
+
+    def test_pix_add_success_records_every_phase(self, client, registry):
+        response = client.post("/pix/add", data=PIX_ADD_REQUEST, content_type="text/xml")
+
+        phases = registry.snapshot()["pix_add"]["phases"]
+        assert response.status_code == 200
+        assert {phase: phases[phase]["count"] for phase in phases} == {
+            "parse": 1, "validate": 1, "log": 1, "respond": 1, "total": 1
+        }
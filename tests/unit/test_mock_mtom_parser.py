@@ -0,0 +1,224 @@
+"""Unit tests for the zero-copy MTOM parser used by the mock ITI-41 endpoint."""
+
+import base64
+
+import pytest
+
+from ihe_test_util.ihe_transactions.mtom import MTOMAttachment, MTOMPackage
+from ihe_test_util.mock_server.iti41_endpoint import extract_mtom_parts
+from ihe_test_util.mock_server.mtom_parser import (
+    fast_extract_mtom_parts,
+    find_xop_includes,
+    normalize_content_id,
+    parse_content_type,
+    parse_multipart_related,
+    resolve_xop_includes,
+)
+
+
+BOUNDARY = "MIME_boundary_test"
+CONTENT_TYPE = f'multipart/related; boundary="{BOUNDARY}"; type="application/xop+xml"'
+
+SOAP_ENVELOPE = (
+    '<?xml version="1.0"?>'
+    '<soap:Envelope xmlns:soap="http://www.w3.org/2003/05/soap-envelope">'
+    '<soap:Body><Document>'
+    '<xop:Include xmlns:xop="http://www.w3.org/2004/08/xop/include" href="cid:doc2%40example.org"/>'
+    "</Document></soap:Body></soap:Envelope>"
+)
+
+DOCUMENT = '<?xml version="1.0"?><ClinicalDocument xmlns="urn:hl7-org:v3"><id extension="123"/></ClinicalDocument>'
+
+
+def build_message(parts: list[tuple[str, str]], newline: str = "\r\n") -> bytes:
+    """Build a multipart body from (header block, body) pairs."""
+    lines = ["preamble text"]
+    for headers, body in parts:
+        lines.append(f"--{BOUNDARY}")
+        lines.extend(headers.splitlines())
+        lines.append("")
+        lines.append(body)
+    lines.append(f"--{BOUNDARY}--")
+    lines.append("epilogue")
+    return newline.join(lines).encode("utf-8")
+
+
+@pytest.fixture
+def two_document_message() -> bytes:
+    """Root part referencing the second of two XML attachments."""
+    return build_message([
+        ("Content-Type: application/xop+xml; charset=UTF-8\nContent-ID: <root@example.org>", SOAP_ENVELOPE),
+        ("Content-Type: text/xml\nContent-ID: <doc1@example.org>", "<other/>"),
+        ("Content-Type: application/xml\nContent-ID: <doc2@example.org>", DOCUMENT),
+    ])
+
+
+class TestParseContentType:
+    """Tests for Content-Type header parsing."""
+
+    def test_quoted_and_bare_parameters(self):
+        media_type, params = parse_content_type(
+            'Multipart/Related; boundary="a;b"; type=application/xop+xml; start="<root@x>"'
+        )
+
+        assert media_type == "multipart/related"
+        assert params == {
+            "boundary": "a;b",
+            "type": "application/xop+xml",
+            "start": "<root@x>",
+        }
+
+    def test_normalize_content_id(self):
+        assert normalize_content_id("<doc@example.org>") == "doc@example.org"
+        assert normalize_content_id("cid:doc%40example.org") == "doc@example.org"
+
+
+class TestParseMultipartRelated:
+    """Tests for boundary scanning."""
+
+    @pytest.mark.parametrize("newline", ["\r\n", "\n"])
+    def test_splits_parts_with_either_line_ending(self, two_document_message, newline):
+        # Arrange
+        data = two_document_message.replace(b"\r\n", newline.encode())
+
+        # Act
+        multipart = parse_multipart_related(data, CONTENT_TYPE)
+
+        # Assert
+        assert [part.content_id for part in multipart.parts] == [
+            "root@example.org", "doc1@example.org", "doc2@example.org"
+        ]
+        assert bytes(multipart.parts[2].body) == DOCUMENT.encode()
+
+    def test_part_bodies_are_views_of_request(self, two_document_message):
+        multipart = parse_multipart_related(two_document_message, CONTENT_TYPE)
+
+        assert all(part.body.obj is two_document_message for part in multipart.parts)
+
+    def test_lookup_by_content_id(self, two_document_message):
+        multipart = parse_multipart_related(two_document_message, CONTENT_TYPE)
+
+        assert multipart.get("cid:doc1%40example.org").content_type == "text/xml"
+        assert multipart.get("<doc2@example.org>").content_type == "application/xml"
+        assert multipart.get("missing@example.org") is None
+
+    def test_start_parameter_selects_root(self):
+        # Arrange
+        data = build_message([
+            ("Content-Type: application/soap+xml\nContent-ID: <first@x>", "<a/>"),
+            ("Content-Type: application/xop+xml\nContent-ID: <second@x>", "<b/>"),
+        ])
+
+        # Act
+        multipart = parse_multipart_related(data, CONTENT_TYPE + '; start="<second@x>"')
+
+        # Assert
+        assert multipart.root.content_id == "second@x"
+
+    def test_folded_headers_are_unfolded(self):
+        data = build_message([
+            ("Content-Type: application/xop+xml;\n charset=UTF-8;\n type=\"application/soap+xml\"\nContent-ID: <r@x>", "<a/>"),
+        ])
+
+        part = parse_multipart_related(data, CONTENT_TYPE).parts[0]
+
+        assert part.params == {"charset": "UTF-8", "type": "application/soap+xml"}
+
+    def test_boundary_inside_body_line_is_not_a_delimiter(self):
+        data = build_message([
+            ("Content-Type: text/xml\nContent-ID: <d@x>", f"<a>x--{BOUNDARY}</a>"),
+        ])
+
+        multipart = parse_multipart_related(data, CONTENT_TYPE)
+
+        assert bytes(multipart.parts[0].body) == f"<a>x--{BOUNDARY}</a>".encode()
+
+    def test_base64_part_is_decoded(self):
+        # Arrange
+        encoded = base64.b64encode(DOCUMENT.encode()).decode()
+        data = build_message([
+            ("Content-Type: text/xml\nContent-ID: <d@x>\nContent-Transfer-Encoding: base64", encoded),
+        ])
+
+        # Act
+        part = parse_multipart_related(data, CONTENT_TYPE).parts[0]
+
+        # Assert
+        assert bytes(part.payload()) == DOCUMENT.encode()
+        assert part.text() == DOCUMENT
+
+    def test_missing_boundary_raises(self):
+        with pytest.raises(ValueError, match="no boundary"):
+            parse_multipart_related(b"--x\r\n\r\nbody\r\n--x--", "multipart/related")
+
+    def test_non_multipart_raises(self):
+        with pytest.raises(ValueError, match="non-multipart content"):
+            parse_multipart_related(b"<soap:Envelope/>", "text/xml")
+
+    def test_no_delimiters_raises(self):
+        with pytest.raises(ValueError, match="non-multipart content"):
+            parse_multipart_related(b"This is not a valid MIME message", 'multipart/related; boundary="test"')
+
+
+class TestXopIncludes:
+    """Tests for xop:Include resolution."""
+
+    def test_find_and_resolve(self, two_document_message):
+        # Arrange
+        multipart = parse_multipart_related(two_document_message, CONTENT_TYPE)
+
+        # Act
+        hrefs = find_xop_includes(multipart.root)
+        resolved = resolve_xop_includes(multipart)
+
+        # Assert
+        assert hrefs == ["cid:doc2%40example.org"]
+        assert resolved["cid:doc2%40example.org"].content_id == "doc2@example.org"
+
+    def test_dangling_reference_raises(self):
+        data = build_message([
+            ("Content-Type: application/xop+xml\nContent-ID: <root@x>", SOAP_ENVELOPE),
+            ("Content-Type: text/xml\nContent-ID: <other@x>", DOCUMENT),
+        ])
+
+        with pytest.raises(ValueError, match="no MIME part has that Content-ID"):
+            resolve_xop_includes(parse_multipart_related(data, CONTENT_TYPE))
+
+
+class TestFastExtractMtomParts:
+    """Tests for the endpoint-facing extraction function."""
+
+    def test_selects_part_referenced_by_xop_include(self, two_document_message):
+        result = fast_extract_mtom_parts(two_document_message, CONTENT_TYPE)
+
+        assert result["document_content_id"] == "doc2@example.org"
+        assert bytes(result["document_attachment"]) == DOCUMENT.encode()
+        assert isinstance(result["document_attachment"], memoryview)
+
+    def test_matches_reference_parser_on_mtom_package(self):
+        # Arrange
+        document = DOCUMENT.encode() * 200
+        package = MTOMPackage(SOAP_ENVELOPE.replace("doc2%40example.org", "doc%40ihe-test-util.local").encode())
+        package.add_attachment(MTOMAttachment(document, "doc@ihe-test-util.local", "application/xml"))
+        message, content_type = package.build()
+
+        # Act
+        reference = extract_mtom_parts(message, content_type)
+        fast = fast_extract_mtom_parts(message, content_type)
+
+        # Assert
+        assert bytes(fast["soap_envelope"]).decode() == reference["soap_envelope"]
+        assert bytes(fast["document_attachment"]).decode() == reference["document_attachment"]
+        assert fast["document_content_id"] == reference["document_content_id"]
+
+    def test_missing_soap_envelope_raises(self):
+        data = build_message([("Content-Type: text/xml\nContent-ID: <d@x>", DOCUMENT)])
+
+        with pytest.raises(ValueError, match="Missing SOAP envelope"):
+            fast_extract_mtom_parts(data, CONTENT_TYPE)
+
+    def test_missing_document_raises(self):
+        data = build_message([("Content-Type: application/xop+xml\nContent-ID: <r@x>", "<soap:Envelope/>")])
+
+        with pytest.raises(ValueError, match="Missing CCD document attachment"):
+            fast_extract_mtom_parts(data, CONTENT_TYPE)
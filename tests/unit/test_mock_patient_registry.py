@@ -0,0 +1,231 @@
+"""Unit tests for the mock server patient registry."""
+
+import gzip
+import os
+
+import pytest
+from flask import Flask
+
+from ihe_test_util.ihe_transactions.parsers import parse_acknowledgment
+from ihe_test_util.mock_server import patient_registry as registry_module
+from ihe_test_util.mock_server.config import MockServerConfig, PatientRegistryConfig
+from ihe_test_util.mock_server.iti41_endpoint import register_iti41_endpoint
+from ihe_test_util.mock_server.patient_registry import (
+    PatientRegistry,
+    SharedPatientIndex,
+    close_patient_registry,
+    get_patient_registry,
+    parse_patient_identifier,
+    restore_snapshots,
+    worker_snapshot_path,
+)
+from ihe_test_util.mock_server.pix_add_endpoint import register_pix_add_endpoint
+
+
+BOUNDARY = "MIME_boundary_registry"
+
+PIX_ADD_REQUEST = """<?xml version="1.0" encoding="UTF-8"?>
+<SOAP-ENV:Envelope xmlns:SOAP-ENV="http://schemas.xmlsoap.org/soap/envelope/">
+  <SOAP-ENV:Body>
+    <PRPA_IN201301UV02 xmlns="urn:hl7-org:v3">
+      <id root="1.2.3" extension="MSG-1"/>
+      <controlActProcess><subject><registrationEvent><subject1><patient>
+        <id root="1.2.3.4" extension="PAT-REG"/>
+        <patientPerson><name><given>Jane</given><family>Doe</family></name></patientPerson>
+      </patient></subject1></registrationEvent></subject></controlActProcess>
+    </PRPA_IN201301UV02>
+  </SOAP-ENV:Body>
+</SOAP-ENV:Envelope>"""
+
+SOAP_ENVELOPE = """<?xml version="1.0" encoding="UTF-8"?>
+<soap:Envelope xmlns:soap="http://www.w3.org/2003/05/soap-envelope">
+  <soap:Body>
+    <lcm:SubmitObjectsRequest xmlns:lcm="urn:oasis:names:tc:ebxml-regrep:xsd:lcm:3.0">
+      <rim:RegistryObjectList xmlns:rim="urn:oasis:names:tc:ebxml-regrep:xsd:rim:3.0">
+        <rim:ExtrinsicObject id="Document01" mimeType="text/xml">
+          <rim:Classification classificationScheme="urn:uuid:41a5887f-8865-4c09-adf7-e362475b143a" nodeRepresentation="34133-9"/>
+          <rim:Classification classificationScheme="urn:uuid:f0306f51-975f-434e-a61c-c59651d33983" nodeRepresentation="34133-9"/>
+          <rim:ExternalIdentifier identificationScheme="urn:uuid:58a6f841-87b3-4a3e-92fd-a8ffeff98427" value="PAT-REG^^^&amp;1.2.3.4&amp;ISO"/>
+          <xop:Include xmlns:xop="http://www.w3.org/2004/08/xop/include" href="cid:document@example.org"/>
+        </rim:ExtrinsicObject>
+      </rim:RegistryObjectList>
+    </lcm:SubmitObjectsRequest>
+  </soap:Body>
+</soap:Envelope>"""
+
+ITI41_BODY = (
+    f"--{BOUNDARY}\r\nContent-Type: application/xop+xml\r\nContent-ID: <soap@example.org>\r\n\r\n"
+    f"{SOAP_ENVELOPE}\r\n"
+    f"--{BOUNDARY}\r\nContent-Type: text/xml\r\nContent-ID: <document@example.org>\r\n\r\n"
+    f"<ClinicalDocument/>\r\n--{BOUNDARY}--"
+).encode()
+
+ITI41_CONTENT_TYPE = f'multipart/related; boundary="{BOUNDARY}"; type="application/xop+xml"'
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch):
+    """Start every test without a process-wide registry."""
+    monkeypatch.setattr(registry_module, "_registry", None)
+    monkeypatch.setattr(registry_module, "_snapshot_path", None)
+    monkeypatch.setattr(registry_module, "_timer", None)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Flask app with PIX Add and ITI-41 (strict) and the registry enabled."""
+    monkeypatch.chdir(tmp_path)
+    config = MockServerConfig(
+        log_path=str(tmp_path / "mock.log"),
+        patient_registry={"enabled": True, "duplicate_policy": "reject"},
+        iti41_behavior={"validation_mode": "strict"},
+    )
+    flask_app = Flask(__name__)
+    register_pix_add_endpoint(flask_app, config)
+    register_iti41_endpoint(flask_app, config)
+    return flask_app.test_client()
+
+
+class TestParsePatientIdentifier:
+    """Tests for CX identifier parsing."""
+
+    def test_cx_identifier(self):
+        assert parse_patient_identifier("PAT-1^^^&1.2.3.4&ISO") == ("PAT-1", "1.2.3.4")
+
+    def test_namespace_only_authority(self):
+        assert parse_patient_identifier("PAT-1^^^HOSP") == ("PAT-1", "HOSP")
+
+    def test_bare_identifier(self):
+        assert parse_patient_identifier("PAT-1") == ("PAT-1", "")
+
+
+class TestPatientRegistry:
+    """Tests for registration, lookup and snapshots."""
+
+    def test_register_and_lookup(self):
+        # Arrange
+        registry = PatientRegistry()
+
+        # Act
+        first = registry.register("PAT-1", "1.2.3", {"last_name": "Doe"})
+        second = registry.register("PAT-1", "1.2.3", {"city": "Boston"})
+
+        # Assert
+        assert (first, second) == (True, False)
+        assert registry.contains("PAT-1", "1.2.3")
+        assert not registry.contains("PAT-1", "9.9.9")  # same ID, other authority
+        record = registry.get("PAT-1", "1.2.3")
+        assert record.registrations == 2
+        assert record.demographics == {"last_name": "Doe", "city": "Boston"}
+        assert registry.stats.duplicates == 1
+        assert registry.stats.misses == 1
+
+    def test_snapshot_round_trip(self, tmp_path):
+        # Arrange
+        registry = PatientRegistry()
+        for index in range(100):
+            registry.register(f"PAT-{index}", "1.2.3", {"gender": "F"})
+        path = tmp_path / "patients.jsonl.gz"
+
+        # Act
+        saved = registry.save_snapshot(path)
+        restored = PatientRegistry()
+        loaded = restored.load_snapshot(path)
+
+        # Assert
+        assert saved == loaded == 100
+        assert gzip.decompress(path.read_bytes()).startswith(b'{"format": "ihe-mock-patient-registry"')
+        assert restored.get("PAT-42", "1.2.3").demographics == {"gender": "F"}
+        assert len(restored) == 100
+
+    def test_load_rejects_foreign_file(self, tmp_path):
+        path = tmp_path / "patients.jsonl"
+        path.write_text('{"something": "else"}\n')
+
+        with pytest.raises(ValueError, match="not a patient registry snapshot"):
+            PatientRegistry().load_snapshot(path)
+
+    def test_restore_merges_worker_snapshots(self, tmp_path):
+        # Arrange
+        path = tmp_path / "patients.jsonl"
+        for worker_id in (1, 2):
+            registry = PatientRegistry()
+            registry.register("PAT-SHARED", "1.2.3")
+            registry.register(f"PAT-W{worker_id}", "1.2.3")
+            registry.save_snapshot(worker_snapshot_path(path, worker_id))
+
+        # Act
+        restored = PatientRegistry()
+        restore_snapshots(restored, path)
+
+        # Assert
+        assert worker_snapshot_path(path, 2).name == "patients.worker-2.jsonl"
+        assert len(restored) == 3
+
+    def test_close_saves_snapshot(self, tmp_path):
+        settings = PatientRegistryConfig(enabled=True, snapshot_path=str(tmp_path / "patients.jsonl"))
+        get_patient_registry(settings).register("PAT-1", "1.2.3")
+
+        close_patient_registry()
+
+        assert get_patient_registry(settings).contains("PAT-1", "1.2.3")
+
+
+class TestSharedPatientIndex:
+    """Tests for the cross-process membership index."""
+
+    def test_membership_is_shared_across_fork(self):
+        # Arrange
+        if not hasattr(os, "fork"):
+            pytest.skip("os.fork not available")
+        registry = PatientRegistry(SharedPatientIndex(1024))
+
+        # Act
+        pid = os.fork()
+        if pid == 0:
+            registry.register("PAT-CHILD", "1.2.3")
+            os._exit(0)
+        os.waitpid(pid, 0)
+
+        # Assert
+        assert registry.contains("PAT-CHILD", "1.2.3")
+        assert registry.get("PAT-CHILD", "1.2.3") is None  # records stay per process
+        assert registry.register("PAT-CHILD", "1.2.3") is False
+        assert len(registry) == 1
+
+    def test_full_index_raises(self):
+        index = SharedPatientIndex(1024)
+        for number in range(1024):
+            index.add(f"PAT-{number}", "1.2.3")
+
+        with pytest.raises(ValueError, match="shared_capacity"):
+            index.add("PAT-OVERFLOW", "1.2.3")
+
+
+class TestRegistryEndpoints:
+    """Tests for PIX Add registration and ITI-41 strict checks."""
+
+    def test_duplicate_registration_is_rejected(self, client):
+        # Act
+        first = client.post("/pix/add", data=PIX_ADD_REQUEST, content_type="text/xml")
+        second = client.post("/pix/add", data=PIX_ADD_REQUEST, content_type="text/xml")
+
+        # Assert
+        assert parse_acknowledgment(first.get_data(as_text=True)).status == "AA"
+        ack = parse_acknowledgment(second.get_data(as_text=True))
+        assert second.status_code == 200
+        assert ack.status == "AE"
+        assert "already registered" in ack.details[0].text
+
+    def test_iti41_strict_rejects_unknown_patient(self, client):
+        response = client.post("/iti41/submit", data=ITI41_BODY, content_type=ITI41_CONTENT_TYPE)
+
+        assert response.status_code == 400
+        assert b"XDSUnknownPatientId" in response.data
+
+    def test_iti41_strict_accepts_registered_patient(self, client):
+        client.post("/pix/add", data=PIX_ADD_REQUEST, content_type="text/xml")
+
+        response = client.post("/iti41/submit", data=ITI41_BODY, content_type=ITI41_CONTENT_TYPE)
+
+        assert response.status_code == 200
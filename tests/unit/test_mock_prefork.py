@@ -0,0 +1,375 @@
+"""Unit tests for the pre-fork multi-worker mock server."""
+
+import http.client
+import logging
+import os
+import signal
+import socket
+import threading
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+import pytest
+
+from ihe_test_util.mock_server import app as app_module
+from ihe_test_util.mock_server import prefork
+from ihe_test_util.mock_server.config import MockServerConfig
+from ihe_test_util.mock_server.prefork import (
+    KeepAliveRequestHandler,
+    PooledWSGIServer,
+    RespawnPolicy,
+    WorkerStats,
+    _reopen_worker_log_files,
+    create_listening_socket,
+    run_prefork_server,
+    worker_log_path,
+)
+
+
+@pytest.fixture
+def worker_context():
+    """Install a worker context on the app and restore it afterwards."""
+    original_id = app_module._worker_id
+    original_stats = app_module._worker_stats
+    original_count = app_module._request_count
+    yield
+    app_module._worker_id = original_id
+    app_module._worker_stats = original_stats
+    app_module._request_count = original_count
+
+
+@pytest.fixture
+def pooled_server():
+    """Serve the Flask app from a PooledWSGIServer on an ephemeral port."""
+    server = PooledWSGIServer("127.0.0.1", 0, app_module.app, threads=4)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.drain(timeout=2)
+    server.server_close()
+    thread.join(timeout=2)
+
+
+class TestWorkerStats:
+    """Tests for shared per-worker counters."""
+
+    def test_increment_and_total(self):
+        # Arrange
+        stats = WorkerStats(3)
+
+        # Act
+        stats.increment(1)
+        stats.increment(1)
+        stats.increment(3)
+
+        # Assert
+        assert stats.total_requests() == 3
+
+    def test_snapshot_reports_each_worker(self):
+        # Arrange
+        stats = WorkerStats(2)
+        stats.register(1, os.getpid())
+        stats.increment(1)
+
+        # Act
+        snapshot = stats.snapshot()
+
+        # Assert
+        assert [worker["worker_id"] for worker in snapshot] == [1, 2]
+        assert snapshot[0]["pid"] == os.getpid()
+        assert snapshot[0]["alive"] is True
+        assert snapshot[0]["request_count"] == 1
+        assert snapshot[1]["pid"] == 0
+        assert snapshot[1]["alive"] is False
+        assert snapshot[1]["uptime_seconds"] == 0
+
+    def test_counters_visible_across_fork(self):
+        # Arrange
+        if not hasattr(os, "fork"):
+            pytest.skip("os.fork not available")
+        stats = WorkerStats(2)
+
+        # Act
+        pid = os.fork()
+        if pid == 0:
+            stats.increment(2)
+            os._exit(0)
+        os.waitpid(pid, 0)
+
+        # Assert
+        assert stats.snapshot()[1]["request_count"] == 1
+
+
+class TestWorkerLogPath:
+    """Tests for per-worker log file naming."""
+
+    def test_inserts_worker_suffix(self):
+        assert worker_log_path("mocks/logs/mock-server.log", 2) == Path(
+            "mocks/logs/mock-server.worker-2.log"
+        )
+
+    def test_reopen_worker_log_files(self, tmp_path, monkeypatch):
+        # Arrange: only reopen this test's logger, not the real mock loggers
+        monkeypatch.setattr(prefork, "MOCK_LOGGER_PREFIX", "ihe_test_util.prefork_test")
+        test_logger = logging.getLogger("ihe_test_util.prefork_test.endpoint")
+        base_handler = RotatingFileHandler(
+            tmp_path / "endpoint.log", maxBytes=1024, backupCount=2
+        )
+        base_handler.setLevel(logging.WARNING)
+        test_logger.addHandler(base_handler)
+
+        try:
+            # Act
+            _reopen_worker_log_files(3)
+
+            # Assert
+            handlers = [
+                h for h in test_logger.handlers if isinstance(h, RotatingFileHandler)
+            ]
+            assert len(handlers) == 1
+            assert handlers[0].baseFilename == str(tmp_path / "endpoint.worker-3.log")
+            assert handlers[0].maxBytes == 1024
+            assert handlers[0].level == logging.WARNING
+        finally:
+            for handler in list(test_logger.handlers):
+                test_logger.removeHandler(handler)
+                handler.close()
+
+
+class TestCreateListeningSocket:
+    """Tests for listening socket creation."""
+
+    def test_binds_ephemeral_port(self):
+        sock = create_listening_socket("127.0.0.1", 0)
+        try:
+            assert sock.getsockname()[1] > 0
+            assert sock.get_inheritable() is True
+        finally:
+            sock.close()
+
+    def test_reuse_port_allows_second_bind(self):
+        if not hasattr(socket, "SO_REUSEPORT"):
+            pytest.skip("SO_REUSEPORT not available")
+        first = create_listening_socket("127.0.0.1", 0, reuse_port=True)
+        try:
+            port = first.getsockname()[1]
+            second = create_listening_socket("127.0.0.1", port, reuse_port=True)
+            second.close()
+        finally:
+            first.close()
+
+    def test_reuse_port_unsupported_raises(self, monkeypatch):
+        monkeypatch.delattr(socket, "SO_REUSEPORT", raising=False)
+        with pytest.raises(ValueError, match="SO_REUSEPORT"):
+            create_listening_socket("127.0.0.1", 0, reuse_port=True)
+
+
+class TestPooledWSGIServer:
+    """Tests for the thread-pooled keep-alive server."""
+
+    def test_uses_keepalive_handler(self, pooled_server):
+        assert pooled_server.RequestHandlerClass is KeepAliveRequestHandler
+        assert KeepAliveRequestHandler.protocol_version == "HTTP/1.1"
+
+    def test_serves_multiple_requests_on_one_connection(self, pooled_server):
+        # Arrange
+        connection = http.client.HTTPConnection("127.0.0.1", pooled_server.port, timeout=5)
+
+        try:
+            # Act
+            sockets = []
+            for _ in range(3):
+                connection.request("GET", "/health")
+                response = connection.getresponse()
+                response.read()
+                assert response.status == 200
+                assert response.getheader("Connection") == "keep-alive"
+                sockets.append(connection.sock)
+        finally:
+            connection.close()
+
+        # Assert - http.client drops its socket when the server closes it
+        assert sockets[0] is not None
+        assert all(sock is sockets[0] for sock in sockets)
+
+    def test_request_bodies_on_kept_alive_connection(self):
+        # Arrange
+        def echo_app(environ, start_response):
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+            body = environ["wsgi.input"].read(length)
+            start_response("200 OK", [("Content-Type", "text/plain")])
+            return [b"echo:", body]
+
+        server = PooledWSGIServer("127.0.0.1", 0, echo_app, threads=2)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+
+        try:
+            # Act
+            bodies = []
+            for payload in (b"first", b"second" * 1000):
+                connection.request("POST", "/", body=payload)
+                bodies.append(connection.getresponse().read())
+            connection.request("POST", "/", body=b"last", headers={"Connection": "close"})
+            last = connection.getresponse()
+            last.read()
+        finally:
+            connection.close()
+            server.shutdown()
+            server.drain(timeout=2)
+            server.server_close()
+
+        # Assert
+        assert bodies == [b"echo:first", b"echo:" + b"second" * 1000]
+        assert last.getheader("Connection") == "close"
+
+    def test_application_error_returns_500(self):
+        # Arrange
+        def failing_app(environ, start_response):
+            raise RuntimeError("boom")
+
+        server = PooledWSGIServer("127.0.0.1", 0, failing_app, threads=1)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        try:
+            # Act
+            connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+            connection.request("GET", "/")
+            response = connection.getresponse()
+            response.read()
+            connection.close()
+        finally:
+            server.shutdown()
+            server.drain(timeout=2)
+            server.server_close()
+
+        # Assert
+        assert response.status == 500
+
+
+class TestHealthAggregation:
+    """Tests for /health in multi-worker mode."""
+
+    def test_health_reports_all_workers(self, worker_context):
+        # Arrange
+        stats = WorkerStats(2)
+        stats.register(1, os.getpid())
+        stats.increment(2)
+        stats.increment(2)
+        app_module.set_worker_context(1, stats)
+        client = app_module.app.test_client()
+
+        # Act
+        data = client.get("/health").get_json()
+
+        # Assert
+        assert data["worker_id"] == 1
+        assert len(data["workers"]) == 2
+        assert data["request_count"] == 3  # two on worker 2 + this request
+        assert data["workers"][0]["request_count"] == 1
+
+    def test_single_process_health_unchanged(self, worker_context):
+        app_module._worker_stats = None
+        data = app_module.app.test_client().get("/health").get_json()
+        assert "workers" not in data
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestRespawnPolicy:
+    """Tests for worker respawn backoff and crash-loop detection."""
+
+    def test_quick_failures_back_off_then_give_up(self):
+        # Arrange
+        clock = FakeClock()
+        policy = RespawnPolicy(
+            quick_failure_seconds=10, initial_backoff=0.5, max_backoff=1.5,
+            max_quick_failures=4, clock=clock,
+        )
+
+        # Act
+        delays = []
+        for _ in range(4):
+            policy.started(1)
+            clock.now += 1
+            delays.append(policy.exited(1))
+
+        # Assert
+        assert delays == [0.5, 1.0, 1.5, None]
+
+    def test_long_running_worker_resets_failures(self):
+        # Arrange
+        clock = FakeClock()
+        policy = RespawnPolicy(quick_failure_seconds=10, max_quick_failures=2, clock=clock)
+        policy.started(1)
+        clock.now += 1
+        policy.exited(1)
+
+        # Act
+        policy.started(1)
+        clock.now += 60
+        after_long_run = policy.exited(1)
+        policy.started(1)
+        clock.now += 1
+        next_quick_failure = policy.exited(1)
+
+        # Assert
+        assert after_long_run == 0.0
+        assert next_quick_failure == policy.initial_backoff
+
+    def test_workers_tracked_separately(self):
+        # Arrange
+        clock = FakeClock()
+        policy = RespawnPolicy(max_quick_failures=2, clock=clock)
+        policy.started(1)
+        policy.started(2)
+
+        # Act
+        first = policy.exited(1)
+        second = policy.exited(2)
+
+        # Assert
+        assert first == second == policy.initial_backoff
+
+
+class TestRunPreforkServerValidation:
+    """Tests for argument validation."""
+
+    def test_rejects_zero_workers(self):
+        with pytest.raises(ValueError, match="at least 1"):
+            run_prefork_server("127.0.0.1", 0, config=None, workers=0)
+
+    def test_crash_looping_worker_stops_master(self, monkeypatch):
+        # Arrange
+        if not hasattr(os, "fork"):
+            pytest.skip("os.fork not available")
+
+        def failing_worker(worker_id, **kwargs):
+            raise OSError("certificate not found")
+
+        monkeypatch.setattr(prefork, "_serve_worker", failing_worker)
+        monkeypatch.setattr(
+            prefork,
+            "RespawnPolicy",
+            lambda: RespawnPolicy(initial_backoff=0.01, max_backoff=0.05, max_quick_failures=3),
+        )
+        previous_handlers = {sig: signal.getsignal(sig) for sig in (signal.SIGTERM, signal.SIGINT)}
+
+        # Act & Assert
+        try:
+            with pytest.raises(RuntimeError, match="exited 3 times in a row"):
+                run_prefork_server("127.0.0.1", 0, config=MockServerConfig(), workers=2)
+        finally:
+            for sig, handler in previous_handlers.items():
+                signal.signal(sig, handler)
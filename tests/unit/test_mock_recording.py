@@ -0,0 +1,211 @@
+"""Unit tests for record/replay of mock endpoint traffic."""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+import requests
+from click.testing import CliRunner
+from flask import Flask, request
+
+from ihe_test_util.cli.mock_commands import mock_group
+from ihe_test_util.mock_server import recording as recording_module
+from ihe_test_util.mock_server.config import MockServerConfig
+from ihe_test_util.mock_server.iti41_endpoint import register_iti41_endpoint
+from ihe_test_util.mock_server.latency import DEFER_SUPPORTED_ENVIRON_KEY, RESPONSE_DELAY_ENVIRON_KEY
+from ihe_test_util.mock_server.pix_add_endpoint import register_pix_add_endpoint
+from ihe_test_util.mock_server.recording import TrafficArchive, TrafficRecorder, close_traffic_recorder
+
+
+PIX_ADD_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<SOAP-ENV:Envelope xmlns:SOAP-ENV="http://schemas.xmlsoap.org/soap/envelope/">
+  <SOAP-ENV:Body>
+    <PRPA_IN201301UV02 xmlns="urn:hl7-org:v3">
+      <id root="1.2.3" extension="MSG-1"/>
+      <controlActProcess><subject><registrationEvent><subject1><patient>
+        <id root="1.2.3.4" extension="{patient_id}"/>
+      </patient></subject1></registrationEvent></subject></controlActProcess>
+    </PRPA_IN201301UV02>
+  </SOAP-ENV:Body>
+</SOAP-ENV:Envelope>"""
+
+UPSTREAM_ACK = b"<ack>upstream AA</ack>"
+
+
+@pytest.fixture(autouse=True)
+def fresh_recording_state(monkeypatch):
+    """Start every test without cached recorders or archives."""
+    monkeypatch.setattr(recording_module, "_recorder", None)
+    monkeypatch.setattr(recording_module, "_archives", {})
+    yield
+    close_traffic_recorder()
+
+
+def make_client(tmp_path, monkeypatch, record_replay):
+    """Flask app with PIX Add and ITI-41 and the given record/replay settings."""
+    monkeypatch.chdir(tmp_path)
+    config = MockServerConfig(
+        log_path=str(tmp_path / "mock.log"),
+        record_replay={"archive_dir": str(tmp_path / "recordings"), **record_replay},
+    )
+    flask_app = Flask(__name__)
+    register_pix_add_endpoint(flask_app, config)
+    register_iti41_endpoint(flask_app, config)
+
+    @flask_app.after_request
+    def expose_delay(response):
+        response.headers["X-Test-Delay"] = str(request.environ.get(RESPONSE_DELAY_ENVIRON_KEY, 0.0))
+        return response
+
+    return flask_app.test_client()
+
+
+def post_pix_add(client, patient_id):
+    return client.post(
+        "/pix/add",
+        data=PIX_ADD_TEMPLATE.format(patient_id=patient_id),
+        content_type="text/xml",
+        environ_base={DEFER_SUPPORTED_ENVIRON_KEY: True},
+    )
+
+
+class TestTrafficArchive:
+    """Tests for the recording archive format."""
+
+    def test_round_trip_and_round_robin(self, tmp_path):
+        # Arrange
+        recorder = TrafficRecorder(tmp_path)
+        recorder.record("pix_add", "PAT-1", b"req-1", "text/xml", b"resp-1", "text/xml", 200, 12.5)
+        recorder.record("pix_add", "PAT-1", b"req-2", "text/xml", b"resp-2", "text/xml", 500, 30.0)
+        recorder.record("iti41", "PAT-1", b"req-3", "multipart/related", b"resp-3", "application/soap+xml", 200, 80.0)
+        recorder.close()
+
+        # Act
+        archive = TrafficArchive(tmp_path)
+        first = archive.match("pix_add", "PAT-1")
+        second = archive.match("pix_add", "PAT-1")
+        third = archive.match("pix_add", "PAT-1")
+
+        # Assert
+        assert len(archive) == 3
+        assert (archive.read_response(first), first.status, first.latency_ms) == (b"resp-1", 200, 12.5)
+        assert (archive.read_response(second), second.status) == (b"resp-2", 500)
+        assert third == first
+        assert archive.read_request(archive.match("iti41", "PAT-1")) == b"req-3"
+        assert archive.match("pix_add", "PAT-2") is None
+
+    def test_corrupt_index_lines_are_skipped(self, tmp_path):
+        recorder = TrafficRecorder(tmp_path)
+        recorder.record("pix_add", "PAT-1", b"req", "text/xml", b"resp", "text/xml", 200, 1.0)
+        recorder.close()
+        index_path = next(tmp_path.glob("*.idx.jsonl"))
+        with open(index_path, "a") as f:
+            f.write("not json\n")
+
+        assert len(TrafficArchive(tmp_path)) == 1
+
+
+class TestRecordMode:
+    """Tests for proxying and recording."""
+
+    def test_proxies_and_records(self, tmp_path, monkeypatch):
+        # Arrange
+        client = make_client(
+            tmp_path, monkeypatch, {"mode": "record", "upstream_pix_add_url": "http://pix.example/add"}
+        )
+        upstream = SimpleNamespace(
+            status_code=200, content=UPSTREAM_ACK, headers={"Content-Type": "text/xml"}
+        )
+
+        # Act
+        with patch.object(recording_module.requests, "post", return_value=upstream) as post:
+            response = post_pix_add(client, "PAT-REC")
+        close_traffic_recorder()
+
+        # Assert
+        assert response.status_code == 200
+        assert response.data == UPSTREAM_ACK
+        assert post.call_args.args[0] == "http://pix.example/add"
+        assert b"PAT-REC" in post.call_args.kwargs["data"]
+        archive = TrafficArchive(tmp_path / "recordings")
+        entry = archive.match("pix_add", "PAT-REC")
+        assert archive.read_response(entry) == UPSTREAM_ACK
+        assert entry.latency_ms >= 0.0
+
+    def test_upstream_error_returns_502(self, tmp_path, monkeypatch):
+        client = make_client(
+            tmp_path, monkeypatch, {"mode": "record", "upstream_pix_add_url": "http://pix.example/add"}
+        )
+
+        with patch.object(
+            recording_module.requests, "post", side_effect=requests.ConnectionError("refused")
+        ):
+            response = post_pix_add(client, "PAT-REC")
+
+        assert response.status_code == 502
+        assert b"Upstream request failed" in response.data
+
+    def test_missing_upstream_url_returns_502(self, tmp_path, monkeypatch):
+        client = make_client(tmp_path, monkeypatch, {"mode": "record"})
+
+        response = client.post("/iti41/submit", data=b"--x--", content_type="multipart/related; boundary=x")
+
+        assert response.status_code == 502
+        assert b"upstream_iti41_url" in response.data
+
+
+class TestReplayMode:
+    """Tests for answering from recordings."""
+
+    @pytest.fixture
+    def recorded(self, tmp_path):
+        recorder = TrafficRecorder(tmp_path / "recordings")
+        recorder.record("pix_add", "PAT-1", b"", "text/xml", UPSTREAM_ACK, "text/xml", 200, 40.0)
+        recorder.close()
+
+    def test_replays_with_scaled_latency(self, tmp_path, monkeypatch, recorded):
+        client = make_client(tmp_path, monkeypatch, {"mode": "replay", "latency_scale": 0.5})
+
+        response = post_pix_add(client, "PAT-1")
+
+        assert response.status_code == 200
+        assert response.data == UPSTREAM_ACK
+        assert float(response.headers["X-Test-Delay"]) == pytest.approx(0.020)  # seconds
+
+    def test_miss_falls_back_to_mock(self, tmp_path, monkeypatch, recorded):
+        client = make_client(tmp_path, monkeypatch, {"mode": "replay"})
+
+        response = post_pix_add(client, "PAT-OTHER")
+
+        assert response.status_code == 200
+        assert b"MCCI_IN000002UV01" in response.data
+
+    def test_miss_fault_policy(self, tmp_path, monkeypatch, recorded):
+        client = make_client(tmp_path, monkeypatch, {"mode": "replay", "on_miss": "fault"})
+
+        response = post_pix_add(client, "PAT-OTHER")
+
+        assert response.status_code == 404
+        assert b"No recorded response" in response.data
+
+
+class TestRecordingsCommand:
+    """Tests for `mock recordings`."""
+
+    def test_lists_and_shows(self, tmp_path):
+        # Arrange
+        recorder = TrafficRecorder(tmp_path)
+        recorder.record("pix_add", "PAT-1", b"req", "text/xml", UPSTREAM_ACK, "text/xml", 200, 5.0)
+        recorder.record("iti41", "PAT-2", b"req", "multipart/related", b"<rr/>", "application/soap+xml", 200, 9.0)
+        recorder.close()
+        runner = CliRunner()
+
+        # Act
+        listing = runner.invoke(mock_group, ["recordings", "--archive-dir", str(tmp_path), "--transaction", "iti41"])
+        shown = runner.invoke(mock_group, ["recordings", "--archive-dir", str(tmp_path), "--patient-id", "PAT-1", "--show"])
+
+        # Assert
+        assert listing.exit_code == 0
+        assert "patient=PAT-2" in listing.output
+        assert "PAT-1" not in listing.output
+        assert "upstream AA" in shown.output
@@ -0,0 +1,99 @@
+"""Unit tests for precompiled mock response templates."""
+
+import pytest
+from lxml import etree
+
+from ihe_test_util.mock_server.iti41_endpoint import (
+    _build_registry_response_template,
+    generate_registry_response,
+    generate_soap_fault,
+)
+from ihe_test_util.mock_server.pix_add_endpoint import generate_acknowledgment
+from ihe_test_util.mock_server.response_templates import (
+    ResponseTemplate,
+    escape_xml,
+    render_soap_fault,
+)
+
+
+class TestResponseTemplate:
+    """Tests for template compilation and rendering."""
+
+    def test_render_splices_values(self):
+        template = ResponseTemplate('<a id="{{id}}">{{text}}</a>')
+
+        assert template.slot_names == {"id", "text"}
+        assert template.render(id="1", text="hello") == b'<a id="1">hello</a>'
+
+    def test_values_are_escaped(self):
+        template = ResponseTemplate('<a id="{{id}}">{{text}}</a>')
+
+        rendered = template.render(id='x"y', text="<b>&</b>")
+
+        assert rendered == b'<a id="x&quot;y">&lt;b&gt;&amp;&lt;/b&gt;</a>'
+        assert etree.fromstring(rendered).get("id") == 'x"y'
+
+    def test_repeated_slot(self):
+        template = ResponseTemplate("<a>{{v}}-{{v}}</a>")
+
+        assert template.render(v="1") == b"<a>1-1</a>"
+
+    def test_missing_value_raises(self):
+        with pytest.raises(ValueError, match="Missing value for response template slot 'b'"):
+            ResponseTemplate("<a>{{a}}{{b}}</a>").render(a="1")
+
+    def test_non_ascii_values_are_utf8(self):
+        assert ResponseTemplate("<a>{{v}}</a>").render(v="Müller") == "<a>Müller</a>".encode()
+
+    def test_escape_returns_plain_values_unchanged(self):
+        value = "urn:uuid:1234"
+
+        assert escape_xml(value) is value
+
+    def test_from_element_keeps_placeholders(self):
+        template = _build_registry_response_template()
+
+        assert template.slot_names == {
+            "request_id", "submission_set_id", "document_unique_id", "response_id", "timestamp"
+        }
+
+
+class TestRenderedResponses:
+    """Tests that template output is well-formed for awkward values."""
+
+    def test_acknowledgment_with_special_characters(self):
+        ack_xml = generate_acknowledgment("MSG&1", "1.2.3", 'PAT"<1>', "1.2.4")
+
+        tree = etree.fromstring(ack_xml.encode("utf-8"))
+        ns = {"hl7": "urn:hl7-org:v3"}
+        assert tree.find(".//hl7:targetMessage/hl7:id", ns).get("extension") == "MSG&1"
+        assert tree.find(".//hl7:patient/hl7:id", ns).get("extension") == 'PAT"<1>'
+
+    def test_acknowledgment_message_ids_are_unique(self):
+        first = generate_acknowledgment("M", "1.2", "P", "1.3")
+        second = generate_acknowledgment("M", "1.2", "P", "1.3")
+
+        ns = {"hl7": "urn:hl7-org:v3"}
+        ids = [
+            etree.fromstring(xml.encode()).find(".//hl7:MCCI_IN000002UV01/hl7:id", ns).get("extension")
+            for xml in (first, second)
+        ]
+        assert ids[0] != ids[1]
+
+    def test_registry_response_with_special_characters(self):
+        response_xml = generate_registry_response("req", "SS<1>", "DOC&1")
+
+        tree = etree.fromstring(response_xml.encode("utf-8"))
+        values = tree.xpath(
+            "//rim:Value/text()", namespaces={"rim": "urn:oasis:names:tc:ebxml-regrep:xsd:rim:3.0"}
+        )
+        assert values[:2] == ["SS<1>", "DOC&1"]
+
+    def test_fault_detail_with_markup_is_well_formed(self):
+        fault_xml = generate_soap_fault("soap:Sender", "Invalid XDSb Metadata", "Missing <rim:Slot> & more")
+
+        tree = etree.fromstring(fault_xml.encode("utf-8"))
+        assert tree.find(".//error").text == "Missing <rim:Slot> & more"
+
+    def test_fault_without_detail_has_no_detail_element(self):
+        assert b"soap:Detail" not in render_soap_fault("soap:Receiver", "Boom")
@@ -0,0 +1,235 @@
+"""Unit tests for asynchronous ITI-41 submission logging."""
+
+import gzip
+import os
+import time
+
+import pytest
+from click.testing import CliRunner
+from flask import Flask
+
+from ihe_test_util.cli.mock_commands import mock_group
+from ihe_test_util.mock_server import submission_log
+from ihe_test_util.mock_server.config import (
+    MockServerConfig,
+    SubmissionLogConfig,
+)
+from ihe_test_util.mock_server.document_store import DocumentStore
+from ihe_test_util.mock_server.iti41_endpoint import register_iti41_endpoint
+from ihe_test_util.mock_server.submission_log import (
+    SubmissionArchive,
+    SubmissionLogWriter,
+    SubmissionRecord,
+    close_submission_log_writer,
+)
+
+
+BOUNDARY = "MIME_boundary_archive"
+
+SOAP_ENVELOPE = """<?xml version="1.0" encoding="UTF-8"?>
+<soap:Envelope xmlns:soap="http://www.w3.org/2003/05/soap-envelope">
+  <soap:Body>
+    <lcm:SubmitObjectsRequest xmlns:lcm="urn:oasis:names:tc:ebxml-regrep:xsd:lcm:3.0">
+      <rim:RegistryObjectList xmlns:rim="urn:oasis:names:tc:ebxml-regrep:xsd:rim:3.0">
+        <rim:RegistryPackage id="SubmissionSet01">
+          <rim:ExternalIdentifier identificationScheme="urn:uuid:96fdda7c-d067-4183-912e-bf5ee74998a8" value="SS_ARCHIVE_001"/>
+        </rim:RegistryPackage>
+        <rim:ExtrinsicObject id="Document01" mimeType="text/xml">
+          <rim:ExternalIdentifier identificationScheme="urn:uuid:2e82c1f6-a085-4c72-9da3-8640a32e42ab" value="DOC_ARCHIVE_001"/>
+          <rim:ExternalIdentifier identificationScheme="urn:uuid:58a6f841-87b3-4a3e-92fd-a8ffeff98427" value="PAT-ARCHIVE"/>
+          <xop:Include xmlns:xop="http://www.w3.org/2004/08/xop/include" href="cid:document@example.org"/>
+        </rim:ExtrinsicObject>
+      </rim:RegistryObjectList>
+    </lcm:SubmitObjectsRequest>
+  </soap:Body>
+</soap:Envelope>"""
+
+DOCUMENT = '<?xml version="1.0"?><ClinicalDocument xmlns="urn:hl7-org:v3"><id extension="CCD_ARCHIVE"/></ClinicalDocument>'
+
+
+def make_record(index: int, patient_id: str = "PAT1", document_store=None) -> SubmissionRecord:
+    return SubmissionRecord(
+        request_id=f"req-{index}",
+        timestamp="20250101_120000",
+        submission_set_id=f"ss-{index}",
+        document_unique_id=f"doc-{index}",
+        patient_id=patient_id,
+        metadata={"class_code": "34133-9"},
+        soap_envelope=b"<soap:Envelope/>",
+        document=memoryview(f"<ClinicalDocument>{index}</ClinicalDocument>".encode()),
+        document_store=document_store,
+    )
+
+
+@pytest.fixture
+def settings(tmp_path):
+    return SubmissionLogConfig(mode="archive", archive_dir=str(tmp_path / "archive"), flush_interval_ms=20)
+
+
+class TestSubmissionLogWriter:
+    """Tests for the background writer and the archive reader."""
+
+    def test_records_are_indexed_and_readable(self, settings):
+        # Arrange
+        writer = SubmissionLogWriter(settings)
+
+        # Act
+        for index in range(5):
+            writer.submit(make_record(index, patient_id="PAT-A" if index % 2 else "PAT-B"))
+        writer.close()
+
+        # Assert
+        archive = SubmissionArchive(settings.archive_dir)
+        entries = archive.find(patient_id="PAT-A")
+        assert [entry.request_id for entry in entries] == ["req-1", "req-3"]
+        record = archive.read_record(archive.find(request_id="req-3")[0])
+        assert b"Request ID: req-3" in record
+        assert b"class_code: 34133-9" in record
+        assert archive.read_document(entries[0]) == b"<ClinicalDocument>1</ClinicalDocument>"
+        assert writer.stats.written == 5
+
+    def test_submissions_are_batched(self, settings):
+        writer = SubmissionLogWriter(settings.model_copy(update={"flush_interval_ms": 500}))
+
+        for index in range(20):
+            writer.submit(make_record(index))
+        writer.close()
+
+        assert writer.stats.batches < 20
+        assert writer.stats.written == 20
+
+    def test_segments_are_plain_gzip(self, settings, tmp_path):
+        # Arrange
+        writer = SubmissionLogWriter(settings.model_copy(update={"batch_size": 2}))
+        for index in range(4):
+            writer.submit(make_record(index))
+        writer.close()
+
+        # Act
+        segment = next((tmp_path / "archive").glob("*.log.gz"))
+        text = gzip.decompress(segment.read_bytes())
+
+        # Assert - every batch member decompresses as one stream
+        assert text.count(b"=== ITI-41 Transaction Log ===") == 4
+
+    def test_segments_rotate(self, settings, tmp_path):
+        writer = SubmissionLogWriter(
+            settings.model_copy(update={"segment_max_bytes": 1024, "batch_size": 1, "compression_level": 1})
+        )
+        big = make_record(0)
+        big.document = os.urandom(4096)  # incompressible, so each batch exceeds 1 KB
+
+        for _ in range(3):
+            writer.submit(big)
+        writer.close()
+
+        assert writer.stats.segments == 3
+        assert len(list((tmp_path / "archive").glob("*.idx.jsonl"))) == 3
+        assert len(SubmissionArchive(tmp_path / "archive").find()) == 3
+
+    def test_documents_saved_off_request_thread(self, settings, tmp_path):
+        writer = SubmissionLogWriter(settings)
+        store = DocumentStore(tmp_path / "documents")
+
+        writer.submit(make_record(7, document_store=store))
+        writer.flush(timeout=5)
+        writer.close()
+
+        assert store.get("doc-7") == b"<ClinicalDocument>7</ClinicalDocument>"
+        assert writer.stats.documents_saved == 1
+
+    def test_drop_policy_drops_when_full(self, settings, monkeypatch):
+        # Arrange - a writer whose thread never runs keeps the queue full
+        writer = SubmissionLogWriter(settings.model_copy(update={"queue_size": 1, "overflow_policy": "drop"}))
+        monkeypatch.setattr(writer, "_ensure_started", lambda: None)
+
+        # Act
+        accepted = [writer.submit(make_record(index)) for index in range(3)]
+
+        # Assert
+        assert accepted == [True, False, False]
+        assert writer.stats.dropped == 2
+
+    def test_block_policy_waits_then_drops(self, settings, monkeypatch):
+        writer = SubmissionLogWriter(settings.model_copy(update={"queue_size": 1, "block_timeout_ms": 50}))
+        monkeypatch.setattr(writer, "_ensure_started", lambda: None)
+        writer.submit(make_record(0))
+
+        start = time.perf_counter()
+        accepted = writer.submit(make_record(1))
+
+        assert accepted is False
+        assert time.perf_counter() - start >= 0.04
+
+    def test_block_policy_waits_for_writer(self, settings):
+        writer = SubmissionLogWriter(settings.model_copy(update={"queue_size": 1, "batch_size": 1}))
+
+        accepted = [writer.submit(make_record(index)) for index in range(10)]
+        writer.close()
+
+        assert all(accepted)
+        assert writer.stats.written == 10
+
+
+class TestArchiveModeEndpoint:
+    """Tests for the ITI-41 endpoint in archive mode."""
+
+    def test_submission_is_archived(self, tmp_path):
+        # Arrange
+        config = MockServerConfig(
+            submission_log={"mode": "archive", "archive_dir": str(tmp_path), "flush_interval_ms": 10}
+        )
+        app = Flask(__name__)
+        register_iti41_endpoint(app, config)
+        body = (
+            f"--{BOUNDARY}\r\nContent-Type: application/xop+xml\r\nContent-ID: <soap@example.org>\r\n\r\n"
+            f"{SOAP_ENVELOPE}\r\n"
+            f"--{BOUNDARY}\r\nContent-Type: text/xml\r\nContent-ID: <document@example.org>\r\n\r\n"
+            f"{DOCUMENT}\r\n--{BOUNDARY}--"
+        ).encode()
+
+        try:
+            # Act
+            response = app.test_client().post(
+                "/iti41/submit",
+                data=body,
+                content_type=f'multipart/related; boundary="{BOUNDARY}"; type="application/xop+xml"',
+            )
+            submission_log._writer.flush(timeout=5)
+        finally:
+            close_submission_log_writer()
+
+        # Assert
+        assert response.status_code == 200
+        entries = SubmissionArchive(tmp_path).find(patient_id="PAT-ARCHIVE")
+        assert len(entries) == 1
+        assert entries[0].document_unique_id == "DOC_ARCHIVE_001"
+        assert SubmissionArchive(tmp_path).read_document(entries[0]) == DOCUMENT.encode()
+
+
+class TestSubmissionsCommand:
+    """Tests for `mock submissions`."""
+
+    def test_lists_and_shows_matches(self, settings):
+        # Arrange
+        writer = SubmissionLogWriter(settings)
+        writer.submit(make_record(1, patient_id="PAT-X"))
+        writer.submit(make_record(2, patient_id="PAT-Y"))
+        writer.close()
+        runner = CliRunner()
+
+        # Act
+        listing = runner.invoke(mock_group, ["submissions", "--archive-dir", settings.archive_dir, "--patient-id", "PAT-Y"])
+        shown = runner.invoke(mock_group, ["submissions", "--archive-dir", settings.archive_dir, "--request-id", "req-1", "--show"])
+
+        # Assert
+        assert listing.exit_code == 0
+        assert "req-2" in listing.output
+        assert "req-1" not in listing.output
+        assert "=== CCD Document ===" in shown.output
+
+    def test_no_matches(self, tmp_path):
+        result = CliRunner().invoke(mock_group, ["submissions", "--archive-dir", str(tmp_path)])
+
+        assert result.exit_code == 0
+        assert "No matching submissions" in result.output
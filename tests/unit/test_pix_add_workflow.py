@@ -14,7 +14,7 @@ import pytest
 from requests import ConnectionError, Timeout
 from requests.exceptions import SSLError
 
-from ihe_test_util.config.schema import Config
+from ihe_test_util.config.schema import Config, EndpointsConfig
 from ihe_test_util.ihe_transactions.workflows import (
     PIXAddWorkflow,
     ErrorCategory,
@@ -36,8 +36,10 @@ def mock_config():
     config = Mock(spec=Config)
     
     # Endpoints
-    config.endpoints = Mock()
-    config.endpoints.pix_add_url = "https://pix.example.com/pix/add"
+    config.endpoints = EndpointsConfig(
+        pix_add_url="https://pix.example.com/pix/add",
+        iti41_url="https://xds.example.com/xdsrepository",
+    )
     
     # SAML configuration
     config.saml = Mock()
@@ -501,6 +503,53 @@ class TestProcessBatch:
         assert mock_process_patient.call_count == 2  # Stopped at patient 2
 
 
+class TestRowToPatientDemographics:
+    """Test conversion of CSV rows to PatientDemographics."""
+
+    def test_empty_optional_cells_become_none(self, mock_config):
+        """Test NaN optional cells map to None instead of float NaN."""
+        # Arrange
+        workflow = PIXAddWorkflow(mock_config)
+        row = pd.Series({
+            "patient_id": "PAT001",
+            "patient_id_oid": "1.2.3.4.5",
+            "first_name": "John",
+            "last_name": "Doe",
+            "dob": "1980-01-15",
+            "gender": "M",
+            "mrn": float("nan"),
+            "zip": float("nan"),
+        })
+
+        # Act
+        patient = workflow._row_to_patient_demographics(row)
+
+        # Assert
+        assert patient.mrn is None
+        assert patient.zip is None
+        assert patient.email is None
+
+    def test_numeric_optional_cells_become_text(self, mock_config):
+        """Test numeric optional cells (e.g. ZIP codes) are converted to str."""
+        # Arrange
+        workflow = PIXAddWorkflow(mock_config)
+        row = pd.Series({
+            "patient_id": "PAT001",
+            "patient_id_oid": "1.2.3.4.5",
+            "first_name": "John",
+            "last_name": "Doe",
+            "dob": "1980-01-15",
+            "gender": "M",
+            "zip": 62701,
+        })
+
+        # Act
+        patient = workflow._row_to_patient_demographics(row)
+
+        # Assert
+        assert patient.zip == "62701"
+
+
 class TestSaveRegisteredIdentifiers:
     """Test saving registered identifiers to JSON."""
     
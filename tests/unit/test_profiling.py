@@ -0,0 +1,164 @@
+"""Unit tests for batch profiling and profile reports."""
+
+import time
+from collections import Counter
+
+import pytest
+
+from ihe_test_util.profiling.profiler import BatchProfiler, ProfileMode, ProfileResult
+from ihe_test_util.profiling.report import (
+    OTHER,
+    collapsed_stacks,
+    format_report,
+    short_path,
+    stack_subsystem,
+    subsystem_for,
+    subsystem_totals,
+    top_functions_by_subsystem,
+    write_profile,
+)
+
+
+SITE = "/venv/lib/python3.11/site-packages"
+PKG = "/repo/src/ihe_test_util"
+
+
+def _busy(seconds: float) -> int:
+    """Burn CPU for roughly ``seconds``."""
+    deadline = time.thread_time() + seconds
+    total = 0
+    while time.thread_time() < deadline:
+        total += sum(range(200))
+    return total
+
+
+@pytest.fixture
+def sampled_result():
+    """Hand-built cpu profile result with known stacks."""
+    cli = (f"{PKG}/cli/submit_commands.py", "batch", 500)
+    signer = (f"{PKG}/saml/signer.py", "sign_assertion", 120)
+    signxml = (f"{SITE}/signxml/signer.py", "sign", 141)
+    client = (f"{PKG}/ihe_transactions/soap_client.py", "submit_pix_add", 300)
+    recv = ("/usr/lib/python3.11/ssl.py", "recv_into", 1200)
+    return ProfileResult(
+        mode=ProfileMode.CPU,
+        elapsed_seconds=1.0,
+        stacks=Counter({
+            (cli, signer, signxml): 600_000,
+            (cli, client, recv): 300_000,
+            (cli,): 100_000,
+        }),
+        samples=10,
+    )
+
+
+class TestSubsystemClassification:
+    """Test mapping of source files and stacks to subsystems."""
+
+    @pytest.mark.parametrize(
+        "filename,expected",
+        [
+            (f"{PKG}/csv_parser/parser.py", "csv_parser"),
+            (f"{PKG}/template_engine/personalizer.py", "template_engine"),
+            (f"{PKG}/saml/signer.py", "saml"),
+            (f"{PKG}/ihe_transactions/workflows.py", "ihe_transactions"),
+            (f"{PKG}/transport/wsgi_adapter.py", "transport"),
+            (f"{SITE}/requests/sessions.py", "transport"),
+            (f"{SITE}/urllib3/connectionpool.py", "transport"),
+            ("/usr/lib/python3.11/ssl.py", "transport"),
+            ("/usr/lib/python3.11/http/client.py", "transport"),
+            (f"{PKG}/cli/submit_commands.py", None),
+            (f"{PKG}/__init__.py", None),
+            (f"{SITE}/lxml/etree.py", None),
+        ],
+    )
+    def test_subsystem_for(self, filename, expected):
+        assert subsystem_for(filename) == expected
+
+    def test_short_path(self):
+        assert short_path(f"{PKG}/saml/signer.py") == "ihe_test_util/saml/signer.py"
+        assert short_path(f"{SITE}/lxml/etree.py") == "lxml/etree.py"
+        assert short_path("/usr/lib/python3.11/http/client.py") == "http/client.py"
+
+    def test_stack_uses_innermost_subsystem_frame(self, sampled_result):
+        """Test third-party frames count toward the calling subsystem."""
+        stacks = list(sampled_result.stacks)
+
+        assert stack_subsystem(stacks[0]) == "saml"
+        assert stack_subsystem(stacks[1]) == "transport"
+        assert stack_subsystem(stacks[2]) == OTHER
+
+
+class TestReport:
+    """Test report rendering and collapsed stacks."""
+
+    def test_subsystem_totals(self, sampled_result):
+        assert subsystem_totals(sampled_result) == {"saml": 600_000, "transport": 300_000, OTHER: 100_000}
+
+    def test_top_functions_use_leaf_frame(self, sampled_result):
+        ranked = top_functions_by_subsystem(sampled_result)
+
+        assert ranked["saml"] == [("sign (signxml/signer.py:141)", 600_000)]
+        assert ranked["transport"] == [("recv_into (ssl.py:1200)", 300_000)]
+
+    def test_format_report_ranks_subsystems(self, sampled_result):
+        report = format_report(sampled_result)
+
+        assert "Profile mode:  cpu" in report
+        assert report.index("saml") < report.index("transport") < report.index(OTHER)
+        assert "60.0%" in report
+        assert "[saml]" in report
+
+    def test_collapsed_stacks_format(self, sampled_result):
+        lines = collapsed_stacks(sampled_result)
+
+        assert lines[0] == (
+            "batch (ihe_test_util/cli/submit_commands.py:500);"
+            "sign_assertion (ihe_test_util/saml/signer.py:120);"
+            "sign (signxml/signer.py:141) 600000"
+        )
+        assert len(lines) == 3
+
+
+class TestBatchProfiler:
+    """Test profiling real work."""
+
+    @pytest.mark.parametrize("mode", [ProfileMode.CPU, ProfileMode.WALL])
+    def test_cpu_and_wall_profiles(self, mode, tmp_path):
+        # Act
+        with BatchProfiler(mode, interval=0.001) as profiler:
+            _busy(0.15)
+        result = profiler.result
+        paths = write_profile(result, tmp_path / "profile", "run")
+
+        # Assert
+        assert result.samples > 0
+        assert any(frame[1] == "_busy" for stack in result.stacks for frame in stack)
+        assert any(key[2] == "_busy" for key in result.stats.stats)
+        assert set(paths) == {"report", "collapsed", "pstats"}
+        assert all(path.exists() for path in paths.values())
+        assert "_busy" in paths["collapsed"].read_text(encoding="utf-8")
+
+    def test_cpu_profile_excludes_sleep(self):
+        """Test cpu samples are weighted by CPU time, so sleeping adds little."""
+        # Act
+        with BatchProfiler(ProfileMode.CPU, interval=0.001) as profiler:
+            time.sleep(0.2)
+
+        # Assert
+        assert sum(profiler.result.stacks.values()) < 100_000
+
+    def test_alloc_profile(self, tmp_path):
+        # Act
+        with BatchProfiler(ProfileMode.ALLOC) as profiler:
+            retained = [bytearray(1024) for _ in range(200)]
+        result = profiler.result
+        paths = write_profile(result, tmp_path, "alloc")
+
+        # Assert
+        assert len(retained) == 200
+        assert result.stats is None
+        assert result.peak_bytes >= 200 * 1024
+        assert sum(result.stacks.values()) >= 200 * 1024
+        assert set(paths) == {"report", "collapsed"}
+        assert "Peak traced:" in paths["report"].read_text(encoding="utf-8")
@@ -0,0 +1,68 @@
+"""Unit tests for the submission registry CLI commands."""
+
+from click.testing import CliRunner
+
+from ihe_test_util.cli.main import cli
+from ihe_test_util.ihe_transactions.submission_registry import ITI41, PIX_ADD, RegistryKey, SubmissionRegistry
+
+PIX_URL = "https://pix.example.com/pix/add"
+ITI41_URL = "https://xds.example.com/iti41"
+
+
+def _write_registry(path):
+    registry = SubmissionRegistry(path)
+    registry.record(RegistryKey(PIX_ADD, PIX_URL, "PAT001", "1.2.3.4", "h1"), enterprise_id="EID001", batch_id="batch-1")
+    registry.record(RegistryKey(ITI41, ITI41_URL, "PAT001", "1.2.3.4", "h2"), document_id="DOC001", batch_id="batch-1")
+    registry.record(RegistryKey(PIX_ADD, PIX_URL, "PAT002", "1.2.3.4", "h3"), enterprise_id="EID002", batch_id="batch-1")
+    registry.close()
+
+
+class TestRegistryCommands:
+    """Test the registry CLI commands."""
+
+    def test_list_filters_by_patient(self, tmp_path):
+        # Arrange
+        _write_registry(tmp_path / "registry.db")
+
+        # Act
+        result = CliRunner().invoke(cli, ["registry", "list", str(tmp_path / "registry.db"), "--patient", "PAT001"])
+
+        # Assert
+        assert result.exit_code == 0
+        lines = result.stdout.splitlines()
+        assert len(lines) == 2
+        assert "pix_add" in lines[0] and "EID001" in lines[0] and PIX_URL in lines[0]
+        assert "iti41" in lines[1] and "DOC001" in lines[1]
+
+    def test_stats_counts_per_endpoint(self, tmp_path):
+        # Arrange
+        _write_registry(tmp_path / "registry.db")
+
+        # Act
+        result = CliRunner().invoke(cli, ["registry", "stats", str(tmp_path / "registry.db")])
+
+        # Assert
+        assert result.exit_code == 0
+        assert "pix_add: 2" in result.stdout
+        assert f"       1  {ITI41_URL}" in result.stdout
+
+    def test_forget_requires_filter_or_all(self, tmp_path):
+        # Arrange
+        _write_registry(tmp_path / "registry.db")
+
+        # Act
+        unfiltered = CliRunner().invoke(cli, ["registry", "forget", str(tmp_path / "registry.db")])
+        everything = CliRunner().invoke(cli, ["registry", "forget", str(tmp_path / "registry.db"), "--all"])
+
+        # Assert
+        assert unfiltered.exit_code == 2
+        assert "--all" in unfiltered.output
+        assert everything.exit_code == 0
+        assert "Removed 3 registry entries" in everything.output
+
+    def test_missing_registry_exits_2(self, tmp_path):
+        result = CliRunner().invoke(cli, ["registry", "list", str(tmp_path / "missing.db")])
+
+        assert result.exit_code == 2
+        assert "Submission registry not found" in result.output
+        assert not (tmp_path / "missing.db").exists()
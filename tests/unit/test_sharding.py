@@ -0,0 +1,235 @@
+"""Unit tests for sharded batch execution and result merging."""
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from ihe_test_util.ihe_transactions.sharding import ShardSpec, WorkQueue, _Heartbeat
+from ihe_test_util.ihe_transactions.workflows import (
+    load_workflow_results_from_json,
+    merge_workflow_results,
+    save_workflow_results_to_json,
+)
+from ihe_test_util.models.batch import BatchWorkflowResult, PatientWorkflowResult
+from ihe_test_util.transport.load_balancer import EndpointStats
+from ihe_test_util.utils.exceptions import ValidationError
+
+
+class FakeClock:
+    """Manually advanced wall clock."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _result(batch_id, patient_ids, start_minute, end_minute, csv_file="patients.csv", shard=None):
+    base = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+    return BatchWorkflowResult(
+        batch_id=batch_id,
+        csv_file=csv_file,
+        ccd_template="templates/ccd-template.xml",
+        start_timestamp=base + timedelta(minutes=start_minute),
+        end_timestamp=base + timedelta(minutes=end_minute),
+        patient_results=[
+            PatientWorkflowResult(
+                patient_id=patient_id,
+                csv_parsed=True,
+                ccd_generated=True,
+                pix_add_status="success",
+                pix_enterprise_id_oid="1.2.3.4.5",
+                iti41_status="success" if i % 2 == 0 else "failed",
+                iti41_message="" if i % 2 == 0 else "Registry error",
+                pix_add_time_ms=100,
+                iti41_time_ms=200,
+                total_time_ms=300,
+            )
+            for i, patient_id in enumerate(patient_ids)
+        ],
+        shard=shard,
+    )
+
+
+class TestShardSpec:
+    """Test static shard parsing and row selection."""
+
+    def test_parse_and_rows_interleave(self):
+        # Act
+        shards = [ShardSpec.parse(f"{i}/3") for i in range(1, 4)]
+
+        # Assert
+        assert [list(shard.rows(8)) for shard in shards] == [[0, 3, 6], [1, 4, 7], [2, 5]]
+        assert str(shards[1]) == "2/3"
+
+    @pytest.mark.parametrize("value", ["0/2", "3/2", "1/0", "1", "a/b", "-1/2"])
+    def test_parse_rejects_invalid(self, value):
+        with pytest.raises(ValueError, match="i/N"):
+            ShardSpec.parse(value)
+
+
+class TestWorkQueue:
+    """Test leasing, heartbeats and reclaiming of CSV row ranges."""
+
+    def test_initialize_once_per_csv(self, tmp_path):
+        # Arrange
+        queue = WorkQueue(tmp_path / "queue.db")
+
+        # Act
+        created = queue.initialize("patients.csv", total_rows=10, range_size=4)
+        again = WorkQueue(tmp_path / "queue.db").initialize("patients.csv", total_rows=10, range_size=4)
+
+        # Assert
+        assert (created, again) == (True, False)
+        assert queue.progress() == {"pending": 3, "leased": 0, "expired": 0, "done": 0}
+        with pytest.raises(ValueError, match="belongs to patients.csv"):
+            queue.initialize("other.csv", total_rows=10)
+
+    def test_expired_lease_is_reclaimed(self, tmp_path):
+        """Test a crashed worker's range goes to the next worker after the lease expires."""
+        # Arrange
+        clock = FakeClock()
+        queue = WorkQueue(tmp_path / "queue.db", lease_seconds=30, clock=clock)
+        queue.initialize("patients.csv", total_rows=4, range_size=2)
+        crashed = queue.claim("worker-a")
+        queue.claim("worker-a")
+
+        # Act
+        before_expiry = queue.claim("worker-b")
+        clock.now += 31
+        reclaimed = queue.claim("worker-b")
+
+        # Assert
+        assert before_expiry is None
+        assert (reclaimed.start, reclaimed.end, reclaimed.attempt) == (0, 2, 2)
+        assert queue.complete(reclaimed)
+        assert not queue.complete(crashed)
+        assert not queue.heartbeat(crashed)
+        assert queue.progress() == {"pending": 0, "leased": 0, "expired": 1, "done": 1}
+
+    def test_heartbeat_keeps_lease(self, tmp_path):
+        # Arrange
+        clock = FakeClock()
+        queue = WorkQueue(tmp_path / "queue.db", lease_seconds=30, clock=clock)
+        queue.initialize("patients.csv", total_rows=2, range_size=2)
+        lease = queue.claim("worker-a")
+
+        # Act
+        clock.now += 20
+        alive = queue.heartbeat(lease)
+        clock.now += 20
+
+        # Assert
+        assert alive
+        assert queue.claim("worker-b") is None
+
+    def test_workers_share_rows_without_overlap(self, tmp_path):
+        # Arrange
+        WorkQueue(tmp_path / "queue.db").initialize("patients.csv", total_rows=50, range_size=3)
+        processed = {}
+
+        def worker(worker_id):
+            processed[worker_id] = list(WorkQueue(tmp_path / "queue.db").rows(worker_id))
+
+        # Act
+        threads = [threading.Thread(target=worker, args=(f"worker-{i}",)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        rows = [row for worker_rows in processed.values() for row in worker_rows]
+        assert sorted(rows) == list(range(50))
+        assert WorkQueue(tmp_path / "queue.db").progress()["done"] == 17
+
+    def test_heartbeat_detects_lost_lease(self, tmp_path):
+        """Test a heartbeat marks the lease lost once another worker took the range."""
+        # Arrange
+        clock = FakeClock()
+        queue = WorkQueue(tmp_path / "queue.db", lease_seconds=30, clock=clock)
+        queue.initialize("patients.csv", total_rows=3, range_size=3)
+        lease = queue.claim("worker-a")
+        clock.now += 31
+        queue.claim("worker-b")
+
+        # Act
+        queue.lease_seconds = 0.03
+        heartbeat = _Heartbeat(queue, lease)
+        heartbeat.start()
+        heartbeat.join(timeout=5)
+
+        # Assert
+        assert lease.lost
+        assert not heartbeat.is_alive()
+
+
+class TestMergeWorkflowResults:
+    """Test combining shard results."""
+
+    def test_merge_combines_patients_timespan_and_endpoints(self):
+        # Arrange
+        first = _result("batch-1", ["PAT001", "PAT002"], 0, 10, shard="1/2")
+        second = _result("batch-2", ["PAT003"], 2, 12, shard="2/2")
+        first.endpoint_stats = [EndpointStats("pix_add", "https://a/pix", 1, requests=2, total_time_ms=100)]
+        second.endpoint_stats = [
+            EndpointStats("pix_add", "https://a/pix", 1, requests=1, failures=1, total_time_ms=50),
+            EndpointStats("pix_add", "https://b/pix", 1, requests=3),
+        ]
+
+        # Act
+        merged = merge_workflow_results([first, second])
+
+        # Assert
+        assert merged.batch_id.startswith("merged-")
+        assert [p.patient_id for p in merged.patient_results] == ["PAT001", "PAT002", "PAT003"]
+        assert merged.duration_seconds == 720
+        assert merged.total_patients == 3
+        assert merged.statistics.throughput_patients_per_minute == pytest.approx(0.25)
+        assert merged.iti41_success_count == 2
+        assert merged.shard is None
+        totals = {stats.url: (stats.requests, stats.failures, stats.total_time_ms) for stats in merged.endpoint_stats}
+        assert totals == {"https://a/pix": (3, 1, 150), "https://b/pix": (3, 0, 0)}
+
+    def test_merge_keeps_latest_result_per_patient(self):
+        """Test a patient processed by two shards (a reclaimed range) counts once."""
+        # Arrange: the stalled worker finished last, after its range was reclaimed
+        reclaimed = _result("batch-1", ["PAT001", "PAT002"], 0, 20, shard="queue:w1")
+        retry = _result("batch-2", ["PAT002", "PAT003"], 5, 10, shard="queue:w2")
+
+        # Act
+        merged = merge_workflow_results([retry, reclaimed])
+
+        # Assert
+        assert [p.patient_id for p in merged.patient_results] == ["PAT002", "PAT003", "PAT001"]
+        assert merged.patient_results[0] is reclaimed.patient_results[1]
+        assert merged.duplicates_dropped == 1
+        assert merged.total_patients == 3
+        assert merged.statistics.throughput_patients_per_minute == pytest.approx(0.15)
+        assert merged.iti41_success_count == 1
+
+    def test_merge_rejects_different_csv_files(self):
+        with pytest.raises(ValidationError, match="different CSV files"):
+            merge_workflow_results([_result("a", ["PAT001"], 0, 1), _result("b", ["PAT002"], 0, 1, "other.csv")])
+
+    def test_results_round_trip_through_json(self, tmp_path):
+        # Arrange
+        result = _result("batch-1", ["PAT001", "PAT002"], 0, 10, shard="queue:host-1")
+        result.calculate_statistics()
+        path = tmp_path / "results.json"
+
+        # Act
+        save_workflow_results_to_json(result, path)
+        loaded = load_workflow_results_from_json(path)
+
+        # Assert
+        assert loaded.to_dict() == result.to_dict()
+
+    def test_load_rejects_other_json(self, tmp_path):
+        path = tmp_path / "pix-results.json"
+        path.write_text('{"patient_results": []}')
+
+        with pytest.raises(ValidationError, match="Invalid workflow results file"):
+            load_workflow_results_from_json(path)
@@ -10,6 +10,7 @@ import requests
 from requests.exceptions import ConnectionError, Timeout, SSLError, HTTPError
 
 from ihe_test_util.ihe_transactions.soap_client import PIXAddSOAPClient, TLS12Adapter
+from ihe_test_util.logging_audit.transaction_archive import ArchiveReader, transaction_archive
 from ihe_test_util.models.responses import TransactionResponse, TransactionStatus, TransactionType
 from ihe_test_util.models.saml import SAMLAssertion, SAMLGenerationMethod
 from ihe_test_util.models.patient import PatientDemographics
@@ -282,7 +283,7 @@ class TestSOAPEnvelopeConstruction:
 class TestPIXAddSubmission:
     """Test PIX Add transaction submission."""
     
-    @patch('ihe_test_util.ihe_transactions.soap_client.parse_acknowledgment')
+    @patch('ihe_test_util.ihe_transactions.soap_client.fast_parse_acknowledgment')
     def test_submit_pix_add_success(
         self,
         mock_parse_ack,
@@ -322,7 +323,7 @@ class TestPIXAddSubmission:
         assert response.processing_time_ms > 0
         assert mock_post.called
     
-    @patch('ihe_test_util.ihe_transactions.soap_client.parse_acknowledgment')
+    @patch('ihe_test_util.ihe_transactions.soap_client.fast_parse_acknowledgment')
     def test_submit_pix_add_with_ae_acknowledgment(
         self,
         mock_parse_ack,
@@ -431,13 +432,41 @@ class TestPIXAddSubmission:
         # Act & Assert
         with pytest.raises(SSLError, match="Certificate verification failed"):
             client.submit_pix_add(sample_pix_message, mock_signed_saml)
+    
+    def test_submit_pix_add_uses_fast_parser(
+        self,
+        mock_config,
+        sample_pix_message,
+        mock_signed_saml,
+        sample_aa_response,
+        mocker
+    ):
+        """Test acknowledgments are parsed without the reference parser."""
+        # Arrange
+        mock_response = Mock()
+        mock_response.text = sample_aa_response
+        mock_response.status_code = 200
+        mocker.patch('requests.Session.post', return_value=mock_response)
+        mock_reference_parser = mocker.patch(
+            'ihe_test_util.ihe_transactions.parsers.parse_acknowledgment'
+        )
+        
+        client = PIXAddSOAPClient(mock_config)
+        
+        # Act
+        response = client.submit_pix_add(sample_pix_message, mock_signed_saml)
+        
+        # Assert
+        assert response.status == TransactionStatus.SUCCESS
+        assert response.status_code == "AA"
+        mock_reference_parser.assert_not_called()
 
 
 class TestRetryLogic:
     """Test retry logic with exponential backoff."""
     
     @patch('ihe_test_util.ihe_transactions.soap_client.time.sleep')
-    @patch('ihe_test_util.ihe_transactions.soap_client.parse_acknowledgment')
+    @patch('ihe_test_util.ihe_transactions.soap_client.fast_parse_acknowledgment')
     def test_retry_with_exponential_backoff(
         self,
         mock_parse_ack,
@@ -481,7 +510,7 @@ class TestRetryLogic:
         assert mock_sleep.call_count == 2  # 2 retries before success
         mock_sleep.assert_has_calls([call(1), call(2)])  # 1s, 2s delays
     
-    @patch('ihe_test_util.ihe_transactions.soap_client.parse_acknowledgment')
+    @patch('ihe_test_util.ihe_transactions.soap_client.fast_parse_acknowledgment')
     def test_max_retries_configurable(
         self,
         mock_parse_ack,
@@ -506,7 +535,7 @@ class TestRetryLogic:
         # Should have tried 5 times
         assert mock_post.call_count == 5
     
-    @patch('ihe_test_util.ihe_transactions.soap_client.parse_acknowledgment')
+    @patch('ihe_test_util.ihe_transactions.soap_client.fast_parse_acknowledgment')
     def test_no_retry_on_4xx_client_errors(
         self,
         mock_parse_ack,
@@ -534,10 +563,48 @@ class TestRetryLogic:
         assert mock_post.call_count == 1
 
 
+    @patch('ihe_test_util.ihe_transactions.soap_client.time.sleep')
+    @patch('ihe_test_util.ihe_transactions.soap_client.fast_parse_acknowledgment')
+    def test_retry_fails_over_to_next_endpoint(
+        self,
+        mock_parse_ack,
+        mock_sleep,
+        mock_config,
+        sample_pix_message,
+        mock_signed_saml,
+        sample_aa_response,
+        mocker
+    ):
+        """Test a retry after a 503 goes to the next load-balanced endpoint."""
+        # Arrange
+        mock_config.endpoints = EndpointsConfig(
+            pix_add_endpoints=["http://node-a:8080/pix/add", "http://node-b:8080/pix/add"],
+            iti41_url="http://localhost:8080/iti41/submit",
+        )
+        unavailable = Mock(status_code=503, text="busy")
+        ok = Mock(status_code=200, text=sample_aa_response)
+        mock_post = mocker.patch('requests.Session.post', side_effect=[unavailable, ok])
+        mock_parse_ack.return_value = Mock(status="AA", is_success=True, acknowledgment_id="ACK-1", details=[])
+        
+        client = PIXAddSOAPClient(mock_config, max_retries=3)
+        
+        # Act
+        response = client.submit_pix_add(sample_pix_message, mock_signed_saml)
+        
+        # Assert
+        assert response.status == TransactionStatus.SUCCESS
+        assert [c.args[0] for c in mock_post.call_args_list] == [
+            "http://node-a:8080/pix/add", "http://node-b:8080/pix/add",
+        ]
+        stats = client.endpoint_pool.stats()
+        assert [(s.requests, s.failures) for s in stats] == [(1, 1), (1, 0)]
+        assert client.endpoint_url == "http://node-a:8080/pix/add"
+
+
 class TestAuditLogging:
     """Test audit logging functionality."""
     
-    @patch('ihe_test_util.ihe_transactions.soap_client.parse_acknowledgment')
+    @patch('ihe_test_util.ihe_transactions.soap_client.fast_parse_acknowledgment')
     def test_audit_logging_request_and_response(
         self,
         mock_parse_ack,
@@ -582,6 +649,44 @@ class TestAuditLogging:
         assert "PRPA_IN201301UV02" in log_text  # Verify request content logged
         assert "MCCI_IN000002UV01" in log_text  # Verify response content logged
 
+    @patch('ihe_test_util.ihe_transactions.soap_client.fast_parse_acknowledgment')
+    def test_transaction_archived_instead_of_logged(
+        self,
+        mock_parse_ack,
+        mock_config,
+        sample_pix_message,
+        mock_signed_saml,
+        sample_aa_response,
+        caplog,
+        mocker,
+        tmp_path
+    ):
+        """Test request/response go to the open transaction archive, once, with the outcome."""
+        # Arrange
+        mock_response = Mock()
+        mock_response.text = sample_aa_response
+        mock_response.status_code = 200
+        mocker.patch('requests.Session.post', return_value=mock_response)
+        mock_parse_ack.return_value = Mock(
+            status="AA", is_success=True, acknowledgment_id="ACK-123", details=[]
+        )
+        client = PIXAddSOAPClient(mock_config)
+        
+        # Act
+        with transaction_archive(tmp_path / "archive", flush_interval=0):
+            with caplog.at_level(logging.DEBUG, logger='ihe_test_util.audit.pix_add'):
+                response = client.submit_pix_add(sample_pix_message, mock_signed_saml)
+        
+        # Assert
+        assert "Status: SUCCESS" in caplog.text
+        assert "Request XML:" not in caplog.text
+        [entry] = ArchiveReader(tmp_path / "archive").entries()
+        assert entry["message_id"] == response.request_id
+        assert entry["status"] == "SUCCESS"
+        transaction = ArchiveReader(tmp_path / "archive").get(response.request_id)
+        assert "PRPA_IN201301UV02" in transaction.parts["request"]
+        assert transaction.parts["response"] == sample_aa_response
+
 
 class TestTransactionResponseParsing:
     """Test transaction response parsing."""
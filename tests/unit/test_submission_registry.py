@@ -0,0 +1,108 @@
+"""Unit tests for the persistent submission registry."""
+
+import dataclasses
+from datetime import date
+
+from ihe_test_util.ihe_transactions.submission_registry import (
+    ITI41,
+    PIX_ADD,
+    RegistryKey,
+    SubmissionRegistry,
+    demographics_hash,
+    document_hash,
+)
+from ihe_test_util.models.patient import PatientDemographics
+
+PIX_URL = "https://pix.example.com/pix/add"
+ITI41_URL = "https://xds.example.com/iti41"
+
+
+def _patient(**changes) -> PatientDemographics:
+    patient = PatientDemographics(
+        patient_id="PAT001",
+        patient_id_oid="1.2.3.4",
+        first_name="John",
+        last_name="Doe",
+        dob=date(1980, 1, 1),
+        gender="M",
+    )
+    return dataclasses.replace(patient, **changes)
+
+
+def _key(transaction_type=PIX_ADD, endpoint=PIX_URL, patient=None, template="<ClinicalDocument/>"):
+    patient = patient or _patient()
+    content_hash = (
+        demographics_hash(patient) if transaction_type == PIX_ADD else document_hash(patient, template)
+    )
+    return RegistryKey(transaction_type, endpoint, patient.patient_id, patient.patient_id_oid, content_hash)
+
+
+def _write_registry(path):
+    registry = SubmissionRegistry(path)
+    registry.record(_key(), enterprise_id="EID001", enterprise_id_oid="9.9.9", batch_id="batch-1")
+    registry.record(_key(ITI41, ITI41_URL), document_id="DOC001", submission_set_id="SS001", batch_id="batch-1")
+    registry.record(_key(patient=_patient(patient_id="PAT002")), enterprise_id="EID002", batch_id="batch-1")
+    registry.close()
+
+
+class TestContentHashes:
+    """Test what makes a submission new."""
+
+    def test_hashes_track_demographics_and_template(self):
+        # Arrange
+        patient = _patient()
+
+        # Assert
+        assert demographics_hash(patient) == demographics_hash(_patient())
+        assert demographics_hash(patient) != demographics_hash(_patient(zip="02108"))
+        assert document_hash(patient, "<a/>") != document_hash(patient, "<b/>")
+        assert document_hash(patient, "<a/>") != document_hash(_patient(last_name="Smith"), "<a/>")
+
+
+class TestSubmissionRegistry:
+    """Test recording and looking up submissions."""
+
+    def test_lookup_after_reopen(self, tmp_path):
+        # Arrange
+        _write_registry(tmp_path / "registry.db")
+
+        # Act
+        registry = SubmissionRegistry(tmp_path / "registry.db")
+        pix = registry.lookup(_key())
+        iti41 = registry.lookup(_key(ITI41, ITI41_URL))
+
+        # Assert
+        assert (pix.enterprise_id, pix.enterprise_id_oid, pix.batch_id) == ("EID001", "9.9.9", "batch-1")
+        assert (iti41.document_id, iti41.submission_set_id) == ("DOC001", "SS001")
+        assert registry.lookup(_key(endpoint="https://other.example.com/pix")) is None
+        assert registry.lookup(_key(patient=_patient(first_name="Jon"))) is None
+        assert registry.lookup(_key(ITI41, ITI41_URL, template="<new/>")) is None
+        registry.close()
+
+    def test_record_replaces_earlier_entry(self, tmp_path):
+        # Arrange
+        registry = SubmissionRegistry(tmp_path / "registry.db")
+        registry.record(_key(), enterprise_id="EID001", batch_id="batch-1")
+
+        # Act
+        registry.record(_key(), enterprise_id="EID002", batch_id="batch-2")
+
+        # Assert
+        assert [entry.enterprise_id for entry in registry.entries()] == ["EID002"]
+        registry.close()
+
+    def test_counts_and_forget(self, tmp_path):
+        # Arrange
+        _write_registry(tmp_path / "registry.db")
+        registry = SubmissionRegistry(tmp_path / "registry.db")
+
+        # Act
+        counts = registry.counts()
+        forgotten = registry.forget(patient_id="PAT001", transaction_type=PIX_ADD)
+
+        # Assert
+        assert counts == {PIX_ADD: {PIX_URL: 2}, ITI41: {ITI41_URL: 1}}
+        assert forgotten == 1
+        assert [entry.key.patient_id for entry in registry.entries(transaction_type=PIX_ADD)] == ["PAT002"]
+        assert registry.forget() == 2
+        registry.close()
@@ -31,7 +31,10 @@ from ihe_test_util.cli.submit_commands import (
     save_pix_results,
     submit,
 )
+from ihe_test_util.ihe_transactions.sharding import WorkQueue
+from ihe_test_util.ihe_transactions.workflows import save_workflow_results_to_json
 from ihe_test_util.models.batch import BatchWorkflowResult, PatientWorkflowResult
+from ihe_test_util.profiling.tracing import get_tracer, span
 from ihe_test_util.utils.exceptions import ConfigurationError, ValidationError
 
 
@@ -212,8 +215,9 @@ class TestSubmitDirectCommand:
             
             result = runner.invoke(submit, ["batch", str(csv_file)])
             
-            # Should attempt to run batch command
-            assert "Configuration Error" in result.output or result.exit_code != 0
+            # Should run the batch command, not parse "batch" as CSV_FILE
+            assert "Configuration Error" in result.output
+            assert result.exit_code == 3
 
 
 # =============================================================================
@@ -713,6 +717,254 @@ class TestHelpDocumentation:
         assert "ihe-test-util submit" in result.output or "submit" in result.output
 
 
+# =============================================================================
+# Profiling Tests
+# =============================================================================
+
+class TestProfileOption:
+    """Tests for the diagnostics options: --profile, --trace and --metrics-file."""
+
+    def _invoke(
+        self,
+        runner: CliRunner,
+        tmp_path: Path,
+        mock_batch_result: BatchWorkflowResult,
+        args: list,
+        execute=None,
+    ):
+        csv_file = tmp_path / "patients.csv"
+        csv_file.write_text(
+            "first_name,last_name,dob,gender,patient_id_oid\n"
+            "John,Doe,1980-01-01,M,1.2.3.4\n"
+        )
+        with patch("ihe_test_util.cli.submit_commands._load_config_with_overrides") as mock_config, \
+                patch("ihe_test_util.cli.submit_commands.IntegratedWorkflow"), \
+                patch("ihe_test_util.cli.submit_commands._execute_full_workflow") as mock_execute:
+            mock_config.return_value.endpoints.pix_add_url = "https://pix.example.com/pix/add"
+            mock_config.return_value.endpoints.iti41_url = "https://xds.example.com/iti41"
+            mock_execute.return_value = mock_batch_result
+            mock_execute.side_effect = execute
+            return runner.invoke(submit, args + [str(csv_file)])
+
+    def test_profile_writes_report_files(
+        self, runner: CliRunner, tmp_path: Path, mock_batch_result: BatchWorkflowResult
+    ) -> None:
+        """Test --profile=wall writes the report, collapsed stacks and pstats."""
+        profile_dir = tmp_path / "profile"
+
+        result = self._invoke(
+            runner, tmp_path, mock_batch_result,
+            ["--profile=wall", "--profile-output", str(profile_dir), "--quiet"],
+        )
+
+        assert result.exit_code == 0, result.output
+        stem = "profile-test-batch-wall"
+        assert (profile_dir / f"{stem}.txt").exists()
+        assert (profile_dir / f"{stem}.collapsed").exists()
+        assert (profile_dir / f"{stem}.prof").exists()
+        assert "Profile report saved to" in result.output
+
+    def test_profile_without_value_defaults_to_cpu(
+        self, runner: CliRunner, tmp_path: Path, mock_batch_result: BatchWorkflowResult
+    ) -> None:
+        """Test a bare --profile profiles CPU time."""
+        profile_dir = tmp_path / "profile"
+
+        result = self._invoke(
+            runner, tmp_path, mock_batch_result,
+            ["--profile-output", str(profile_dir), "--profile", "--show-errors"],
+        )
+
+        assert result.exit_code == 0, result.output
+        assert (profile_dir / "profile-test-batch-cpu.txt").exists()
+        assert "Profile (cpu):" in result.output
+
+    def test_profile_rejects_unknown_mode(
+        self, runner: CliRunner, tmp_path: Path, mock_batch_result: BatchWorkflowResult
+    ) -> None:
+        """Test an unknown profile mode is a usage error."""
+        result = self._invoke(runner, tmp_path, mock_batch_result, ["--profile=gpu"])
+
+        assert result.exit_code == 2
+        assert "gpu" in result.output
+
+    def test_trace_writes_chrome_trace(
+        self, runner: CliRunner, tmp_path: Path, mock_batch_result: BatchWorkflowResult
+    ) -> None:
+        """Test --trace records spans opened during the run and writes trace JSON."""
+        trace_file = tmp_path / "trace" / "trace.json"
+
+        def execute(**kwargs):
+            with span("ccd.generate", "ccd", patient_id="PAT001"):
+                return mock_batch_result
+
+        result = self._invoke(
+            runner, tmp_path, mock_batch_result, ["--trace", str(trace_file), "--quiet"], execute
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "Trace saved to" in result.output
+        events = json.loads(trace_file.read_text(encoding="utf-8"))["traceEvents"]
+        spans = [event for event in events if event["ph"] == "X"]
+        assert [event["name"] for event in spans] == ["ccd.generate"]
+        assert spans[0]["args"] == {"patient_id": "PAT001"}
+        assert get_tracer() is None
+
+    def test_metrics_file_written_during_run(
+        self, runner: CliRunner, tmp_path: Path, mock_batch_result: BatchWorkflowResult
+    ) -> None:
+        """Test --metrics-file publishes client metrics as a Prometheus textfile."""
+        metrics_file = tmp_path / "metrics" / "ihe.prom"
+
+        result = self._invoke(
+            runner, tmp_path, mock_batch_result, ["--metrics-file", str(metrics_file)]
+        )
+
+        assert result.exit_code == 0, result.output
+        assert f"Client metrics:     {metrics_file}" in result.output
+        assert "# TYPE ihe_client_requests_total counter" in metrics_file.read_text(encoding="utf-8")
+
+
+# =============================================================================
+# Sharding Tests
+# =============================================================================
+
+class TestSharding:
+    """Tests for --shard, --work-queue and submit merge."""
+
+    def _invoke(self, runner, tmp_path, mock_batch_result, args, rows=3):
+        csv_file = tmp_path / "patients.csv"
+        csv_file.write_text(
+            "first_name,last_name,dob,gender,patient_id_oid\n"
+            + "John,Doe,1980-01-01,M,1.2.3.4\n" * rows
+        )
+        calls = []
+
+        def execute(**kwargs):
+            selector = kwargs["row_selector"]
+            calls.append((kwargs["total_patients"], list(selector(rows)) if selector else None))
+            return mock_batch_result
+
+        with patch("ihe_test_util.cli.submit_commands._load_config_with_overrides") as mock_config, \
+                patch("ihe_test_util.cli.submit_commands.IntegratedWorkflow"), \
+                patch("ihe_test_util.cli.submit_commands._execute_full_workflow", side_effect=execute):
+            mock_config.return_value.endpoints.pix_add_url = "https://pix.example.com/pix/add"
+            mock_config.return_value.endpoints.iti41_url = "https://xds.example.com/iti41"
+            result = runner.invoke(submit, ["batch", str(csv_file)] + args)
+        return result, calls
+
+    def test_shard_selects_rows_and_saves_labelled_results(
+        self, runner: CliRunner, tmp_path: Path, mock_batch_result: BatchWorkflowResult, monkeypatch
+    ) -> None:
+        """Test --shard 2/2 processes every second row and writes results-2of2.json."""
+        monkeypatch.chdir(tmp_path)
+
+        result, calls = self._invoke(runner, tmp_path, mock_batch_result, ["--shard", "2/2", "--quiet"])
+
+        assert result.exit_code == 0, result.output
+        assert calls == [(1, [1])]
+        saved = json.loads((tmp_path / "output" / "results-2of2.json").read_text())
+        assert saved["shard"] == "2/2"
+        assert "Shard:                2/2" in result.output
+
+    def test_invalid_shard_is_usage_error(
+        self, runner: CliRunner, tmp_path: Path, mock_batch_result: BatchWorkflowResult
+    ) -> None:
+        result, _ = self._invoke(runner, tmp_path, mock_batch_result, ["--shard", "3/2"])
+
+        assert result.exit_code == 2
+        assert "Invalid shard 3/2" in result.output
+
+    def test_shard_and_work_queue_are_exclusive(
+        self, runner: CliRunner, tmp_path: Path, mock_batch_result: BatchWorkflowResult
+    ) -> None:
+        result, _ = self._invoke(
+            runner, tmp_path, mock_batch_result,
+            ["--shard", "1/2", "--work-queue", str(tmp_path / "queue.db")],
+        )
+
+        assert result.exit_code == 2
+        assert "Cannot use --shard and --work-queue together" in result.output
+
+    def test_work_queue_leases_every_row(
+        self, runner: CliRunner, tmp_path: Path, mock_batch_result: BatchWorkflowResult
+    ) -> None:
+        """Test a single worker drains a new work queue and marks every range done."""
+        queue_file = tmp_path / "queue.db"
+        output = tmp_path / "results-w1.json"
+
+        result, calls = self._invoke(
+            runner, tmp_path, mock_batch_result,
+            ["--work-queue", str(queue_file), "--worker-id", "w1", "--range-size", "2", "-o", str(output)],
+        )
+
+        assert result.exit_code == 0, result.output
+        assert calls == [(3, [0, 1, 2])]
+        assert WorkQueue(queue_file).progress()["done"] == 2
+        assert json.loads(output.read_text())["shard"] == "queue:w1"
+
+    def test_merge_combines_result_files(
+        self, runner: CliRunner, tmp_path: Path, mock_batch_result: BatchWorkflowResult
+    ) -> None:
+        """Test submit merge writes one result and reports patients seen twice."""
+        shard_files = []
+        for index in (1, 2):
+            mock_batch_result.shard = f"{index}/2"
+            shard_files.append(tmp_path / f"results-{index}of2.json")
+            save_workflow_results_to_json(mock_batch_result, shard_files[-1])
+        output = tmp_path / "merged.json"
+
+        result = runner.invoke(submit, ["merge", *map(str, shard_files), "-o", str(output)])
+
+        assert result.exit_code == 0, result.output
+        merged = json.loads(output.read_text())
+        assert [patient["patient_id"] for patient in merged["patients"]] == ["PAT001", "PAT002"]
+        assert merged["duplicates_dropped"] == 2
+        assert "shard" not in merged
+        assert "Duplicate patient results dropped: 2" in result.output
+
+    def test_merge_invalid_file_exits_1(
+        self, runner: CliRunner, tmp_path: Path, sample_pix_results_file: Path
+    ) -> None:
+        result = runner.invoke(
+            submit, ["merge", str(sample_pix_results_file), "-o", str(tmp_path / "merged.json")]
+        )
+
+        assert result.exit_code == 1
+        assert "Invalid workflow results file" in result.output
+
+
+class TestRegistryOption:
+    """Tests for --registry and --force."""
+
+    def test_registry_and_force_reach_batch_config(
+        self, runner: CliRunner, tmp_path: Path, mock_batch_result: BatchWorkflowResult
+    ) -> None:
+        csv_file = tmp_path / "patients.csv"
+        csv_file.write_text(
+            "first_name,last_name,dob,gender,patient_id_oid\n"
+            "John,Doe,1980-01-01,M,1.2.3.4\n"
+        )
+        mock_batch_result.patient_results[0].pix_add_reused = True
+
+        with patch("ihe_test_util.cli.submit_commands._load_config_with_overrides") as mock_config, \
+                patch("ihe_test_util.cli.submit_commands.IntegratedWorkflow") as mock_workflow, \
+                patch("ihe_test_util.cli.submit_commands._execute_full_workflow",
+                      return_value=mock_batch_result):
+            mock_config.return_value.endpoints.pix_add_url = "https://pix.example.com/pix/add"
+            mock_config.return_value.endpoints.iti41_url = "https://xds.example.com/iti41"
+            result = runner.invoke(
+                submit,
+                ["--registry", str(tmp_path / "registry.db"), "--force", "--quiet", str(csv_file)],
+            )
+
+        assert result.exit_code == 0, result.output
+        batch_config = mock_workflow.call_args.args[2]
+        assert batch_config.registry_path == tmp_path / "registry.db"
+        assert batch_config.force_resubmit is True
+        assert "Already Registered: 1 (not resent)" in result.output
+
+
 # =============================================================================
 # Edge Cases and Error Handling
 # =============================================================================
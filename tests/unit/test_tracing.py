@@ -0,0 +1,174 @@
+"""Unit tests for span tracing and Chrome trace export."""
+
+import json
+import threading
+
+import pytest
+
+from ihe_test_util.profiling import tracing
+from ihe_test_util.profiling.tracing import (
+    disable_tracing,
+    enable_tracing,
+    get_tracer,
+    instant,
+    span,
+    trace_context,
+)
+
+
+@pytest.fixture
+def tracer():
+    """Tracer enabled for the duration of a test."""
+    tracer = enable_tracing()
+    yield tracer
+    disable_tracing()
+
+
+def _spans(tracer):
+    return [event for event in tracer.events if event["ph"] == "X"]
+
+
+class TestDisabledTracing:
+    """Test behaviour while tracing is disabled."""
+
+    def test_span_is_shared_noop(self):
+        assert get_tracer() is None
+        first = span("ccd.generate", "ccd", patient_id="PAT001")
+        second = span("http.post", "http")
+
+        with first as opened:
+            opened.set(status_code=200)
+
+        assert first is second is tracing._NULL_SPAN
+
+    def test_trace_context_and_instant_are_noops(self):
+        with trace_context(patient_id="PAT001"):
+            instant("retry", "http")
+
+        assert tracing._context.get() == {}
+
+
+class TestSpans:
+    """Test span recording."""
+
+    def test_span_records_complete_event(self, tracer):
+        # Act
+        with span("ccd.generate", "ccd", row=3) as ccd_span:
+            ccd_span.set(bytes=1024)
+
+        # Assert
+        [event] = _spans(tracer)
+        assert event["name"] == "ccd.generate"
+        assert event["cat"] == "ccd"
+        assert event["tid"] == threading.get_ident()
+        assert event["dur"] >= 0
+        assert event["args"] == {"row": 3, "bytes": 1024}
+
+    def test_context_args_attached_to_nested_spans(self, tracer):
+        # Act
+        with trace_context(patient_id="PAT001"), span("patient"):
+            with trace_context(transaction_id="urn:uuid:1"):
+                with span("http.post", "http", attempt=1):
+                    pass
+            with span("checkpoint.write", "checkpoint"):
+                pass
+
+        # Assert
+        args = {event["name"]: event["args"] for event in _spans(tracer)}
+        assert args["http.post"] == {"patient_id": "PAT001", "transaction_id": "urn:uuid:1", "attempt": 1}
+        assert args["checkpoint.write"] == {"patient_id": "PAT001"}
+        assert args["patient"] == {"patient_id": "PAT001"}
+        assert tracing._context.get() == {}
+
+    def test_exception_marks_span_and_propagates(self, tracer):
+        with pytest.raises(ValueError):
+            with span("iti41.parse_response", "iti41"):
+                raise ValueError("bad response")
+
+        assert _spans(tracer)[0]["args"]["error"] == "ValueError"
+
+    def test_instant_event(self, tracer):
+        with trace_context(patient_id="PAT001"):
+            instant("retry", "http", attempt=2)
+
+        [event] = tracer.events
+        assert event["ph"] == "i"
+        assert event["args"] == {"patient_id": "PAT001", "attempt": 2}
+
+    def test_threads_get_own_tracks_and_context(self, tracer):
+        # Keep all workers alive together so their thread ids are distinct
+        barrier = threading.Barrier(3)
+
+        def worker(patient_id):
+            with trace_context(patient_id=patient_id), span("patient"):
+                barrier.wait()
+
+        threads = [
+            threading.Thread(target=worker, args=(f"PAT00{i}",), name=f"load-worker-{i}")
+            for i in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        trace = tracer.to_chrome_trace()
+        thread_names = {
+            event["args"]["name"] for event in trace["traceEvents"] if event["name"] == "thread_name"
+        }
+        assert thread_names == {"load-worker-0", "load-worker-1", "load-worker-2"}
+        assert sorted(event["args"]["patient_id"] for event in _spans(tracer)) == [
+            "PAT000", "PAT001", "PAT002",
+        ]
+
+
+class TestExport:
+    """Test Chrome trace export."""
+
+    def test_write_chrome_trace(self, tracer, tmp_path):
+        # Arrange
+        with span("csv.parse", "csv"):
+            with span("csv.row_to_patient", "csv", row=0):
+                pass
+
+        # Act
+        path = tracer.write(tmp_path / "traces" / "trace.json")
+
+        # Assert
+        trace = json.loads(path.read_text(encoding="utf-8"))
+        assert trace["displayTimeUnit"] == "ms"
+        events = trace["traceEvents"]
+        assert events[0] == {
+            "name": "process_name", "ph": "M", "pid": events[0]["pid"], "args": {"name": "ihe-test-util"}
+        }
+        spans = [event for event in events if event["ph"] == "X"]
+        assert [event["name"] for event in spans] == ["csv.parse", "csv.row_to_patient"]
+        assert spans[0]["ts"] <= spans[1]["ts"]
+        assert spans[0]["ts"] + spans[0]["dur"] >= spans[1]["ts"] + spans[1]["dur"]
+
+    def test_tracing_block_disables_afterwards(self):
+        with tracing.tracing() as tracer:
+            with span("saml.assertion", "saml"):
+                pass
+
+        assert get_tracer() is None
+        assert [event["name"] for event in _spans(tracer)] == ["saml.assertion"]
+
+    def test_events_beyond_cap_are_dropped_and_reported(self, tmp_path):
+        # Arrange
+        tracer = enable_tracing(max_events=3)
+
+        # Act
+        try:
+            for row in range(5):
+                with span("csv.row_to_patient", "csv", row=row):
+                    pass
+            instant("retry", "http")
+        finally:
+            disable_tracing()
+        trace = json.loads(tracer.write(tmp_path / "trace.json").read_text(encoding="utf-8"))
+
+        # Assert
+        assert [event["args"]["row"] for event in _spans(tracer)] == [0, 1, 2]
+        assert tracer.dropped_events == 3
+        assert trace["otherData"] == {"max_events": 3, "dropped_events": 3}
@@ -0,0 +1,331 @@
+"""Unit tests for the compressed transaction archive."""
+
+import json
+import os
+import threading
+import zlib
+
+import pytest
+
+from ihe_test_util.logging_audit import configure_logging, flush_logging, log_transaction
+from ihe_test_util.logging_audit.transaction_archive import (
+    DICTIONARY_FILE,
+    KEY_INDEX_FILE,
+    LEGACY_INDEX_FILE,
+    ArchiveReader,
+    TransactionArchive,
+    archive_context,
+    archive_transaction,
+    get_transaction_archive,
+    transaction_archive,
+)
+
+
+def _envelope(i: int) -> str:
+    """A request that shares most of its bytes with every other one."""
+    sections = "".join(
+        f'<section code="{code}"><title>Section {code}</title><text>Template text</text></section>'
+        for code in range(40)
+    )
+    return f'<Envelope><MessageID>urn:uuid:{i}</MessageID><Body>{sections}</Body></Envelope>'
+
+
+class TestTransactionArchive:
+    """Test writing and reading archives."""
+
+    def test_round_trip_by_message_id(self, tmp_path):
+        # Arrange
+        archive = TransactionArchive(tmp_path, flush_interval=0)
+
+        # Act
+        archive.write("PIX_ADD", "urn:uuid:1", "SUCCESS",
+                      {"request": "<req>ü</req>", "response": "<ack/>"}, patient_id="PAT001")
+        archive.write("PIX_ADD", "urn:uuid:2", "ERROR",
+                      {"request": "<req2/>", "response": None}, error="Connection refused")
+        archive.close()
+
+        # Assert
+        reader = ArchiveReader(tmp_path)
+        first = reader.get("urn:uuid:1")
+        assert first.parts == {"request": "<req>ü</req>", "response": "<ack/>"}
+        assert first.patient_id == "PAT001"
+        second = reader.get("urn:uuid:2")
+        assert second.parts == {"request": "<req2/>"}
+        assert (second.status, second.error) == ("ERROR", "Connection refused")
+        assert reader.get("urn:uuid:3") is None
+
+    def test_flush_makes_queued_transactions_readable(self, tmp_path):
+        # Arrange
+        archive = TransactionArchive(tmp_path, flush_interval=0)
+        archive.write("PIX_ADD", "urn:uuid:1", "SUCCESS", {"request": "<req/>"})
+
+        # Act
+        archive.flush()
+
+        # Assert
+        assert ArchiveReader(tmp_path).get("urn:uuid:1").parts == {"request": "<req/>"}
+        archive.close()
+
+    def test_repeated_templates_compress_well(self, tmp_path):
+        """Test transactions sharing template fragments take a fraction of their size."""
+        # Arrange
+        archive = TransactionArchive(tmp_path, flush_interval=0, chunk_bytes=16 * 1024)
+        requests = [_envelope(i) for i in range(200)]
+
+        # Act
+        for i, request in enumerate(requests):
+            archive.write("ITI41_SUBMIT", f"urn:uuid:{i}", "SUCCESS", {"request": request})
+        archive.close()
+
+        # Assert
+        raw_bytes = sum(len(request) for request in requests)
+        segment_bytes = sum(path.stat().st_size for path in tmp_path.glob("segment-*.dat"))
+        assert segment_bytes * 20 < raw_bytes
+        chunks = {entry["chunk_offset"] for entry in ArchiveReader(tmp_path).entries()}
+        assert len(chunks) > 1
+        assert ArchiveReader(tmp_path).get("urn:uuid:150").parts["request"] == requests[150]
+
+    def test_segments_roll_over_and_reopen_keeps_dictionary(self, tmp_path):
+        """Test full segments start a new file and a reopened archive keeps its dictionary."""
+        # Arrange
+        archive = TransactionArchive(tmp_path, flush_interval=0, chunk_bytes=1, segment_bytes=1)
+        for i in range(3):
+            archive.write("PIX_ADD", f"urn:uuid:{i}", "SUCCESS", {"request": _envelope(i)})
+        archive.close()
+        dictionary = (tmp_path / DICTIONARY_FILE).read_bytes()
+
+        # Act
+        reopened = TransactionArchive(tmp_path, flush_interval=0)
+        reopened.write("PIX_ADD", "urn:uuid:3", "SUCCESS", {"request": _envelope(3)})
+        reopened.close()
+
+        # Assert
+        segments = sorted(path.name for path in tmp_path.glob("segment-*.dat"))
+        assert [name[-10:] for name in segments] == ["000001.dat", "000002.dat", "000003.dat", "000001.dat"]
+        assert len(list(tmp_path.glob("index-*.jsonl"))) == 2
+        assert (tmp_path / DICTIONARY_FILE).read_bytes() == dictionary
+        reader = ArchiveReader(tmp_path)
+        assert [reader.get(f"urn:uuid:{i}").parts["request"] for i in range(4)] == [
+            _envelope(i) for i in range(4)
+        ]
+
+    def test_concurrent_writers(self, tmp_path):
+        # Arrange
+        archive = TransactionArchive(tmp_path, flush_interval=0, chunk_bytes=4096, queue_size=8)
+
+        def submit(worker):
+            for i in range(25):
+                archive.write("PIX_ADD", f"urn:uuid:{worker}-{i}", "SUCCESS", {"request": _envelope(i)})
+
+        # Act
+        threads = [threading.Thread(target=submit, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        archive.close()
+
+        # Assert
+        reader = ArchiveReader(tmp_path)
+        assert len(list(reader.entries())) == 100
+        assert reader.get("urn:uuid:3-24").parts["request"] == _envelope(24)
+
+    def test_unindexed_chunk_is_invisible(self, tmp_path):
+        """Test a crash between the chunk write and its index lines loses nothing indexed."""
+        # Arrange
+        archive = TransactionArchive(tmp_path, flush_interval=0)
+        archive.write("PIX_ADD", "urn:uuid:1", "SUCCESS", {"request": "<req/>"})
+        archive.close()
+
+        # Act
+        with open(next(tmp_path.glob("segment-*.dat")), "ab") as segment:
+            segment.write(b"torn write")
+        with open(next(tmp_path.glob("index-*.jsonl")), "a", encoding="utf-8") as index:
+            index.write('{"message_id": "urn:uuid:2", "trunc')
+
+        # Assert
+        reader = ArchiveReader(tmp_path)
+        assert [entry["message_id"] for entry in reader.entries()] == ["urn:uuid:1"]
+        assert reader.get("urn:uuid:1").parts == {"request": "<req/>"}
+
+    def test_key_lookups_do_not_scan_index(self, tmp_path, monkeypatch):
+        # Arrange
+        archive = TransactionArchive(tmp_path, flush_interval=0, chunk_bytes=1)
+        for i in range(20):
+            archive.write("PIX_ADD", f"urn:uuid:{i}", "SUCCESS" if i % 2 else "ERROR",
+                          {"request": _envelope(i)}, patient_id=f"PAT{i % 5:03d}")
+        archive.close()
+        reader = ArchiveReader(tmp_path)
+        monkeypatch.setattr(ArchiveReader, "_scan", lambda self, equals: pytest.fail("index scanned"))
+
+        # Act
+        transaction = reader.get("urn:uuid:7")
+        by_patient = list(reader.entries(patient_id="PAT002", status="ERROR"))
+
+        # Assert
+        assert (tmp_path / KEY_INDEX_FILE).exists()
+        assert transaction.parts["request"] == _envelope(7)
+        assert [entry["message_id"] for entry in by_patient] == ["urn:uuid:2", "urn:uuid:12"]
+        assert reader.get("urn:uuid:99") is None
+
+    def test_missing_key_index_is_rebuilt(self, tmp_path):
+        """Test archives written before index.db existed are indexed on open."""
+        # Arrange
+        archive = TransactionArchive(tmp_path, flush_interval=0)
+        archive.write("PIX_ADD", "urn:uuid:1", "SUCCESS", {"request": "<req1/>"}, patient_id="PAT001")
+        archive.close()
+        (tmp_path / KEY_INDEX_FILE).unlink()
+
+        # Act
+        reopened = TransactionArchive(tmp_path, flush_interval=0)
+        reopened.write("PIX_ADD", "urn:uuid:2", "SUCCESS", {"request": "<req2/>"}, patient_id="PAT001")
+        reopened.close()
+
+        # Assert
+        reader = ArchiveReader(tmp_path)
+        assert [entry["message_id"] for entry in reader.entries(patient_id="PAT001")] == [
+            "urn:uuid:1", "urn:uuid:2",
+        ]
+
+    def test_reader_sees_transactions_archived_after_open(self, tmp_path):
+        # Arrange
+        archive = TransactionArchive(tmp_path, flush_interval=0)
+        archive.write("PIX_ADD", "urn:uuid:1", "SUCCESS", {"request": "<req1/>"})
+        archive.flush()
+        reader = ArchiveReader(tmp_path)
+
+        # Act
+        archive.write("PIX_ADD", "urn:uuid:2", "SUCCESS", {"request": "<req2/>"})
+        archive.close()
+
+        # Assert
+        assert reader.get("urn:uuid:2").parts == {"request": "<req2/>"}
+
+    def test_writers_sharing_a_directory(self, tmp_path):
+        """Test two writers (e.g. sharded batch workers) interleaving in one directory."""
+        # Arrange
+        first = TransactionArchive(tmp_path, flush_interval=0)
+        second = TransactionArchive(tmp_path, flush_interval=0)
+
+        # Act
+        first.write("PIX_ADD", "urn:uuid:1", "SUCCESS", {"request": _envelope(1)}, patient_id="PAT001")
+        second.write("PIX_ADD", "urn:uuid:2", "SUCCESS", {"request": _envelope(2)}, patient_id="PAT001")
+        first.flush()
+        second.flush()
+        first.write("PIX_ADD", "urn:uuid:3", "SUCCESS", {"request": _envelope(3)}, patient_id="PAT001")
+        first.close()
+        second.close()
+
+        # Assert
+        reader = ArchiveReader(tmp_path)
+        assert [reader.get(f"urn:uuid:{i}").parts["request"] for i in (1, 2, 3)] == [
+            _envelope(1), _envelope(2), _envelope(3),
+        ]
+        assert sorted(entry["message_id"] for entry in reader.entries(patient_id="PAT001")) == [
+            "urn:uuid:1", "urn:uuid:2", "urn:uuid:3",
+        ]
+        assert [path.name for path in tmp_path.glob("*.tmp")] == []
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+    def test_writer_processes_sharing_a_directory(self, tmp_path):
+        # Arrange
+        archive = TransactionArchive(tmp_path, flush_interval=0, chunk_bytes=1)
+
+        # Act
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 1
+            try:
+                child = TransactionArchive(tmp_path, flush_interval=0, chunk_bytes=1)
+                for i in range(20):
+                    child.write("PIX_ADD", f"urn:uuid:child-{i}", "SUCCESS", {"request": _envelope(i)})
+                child.close()
+                exit_code = 0
+            finally:
+                os._exit(exit_code)
+        for i in range(20):
+            archive.write("PIX_ADD", f"urn:uuid:parent-{i}", "SUCCESS", {"request": _envelope(i)})
+        archive.close()
+        _, status = os.waitpid(pid, 0)
+
+        # Assert
+        assert os.waitstatus_to_exitcode(status) == 0
+        reader = ArchiveReader(tmp_path)
+        for owner in ("parent", "child"):
+            assert [reader.get(f"urn:uuid:{owner}-{i}").parts["request"] for i in range(20)] == [
+                _envelope(i) for i in range(20)
+            ]
+
+    def test_reads_single_writer_archives(self, tmp_path):
+        """Test archives from before per-writer files (index.jsonl) stay readable."""
+        # Arrange
+        data = zlib.compress(b"<req/><ack/>")
+        (tmp_path / "segment-000001.dat").write_bytes(b"IHTA" + len(data).to_bytes(4, "big") + data)
+        entry = {
+            "v": 1, "timestamp": "2025-01-01T12:00:00.000+00:00", "message_id": "urn:uuid:1",
+            "patient_id": "PAT001", "transaction_type": "PIX_ADD", "status": "SUCCESS", "error": None,
+            "offset": 0, "parts": [["request", 6], ["response", 6]],
+            "segment": "segment-000001.dat", "chunk_offset": 0,
+        }
+        (tmp_path / LEGACY_INDEX_FILE).write_text(json.dumps(entry) + "\n")
+
+        # Act
+        reader = ArchiveReader(tmp_path)
+
+        # Assert
+        assert reader.get("urn:uuid:1").parts == {"request": "<req/>", "response": "<ack/>"}
+        assert [e["message_id"] for e in reader.entries(patient_id="PAT001")] == ["urn:uuid:1"]
+
+    def test_reader_requires_index(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            ArchiveReader(tmp_path)
+
+
+class TestArchiveTransaction:
+    """Test the process-wide archive and its producers."""
+
+    def test_archive_transaction_without_archive_is_noop(self):
+        assert get_transaction_archive() is None
+        assert archive_transaction("PIX_ADD", "urn:uuid:1", "SUCCESS", "<req/>") is False
+
+    def test_patient_id_from_archive_context(self, tmp_path):
+        # Act
+        with transaction_archive(tmp_path, flush_interval=0):
+            with archive_context("PAT001"):
+                archive_transaction("PIX_ADD", "urn:uuid:1", "SUCCESS", "<req/>", "<ack/>")
+            archive_transaction("PIX_ADD", "urn:uuid:2", "SUCCESS", "<req/>", "<ack/>")
+
+        # Assert
+        reader = ArchiveReader(tmp_path)
+        assert get_transaction_archive() is None
+        assert [entry["message_id"] for entry in reader.entries(patient_id="PAT001")] == ["urn:uuid:1"]
+        assert reader.get("urn:uuid:2").patient_id is None
+
+    def test_log_transaction_archives_instead_of_logging_payloads(self, tmp_path):
+        """Test payloads go to the archive, not the DEBUG log, when an archive is open."""
+        # Arrange
+        log_file = tmp_path / "test.log"
+        configure_logging(level="DEBUG", log_file=log_file)
+
+        # Act
+        with transaction_archive(tmp_path / "archive", flush_interval=0):
+            log_transaction(
+                "ITI41_SUBMIT", "<request/>", "<response/>", "success",
+                message_id="urn:uuid:1", patient_id="PAT001",
+                attachments={"document": "<ClinicalDocument/>"},
+            )
+        flush_logging()
+
+        # Assert
+        log_content = log_file.read_text()
+        assert "correlation_id=urn:uuid:1" in log_content
+        assert "TRANSACTION REQUEST" not in log_content
+        transaction = ArchiveReader(tmp_path / "archive").get("urn:uuid:1")
+        assert transaction.parts == {
+            "request": "<request/>",
+            "response": "<response/>",
+            "document": "<ClinicalDocument/>",
+        }
+        assert transaction.patient_id == "PAT001"
+        index_file = next((tmp_path / "archive").glob("index-*.jsonl"))
+        assert json.loads(index_file.read_text())["status"] == "success"
@@ -0,0 +1,151 @@
+"""Unit tests for the in-process WSGI transport adapter."""
+
+import pytest
+import requests
+from flask import Flask, Response, request
+from requests.adapters import HTTPAdapter
+
+from ihe_test_util.ihe_transactions.iti41_client import ITI41SOAPClient
+from ihe_test_util.transport.wsgi_adapter import (
+    DEFAULT_BASE_URL,
+    WSGIAdapter,
+    mount_wsgi_app,
+)
+
+
+MTOM_BODY = (
+    b"--uuid:boundary\r\n"
+    b"Content-Type: application/xop+xml; charset=UTF-8\r\n\r\n"
+    b"<soap:Envelope/>\r\n"
+    b"--uuid:boundary\r\n"
+    b"Content-Type: application/octet-stream\r\n\r\n"
+    + bytes(range(256))
+    + b"\r\n--uuid:boundary--\r\n"
+)
+
+
+@pytest.fixture
+def echo_app():
+    """Flask app that echoes what it receives."""
+    echo = Flask("echo")
+
+    @echo.route("/echo", methods=["POST"])
+    def echo_body():
+        response = Response(request.get_data(), status=202, content_type=request.content_type)
+        response.headers["X-Received-Path"] = request.path
+        response.headers["X-Received-Query"] = request.query_string.decode("ascii")
+        response.headers["X-Received-Action"] = request.headers.get("X-Action", "")
+        return response
+
+    @echo.route("/fault", methods=["GET"])
+    def fault():
+        response = Response("<fault/>", status=500, content_type="text/xml; charset=ISO-8859-1")
+        response.headers.add("X-Repeated", "one")
+        response.headers.add("X-Repeated", "two")
+        return response
+
+    return echo
+
+
+@pytest.fixture
+def session(echo_app):
+    """Session with the echo app mounted on the default base URL."""
+    session = requests.Session()
+    mount_wsgi_app(session, echo_app)
+    return session
+
+
+class TestWSGIAdapter:
+    """Test request/response translation through the adapter."""
+
+    def test_binary_body_and_content_type_round_trip(self, session):
+        """Test MTOM multipart bodies and boundaries reach the app byte for byte."""
+        # Arrange
+        content_type = 'multipart/related; type="application/xop+xml"; boundary="uuid:boundary"'
+
+        # Act
+        response = session.post(
+            f"{DEFAULT_BASE_URL}/echo",
+            data=MTOM_BODY,
+            headers={"Content-Type": content_type},
+        )
+
+        # Assert
+        assert response.status_code == 202
+        assert response.content == MTOM_BODY
+        assert response.headers["Content-Type"] == content_type
+        assert response.headers["Content-Length"] == str(len(MTOM_BODY))
+
+    def test_request_headers_path_and_query_are_preserved(self, session):
+        """Test custom headers, path and query string are passed to the app."""
+        # Act
+        response = session.post(
+            f"{DEFAULT_BASE_URL}/echo?mode=test&n=1",
+            data="<a/>",
+            headers={"X-Action": "urn:hl7-org:v3:PRPA_IN201301UV02"},
+        )
+
+        # Assert
+        assert response.headers["X-Received-Path"] == "/echo"
+        assert response.headers["X-Received-Query"] == "mode=test&n=1"
+        assert response.headers["X-Received-Action"] == "urn:hl7-org:v3:PRPA_IN201301UV02"
+        assert response.text == "<a/>"
+
+    def test_error_status_reason_and_encoding(self, session):
+        """Test error statuses, reason phrases and charsets are reported."""
+        # Act
+        response = session.get(f"{DEFAULT_BASE_URL}/fault")
+
+        # Assert
+        assert response.status_code == 500
+        assert response.reason == "INTERNAL SERVER ERROR"
+        assert response.encoding == "ISO-8859-1"
+        assert response.text == "<fault/>"
+        with pytest.raises(requests.HTTPError):
+            response.raise_for_status()
+
+    def test_repeated_response_headers_are_joined(self, session):
+        """Test repeated header names are combined like socket responses."""
+        # Act
+        response = session.get(f"{DEFAULT_BASE_URL}/fault")
+
+        # Assert
+        assert response.headers["X-Repeated"] == "one, two"
+
+    def test_response_references_request(self, session):
+        """Test the response carries its URL and prepared request."""
+        # Act
+        response = session.get(f"{DEFAULT_BASE_URL}/fault")
+
+        # Assert
+        assert response.url == f"{DEFAULT_BASE_URL}/fault"
+        assert response.request.method == "GET"
+        assert isinstance(response.connection, WSGIAdapter)
+
+
+class TestMountWSGIApp:
+    """Test mounting the adapter on sessions."""
+
+    def test_only_base_url_is_intercepted(self, echo_app):
+        """Test other hosts keep the session's default adapters."""
+        # Arrange
+        session = requests.Session()
+
+        # Act
+        adapter = mount_wsgi_app(session, echo_app, base_url="http://mock.test/")
+
+        # Assert
+        assert session.get_adapter("http://mock.test/pix/add") is adapter
+        assert isinstance(session.get_adapter("http://mock.testing/pix/add"), HTTPAdapter)
+        assert isinstance(session.get_adapter("https://pix.example.com/pix/add"), HTTPAdapter)
+
+    def test_mount_on_iti41_client_session(self, echo_app):
+        """Test the adapter can be mounted on the ITI-41 client's session."""
+        # Arrange
+        client = ITI41SOAPClient(endpoint_url=f"{DEFAULT_BASE_URL}/iti41/submit")
+
+        # Act
+        adapter = mount_wsgi_app(client.session, echo_app)
+
+        # Assert
+        assert client.session.get_adapter(client.endpoint_url) is adapter